@@ -0,0 +1,131 @@
+"""
+Endpoints de runs eGestiona en segundo plano: estado, progreso (SSE) y cancelación.
+
+Los POST /runs/egestiona/* devuelven {"run_id", "status_url", "events_url", "cancel_url"};
+el resultado original del flujo (run_id de ejecución, runs_url...) queda en "result".
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+
+from backend.runs.background_runs_v1 import (
+    BackgroundRunCanceled,
+    BackgroundRunV1,
+    get_background_run_manager,
+)
+
+router = APIRouter(tags=["egestiona"])
+
+SSE_POLL_INTERVAL_S = 0.5
+SSE_KEEPALIVE_S = 15.0
+
+
+async def submit_flow_run(kind: str, job, *, wait: bool, params: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Encola job (función síncrona del flujo) en el executor de runs eGestiona.
+
+    wait=False: respuesta inmediata con el run_id del run en segundo plano.
+    wait=True: espera el resultado sin ocupar el threadpool de Starlette (respuesta legacy).
+    """
+    run = get_background_run_manager().submit(kind, job, params=params)
+    if not wait:
+        return {"run_id": run.run_id, "status": run.status.value, **run.urls()}
+    try:
+        return await run.wait_result()
+    except BackgroundRunCanceled:
+        raise HTTPException(status_code=409, detail=f"Run {run.run_id} cancelado")
+
+
+def _get_run_or_404(run_id: str) -> BackgroundRunV1:
+    run = get_background_run_manager().get(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail=f"Run {run_id} no encontrado")
+    return run
+
+
+def _sse(event: str, data: Any, event_id: Optional[int] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, default=str)}")
+    return "\n".join(lines) + "\n\n"
+
+
+async def _stream_run_events(run: BackgroundRunV1, request: Request, after: int) -> AsyncIterator[str]:
+    """Eventos del timeline a partir del índice after; termina con un evento "status" final."""
+    index = max(0, after)
+    idle_s = 0.0
+    while True:
+        events = run.timeline.get_events()
+        terminal = run.is_terminal  # leer antes de vaciar: no perder eventos finales
+        for event in events[index:]:
+            yield _sse("timeline", event.to_dict(), event_id=index)
+            index += 1
+            idle_s = 0.0
+        if terminal and index >= run.timeline.get_event_count():
+            yield _sse("status", run.to_dict())
+            return
+        if await request.is_disconnected():
+            return
+        await asyncio.sleep(SSE_POLL_INTERVAL_S)
+        idle_s += SSE_POLL_INTERVAL_S
+        if idle_s >= SSE_KEEPALIVE_S:
+            idle_s = 0.0
+            yield ": keepalive\n\n"
+
+
+@router.get("/runs/egestiona/background")
+async def list_background_runs(limit: int = 50):
+    """Runs en segundo plano más recientes (en memoria del proceso)."""
+    return {"runs": [run.to_dict() for run in get_background_run_manager().list_runs(limit=limit)]}
+
+
+@router.get("/runs/egestiona/background/{run_id}")
+async def get_background_run(run_id: str, include_events: bool = True):
+    """Estado, resultado o error y timeline de un run en segundo plano."""
+    return _get_run_or_404(run_id).to_dict(include_events=include_events)
+
+
+@router.get("/runs/egestiona/background/{run_id}/events")
+async def stream_background_run_events(run_id: str, request: Request, after: Optional[int] = None):
+    """
+    Server-Sent Events con el progreso del run.
+
+    Reanudable: Last-Event-ID (o ?after=N) indica el último evento recibido; se reenvía
+    desde el siguiente. Sin ninguno de los dos se envía el timeline completo.
+    """
+    run = _get_run_or_404(run_id)
+    start = 0
+    last_event_id = request.headers.get("last-event-id")
+    if after is not None:
+        start = after + 1
+    elif last_event_id is not None:
+        try:
+            start = int(last_event_id) + 1
+        except ValueError:
+            start = 0
+    return StreamingResponse(
+        _stream_run_events(run, request, start),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/runs/egestiona/background/{run_id}/cancel")
+async def cancel_background_run(run_id: str):
+    """
+    Cancela un run encolado o pide al flujo en curso que se detenga en el siguiente punto de
+    control: cada paso de ExecutorRuntimeH4 y, en los constructores de plan/matching headful,
+    tras el login, por página del grid y antes del matching. Los flujos de diagnóstico sin
+    puntos de control terminan su ejecución y el run queda CANCELED al acabar.
+    """
+    _get_run_or_404(run_id)
+    run = get_background_run_manager().cancel(run_id)
+    return run.to_dict()
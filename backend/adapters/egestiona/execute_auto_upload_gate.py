@@ -18,10 +18,10 @@ from pydantic import BaseModel
 from backend.config import DATA_DIR
 from backend.adapters.egestiona.real_uploader import EgestionaRealUploader
 from backend.adapters.egestiona.upload_policy import evaluate_upload_policy
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.adapters.egestiona.session_pool import egestiona_session_key_for, get_session_pool, home_url_for
+from backend.repository.repository_service_v1 import get_config_store
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
 from backend.repository.secrets_store_v1 import SecretsStoreV1
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
 from backend.repository.document_matcher_v1 import DocumentMatcherV1
 from starlette.concurrency import run_in_threadpool
 # SPRINT C2.16: Hardening
@@ -453,7 +453,7 @@ async def egestiona_execute_auto_upload(
     from backend.adapters.egestiona.frame_scan_headful import LOGIN_URL_PREVIOUS_SUCCESS
     
     base = ensure_data_layout(base_dir="data")
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
     
     platforms = store.load_platforms()
@@ -514,72 +514,92 @@ async def egestiona_execute_auto_upload(
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=False, slow_mo=300)
-            context = browser.new_context(
+            
+            # Sesión del pool (misma clave que plan/matching/escaneo): login solo si no hay una viva
+            session_pool = get_session_pool(base)
+            session_key = egestiona_session_key_for(
+                coordination=request.coord,
+                username=creds.username,
+                client_code=(coord.client_code or "").strip(),
+            )
+            reused_session = session_pool.try_reuse(
+                browser,
+                session_key,
+                home_url=home_url_for(url),
                 viewport={"width": 1600, "height": 1000},
             )
-            page = context.new_page()
-            
-            # SPRINT C2.16: Login con retry policy y timeout
-            print(f"[CAE][AUTO_UPLOAD] Haciendo login...")
-            
-            def do_login():
-                page.goto(url)
-                page.fill('input[name="usuario"], input[name="username"], input[type="text"]', creds.username)
-                page.fill('input[name="password"], input[type="password"]', creds.password)
-                page.click('button[type="submit"], input[type="submit"], button:has-text("Entrar")')
-                page.wait_for_timeout(3000)
-            
-            try:
-                run_with_phase_timeout(
-                    phase="login",
-                    fn=do_login,
-                    timeout_s=DEFAULT_TIMEOUTS["login"],
-                    on_timeout_evidence=lambda: generate_error_evidence(
+            if reused_session is not None:
+                context, page = reused_session
+                print(f"[CAE][AUTO_UPLOAD] Sesión reutilizada del pool (sin login)")
+            else:
+                context = browser.new_context(
+                    viewport={"width": 1600, "height": 1000},
+                )
+                page = context.new_page()
+                
+                # SPRINT C2.16: Login con retry policy y timeout
+                print(f"[CAE][AUTO_UPLOAD] Haciendo login...")
+                
+                def do_login():
+                    page.goto(url)
+                    page.fill('input[name="usuario"], input[name="username"], input[type="text"]', creds.username)
+                    page.fill('input[name="password"], input[type="password"]', creds.password)
+                    page.click('button[type="submit"], input[type="submit"], button:has-text("Entrar")')
+                    page.wait_for_timeout(3000)
+                
+                try:
+                    run_with_phase_timeout(
+                        phase="login",
+                        fn=do_login,
+                        timeout_s=DEFAULT_TIMEOUTS["login"],
+                        on_timeout_evidence=lambda: generate_error_evidence(
+                            page=page,
+                            phase="login",
+                            attempt=1,
+                            error=Exception("Login timeout"),
+                            evidence_dir=execution_dir,
+                            context={"url": url},
+                            run_id=run_id,
+                        ),
+                    )
+                except Exception as login_error:
+                    error_classification = classify_exception(login_error, "login", {"url": url})
+                    errors_logged.append({
+                        "phase": "login",
+                        "error_code": error_classification["error_code"],
+                        "message": error_classification["message"],
+                        "transient": error_classification["is_transient"],
+                        "attempt": 1,
+                    })
+                    
+                    # Generar evidencia
+                    evidence_paths = generate_error_evidence(
                         page=page,
                         phase="login",
                         attempt=1,
-                        error=Exception("Login timeout"),
+                        error=login_error,
                         evidence_dir=execution_dir,
                         context={"url": url},
                         run_id=run_id,
-                    ),
-                )
-            except Exception as login_error:
-                error_classification = classify_exception(login_error, "login", {"url": url})
-                errors_logged.append({
-                    "phase": "login",
-                    "error_code": error_classification["error_code"],
-                    "message": error_classification["message"],
-                    "transient": error_classification["is_transient"],
-                    "attempt": 1,
-                })
-                
-                # Generar evidencia
-                evidence_paths = generate_error_evidence(
-                    page=page,
-                    phase="login",
-                    attempt=1,
-                    error=login_error,
-                    evidence_dir=execution_dir,
-                    context={"url": url},
-                    run_id=run_id,
-                )
+                    )
+                    
+                    # Retry si es transitorio
+                    if error_classification["is_transient"]:
+                        try:
+                            retry_with_policy(
+                                fn=do_login,
+                                phase="login",
+                                error_code=error_classification["error_code"],
+                                context={"url": url},
+                                on_retry=lambda attempt, exc: print(f"[RETRY][login] Attempt {attempt}"),
+                            )
+                        except Exception as retry_error:
+                            # Si retry también falla, abortar
+                            raise retry_error
+                    else:
+                        raise login_error
                 
-                # Retry si es transitorio
-                if error_classification["is_transient"]:
-                    try:
-                        retry_with_policy(
-                            fn=do_login,
-                            phase="login",
-                            error_code=error_classification["error_code"],
-                            context={"url": url},
-                            on_retry=lambda attempt, exc: print(f"[RETRY][login] Attempt {attempt}"),
-                        )
-                    except Exception as retry_error:
-                        # Si retry también falla, abortar
-                        raise retry_error
-                else:
-                    raise login_error
+                session_pool.save(context, session_key)
             
             # SPRINT C2.17: Para cada item (usar items_to_upload si existe, sino request.items)
             items_list = items_to_upload if items_to_upload else (request.items if request.items else [])
@@ -20,7 +20,7 @@ from pydantic import BaseModel
 from backend.config import DATA_DIR
 from backend.adapters.egestiona.execute_plan_gate import ExecutePlanRequest
 from backend.adapters.egestiona.real_uploader import EgestionaRealUploader
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store
 
 router = APIRouter(tags=["egestiona"])
 
@@ -293,7 +293,7 @@ async def egestiona_execute_plan_headful(request: ExecutePlanRequest, http_reque
             
             try:
                 # 7) Verificar autenticación navegando a e-gestiona
-                store = ConfigStoreV1(base_dir=DATA_DIR)
+                store = get_config_store(DATA_DIR)
                 platforms = store.load_platforms()
                 plat = next((p for p in platforms.platforms if p.key == "egestiona"), None)
                 if not plat:
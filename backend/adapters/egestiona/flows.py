@@ -6,15 +6,16 @@ from pathlib import Path
 from typing import Optional, List
 
 from fastapi import APIRouter, HTTPException, Request
-from starlette.concurrency import run_in_threadpool
 
+from backend.adapters.egestiona.background_run_routes import submit_flow_run
+from backend.runs.background_runs_v1 import BackgroundRunCanceled
 from backend.adapters.egestiona.profile import EgestionaProfileV1
 from backend.adapters.egestiona.targets import build_targets_from_selectors
 
 # Selector post-login robusto: verificar que salimos de login (no usar texto específico)
 POST_LOGIN_SELECTOR_DEFAULT = None  # No usar selector de texto, verificar navegación
 from backend.executor.runtime_h4 import ExecutorRuntimeH4
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
 from backend.repository.secrets_store_v1 import SecretsStoreV1
 from backend.shared.executor_contracts_v1 import (
@@ -66,7 +67,7 @@ def run_login_and_snapshot(
     Devuelve run_id.
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -284,7 +285,7 @@ def run_upload_document_cae(
         file_path: Ruta local al archivo a subir (se registrará en el repositorio si no existe)
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
     
     # Registrar documento si no existe
@@ -637,7 +638,7 @@ def run_buscar_frames_dashboard(
         raise ValueError("HEADFUL_REQUIRED: Frame search requires visible browser (headless=False)")
 
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -821,7 +822,7 @@ def run_smoke_test_tenant_correcto(
         raise ValueError("HEADFUL_REQUIRED: Smoke test requires visible browser (headless=False)")
 
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -1003,7 +1004,7 @@ def run_localizacion_geometrica(
         raise ValueError("HEADFUL_REQUIRED: Geometry location requires visible browser (headless=False)")
 
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -1210,7 +1211,7 @@ def run_diagnostico_icono_central(
         raise ValueError("HEADFUL_REQUIRED: Diagnosis mode requires visible browser (headless=False)")
 
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -1427,7 +1428,7 @@ def run_diagnostico_paridad(
         raise ValueError("HEADFUL_REQUIRED: Diagnosis mode requires visible browser (headless=False)")
 
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -1711,7 +1712,7 @@ def run_discovery_ui_cae(
         raise ValueError("HEADFUL_REQUIRED: Discovery mode requires visible browser (headless=False)")
 
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -1966,7 +1967,7 @@ def run_send_pending_document_kern(
     Archivo: el único en data/samples/
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     # Determinar automáticamente el archivo único en data/samples/
@@ -2552,19 +2553,22 @@ router = APIRouter(tags=["egestiona"])
 
 
 @router.post("/runs/egestiona/login")
-async def egestiona_login(coord: str = "Kern"):
+async def egestiona_login(coord: str = "Kern", wait: bool = False):
     """
     Ejecuta login determinista a eGestiona usando Config Store (platform=egestiona, coordination=<coord>).
     """
-    try:
-        run_id = await run_in_threadpool(lambda: run_login_and_snapshot(base_dir="data", platform="egestiona", coordination=coord, headless=True, execution_mode="production"))
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+    def _job():
+        try:
+            run_id = run_login_and_snapshot(base_dir="data", platform="egestiona", coordination=coord, headless=True, execution_mode="production")
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("login", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/upload_document")
-async def egestiona_upload_document(coord: str = "Kern", file_path: str = "data/samples/dummy.pdf"):
+async def egestiona_upload_document(coord: str = "Kern", file_path: str = "data/samples/dummy.pdf", wait: bool = False):
     """
     Ejecuta flujo completo: login + navegación a CAE + upload de documento + validación.
 
@@ -2572,9 +2576,9 @@ async def egestiona_upload_document(coord: str = "Kern", file_path: str = "data/
         coord: Coordinación (default: "Kern")
         file_path: Ruta al archivo a subir (default: "data/samples/dummy.pdf")
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_upload_document_cae(
+    def _job():
+        try:
+            run_id = run_upload_document_cae(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
@@ -2582,12 +2586,21 @@ async def egestiona_upload_document(coord: str = "Kern", file_path: str = "data/
                 headless=True,
                 execution_mode="production",
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except FileNotFoundError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except FileNotFoundError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run(
+        "upload_document",
+        _job,
+        wait=wait,
+        params={
+            "coord": coord,
+            "file_path": file_path,
+        },
+    )
 
 
 @router.post("/runs/egestiona/send_pending_document")
@@ -2595,7 +2608,8 @@ async def egestiona_send_pending_document(
     coord: str = "Kern",
     company_name: str = "TEDELAB INGENIERIA SCCL",
     worker_name: str = "Emilio Roldán Molina",
-    worker_tax_id: str = "37330395"
+    worker_tax_id: str = "37330395",
+    wait: bool = False,
 ):
     """
     Ejecuta flujo específico para enviar documentación pendiente en eGestiona Kern.
@@ -2604,9 +2618,9 @@ async def egestiona_send_pending_document(
     Trabajador objetivo: Emilio Roldán Molina (DNI 37330395)
     Archivo: el único PDF en data/samples/
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_send_pending_document_kern(
+    def _job():
+        try:
+            run_id = run_send_pending_document_kern(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
@@ -2616,103 +2630,118 @@ async def egestiona_send_pending_document(
                 headless=True,
                 execution_mode="production",
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run(
+        "send_pending_document",
+        _job,
+        wait=wait,
+        params={
+            "coord": coord,
+            "company_name": company_name,
+            "worker_name": worker_name,
+            "worker_tax_id": worker_tax_id,
+        },
+    )
 
 
 @router.post("/runs/egestiona/discovery_ui_cae")
-async def egestiona_discovery_ui_cae(coord: str = "Kern"):
+async def egestiona_discovery_ui_cae(coord: str = "Kern", wait: bool = False):
     """
     DISCOVERY MODE: Navegación visual read-only hasta pantalla "Enviar Doc. Pendiente".
     - Navegador VISIBLE obligatorio (headless=False)
     - NO acciones mutables
     - Para identificar selectores correctos en UI real de eGestiona
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_discovery_ui_cae(
+    def _job():
+        try:
+            run_id = run_discovery_ui_cae(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
                 headless=False,  # HEADFUL obligatorio
                 execution_mode="production",
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("discovery_ui_cae", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/diagnostico_paridad")
-async def egestiona_diagnostico_paridad(coord: str = "Kern"):
+async def egestiona_diagnostico_paridad(coord: str = "Kern", wait: bool = False):
     """
     DIAGNÓSTICO DE PARIDAD: investigar por qué iframe#id_contenido no carga contenido.
     - Secuencia de clicks "humanos" para activar carga
     - Captura información de paridad completa
     - Diagnóstico detallado del iframe y elementos
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_diagnostico_paridad(
+    def _job():
+        try:
+            run_id = run_diagnostico_paridad(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
                 headless=False,  # HEADFUL obligatorio para diagnóstico
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("diagnostico_paridad", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/diagnostico_icono_central")
-async def egestiona_diagnostico_icono_central(coord: str = "Kern"):
+async def egestiona_diagnostico_icono_central(coord: str = "Kern", wait: bool = False):
     """
     DIAGNÓSTICO DEL ICONO CENTRAL: encontrar y activar el icono "Enviar Doc. Pendiente" del dashboard.
     - Ruta canónica: login -> dashboard -> click icono central
     - Diagnosticar dónde carga el contenido (iframe vs mismo DOM)
     - NO usar menú lateral salvo fallback
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_diagnostico_icono_central(
+    def _job():
+        try:
+            run_id = run_diagnostico_icono_central(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
                 headless=False,  # HEADFUL obligatorio para diagnóstico
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("diagnostico_icono_central", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/localizacion_geometrica")
-async def egestiona_localizacion_geometrica(coord: str = "Kern"):
+async def egestiona_localizacion_geometrica(coord: str = "Kern", wait: bool = False):
     """
     LOCALIZACIÓN GEOMÉTRICA: encontrar elementos clickables por bounding boxes y geometría.
     - Enumerar elementos clickables en zona central
     - Usar heurística de posición para seleccionar candidato
     - Click y observar cambios
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_localizacion_geometrica(
+    def _job():
+        try:
+            run_id = run_localizacion_geometrica(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
                 headless=False,  # HEADFUL obligatorio para diagnóstico
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("localizacion_geometrica", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/smoke_test_tenant")
-async def egestiona_smoke_test_tenant(coord: str = "Kern"):
+async def egestiona_smoke_test_tenant(coord: str = "Kern", wait: bool = False):
     """
     SMOKE TEST: Verificar tenant correcto y existencia de "Enviar Doc. Pendiente".
     - Login en tenant correcto (grupoindukern.egestiona.com)
@@ -2720,22 +2749,23 @@ async def egestiona_smoke_test_tenant(coord: str = "Kern"):
     - Buscar "Enviar Doc. Pendiente" en dashboard
     - Generar screenshots obligatorias
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_smoke_test_tenant_correcto(
+    def _job():
+        try:
+            run_id = run_smoke_test_tenant_correcto(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
                 headless=False,  # HEADFUL obligatorio para smoke test
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("smoke_test_tenant", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/buscar_frames_dashboard")
-async def egestiona_buscar_frames_dashboard(coord: str = "Kern"):
+async def egestiona_buscar_frames_dashboard(coord: str = "Kern", wait: bool = False):
     """
     BÚSQUEDA EN FRAMES: Localizar "Enviar Doc. Pendiente" en todos los frames del dashboard.
     - Login usando EXACTAMENTE la URL anterior correcta
@@ -2743,45 +2773,47 @@ async def egestiona_buscar_frames_dashboard(coord: str = "Kern"):
     - Buscar texto en cada frame
     - Capturar evidencia
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_buscar_frames_dashboard(
+    def _job():
+        try:
+            run_id = run_buscar_frames_dashboard(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
                 headless=False,  # HEADFUL obligatorio para ver frames
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("buscar_frames_dashboard", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/buscar_frames_dashboard_headful")
-async def egestiona_buscar_frames_dashboard_headful(coord: str = "Kern"):
+async def egestiona_buscar_frames_dashboard_headful(coord: str = "Kern", wait: bool = False):
     """
     HEADFUL + READ-ONLY:
     - Reutiliza EXACTAMENTE la URL del último run exitoso.
     - Enumera TODOS los frames y busca "Enviar Doc. Pendiente" dentro de cada frame.
     - Evidence PNG SIEMPRE (01_dashboard.png, 02_found_or_not.png, 03_tile_element.png).
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_find_enviar_doc_in_all_frames_headful(
+    def _job():
+        try:
+            run_id = run_find_enviar_doc_in_all_frames_headful(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
                 slow_mo_ms=300,
                 wait_after_login_s=2.5,
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("buscar_frames_dashboard_headful", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/frames_screenshots_headful")
-async def egestiona_frames_screenshots_headful(coord: str = "Kern"):
+async def egestiona_frames_screenshots_headful(coord: str = "Kern", wait: bool = False):
     """
     HEADFUL + READ-ONLY:
     - Login con EXACTAMENTE la misma URL del run anterior.
@@ -2789,23 +2821,24 @@ async def egestiona_frames_screenshots_headful(coord: str = "Kern"):
     - Enumera frames y genera PNG por frame: evidence/frame_<idx>_<name>.png (SIN omitir).
     - Solo después busca "Enviar Doc. Pendiente" dentro de cada frame.
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_frames_screenshots_and_find_tile_headful(
+    def _job():
+        try:
+            run_id = run_frames_screenshots_and_find_tile_headful(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
                 slow_mo_ms=300,
                 wait_after_login_s=3.0,
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("frames_screenshots_headful", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/list_pending_documents_readonly")
-async def egestiona_list_pending_documents_readonly(coord: str = "Kern"):
+async def egestiona_list_pending_documents_readonly(coord: str = "Kern", wait: bool = False):
     """
     HEADFUL + READ-ONLY:
     - Login
@@ -2813,9 +2846,9 @@ async def egestiona_list_pending_documents_readonly(coord: str = "Kern"):
     - Cargar listado y extraer filas (sin mutar datos)
     - Evidence PNG + JSON en evidence/
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_list_pending_documents_readonly_headful(
+    def _job():
+        try:
+            run_id = run_list_pending_documents_readonly_headful(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
@@ -2823,14 +2856,15 @@ async def egestiona_list_pending_documents_readonly(coord: str = "Kern"):
                 viewport={"width": 1600, "height": 1000},
                 wait_after_login_s=2.5,
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("list_pending_documents_readonly", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/discovery_pending_table")
-async def egestiona_discovery_pending_table(coord: str = "Kern"):
+async def egestiona_discovery_pending_table(coord: str = "Kern", wait: bool = False):
     """
     HEADFUL + READ-ONLY:
     Descubre en qué frame vive la tabla REAL de "Documentación Pendiente" y dumpea:
@@ -2839,9 +2873,9 @@ async def egestiona_discovery_pending_table(coord: str = "Kern"):
     - tables_detected.json
     - pending_table_selector.json + pending_table_outerhtml.html
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_discovery_pending_table_headful(
+    def _job():
+        try:
+            run_id = run_discovery_pending_table_headful(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
@@ -2850,22 +2884,23 @@ async def egestiona_discovery_pending_table(coord: str = "Kern"):
                 wait_after_login_s=2.0,
                 wait_after_click_s=10.0,
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("discovery_pending_table", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/open_pending_document_details_readonly")
-async def egestiona_open_pending_document_details_readonly(coord: str = "Kern"):
+async def egestiona_open_pending_document_details_readonly(coord: str = "Kern", wait: bool = False):
     """
     HEADFUL + READ-ONLY:
     Abre el detalle de EXACTAMENTE 1 documento pendiente filtrado (TEDELAB + Emilio)
     desde el grid DHTMLX (frame f3) y valida scope visible.
     """
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_open_pending_document_details_readonly_headful(
+    def _job():
+        try:
+            run_id = run_open_pending_document_details_readonly_headful(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
@@ -2873,21 +2908,29 @@ async def egestiona_open_pending_document_details_readonly(coord: str = "Kern"):
                 viewport={"width": 1600, "height": 1000},
                 wait_after_login_s=2.5,
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run(
+        "open_pending_document_details_readonly",
+        _job,
+        wait=wait,
+        params={
+            "coord": coord,
+        },
+    )
 
 
 @router.post("/runs/egestiona/upload_pending_document_scoped")
-async def egestiona_upload_pending_document_scoped(coord: str = "Kern"):
+async def egestiona_upload_pending_document_scoped(coord: str = "Kern", wait: bool = False):
     """
     HEADFUL + WRITE (guardrails strict):
     - Encuentra EXACTAMENTE 1 fila (TEDELAB + Emilio), abre detalle, adjunta el ÚNICO PDF en data/samples/,
       rellena Inicio Vigencia (hoy, Europe/Madrid) y pulsa Enviar solo si scope/inputs validan.
     """
-    run_id = await run_in_threadpool(
-        lambda: run_upload_pending_document_scoped_headful(
+    def _job():
+        run_id = run_upload_pending_document_scoped_headful(
             base_dir="data",
             platform="egestiona",
             coordination=coord,
@@ -2895,8 +2938,9 @@ async def egestiona_upload_pending_document_scoped(coord: str = "Kern"):
             viewport={"width": 1600, "height": 1000},
             wait_after_login_s=2.5,
         )
-    )
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run("upload_pending_document_scoped", _job, wait=wait, params={"coord": coord})
 
 
 @router.post("/runs/egestiona/match_pending_documents_readonly")
@@ -2906,6 +2950,7 @@ async def egestiona_match_pending_documents_readonly(
     person_key: Optional[str] = None,
     limit: int = 20,
     only_target: bool = True,
+    wait: bool = False,
 ):
     """
     HEADFUL / READ-ONLY: Hace matching de pendientes eGestiona con documentos del repositorio.
@@ -2918,9 +2963,9 @@ async def egestiona_match_pending_documents_readonly(
     if not company_key:
         raise HTTPException(status_code=400, detail="company_key is required")
     
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_match_pending_documents_readonly_headful(
+    def _job():
+        try:
+            run_id = run_match_pending_documents_readonly_headful(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
@@ -2932,22 +2977,34 @@ async def egestiona_match_pending_documents_readonly(
                 viewport={"width": 1600, "height": 1000},
                 wait_after_login_s=2.5,
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except RuntimeError as e:
-        error_msg = str(e)
-        # Verificar si es error de navegación a pendientes
-        if "PENDING_ENTRY_POINT_NOT_REACHED" in error_msg:
-            error_detail = {
-                "error": "pending_entry_point_not_reached",
-                "message": error_msg,
-                "detail": "No se pudo llegar a la pantalla de pendientes después de reintentos. "
-                         "Revisar evidence en el directorio de runs para más detalles.",
-            }
-            raise HTTPException(status_code=422, detail=error_detail)
-        raise HTTPException(status_code=500, detail=str(e))
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except RuntimeError as e:
+            error_msg = str(e)
+            # Verificar si es error de navegación a pendientes
+            if "PENDING_ENTRY_POINT_NOT_REACHED" in error_msg:
+                error_detail = {
+                    "error": "pending_entry_point_not_reached",
+                    "message": error_msg,
+                    "detail": "No se pudo llegar a la pantalla de pendientes después de reintentos. "
+                             "Revisar evidence en el directorio de runs para más detalles.",
+                }
+                raise HTTPException(status_code=422, detail=error_detail)
+            raise HTTPException(status_code=500, detail=str(e))
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run(
+        "match_pending_documents_readonly",
+        _job,
+        wait=wait,
+        params={
+            "coord": coord,
+            "company_key": company_key,
+            "person_key": person_key,
+            "limit": limit,
+            "only_target": only_target,
+        },
+    )
 
 
 @router.post("/runs/egestiona/stability_test_pending_readonly")
@@ -2958,6 +3015,7 @@ async def egestiona_stability_test_pending_readonly(
     limit: int = 20,
     only_target: bool = True,
     iterations: int = 5,
+    wait: bool = False,
 ):
     """
     Stability test: Ejecuta el mismo flujo READ-ONLY N veces y valida consistencia.
@@ -2981,9 +3039,9 @@ async def egestiona_stability_test_pending_readonly(
     if iterations < 1 or iterations > 10:
         raise HTTPException(status_code=400, detail="iterations must be between 1 and 10")
     
-    try:
-        summary = await run_in_threadpool(
-            lambda: run_stability_test_pending_readonly(
+    def _job():
+        try:
+            summary = run_stability_test_pending_readonly(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
@@ -2996,14 +3054,27 @@ async def egestiona_stability_test_pending_readonly(
                 viewport={"width": 1600, "height": 1000},
                 wait_after_login_s=2.5,
             )
-        )
-        return summary
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except RuntimeError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error inesperado: {str(e)}")
+            return summary
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except RuntimeError as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Error inesperado: {str(e)}")
+
+    return await submit_flow_run(
+        "stability_test_pending_readonly",
+        _job,
+        wait=wait,
+        params={
+            "coord": coord,
+            "company_key": company_key,
+            "person_key": person_key,
+            "limit": limit,
+            "only_target": only_target,
+            "iterations": iterations,
+        },
+    )
 
 
 @router.post("/runs/egestiona/execute_submission_plan_scoped")
@@ -3017,6 +3088,7 @@ async def egestiona_execute_submission_plan_scoped(
     confirm_execute: bool = False,
     self_test: bool = False,
     self_test_doc_id: Optional[str] = None,
+    wait: bool = False,
 ):
     """
     HEADFUL / WRITE (con guardrails fuertes): Ejecuta plan de envío para items AUTO_SUBMIT_OK.
@@ -3030,9 +3102,9 @@ async def egestiona_execute_submission_plan_scoped(
     if not company_key:
         raise HTTPException(status_code=400, detail="company_key is required")
     
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_execute_submission_plan_scoped_headful(
+    def _job():
+        try:
+            run_id = run_execute_submission_plan_scoped_headful(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
@@ -3048,40 +3120,56 @@ async def egestiona_execute_submission_plan_scoped(
                 viewport={"width": 1600, "height": 1000},
                 wait_after_login_s=2.5,
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except RuntimeError as e:
-        error_msg = str(e)
-        if "SECURITY_HARD_STOP" in error_msg or "GUARDRAIL_VIOLATION" in error_msg:
-            raise HTTPException(status_code=403, detail=error_msg)
-        # Capturar RuntimeError con mensaje DHX_BLOCKER_NOT_DISMISSED
-        if "DHX_BLOCKER_NOT_DISMISSED" in error_msg:
-            from backend.adapters.egestiona.priority_comms_headful import DhxBlockerNotDismissed
-            error_detail = {
-                "error": "dhx_blocker_not_dismissed",
-                "message": error_msg,
-                "detail": "No se pudo cerrar un overlay DHTMLX bloqueante después del login. "
-                         "Revisar evidence en el directorio de runs para más detalles.",
-            }
-            raise HTTPException(status_code=422, detail=error_detail)
-        raise HTTPException(status_code=500, detail=error_msg)
-    except Exception as e:
-        # Capturar excepciones de overlays DHTMLX bloqueantes
-        from backend.adapters.egestiona.priority_comms_headful import PriorityCommsModalNotDismissed, DhxBlockerNotDismissed
-        if isinstance(e, (PriorityCommsModalNotDismissed, DhxBlockerNotDismissed)):
-            error_type = "priority_comms_modal_not_dismissed" if isinstance(e, PriorityCommsModalNotDismissed) else "dhx_blocker_not_dismissed"
-            error_detail = {
-                "error": error_type,
-                "message": str(e),
-                "detail": "No se pudo cerrar un overlay DHTMLX bloqueante después del login. "
-                         "Revisar evidence en el directorio de runs para más detalles.",
-            }
-            if hasattr(e, 'run_id'):
-                error_detail["run_id"] = e.run_id
-            raise HTTPException(status_code=422, detail=error_detail)
-        raise HTTPException(status_code=500, detail=f"Error inesperado: {str(e)}")
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except RuntimeError as e:
+            error_msg = str(e)
+            if "SECURITY_HARD_STOP" in error_msg or "GUARDRAIL_VIOLATION" in error_msg:
+                raise HTTPException(status_code=403, detail=error_msg)
+            # Capturar RuntimeError con mensaje DHX_BLOCKER_NOT_DISMISSED
+            if "DHX_BLOCKER_NOT_DISMISSED" in error_msg:
+                from backend.adapters.egestiona.priority_comms_headful import DhxBlockerNotDismissed
+                error_detail = {
+                    "error": "dhx_blocker_not_dismissed",
+                    "message": error_msg,
+                    "detail": "No se pudo cerrar un overlay DHTMLX bloqueante después del login. "
+                             "Revisar evidence en el directorio de runs para más detalles.",
+                }
+                raise HTTPException(status_code=422, detail=error_detail)
+            raise HTTPException(status_code=500, detail=error_msg)
+        except Exception as e:
+            # Capturar excepciones de overlays DHTMLX bloqueantes
+            from backend.adapters.egestiona.priority_comms_headful import PriorityCommsModalNotDismissed, DhxBlockerNotDismissed
+            if isinstance(e, (PriorityCommsModalNotDismissed, DhxBlockerNotDismissed)):
+                error_type = "priority_comms_modal_not_dismissed" if isinstance(e, PriorityCommsModalNotDismissed) else "dhx_blocker_not_dismissed"
+                error_detail = {
+                    "error": error_type,
+                    "message": str(e),
+                    "detail": "No se pudo cerrar un overlay DHTMLX bloqueante después del login. "
+                             "Revisar evidence en el directorio de runs para más detalles.",
+                }
+                if hasattr(e, 'run_id'):
+                    error_detail["run_id"] = e.run_id
+                raise HTTPException(status_code=422, detail=error_detail)
+            raise HTTPException(status_code=500, detail=f"Error inesperado: {str(e)}")
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run(
+        "execute_submission_plan_scoped",
+        _job,
+        wait=wait,
+        params={
+            "coord": coord,
+            "company_key": company_key,
+            "person_key": person_key,
+            "limit": limit,
+            "only_target": only_target,
+            "dry_run": dry_run,
+            "confirm_execute": confirm_execute,
+            "self_test": self_test,
+            "self_test_doc_id": self_test_doc_id,
+        },
+    )
 
 
 def normalize_contract(payload: dict, run_id_opt: Optional[str]) -> dict:
@@ -3119,72 +3207,28 @@ def normalize_contract(payload: dict, run_id_opt: Optional[str]) -> dict:
 normalize_run_id = normalize_contract
 
 
-@router.post("/runs/egestiona/build_submission_plan_readonly")
-async def egestiona_build_submission_plan_readonly(
-    coord: str = "Kern",
-    company_key: str = "",
-    person_key: Optional[str] = None,
-    limit: int = 20,
-    only_target: bool = True,
-    dry_run: bool = True,  # Explícitamente expuesto (siempre True en este endpoint, pero claro)
-    fixture: bool = False,  # Activar fixture determinista
-    request: Request = None,  # Para leer headers
-):
-    """
-    HEADFUL / READ-ONLY: Genera plan de envío determinista para pendientes eGestiona.
-    - Login -> nm_contenido -> click Gestion(3)
-    - Carga grid DHTMLX en frame f3
-    - Para cada pendiente: matching + evaluación de guardrails
-    - Genera submission_plan.json con decisiones (AUTO_SUBMIT_OK | REVIEW_REQUIRED | NO_MATCH)
-    - NO sube nada, NO hace clicks de "Enviar documento"
-    
-    Response estructurado:
-    - status: "ok" | "error"
-    - run_id: str (si ok)
-    - summary: dict con counts (si ok)
-    - items: array (si ok, puede estar vacío)
-    - error_code, message, details (si error)
-    """
-    # HOTFIX C2.13.7: Logging de trace para identificar ramas
-    print(f"[CAE][READONLY][TRACE] ========================================")
-    print(f"[CAE][READONLY][TRACE] ENTRADA: coord={coord} company_key={company_key} person_key={person_key} limit={limit} only_target={only_target} dry_run={dry_run} fixture={fixture}")
+def _build_submission_plan_readonly_response(
+    *,
+    coord: str,
+    company_key: str,
+    person_key: Optional[str],
+    limit: int,
+    only_target: bool,
+    dry_run: bool,
+    use_fixture: bool,
+    client_request_id: str,
+) -> dict:
+    """Construye el plan READ-ONLY y su respuesta; se ejecuta como run en segundo plano."""
+    import os
     
     # HOTFIX C2.13.2: Inicializar run_id = None al principio (READ-ONLY no tiene run_id por defecto)
     run_id = None
     
-    # Generar client_req_id SIEMPRE (uuid4 si no viene en header)
-    import uuid
-    client_request_id = None
-    if request and hasattr(request, 'headers'):
-        client_request_id = request.headers.get("X-CLIENT-REQ-ID")
-        
-        # Verificar si se activa fixture (header o param)
-        fixture_header = request.headers.get("X-CAE-PLAN-FIXTURE", "0")
-        if fixture_header == "1":
-            fixture = True
-    
-    # Si no viene en header, generar uno
-    if not client_request_id:
-        client_request_id = str(uuid.uuid4())
-    
-    # HOTFIX C2.13.7: Verificar ENV para fixture (solo si explícito)
-    import os
-    env_fixture = os.getenv("EGESTIONA_READONLY_FIXTURE", "0")
-    use_fixture = fixture or (env_fixture == "1")
-    
-    # HOTFIX C2.13.7: Logging de rama
-    if use_fixture:
-        print(f"[CAE][READONLY][TRACE] BRANCH: legacy_fixture reason=fixture={fixture} env_fixture={env_fixture}")
-    else:
-        print(f"[CAE][READONLY][TRACE] BRANCH: real_playwright reason=fixture=False env_fixture={env_fixture}")
-    
     # Si fixture está activo, usar plan determinista
     if use_fixture:
         from backend.adapters.egestiona.fixture_plan import build_fixture_plan
         try:
-            run_id = await run_in_threadpool(
-                lambda: build_fixture_plan(base_dir="data")
-            )
+            run_id = build_fixture_plan(base_dir="data")
         except Exception as e:
             return {
                 "status": "error",
@@ -3193,45 +3237,26 @@ async def egestiona_build_submission_plan_readonly(
                 "details": None,
             }
     else:
-        # HOTFIX C2.13.7: Early return si falta company_key
-        if not company_key:
-            print(f"[CAE][READONLY][TRACE] BRANCH: early_return_missing_company_key reason=company_key is empty")
-            return {
-                "status": "error",
-                "error_code": "missing_company_key",
-                "message": "company_key is required",
-                "details": None,
-                "run_id": None,  # HOTFIX C2.13.6: Siempre incluir run_id (puede ser null)
-                "items": [],  # HOTFIX C2.13.6: Siempre array, nunca null
-                "artifacts": {
-                    "client_request_id": client_request_id,
-                    "run_id": None,
-                },
-                "diagnostics": {},  # HOTFIX C2.13.6: Siempre incluir diagnostics (object)
-            }
-        
         # HOTFIX C2.13.7: READ-ONLY debe ejecutar Playwright (solo sin subida, pero sí con scraping)
         # Usar return_plan_only=True para obtener plan directamente sin crear run
         print(f"[CAE][READONLY][TRACE] BRANCH: real_playwright_executing reason=company_key present, calling run_build_submission_plan_readonly_headful")
         plan_result = None
         try:
             print(f"[CAE][READONLY][TRACE] Llamando run_build_submission_plan_readonly_headful con return_plan_only=True")
-            plan_result = await run_in_threadpool(
-                lambda: run_build_submission_plan_readonly_headful(
-                    base_dir="data",
-                    platform="egestiona",
-                    coordination=coord,
-                    company_key=company_key,
-                    person_key=person_key,
-                    limit=limit,
-                    only_target=only_target,
-                    slow_mo_ms=300,
-                    viewport={"width": 1600, "height": 1000},
-                    wait_after_login_s=2.5,
-                    return_plan_only=True,  # NO crear run ni tocar filesystem, pero SÍ ejecutar Playwright
-                    max_pages=10,  # SPRINT C2.14.1: Límite de páginas para paginación
-                    max_items=200,  # SPRINT C2.14.1: Límite de items totales
-                )
+            plan_result = run_build_submission_plan_readonly_headful(
+                base_dir="data",
+                platform="egestiona",
+                coordination=coord,
+                company_key=company_key,
+                person_key=person_key,
+                limit=limit,
+                only_target=only_target,
+                slow_mo_ms=300,
+                viewport={"width": 1600, "height": 1000},
+                wait_after_login_s=2.5,
+                return_plan_only=True,  # NO crear run ni tocar filesystem, pero SÍ ejecutar Playwright
+                max_pages=10,  # SPRINT C2.14.1: Límite de páginas para paginación
+                max_items=200,  # SPRINT C2.14.1: Límite de items totales
             )
             print(f"[CAE][READONLY][TRACE] run_build_submission_plan_readonly_headful completado. plan_result type: {type(plan_result)}")
             if isinstance(plan_result, dict):
@@ -3846,62 +3871,114 @@ async def egestiona_build_submission_plan_readonly(
         return response
 
 
-@router.post("/runs/egestiona/build_auto_upload_plan")
-async def egestiona_build_auto_upload_plan(
+@router.post("/runs/egestiona/build_submission_plan_readonly")
+async def egestiona_build_submission_plan_readonly(
     coord: str = "Kern",
     company_key: str = "",
     person_key: Optional[str] = None,
     limit: int = 20,
     only_target: bool = True,
-    max_items: int = 200,  # SPRINT C2.15: Límite de items para snapshot
-    max_pages: int = 10,  # SPRINT C2.15: Límite de páginas para snapshot
+    dry_run: bool = True,  # Explícitamente expuesto (siempre True en este endpoint, pero claro)
+    fixture: bool = False,  # Activar fixture determinista
+    wait: bool = False,
     request: Request = None,  # Para leer headers
 ):
     """
-    SPRINT C2.15: Construye plan de auto-upload sin ejecutar uploads.
+    HEADFUL / READ-ONLY: Genera plan de envío determinista para pendientes eGestiona.
+    - Login -> nm_contenido -> click Gestion(3)
+    - Carga grid DHTMLX en frame f3
+    - Para cada pendiente: matching + evaluación de guardrails
+    - Genera submission_plan.json con decisiones (AUTO_SUBMIT_OK | REVIEW_REQUIRED | NO_MATCH)
+    - NO sube nada, NO hace clicks de "Enviar documento"
     
-    Reutiliza C2.14.1 snapshot paginado y aplica política de decisión
-    para clasificar items en AUTO_UPLOAD, REVIEW_REQUIRED, NO_MATCH.
+    Se ejecuta como run en segundo plano: la respuesta estructurada queda en "result" del
+    run (status_url); con wait=true se devuelve directamente.
     
-    Response:
-    {
-        status: "ok",
-        snapshot: { items: [...] },  # incluye pending_item_key
-        decisions: [
-            { pending_item_key, decision, reason_code, reason, confidence, local_doc_ref? }
-        ],
-        summary: {
-            total, auto_upload_count, review_required_count, no_match_count
-        },
-        diagnostics: { pagination... }
-    }
+    Response estructurado:
+    - status: "ok" | "error"
+    - run_id: str (si ok)
+    - summary: dict con counts (si ok)
+    - items: array (si ok, puede estar vacío)
+    - error_code, message, details (si error)
     """
+    # HOTFIX C2.13.7: Logging de trace para identificar ramas
+    print(f"[CAE][READONLY][TRACE] ========================================")
+    print(f"[CAE][READONLY][TRACE] ENTRADA: coord={coord} company_key={company_key} person_key={person_key} limit={limit} only_target={only_target} dry_run={dry_run} fixture={fixture}")
+    
+    # Generar client_req_id SIEMPRE (uuid4 si no viene en header)
     import uuid
-    import os
     client_request_id = None
     if request and hasattr(request, 'headers'):
         client_request_id = request.headers.get("X-CLIENT-REQ-ID")
+        
+        # Verificar si se activa fixture (header o param)
+        fixture_header = request.headers.get("X-CAE-PLAN-FIXTURE", "0")
+        if fixture_header == "1":
+            fixture = True
+    
+    # Si no viene en header, generar uno
     if not client_request_id:
         client_request_id = str(uuid.uuid4())
     
-    if not company_key:
+    # HOTFIX C2.13.7: Verificar ENV para fixture (solo si explícito)
+    import os
+    env_fixture = os.getenv("EGESTIONA_READONLY_FIXTURE", "0")
+    use_fixture = fixture or (env_fixture == "1")
+    
+    # HOTFIX C2.13.7: Logging de rama
+    if use_fixture:
+        print(f"[CAE][READONLY][TRACE] BRANCH: legacy_fixture reason=fixture={fixture} env_fixture={env_fixture}")
+    else:
+        print(f"[CAE][READONLY][TRACE] BRANCH: real_playwright reason=fixture=False env_fixture={env_fixture}")
+    
+    # HOTFIX C2.13.7: Early return si falta company_key
+    if not use_fixture and not company_key:
+        print(f"[CAE][READONLY][TRACE] BRANCH: early_return_missing_company_key reason=company_key is empty")
         return {
             "status": "error",
             "error_code": "missing_company_key",
             "message": "company_key is required",
             "details": None,
-            "snapshot": {"items": []},
-            "decisions": [],
-            "summary": {
-                "total": 0,
-                "auto_upload_count": 0,
-                "review_required_count": 0,
-                "no_match_count": 0,
+            "run_id": None,  # HOTFIX C2.13.6: Siempre incluir run_id (puede ser null)
+            "items": [],  # HOTFIX C2.13.6: Siempre array, nunca null
+            "artifacts": {
+                "client_request_id": client_request_id,
+                "run_id": None,
             },
-            "diagnostics": {},
-            "artifacts": {"client_request_id": client_request_id},
+            "diagnostics": {},  # HOTFIX C2.13.6: Siempre incluir diagnostics (object)
         }
     
+    return await submit_flow_run(
+        "build_submission_plan_readonly",
+        lambda: _build_submission_plan_readonly_response(
+            coord=coord,
+            company_key=company_key,
+            person_key=person_key,
+            limit=limit,
+            only_target=only_target,
+            dry_run=dry_run,
+            use_fixture=use_fixture,
+            client_request_id=client_request_id,
+        ),
+        wait=wait,
+        params={"coord": coord, "company_key": company_key, "person_key": person_key},
+    )
+
+
+def _build_auto_upload_plan_response(
+    *,
+    coord: str,
+    company_key: str,
+    person_key: Optional[str],
+    limit: int,
+    only_target: bool,
+    max_items: int,
+    max_pages: int,
+    client_request_id: str,
+) -> dict:
+    """Construye el plan de auto-upload y su respuesta; se ejecuta como run en segundo plano."""
+    import os
+    
     # SPRINT C2.16.2: Generar run_id propio para plan
     import time
     import uuid
@@ -3915,26 +3992,23 @@ async def egestiona_build_auto_upload_plan(
     
     try:
         # Reutilizar snapshot paginado de C2.14.1
-        from starlette.concurrency import run_in_threadpool
         from backend.adapters.egestiona.submission_plan_headful import run_build_submission_plan_readonly_headful
         
         print(f"[CAE][AUTO_UPLOAD_PLAN] Construyendo plan de auto-upload (temp_run_id={temp_run_id})...")
-        plan_result = await run_in_threadpool(
-            lambda: run_build_submission_plan_readonly_headful(
-                base_dir="data",
-                platform="egestiona",
-                coordination=coord,
-                company_key=company_key,
-                person_key=person_key,
-                limit=limit,
-                only_target=only_target,
-                slow_mo_ms=300,
-                viewport={"width": 1600, "height": 1000},
-                wait_after_login_s=2.5,
-                return_plan_only=True,  # NO crear run
-                max_pages=max_pages,
-                max_items=max_items,
-            )
+        plan_result = run_build_submission_plan_readonly_headful(
+            base_dir="data",
+            platform="egestiona",
+            coordination=coord,
+            company_key=company_key,
+            person_key=person_key,
+            limit=limit,
+            only_target=only_target,
+            slow_mo_ms=300,
+            viewport={"width": 1600, "height": 1000},
+            wait_after_login_s=2.5,
+            return_plan_only=True,  # NO crear run
+            max_pages=max_pages,
+            max_items=max_items,
         )
         
         if not isinstance(plan_result, dict):
@@ -4063,7 +4137,7 @@ async def egestiona_build_auto_upload_plan(
         try:
             from backend.shared.run_metrics import initialize_metrics, update_metrics_from_decisions, record_learning_hint_applied
             
-            metrics = initialize_metrics(plan_id, len(snapshot_items))
+            metrics = initialize_metrics(plan_id, len(snapshot_items), platform="egestiona")
             # Actualizar con decisiones iniciales (auto_matching)
             update_metrics_from_decisions(plan_id, decisions, source="auto_matching")
             
@@ -4132,6 +4206,8 @@ async def egestiona_build_auto_upload_plan(
         
         return response
     
+    except BackgroundRunCanceled:
+        raise
     except Exception as e:
         import traceback
         print(f"[CAE][AUTO_UPLOAD_PLAN] Error: {e}")
@@ -4155,6 +4231,83 @@ async def egestiona_build_auto_upload_plan(
         }
 
 
+
+@router.post("/runs/egestiona/build_auto_upload_plan")
+async def egestiona_build_auto_upload_plan(
+    coord: str = "Kern",
+    company_key: str = "",
+    person_key: Optional[str] = None,
+    limit: int = 20,
+    only_target: bool = True,
+    max_items: int = 200,  # SPRINT C2.15: Límite de items para snapshot
+    max_pages: int = 10,  # SPRINT C2.15: Límite de páginas para snapshot
+    wait: bool = False,
+    request: Request = None,  # Para leer headers
+):
+    """
+    SPRINT C2.15: Construye plan de auto-upload sin ejecutar uploads.
+    
+    Reutiliza C2.14.1 snapshot paginado y aplica política de decisión
+    para clasificar items en AUTO_UPLOAD, REVIEW_REQUIRED, NO_MATCH.
+    
+    Se ejecuta como run en segundo plano: la respuesta queda en "result" del run
+    (status_url); con wait=true se devuelve directamente.
+    
+    Response:
+    {
+        status: "ok",
+        snapshot: { items: [...] },  # incluye pending_item_key
+        decisions: [
+            { pending_item_key, decision, reason_code, reason, confidence, local_doc_ref? }
+        ],
+        summary: {
+            total, auto_upload_count, review_required_count, no_match_count
+        },
+        diagnostics: { pagination... }
+    }
+    """
+    import uuid
+    client_request_id = None
+    if request and hasattr(request, 'headers'):
+        client_request_id = request.headers.get("X-CLIENT-REQ-ID")
+    if not client_request_id:
+        client_request_id = str(uuid.uuid4())
+    
+    if not company_key:
+        return {
+            "status": "error",
+            "error_code": "missing_company_key",
+            "message": "company_key is required",
+            "details": None,
+            "snapshot": {"items": []},
+            "decisions": [],
+            "summary": {
+                "total": 0,
+                "auto_upload_count": 0,
+                "review_required_count": 0,
+                "no_match_count": 0,
+            },
+            "diagnostics": {},
+            "artifacts": {"client_request_id": client_request_id},
+        }
+    
+    return await submit_flow_run(
+        "build_auto_upload_plan",
+        lambda: _build_auto_upload_plan_response(
+            coord=coord,
+            company_key=company_key,
+            person_key=person_key,
+            limit=limit,
+            only_target=only_target,
+            max_items=max_items,
+            max_pages=max_pages,
+            client_request_id=client_request_id,
+        ),
+        wait=wait,
+        params={"coord": coord, "company_key": company_key, "person_key": person_key},
+    )
+
+
 @router.post("/runs/egestiona/execute_submission_plan_scoped")
 async def egestiona_execute_submission_plan_scoped(
     coord: str = "Kern",
@@ -4166,6 +4319,7 @@ async def egestiona_execute_submission_plan_scoped(
     confirm_execute: bool = False,
     self_test: bool = False,
     self_test_doc_id: Optional[str] = None,
+    wait: bool = False,
 ):
     """
     HEADFUL / WRITE (con guardrails fuertes): Ejecuta plan de envío para items AUTO_SUBMIT_OK.
@@ -4179,9 +4333,9 @@ async def egestiona_execute_submission_plan_scoped(
     if not company_key:
         raise HTTPException(status_code=400, detail="company_key is required")
     
-    try:
-        run_id = await run_in_threadpool(
-            lambda: run_execute_submission_plan_scoped_headful(
+    def _job():
+        try:
+            run_id = run_execute_submission_plan_scoped_headful(
                 base_dir="data",
                 platform="egestiona",
                 coordination=coord,
@@ -4197,39 +4351,55 @@ async def egestiona_execute_submission_plan_scoped(
                 viewport={"width": 1600, "height": 1000},
                 wait_after_login_s=2.5,
             )
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except RuntimeError as e:
-        error_msg = str(e)
-        if "SECURITY_HARD_STOP" in error_msg or "GUARDRAIL_VIOLATION" in error_msg:
-            raise HTTPException(status_code=403, detail=error_msg)
-        # Capturar RuntimeError con mensaje DHX_BLOCKER_NOT_DISMISSED
-        if "DHX_BLOCKER_NOT_DISMISSED" in error_msg:
-            from backend.adapters.egestiona.priority_comms_headful import DhxBlockerNotDismissed
-            error_detail = {
-                "error": "dhx_blocker_not_dismissed",
-                "message": error_msg,
-                "detail": "No se pudo cerrar un overlay DHTMLX bloqueante después del login. "
-                         "Revisar evidence en el directorio de runs para más detalles.",
-            }
-            raise HTTPException(status_code=422, detail=error_detail)
-        raise HTTPException(status_code=500, detail=error_msg)
-    except Exception as e:
-        # Capturar excepciones de overlays DHTMLX bloqueantes
-        from backend.adapters.egestiona.priority_comms_headful import PriorityCommsModalNotDismissed, DhxBlockerNotDismissed
-        if isinstance(e, (PriorityCommsModalNotDismissed, DhxBlockerNotDismissed)):
-            error_type = "priority_comms_modal_not_dismissed" if isinstance(e, PriorityCommsModalNotDismissed) else "dhx_blocker_not_dismissed"
-            error_detail = {
-                "error": error_type,
-                "message": str(e),
-                "detail": "No se pudo cerrar un overlay DHTMLX bloqueante después del login. "
-                         "Revisar evidence en el directorio de runs para más detalles.",
-            }
-            if hasattr(e, 'run_id'):
-                error_detail["run_id"] = e.run_id
-            raise HTTPException(status_code=422, detail=error_detail)
-        raise HTTPException(status_code=500, detail=f"Error inesperado: {str(e)}")
-    return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except RuntimeError as e:
+            error_msg = str(e)
+            if "SECURITY_HARD_STOP" in error_msg or "GUARDRAIL_VIOLATION" in error_msg:
+                raise HTTPException(status_code=403, detail=error_msg)
+            # Capturar RuntimeError con mensaje DHX_BLOCKER_NOT_DISMISSED
+            if "DHX_BLOCKER_NOT_DISMISSED" in error_msg:
+                from backend.adapters.egestiona.priority_comms_headful import DhxBlockerNotDismissed
+                error_detail = {
+                    "error": "dhx_blocker_not_dismissed",
+                    "message": error_msg,
+                    "detail": "No se pudo cerrar un overlay DHTMLX bloqueante después del login. "
+                             "Revisar evidence en el directorio de runs para más detalles.",
+                }
+                raise HTTPException(status_code=422, detail=error_detail)
+            raise HTTPException(status_code=500, detail=error_msg)
+        except Exception as e:
+            # Capturar excepciones de overlays DHTMLX bloqueantes
+            from backend.adapters.egestiona.priority_comms_headful import PriorityCommsModalNotDismissed, DhxBlockerNotDismissed
+            if isinstance(e, (PriorityCommsModalNotDismissed, DhxBlockerNotDismissed)):
+                error_type = "priority_comms_modal_not_dismissed" if isinstance(e, PriorityCommsModalNotDismissed) else "dhx_blocker_not_dismissed"
+                error_detail = {
+                    "error": error_type,
+                    "message": str(e),
+                    "detail": "No se pudo cerrar un overlay DHTMLX bloqueante después del login. "
+                             "Revisar evidence en el directorio de runs para más detalles.",
+                }
+                if hasattr(e, 'run_id'):
+                    error_detail["run_id"] = e.run_id
+                raise HTTPException(status_code=422, detail=error_detail)
+            raise HTTPException(status_code=500, detail=f"Error inesperado: {str(e)}")
+        return {"run_id": run_id, "runs_url": f"/runs/{run_id}"}
+
+    return await submit_flow_run(
+        "execute_submission_plan_scoped",
+        _job,
+        wait=wait,
+        params={
+            "coord": coord,
+            "company_key": company_key,
+            "person_key": person_key,
+            "limit": limit,
+            "only_target": only_target,
+            "dry_run": dry_run,
+            "confirm_execute": confirm_execute,
+            "self_test": self_test,
+            "self_test_doc_id": self_test_doc_id,
+        },
+    )
 
 
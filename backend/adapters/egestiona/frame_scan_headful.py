@@ -6,9 +6,17 @@ import uuid
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
 from backend.repository.secrets_store_v1 import SecretsStoreV1
+from backend.adapters.egestiona.session_pool import open_egestiona_session
+from backend.adapters.egestiona.wait_conditions import (
+    wait_for_frame,
+    wait_for_grid_rows,
+    wait_for_network_quiet,
+    wait_for_portal_ready,
+    wait_until,
+)
 
 
 LOGIN_URL_PREVIOUS_SUCCESS = "https://coordinate.egestiona.es/login?origen=subcontrata"
@@ -34,7 +42,7 @@ def run_find_enviar_doc_in_all_frames_headful(
     - Generar evidencia PNG SIEMPRE + dump JSON de frames/textos.
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -91,12 +99,8 @@ def run_find_enviar_doc_in_all_frames_headful(
         page.locator('input[name="Password"]').fill(password, timeout=15000)
         page.locator('button[type="submit"]').click(timeout=15000)
 
-        # 3) Esperar post-login + 2-3s
-        try:
-            page.wait_for_load_state("networkidle", timeout=20000)
-        except Exception:
-            pass
-        time.sleep(wait_after_login_s)
+        # 3) Esperar post-login: red en calma + dashboard (nm_contenido)
+        wait_for_portal_ready(page, timeout_s=20.0 + wait_after_login_s)
 
         # Evidence 01: siempre
         page.screenshot(path=str(shot_01), full_page=True)
@@ -254,7 +258,7 @@ def run_upload_pending_document_scoped_headful(
     - Validate confirmation (message or visible state change)
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -465,23 +469,20 @@ def run_upload_pending_document_scoped_headful(
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False, slow_mo=slow_mo_ms)
-        context = browser.new_context(viewport=viewport or {"width": 1600, "height": 1000})
-        page = context.new_page()
         try:
-            # 1) Login con URL exacta anterior
-            page.goto(LOGIN_URL_PREVIOUS_SUCCESS, wait_until="domcontentloaded", timeout=60000)
-            page.locator('input[name="ClientName"]').fill(client_code, timeout=20000)
-            page.locator('input[name="Username"]').fill(username, timeout=20000)
-            page.locator('input[name="Password"]').fill(password, timeout=20000)
-            page.locator('button[type="submit"]').click(timeout=20000)
-
-            # 2) Esperar post-login + tiles
-            page.wait_for_url("**/default_contenido.asp", timeout=30000)
-            try:
-                page.wait_for_load_state("networkidle", timeout=25000)
-            except Exception:
-                pass
-            time.sleep(wait_after_login_s)
+            # 1) Login (o reutilización de sesión guardada en el pool)
+            context, page, _session_reused = open_egestiona_session(
+                browser,
+                base_dir=base,
+                platform=platform,
+                coordination=coordination,
+                client_code=client_code,
+                username=username,
+                password=password,
+                login_url=LOGIN_URL_PREVIOUS_SUCCESS,
+                viewport=viewport or {"width": 1600, "height": 1000},
+                wait_after_login_s=wait_after_login_s,
+            )
 
             frame_dashboard = page.frame(name="nm_contenido")
             if not frame_dashboard:
@@ -512,13 +513,7 @@ def run_upload_pending_document_scoped_headful(
                 except Exception:
                     return False
 
-            list_frame = None
-            t_deadline = time.time() + 15.0
-            while time.time() < t_deadline:
-                list_frame = _find_list_frame()
-                if list_frame and _frame_has_grid(list_frame):
-                    break
-                time.sleep(0.25)
+            list_frame = wait_for_frame(page, _find_list_frame, ready=_frame_has_grid, timeout_s=15.0).value
 
             # If needed, click "Buscar" to render grid (no filters changed)
             if not (list_frame and _frame_has_grid(list_frame)):
@@ -539,12 +534,7 @@ def run_upload_pending_document_scoped_headful(
                             btn.first.click(timeout=10000)
                     except Exception:
                         pass
-                t_deadline = time.time() + 20.0
-                while time.time() < t_deadline:
-                    list_frame = _find_list_frame()
-                    if list_frame and _frame_has_grid(list_frame):
-                        break
-                    time.sleep(0.25)
+                list_frame = wait_for_frame(page, _find_list_frame, ready=_frame_has_grid, timeout_s=20.0).value
 
             if not (list_frame and _frame_has_grid(list_frame)):
                 page.screenshot(path=str(shot_02), full_page=True)
@@ -596,11 +586,7 @@ def run_upload_pending_document_scoped_headful(
             except Exception:
                 pass
 
-            t_deadline = time.time() + 30.0
-            while time.time() < t_deadline:
-                if _grid_rows_ready(list_frame):
-                    break
-                time.sleep(0.25)
+            wait_for_grid_rows(list_frame, timeout_s=30.0)
 
             # Hard-stop if still no rows (guardrail: don't proceed without loaded grid)
             if not _grid_rows_ready(list_frame):
@@ -816,13 +802,14 @@ def run_upload_pending_document_scoped_headful(
                 except Exception:
                     return ""
 
-            t_deadline = time.time() + 25.0
-            detail_text = ""
-            while time.time() < t_deadline:
-                detail_text = _modal_best_text()
-                if len((detail_text or "").strip()) >= 40 and _detail_labels_ok(detail_text) and _scope_ok(detail_text):
-                    break
-                time.sleep(0.25)
+            def _detail_ready() -> Optional[str]:
+                text = _modal_best_text()
+                if len((text or "").strip()) >= 40 and _detail_labels_ok(text) and _scope_ok(text):
+                    return text
+                return None
+
+            waited = wait_until(_detail_ready, condition="detail_modal", phase="upload", timeout_s=25.0, target=page)
+            detail_text = waited.value or _modal_best_text()
 
             # Evidence 04 + dump
             page.screenshot(path=str(shot_04), full_page=True)
@@ -1048,21 +1035,27 @@ def run_upload_pending_document_scoped_headful(
             send_btn.click(timeout=15000)
 
             # 9) Wait for confirmation
-            confirmation_text = ""
-            t_deadline = time.time() + 25.0
-            while time.time() < t_deadline:
+            def _page_text() -> str:
                 try:
-                    confirmation_text = page.evaluate("() => (document.body ? (document.body.innerText || '') : '')") or ""
+                    return page.evaluate("() => (document.body ? (document.body.innerText || '') : '')") or ""
                 except Exception:
-                    confirmation_text = ""
-                hay = (confirmation_text or "").lower()
+                    return ""
+
+            def _confirmation_seen() -> Optional[str]:
+                text = _page_text()
+                hay = text.lower()
                 # heuristics: success-ish keywords OR state changes
                 if any(k in hay for k in ("correct", "enviado", "guardado", "registrad", "éxito", "exito")):
-                    break
+                    return text
                 # or if "Pendiente enviar" disappears from detail (very weak, but something)
                 if ("pendiente enviar" not in hay) and ("estado documento" in hay):
-                    break
-                time.sleep(0.5)
+                    return text
+                return None
+
+            waited = wait_until(
+                _confirmation_seen, condition="confirmation", phase="verification", timeout_s=25.0, target=page
+            )
+            confirmation_text = waited.value or _page_text()
 
             confirmation_txt_path.write_text(confirmation_text or "", encoding="utf-8")
             page.screenshot(path=str(shot_07), full_page=True)
@@ -1126,7 +1119,7 @@ def run_frames_screenshots_and_find_tile_headful(
        Si lo encuentra: screenshot elemento + outerHTML clickable y STOP.
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -1200,17 +1193,8 @@ def run_frames_screenshots_and_find_tile_headful(
             page.locator("iframe#id_contenido").wait_for(state="attached", timeout=20000)
         except Exception:
             pass
-        # Espera adicional solicitada (tiles visibles)
-        time.sleep(wait_after_login_s)
-
-        # Poll: esperar a que aparezcan frames reales (incluido nm_contenido) antes de enumerar
-        t_deadline = time.time() + 20.0
-        while time.time() < t_deadline:
-            frs = list(page.frames)
-            has_nm = any((f.name or "") == "nm_contenido" for f in frs)
-            if len(frs) > 1 and has_nm:
-                break
-            time.sleep(0.25)
+        # Esperar a que aparezcan frames reales (incluido nm_contenido) antes de enumerar
+        wait_for_frame(page, "nm_contenido", phase="login", timeout_s=20.0 + wait_after_login_s)
 
         # 3) Enumerar frames (ya con iframes cargados)
         fr_list = list(page.frames)
@@ -1390,7 +1374,7 @@ def run_list_pending_documents_readonly_headful(
     5) Filtra en memoria y guarda JSON + evidencia PNG.
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -1450,20 +1434,12 @@ def run_list_pending_documents_readonly_headful(
 
         # 2) Esperar post-login: default_contenido.asp + frame nm_contenido (tiles)
         page.wait_for_url("**/default_contenido.asp", timeout=30000)
-        try:
-            page.wait_for_load_state("networkidle", timeout=25000)
-        except Exception:
-            pass
-        time.sleep(wait_after_login_s)
+        wait_for_network_quiet(page, phase="login", timeout_s=25.0)
 
         # Esperar a que exista el frame nm_contenido
-        t_deadline = time.time() + 25.0
-        frame = None
-        while time.time() < t_deadline:
-            frame = page.frame(name="nm_contenido")
-            if frame and frame.url:
-                break
-            time.sleep(0.25)
+        frame = wait_for_frame(
+            page, "nm_contenido", ready=lambda fr: bool(fr.url), phase="login", timeout_s=25.0
+        ).value or page.frame(name="nm_contenido")
         if not frame:
             # Evidence y abort limpio
             page.screenshot(path=str(shot_01), full_page=True)
@@ -1497,13 +1473,7 @@ def run_list_pending_documents_readonly_headful(
             except Exception:
                 return False
 
-        list_frame = None
-        t_deadline = time.time() + 15.0
-        while time.time() < t_deadline:
-            list_frame = _find_list_frame()
-            if list_frame and _frame_has_grid(list_frame):
-                break
-            time.sleep(0.25)
+        list_frame = wait_for_frame(page, _find_list_frame, ready=_frame_has_grid, timeout_s=15.0).value
 
         # Si no aparece aún, suele requerir "Buscar" (read-only) para renderizar el grid
         if not (list_frame and _frame_has_grid(list_frame)):
@@ -1514,12 +1484,7 @@ def run_list_pending_documents_readonly_headful(
             except Exception:
                 pass
             # Esperar otra vez
-            t_deadline = time.time() + 20.0
-            while time.time() < t_deadline:
-                list_frame = _find_list_frame()
-                if list_frame and _frame_has_grid(list_frame):
-                    break
-                time.sleep(0.25)
+            list_frame = wait_for_frame(page, _find_list_frame, ready=_frame_has_grid, timeout_s=20.0).value
 
         # Último fallback: "Resultados" (read-only)
         if not (list_frame and _frame_has_grid(list_frame)):
@@ -1529,12 +1494,7 @@ def run_list_pending_documents_readonly_headful(
                     btn_res.first.click(timeout=10000)
             except Exception:
                 pass
-            t_deadline = time.time() + 20.0
-            while time.time() < t_deadline:
-                list_frame = _find_list_frame()
-                if list_frame and _frame_has_grid(list_frame):
-                    break
-                time.sleep(0.25)
+            list_frame = wait_for_frame(page, _find_list_frame, ready=_frame_has_grid, timeout_s=20.0).value
 
         if not (list_frame and _frame_has_grid(list_frame)):
             # Evidence y abort limpio
@@ -1827,7 +1787,7 @@ def run_discovery_pending_table_headful(
     - Screenshot final con tabla resaltada
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -1873,32 +1833,24 @@ def run_discovery_pending_table_headful(
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False, slow_mo=slow_mo_ms)
-        context = browser.new_context(viewport=viewport or {"width": 1600, "height": 1000})
-        page = context.new_page()
-
-        # 1) Login (URL exacta anterior)
-        page.goto(LOGIN_URL_PREVIOUS_SUCCESS, wait_until="domcontentloaded", timeout=60000)
-        page.locator('input[name="ClientName"]').fill(client_code, timeout=20000)
-        page.locator('input[name="Username"]').fill(username, timeout=20000)
-        page.locator('input[name="Password"]').fill(password, timeout=20000)
-        page.locator('button[type="submit"]').click(timeout=20000)
-
-        # 2) Esperar default_contenido.asp
-        page.wait_for_url("**/default_contenido.asp", timeout=30000)
-        try:
-            page.wait_for_load_state("networkidle", timeout=25000)
-        except Exception:
-            pass
-        time.sleep(wait_after_login_s)
+        # 1) Login (o reutilización de sesión guardada en el pool)
+        context, page, _session_reused = open_egestiona_session(
+            browser,
+            base_dir=base,
+            platform=platform,
+            coordination=coordination,
+            client_code=client_code,
+            username=username,
+            password=password,
+            login_url=LOGIN_URL_PREVIOUS_SUCCESS,
+            viewport=viewport or {"width": 1600, "height": 1000},
+            wait_after_login_s=wait_after_login_s,
+        )
 
         # 3) Frame dashboard nm_contenido (tiles)
-        t_deadline = time.time() + 25.0
-        frame_dashboard = None
-        while time.time() < t_deadline:
-            frame_dashboard = page.frame(name="nm_contenido")
-            if frame_dashboard and frame_dashboard.url:
-                break
-            time.sleep(0.25)
+        frame_dashboard = wait_for_frame(
+            page, "nm_contenido", ready=lambda fr: bool(fr.url), phase="login", timeout_s=25.0
+        ).value or page.frame(name="nm_contenido")
         if not frame_dashboard:
             page.screenshot(path=str(dash_png), full_page=True)
             raise RuntimeError("FRAME_NOT_FOUND: nm_contenido")
@@ -1915,25 +1867,31 @@ def run_discovery_pending_table_headful(
         # Evento A: cambio de URL en algún frame
         # Evento B: aparición de una <table> con >1 <tr> en algún frame
         pre_urls = [f.url for f in page.frames]
-        t_deadline = time.time() + max(10.0, float(wait_after_click_s))
-        while time.time() < t_deadline:
+        def _content_changed() -> bool:
             try:
                 if any(f.url and f.url not in pre_urls for f in page.frames):
-                    break
+                    return True
             except Exception:
                 pass
             # Detectar tabla con filas
-            found_table = False
             for fr in page.frames:
                 try:
                     if fr.locator("table tr").count() > 2:
-                        found_table = True
-                        break
+                        return True
                 except Exception:
                     continue
-            if found_table:
-                break
-            time.sleep(0.25)
+            return False
+
+        wait_until(
+            _content_changed,
+            condition="content_change",
+            phase="navigation",
+            timeout_s=max(10.0, float(wait_after_click_s)),
+            target=page,
+        )
+
+        def _rows_or_grid(fr) -> bool:
+            return fr.locator("table tr").count() > 2 or fr.locator('[role="grid"], [role="table"], [role="rowgroup"]').count() > 0
 
         # Si aún no hay tablas/grids, en esta pantalla suele existir el botón "Resultados"
         # y/o "Buscar" para mostrar el listado (READ-ONLY). NO tocamos filtros.
@@ -1952,19 +1910,10 @@ def run_discovery_pending_table_headful(
                     if btn_res.count() > 0:
                         btn_res.first.click(timeout=10000)
                         # esperar a que aparezcan filas o algún grid
-                        t2 = time.time() + 15.0
-                        while time.time() < t2:
-                            try:
-                                if fr_tmp.locator("table tr").count() > 2:
-                                    break
-                            except Exception:
-                                pass
-                            try:
-                                if fr_tmp.locator('[role="grid"], [role="table"], [role="rowgroup"]').count() > 0:
-                                    break
-                            except Exception:
-                                pass
-                            time.sleep(0.25)
+                        wait_until(
+                            lambda: _rows_or_grid(fr_tmp), condition="grid_appears", phase="grid_load",
+                            timeout_s=15.0, target=fr_tmp,
+                        )
                     # Si sigue sin aparecer, probar "Buscar" (read-only query) sin tocar filtros
                     has_rows = False
                     try:
@@ -1975,19 +1924,10 @@ def run_discovery_pending_table_headful(
                         btn_buscar = fr_tmp.get_by_text("Buscar", exact=True)
                         if btn_buscar.count() > 0:
                             btn_buscar.first.click(timeout=10000)
-                            t3 = time.time() + 20.0
-                            while time.time() < t3:
-                                try:
-                                    if fr_tmp.locator("table tr").count() > 2:
-                                        break
-                                except Exception:
-                                    pass
-                                try:
-                                    if fr_tmp.locator('[role="grid"], [role="table"], [role="rowgroup"]').count() > 0:
-                                        break
-                                except Exception:
-                                    pass
-                                time.sleep(0.25)
+                            wait_until(
+                                lambda: _rows_or_grid(fr_tmp), condition="grid_appears", phase="grid_load",
+                                timeout_s=20.0, target=fr_tmp,
+                            )
         except Exception:
             pass
 
@@ -2314,7 +2254,7 @@ def run_open_pending_document_details_readonly_headful(
     - Evidence PNG + dump de texto visible del detalle
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
 
     platforms = store.load_platforms()
@@ -2435,23 +2375,19 @@ def run_open_pending_document_details_readonly_headful(
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False, slow_mo=slow_mo_ms)
-        context = browser.new_context(viewport=viewport or {"width": 1600, "height": 1000})
-        page = context.new_page()
-
-        # 1) Login con URL exacta anterior
-        page.goto(LOGIN_URL_PREVIOUS_SUCCESS, wait_until="domcontentloaded", timeout=60000)
-        page.locator('input[name="ClientName"]').fill(client_code, timeout=20000)
-        page.locator('input[name="Username"]').fill(username, timeout=20000)
-        page.locator('input[name="Password"]').fill(password, timeout=20000)
-        page.locator('button[type="submit"]').click(timeout=20000)
-
-        # 2) Esperar post-login: default_contenido.asp + frame nm_contenido (tiles)
-        page.wait_for_url("**/default_contenido.asp", timeout=30000)
-        try:
-            page.wait_for_load_state("networkidle", timeout=25000)
-        except Exception:
-            pass
-        time.sleep(wait_after_login_s)
+        # 1) Login (o reutilización de sesión guardada en el pool)
+        context, page, _session_reused = open_egestiona_session(
+            browser,
+            base_dir=base,
+            platform=platform,
+            coordination=coordination,
+            client_code=client_code,
+            username=username,
+            password=password,
+            login_url=LOGIN_URL_PREVIOUS_SUCCESS,
+            viewport=viewport or {"width": 1600, "height": 1000},
+            wait_after_login_s=wait_after_login_s,
+        )
 
         frame_dashboard = page.frame(name="nm_contenido")
         if not frame_dashboard:
@@ -2484,13 +2420,7 @@ def run_open_pending_document_details_readonly_headful(
                 return False
 
         # Espera list frame + grid
-        list_frame = None
-        t_deadline = time.time() + 15.0
-        while time.time() < t_deadline:
-            list_frame = _find_list_frame()
-            if list_frame and _frame_has_grid(list_frame):
-                break
-            time.sleep(0.25)
+        list_frame = wait_for_frame(page, _find_list_frame, ready=_frame_has_grid, timeout_s=15.0).value
 
         # Si aún no aparece, suele requerir "Buscar" (read-only) para renderizar el grid
         if not (list_frame and _frame_has_grid(list_frame)):
@@ -2512,12 +2442,7 @@ def run_open_pending_document_details_readonly_headful(
                         btn.first.click(timeout=10000)
             except Exception:
                 pass
-            t_deadline = time.time() + 20.0
-            while time.time() < t_deadline:
-                list_frame = _find_list_frame()
-                if list_frame and _frame_has_grid(list_frame):
-                    break
-                time.sleep(0.25)
+            list_frame = wait_for_frame(page, _find_list_frame, ready=_frame_has_grid, timeout_s=20.0).value
 
         if not (list_frame and _frame_has_grid(list_frame)):
             page.screenshot(path=str(shot_02), full_page=True)
@@ -2556,11 +2481,7 @@ def run_open_pending_document_details_readonly_headful(
             except Exception:
                 return False
 
-        t_deadline = time.time() + 20.0
-        while time.time() < t_deadline:
-            if _grid_rows_ready(list_frame):
-                break
-            time.sleep(0.25)
+        wait_for_grid_rows(list_frame, timeout_s=20.0)
 
         # Evidence 02: grid visible (después de cargar filas)
         try:
@@ -2809,27 +2730,27 @@ def run_open_pending_document_details_readonly_headful(
                 return {"hasModal": False, "score": 0, "textLen": 0, "iframeSrcs": []}
 
         # Wait up to 25s for a real detail surface to load (modal content or a dedicated detail frame).
-        t_deadline = time.time() + 25.0
         detail_frame = None
         modal_info: Dict[str, Any] = {"hasModal": False, "z": 0, "textLen": 0, "iframeSrcs": []}
-        while time.time() < t_deadline:
+
+        def _detail_surface_ready() -> bool:
+            nonlocal detail_frame, modal_info
             dfs = _detail_frames()
             if dfs:
                 detail_frame = dfs[0]
-                break
+                return True
             modal_info = _modal_info()
             if modal_info.get("hasModal") and (modal_info.get("textLen") or 0) >= 40:
-                break
+                return True
             # if modal contains iframe(s), wait for a matching frame url to appear
             srcs = modal_info.get("iframeSrcs") or []
-            if srcs:
-                for fr in page.frames:
-                    if fr.url and any(fr.url.startswith(s) or (s in fr.url) for s in srcs):
-                        detail_frame = fr
-                        break
-                if detail_frame:
-                    break
-            time.sleep(0.25)
+            for fr in page.frames if srcs else []:
+                if fr.url and any(fr.url.startswith(s) or (s in fr.url) for s in srcs):
+                    detail_frame = fr
+                    return True
+            return False
+
+        wait_until(_detail_surface_ready, condition="detail_surface", phase="navigation", timeout_s=25.0, target=page)
 
         # Evidence 04: after click
         try:
@@ -2858,12 +2779,12 @@ def run_open_pending_document_details_readonly_headful(
 
         if detail_frame:
             # wait a bit for detail frame to populate (avoid blank)
-            t2 = time.time() + 15.0
-            while time.time() < t2:
-                detail_text = _visible_text_from_frame(detail_frame)
-                if len(detail_text.strip()) >= 40:
-                    break
-                time.sleep(0.25)
+            def _detail_text() -> Optional[str]:
+                text = _visible_text_from_frame(detail_frame)
+                return text if len(text.strip()) >= 40 else None
+
+            waited = wait_until(_detail_text, condition="detail_text", phase="navigation", timeout_s=15.0, target=detail_frame)
+            detail_text = waited.value or _visible_text_from_frame(detail_frame)
             detail_src = {"kind": "frame", "name": detail_frame.name, "url": detail_frame.url}
         else:
             # modal text from main document
@@ -7,10 +7,12 @@ y esperando a que el grid se rellene.
 
 from __future__ import annotations
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import time
 import re
 
+from backend.adapters.egestiona.wait_conditions import read_grid_state, wait_for_grid_idle, wait_until
+
 
 def ensure_results_loaded(
     list_frame: Any,
@@ -219,7 +221,6 @@ def ensure_results_loaded(
                                 print(f"[grid_search] Fallback 2: Enfocar input y enviar Enter (selector: {selector})")
                                 input_elem.focus()
                                 input_elem.press("Enter")
-                                time.sleep(1.0)  # Esperar a que se procese
                                 fallback_attempted = True
                                 fallback_success = True
                                 result["search_clicked"] = True
@@ -264,96 +265,10 @@ def ensure_results_loaded(
             if fallback_success:
                 print(f"[grid_search] Fallback exitoso usado, esperando a que el grid se rellene...")
                 # Reutilizar la misma lógica de espera que para "Buscar"
-                start_wait = time.time()
-                rows_after = rows_before
-                counter_text_after = counter_text_before
-                
-                # Esperar un poco después del fallback
-                time.sleep(1.0)
-                
-                # Esperar indicadores de que el grid se está cargando/rellenando
-                loading_detected = False
-                while time.time() - start_wait < timeout_seconds:
-                    try:
-                        # Verificar si hay overlay de loading
-                        loading_selectors = [
-                            r'text=/loading\.\.\./i',
-                            r'text=/cargando\.\.\./i',
-                            '[class*="loading"]',
-                            '[id*="loading"]',
-                        ]
-                        
-                        has_loading = False
-                        for selector in loading_selectors:
-                            try:
-                                if list_frame.locator(selector).count() > 0:
-                                    has_loading = True
-                                    loading_detected = True
-                                    break
-                            except Exception:
-                                continue
-                        
-                        # Si hay loading, esperar a que desaparezca
-                        if has_loading:
-                            time.sleep(0.5)
-                            continue
-                        
-                        # Si ya no hay loading (o nunca hubo), verificar filas
-                        if not has_loading or (loading_detected and not has_loading):
-                            # Contar filas actuales
-                            try:
-                                rows_count = list_frame.locator("table.obj.row20px tbody tr").count()
-                                if rows_count == 0:
-                                    # Fallback: contar tablas
-                                    rows_count = list_frame.locator("table.obj.row20px").count()
-                                
-                                if rows_count > rows_before:
-                                    rows_after = rows_count
-                                    result["rows_after"] = rows_after
-                                    print(f"[grid_search] Grid rellenado después de fallback: {rows_after} filas detectadas")
-                                    break
-                            except Exception as e:
-                                result["diagnostics"]["rows_count_after_fallback_error"] = str(e)
-                                pass
-                            
-                            # Verificar contador de registros
-                            try:
-                                body_text = list_frame.evaluate("() => document.body.innerText")
-                                body_text_lower = body_text.lower() if body_text else ""
-                                
-                                for pattern in counter_patterns:
-                                    match = re.search(pattern, body_text_lower, re.IGNORECASE)
-                                    if match:
-                                        counter_text_after = match.group(0)
-                                        count = int(match.group(1))
-                                        if count > rows_before:
-                                            result["counter_text_after"] = counter_text_after
-                                            result["rows_after"] = count
-                                            rows_after = count
-                                            print(f"[grid_search] Contador actualizado después de fallback: {counter_text_after}")
-                                            break
-                            except Exception:
-                                pass
-                            
-                            # Si ya pasó suficiente tiempo sin loading y hay filas, considerar listo
-                            if time.time() - start_wait > 3.0:
-                                try:
-                                    rows_count = list_frame.locator("table.obj.row20px tbody tr").count()
-                                    if rows_count == 0:
-                                        # Fallback: contar tablas
-                                        rows_count = list_frame.locator("table.obj.row20px").count()
-                                    
-                                    if rows_count > 0:
-                                        rows_after = rows_count
-                                        result["rows_after"] = rows_after
-                                        break
-                                except Exception:
-                                    pass
-                        
-                        time.sleep(0.5)
-                    except Exception as e:
-                        result["diagnostics"]["wait_error_fallback"] = str(e)
-                        time.sleep(0.5)
+                rows_after, counter_text_after = _wait_grid_filled(
+                    list_frame, rows_before, counter_text_before, counter_patterns, timeout_seconds,
+                    result, suffix="_fallback", label=" después de fallback",
+                )
                 
                 # Screenshot después (si evidence_dir disponible)
                 if evidence_dir:
@@ -365,10 +280,6 @@ def ensure_results_loaded(
                 result["counter_text_after"] = counter_text_after
                 result["rows_after"] = rows_after
                 
-                wait_duration = time.time() - start_wait
-                result["diagnostics"]["wait_duration_seconds_fallback"] = wait_duration
-                result["diagnostics"]["loading_detected_fallback"] = loading_detected
-                
                 if rows_after > rows_before:
                     print(f"[grid_search] ✅ Grid rellenado exitosamente después de fallback: {rows_before} → {rows_after} filas")
                 else:
@@ -400,96 +311,10 @@ def ensure_results_loaded(
                 return result
             
             # 4) Esperar a que el grid se rellene
-            start_wait = time.time()
-            rows_after = rows_before
-            counter_text_after = counter_text_before
-            
-            # HOTFIX C2.13.9: Esperar un poco después del click para que se procese
-            time.sleep(1.0)
-            
-            # Esperar indicadores de que el grid se está cargando/rellenando
-            loading_detected = False
-            while time.time() - start_wait < timeout_seconds:
-                try:
-                    # Verificar si hay overlay de loading
-                    loading_selectors = [
-                        r'text=/loading\.\.\./i',
-                        r'text=/cargando\.\.\./i',
-                        '[class*="loading"]',
-                        '[id*="loading"]',
-                    ]
-                    
-                    has_loading = False
-                    for selector in loading_selectors:
-                        try:
-                            if list_frame.locator(selector).count() > 0:
-                                has_loading = True
-                                loading_detected = True
-                                break
-                        except Exception:
-                            continue
-                    
-                    # Si hay loading, esperar a que desaparezca
-                    if has_loading:
-                        time.sleep(0.5)
-                        continue
-                    
-                    # Si ya no hay loading (o nunca hubo), verificar filas
-                    if not has_loading or (loading_detected and not has_loading):
-                        # HOTFIX C2.13.9: Contar filas de datos reales (tr dentro de tbody)
-                        try:
-                            rows_count = list_frame.locator("table.obj.row20px tbody tr").count()
-                            if rows_count == 0:
-                                # Fallback: contar tablas
-                                rows_count = list_frame.locator("table.obj.row20px").count()
-                            
-                            if rows_count > rows_before:
-                                rows_after = rows_count
-                                result["rows_after"] = rows_after
-                                print(f"[grid_search] Grid rellenado: {rows_after} filas detectadas")
-                                break
-                        except Exception as e:
-                            result["diagnostics"]["rows_count_after_error"] = str(e)
-                            pass
-                        
-                        # Verificar contador de registros
-                        try:
-                            body_text = list_frame.evaluate("() => document.body.innerText")
-                            body_text_lower = body_text.lower() if body_text else ""
-                            
-                            for pattern in counter_patterns:
-                                match = re.search(pattern, body_text_lower, re.IGNORECASE)
-                                if match:
-                                    counter_text_after = match.group(0)
-                                    count = int(match.group(1))
-                                    if count > rows_before:
-                                        result["counter_text_after"] = counter_text_after
-                                        result["rows_after"] = count
-                                        rows_after = count
-                                        print(f"[grid_search] Contador actualizado: {counter_text_after}")
-                                        break
-                        except Exception:
-                            pass
-                        
-                        # Si ya pasó suficiente tiempo sin loading y hay filas, considerar listo
-                        if time.time() - start_wait > 3.0:
-                            try:
-                                rows_count = list_frame.locator("table.obj.row20px tbody tr").count()
-                                if rows_count == 0:
-                                    # Fallback: contar tablas
-                                    rows_count = list_frame.locator("table.obj.row20px").count()
-                                
-                                if rows_count > 0:
-                                    rows_after = rows_count
-                                    result["rows_after"] = rows_after
-                                    break
-                            except Exception:
-                                pass
-                    
-                    time.sleep(0.5)
-                except Exception as e:
-                    result["diagnostics"]["wait_error"] = str(e)
-                    time.sleep(0.5)
+            rows_after, counter_text_after = _wait_grid_filled(
+                list_frame, rows_before, counter_text_before, counter_patterns, timeout_seconds,
+                result, suffix="", label="",
+            )
             
             # Screenshot después (si evidence_dir disponible)
             if evidence_dir:
@@ -501,10 +326,6 @@ def ensure_results_loaded(
             result["counter_text_after"] = counter_text_after
             result["rows_after"] = rows_after
             
-            wait_duration = time.time() - start_wait
-            result["diagnostics"]["wait_duration_seconds"] = wait_duration
-            result["diagnostics"]["loading_detected"] = loading_detected
-            
             if rows_after > rows_before:
                 print(f"[grid_search] ✅ Grid rellenado exitosamente: {rows_before} → {rows_after} filas")
             else:
@@ -691,96 +512,10 @@ def ensure_results_loaded(
                                 # Si se hizo click, esperar a que el grid se rellene
                                 if clicked_candidate:
                                     print(f"[grid_search] Esperando a que el grid se rellene después de click en 'Buscar'...")
-                                    start_wait = time.time()
-                                    rows_after = rows_before
-                                    counter_text_after = counter_text_before
-                                    
-                                    # Esperar un poco después del click
-                                    time.sleep(1.0)
-                                    
-                                    # Esperar indicadores de que el grid se está cargando/rellenando
-                                    loading_detected = False
-                                    while time.time() - start_wait < timeout_seconds:
-                                        try:
-                                            # Verificar si hay overlay de loading
-                                            loading_selectors = [
-                                                r'text=/loading\.\.\./i',
-                                                r'text=/cargando\.\.\./i',
-                                                '[class*="loading"]',
-                                                '[id*="loading"]',
-                                            ]
-                                            
-                                            has_loading = False
-                                            for selector in loading_selectors:
-                                                try:
-                                                    if list_frame.locator(selector).count() > 0:
-                                                        has_loading = True
-                                                        loading_detected = True
-                                                        break
-                                                except Exception:
-                                                    continue
-                                            
-                                            # Si hay loading, esperar a que desaparezca
-                                            if has_loading:
-                                                time.sleep(0.5)
-                                                continue
-                                            
-                                            # Si ya no hay loading (o nunca hubo), verificar filas
-                                            if not has_loading or (loading_detected and not has_loading):
-                                                # Contar filas actuales
-                                                try:
-                                                    rows_count = list_frame.locator("table.obj.row20px tbody tr").count()
-                                                    if rows_count == 0:
-                                                        # Fallback: contar tablas
-                                                        rows_count = list_frame.locator("table.obj.row20px").count()
-                                                    
-                                                    if rows_count > rows_before:
-                                                        rows_after = rows_count
-                                                        result["rows_after"] = rows_after
-                                                        print(f"[grid_search] Grid rellenado después de click en 'Buscar': {rows_after} filas detectadas")
-                                                        break
-                                                except Exception as e:
-                                                    result["diagnostics"]["rows_count_after_buscar_error"] = str(e)
-                                                    pass
-                                                
-                                                # Verificar contador de registros (preferible: localizar "X Registros" dentro del contenedor del grid)
-                                                try:
-                                                    body_text = list_frame.evaluate("() => document.body.innerText")
-                                                    body_text_lower = body_text.lower() if body_text else ""
-                                                    
-                                                    for pattern in counter_patterns:
-                                                        match = re.search(pattern, body_text_lower, re.IGNORECASE)
-                                                        if match:
-                                                            counter_text_after = match.group(0)
-                                                            count = int(match.group(1))
-                                                            if count > rows_before:
-                                                                result["counter_text_after"] = counter_text_after
-                                                                result["rows_after"] = count
-                                                                rows_after = count
-                                                                print(f"[grid_search] Contador actualizado después de click en 'Buscar': {counter_text_after}")
-                                                                break
-                                                except Exception:
-                                                    pass
-                                                
-                                                # Si ya pasó suficiente tiempo sin loading y hay filas, considerar listo
-                                                if time.time() - start_wait > 3.0:
-                                                    try:
-                                                        rows_count = list_frame.locator("table.obj.row20px tbody tr").count()
-                                                        if rows_count == 0:
-                                                            # Fallback: contar tablas
-                                                            rows_count = list_frame.locator("table.obj.row20px").count()
-                                                        
-                                                        if rows_count > 0:
-                                                            rows_after = rows_count
-                                                            result["rows_after"] = rows_after
-                                                            break
-                                                    except Exception:
-                                                        pass
-                                            
-                                            time.sleep(0.5)
-                                        except Exception as e:
-                                            result["diagnostics"]["wait_error_buscar"] = str(e)
-                                            time.sleep(0.5)
+                                    rows_after, counter_text_after = _wait_grid_filled(
+                                        list_frame, rows_before, counter_text_before, counter_patterns, timeout_seconds,
+                                        result, suffix="_buscar", label=" después de click en 'Buscar'",
+                                    )
                                     
                                     # Screenshot después (si evidence_dir disponible)
                                     if evidence_dir:
@@ -792,10 +527,6 @@ def ensure_results_loaded(
                                     result["counter_text_after"] = counter_text_after
                                     result["rows_after"] = rows_after
                                     
-                                    wait_duration = time.time() - start_wait
-                                    result["diagnostics"]["wait_duration_seconds_buscar"] = wait_duration
-                                    result["diagnostics"]["loading_detected_buscar"] = loading_detected
-                                    
                                     if rows_after > rows_before:
                                         print(f"[grid_search] ✅ Grid rellenado exitosamente después de click en 'Buscar': {rows_before} → {rows_after} filas")
                                     else:
@@ -816,3 +547,94 @@ def ensure_results_loaded(
         print(f"[grid_search] Error en ensure_results_loaded: {e}")
     
     return result
+
+
+def _wait_grid_filled(
+    list_frame: Any,
+    rows_before: int,
+    counter_text_before: Optional[str],
+    counter_patterns: List[str],
+    timeout_seconds: float,
+    result: Dict[str, Any],
+    suffix: str = "",
+    label: str = "",
+) -> Tuple[int, Optional[str]]:
+    """
+    Espera a que el grid se rellene tras "Buscar" o un fallback.
+    
+    Primero espera a que el grid quede quieto (sin mutaciones ni "Loading..."), después
+    a que las filas o el contador superen rows_before; pasados 3 s basta con que haya filas.
+    Deja wait_duration_seconds{suffix} y loading_detected{suffix} en result["diagnostics"].
+    
+    Returns:
+        (rows_after, counter_text_after)
+    """
+    start_wait = time.time()
+    found = {"rows_after": rows_before, "counter_text_after": counter_text_before, "loading": False}
+    
+    # Como mucho la mitad del presupuesto: un grid que nunca queda quieto no debe agotarlo
+    idle = wait_for_grid_idle(list_frame, phase="grid_load", timeout_s=timeout_seconds / 2)
+    if idle.value and idle.value.get("saw_loading"):
+        found["loading"] = True
+    
+    def _count_rows() -> int:
+        rows_count = list_frame.locator("table.obj.row20px tbody tr").count()
+        if rows_count == 0:
+            # Fallback: contar tablas
+            rows_count = list_frame.locator("table.obj.row20px").count()
+        return rows_count
+    
+    def _filled() -> bool:
+        try:
+            if read_grid_state(list_frame).get("loading"):
+                found["loading"] = True
+                return False
+            
+            try:
+                rows_count = _count_rows()
+                if rows_count > rows_before:
+                    found["rows_after"] = rows_count
+                    print(f"[grid_search] Grid rellenado{label}: {rows_count} filas detectadas")
+                    return True
+            except Exception as e:
+                result["diagnostics"][f"rows_count_after{suffix}_error"] = str(e)
+            
+            # Verificar contador de registros
+            try:
+                body_text = list_frame.evaluate("() => document.body.innerText")
+                body_text_lower = body_text.lower() if body_text else ""
+                for pattern in counter_patterns:
+                    match = re.search(pattern, body_text_lower, re.IGNORECASE)
+                    if match:
+                        found["counter_text_after"] = match.group(0)
+                        count = int(match.group(1))
+                        if count > rows_before:
+                            found["rows_after"] = count
+                            print(f"[grid_search] Contador actualizado{label}: {match.group(0)}")
+                            return True
+            except Exception:
+                pass
+            
+            # Si ya pasó suficiente tiempo sin loading y hay filas, considerar listo
+            if time.time() - start_wait > 3.0:
+                rows_count = _count_rows()
+                if rows_count > 0:
+                    found["rows_after"] = rows_count
+                    return True
+            return False
+        except Exception as e:
+            result["diagnostics"][f"wait_error{suffix}"] = str(e)
+            return False
+    
+    wait_until(
+        _filled,
+        condition="grid_filled",
+        phase="grid_load",
+        timeout_s=max(0.0, timeout_seconds - (time.time() - start_wait)),
+        poll_s=0.25,
+        target=list_frame,
+    )
+    
+    result["diagnostics"][f"wait_duration_seconds{suffix}"] = time.time() - start_wait
+    result["diagnostics"][f"loading_detected{suffix}"] = found["loading"]
+    return found["rows_after"], found["counter_text_after"]
@@ -22,7 +22,7 @@ from backend.runs.headful_run_manager import HeadfulRunManager
 from backend.runs.run_timeline import EventType
 from backend.adapters.egestiona.execute_plan_gate import ExecutePlanRequest
 from backend.adapters.egestiona.real_uploader import EgestionaRealUploader
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store
 
 router = APIRouter(tags=["egestiona"])
 
@@ -203,7 +203,7 @@ async def start_headful_run(request: StartHeadfulRunRequest, http_request: Reque
             page = context.new_page()
             
             # Navegar y verificar autenticación
-            store = ConfigStoreV1(base_dir=DATA_DIR)
+            store = get_config_store(DATA_DIR)
             platforms = store.load_platforms()
             plat = next((p for p in platforms.platforms if p.key == "egestiona"), None)
             if not plat:
@@ -7,16 +7,17 @@ from datetime import date, datetime
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store, get_repository_store
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
 from backend.repository.secrets_store_v1 import SecretsStoreV1
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
 from backend.repository.document_matcher_v1 import (
     DocumentMatcherV1,
     PendingItemV1,
     normalize_text,
 )
 from backend.adapters.egestiona.frame_scan_headful import LOGIN_URL_PREVIOUS_SUCCESS, _safe_write_json
+from backend.adapters.egestiona.session_pool import open_egestiona_session
+from backend.runs.background_runs_v1 import raise_if_canceled
 
 
 def _parse_date_from_cell(cell_value: str) -> Optional[date]:
@@ -58,9 +59,9 @@ def run_match_pending_documents_readonly_headful(
     3) Genera evidence: pending_items.json, match_results.json, meta.json.
     """
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
-    repo_store = DocumentRepositoryStoreV1(base_dir=base)
+    repo_store = get_repository_store(base)
     matcher = DocumentMatcherV1(repo_store, base_dir=base)
 
     platforms = store.load_platforms()
@@ -103,24 +104,21 @@ def run_match_pending_documents_readonly_headful(
 
     with sync_playwright() as p:
         browser = p.chromium.launch(headless=False, slow_mo=slow_mo_ms)
-        context = browser.new_context(
+
+        # 1) Login (o reutilización de sesión guardada en el pool)
+        context, page, _session_reused = open_egestiona_session(
+            browser,
+            base_dir=base,
+            platform=platform,
+            coordination=coordination,
+            client_code=client_code,
+            username=username,
+            password=password,
+            login_url=LOGIN_URL_PREVIOUS_SUCCESS,
             viewport=viewport or {"width": 1600, "height": 1000},
+            wait_after_login_s=wait_after_login_s,
         )
-        page = context.new_page()
-
-        # 1) Login (reutilizar lógica existente)
-        page.goto(LOGIN_URL_PREVIOUS_SUCCESS, wait_until="domcontentloaded", timeout=60000)
-        page.locator('input[name="ClientName"]').fill(client_code, timeout=20000)
-        page.locator('input[name="Username"]').fill(username, timeout=20000)
-        page.locator('input[name="Password"]').fill(password, timeout=20000)
-        page.locator('button[type="submit"]').click(timeout=20000)
-
-        page.wait_for_url("**/default_contenido.asp", timeout=30000)
-        try:
-            page.wait_for_load_state("networkidle", timeout=25000)
-        except Exception:
-            pass
-        time.sleep(wait_after_login_s)
+        raise_if_canceled("login")
 
         # Cerrar todos los overlays DHTMLX bloqueantes (pipeline completo)
         try:
@@ -498,7 +496,8 @@ def run_match_pending_documents_readonly_headful(
                 except Exception:
                     pass
 
-        # 6) Convertir a PendingItemV1 y hacer matching
+        # 6) Convertir a PendingItemV1 y hacer matching (todo el grid en una pasada)
+        target_pendings: List[PendingItemV1] = []
         for row in target_rows:
             tipo_doc = str(row.get("Tipo Documento") or row.get("tipo_doc") or row.get("Tipo") or "")
             elemento = str(row.get("Elemento") or row.get("elemento") or "")
@@ -508,7 +507,7 @@ def run_match_pending_documents_readonly_headful(
             fecha_inicio = _parse_date_from_cell(row.get("Inicio") or row.get("inicio") or row.get("Fecha Inicio") or "")
             fecha_fin = _parse_date_from_cell(row.get("Fin") or row.get("fin") or row.get("Fecha Fin") or "")
 
-            pending = PendingItemV1(
+            target_pendings.append(PendingItemV1(
                 tipo_doc=tipo_doc,
                 elemento=elemento,
                 empresa=empresa,
@@ -516,21 +515,23 @@ def run_match_pending_documents_readonly_headful(
                 fecha_inicio=fecha_inicio,
                 fecha_fin=fecha_fin,
                 raw_data=row
-            )
+            ))
+
+        # Hacer matching (con platform y coord para reglas)
+        raise_if_canceled("matching")
+        target_match_results = matcher.match_pending_items(
+            target_pendings,
+            company_key=company_key,
+            person_key=person_key,
+            platform_key=platform,
+            coord_label=coordination,
+            evidence_dir=evidence_dir  # Pasar evidence_dir para debug
+        )
 
+        for pending, match_result in zip(target_pendings, target_match_results):
             pending_dict = pending.to_dict()
             pending_items.append(pending_dict)
 
-            # Hacer matching (con platform y coord para reglas)
-            match_result = matcher.match_pending_item(
-                pending,
-                company_key=company_key,
-                person_key=person_key,
-                platform_key=platform,
-                coord_label=coordination,
-                evidence_dir=evidence_dir  # Pasar evidence_dir para debug
-            )
-
             match_results.append({
                 "pending_item": pending_dict,
                 "match_result": match_result
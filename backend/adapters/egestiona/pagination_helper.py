@@ -10,6 +10,8 @@ from typing import Any, Dict, List, Optional
 import time
 import re
 
+from backend.adapters.egestiona.wait_conditions import read_grid_state, wait_until
+
 
 def detect_pagination_controls(frame: Any) -> Dict[str, Any]:
     """
@@ -177,64 +179,45 @@ def wait_for_page_change(
     """
     start_time = time.time()
     
-    while time.time() - start_time < timeout_seconds:
-        try:
-            # Verificar si cambió el contador de registros
-            if initial_row_count is not None:
+    def _page_changed() -> bool:
+        # Verificar si cambió el contador de registros
+        if initial_row_count is not None:
+            try:
                 current_count = frame.locator("table.obj.row20px tbody tr").count()
                 if current_count != initial_row_count:
                     return True
-            
-            # Verificar si cambió la firma de la primera fila
-            if initial_signature:
-                try:
-                    first_row_text = frame.evaluate("""() => {
-                        const firstRow = document.querySelector('table.obj.row20px tbody tr');
-                        if (!firstRow) return '';
-                        return (firstRow.innerText || '').substring(0, 100);
-                    }""")
-                    if first_row_text and first_row_text != initial_signature:
-                        return True
-                except Exception:
-                    pass
-            
-            # Verificar si hay overlay de loading
-            loading_selectors = [
-                r'text=/loading\.\.\./i',
-                r'text=/cargando\.\.\./i',
-                '[class*="loading"]',
-                '[id*="loading"]',
-            ]
-            
-            has_loading = False
-            for selector in loading_selectors:
-                try:
-                    if frame.locator(selector).count() > 0:
-                        has_loading = True
-                        break
-                except Exception:
-                    continue
-            
-            # Si hay loading, esperar a que desaparezca
-            if has_loading:
-                time.sleep(0.3)
-                continue
-            
-            # Si no hay loading y ya pasó tiempo suficiente, considerar que cambió
-            if time.time() - start_time > 2.0:
-                # Verificar que hay filas
-                try:
-                    row_count = frame.locator("table.obj.row20px tbody tr").count()
-                    if row_count > 0:
-                        return True
-                except Exception:
-                    pass
-            
-            time.sleep(0.3)
-        except Exception:
-            time.sleep(0.3)
+            except Exception:
+                pass
+        
+        # Verificar si cambió la firma de la primera fila
+        if initial_signature:
+            try:
+                first_row_text = frame.evaluate("""() => {
+                    const firstRow = document.querySelector('table.obj.row20px tbody tr');
+                    if (!firstRow) return '';
+                    return (firstRow.innerText || '').substring(0, 100);
+                }""")
+                if first_row_text and first_row_text != initial_signature:
+                    return True
+            except Exception:
+                pass
+        
+        # Si hay "Loading..." visible, seguir esperando
+        if read_grid_state(frame).get("loading"):
+            return False
+        
+        # Si no hay loading y ya pasó tiempo suficiente, considerar que cambió si hay filas
+        if time.time() - start_time > 2.0:
+            return frame.locator("table.obj.row20px tbody tr").count() > 0
+        return False
     
-    return False
+    return bool(wait_until(
+        _page_changed,
+        condition="page_change",
+        phase="pagination",
+        timeout_s=timeout_seconds,
+        target=frame,
+    ))
 
 
 def click_pagination_button(
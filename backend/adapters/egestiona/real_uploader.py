@@ -18,7 +18,7 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_service_v1 import get_repository_store
 from backend.config import DATA_DIR
 
 
@@ -42,7 +42,7 @@ class EgestionaRealUploader:
         self.evidence_dir.mkdir(parents=True, exist_ok=True)
         self.log = logger or (lambda msg: print(f"[REAL_UPLOADER] {msg}"))
         self.upload_count = 0
-        self.repo_store = DocumentRepositoryStoreV1(base_dir=DATA_DIR)
+        self.repo_store = get_repository_store(DATA_DIR)
     
     def upload_one_real(
         self,
@@ -0,0 +1,335 @@
+"""
+Pool de sesiones autenticadas de eGestiona para los flujos headful.
+
+Cada flujo (plan de envío, matching, escaneo de frames, auto-upload) lanzaba su propio
+Chromium y hacía login completo + espera post-login. El pool guarda el storage_state de
+la sesión por clave (tenant, plataforma, coordinación, usuario) y lo reutiliza:
+
+1) Si hay un storage_state guardado y no ha caducado (TTL), se crea el contexto con él y se
+   comprueba que la sesión sigue viva (navegar a default_contenido.asp sin rebotar al login).
+2) Solo si no hay sesión o ha expirado se hace login y se guarda el nuevo storage_state.
+
+Los contextos de Playwright sync están ligados al hilo que los creó, así que el pool no
+mantiene navegadores vivos entre flujos: lo que se comparte es el estado autenticado.
+
+Estructura: data/tenants/<tenant_id>/sessions/<platform>__<coordination>__<user_hash>.json
+(tenant_id derivado de la coordinación: egestiona_session_tenant; user_hash cubre
+client_code + usuario)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+from urllib.parse import urljoin
+
+from backend.adapters.egestiona.wait_conditions import wait_for_portal_ready
+from backend.shared.tenant_context import sanitize_tenant_id
+from backend.shared.tenant_paths import tenant_root
+
+
+# Tiempo máximo desde el último uso antes de descartar un storage_state sin probarlo
+DEFAULT_SESSION_TTL_S = 20 * 60
+HOME_PATH = "/default_contenido.asp"
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", value or "").strip("_") or "_"
+
+
+@dataclass(frozen=True)
+class EgestionaSessionKey:
+    """
+    Identidad de una sesión de portal.
+
+    El login de eGestiona es (ClientName, usuario, contraseña): el mismo usuario en otro
+    client_code es otra sesión, aunque la coordinación (etiqueta) se reconfigure sin cambiar.
+    """
+
+    tenant_id: str
+    platform: str
+    coordination: str
+    username: str
+    client_code: str = ""
+
+    def file_name(self) -> str:
+        identity = f"{self.client_code}\x00{self.username}" if self.client_code else self.username
+        user_hash = hashlib.sha256(identity.encode("utf-8")).hexdigest()[:12]
+        return f"{_slug(self.platform)}__{_slug(self.coordination)}__{user_hash}.json"
+
+
+def egestiona_session_key(
+    *,
+    tenant: Optional[str],
+    platform: str,
+    coordination: str,
+    username: str,
+    client_code: str = "",
+) -> EgestionaSessionKey:
+    """Construye la clave del pool (tenant vacío -> "default")."""
+    tenant_id = sanitize_tenant_id(tenant) if tenant else ""
+    return EgestionaSessionKey(
+        tenant_id=tenant_id or "default",
+        platform=platform,
+        coordination=coordination,
+        username=username,
+        client_code=client_code,
+    )
+
+
+def egestiona_session_tenant(coordination: Optional[str]) -> str:
+    """
+    Tenant del pool para una sesión de portal. El login es por coordinación (cliente +
+    usuario), no por empresa: escaneo, plan, matching y ejecución de una misma coordinación
+    comparten sesión aunque filtren por empresas distintas, así que company_key no interviene.
+    """
+    return sanitize_tenant_id(coordination) if coordination else "default"
+
+
+def egestiona_session_key_for(
+    *,
+    coordination: str,
+    username: str,
+    client_code: str = "",
+    platform: str = "egestiona",
+) -> EgestionaSessionKey:
+    """Clave del pool que deben usar todos los flujos (lectura y guardado de la sesión)."""
+    return egestiona_session_key(
+        tenant=egestiona_session_tenant(coordination),
+        platform=platform,
+        coordination=coordination,
+        username=username,
+        client_code=client_code,
+    )
+
+
+def login_egestiona(
+    page: Any,
+    *,
+    login_url: str,
+    client_code: str,
+    username: str,
+    password: str,
+    timeout_ms: int = 20000,
+) -> None:
+    """Login estándar en eGestiona (mismos selectores que los flujos headful)."""
+    page.goto(login_url, wait_until="domcontentloaded", timeout=60000)
+    page.locator('input[name="ClientName"]').fill(client_code, timeout=timeout_ms)
+    page.locator('input[name="Username"]').fill(username, timeout=timeout_ms)
+    page.locator('input[name="Password"]').fill(password, timeout=timeout_ms)
+    page.locator('button[type="submit"]').click(timeout=timeout_ms)
+    page.wait_for_url("**/default_contenido.asp", timeout=30000)
+    try:
+        page.wait_for_load_state("networkidle", timeout=25000)
+    except Exception:
+        pass
+
+
+class EgestionaSessionPoolV1:
+    """Storage states reutilizables por clave de sesión (process-wide por base_dir)."""
+
+    def __init__(self, base_dir: Path, ttl_s: Optional[float] = None):
+        self.base_dir = Path(base_dir)
+        if ttl_s is None:
+            try:
+                ttl_s = float(os.getenv("EGESTIONA_SESSION_TTL_S", str(DEFAULT_SESSION_TTL_S)))
+            except ValueError:
+                ttl_s = DEFAULT_SESSION_TTL_S
+        self.ttl_s = ttl_s
+        self._locks: Dict[EgestionaSessionKey, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self.stats = {"reused": 0, "logins": 0, "expired": 0}
+
+    def _lock_for(self, key: EgestionaSessionKey) -> threading.Lock:
+        with self._locks_guard:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = threading.Lock()
+                self._locks[key] = lock
+            return lock
+
+    def state_path(self, key: EgestionaSessionKey) -> Path:
+        return tenant_root(self.base_dir, key.tenant_id) / "sessions" / key.file_name()
+
+    def _fresh_state_path(self, key: EgestionaSessionKey) -> Optional[Path]:
+        path = self.state_path(key)
+        try:
+            age = time.time() - path.stat().st_mtime
+        except OSError:
+            return None
+        if age > self.ttl_s:
+            self.invalidate(key)
+            return None
+        return path
+
+    def save(self, context: Any, key: EgestionaSessionKey) -> None:
+        """Guarda el storage_state actual del contexto para la clave."""
+        path = self.state_path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        try:
+            context.storage_state(path=str(tmp))
+            tmp.replace(path)
+        except Exception as e:
+            print(f"[session_pool] No se pudo guardar storage_state: {e}")
+
+    def invalidate(self, key: EgestionaSessionKey) -> None:
+        """Descarta la sesión guardada (p.ej. tras detectar que el portal la cerró)."""
+        try:
+            self.state_path(key).unlink()
+        except OSError:
+            pass
+
+    def try_reuse(
+        self,
+        browser: Any,
+        key: EgestionaSessionKey,
+        *,
+        home_url: str,
+        viewport: Optional[Dict[str, int]] = None,
+    ) -> Optional[Tuple[Any, Any]]:
+        """
+        Crea (context, page) desde el storage_state guardado si la sesión sigue viva.
+        Retorna None (y descarta el estado) si no hay sesión válida.
+        """
+        path = self._fresh_state_path(key)
+        if path is None:
+            return None
+        context = browser.new_context(viewport=viewport, storage_state=str(path))
+        try:
+            page = context.new_page()
+            alive = is_session_alive(page, home_url=home_url)
+        except BaseException:
+            _close_quietly(context)
+            raise
+        if alive:
+            self.stats["reused"] += 1
+            self.save(context, key)  # refresca cookies rotadas y el TTL
+            return context, page
+        self.stats["expired"] += 1
+        self.invalidate(key)
+        _close_quietly(context)
+        return None
+
+    def open(
+        self,
+        browser: Any,
+        key: EgestionaSessionKey,
+        *,
+        login_fn: Callable[[Any], None],
+        home_url: str,
+        viewport: Optional[Dict[str, int]] = None,
+        wait_after_login_s: float = 0.0,
+    ) -> Tuple[Any, Any, bool]:
+        """
+        Devuelve (context, page, reused) con sesión autenticada.
+        login_fn(page) solo se invoca si no hay sesión reutilizable. Tras un login real, si
+        wait_after_login_s > 0 se espera a que el portal esté listo (red en calma + frame
+        nm_contenido) con presupuesto de fase login, en lugar de una pausa fija.
+        Si el login (o la espera) falla, el contexto nuevo se cierra antes de propagar el error.
+        """
+        with self._lock_for(key):
+            reused = self.try_reuse(browser, key, home_url=home_url, viewport=viewport)
+            if reused is not None:
+                context, page = reused
+                return context, page, True
+
+            context = browser.new_context(viewport=viewport)
+            try:
+                page = context.new_page()
+                login_fn(page)
+                self.stats["logins"] += 1
+                if wait_after_login_s:
+                    wait_for_portal_ready(page, phase="login")
+                self.save(context, key)
+            except BaseException:
+                _close_quietly(context)
+                raise
+            return context, page, False
+
+
+def _close_quietly(context: Any) -> None:
+    try:
+        context.close()
+    except Exception:
+        pass
+
+
+def is_session_alive(page: Any, *, home_url: str, timeout_ms: int = 20000) -> bool:
+    """
+    Comprobación barata de sesión: navegar a la home autenticada y verificar que no
+    se redirige al login (sin formulario ClientName).
+    """
+    try:
+        page.goto(home_url, wait_until="domcontentloaded", timeout=timeout_ms)
+    except Exception:
+        return False
+    if "default_contenido.asp" not in (page.url or ""):
+        return False
+    try:
+        return page.locator('input[name="ClientName"]').count() == 0
+    except Exception:
+        return False
+
+
+def home_url_for(login_url: str) -> str:
+    """URL de la home autenticada (default_contenido.asp) a partir de la URL de login."""
+    return urljoin(login_url, HOME_PATH)
+
+
+_POOLS: Dict[str, EgestionaSessionPoolV1] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_session_pool(base_dir: Path) -> EgestionaSessionPoolV1:
+    """Pool compartido para un base_dir."""
+    key = str(Path(base_dir).resolve())
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = EgestionaSessionPoolV1(Path(key))
+            _POOLS[key] = pool
+        return pool
+
+
+def open_egestiona_session(
+    browser: Any,
+    *,
+    base_dir: Path,
+    platform: str,
+    coordination: str,
+    client_code: str,
+    username: str,
+    password: str,
+    login_url: str,
+    viewport: Optional[Dict[str, int]] = None,
+    wait_after_login_s: float = 0.0,
+    timeout_ms: int = 20000,
+) -> Tuple[Any, Any, bool]:
+    """
+    Atajo para los flujos headful: (context, page, reused) ya autenticados en eGestiona.
+    """
+    key = egestiona_session_key_for(
+        coordination=coordination, username=username, client_code=client_code, platform=platform
+    )
+    return get_session_pool(base_dir).open(
+        browser,
+        key,
+        login_fn=lambda page: login_egestiona(
+            page,
+            login_url=login_url,
+            client_code=client_code,
+            username=username,
+            password=password,
+            timeout_ms=timeout_ms,
+        ),
+        home_url=home_url_for(login_url),
+        viewport=viewport,
+        wait_after_login_s=wait_after_login_s,
+    )
@@ -10,10 +10,9 @@ from datetime import date as dt_date, datetime, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store, get_repository_store
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
 from backend.repository.secrets_store_v1 import SecretsStoreV1
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
 from backend.repository.document_matcher_v1 import (
     DocumentMatcherV1,
     PendingItemV1,
@@ -30,6 +29,8 @@ from backend.adapters.egestiona.pagination_helper import (
 )
 from backend.adapters.egestiona.upload_policy import evaluate_upload_policy
 from backend.adapters.egestiona.frame_scan_headful import LOGIN_URL_PREVIOUS_SUCCESS, _safe_write_json
+from backend.adapters.egestiona.session_pool import open_egestiona_session
+from backend.runs.background_runs_v1 import raise_if_canceled
 from backend.adapters.egestiona.match_pending_headful import (
     _parse_date_from_cell,
     run_match_pending_documents_readonly_headful,
@@ -209,9 +210,9 @@ def run_build_submission_plan_readonly_headful(
     print(f"[CAE][READONLY][TRACE] run_build_submission_plan_readonly_headful ENTRADA: platform={platform} coordination={coordination} company_key={company_key} person_key={person_key} limit={limit} only_target={only_target} return_plan_only={return_plan_only}")
     
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     secrets = SecretsStoreV1(base_dir=base)
-    repo_store = DocumentRepositoryStoreV1(base_dir=base)
+    repo_store = get_repository_store(base)
     matcher = DocumentMatcherV1(repo_store, base_dir=base)
 
     platforms = store.load_platforms()
@@ -294,30 +295,23 @@ def run_build_submission_plan_readonly_headful(
     with sync_playwright() as p:
         print(f"[CAE][READONLY][TRACE] Lanzando browser Chromium (headless=False)...")
         browser = p.chromium.launch(headless=False, slow_mo=slow_mo_ms)
-        context = browser.new_context(
+        print(f"[CAE][READONLY][TRACE] Browser lanzado, abriendo sesión (pool)...")
+
+        # 1) Login (o reutilización de sesión guardada en el pool)
+        context, page, session_reused = open_egestiona_session(
+            browser,
+            base_dir=base,
+            platform=platform,
+            coordination=coordination,
+            client_code=client_code,
+            username=username,
+            password=password,
+            login_url=LOGIN_URL_PREVIOUS_SUCCESS,
             viewport=viewport or {"width": 1600, "height": 1000},
+            wait_after_login_s=wait_after_login_s,
         )
-        page = context.new_page()
-        print(f"[CAE][READONLY][TRACE] Browser lanzado, navegando a login...")
-
-        # 1) Login (reutilizar lógica existente)
-        print(f"[CAE][READONLY][TRACE] Navegando a: {LOGIN_URL_PREVIOUS_SUCCESS}")
-        page.goto(LOGIN_URL_PREVIOUS_SUCCESS, wait_until="domcontentloaded", timeout=60000)
-        print(f"[CAE][READONLY][TRACE] Página de login cargada, rellenando credenciales...")
-        page.locator('input[name="ClientName"]').fill(client_code, timeout=20000)
-        page.locator('input[name="Username"]').fill(username, timeout=20000)
-        page.locator('input[name="Password"]').fill(password, timeout=20000)
-        print(f"[CAE][READONLY][TRACE] Credenciales rellenadas, haciendo click en submit...")
-        page.locator('button[type="submit"]').click(timeout=20000)
-
-        print(f"[CAE][READONLY][TRACE] Esperando redirección a default_contenido.asp...")
-        page.wait_for_url("**/default_contenido.asp", timeout=30000)
-        try:
-            page.wait_for_load_state("networkidle", timeout=25000)
-        except Exception:
-            pass
-        print(f"[CAE][READONLY][TRACE] Login completado, esperando {wait_after_login_s}s...")
-        time.sleep(wait_after_login_s)
+        print(f"[CAE][READONLY][TRACE] Sesión lista (reutilizada={session_reused})")
+        raise_if_canceled("login")
         print(f"[CAE][READONLY][TRACE] Continuando con navegación a listado de pendientes...")
 
         # Guardar storage_state tras login exitoso (para reutilizar sesión) - solo si NO es return_plan_only
@@ -527,6 +521,7 @@ def run_build_submission_plan_readonly_headful(
         # Loop de paginación
         while pages_processed < max_pages:
             pages_processed += 1
+            raise_if_canceled(f"grid_page_{pages_processed}")
             print(f"[CAE][READONLY][PAGINATION] Procesando página {pages_processed}...")
             
             # Extraer grid de la página actual
@@ -985,6 +980,7 @@ def run_build_submission_plan_readonly_headful(
         # 7) Convertir a PendingItemV1, hacer matching y generar plan
         # Las filas ya están canonicalizadas
         print(f"[CAE][READONLY][TRACE] Procesando {len(target_rows)} filas target para matching...")
+        target_pendings: List[PendingItemV1] = []
         for row in target_rows:
             tipo_doc = row.get("tipo_doc") or ""
             elemento = row.get("elemento") or ""
@@ -993,7 +989,7 @@ def run_build_submission_plan_readonly_headful(
             fecha_inicio = _parse_date_from_cell(row.get("inicio") or "")
             fecha_fin = _parse_date_from_cell(row.get("fin") or "")
 
-            pending = PendingItemV1(
+            target_pendings.append(PendingItemV1(
                 tipo_doc=tipo_doc,
                 elemento=elemento,
                 empresa=empresa,
@@ -1001,24 +997,26 @@ def run_build_submission_plan_readonly_headful(
                 fecha_inicio=fecha_inicio,
                 fecha_fin=fecha_fin,
                 raw_data=row.get("_raw_row", row)  # Mantener raw para debug
-            )
+            ))
 
+        raise_if_canceled("matching")
+        # Hacer matching de todo el grid en una pasada (con platform y coord para reglas)
+        # SPRINT C2.18A: Generar debug report estructurado
+        # Siempre pasar evidence_dir si está disponible (incluso en return_plan_only)
+        target_match_results = matcher.match_pending_items(
+            target_pendings,
+            company_key=company_key,
+            person_key=person_key,
+            platform_key=platform,
+            coord_label=coordination,
+            evidence_dir=evidence_dir,  # SPRINT C2.18A: Siempre pasar evidence_dir si está disponible
+            generate_debug_report=True,  # SPRINT C2.18A: Siempre generar reporte estructurado
+        )
+
+        for row, pending, match_result in zip(target_rows, target_pendings, target_match_results):
             pending_dict = pending.to_dict()
             pending_items.append(pending_dict)
 
-            # Hacer matching (con platform y coord para reglas)
-            # SPRINT C2.18A: Generar debug report estructurado
-            # Siempre pasar evidence_dir si está disponible (incluso en return_plan_only)
-            match_result = matcher.match_pending_item(
-                pending,
-                company_key=company_key,
-                person_key=person_key,
-                platform_key=platform,
-                coord_label=coordination,
-                evidence_dir=evidence_dir,  # SPRINT C2.18A: Siempre pasar evidence_dir si está disponible
-                generate_debug_report=True,  # SPRINT C2.18A: Siempre generar reporte estructurado
-            )
-
             match_results.append({
                 "pending_item": pending_dict,
                 "match_result": match_result
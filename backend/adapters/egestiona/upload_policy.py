@@ -10,7 +10,7 @@ from typing import Any, Dict, List, Optional
 from pathlib import Path
 from datetime import date as dt_date
 
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_service_v1 import get_repository_store
 from backend.config import DATA_DIR
 
 
@@ -84,7 +84,7 @@ def evaluate_upload_policy(
         return result
     
     # Regla 2: Si hay match pero falta archivo / path inválido -> REVIEW_REQUIRED
-    repo_store = DocumentRepositoryStoreV1(base_dir=base_dir)
+    repo_store = get_repository_store(base_dir)
     try:
         # Verificar que el documento existe en el repositorio
         doc = repo_store.get_document(doc_id)
@@ -0,0 +1,462 @@
+"""
+Esperas por condición para los flujos eGestiona (Playwright sync).
+
+Los flujos headful esperaban con time.sleep fijos (0.25-2.5 s) y bucles
+`while time.time() < deadline` propios. Aquí cada espera es una condición sobre
+primitivas de Playwright que termina en cuanto el portal está listo:
+
+- frame_appears: un frame (nombre, URL o búsqueda propia) existe y, opcionalmente, está listo
+- grid_has_rows: el grid DHTMLX tiene filas con texto (o contador "N Registros") y no hay "Loading..."
+- grid_idle: el grid lleva quiet_ms sin mutaciones del DOM (MutationObserver) y sin "Loading..."
+- network_quiet: load_state "networkidle"
+- modal_closed: no queda visible ninguna ventana modal DHTMLX
+- wait_until: predicado Python arbitrario (sondeo corto con wait_for_timeout de Playwright)
+
+Cada espera tiene un presupuesto por fase (phase_timeout.get_wait_budget, acotado a
+DEFAULT_TIMEOUTS) y su duración real se registra en el timeline del run
+(report_progress, o el RunTimeline que se pase). Agotar el presupuesto no lanza
+excepción salvo raise_on_timeout=True: el resultado es falsy y el flujo decide.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Sequence, Union
+
+from backend.runs.run_timeline import EventType, RunTimeline
+from backend.shared.phase_timeout import PhaseTimeoutError, get_wait_budget
+
+
+DEFAULT_POLL_S = 0.1
+DEFAULT_GRID_QUIET_MS = 400
+
+MODAL_SELECTORS = (
+    "div.dhtmlx_window_active",
+    "div.dhxwin_active",
+    "div.dhtmlx_modal_cover",
+    "div.dhxwins_mcover",
+    "div.modal.show",
+)
+
+# Estado del grid: filas con texto, contador "N Registros" y "Loading..." visible
+_GRID_STATE_JS = """() => {
+  const body = document.body;
+  const text = body ? (body.innerText || '') : '';
+  const loading = /(^|\\s)(loading|cargando)\\.\\.\\./i.test(text);
+  const obj = document.querySelector('table.obj.row20px');
+  let rows = 0;
+  if (obj) {
+    for (const tr of obj.querySelectorAll('tr')) {
+      const tds = tr.querySelectorAll('td');
+      if (tds.length && Array.from(tds).some(td => (td.innerText || '').trim().length > 0)) rows++;
+    }
+  }
+  const m = text.match(/\\b(\\d+)\\s+Registros\\b/i);
+  return {rows: rows, registros: m ? parseInt(m[1], 10) : null, loading: loading};
+}"""
+
+_GRID_HAS_ROWS_JS = """(minRows) => {
+  const state = (%s)();
+  if (state.loading) return false;
+  // "0 Registros" sin "Loading...": grid vacío ya asentado, no hay filas que esperar
+  if (state.registros === 0) return state;
+  const n = Math.max(state.rows, state.registros || 0);
+  return n >= minRows ? state : false;
+}""" % _GRID_STATE_JS
+
+# Instala (o rearma) un MutationObserver sobre el contenedor del grid; el reloj de
+# calma empieza en cada llamada para no dar por quieto un grid que aún no ha reaccionado
+_GRID_OBSERVER_INSTALL_JS = """() => {
+  const target = document.querySelector('div.objbox')
+    || (document.querySelector('table.obj.row20px') || {}).parentElement
+    || document.body;
+  let w = window.__cometGridWait;
+  if (!w || !w.target || !w.target.isConnected || w.target !== target) {
+    if (w && w.observer) w.observer.disconnect();
+    w = {target: target, last: performance.now(), mutations: 0, sawLoading: false};
+    w.observer = new MutationObserver(() => { w.last = performance.now(); w.mutations++; });
+    if (target) w.observer.observe(target, {childList: true, subtree: true, characterData: true, attributes: true});
+    window.__cometGridWait = w;
+  }
+  w.last = performance.now();
+  w.mutations = 0;
+  w.sawLoading = false;
+  return true;
+}"""
+
+_GRID_IDLE_JS = """(quietMs) => {
+  const w = window.__cometGridWait;
+  if (!w) return false;
+  const state = (%s)();
+  if (state.loading) { w.sawLoading = true; w.last = performance.now(); return false; }
+  if (performance.now() - w.last < quietMs) return false;
+  return {rows: state.rows, registros: state.registros, mutations: w.mutations, saw_loading: w.sawLoading};
+}""" % _GRID_STATE_JS
+
+_MODAL_CLOSED_JS = """(selectors) => {
+  for (const sel of selectors) {
+    for (const el of document.querySelectorAll(sel)) {
+      const r = el.getBoundingClientRect();
+      const st = window.getComputedStyle(el);
+      if (r.width > 0 && r.height > 0 && st.visibility !== 'hidden' && st.display !== 'none') return false;
+    }
+  }
+  return true;
+}"""
+
+
+@dataclass
+class WaitResult:
+    """Resultado de una espera: falsy si se agotó el presupuesto."""
+    condition: str
+    phase: str
+    satisfied: bool
+    duration_ms: int
+    timeout_s: float
+    value: Any = None
+    detail: Dict[str, Any] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return self.satisfied
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "condition": self.condition,
+            "phase": self.phase,
+            "satisfied": self.satisfied,
+            "duration_ms": self.duration_ms,
+            "timeout_s": self.timeout_s,
+            **self.detail,
+        }
+
+
+def _record(result: WaitResult, timeline: Optional[RunTimeline]) -> None:
+    """Registra la duración de la espera en el timeline (el del run actual si no se pasa)."""
+    outcome = "ok" if result.satisfied else "timeout"
+    message = f"Espera {result.condition} ({result.phase}): {result.duration_ms} ms [{outcome}]"
+    event_type = EventType.INFO if result.satisfied else EventType.WARNING
+    try:
+        if timeline is not None:
+            timeline.add_event(event_type, message, result.to_dict())
+        else:
+            from backend.runs.background_runs_v1 import report_progress
+
+            report_progress(message, event_type, **result.to_dict())
+    except Exception:
+        pass  # el registro nunca rompe el flujo
+
+
+def _finish(
+    condition: str,
+    phase: str,
+    started: float,
+    budget: float,
+    value: Any,
+    satisfied: bool,
+    timeline: Optional[RunTimeline],
+    raise_on_timeout: bool,
+    detail: Optional[Dict[str, Any]] = None,
+) -> WaitResult:
+    result = WaitResult(
+        condition=condition,
+        phase=phase,
+        satisfied=satisfied,
+        duration_ms=int((time.monotonic() - started) * 1000),
+        timeout_s=budget,
+        value=value,
+        detail=detail or {},
+    )
+    _record(result, timeline)
+    if raise_on_timeout and not satisfied:
+        raise PhaseTimeoutError(phase, budget, f"Condition '{condition}' not met after {budget}s")
+    return result
+
+
+def _timeout_ms(budget: float) -> float:
+    # En Playwright timeout=0 significa "sin límite": un presupuesto agotado se queda en 1 ms
+    return max(1.0, budget * 1000)
+
+
+def _pause(target: Any, seconds: float) -> None:
+    """Pausa corta de sondeo; con página/frame usa wait_for_timeout (procesa eventos de Playwright)."""
+    waiter = getattr(target, "wait_for_timeout", None) if target is not None else None
+    if callable(waiter):
+        try:
+            waiter(seconds * 1000)
+            return
+        except Exception:
+            pass
+    time.sleep(seconds)
+
+
+def wait_until(
+    check: Callable[[], Any],
+    *,
+    condition: str,
+    phase: str,
+    timeout_s: Optional[float] = None,
+    poll_s: float = DEFAULT_POLL_S,
+    target: Any = None,
+    timeline: Optional[RunTimeline] = None,
+    raise_on_timeout: bool = False,
+) -> WaitResult:
+    """
+    Sondea check() hasta que devuelve un valor truthy o se agota el presupuesto.
+
+    Args:
+        check: Predicado sin argumentos (una excepción cuenta como "aún no")
+        condition: Nombre de la condición (timeline)
+        phase: Fase (presupuesto por defecto y timeline)
+        timeout_s: Presupuesto explícito (si None, get_wait_budget(phase))
+        poll_s: Intervalo de sondeo
+        target: Página o frame para pausar con wait_for_timeout (opcional)
+        timeline: RunTimeline donde registrar (por defecto, el del run en segundo plano)
+        raise_on_timeout: Lanzar PhaseTimeoutError si no se cumple
+
+    Returns:
+        WaitResult con value = último valor de check()
+    """
+    budget = get_wait_budget(phase, timeout_s)
+    started = time.monotonic()
+    deadline = started + budget
+    value = None
+    while True:
+        try:
+            value = check()
+        except Exception:
+            value = None
+        if value:
+            return _finish(condition, phase, started, budget, value, True, timeline, raise_on_timeout)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return _finish(condition, phase, started, budget, value, False, timeline, raise_on_timeout)
+        _pause(target, min(poll_s, remaining))
+
+
+def _wait_for_js(
+    frame: Any,
+    expression: str,
+    arg: Any,
+    *,
+    condition: str,
+    phase: str,
+    timeout_s: Optional[float],
+    timeline: Optional[RunTimeline],
+    raise_on_timeout: bool,
+) -> WaitResult:
+    """Espera en el navegador (frame.wait_for_function) a que la expresión devuelva un valor truthy."""
+    budget = get_wait_budget(phase, timeout_s)
+    started = time.monotonic()
+    value = None
+    detail: Dict[str, Any] = {}
+    try:
+        handle = frame.wait_for_function(expression, arg=arg, timeout=_timeout_ms(budget), polling="raf")
+        try:
+            value = handle.json_value()
+        except Exception:
+            value = True
+        satisfied = True
+    except Exception as e:
+        satisfied = False
+        detail["error"] = type(e).__name__
+    return _finish(condition, phase, started, budget, value, satisfied, timeline, raise_on_timeout, detail)
+
+
+def wait_for_frame(
+    page: Any,
+    find: Union[str, Callable[[], Any]],
+    *,
+    ready: Optional[Callable[[Any], bool]] = None,
+    url_contains: Sequence[str] = (),
+    phase: str = "navigation",
+    timeout_s: Optional[float] = None,
+    timeline: Optional[RunTimeline] = None,
+    raise_on_timeout: bool = False,
+) -> WaitResult:
+    """
+    Espera a que aparezca un frame (y, si se indica, a que ready(frame) sea True).
+
+    Args:
+        page: Página de Playwright
+        find: Nombre del frame o función que lo busca (None si aún no existe)
+        ready: Condición adicional sobre el frame encontrado (p.ej. que tenga el grid)
+        url_contains: Si find es un nombre, fragmentos de URL alternativos (todos deben aparecer)
+
+    Returns:
+        WaitResult con value = frame (None si no apareció)
+    """
+    if isinstance(find, str):
+        name = find
+        needles = [n.lower() for n in url_contains]
+
+        def _find() -> Any:
+            fr = page.frame(name=name)
+            if fr is not None or not needles:
+                return fr
+            for candidate in page.frames:
+                url = (candidate.url or "").lower()
+                if all(n in url for n in needles):
+                    return candidate
+            return None
+    else:
+        _find = find
+
+    found: Dict[str, Any] = {}
+
+    def _check() -> Any:
+        fr = _find()
+        found["frame"] = fr
+        if fr is None:
+            return None
+        if ready is not None and not ready(fr):
+            return None
+        return fr
+
+    result = wait_until(
+        _check,
+        condition="frame_appears",
+        phase=phase,
+        timeout_s=timeout_s,
+        target=page,
+        timeline=timeline,
+        raise_on_timeout=raise_on_timeout,
+    )
+    if not result.satisfied:
+        result.value = None
+    return result
+
+
+def wait_for_grid_rows(
+    frame: Any,
+    *,
+    min_rows: int = 1,
+    phase: str = "grid_load",
+    timeout_s: Optional[float] = None,
+    timeline: Optional[RunTimeline] = None,
+    raise_on_timeout: bool = False,
+) -> WaitResult:
+    """
+    Espera a que el grid DHTMLX (table.obj.row20px) tenga al menos min_rows filas con
+    texto (o el contador "N Registros" lo indique) y no haya "Loading..." visible.
+    Un contador explícito "0 Registros" sin "Loading..." cuenta como grid asentado (vacío):
+    la espera termina satisfecha con value["registros"] == 0 en lugar de agotar el presupuesto.
+
+    Returns:
+        WaitResult con value = {"rows", "registros", "loading"}
+    """
+    return _wait_for_js(
+        frame,
+        _GRID_HAS_ROWS_JS,
+        max(1, int(min_rows)),
+        condition="grid_has_rows",
+        phase=phase,
+        timeout_s=timeout_s,
+        timeline=timeline,
+        raise_on_timeout=raise_on_timeout,
+    )
+
+
+def wait_for_grid_idle(
+    frame: Any,
+    *,
+    quiet_ms: int = DEFAULT_GRID_QUIET_MS,
+    phase: str = "grid_load",
+    timeout_s: Optional[float] = None,
+    timeline: Optional[RunTimeline] = None,
+    raise_on_timeout: bool = False,
+) -> WaitResult:
+    """
+    Espera a que el grid deje de cambiar: quiet_ms sin mutaciones en su contenedor
+    (MutationObserver) y sin "Loading..." visible. El reloj empieza en esta llamada.
+
+    Returns:
+        WaitResult con value = {"rows", "registros", "mutations", "saw_loading"}
+    """
+    budget = get_wait_budget(phase, timeout_s)
+    started = time.monotonic()
+    try:
+        frame.evaluate(_GRID_OBSERVER_INSTALL_JS)
+    except Exception as e:
+        return _finish("grid_idle", phase, started, budget, None, False, timeline, raise_on_timeout,
+                       {"error": type(e).__name__})
+    remaining = max(0.0, budget - (time.monotonic() - started))
+    return _wait_for_js(
+        frame,
+        _GRID_IDLE_JS,
+        int(quiet_ms),
+        condition="grid_idle",
+        phase=phase,
+        timeout_s=remaining,
+        timeline=timeline,
+        raise_on_timeout=raise_on_timeout,
+    )
+
+
+def read_grid_state(frame: Any) -> Dict[str, Any]:
+    """Estado instantáneo del grid ({"rows", "registros", "loading"}); vacío si el frame no responde."""
+    try:
+        return frame.evaluate(_GRID_STATE_JS) or {}
+    except Exception:
+        return {}
+
+
+def wait_for_network_quiet(
+    page: Any,
+    *,
+    phase: str = "navigation",
+    timeout_s: Optional[float] = None,
+    timeline: Optional[RunTimeline] = None,
+    raise_on_timeout: bool = False,
+) -> WaitResult:
+    """Espera al load_state "networkidle" de la página (o frame)."""
+    budget = get_wait_budget(phase, timeout_s)
+    started = time.monotonic()
+    detail: Dict[str, Any] = {}
+    try:
+        page.wait_for_load_state("networkidle", timeout=_timeout_ms(budget))
+        satisfied = True
+    except Exception as e:
+        satisfied = False
+        detail["error"] = type(e).__name__
+    return _finish("network_quiet", phase, started, budget, None, satisfied, timeline, raise_on_timeout, detail)
+
+
+def wait_for_modal_closed(
+    frame: Any,
+    *,
+    selectors: Sequence[str] = MODAL_SELECTORS,
+    phase: str = "upload",
+    timeout_s: Optional[float] = None,
+    timeline: Optional[RunTimeline] = None,
+    raise_on_timeout: bool = False,
+) -> WaitResult:
+    """Espera a que no quede visible ninguna ventana modal (selectors) en la página o frame."""
+    return _wait_for_js(
+        frame,
+        _MODAL_CLOSED_JS,
+        list(selectors),
+        condition="modal_closed",
+        phase=phase,
+        timeout_s=timeout_s,
+        timeline=timeline,
+        raise_on_timeout=raise_on_timeout,
+    )
+
+
+def wait_for_portal_ready(
+    page: Any,
+    *,
+    phase: str = "login",
+    timeout_s: Optional[float] = None,
+    timeline: Optional[RunTimeline] = None,
+) -> WaitResult:
+    """
+    Tras el login: red en calma y frame del dashboard (nm_contenido) presente.
+    Sustituye la espera fija post-login (wait_after_login_s).
+    """
+    budget = get_wait_budget(phase, timeout_s)
+    started = time.monotonic()
+    wait_for_network_quiet(page, phase=phase, timeout_s=budget, timeline=timeline)
+    remaining = max(0.0, budget - (time.monotonic() - started))
+    return wait_for_frame(page, "nm_contenido", phase=phase, timeout_s=remaining, timeline=timeline)
@@ -23,6 +23,7 @@ from backend.shared.models import (
     PlatformMemory,
 )
 from backend.memory import MemoryStore
+from backend.shared.write_behind_v1 import flush_learning_stores
 from backend.config import MEMORY_BASE_DIR
 
 logger = logging.getLogger(__name__)
@@ -754,6 +755,9 @@ def build_cae_response_from_batch(
     
     except Exception as e:
         logger.warning(f"[cae-adapter] Error al actualizar memoria de outcome: {e}", exc_info=True)
+    finally:
+        # Fin del run: volcar a disco la memoria de aprendizaje pendiente (write-behind)
+        flush_learning_stores()
     
     # Construir summary global
     total_workers = len(cae_request.workers)
@@ -957,6 +961,9 @@ def build_cae_response_from_batch(
         
     except Exception as e:
         logger.warning(f"[cae-adapter] Failed to initialize memory store: {e}")
+    finally:
+        # Memoria de trabajador/empresa/plataforma guardada tras el volcado anterior
+        flush_learning_stores()
     
     return CAEBatchResponse(
         platform=cae_request.platform,
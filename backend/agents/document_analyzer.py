@@ -17,6 +17,7 @@ except ImportError:
     PYPDF_AVAILABLE = False
 
 from backend.shared.models import DocumentAnalysisResult
+from backend.shared.pdf_text_cache import get_pdf_text_cache
 from backend.vision.ocr_service import OCRService
 
 logger = logging.getLogger(__name__)
@@ -112,16 +113,12 @@ class DocumentAnalyzer:
         # Intentar con pypdf
         if PYPDF_AVAILABLE:
             try:
-                reader = PdfReader(str(file_path))
-                text_parts = []
                 # Limitar a las primeras 10 páginas para evitar problemas con PDFs muy grandes
-                for i, page in enumerate(reader.pages[:10]):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text:
-                            text_parts.append(page_text)
-                    except Exception as e:
-                        logger.warning(f"[doc-analyzer] Error extrayendo texto de página {i}: {e}")
+                pdf_text = get_pdf_text_cache().extract(file_path, reader_factory=PdfReader, max_pages=10)
+                for i, error in sorted(pdf_text.page_errors.items()):
+                    if i < 10:
+                        logger.warning(f"[doc-analyzer] Error extrayendo texto de página {i}: {error}")
+                text_parts = [t for t in pdf_text.pages[:10] if t]
                 
                 full_text = "\n".join(text_parts)
                 
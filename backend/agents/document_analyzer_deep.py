@@ -17,6 +17,7 @@ from datetime import datetime, date
 from pathlib import Path
 
 from backend.shared.models import DeepDocumentAnalysis, DeepDocumentField
+from backend.shared.pdf_text_cache import get_pdf_text_cache
 
 logger = logging.getLogger(__name__)
 
@@ -401,13 +402,11 @@ class DeepDocumentAnalyzer:
         try:
             from pypdf import PdfReader
             
-            reader = PdfReader(str(pdf_path))
-            text_parts = []
-            
-            for page in reader.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text_parts.append(page_text)
+            pdf_text = get_pdf_text_cache().extract(pdf_path, reader_factory=PdfReader)
+            if pdf_text.page_errors:
+                first_page = min(pdf_text.page_errors)
+                raise RuntimeError(f"page {first_page}: {pdf_text.page_errors[first_page]}")
+            text_parts = [t for t in pdf_text.pages if t]
             
             if text_parts:
                 return "\n".join(text_parts)
@@ -17,6 +17,7 @@ from backend.shared.models import (
 from backend.agents.dom_explorer import DOMExplorer, DOMSnapshot
 from backend.agents.visual_explorer import VisualExplorer, VisualSnapshot
 from backend.agents.path_finder import PathFinder
+from backend.shared.write_behind_v1 import flush_learning_stores
 
 logger = logging.getLogger(__name__)
 
@@ -370,6 +371,20 @@ class HybridPlanner:
         Returns:
             Tupla (grafo final, resultados de nodos)
         """
+        try:
+            return await self._run_episode(goal, task_graph, memory, document_analysis)
+        finally:
+            if self.rl_engine:
+                # Fin del episodio RL: volcar a disco las transiciones pendientes (write-behind)
+                flush_learning_stores()
+    
+    async def _run_episode(
+        self,
+        goal: str,
+        task_graph: Optional[Any],
+        memory: Optional[Any],
+        document_analysis: Optional[Any],
+    ) -> Tuple[PlannerGraph, List[PlannerNodeResult]]:
         logger.info(f"[hybrid-planner] Starting hybrid planner for goal: {goal[:100]}...")
         
         # 1. Construir grafo inicial
@@ -72,6 +72,7 @@ async def create_auto_upload_plan(
         only_target=request.only_target,
         max_items=request.max_items,
         max_pages=request.max_pages,
+        wait=True,  # contrato C2.17: el plan se devuelve en la respuesta
         request=http_request,
     )
     
@@ -12,7 +12,7 @@ from typing import Dict, List
 from fastapi import APIRouter
 from pydantic import BaseModel
 
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store
 from backend.config import DATA_DIR
 
 
@@ -50,7 +50,7 @@ async def get_coordination_context_options():
         - platforms: Plataformas disponibles
         - coordinated_companies_by_platform: Empresas coordinadas por plataforma
     """
-    store = ConfigStoreV1(base_dir=DATA_DIR)
+    store = get_config_store(DATA_DIR)
     
     # 1) Empresas propias: desde org.json
     # Por ahora solo hay una organización, pero se puede expandir
@@ -20,6 +20,7 @@ from backend.shared.decision_pack_store import DecisionPackStore
 from backend.config import DATA_DIR
 from backend.shared.tenant_context import get_tenant_from_request
 from backend.shared.tenant_paths import get_runs_root
+from backend.shared.storage_io_v1 import async_store, run_storage_io
 
 router = APIRouter(prefix="/api/plans", tags=["decision-packs"])
 
@@ -45,6 +46,11 @@ async def create_decision_pack(
     Response:
         DecisionPackV1 con decision_pack_id generado
     """
+    # Lectura del plan, validación contra el repositorio y escritura del pack fuera del event loop
+    return await run_storage_io(_create_decision_pack_sync, plan_id, request)
+
+
+def _create_decision_pack_sync(plan_id: str, request: CreateDecisionPackRequest) -> DecisionPackV1:
     # Validar que el plan existe
     plan_path = Path(DATA_DIR) / "runs" / plan_id / "plan_response.json"
     if not plan_path.exists():
@@ -85,10 +91,10 @@ async def create_decision_pack(
                     detail=f"MARK_AS_MATCH requires chosen_local_doc_id for item {decision.item_id}"
                 )
             # SPRINT C2.18B: Validar que el doc_id existe en el repositorio
-            from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+            from backend.repository.repository_service_v1 import get_repository_store
             try:
-                store = DocumentRepositoryStoreV1()
-                doc = store.get_document(decision.chosen_local_doc_id)
+                repo_store = get_repository_store()
+                doc = repo_store.get_document(decision.chosen_local_doc_id)
                 if not doc:
                     raise HTTPException(
                         status_code=400,
@@ -207,10 +213,10 @@ async def list_decision_packs(plan_id: str, request: Request = None) -> dict:
     tenant_ctx = get_tenant_from_request(request)
     runs_root = get_runs_root(DATA_DIR, tenant_ctx.tenant_id, mode="read")
     plan_path = runs_root / plan_id / "plan_response.json"
-    if not plan_path.exists():
+    if not await run_storage_io(plan_path.exists):
         raise HTTPException(status_code=404, detail=f"Plan {plan_id} not found")
     
-    packs = store.list_packs(plan_id)
+    packs = await async_store(store).list_packs(plan_id)
     
     return {
         "plan_id": plan_id,
@@ -234,10 +240,10 @@ async def get_decision_pack(
     tenant_ctx = get_tenant_from_request(request)
     runs_root = get_runs_root(DATA_DIR, tenant_ctx.tenant_id, mode="read")
     plan_path = runs_root / plan_id / "plan_response.json"
-    if not plan_path.exists():
+    if not await run_storage_io(plan_path.exists):
         raise HTTPException(status_code=404, detail=f"Plan {plan_id} not found")
     
-    pack = store.load_pack(plan_id, decision_pack_id)
+    pack = await async_store(store).load_pack(plan_id, decision_pack_id)
     if not pack:
         raise HTTPException(
             status_code=404,
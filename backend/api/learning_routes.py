@@ -109,3 +109,19 @@ async def disable_hint(hint_id: str, body: Optional[DisableHintRequest] = None,
         "hint_id": hint_id,
         "disabled": True,
     }
+
+
+@router.post("/hints/compact")
+async def compact_hints(request: Request = None) -> dict:
+    """
+    Reescribe hints_v1.jsonl sin los hints desactivados (tombstones).
+    
+    Response:
+    {
+        "kept": N,
+        "removed": M
+    }
+    """
+    tenant_ctx = get_tenant_from_request(request)
+    store = LearningStore(tenant_id=tenant_ctx.tenant_id)
+    return store.compact()
@@ -23,11 +23,13 @@ from backend.shared.tenant_context import get_tenant_from_request, compute_tenan
 from backend.shared.run_summary import (
     RunSummaryV1, RunContextV1, create_run_dir, save_run_summary
 )
+from backend.shared.run_index_v1 import get_summary_run_index
 from backend.shared.run_lock import RunLock
 from backend.cae.execution_runner_v1 import CAEExecutionRunnerV1
 from backend.cae.submission_routes import _get_plan_evidence
 from backend.shared.schedule_models import ScheduleV1
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.shared.storage_io_v1 import run_storage_io
+from backend.repository.repository_service_v1 import get_config_store
 from backend.api.coordination_context_routes import (
     CompanyOptionV1, PlatformOptionV1, CoordinationContextOptionsV1
 )
@@ -73,7 +75,7 @@ def _get_context_from_request(request: Request) -> RunContextV1:
     
     # Obtener opciones para conseguir los nombres
     # Usar ConfigStore directamente para evitar dependencia circular
-    store = ConfigStoreV1(base_dir=DATA_DIR)
+    store = get_config_store(DATA_DIR)
     
     # Construir opciones manualmente
     org = store.load_org()
@@ -417,8 +419,11 @@ async def get_latest_run(request: Request) -> dict:
         )
     
     tenant_ctx = get_tenant_from_request(request)
-    tenant_id = tenant_ctx.tenant_id
-    
+    # Glob + lectura de summary.json fuera del event loop
+    return await run_storage_io(_read_latest_run, tenant_ctx.tenant_id)
+
+
+def _read_latest_run(tenant_id: str) -> dict:
     # Buscar último run
     from backend.shared.tenant_paths import tenant_runs_root
     runs_root = tenant_runs_root(DATA_DIR, tenant_id)
@@ -426,13 +431,13 @@ async def get_latest_run(request: Request) -> dict:
     if not runs_root.exists():
         raise HTTPException(status_code=404, detail="No runs found")
     
-    # Buscar directorios de runs (formato: YYYYMMDD_HHMMSS__<run_id>)
-    run_dirs = sorted(runs_root.glob("*__*"), key=lambda p: p.name, reverse=True)
+    # Último run según el índice del tenant (orden por nombre YYYYMMDD_HHMMSS__<run_id>)
+    latest = get_summary_run_index(runs_root).latest()
     
-    if not run_dirs:
+    if not latest:
         raise HTTPException(status_code=404, detail="No runs found")
     
-    latest_run_dir = run_dirs[0]
+    latest_run_dir = runs_root / latest["run_dir"]
     
     # Cargar summary.json
     summary_path = latest_run_dir / "summary.json"
@@ -466,19 +471,23 @@ async def get_run(run_id: str, request: Request) -> dict:
         )
     
     tenant_ctx = get_tenant_from_request(request)
-    tenant_id = tenant_ctx.tenant_id
-    
+    return await run_storage_io(_read_run, run_id, tenant_ctx.tenant_id)
+
+
+def _read_run(run_id: str, tenant_id: str) -> dict:
     # Buscar run
     from backend.shared.tenant_paths import tenant_runs_root
     runs_root = tenant_runs_root(DATA_DIR, tenant_id)
     
-    # Buscar directorio que contenga el run_id
-    run_dirs = list(runs_root.glob(f"*__{run_id}"))
-    
-    if not run_dirs:
-        raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
-    
-    run_dir = run_dirs[0]
+    # Buscar directorio del run: índice del tenant y, si no está indexado (run en curso), glob
+    record = get_summary_run_index(runs_root).get(run_id) if runs_root.exists() else None
+    if record:
+        run_dir = runs_root / record["run_dir"]
+    else:
+        run_dirs = list(runs_root.glob(f"*__{run_id}"))
+        if not run_dirs:
+            raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
+        run_dir = run_dirs[0]
     
     # Cargar summary.json
     summary_path = run_dir / "summary.json"
@@ -8,6 +8,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Query, Request
 from typing import Optional, List
 from backend.shared.run_summary import list_run_summaries
+from backend.shared.storage_io_v1 import run_storage_io
 from backend.shared.tenant_context import get_tenant_from_request
 
 router = APIRouter(tags=["runs"])
@@ -16,6 +17,7 @@ router = APIRouter(tags=["runs"])
 @router.get("/api/runs/summary")
 async def get_runs_summary(
     limit: int = Query(50, ge=1, le=200, description="Límite de resultados"),
+    offset: int = Query(0, ge=0, description="Runs a saltar (paginación)"),
     platform: Optional[str] = Query(None, description="Filtrar por plataforma (ej: 'egestiona')"),
     request: Request = None,
 ):
@@ -62,7 +64,9 @@ async def get_runs_summary(
     """
     # SPRINT C2.22A: Extraer tenant_id del request
     tenant_ctx = get_tenant_from_request(request)
-    summaries = list_run_summaries(limit=limit, platform=platform, tenant_id=tenant_ctx.tenant_id)
+    summaries = await run_storage_io(
+        list_run_summaries, limit=limit, platform=platform, tenant_id=tenant_ctx.tenant_id, offset=offset
+    )
     
     return {
         "status": "ok",
@@ -34,11 +34,13 @@ from backend.executor.runs_viewer import create_runs_viewer_router
 from backend.config import BATCH_RUNS_DIR
 from backend.executor.config_viewer import create_config_viewer_router
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
+from backend.shared.write_behind_v1 import flush_learning_stores
 from backend.adapters.egestiona.flows import router as egestiona_router
 from backend.adapters.egestiona.execute_plan_gate import router as egestiona_execute_router
 from backend.adapters.egestiona.execute_plan_headful_gate import router as egestiona_execute_headful_router
 from backend.adapters.egestiona.execute_auto_upload_gate import router as egestiona_execute_auto_upload_router
 from backend.adapters.egestiona.headful_run_routes import router as egestiona_headful_run_router
+from backend.adapters.egestiona.background_run_routes import router as egestiona_background_run_router
 from backend.api.runs_summary_routes import router as runs_summary_router
 from backend.api.auto_upload_routes import router as auto_upload_router  # SPRINT C2.17
 from backend.api.matching_debug_routes import router as matching_debug_router
@@ -129,6 +131,7 @@ app.include_router(egestiona_execute_router)
 app.include_router(egestiona_execute_headful_router)
 app.include_router(egestiona_execute_auto_upload_router)
 app.include_router(egestiona_headful_run_router)
+app.include_router(egestiona_background_run_router)
 app.include_router(runs_summary_router)
 app.include_router(auto_upload_router)  # SPRINT C2.17
 app.include_router(matching_debug_router)  # SPRINT C2.18A
@@ -199,6 +202,13 @@ async def startup_event():
     data_dir = ensure_data_layout(base_dir=DATA_DIR)
     print(f"Using data dir: {data_dir.resolve()}")
     
+    # Servicio compartido de config/repositorio: stores y cachés listos antes del primer request
+    from backend.repository.repository_service_v1 import get_repository_service
+    try:
+        get_repository_service(data_dir).warm_up()
+    except Exception as e:
+        print(f"[repository_service] Warm-up fallido (se cargará bajo demanda): {e}")
+    
     # SPRINT C2.31: Asegurar dataset demo si estamos en modo demo
     from backend.shared.demo_dataset import is_demo_mode, ensure_demo_dataset
     if is_demo_mode():
@@ -273,6 +283,16 @@ async def shutdown_event():
     from backend.cae.job_queue_v1 import stop_worker
     stop_worker()
     
+    # Runs eGestiona en segundo plano: cancelar los encolados y pedir parada a los activos
+    from backend.runs.background_runs_v1 import shutdown_background_runs
+    shutdown_background_runs()
+    
+    # Volcar actualizaciones pendientes de memoria visual / RL / MemoryStore
+    flush_learning_stores()
+    
+    from backend.shared.storage_io_v1 import shutdown_storage_executor
+    shutdown_storage_executor()
+    
     # Cerramos el navegador solo si está iniciado (lazy initialization)
     if browser.page is not None:
         await browser.close()
@@ -1164,6 +1184,7 @@ async def agent_answer_endpoint(payload: AgentAnswerRequest):
                 
                 # Guardar en memoria
                 memory_store.save_platform(platform_memory)
+                flush_learning_stores()
                 logger.info(f"[agent_answer_endpoint] Credenciales guardadas en memoria para {portal}")
                 print(f"[DEBUG_AGENT] Credenciales guardadas: empresa={parsed_creds.get('company_code')}, usuario={parsed_creds.get('username')}")
             except Exception as e:
@@ -1898,6 +1919,7 @@ async def agent_answer_endpoint(payload: AgentAnswerRequest):
                     
                     # Guardar
                     memory_store.save_platform(platform_memory)
+                    flush_learning_stores()
                     logger.info(f"[agent_answer_endpoint] Memoria actualizada para plataforma {portal}")
             except Exception as e:
                 logger.warning(f"[agent_answer_endpoint] Error al guardar en memoria: {e}", exc_info=True)
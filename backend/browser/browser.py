@@ -1,3 +1,4 @@
+import time
 from typing import Dict, Any
 from playwright.async_api import (
     async_playwright,
@@ -6,6 +7,77 @@ from playwright.async_api import (
 from backend.shared.models import BrowserObservation
 
 
+_MAX_TEXT_EXCERPT = 3000
+_CLICKABLE_SELECTORS = [
+    "a",
+    "button",
+    "[role='button']",
+    "input[type='button']",
+    "input[type='submit']",
+]
+_INPUT_SELECTORS = [
+    "input[type='text']",
+    "input[type='search']",
+    "input[type='email']",
+    "input[type='password']",
+    "textarea",
+]
+
+# Observación en una sola pasada. La visibilidad replica is_visible() de Playwright:
+# bounding box no vacía y visibility distinta de hidden.
+_OBSERVATION_JS = """
+(args) => {
+    const isVisible = (el) => {
+        const rect = el.getBoundingClientRect();
+        if (!rect || rect.width === 0 || rect.height === 0) return false;
+        const style = window.getComputedStyle(el);
+        return !style || style.visibility !== 'hidden';
+    };
+    const bodyText = document.body ? (document.body.innerText || '') : '';
+    const clickables = [];
+    for (const selector of args.clickableSelectors) {
+        let elements = [];
+        try { elements = document.querySelectorAll(selector); } catch (e) { continue; }
+        for (const el of elements) {
+            try {
+                if (!isVisible(el)) continue;
+                clickables.push(el.innerText || '');
+            } catch (e) { continue; }
+        }
+    }
+    const inputs = [];
+    for (const selector of args.inputSelectors) {
+        let elements = [];
+        try { elements = document.querySelectorAll(selector); } catch (e) { continue; }
+        for (const el of elements) {
+            try {
+                if (!isVisible(el)) continue;
+                let labelText = '';
+                const id = el.getAttribute('id');
+                if (id) {
+                    const label = document.querySelector('label[for="' + CSS.escape(id) + '"]');
+                    if (label) labelText = label.innerText || '';
+                }
+                inputs.push([
+                    el.getAttribute('placeholder') || '',
+                    el.getAttribute('aria-label') || '',
+                    el.getAttribute('name') || '',
+                    labelText,
+                ]);
+            } catch (e) { continue; }
+        }
+    }
+    return {
+        url: location.href,
+        title: document.title || '',
+        bodyText: bodyText.slice(0, args.maxTextChars + 1),
+        clickables: clickables,
+        inputs: inputs,
+    };
+}
+"""
+
+
 class BrowserController:
     """
     Controla un navegador Chromium mediante Playwright (API asíncrona).
@@ -682,10 +754,79 @@ class BrowserController:
         This method only reads the page, it does not perform any actions.
         
         This is the API that will be used by the future planner.
+        
+        Todo se recoge en un único page.evaluate (visibilidad calculada en la página):
+        una sola ida y vuelta en lugar de dos por elemento clicable/input.
         """
         if not self.page:
             raise RuntimeError("BrowserController no está iniciado. Llama a start() primero.")
 
+        started = time.perf_counter()
+        try:
+            raw = await self.page.evaluate(_OBSERVATION_JS, {
+                "clickableSelectors": _CLICKABLE_SELECTORS,
+                "inputSelectors": _INPUT_SELECTORS,
+                "maxTextChars": _MAX_TEXT_EXCERPT,
+            })
+        except Exception:
+            observation = await self._get_observation_legacy()
+            observation.timings_ms = {
+                "total_ms": round((time.perf_counter() - started) * 1000.0, 2),
+                "roundtrips": None,
+            }
+            return observation
+        evaluate_ms = (time.perf_counter() - started) * 1000.0
+
+        url = ""
+        try:
+            url = self.page.url or raw.get("url") or ""
+        except Exception:
+            url = raw.get("url") or ""
+
+        body_text = raw.get("bodyText") or ""
+        visible_text_excerpt = body_text[:_MAX_TEXT_EXCERPT]
+        if len(body_text) > _MAX_TEXT_EXCERPT:
+            visible_text_excerpt += "..."
+
+        clickable_texts: list[str] = []
+        seen_texts = set()
+        for text in raw.get("clickables") or []:
+            # Normalize and filter
+            text_normalized = " ".join((text or "").split())
+            if text_normalized and len(text_normalized) >= 2:
+                text_lower = text_normalized.lower()
+                if text_lower not in seen_texts:
+                    seen_texts.add(text_lower)
+                    clickable_texts.append(text_normalized)
+
+        input_hints: list[str] = []
+        seen_hints = set()
+        for candidates in raw.get("inputs") or []:
+            # placeholder, aria-label, name, label[for=id] (mismo orden que antes)
+            for candidate in candidates:
+                hint = (candidate or "").strip()
+                if hint and hint.lower() not in seen_hints:
+                    seen_hints.add(hint.lower())
+                    input_hints.append(hint)
+
+        return BrowserObservation(
+            url=url,
+            title=raw.get("title") or "",
+            visible_text_excerpt=visible_text_excerpt,
+            clickable_texts=clickable_texts,
+            input_hints=input_hints,
+            timings_ms={
+                "evaluate_ms": round(evaluate_ms, 2),
+                "total_ms": round((time.perf_counter() - started) * 1000.0, 2),
+                "roundtrips": 1,
+            },
+        )
+
+    async def _get_observation_legacy(self) -> BrowserObservation:
+        """
+        Observación elemento a elemento (query_selector_all + is_visible/inner_text).
+        Solo se usa como fallback si el page.evaluate de get_observation falla.
+        """
         # Initialize defaults
         url = ""
         title = ""
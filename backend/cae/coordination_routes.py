@@ -46,8 +46,8 @@ def _create_fake_snapshot(scope: CoordinationScopeV1) -> CoordinationSnapshotV1:
     created_at = datetime.utcnow()
     
     # Intentar encontrar tipos E2E existentes para usar en el snapshot
-    from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
-    store = DocumentRepositoryStoreV1()
+    from backend.repository.repository_service_v1 import get_repository_store
+    store = get_repository_store()
     e2e_types = [t for t in store.list_types(include_inactive=True) if t.type_id.startswith("E2E_")]
     
     # Crear 2 pending items deterministas
@@ -175,8 +175,8 @@ def _create_real_snapshot(scope: CoordinationScopeV1) -> CoordinationSnapshotV1:
             pending_items.append(item)
         
         # Obtener info de plataforma (sin secretos)
-        from backend.repository.config_store_v1 import ConfigStoreV1
-        config_store = ConfigStoreV1(base_dir=str(DATA_DIR))
+        from backend.repository.repository_service_v1 import get_config_store
+        config_store = get_config_store(DATA_DIR)
         platforms = config_store.load_platforms()
         plat = next((p for p in platforms.platforms if p.key == scope.platform_key), None)
         coord = None
@@ -293,8 +293,8 @@ async def get_snapshot_doc_candidates(
     type_id = pending_item.type_id
     if not type_id and pending_item.type_alias_candidates:
         # Probar cada alias hasta encontrar uno que exista
-        from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
-        store = DocumentRepositoryStoreV1()
+        from backend.repository.repository_service_v1 import get_repository_store
+        store = get_repository_store()
         for alias in pending_item.type_alias_candidates:
             doc_type = store.get_type(alias)
             if doc_type:
@@ -0,0 +1,546 @@
+"""
+Sesión eGestiona reutilizable para ejecutar todos los items de un plan CAE.
+
+Antes, _execute_egestiona_upload_real abría sync_playwright, lanzaba Chromium, hacía login
+(+2.5 s de espera), navegaba a Gestion(3) y esperaba el grid por cada item: un plan de 40
+items pagaba 40 lanzamientos de navegador y 40 logins.
+
+- EgestionaPlanSessionV1: un navegador, una sesión autenticada y el frame de listado abierto
+  durante el plan. La autenticación pasa por el pool de storage_state de los flujos headful
+  (adapters/egestiona/session_pool.py), así que un plan puede no necesitar login.
+  El grid se extrae una vez y solo se vuelve a extraer tras cada subida (o tras recuperar).
+  Un item fallido se recupera con page.reload() (re-login solo si la sesión del portal
+  caducó) en lugar de lanzar un navegador nuevo.
+- EgestionaPlanSessionPoolV1: una sesión por (plataforma, coordinación) durante un plan. Si
+  el login falla, el error se recuerda y no se reintenta en cada item (evita bloqueos de cuenta).
+
+Las esperas son por condición (adapters/egestiona/wait_conditions.py): frame de listado,
+filas del grid, red en calma, cierre del modal de detalle tras enviar; nada de pausas fijas
+entre pasos.
+
+Playwright sync: una sesión debe usarse siempre desde el hilo que la abrió.
+Config: CAE_EGESTIONA_HEADLESS (por defecto 0), CAE_EGESTIONA_SLOW_MO_MS (por defecto 300).
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.adapters.egestiona.wait_conditions import (
+    wait_for_frame,
+    wait_for_grid_idle,
+    wait_for_grid_rows,
+    wait_for_modal_closed,
+    wait_for_network_quiet,
+    wait_for_portal_ready,
+    wait_until,
+)
+from backend.cae.submission_models_v1 import CAESubmissionItemV1
+
+
+DEFAULT_LOGIN_URL = "https://coordinate.egestiona.es/login?origen=subcontrata"
+DEFAULT_SLOW_MO_MS = 300
+WAIT_AFTER_LOGIN_S = 2.5
+VIEWPORT = {"width": 1600, "height": 1000}
+LIST_TILE_SELECTOR = 'a.listado_link[href="javascript:Gestion(3);"]'
+
+SUBMIT_SELECTORS = [
+    'button:has-text("Enviar documento")',
+    'button:has-text("Enviar archivo")',
+    'button:has-text("Enviar")',
+    'button:has-text("Guardar")',
+    'input[type="submit"][value*="Enviar"]',
+    'input[type="submit"][value*="Guardar"]',
+]
+
+# Click en la fila del grid cuyas celdas coinciden con las extraídas (_raw_cells) del item:
+# la sesión es compartida entre items, así que la fila 0 no es necesariamente la del item.
+_CLICK_ROW_JS = """(target) => {
+  function norm(s){ return (s||'').replace(/\\s+/g,' ').trim(); }
+  const tbls = Array.from(document.querySelectorAll('table.obj.row20px'));
+  if(!tbls.length) return {ok: false, reason: 'no_table'};
+  if(!target || !target.length) return {ok: false, reason: 'no_target'};
+  const wanted = (target || []).join('\\u0001');
+  for(const tbl of tbls){
+    for(const tr of Array.from(tbl.querySelectorAll('tbody tr'))){
+      const cells = Array.from(tr.querySelectorAll('td')).map(td => norm(td.innerText));
+      if(cells.join('\\u0001') !== wanted) continue;
+      const a = tr.querySelector('a');
+      if(a) { a.click(); return {ok: true, kind: 'a'}; }
+      const img = tr.querySelector('img[onclick]');
+      if(img) { img.click(); return {ok: true, kind: 'img'}; }
+      tr.click();
+      return {ok: true, kind: 'tr'};
+    }
+  }
+  return {ok: false, reason: 'row_not_found'};
+}"""
+
+_DATE_SELECTOR_JS = """() => {
+  function norm(s){ return (s||'').replace(/\\s+/g,' ').trim(); }
+  const labels = Array.from(document.querySelectorAll('*')).filter(el => {
+    const t = norm(el.innerText).toLowerCase();
+    return t.includes('inicio vigencia');
+  });
+  if(!labels.length) return null;
+  const label = labels[0];
+  const inputs = Array.from(document.querySelectorAll('input[type="text"], input[type="date"]'));
+  for(const inp of inputs){
+    const r1 = label.getBoundingClientRect();
+    const r2 = inp.getBoundingClientRect();
+    const dist = Math.sqrt(Math.pow(r1.left - r2.left, 2) + Math.pow(r1.top - r2.top, 2));
+    if(dist < 200 && inp.offsetWidth > 0 && inp.offsetHeight > 0){
+      if(inp.id) return '#' + inp.id;
+      if(inp.name) return `input[name="${inp.name}"]`;
+    }
+  }
+  return null;
+}"""
+
+
+def _headless_from_env() -> bool:
+    return os.getenv("CAE_EGESTIONA_HEADLESS", "0").strip().lower() in ("1", "true", "yes")
+
+
+def _slow_mo_from_env() -> int:
+    try:
+        return max(0, int(os.getenv("CAE_EGESTIONA_SLOW_MO_MS", str(DEFAULT_SLOW_MO_MS))))
+    except ValueError:
+        return DEFAULT_SLOW_MO_MS
+
+
+def match_item_rows(rows: List[Dict[str, Any]], item: CAESubmissionItemV1) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Filas del grid (canonicalizadas, originales) que coinciden con empresa/trabajador del item."""
+    from backend.adapters.egestiona.grid_extract import canonicalize_row
+    from backend.shared.text_normalizer import normalize_text_robust, text_contains
+
+    company_key_norm = normalize_text_robust(item.company_key) if item.company_key else None
+    person_key_norm = normalize_text_robust(item.person_key) if item.person_key else None
+
+    matching_rows = []
+    for row_data in rows:
+        row = canonicalize_row(row_data)
+        empresa_match = True
+        elemento_match = True
+
+        if company_key_norm:
+            empresa_norm = normalize_text_robust(str(row.get("empresa") or ""))
+            empresa_match = text_contains(empresa_norm, company_key_norm)
+
+        if person_key_norm:
+            elemento_norm = normalize_text_robust(str(row.get("elemento") or ""))
+            elemento_match = text_contains(elemento_norm, person_key_norm)
+
+        if empresa_match and elemento_match:
+            matching_rows.append((row, row_data))
+    return matching_rows
+
+
+class EgestionaPlanSessionV1:
+    """Sesión Playwright (sync) con login y frame de listado reutilizables entre items."""
+
+    def __init__(
+        self,
+        coordination: str,
+        client_code: str,
+        username: str,
+        password: str,
+        *,
+        headless: Optional[bool] = None,
+        slow_mo: Optional[int] = None,
+        login_url: Optional[str] = None,
+        base_dir: Optional[Path] = None,
+    ):
+        self.coordination = coordination
+        self.client_code = client_code
+        self.username = username
+        self.password = password
+        self.headless = _headless_from_env() if headless is None else headless
+        self.slow_mo = _slow_mo_from_env() if slow_mo is None else slow_mo
+        self.login_url = login_url
+        self.base_dir = base_dir
+        self.page: Any = None
+        self._context: Any = None
+        self.list_frame: Any = None
+        self._playwright: Any = None
+        self._browser: Any = None
+        self._rows: Optional[List[Dict[str, Any]]] = None
+        self.stats = {
+            "browser_launches": 0,
+            "logins": 0,
+            "session_reused": 0,
+            "list_navigations": 0,
+            "grid_extractions": 0,
+            "recoveries": 0,
+            "items": 0,
+        }
+
+    # ------------------------------------------------------------------ ciclo de vida
+
+    def open(self, screenshots_dir: Optional[Path] = None) -> None:
+        """Lanza el navegador, hace login y deja abierto el frame de listado."""
+        self._launch()
+        self._login(screenshots_dir)
+        self._navigate_to_list(screenshots_dir)
+
+    def close(self) -> None:
+        for closer in (
+            lambda: self._browser.close() if self._browser else None,
+            lambda: self._playwright.stop() if self._playwright else None,
+        ):
+            try:
+                closer()
+            except Exception:
+                pass
+        self._browser = self._playwright = self._context = self.page = self.list_frame = None
+        self._rows = None
+
+    def recover(self) -> None:
+        """
+        Recupera la sesión tras un item fallido: recarga la página, repite el login solo si
+        el portal la ha expulsado y vuelve al listado (el grid se re-extrae).
+        """
+        self.stats["recoveries"] += 1
+        self.list_frame = None
+        self._rows = None
+        try:
+            self.page.reload(wait_until="domcontentloaded", timeout=60000)
+        except Exception:
+            pass
+        if self._needs_login():
+            self._login(None)
+        self._navigate_to_list(None)
+
+    # ------------------------------------------------------------------ pasos del portal
+
+    def _launch(self) -> None:
+        from playwright.sync_api import sync_playwright
+
+        self._playwright = sync_playwright().start()
+        self._browser = self._playwright.chromium.launch(headless=self.headless, slow_mo=self.slow_mo)
+        self.stats["browser_launches"] += 1
+
+    def _resolve_login_url(self) -> str:
+        if self.login_url:
+            return self.login_url
+        from backend.adapters.egestiona.frame_scan_headful import LOGIN_URL_PREVIOUS_SUCCESS
+        return LOGIN_URL_PREVIOUS_SUCCESS or DEFAULT_LOGIN_URL
+
+    def _resolve_base_dir(self) -> Path:
+        if self.base_dir is None:
+            from backend.repository.data_bootstrap_v1 import ensure_data_layout
+            self.base_dir = ensure_data_layout()
+        return self.base_dir
+
+    def _login(self, screenshots_dir: Optional[Path]) -> None:
+        """
+        Primer acceso: sesión del pool de storage_state (login solo si no hay sesión viva).
+        Tras una expulsión (recover): login en la página actual y se guarda el nuevo estado.
+        """
+        from backend.adapters.egestiona.session_pool import (
+            egestiona_session_key_for,
+            get_session_pool,
+            login_egestiona,
+            open_egestiona_session,
+        )
+
+        base_dir = self._resolve_base_dir()
+        login_url = self._resolve_login_url()
+        if self.page is None:
+            self._context, self.page, reused = open_egestiona_session(
+                self._browser,
+                base_dir=base_dir,
+                platform="egestiona",
+                coordination=self.coordination,
+                client_code=self.client_code,
+                username=self.username,
+                password=self.password,
+                login_url=login_url,
+                viewport=VIEWPORT,
+                wait_after_login_s=WAIT_AFTER_LOGIN_S,
+            )
+            self.stats["session_reused" if reused else "logins"] += 1
+        else:
+            login_egestiona(
+                self.page,
+                login_url=login_url,
+                client_code=self.client_code,
+                username=self.username,
+                password=self.password,
+            )
+            wait_for_portal_ready(self.page, phase="login")
+            key = egestiona_session_key_for(
+                coordination=self.coordination, username=self.username, client_code=self.client_code
+            )
+            get_session_pool(base_dir).save(self._context, key)
+            self.stats["logins"] += 1
+
+        if screenshots_dir:
+            self.page.screenshot(path=str(screenshots_dir / "01_login.png"), full_page=True)
+
+    def _needs_login(self) -> bool:
+        url = (self.page.url or "").lower()
+        return "login" in url or self.page.frame(name="nm_contenido") is None
+
+    def _find_list_frame(self) -> Any:
+        fr = self.page.frame(name="f3")
+        if fr:
+            return fr
+        for fr2 in self.page.frames:
+            u = (fr2.url or "").lower()
+            if ("buscador.asp" in u) and ("apartado_id=3" in u):
+                return fr2
+        return None
+
+    @staticmethod
+    def _frame_has_grid(fr: Any) -> bool:
+        try:
+            return fr.locator("table.obj.row20px").count() > 0 and fr.locator("table.hdr").count() > 0
+        except Exception:
+            return False
+
+    def _navigate_to_list(self, screenshots_dir: Optional[Path]) -> None:
+        page = self.page
+        frame_dashboard = page.frame(name="nm_contenido")
+        if not frame_dashboard:
+            raise RuntimeError("FRAME_NOT_FOUND: nm_contenido")
+
+        if screenshots_dir:
+            page.screenshot(path=str(screenshots_dir / "02_dashboard.png"), full_page=True)
+
+        # Click Gestion(3)
+        frame_dashboard.locator(LIST_TILE_SELECTOR).first.wait_for(state="visible", timeout=20000)
+        frame_dashboard.locator(LIST_TILE_SELECTOR).first.click(timeout=20000)
+
+        waited = wait_for_frame(page, self._find_list_frame, ready=self._frame_has_grid, timeout_s=15.0)
+        if not waited:
+            # Intentar click Buscar
+            for fr in page.frames:
+                try:
+                    btn = fr.get_by_text("Buscar", exact=True)
+                    if btn.count() > 0:
+                        btn.first.click(timeout=10000)
+                        break
+                except Exception:
+                    continue
+            waited = wait_for_frame(page, self._find_list_frame, ready=self._frame_has_grid, timeout_s=20.0)
+            if not waited:
+                raise RuntimeError("GRID_NOT_FOUND: no se pudo cargar el grid de pendientes")
+
+        list_frame = waited.value
+        grid = wait_for_grid_rows(list_frame, timeout_s=10.0)
+        if not grid or grid.value.get("registros") == 0:
+            raise RuntimeError("GRID_EMPTY: el grid no tiene filas")
+
+        self.list_frame = list_frame
+        self._rows = None
+        self.stats["list_navigations"] += 1
+
+    def _list_frame_usable(self) -> bool:
+        if self.list_frame is None:
+            return False
+        try:
+            if self.list_frame.is_detached():
+                return False
+        except Exception:
+            return False
+        return self._frame_has_grid(self.list_frame)
+
+    def ensure_list_frame(self) -> Any:
+        """Frame de listado abierto; solo se vuelve a navegar si el portal lo descartó."""
+        if not self._list_frame_usable():
+            self._navigate_to_list(None)
+        return self.list_frame
+
+    def grid_rows(self) -> List[Dict[str, Any]]:
+        """Filas del grid; se extraen una vez y tras cada subida (invalidate_grid)."""
+        if self._rows is None:
+            from backend.adapters.egestiona.grid_extract import extract_dhtmlx_grid
+
+            self._rows = extract_dhtmlx_grid(self.list_frame).get("rows", [])
+            self.stats["grid_extractions"] += 1
+        return self._rows
+
+    def invalidate_grid(self) -> None:
+        self._rows = None
+
+    def _attach_pdf(self, pdf_path: Path) -> None:
+        page = self.page
+        file_input = page.locator("input[type='file']:visible")
+        if file_input.count() == 0:
+            file_input = page.locator("input[type='file']")
+
+        if file_input.count() > 0:
+            file_input.first.set_input_files(str(pdf_path))
+            return
+        # Fallback: buscar botón "Adjuntar"
+        try:
+            attach = page.get_by_text("Adjuntar fichero", exact=False)
+            if attach.count() == 0:
+                attach = page.get_by_text("Adjuntar", exact=False)
+            if attach.count() > 0:
+                with page.expect_file_chooser(timeout=15000) as fc_info:
+                    attach.first.click(timeout=10000)
+                chooser = fc_info.value
+                chooser.set_files(str(pdf_path))
+            else:
+                raise RuntimeError("FILE_INPUT_NOT_FOUND: no se encontró input de archivo ni botón Adjuntar")
+        except Exception as e:
+            raise RuntimeError(f"FILE_INPUT_NOT_FOUND: {str(e)}")
+
+    def _fill_valid_from(self, date_ddmmyyyy: str) -> None:
+        # Buscar input de fecha cerca de label "Inicio Vigencia" (no crítico)
+        try:
+            date_selector = self.page.evaluate(_DATE_SELECTOR_JS)
+            if date_selector:
+                date_input = self.page.locator(date_selector)
+                if date_input.count() > 0:
+                    date_input.first.fill(date_ddmmyyyy, timeout=10000)
+        except Exception:
+            pass
+
+    def _submit(self, confirmation_path: Path) -> None:
+        # Confirmar (buscar botón Enviar/Guardar); si no hay botón claro puede ser auto-submit
+        try:
+            for selector in SUBMIT_SELECTORS:
+                try:
+                    btn = self.page.locator(selector)
+                    if btn.count() > 0:
+                        btn.first.click(timeout=10000)
+                        break
+                except Exception:
+                    continue
+            wait_for_network_quiet(self.page, phase="upload", timeout_s=10.0)
+            self.page.screenshot(path=str(confirmation_path), full_page=True)
+        except Exception:
+            pass
+
+        # Volver al listado antes del siguiente item: con el detalle aún abierto, la espera
+        # del siguiente detalle (input de fichero) la satisfaría este modal y el PDF iría al
+        # requisito equivocado. El listado se da por perdido y el item falla (recover).
+        if not wait_for_modal_closed(self.page, phase="upload"):
+            self.list_frame = None
+            raise RuntimeError("MODAL_NOT_CLOSED: el detalle del pendiente sigue abierto tras enviar")
+        if self.list_frame is not None:
+            wait_for_grid_idle(self.list_frame, phase="grid_load")
+
+    def upload_item(
+        self,
+        item: CAESubmissionItemV1,
+        pdf_path: Path,
+        screenshot_paths: Dict[str, Path],
+        date_ddmmyyyy: Optional[str] = None,
+    ) -> None:
+        """
+        Sube el PDF de un item desde el listado abierto (localizar fila, detalle, adjuntar,
+        fecha de vigencia, confirmar). Lanza excepción si el item no se puede subir.
+        """
+        self.stats["items"] += 1
+        list_frame = self.ensure_list_frame()
+        try:
+            list_frame.locator("body").screenshot(path=str(screenshot_paths["03_listado"]))
+        except Exception:
+            self.page.screenshot(path=str(screenshot_paths["03_listado"]), full_page=True)
+
+        # Buscar fila que coincida con el sujeto del item
+        # TODO: Mejorar matching para usar type_id y period_key del item
+        matching_rows = match_item_rows(self.grid_rows(), item)
+        if len(matching_rows) != 1:
+            raise RuntimeError(
+                f"Se encontraron {len(matching_rows)} filas que coinciden con el sujeto (esperado: 1). "
+                "No se puede proceder de forma segura."
+            )
+
+        # A partir del click el listado cambia: el grid se re-extrae en el siguiente item
+        self.invalidate_grid()
+        _, raw_row = matching_rows[0]
+        click_success = list_frame.evaluate(_CLICK_ROW_JS, raw_row.get("_raw_cells") or [])
+        if not click_success.get("ok"):
+            raise RuntimeError(
+                f"No se pudo hacer click en la fila del pendiente ({click_success.get('reason', 'unknown')})"
+            )
+
+        # Esperar modal de detalle (input de fichero o botón Adjuntar)
+        wait_until(
+            lambda: self.page.locator("input[type='file']").count() > 0
+            or self.page.get_by_text("Adjuntar", exact=False).count() > 0,
+            condition="detail_modal",
+            phase="upload",
+            timeout_s=15.0,
+            target=self.page,
+        )
+        self.page.screenshot(path=str(screenshot_paths["04_detail"]), full_page=True)
+
+        self._attach_pdf(pdf_path)
+        if date_ddmmyyyy:
+            self._fill_valid_from(date_ddmmyyyy)
+        self.page.screenshot(path=str(screenshot_paths["05_uploaded"]), full_page=True)
+
+        self._submit(screenshot_paths["06_confirmation"])
+
+
+class EgestionaPlanSessionPoolV1:
+    """Sesiones abiertas por (plataforma, coordinación) durante la ejecución de un plan."""
+
+    def __init__(self, session_factory: Optional[Callable[..., EgestionaPlanSessionV1]] = None):
+        self._factory = session_factory or EgestionaPlanSessionV1
+        self._sessions: Dict[Tuple[str, str], EgestionaPlanSessionV1] = {}
+        self._open_errors: Dict[Tuple[str, str], str] = {}
+        self._stats_closed: Dict[str, int] = {}
+
+    def get(
+        self,
+        platform_key: str,
+        coordination: str,
+        client_code: str,
+        username: str,
+        password: str,
+        screenshots_dir: Optional[Path] = None,
+    ) -> EgestionaPlanSessionV1:
+        """
+        Sesión de (platform_key, coordination); la abre (login) en el primer uso.
+
+        Raises:
+            RuntimeError: Si el login de esa coordinación ya falló en este plan
+        """
+        key = (platform_key, coordination)
+        if key in self._open_errors:
+            raise RuntimeError(f"Sesión no disponible para '{coordination}': {self._open_errors[key]}")
+        session = self._sessions.get(key)
+        if session is None:
+            session = self._factory(coordination, client_code, username, password)
+            try:
+                session.open(screenshots_dir)
+            except Exception as e:
+                self._open_errors[key] = str(e)
+                self._retire(session)
+                raise
+            self._sessions[key] = session
+        return session
+
+    def discard(self, session: EgestionaPlanSessionV1) -> None:
+        """Cierra una sesión irrecuperable; el siguiente item de esa coordinación abre otra."""
+        for key, current in list(self._sessions.items()):
+            if current is session:
+                del self._sessions[key]
+        self._retire(session)
+
+    def _retire(self, session: EgestionaPlanSessionV1) -> None:
+        for name, value in session.stats.items():
+            self._stats_closed[name] = self._stats_closed.get(name, 0) + value
+        session.close()
+
+    def close_all(self) -> None:
+        for session in list(self._sessions.values()):
+            self._retire(session)
+        self._sessions.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores agregados (logins, extracciones de grid, recuperaciones...)."""
+        totals = dict(self._stats_closed)
+        for session in self._sessions.values():
+            for name, value in session.stats.items():
+                totals[name] = totals.get(name, 0) + value
+        return totals
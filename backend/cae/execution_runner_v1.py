@@ -10,6 +10,8 @@ import json
 import os
 import uuid
 import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, Callable
@@ -17,6 +19,7 @@ from typing import Optional, Callable
 from backend.cae.submission_models_v1 import CAESubmissionPlanV1, CAESubmissionItemV1
 from backend.cae.execution_models_v1 import RunResultV1
 from backend.cae.job_queue_models_v1 import CAEJobProgressV1
+from backend.cae.egestiona_session_v1 import EgestionaPlanSessionPoolV1, EgestionaPlanSessionV1
 from backend.config import DATA_DIR
 
 
@@ -26,6 +29,19 @@ CAE_WRITE_ALLOWLIST = {
     "person_key": "EMILIO",  # O None si scope company
 }
 
+# Coordinación con la que el runner hace login (si no existe, la primera configurada)
+DEFAULT_COORDINATION_LABEL = "Kern"
+
+
+def pick_execution_coordination(platform):
+    """Coordinación (CoordinationV1) que usa el runner para loguearse en la plataforma, o None."""
+    if platform is None:
+        return None
+    coord = next((c for c in platform.coordinations if c.label == DEFAULT_COORDINATION_LABEL), None)
+    if not coord and platform.coordinations:
+        coord = platform.coordinations[0]
+    return coord
+
 
 class CAEExecutionRunnerV1:
     """Runner para ejecutar planes CAE."""
@@ -34,6 +50,15 @@ class CAEExecutionRunnerV1:
         self.evidence_base_dir = Path(DATA_DIR) / "docs" / "evidence" / "cae_runs"
         self.evidence_base_dir.mkdir(parents=True, exist_ok=True)
         self.executor_mode = os.getenv("CAE_EXECUTOR_MODE", "REAL")  # REAL o FAKE
+        # REAL: "plan" = una sesión eGestiona (login) por plan; "item" = navegador y login por item
+        self.session_mode = os.getenv("CAE_EGESTIONA_SESSION_MODE", "plan").strip().lower()
+        self.session_factory = EgestionaPlanSessionV1
+    
+    def _create_session_pool(self, dry_run: bool) -> Optional[EgestionaPlanSessionPoolV1]:
+        """Pool de sesiones para una ejecución REAL en modo "plan" (None en FAKE, dry_run o modo "item")."""
+        if self.executor_mode == "FAKE" or dry_run or self.session_mode == "item":
+            return None
+        return EgestionaPlanSessionPoolV1(session_factory=self.session_factory)
     
     def execute_plan_egestiona(
         self,
@@ -90,57 +115,64 @@ class CAEExecutionRunnerV1:
         first_error = None
         stop_reason = None
         
-        for idx, item in enumerate(plan.items):
-            # Crear subcarpeta por item
-            item_evidence_dir = evidence_dir / f"item_{idx + 1}"
-            item_evidence_dir.mkdir(exist_ok=True)
-            item_screenshots_dir = item_evidence_dir / "screenshots"
-            item_screenshots_dir.mkdir(exist_ok=True)
-            
-            # Ejecutar item
-            if self.executor_mode == "FAKE" or dry_run:
-                item_result = self._execute_fake(
-                    plan=plan,
-                    item=item,
-                    run_id=f"{run_id}_item{idx + 1}",
-                    evidence_dir=item_evidence_dir,
-                    screenshots_dir=item_screenshots_dir,
-                    started_at=datetime.now(),
-                )
-            else:
-                item_result = self._execute_real(
-                    plan=plan,
-                    item=item,
-                    run_id=f"{run_id}_item{idx + 1}",
-                    evidence_dir=item_evidence_dir,
-                    screenshots_dir=item_screenshots_dir,
-                    started_at=datetime.now(),
-                )
-            
-            items_results.append({
-                "item_index": idx,
-                "item_type_id": item.type_id,
-                "item_period_key": item.period_key,
-                "status": item_result.status,
-                "error": item_result.error,
-            })
-            
-            if item_result.status == "SUCCESS":
-                items_success += 1
-            elif item_result.status == "BLOCKED":
-                items_blocked += 1
-                if not first_error:
-                    first_error = item_result.error
-                    stop_reason = "BLOCKED"
-                # Stop on first BLOCKED
-                break
-            elif item_result.status == "FAILED":
-                items_failed += 1
-                if not first_error:
-                    first_error = item_result.error
-                    stop_reason = "FAILED"
-                # Stop on first FAILED
-                break
+        session_pool = self._create_session_pool(dry_run)
+        try:
+            for idx, item in enumerate(plan.items):
+                # Crear subcarpeta por item
+                item_evidence_dir = evidence_dir / f"item_{idx + 1}"
+                item_evidence_dir.mkdir(exist_ok=True)
+                item_screenshots_dir = item_evidence_dir / "screenshots"
+                item_screenshots_dir.mkdir(exist_ok=True)
+                
+                # Ejecutar item
+                if self.executor_mode == "FAKE" or dry_run:
+                    item_result = self._execute_fake(
+                        plan=plan,
+                        item=item,
+                        run_id=f"{run_id}_item{idx + 1}",
+                        evidence_dir=item_evidence_dir,
+                        screenshots_dir=item_screenshots_dir,
+                        started_at=datetime.now(),
+                    )
+                else:
+                    item_result = self._execute_real(
+                        plan=plan,
+                        item=item,
+                        run_id=f"{run_id}_item{idx + 1}",
+                        evidence_dir=item_evidence_dir,
+                        screenshots_dir=item_screenshots_dir,
+                        started_at=datetime.now(),
+                        session_pool=session_pool,
+                    )
+                
+                items_results.append({
+                    "item_index": idx,
+                    "item_type_id": item.type_id,
+                    "item_period_key": item.period_key,
+                    "status": item_result.status,
+                    "error": item_result.error,
+                })
+                
+                if item_result.status == "SUCCESS":
+                    items_success += 1
+                elif item_result.status == "BLOCKED":
+                    items_blocked += 1
+                    if not first_error:
+                        first_error = item_result.error
+                        stop_reason = "BLOCKED"
+                    # Stop on first BLOCKED
+                    break
+                elif item_result.status == "FAILED":
+                    items_failed += 1
+                    if not first_error:
+                        first_error = item_result.error
+                        stop_reason = "FAILED"
+                    # Stop on first FAILED (en modo sesión el fallo queda aislado y se sigue)
+                    if session_pool is None:
+                        break
+        finally:
+            if session_pool is not None:
+                session_pool.close_all()
         
         # Determinar status final
         finished_at = datetime.now()
@@ -174,6 +206,8 @@ class CAEExecutionRunnerV1:
                 "items_blocked": items_blocked,
             },
         }
+        if session_pool is not None:
+            manifest["session"] = session_pool.stats()
         
         with open(evidence_dir / "manifest.json", "w", encoding="utf-8") as f:
             json.dump(manifest, f, indent=2, ensure_ascii=False)
@@ -295,139 +329,157 @@ class CAEExecutionRunnerV1:
             except (ValueError, TypeError):
                 fake_fail_after_item = None
         
-        for idx, item in enumerate(plan.items):
-            # Actualizar progreso antes de ejecutar item
-            if on_progress:
-                progress = CAEJobProgressV1(
-                    total_items=total_items,
-                    current_index=idx,
-                    items_success=items_success,
-                    items_failed=items_failed,
-                    items_blocked=items_blocked,
-                    percent=int((idx / total_items) * 100) if total_items > 0 else 0,
-                    message=f"Subiendo item {idx + 1}/{total_items}...",
-                )
-                # v1.9: Verificar si debe continuar (cancelación)
-                should_continue = on_progress(progress)
-                if not should_continue:
-                    # Cancelación solicitada
-                    stop_reason = "CANCELED"
-                    first_error = "Cancelado por usuario"
-                    break
-            
-            # Crear subcarpeta por item
-            item_evidence_dir = evidence_dir / f"item_{idx + 1}"
-            item_evidence_dir.mkdir(exist_ok=True)
-            item_screenshots_dir = item_evidence_dir / "screenshots"
-            item_screenshots_dir.mkdir(exist_ok=True)
-            
-            # Ejecutar item (en modo FAKE, usar sleep mínimo para simular progreso)
-            if self.executor_mode == "FAKE" or dry_run:
-                # v1.9.1: Verificar si debemos forzar fallo FAKE
-                if fake_fail_after_item is not None and idx >= fake_fail_after_item:
-                    # Forzar fallo después de N items
-                    print(f"[execution_runner] Forzando fallo FAKE en item {idx} (fake_fail_after_item={fake_fail_after_item})")
-                    item_result = RunResultV1(
-                        run_id=f"{run_id}_item{idx + 1}",
-                        status="FAILED",
-                        evidence_path=str(item_evidence_dir),
-                        summary={
-                            "total_items": 1,
-                            "items_success": 0,
-                            "items_failed": 1,
-                            "items_blocked": 0,
-                        },
-                        error=f"Forzado fallo FAKE después de {fake_fail_after_item} item(s) (CAE_FAKE_FAIL_AFTER_ITEM={fake_fail_after_item})",
-                        started_at=datetime.now(),
-                        finished_at=datetime.now(),
+        session_pool = self._create_session_pool(dry_run)
+        # Playwright sync: la sesión del plan se abre, usa y cierra siempre en el mismo hilo
+        session_thread = (
+            ThreadPoolExecutor(max_workers=1, thread_name_prefix="cae-egestiona-session")
+            if session_pool is not None
+            else None
+        )
+        try:
+            for idx, item in enumerate(plan.items):
+                # Actualizar progreso antes de ejecutar item
+                if on_progress:
+                    progress = CAEJobProgressV1(
+                        total_items=total_items,
+                        current_index=idx,
+                        items_success=items_success,
+                        items_failed=items_failed,
+                        items_blocked=items_blocked,
+                        percent=int((idx / total_items) * 100) if total_items > 0 else 0,
+                        message=f"Subiendo item {idx + 1}/{total_items}...",
                     )
-                    # Crear manifest de error
-                    manifest = {
-                        "run_id": item_result.run_id,
-                        "plan_id": plan.plan_id,
-                        "item": {
-                            "kind": item.kind,
-                            "type_id": item.type_id,
-                            "scope": item.scope,
-                            "company_key": item.company_key,
-                            "person_key": item.person_key,
-                            "period_key": item.period_key,
-                        },
-                        "started_at": item_result.started_at.isoformat(),
-                        "finished_at": item_result.finished_at.isoformat(),
-                        "mode": "FAKE",
-                        "dry_run": True,
-                        "error": item_result.error,
-                        "forced_failure": True,
-                    }
-                    with open(item_evidence_dir / "manifest.json", "w", encoding="utf-8") as f:
-                        json.dump(manifest, f, indent=2, ensure_ascii=False)
+                    # v1.9: Verificar si debe continuar (cancelación)
+                    should_continue = on_progress(progress)
+                    if not should_continue:
+                        # Cancelación solicitada
+                        stop_reason = "CANCELED"
+                        first_error = "Cancelado por usuario"
+                        break
+                
+                # Crear subcarpeta por item
+                item_evidence_dir = evidence_dir / f"item_{idx + 1}"
+                item_evidence_dir.mkdir(exist_ok=True)
+                item_screenshots_dir = item_evidence_dir / "screenshots"
+                item_screenshots_dir.mkdir(exist_ok=True)
+                
+                # Ejecutar item (en modo FAKE, usar sleep mínimo para simular progreso)
+                if self.executor_mode == "FAKE" or dry_run:
+                    # v1.9.1: Verificar si debemos forzar fallo FAKE
+                    if fake_fail_after_item is not None and idx >= fake_fail_after_item:
+                        # Forzar fallo después de N items
+                        print(f"[execution_runner] Forzando fallo FAKE en item {idx} (fake_fail_after_item={fake_fail_after_item})")
+                        item_result = RunResultV1(
+                            run_id=f"{run_id}_item{idx + 1}",
+                            status="FAILED",
+                            evidence_path=str(item_evidence_dir),
+                            summary={
+                                "total_items": 1,
+                                "items_success": 0,
+                                "items_failed": 1,
+                                "items_blocked": 0,
+                            },
+                            error=f"Forzado fallo FAKE después de {fake_fail_after_item} item(s) (CAE_FAKE_FAIL_AFTER_ITEM={fake_fail_after_item})",
+                            started_at=datetime.now(),
+                            finished_at=datetime.now(),
+                        )
+                        # Crear manifest de error
+                        manifest = {
+                            "run_id": item_result.run_id,
+                            "plan_id": plan.plan_id,
+                            "item": {
+                                "kind": item.kind,
+                                "type_id": item.type_id,
+                                "scope": item.scope,
+                                "company_key": item.company_key,
+                                "person_key": item.person_key,
+                                "period_key": item.period_key,
+                            },
+                            "started_at": item_result.started_at.isoformat(),
+                            "finished_at": item_result.finished_at.isoformat(),
+                            "mode": "FAKE",
+                            "dry_run": True,
+                            "error": item_result.error,
+                            "forced_failure": True,
+                        }
+                        with open(item_evidence_dir / "manifest.json", "w", encoding="utf-8") as f:
+                            json.dump(manifest, f, indent=2, ensure_ascii=False)
+                    else:
+                        # En modo FAKE, simular un pequeño delay para progreso visible
+                        await asyncio.sleep(0.05)  # Mínimo delay solo en FAKE
+                        item_result = self._execute_fake(
+                            plan=plan,
+                            item=item,
+                            run_id=f"{run_id}_item{idx + 1}",
+                            evidence_dir=item_evidence_dir,
+                            screenshots_dir=item_screenshots_dir,
+                            started_at=datetime.now(),
+                        )
                 else:
-                    # En modo FAKE, simular un pequeño delay para progreso visible
-                    await asyncio.sleep(0.05)  # Mínimo delay solo en FAKE
-                    item_result = self._execute_fake(
+                    # En modo REAL, ejecutar sincrónicamente (el callback se llama antes)
+                    execute_real = functools.partial(
+                        self._execute_real,
                         plan=plan,
                         item=item,
                         run_id=f"{run_id}_item{idx + 1}",
                         evidence_dir=item_evidence_dir,
                         screenshots_dir=item_screenshots_dir,
                         started_at=datetime.now(),
+                        session_pool=session_pool,
                     )
-            else:
-                # En modo REAL, ejecutar sincrónicamente (el callback se llama antes)
-                item_result = await asyncio.to_thread(
-                    self._execute_real,
-                    plan=plan,
-                    item=item,
-                    run_id=f"{run_id}_item{idx + 1}",
-                    evidence_dir=item_evidence_dir,
-                    screenshots_dir=item_screenshots_dir,
-                    started_at=datetime.now(),
-                )
-            
-            items_results.append({
-                "item_index": idx,
-                "item_type_id": item.type_id,
-                "item_period_key": item.period_key,
-                "status": item_result.status,
-                "error": item_result.error,
-            })
-            
-            if item_result.status == "SUCCESS":
-                items_success += 1
-            elif item_result.status == "BLOCKED":
-                items_blocked += 1
-                if not first_error:
-                    first_error = item_result.error
-                    stop_reason = "BLOCKED"
-                # Stop on first BLOCKED
-                break
-            elif item_result.status == "FAILED":
-                items_failed += 1
-                if not first_error:
-                    first_error = item_result.error
-                    stop_reason = "FAILED"
-                # Stop on first FAILED
-                break
-            
-            # Actualizar progreso después de ejecutar item
-            if on_progress:
-                progress = CAEJobProgressV1(
-                    total_items=total_items,
-                    current_index=idx + 1,
-                    items_success=items_success,
-                    items_failed=items_failed,
-                    items_blocked=items_blocked,
-                    percent=int(((idx + 1) / total_items) * 100) if total_items > 0 else 100,
-                    message=f"Completado item {idx + 1}/{total_items}",
-                )
-                # v1.9: Verificar si debe continuar (cancelación)
-                should_continue = on_progress(progress)
-                if not should_continue:
-                    # Cancelación solicitada
-                    stop_reason = "CANCELED"
-                    first_error = "Cancelado por usuario"
+                    if session_thread is not None:
+                        item_result = await asyncio.get_running_loop().run_in_executor(session_thread, execute_real)
+                    else:
+                        item_result = await asyncio.to_thread(execute_real)
+                
+                items_results.append({
+                    "item_index": idx,
+                    "item_type_id": item.type_id,
+                    "item_period_key": item.period_key,
+                    "status": item_result.status,
+                    "error": item_result.error,
+                })
+                
+                if item_result.status == "SUCCESS":
+                    items_success += 1
+                elif item_result.status == "BLOCKED":
+                    items_blocked += 1
+                    if not first_error:
+                        first_error = item_result.error
+                        stop_reason = "BLOCKED"
+                    # Stop on first BLOCKED
                     break
+                elif item_result.status == "FAILED":
+                    items_failed += 1
+                    if not first_error:
+                        first_error = item_result.error
+                        stop_reason = "FAILED"
+                    # Stop on first FAILED (en modo sesión el fallo queda aislado y se sigue)
+                    if session_pool is None:
+                        break
+                
+                # Actualizar progreso después de ejecutar item
+                if on_progress:
+                    progress = CAEJobProgressV1(
+                        total_items=total_items,
+                        current_index=idx + 1,
+                        items_success=items_success,
+                        items_failed=items_failed,
+                        items_blocked=items_blocked,
+                        percent=int(((idx + 1) / total_items) * 100) if total_items > 0 else 100,
+                        message=f"Completado item {idx + 1}/{total_items}",
+                    )
+                    # v1.9: Verificar si debe continuar (cancelación)
+                    should_continue = on_progress(progress)
+                    if not should_continue:
+                        # Cancelación solicitada
+                        stop_reason = "CANCELED"
+                        first_error = "Cancelado por usuario"
+                        break
+        finally:
+            if session_thread is not None:
+                await asyncio.get_running_loop().run_in_executor(session_thread, session_pool.close_all)
+                session_thread.shutdown(wait=False)
         
         # Determinar status final
         finished_at = datetime.now()
@@ -463,6 +515,8 @@ class CAEExecutionRunnerV1:
                 "items_blocked": items_blocked,
             },
         }
+        if session_pool is not None:
+            manifest["session"] = session_pool.stats()
         
         with open(evidence_dir / "manifest.json", "w", encoding="utf-8") as f:
             json.dump(manifest, f, indent=2, ensure_ascii=False)
@@ -605,6 +659,7 @@ class CAEExecutionRunnerV1:
         evidence_dir: Path,
         screenshots_dir: Path,
         started_at: datetime,
+        session_pool: Optional[EgestionaPlanSessionPoolV1] = None,
     ) -> RunResultV1:
         """
         Ejecuta en modo REAL usando Playwright y eGestiona.
@@ -612,15 +667,14 @@ class CAEExecutionRunnerV1:
         Algoritmo:
         1) Validar que item.suggested_doc_id existe
         2) Cargar documento del store y obtener PDF
-        3) Login eGestiona
+        3) Login eGestiona (una vez por plan si hay session_pool)
         4) Navegar a pendientes y localizar el pendiente específico
         5) Entrar al detalle
         6) Subir PDF
         7) Confirmar resultado
         8) Capturar evidencia
         """
-        from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
-        from backend.repository.config_store_v1 import ConfigStoreV1
+        from backend.repository.repository_service_v1 import get_config_store, get_repository_store
         from backend.repository.secrets_store_v1 import SecretsStoreV1
         from backend.repository.data_bootstrap_v1 import ensure_data_layout
         
@@ -636,7 +690,7 @@ class CAEExecutionRunnerV1:
             )
         
         # Cargar documento del store
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         try:
             doc = store.get_document(item.suggested_doc_id)
             if not doc:
@@ -679,7 +733,7 @@ class CAEExecutionRunnerV1:
         # Validar credenciales
         try:
             base_dir = ensure_data_layout()
-            config_store = ConfigStoreV1(base_dir=base_dir)
+            config_store = get_config_store(base_dir)
             secrets_store = SecretsStoreV1(base_dir=base_dir)
             
             platforms = config_store.load_platforms()
@@ -693,12 +747,9 @@ class CAEExecutionRunnerV1:
                     started_at=started_at,
                 )
             
-            # Usar primera coordination disponible (o "Kern" por defecto)
-            coordination = "Kern"
-            coord = next((c for c in plat.coordinations if c.label == coordination), None)
-            if not coord and plat.coordinations:
-                coord = plat.coordinations[0]
-                coordination = coord.label
+            # Usar "Kern" o, si no existe, la primera coordination disponible
+            coord = pick_execution_coordination(plat)
+            coordination = coord.label if coord else DEFAULT_COORDINATION_LABEL
             
             if not coord:
                 error_msg = f"Coordination '{coordination}' no encontrada en plataforma egestiona"
@@ -746,6 +797,7 @@ class CAEExecutionRunnerV1:
                 evidence_dir=evidence_dir,
                 screenshots_dir=screenshots_dir,
                 started_at=started_at,
+                session_pool=session_pool,
             )
             return result
         except Exception as e:
@@ -771,19 +823,19 @@ class CAEExecutionRunnerV1:
         evidence_dir: Path,
         screenshots_dir: Path,
         started_at: datetime,
+        session_pool: Optional[EgestionaPlanSessionPoolV1] = None,
     ) -> RunResultV1:
         """
         Ejecuta el upload real en eGestiona usando Playwright.
         
         Reutiliza la lógica de run_upload_pending_document_scoped_headful pero adaptada
-        para trabajar con un item del plan CAE.
+        para trabajar con un item del plan CAE. Con session_pool el item se sube en la
+        sesión compartida del plan (ver egestiona_session_v1); sin él, abre y cierra una
+        sesión propia (un navegador y un login por item).
         """
-        import time
-        from backend.adapters.egestiona.frame_scan_headful import LOGIN_URL_PREVIOUS_SUCCESS
-        
         # Intentar importar Playwright
         try:
-            from playwright.sync_api import sync_playwright
+            from playwright.sync_api import sync_playwright  # noqa: F401
         except Exception as e:
             error_msg = f"Playwright no disponible: {str(e)}"
             return self._create_failed_run(
@@ -807,9 +859,6 @@ class CAEExecutionRunnerV1:
         date_ddmmyyyy = None
         if item.resolved_dates and "valid_from" in item.resolved_dates:
             try:
-                from datetime import datetime
-                from zoneinfo import ZoneInfo
-                
                 valid_from_str = item.resolved_dates["valid_from"]
                 valid_from = datetime.fromisoformat(valid_from_str.replace("Z", "+00:00"))
                 date_ddmmyyyy = valid_from.strftime("%d/%m/%Y")
@@ -839,294 +888,43 @@ class CAEExecutionRunnerV1:
             "mode": "REAL",
         }
         
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=False, slow_mo=300)
-            context = browser.new_context(viewport={"width": 1600, "height": 1000})
-            page = context.new_page()
-            
-            try:
-                # 1) Login
-                login_url = LOGIN_URL_PREVIOUS_SUCCESS or "https://coordinate.egestiona.es/login?origen=subcontrata"
-                page.goto(login_url, wait_until="domcontentloaded", timeout=60000)
-                page.locator('input[name="ClientName"]').fill(client_code, timeout=20000)
-                page.locator('input[name="Username"]').fill(username, timeout=20000)
-                page.locator('input[name="Password"]').fill(password, timeout=20000)
-                page.locator('button[type="submit"]').click(timeout=20000)
-                
-                # Esperar post-login
-                page.wait_for_url("**/default_contenido.asp", timeout=30000)
-                try:
-                    page.wait_for_load_state("networkidle", timeout=25000)
-                except Exception:
-                    pass
-                time.sleep(2.5)
-                
-                page.screenshot(path=str(screenshot_paths["01_login"]), full_page=True)
-                
-                # 2) Navegar a pendientes
-                frame_dashboard = page.frame(name="nm_contenido")
-                if not frame_dashboard:
-                    raise RuntimeError("FRAME_NOT_FOUND: nm_contenido")
-                
-                page.screenshot(path=str(screenshot_paths["02_dashboard"]), full_page=True)
-                
-                # Click Gestion(3)
-                tile_sel = 'a.listado_link[href="javascript:Gestion(3);"]'
-                frame_dashboard.locator(tile_sel).first.wait_for(state="visible", timeout=20000)
-                frame_dashboard.locator(tile_sel).first.click(timeout=20000)
-                
-                # 3) Esperar frame de listado
-                def _find_list_frame():
-                    fr = page.frame(name="f3")
-                    if fr:
-                        return fr
-                    for fr2 in page.frames:
-                        u = (fr2.url or "").lower()
-                        if ("buscador.asp" in u) and ("apartado_id=3" in u):
-                            return fr2
-                    return None
-                
-                def _frame_has_grid(fr):
-                    try:
-                        return fr.locator("table.obj.row20px").count() > 0 and fr.locator("table.hdr").count() > 0
-                    except Exception:
-                        return False
-                
-                list_frame = None
-                t_deadline = time.time() + 15.0
-                while time.time() < t_deadline:
-                    list_frame = _find_list_frame()
-                    if list_frame and _frame_has_grid(list_frame):
-                        break
-                    time.sleep(0.25)
-                
-                if not (list_frame and _frame_has_grid(list_frame)):
-                    # Intentar click Buscar
-                    for fr in page.frames:
-                        try:
-                            btn = fr.get_by_text("Buscar", exact=True)
-                            if btn.count() > 0:
-                                btn.first.click(timeout=10000)
-                                break
-                        except Exception:
-                            continue
-                    
-                    t_deadline = time.time() + 20.0
-                    while time.time() < t_deadline:
-                        list_frame = _find_list_frame()
-                        if list_frame and _frame_has_grid(list_frame):
-                            break
-                        time.sleep(0.25)
-                
-                if not (list_frame and _frame_has_grid(list_frame)):
-                    raise RuntimeError("GRID_NOT_FOUND: no se pudo cargar el grid de pendientes")
-                
-                # Esperar que el grid tenga filas
-                def _grid_rows_ready(fr):
-                    try:
-                        return bool(
-                            fr.evaluate(
-                                """() => {
-  const obj = document.querySelector('table.obj.row20px');
-  if(!obj) return false;
-  const trs = Array.from(obj.querySelectorAll('tr'));
-  return trs.some(tr => {
-    const tds = Array.from(tr.querySelectorAll('td'));
-    return tds.length > 0 && tds.some(td => (td.innerText||'').trim().length > 0);
-  });
-}"""
-                            )
-                        )
-                    except Exception:
-                        return False
-                
-                t_deadline = time.time() + 10.0
-                while time.time() < t_deadline:
-                    if _grid_rows_ready(list_frame):
-                        break
-                    time.sleep(0.25)
-                
-                if not _grid_rows_ready(list_frame):
-                    raise RuntimeError("GRID_EMPTY: el grid no tiene filas")
-                
-                try:
-                    list_frame.locator("body").screenshot(path=str(screenshot_paths["03_listado"]))
-                except Exception:
-                    page.screenshot(path=str(screenshot_paths["03_listado"]), full_page=True)
-                
-                # 4) Buscar fila que coincida con type_id + sujeto + periodo
-                # Por ahora, simplificado: buscar primera fila que coincida con empresa/trabajador
-                # TODO: Mejorar matching para usar type_id y period_key del item
-                from backend.adapters.egestiona.grid_extract import extract_dhtmlx_grid
-                from backend.adapters.egestiona.grid_extract import canonicalize_row
-                from backend.shared.text_normalizer import normalize_text_robust, text_contains
-                
-                extracted = extract_dhtmlx_grid(list_frame)
-                rows = extracted.get("rows", [])
-                
-                # Filtrar filas que coincidan con el sujeto
-                matching_rows = []
-                for row_data in rows:
-                    row = canonicalize_row(row_data)
-                    empresa_match = True
-                    elemento_match = True
-                    
-                    if item.company_key:
-                        empresa_norm = normalize_text_robust(str(row.get("empresa") or ""))
-                        company_key_norm = normalize_text_robust(item.company_key)
-                        empresa_match = text_contains(empresa_norm, company_key_norm)
-                    
-                    if item.person_key:
-                        elemento_norm = normalize_text_robust(str(row.get("elemento") or ""))
-                        person_key_norm = normalize_text_robust(item.person_key)
-                        elemento_match = text_contains(elemento_norm, person_key_norm)
-                    
-                    if empresa_match and elemento_match:
-                        matching_rows.append((row, row_data))
-                
-                if len(matching_rows) != 1:
-                    error_msg = f"Se encontraron {len(matching_rows)} filas que coinciden con el sujeto (esperado: 1). No se puede proceder de forma segura."
-                    raise RuntimeError(error_msg)
-                
-                # 5) Abrir detalle de la fila encontrada
-                # Por ahora, usar la lógica simplificada: click en primera fila matching
-                # TODO: Mejorar para encontrar el índice exacto y hacer click
-                target_row_data = matching_rows[0][1]
-                
-                # Intentar hacer click en la fila (buscar botón o link)
-                click_success = list_frame.evaluate(
-                    """() => {
-  const tbls = Array.from(document.querySelectorAll('table.obj.row20px'));
-  if(!tbls.length) return {ok: false, reason: 'no_table'};
-  const trs = Array.from(tbls[0].querySelectorAll('tr'));
-  if(!trs.length) return {ok: false, reason: 'no_rows'};
-  const tr = trs[0];
-  const a = tr.querySelector('a');
-  if(a) { a.click(); return {ok: true, kind: 'a'}; }
-  const img = tr.querySelector('img[onclick]');
-  if(img) { img.click(); return {ok: true, kind: 'img'}; }
-  tr.click();
-  return {ok: true, kind: 'tr'};
-}"""
+        # Modo sesión: login y listado compartidos entre items; si no, sesión propia del item
+        own_session = session_pool is None
+        session: Optional[EgestionaPlanSessionV1] = None
+        try:
+            if own_session:
+                session = self.session_factory(coordination, client_code, username, password)
+                session.open(screenshots_dir)
+            else:
+                session = session_pool.get(
+                    "egestiona", coordination, client_code, username, password, screenshots_dir=screenshots_dir
                 )
-                
-                if not click_success.get("ok"):
-                    raise RuntimeError("No se pudo hacer click en la fila del pendiente")
-                
-                # Esperar modal de detalle
-                time.sleep(2.0)
-                page.screenshot(path=str(screenshot_paths["04_detail"]), full_page=True)
-                
-                # 6) Subir PDF
-                file_input = page.locator("input[type='file']:visible")
-                if file_input.count() == 0:
-                    file_input = page.locator("input[type='file']")
-                
-                if file_input.count() > 0:
-                    file_input.first.set_input_files(str(pdf_path))
-                else:
-                    # Fallback: buscar botón "Adjuntar"
-                    try:
-                        attach = page.get_by_text("Adjuntar fichero", exact=False)
-                        if attach.count() == 0:
-                            attach = page.get_by_text("Adjuntar", exact=False)
-                        if attach.count() > 0:
-                            with page.expect_file_chooser(timeout=15000) as fc_info:
-                                attach.first.click(timeout=10000)
-                            chooser = fc_info.value
-                            chooser.set_files(str(pdf_path))
-                        else:
-                            raise RuntimeError("FILE_INPUT_NOT_FOUND: no se encontró input de archivo ni botón Adjuntar")
-                    except Exception as e:
-                        raise RuntimeError(f"FILE_INPUT_NOT_FOUND: {str(e)}")
-                
-                # 7) Rellenar fecha "Inicio Vigencia" solo si existe en resolved_dates (v1.3.1)
-                if date_ddmmyyyy:
-                    try:
-                        # Buscar input de fecha cerca de label "Inicio Vigencia"
-                        date_selector = page.evaluate(
-                            """() => {
-  function norm(s){ return (s||'').replace(/\\s+/g,' ').trim(); }
-  const labels = Array.from(document.querySelectorAll('*')).filter(el => {
-    const t = norm(el.innerText).toLowerCase();
-    return t.includes('inicio vigencia');
-  });
-  if(!labels.length) return null;
-  const label = labels[0];
-  const inputs = Array.from(document.querySelectorAll('input[type="text"], input[type="date"]'));
-  for(const inp of inputs){
-    const r1 = label.getBoundingClientRect();
-    const r2 = inp.getBoundingClientRect();
-    const dist = Math.sqrt(Math.pow(r1.left - r2.left, 2) + Math.pow(r1.top - r2.top, 2));
-    if(dist < 200 && inp.offsetWidth > 0 && inp.offsetHeight > 0){
-      if(inp.id) return '#' + inp.id;
-      if(inp.name) return `input[name="${inp.name}"]`;
-    }
-  }
-  return null;
-}"""
-                        )
-                        
-                        if date_selector:
-                            date_input = page.locator(date_selector)
-                            if date_input.count() > 0:
-                                date_input.first.fill(date_ddmmyyyy, timeout=10000)
-                    except Exception as e:
-                        # No crítico, continuar
-                        pass
-                else:
-                    # v1.3.1: Si el portal exige fecha y no existe en plan -> verificar si es requerido
-                    # Por ahora, solo log (no bloqueamos automáticamente, el portal puede no requerirla)
-                    # Si el portal falla por falta de fecha, el error se capturará en el paso siguiente
-                    pass
-                
-                page.screenshot(path=str(screenshot_paths["05_uploaded"]), full_page=True)
-                
-                # 8) Confirmar (buscar botón Enviar/Guardar)
-                try:
-                    # Buscar botones comunes de confirmación
-                    submit_selectors = [
-                        'button:has-text("Enviar documento")',
-                        'button:has-text("Enviar archivo")',
-                        'button:has-text("Enviar")',
-                        'button:has-text("Guardar")',
-                        'input[type="submit"][value*="Enviar"]',
-                        'input[type="submit"][value*="Guardar"]',
-                    ]
-                    
-                    submitted = False
-                    for selector in submit_selectors:
-                        try:
-                            btn = page.locator(selector)
-                            if btn.count() > 0:
-                                btn.first.click(timeout=10000)
-                                submitted = True
-                                break
-                        except Exception:
-                            continue
-                    
-                    if not submitted:
-                        # Si no hay botón claro, no hacer nada (puede ser auto-submit)
-                        pass
-                    
-                    time.sleep(2.0)
-                    page.screenshot(path=str(screenshot_paths["06_confirmation"]), full_page=True)
-                except Exception as e:
-                    # No crítico, continuar
-                    pass
-                
-                status = "SUCCESS"
-                
-            except Exception as e:
-                last_error = str(e)
-                status = "FAILED"
-                # Capturar screenshot de error
+            session.upload_item(item, pdf_path, screenshot_paths, date_ddmmyyyy=date_ddmmyyyy)
+            status = "SUCCESS"
+        except Exception as e:
+            last_error = str(e)
+            status = "FAILED"
+            # Capturar screenshot de error
+            if session is not None and session.page is not None:
                 try:
-                    page.screenshot(path=str(screenshots_dir / "error.png"), full_page=True)
+                    session.page.screenshot(path=str(screenshots_dir / "error.png"), full_page=True)
                 except Exception:
                     pass
-            finally:
-                browser.close()
+            # Aislar el fallo: recargar la página (no un navegador nuevo) para el siguiente item
+            if not own_session and session is not None and session.page is not None:
+                try:
+                    session.recover()
+                    manifest["session_recovered"] = True
+                except Exception as recover_error:
+                    manifest["session_recovered"] = False
+                    manifest["session_recover_error"] = str(recover_error)
+                    session_pool.discard(session)
+        finally:
+            if own_session and session is not None:
+                session.close()
+        
+        if not own_session:
+            manifest["session"] = session_pool.stats()
         
         finished_at = datetime.now()
         
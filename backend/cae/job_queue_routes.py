@@ -11,7 +11,7 @@ from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 
 from backend.cae.job_queue_models_v1 import CAEJobV1, CAEJobStatus
-from backend.cae.job_queue_v1 import enqueue_job, get_job, list_jobs, cancel_job, retry_job
+from backend.cae.job_queue_v1 import enqueue_job, get_job, list_jobs_page, cancel_job, retry_job
 from backend.cae.submission_routes import _validate_challenge
 from backend.cae.submission_models_v1 import CAESubmissionPlanV1
 from backend.cae.job_report_v1 import generate_job_report_html
@@ -89,10 +89,21 @@ async def get_job_status(job_id: str) -> CAEJobV1:
 
 @router.get("/jobs", response_model=List[CAEJobV1])
 async def list_jobs_endpoint(
+    response: Response,
     limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Cursor de la página anterior (header X-Next-Cursor)"),
+    status: Optional[CAEJobStatus] = Query(None),
 ) -> List[CAEJobV1]:
-    """Lista jobs ordenados por created_at desc."""
-    return list_jobs(limit=limit)
+    """
+    Lista jobs ordenados por created_at desc.
+    
+    Paginación por cursor: si hay más resultados, el header X-Next-Cursor
+    contiene el valor a pasar como ?cursor= para la página siguiente.
+    """
+    jobs, next_cursor = list_jobs_page(limit=limit, cursor=cursor, status=status)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return jobs
 
 
 @router.post("/jobs/{job_id}/cancel", response_model=CAEJobV1)
@@ -1,7 +1,14 @@
 """
 Cola de ejecuciones CAE v1.8.
 
-Implementa una cola in-memory con worker asyncio que procesa jobs secuencialmente.
+Implementa una cola in-memory con un pool de workers asyncio:
+- N workers concurrentes (CAE_JOB_WORKERS).
+- Límite de jobs simultáneos por tenant (CAE_JOB_MAX_PER_TENANT) y por sesión de portal
+  plataforma/credencial con la que el runner hace login (CAE_JOB_MAX_PER_SESSION, por
+  defecto 1: nunca dos jobs contra la misma sesión en paralelo, aunque sean de empresas
+  distintas).
+- Reparto justo entre tenants (round-robin) y despertares por asyncio.Condition en lugar
+  de polling.
 """
 
 from __future__ import annotations
@@ -10,14 +17,15 @@ import os
 import uuid
 import json
 import tempfile
-from datetime import datetime
+import threading
+from datetime import datetime, timedelta
 from collections import deque
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 
 from backend.cae.job_queue_models_v1 import CAEJobV1, CAEJobStatus, CAEJobProgressV1
 from backend.cae.submission_models_v1 import CAESubmissionPlanV1
-from backend.cae.execution_runner_v1 import CAEExecutionRunnerV1
+from backend.cae.execution_runner_v1 import CAEExecutionRunnerV1, pick_execution_coordination
 from backend.cae.execution_models_v1 import RunResultV1
 from backend.config import DATA_DIR
 
@@ -25,11 +33,32 @@ from backend.config import DATA_DIR
 # Store in-memory
 _jobs: Dict[str, CAEJobV1] = {}
 _queue: deque = deque()
-_current_job_id: Optional[str] = None
-_worker_task: Optional[asyncio.Task] = None
+_worker_tasks: List[asyncio.Task] = []
+
+# Pool de workers
+DEFAULT_WORKERS = 3
+DEFAULT_MAX_PER_TENANT = 2
+DEFAULT_MAX_PER_SESSION = 1
+
+_running: Dict[str, Tuple[str, Tuple[str, str]]] = {}  # job_id -> (tenant, sesión)
+_tenant_last_served: Dict[str, int] = {}
+_dispatch_seq = 0
+_scheduler_cond: Optional[asyncio.Condition] = None
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
 
 # v1.9: Persistencia de jobs
+# Snapshot (cae_jobs.json) + journal append-only (cae_jobs.journal.jsonl)
 JOBS_FILE = Path(DATA_DIR) / "cae_jobs.json"
+JOURNAL_SNAPSHOT_EVERY = 500
+DEFAULT_RETENTION_DAYS = 30
+DEFAULT_MAX_TERMINAL_JOBS = 1000
+TERMINAL_STATUSES = ("SUCCESS", "PARTIAL_SUCCESS", "FAILED", "BLOCKED", "CANCELED")
+
+_persist_lock = threading.RLock()
+_journal_events = 0
+# _jobs se modifica desde el event loop, desde handlers síncronos (threadpool) y desde el
+# callback de progreso; altas, bajas e iteraciones (snapshots) van bajo este lock
+_jobs_lock = threading.RLock()
 
 
 def _generate_job_id() -> str:
@@ -40,47 +69,158 @@ def _generate_job_id() -> str:
 
 
 def _get_jobs_file() -> Path:
-    """Obtiene el path del archivo de jobs."""
+    """Obtiene el path del snapshot de jobs."""
     jobs_dir = JOBS_FILE.parent
     jobs_dir.mkdir(parents=True, exist_ok=True)
     return JOBS_FILE
 
 
+def _get_journal_file() -> Path:
+    """Journal JSONL append-only con los cambios posteriores al snapshot."""
+    return _get_jobs_file().with_name("cae_jobs.journal.jsonl")
+
+
+def _get_archive_file() -> Path:
+    """Archivo JSONL con los jobs terminales retirados de memoria."""
+    return _get_jobs_file().with_name("cae_jobs_archive.jsonl")
+
+
+def _retention_limits() -> Tuple[int, int]:
+    """(días de retención, máx. jobs terminales en memoria) desde entorno."""
+    try:
+        days = int(os.getenv("CAE_JOB_RETENTION_DAYS", str(DEFAULT_RETENTION_DAYS)))
+    except ValueError:
+        days = DEFAULT_RETENTION_DAYS
+    try:
+        max_terminal = int(os.getenv("CAE_JOB_MAX_TERMINAL", str(DEFAULT_MAX_TERMINAL_JOBS)))
+    except ValueError:
+        max_terminal = DEFAULT_MAX_TERMINAL_JOBS
+    return days, max_terminal
+
+
+def _persist_job(job_id: str) -> None:
+    """
+    Persiste el estado actual de un job como una línea del journal (coste constante).
+    Cada JOURNAL_SNAPSHOT_EVERY eventos se compacta el journal en un snapshot.
+    """
+    global _journal_events
+    job = _jobs.get(job_id)
+    if job is None:
+        return
+    try:
+        line = json.dumps({"op": "put", "job": job.model_dump(mode="json")}, ensure_ascii=False, default=str)
+        with _persist_lock:
+            with open(_get_journal_file(), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            _journal_events += 1
+            needs_snapshot = _journal_events >= JOURNAL_SNAPSHOT_EVERY
+    except Exception as e:
+        print(f"[job_queue] Error al escribir journal de jobs: {e}")
+        return
+    if needs_snapshot:
+        _save_jobs()
+
+
+def _archive_terminal_jobs() -> List[CAEJobV1]:
+    """Retira de memoria los jobs terminales fuera de retención (por antigüedad o por cantidad)."""
+    days, max_terminal = _retention_limits()
+    cutoff = datetime.utcnow() - timedelta(days=days)
+    with _jobs_lock:
+        terminal = sorted(
+            (j for j in _jobs.values() if j.status in TERMINAL_STATUSES),
+            key=lambda j: (j.finished_at or j.created_at, j.job_id),
+            reverse=True,
+        )
+        archived = [
+            job for pos, job in enumerate(terminal)
+            if pos >= max_terminal or (job.finished_at or job.created_at) < cutoff
+        ]
+        for job in archived:
+            _jobs.pop(job.job_id, None)
+    return archived
+
+
 def _save_jobs() -> None:
-    """Guarda jobs en disco (atomic write)."""
+    """
+    Escribe un snapshot completo (atomic write) y vacía el journal.
+    Antes, archiva los jobs terminales fuera de retención en cae_jobs_archive.jsonl.
+    """
+    global _journal_events
     try:
-        jobs_file = _get_jobs_file()
-        jobs_data = []
-        
-        for job in _jobs.values():
-            # Serializar job sin campos temporales (_plan, _challenge_token, etc.)
-            job_dict = job.model_dump(mode="json")
-            jobs_data.append(job_dict)
-        
-        # Write atomic: escribir a temp file y luego mover
-        with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', delete=False, dir=jobs_file.parent) as tmp:
-            json.dump(jobs_data, tmp, indent=2, ensure_ascii=False, default=str)
-            tmp_path = Path(tmp.name)
-        
-        # Mover temp file a archivo final (atomic en la mayoría de sistemas)
-        tmp_path.replace(jobs_file)
+        with _persist_lock:
+            jobs_file = _get_jobs_file()
+            
+            archived = _archive_terminal_jobs()
+            if archived:
+                with open(_get_archive_file(), "a", encoding="utf-8") as f:
+                    for job in archived:
+                        f.write(json.dumps(job.model_dump(mode="json"), ensure_ascii=False, default=str) + "\n")
+            
+            # Serializar jobs sin campos temporales (_plan, _challenge_token, etc.)
+            with _jobs_lock:
+                jobs_data = [job.model_dump(mode="json") for job in list(_jobs.values())]
+            
+            # Write atomic: escribir a temp file y luego mover
+            with tempfile.NamedTemporaryFile(mode='w', encoding='utf-8', delete=False, dir=jobs_file.parent) as tmp:
+                json.dump(jobs_data, tmp, ensure_ascii=False, default=str)
+                tmp_path = Path(tmp.name)
+            
+            # Mover temp file a archivo final (atomic en la mayoría de sistemas)
+            tmp_path.replace(jobs_file)
+            
+            # El snapshot ya contiene todo lo del journal
+            _get_journal_file().write_text("", encoding="utf-8")
+            _journal_events = 0
     except Exception as e:
         print(f"[job_queue] Error al guardar jobs: {e}")
 
 
+def _read_persisted_jobs() -> Dict[str, dict]:
+    """Snapshot + replay del journal (el último evento de cada job gana)."""
+    persisted: Dict[str, dict] = {}
+    
+    jobs_file = _get_jobs_file()
+    if jobs_file.exists():
+        try:
+            with open(jobs_file, 'r', encoding='utf-8') as f:
+                for job_dict in json.load(f):
+                    persisted[job_dict.get("job_id")] = job_dict
+        except Exception as e:
+            print(f"[job_queue] Error al cargar snapshot de jobs: {e}")
+    
+    journal_file = _get_journal_file()
+    if journal_file.exists():
+        with open(journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    # Línea truncada por un corte durante la escritura
+                    continue
+                if event.get("op") == "put" and isinstance(event.get("job"), dict):
+                    persisted[event["job"].get("job_id")] = event["job"]
+    
+    persisted.pop(None, None)
+    return persisted
+
+
 def _load_jobs() -> None:
-    """Carga jobs desde disco al startup."""
+    """Carga jobs desde disco al startup (snapshot + journal) y compacta."""
     global _jobs, _queue
     
-    jobs_file = _get_jobs_file()
-    if not jobs_file.exists():
+    persisted = _read_persisted_jobs()
+    if not persisted:
         return
     
-    try:
-        with open(jobs_file, 'r', encoding='utf-8') as f:
-            jobs_data = json.load(f)
-        
-        for job_dict in jobs_data:
+    loaded = 0
+    with _jobs_lock:
+        for job_id, job_dict in persisted.items():
+            if job_id in _jobs:
+                # Ya en memoria (con sus campos temporales): no pisarlo
+                continue
             try:
                 job = CAEJobV1(**job_dict)
                 
@@ -90,20 +230,19 @@ def _load_jobs() -> None:
                     job.status = "FAILED"
                     job.error = "Interrupted by restart"
                     job.finished_at = datetime.utcnow()
-                elif job.status == "QUEUED":
+                elif job.status == "QUEUED" and job.job_id not in _queue:
                     # Volver a cola
                     _queue.append(job.job_id)
                 
-                # Solo cargar jobs terminales o reanudables
                 # No cargar campos temporales (_plan, _challenge_token) porque no están en disco
                 _jobs[job.job_id] = job
+                loaded += 1
             except Exception as e:
-                print(f"[job_queue] Error al cargar job {job_dict.get('job_id', 'unknown')}: {e}")
+                print(f"[job_queue] Error al cargar job {job_id}: {e}")
                 continue
-        
-        print(f"[job_queue] Cargados {len(_jobs)} jobs desde disco")
-    except Exception as e:
-        print(f"[job_queue] Error al cargar jobs desde disco: {e}")
+    
+    print(f"[job_queue] Cargados {loaded} jobs desde disco")
+    _save_jobs()
 
 
 def enqueue_job(
@@ -159,15 +298,17 @@ def enqueue_job(
     # Guardar job y challenge data (temporalmente en el job)
     # Nota: challenge_token y challenge_response se validan antes de ejecutar
     # Usar setattr para añadir campos temporales que no están en el modelo Pydantic
-    _jobs[job_id] = job
-    setattr(_jobs[job_id], "_challenge_token", challenge_token)
-    setattr(_jobs[job_id], "_challenge_response", challenge_response)
-    setattr(_jobs[job_id], "_plan", plan.model_dump())  # Guardar plan completo
+    setattr(job, "_challenge_token", challenge_token)
+    setattr(job, "_challenge_response", challenge_response)
+    setattr(job, "_plan", plan.model_dump())  # Guardar plan completo
+    with _jobs_lock:
+        _jobs[job_id] = job
     
     _queue.append(job_id)
     
     # v1.9: Persistir job
-    _save_jobs()
+    _persist_job(job_id)
+    _wake_workers()
     
     return _jobs[job_id]
 
@@ -177,11 +318,43 @@ def get_job(job_id: str) -> Optional[CAEJobV1]:
     return _jobs.get(job_id)
 
 
-def list_jobs(limit: int = 50) -> List[CAEJobV1]:
+def _job_sort_key(job: CAEJobV1) -> Tuple[str, str]:
+    return (job.created_at.isoformat(), job.job_id)
+
+
+def list_jobs_page(
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+) -> Tuple[List[CAEJobV1], Optional[str]]:
+    """
+    Página de jobs ordenados por created_at desc.
+
+    Args:
+        limit: Máximo de jobs en la página
+        cursor: Cursor opaco devuelto por la página anterior (None = primera página)
+        status: Filtrar por status (opcional)
+
+    Returns:
+        (jobs, next_cursor). next_cursor es None si no hay más páginas.
+    """
+    with _jobs_lock:
+        jobs_list = [j for j in _jobs.values() if status is None or j.status == status]
+    jobs_list.sort(key=_job_sort_key, reverse=True)
+    if cursor:
+        created_at, _, job_id = cursor.partition("|")
+        after = (created_at, job_id)
+        jobs_list = [j for j in jobs_list if _job_sort_key(j) < after]
+    page = jobs_list[:limit]
+    next_cursor = None
+    if len(jobs_list) > limit and page:
+        next_cursor = "|".join(_job_sort_key(page[-1]))
+    return page, next_cursor
+
+
+def list_jobs(limit: int = 50, cursor: Optional[str] = None) -> List[CAEJobV1]:
     """Lista jobs ordenados por created_at desc."""
-    jobs_list = list(_jobs.values())
-    jobs_list.sort(key=lambda j: j.created_at, reverse=True)
-    return jobs_list[:limit]
+    return list_jobs_page(limit=limit, cursor=cursor)[0]
 
 
 def cancel_job(job_id: str) -> Optional[CAEJobV1]:
@@ -211,13 +384,13 @@ def cancel_job(job_id: str) -> Optional[CAEJobV1]:
         job.finished_at = datetime.utcnow()
         job.error = "Cancelado por usuario"
         _jobs[job_id] = job
-        _save_jobs()
+        _persist_job(job_id)
         return job
     elif job.status == "RUNNING":
         # Señalar cancelación (worker lo manejará)
         job.cancel_requested = True
         _jobs[job_id] = job
-        _save_jobs()
+        _persist_job(job_id)
         return job
     
     return None
@@ -286,12 +459,14 @@ def retry_job(job_id: str) -> Optional[CAEJobV1]:
         )
         
         # Guardar job (sin challenge por ahora - requerirá nuevo challenge al ejecutar)
-        _jobs[new_job_id] = new_job
-        setattr(_jobs[new_job_id], "_plan", plan.model_dump())
+        setattr(new_job, "_plan", plan.model_dump())
+        with _jobs_lock:
+            _jobs[new_job_id] = new_job
         # No establecer challenge - requerirá nuevo challenge
         
         _queue.append(new_job_id)
-        _save_jobs()
+        _persist_job(new_job_id)
+        _wake_workers()
         
         return new_job
         
@@ -300,95 +475,214 @@ def retry_job(job_id: str) -> Optional[CAEJobV1]:
         return None
 
 
-async def _worker_loop():
-    """Loop del worker que procesa jobs de la cola."""
-    global _current_job_id
-    
+def _job_tenant_key(job: CAEJobV1) -> str:
+    """Tenant (cliente) del job: empresa del plan."""
+    return job.scope_summary.get("company_key") or "default"
+
+
+def _load_platforms():
+    """Plataformas configuradas (las mismas que lee el runner al hacer login)."""
+    from backend.repository.repository_service_v1 import get_config_store
+    return get_config_store().load_platforms()
+
+
+def _platform_login_key(platform_key: str) -> str:
+    """
+    Credencial con la que el runner hace login en la plataforma.
+
+    El runner no elige la coordinación por empresa (ver pick_execution_coordination), así que
+    jobs de empresas distintas comparten login. Sin configuración legible se devuelve "" (todos
+    los jobs de la plataforma comparten sesión: el caso seguro).
+    """
+    try:
+        platforms = _load_platforms()
+    except Exception:
+        return ""
+    plat = next((p for p in platforms.platforms if p.key == platform_key), None)
+    coord = pick_execution_coordination(plat)
+    if coord is None:
+        return ""
+    client_code = (coord.client_code or "").strip()
+    username = (coord.username or "").strip()
+    return f"{client_code}/{username}" if client_code or username else coord.label
+
+
+def _job_session_key(job: CAEJobV1, login_keys: Optional[Dict[str, str]] = None) -> Tuple[str, str]:
+    """
+    Sesión de portal que usa el job: (plataforma, credencial de login).
+
+    login_keys cachea la credencial por plataforma durante una misma pasada por la cola.
+    """
+    platform_key = job.scope_summary.get("platform_key") or ""
+    if login_keys is None:
+        login_keys = {}
+    if platform_key not in login_keys:
+        login_keys[platform_key] = _platform_login_key(platform_key)
+    return (platform_key, login_keys[platform_key])
+
+
+def _pool_limits() -> Tuple[int, int, int]:
+    """(workers, máx. jobs por tenant, máx. jobs por sesión de portal) desde entorno."""
+    def _env_int(name: str, default: int) -> int:
+        try:
+            return max(1, int(os.getenv(name, str(default))))
+        except ValueError:
+            return default
+    return (
+        _env_int("CAE_JOB_WORKERS", DEFAULT_WORKERS),
+        _env_int("CAE_JOB_MAX_PER_TENANT", DEFAULT_MAX_PER_TENANT),
+        _env_int("CAE_JOB_MAX_PER_SESSION", DEFAULT_MAX_PER_SESSION),
+    )
+
+
+def _pick_next_job(
+    max_per_tenant: int,
+    max_per_session: int,
+    login_keys: Optional[Dict[str, str]] = None,
+) -> Optional[str]:
+    """
+    Elige el siguiente job de _queue respetando límites y reparto justo.
+
+    - Se descartan jobs cuyo tenant o sesión de portal ya están al límite.
+    - Entre los elegibles gana el tenant atendido hace más tiempo (round-robin);
+      dentro de un mismo tenant se respeta el orden FIFO.
+    """
+    if login_keys is None:
+        login_keys = {}
+    running_tenants: Dict[str, int] = {}
+    running_sessions: Dict[Tuple[str, str], int] = {}
+    for tenant, session in _running.values():
+        running_tenants[tenant] = running_tenants.get(tenant, 0) + 1
+        running_sessions[session] = running_sessions.get(session, 0) + 1
+
+    best: Optional[Tuple[int, str]] = None
+    for job_id in list(_queue):
+        job = _jobs.get(job_id)
+        if job is None:
+            _queue.remove(job_id)
+            continue
+        tenant = _job_tenant_key(job)
+        if running_tenants.get(tenant, 0) >= max_per_tenant:
+            continue
+        if running_sessions.get(_job_session_key(job, login_keys), 0) >= max_per_session:
+            continue
+        rank = _tenant_last_served.get(tenant, 0)
+        if best is None or rank < best[0]:
+            best = (rank, job_id)
+    return best[1] if best else None
+
+
+def _claim_next_job() -> Optional[str]:
+    """Saca de la cola el siguiente job ejecutable y reserva su tenant/sesión."""
+    global _dispatch_seq
+    _, max_per_tenant, max_per_session = _pool_limits()
+    login_keys: Dict[str, str] = {}
+    job_id = _pick_next_job(max_per_tenant, max_per_session, login_keys)
+    if job_id is None:
+        return None
+    job = _jobs[job_id]
+    _queue.remove(job_id)
+    tenant = _job_tenant_key(job)
+    _running[job_id] = (tenant, _job_session_key(job, login_keys))
+    _dispatch_seq += 1
+    _tenant_last_served[tenant] = _dispatch_seq
+    return job_id
+
+
+def _wake_workers() -> None:
+    """Despierta a los workers (seguro desde el event loop o desde otro hilo)."""
+    loop, cond = _worker_loop, _scheduler_cond
+    if loop is None or cond is None or loop.is_closed():
+        return
+
+    async def _notify():
+        async with cond:
+            cond.notify_all()
+
+    try:
+        current = asyncio.get_running_loop()
+    except RuntimeError:
+        current = None
+    if current is loop:
+        loop.create_task(_notify())
+    else:
+        loop.call_soon_threadsafe(lambda: loop.create_task(_notify()))
+
+
+def _finish_job(job_id: str, job: CAEJobV1, error: str, status: str = "BLOCKED") -> None:
+    """Cierra un job sin ejecutarlo (o tras un error) y persiste."""
+    job.status = status
+    job.error = error
+    job.finished_at = datetime.utcnow()
+    _jobs[job_id] = job
+    _persist_job(job_id)
+
+
+async def _run_job(job_id: str) -> None:
+    """Valida y ejecuta un job ya reservado por un worker."""
+    job = _jobs.get(job_id)
+    if not job:
+        return
+
+    # Verificar que el plan sigue siendo READY
+    # Cargar plan desde evidencia guardada (síncrono)
+    from backend.config import DATA_DIR
+
+    try:
+        plan_file = Path(DATA_DIR) / "docs" / "evidence" / "cae_plans" / f"{job.plan_id}.json"
+        if not plan_file.exists():
+            _finish_job(job_id, job, f"Plan {job.plan_id} no encontrado")
+            return
+        plan_data = json.loads(plan_file.read_text(encoding="utf-8"))
+        if plan_data.get("decision") != "READY":
+            _finish_job(job_id, job, f"Plan ya no es READY (decision: {plan_data.get('decision')})")
+            return
+    except Exception as e:
+        _finish_job(job_id, job, f"Error al verificar plan: {str(e)}")
+        return
+
+    # Verificar cancelación antes de empezar
+    if job.cancel_requested:
+        _finish_job(job_id, job, "Cancelado antes de iniciar", status="CANCELED")
+        return
+
+    # Marcar como RUNNING
+    job.status = "RUNNING"
+    job.started_at = datetime.utcnow()
+    job.progress.message = "Iniciando ejecución..."
+    _jobs[job_id] = job
+    _persist_job(job_id)
+
+    # Ejecutar job
+    try:
+        await _execute_job(job_id, job)
+    except Exception as e:
+        job = _jobs.get(job_id)
+        if job:
+            _finish_job(job_id, job, f"Error inesperado: {str(e)}", status="FAILED")
+
+
+async def _worker_main(worker_index: int):
+    """Worker del pool: espera (sin polling) a que haya un job ejecutable y lo procesa."""
+    cond = _scheduler_cond
     while True:
         try:
-            # Si hay un job corriendo, esperar un poco
-            if _current_job_id:
-                await asyncio.sleep(0.5)
-                continue
-            
-            # Si no hay jobs en cola, esperar
-            if not _queue:
-                await asyncio.sleep(0.5)
-                continue
-            
-            # Tomar siguiente job
-            job_id = _queue.popleft()
-            job = _jobs.get(job_id)
-            
-            if not job:
-                continue
-            
-            # Verificar que el plan sigue siendo READY
-            # Cargar plan desde evidencia guardada (síncrono)
-            from pathlib import Path
-            from backend.config import DATA_DIR
-            import json
-            
-            try:
-                plan_file = Path(DATA_DIR) / "docs" / "evidence" / "cae_plans" / f"{job.plan_id}.json"
-                if plan_file.exists():
-                    plan_data = json.loads(plan_file.read_text(encoding="utf-8"))
-                    if plan_data.get("decision") != "READY":
-                        job.status = "BLOCKED"
-                        job.error = f"Plan ya no es READY (decision: {plan_data.get('decision')})"
-                        job.finished_at = datetime.utcnow()
-                        _jobs[job_id] = job
-                        _save_jobs()
-                        continue
-                else:
-                    job.status = "BLOCKED"
-                    job.error = f"Plan {job.plan_id} no encontrado"
-                    job.finished_at = datetime.utcnow()
-                    _jobs[job_id] = job
-                    _save_jobs()
-                    continue
-            except Exception as e:
-                job.status = "BLOCKED"
-                job.error = f"Error al verificar plan: {str(e)}"
-                job.finished_at = datetime.utcnow()
-                _jobs[job_id] = job
-                _save_jobs()
-                continue
-            
-            # Verificar cancelación antes de empezar
-            if job.cancel_requested:
-                job.status = "CANCELED"
-                job.finished_at = datetime.utcnow()
-                job.error = "Cancelado antes de iniciar"
-                _jobs[job_id] = job
-                _save_jobs()
-                continue
-            
-            # Marcar como RUNNING
-            _current_job_id = job_id
-            job.status = "RUNNING"
-            job.started_at = datetime.utcnow()
-            job.progress.message = "Iniciando ejecución..."
-            _jobs[job_id] = job
-            _save_jobs()
-            
-            # Ejecutar job
+            async with cond:
+                job_id = _claim_next_job()
+                while job_id is None:
+                    await cond.wait()
+                    job_id = _claim_next_job()
             try:
-                await _execute_job(job_id, job)
-            except Exception as e:
-                job = _jobs.get(job_id)
-                if job:
-                    job.status = "FAILED"
-                    job.error = f"Error inesperado: {str(e)}"
-                    job.finished_at = datetime.utcnow()
-                    _jobs[job_id] = job
-                    _save_jobs()
+                await _run_job(job_id)
             finally:
-                _current_job_id = None
-        
+                # Liberar tenant/sesión y despertar a quien esperaba por ellos
+                _running.pop(job_id, None)
+                _wake_workers()
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             # Error en el loop, continuar
-            print(f"[job_queue] Error en worker loop: {e}")
+            print(f"[job_queue] Error en worker {worker_index}: {e}")
             await asyncio.sleep(1)
 
 
@@ -429,7 +723,7 @@ async def _execute_job(job_id: str, job: CAEJobV1):
                 job.error = "Reintento requiere nuevo challenge. Ejecuta el plan nuevamente para obtener un challenge."
                 job.finished_at = datetime.utcnow()
                 _jobs[job_id] = job
-                _save_jobs()
+                _persist_job(job_id)
                 return
         else:
             # No es retry y no tiene challenge - error
@@ -437,7 +731,7 @@ async def _execute_job(job_id: str, job: CAEJobV1):
             job.error = "Challenge requerido para ejecución"
             job.finished_at = datetime.utcnow()
             _jobs[job_id] = job
-            _save_jobs()
+            _persist_job(job_id)
             return
     
     from backend.cae.submission_routes import _validate_challenge
@@ -451,7 +745,7 @@ async def _execute_job(job_id: str, job: CAEJobV1):
             job.error = error_msg or "Challenge inválido o expirado"
             job.finished_at = datetime.utcnow()
             _jobs[job_id] = job
-            _save_jobs()
+            _persist_job(job_id)
             return
     
     # Callback para actualizar progreso y verificar cancelación
@@ -469,7 +763,7 @@ async def _execute_job(job_id: str, job: CAEJobV1):
                 return False  # Señalar que debe cancelar
             job.progress = progress
             _jobs[job_id] = job
-            _save_jobs()
+            _persist_job(job_id)
         return True
     
     # Ejecutar plan
@@ -516,26 +810,40 @@ async def _execute_job(job_id: str, job: CAEJobV1):
             job.error = result.error
         
         _jobs[job_id] = job
-        _save_jobs()
+        _persist_job(job_id)
 
 
 def start_worker():
-    """Inicia el worker (llamar en startup de FastAPI)."""
-    global _worker_task
+    """Inicia el pool de workers (llamar en startup de FastAPI)."""
+    global _worker_tasks, _scheduler_cond, _worker_loop
     
     # v1.9: Cargar jobs desde disco antes de iniciar worker
     _load_jobs()
     
-    if _worker_task is None or _worker_task.done():
-        _worker_task = asyncio.create_task(_worker_loop())
-        print("[job_queue] Worker iniciado")
+    if any(not t.done() for t in _worker_tasks):
+        return
+    
+    workers, max_per_tenant, max_per_session = _pool_limits()
+    _worker_loop = asyncio.get_running_loop()
+    _scheduler_cond = asyncio.Condition()
+    _running.clear()
+    _worker_tasks = [asyncio.create_task(_worker_main(i)) for i in range(workers)]
+    print(
+        f"[job_queue] Pool iniciado: {workers} workers "
+        f"(máx. {max_per_tenant}/tenant, {max_per_session}/sesión)"
+    )
 
 
 def stop_worker():
-    """Detiene el worker (llamar en shutdown de FastAPI)."""
-    global _worker_task
-    
-    if _worker_task and not _worker_task.done():
-        _worker_task.cancel()
-        print("[job_queue] Worker detenido")
-
+    """Detiene el pool de workers (llamar en shutdown de FastAPI)."""
+    global _worker_tasks, _scheduler_cond, _worker_loop
+    
+    active = [t for t in _worker_tasks if not t.done()]
+    for task in active:
+        task.cancel()
+    _worker_tasks = []
+    _scheduler_cond = None
+    _worker_loop = None
+    _save_jobs()
+    if active:
+        print("[job_queue] Pool detenido")
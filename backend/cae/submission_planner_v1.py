@@ -20,6 +20,7 @@ from backend.cae.submission_models_v1 import (
     CAESubmissionItemV1,
 )
 from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_service_v1 import get_repository_store
 from backend.repository.period_planner_v1 import PeriodPlannerV1
 from backend.repository.document_status_calculator_v1 import calculate_document_status
 from backend.shared.document_repository_v1 import DocumentTypeV1, DocumentInstanceV1, PeriodKindV1
@@ -29,7 +30,7 @@ class CAESubmissionPlannerV1:
     """Planificador de envíos CAE."""
     
     def __init__(self, store: Optional[DocumentRepositoryStoreV1] = None):
-        self.store = store or DocumentRepositoryStoreV1()
+        self.store = store or get_repository_store()
         self.planner = PeriodPlannerV1(self.store)
     
     def generate_plan_id(self) -> str:
@@ -65,14 +65,14 @@ async def get_doc_candidates(
     - Si allow_period_fallback=false: devuelve [] (fallback_applied=false)
     - Si allow_period_fallback=true: devuelve docs del mismo tipo/sujeto sin filtrar por period_key (fallback_applied=true)
     """
-    from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+    from backend.repository.repository_service_v1 import get_repository_store
     from backend.repository.document_status_calculator_v1 import calculate_document_status
     
     try:
         import logging
         logger = logging.getLogger(__name__)
         
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         
         # Validar scope
         if scope not in ["company", "worker"]:
@@ -276,7 +276,7 @@ async def create_plan_from_selection(request: PlanFromSelectionRequest) -> CAESu
       - NEEDS_CONFIRMATION si hay alguno NEEDS_CONFIRMATION y ninguno BLOCKED
       - BLOCKED si cualquiera BLOCKED
     """
-    from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+    from backend.repository.repository_service_v1 import get_repository_store
     from backend.repository.document_status_calculator_v1 import calculate_document_status
     
     # Validar que selected_items no está vacío
@@ -286,7 +286,7 @@ async def create_plan_from_selection(request: PlanFromSelectionRequest) -> CAESu
     plan_id = CAESubmissionPlannerV1().generate_plan_id()
     created_at = datetime.now()
     
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     planner = CAESubmissionPlannerV1(store)
     
     items: List[CAESubmissionItemV1] = []
@@ -4,17 +4,62 @@ Interfaz base para conectores de plataformas CAE.
 Todos los conectores deben implementar BaseConnector.
 """
 
+import os
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
+from pathlib import Path
+from typing import List, Dict, Optional, Any, Union
 from playwright.async_api import Page
 
 from backend.connectors.models import (
     PendingRequirement,
     UploadResult,
     RunContext,
+    SCREENSHOT_FULL,
+    SCREENSHOT_OFF,
+    SCREENSHOT_ON_FAILURE,
+    SCREENSHOT_POLICIES,
+    SCREENSHOT_VIEWPORT,
 )
 
 
+def resolve_screenshot_policy(policy: Optional[str] = None) -> str:
+    """
+    Normaliza la política de capturas (parámetro explícito o CONNECTOR_SCREENSHOT_POLICY).
+    
+    Raises:
+        ValueError: Si la política no es válida
+    """
+    value = (policy or os.getenv("CONNECTOR_SCREENSHOT_POLICY") or SCREENSHOT_FULL).strip().lower()
+    if value not in SCREENSHOT_POLICIES:
+        raise ValueError(f"Invalid screenshot policy '{value}'. Expected one of {', '.join(SCREENSHOT_POLICIES)}")
+    return value
+
+
+async def capture_screenshot(
+    page: Page,
+    path: Union[str, Path],
+    policy: str = SCREENSHOT_FULL,
+    *,
+    failure: bool = False,
+) -> Optional[str]:
+    """
+    Captura de pantalla según la política.
+    
+    Args:
+        page: Página de Playwright
+        path: Ruta destino del PNG
+        policy: Una de SCREENSHOT_POLICIES
+        failure: True si la captura documenta un error (se toma también con "on_failure")
+    
+    Returns:
+        Ruta de la captura o None si la política la omite
+    """
+    if policy == SCREENSHOT_OFF or (policy == SCREENSHOT_ON_FAILURE and not failure):
+        return None
+    await page.screenshot(path=str(path), full_page=policy != SCREENSHOT_VIEWPORT)
+    return str(path)
+
+
 class BaseConnector(ABC):
     """
     Interfaz abstracta para conectores de plataformas CAE.
@@ -100,6 +145,21 @@ class BaseConnector(ABC):
         """
         pass
     
+    async def capture_screenshot(
+        self,
+        page: Page,
+        path: Union[str, Path],
+        *,
+        failure: bool = False,
+    ) -> Optional[str]:
+        """
+        Captura de pantalla respetando ctx.screenshot_policy.
+        
+        Returns:
+            Ruta de la captura o None si la política la omite
+        """
+        return await capture_screenshot(page, path, self.ctx.screenshot_policy, failure=failure)
+    
     @abstractmethod
     async def upload_one(
         self,
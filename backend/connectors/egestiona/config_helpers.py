@@ -7,7 +7,7 @@ PASO 0: Reutilizar ConfigStoreV1 y SecretsStoreV1 existentes.
 from pathlib import Path
 from typing import Dict, Optional
 
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store
 from backend.repository.secrets_store_v1 import SecretsStoreV1
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
 from backend.shared.platforms_v1 import PlatformV1, CoordinationV1
@@ -29,7 +29,7 @@ def get_platform_config(platform_id: str, base_dir: Optional[str | Path] = None)
         base_dir = DATA_DIR
     
     base = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base)
+    store = get_config_store(base)
     platforms = store.load_platforms()
     
     # Buscar por key exacta
@@ -0,0 +1,253 @@
+"""
+Modo fleet: ejecuta muchos jobs (tenant, plataforma) de conectores en paralelo.
+
+run_connector lanza un Chromium nuevo por run y procesa los tenants de uno en uno; un
+barrido nocturno sobre decenas de empresas cliente tarda la suma de todos los runs.
+
+- Un único proceso de navegador compartido; cada job usa su propio BrowserContext
+  (cookies, storage y sesión aislados) que se cierra al terminar.
+- Límite global de concurrencia (CONNECTOR_FLEET_MAX_CONCURRENCY, por defecto 4).
+- Límites por plataforma: jobs simultáneos (CONNECTOR_FLEET_PLATFORM_CONCURRENCY, por
+  defecto 2) e intervalo mínimo entre interacciones con el portal
+  (CONNECTOR_FLEET_PLATFORM_MIN_INTERVAL_S, por defecto 1.0). Overrides por plataforma
+  con CONNECTOR_FLEET_PLATFORM_LIMITS="egestiona=3:0.5,otra=1:2".
+- Política de capturas configurable (CONNECTOR_SCREENSHOT_POLICY, ver models.py).
+- Un job que falla no afecta al resto: su resumen lleva "error".
+"""
+
+import asyncio
+import json
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from playwright.async_api import async_playwright, Browser
+
+from backend.connectors.base import resolve_screenshot_policy
+from backend.connectors.runner import _prepare_run, run_connector_in_browser
+
+
+DEFAULT_FLEET_MAX_CONCURRENCY = 4
+DEFAULT_PLATFORM_MAX_CONCURRENCY = 2
+DEFAULT_PLATFORM_MIN_INTERVAL_S = 1.0
+
+COUNT_KEYS = ("total_requirements", "matched", "uploaded", "failed", "skipped")
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, str(default))))
+    except ValueError:
+        return default
+
+
+@dataclass
+class FleetJob:
+    """Un run de conector dentro del fleet."""
+    platform_id: str
+    tenant_id: Optional[str] = None
+    base_url: Optional[str] = None
+    max_items: int = 5
+    dry_run: bool = False
+
+
+@dataclass
+class PlatformLimit:
+    """Límites de ritmo para una plataforma."""
+    max_concurrency: int = DEFAULT_PLATFORM_MAX_CONCURRENCY
+    min_interval_s: float = DEFAULT_PLATFORM_MIN_INTERVAL_S
+
+
+def _parse_platform_limits(raw: str, default: PlatformLimit) -> Dict[str, PlatformLimit]:
+    """Parsea "plataforma=concurrencia:intervalo,..." (entradas inválidas se ignoran)."""
+    limits: Dict[str, PlatformLimit] = {}
+    for entry in raw.split(","):
+        platform_id, sep, spec = entry.strip().partition("=")
+        if not sep or not platform_id:
+            continue
+        concurrency, _, interval = spec.partition(":")
+        try:
+            limits[platform_id.strip()] = PlatformLimit(
+                max_concurrency=max(1, int(concurrency)) if concurrency else default.max_concurrency,
+                min_interval_s=max(0.0, float(interval)) if interval else default.min_interval_s,
+            )
+        except ValueError:
+            continue
+    return limits
+
+
+@dataclass
+class FleetConfig:
+    """Configuración del fleet (ver FleetConfig.from_env)."""
+    max_concurrency: int = DEFAULT_FLEET_MAX_CONCURRENCY
+    default_platform_limit: PlatformLimit = field(default_factory=PlatformLimit)
+    platform_limits: Dict[str, PlatformLimit] = field(default_factory=dict)
+    screenshot_policy: Optional[str] = None  # None -> CONNECTOR_SCREENSHOT_POLICY o "full"
+
+    @classmethod
+    def from_env(cls) -> "FleetConfig":
+        default_limit = PlatformLimit(
+            max_concurrency=_env_int("CONNECTOR_FLEET_PLATFORM_CONCURRENCY", DEFAULT_PLATFORM_MAX_CONCURRENCY),
+            min_interval_s=_env_float("CONNECTOR_FLEET_PLATFORM_MIN_INTERVAL_S", DEFAULT_PLATFORM_MIN_INTERVAL_S),
+        )
+        return cls(
+            max_concurrency=_env_int("CONNECTOR_FLEET_MAX_CONCURRENCY", DEFAULT_FLEET_MAX_CONCURRENCY),
+            default_platform_limit=default_limit,
+            platform_limits=_parse_platform_limits(os.getenv("CONNECTOR_FLEET_PLATFORM_LIMITS", ""), default_limit),
+        )
+
+    def limit_for(self, platform_id: str) -> PlatformLimit:
+        return self.platform_limits.get(platform_id, self.default_platform_limit)
+
+
+class PlatformRateLimiter:
+    """
+    Limitador por plataforma: jobs simultáneos (slot) e intervalo mínimo entre
+    interacciones con el portal (throttle), compartido por todos los jobs de la plataforma.
+    """
+
+    def __init__(self, limit: PlatformLimit):
+        self.limit = limit
+        self.slot = asyncio.Semaphore(limit.max_concurrency)
+        self._lock = asyncio.Lock()
+        self._next_at = 0.0
+
+    async def throttle(self) -> None:
+        if self.limit.min_interval_s <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            wait = self._next_at - loop.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_at = loop.time() + self.limit.min_interval_s
+
+
+def _create_fleet_id() -> str:
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    return f"FLEET-{timestamp}-{random.randint(1000, 9999)}"
+
+
+def _error_summary(run_id: Optional[str], job: FleetJob, error: str) -> Dict[str, Any]:
+    return {
+        "run_id": run_id,
+        "platform_id": job.platform_id,
+        "tenant_id": job.tenant_id,
+        "error": error,
+        "counts": {key: 0 for key in COUNT_KEYS},
+        "results": [],
+    }
+
+
+async def run_fleet(
+    jobs: List[FleetJob],
+    headless: bool = True,
+    evidence_base_dir: Optional[str] = None,
+    config: Optional[FleetConfig] = None,
+    browser: Optional[Browser] = None,
+) -> Dict[str, Any]:
+    """
+    Ejecuta los jobs en paralelo sobre un navegador compartido.
+
+    Args:
+        jobs: Jobs (tenant, plataforma) a ejecutar
+        headless: Si ejecutar en modo headless (solo si el fleet lanza el navegador)
+        evidence_base_dir: Directorio base para evidencias (por defecto data/connectors/evidence);
+            el fleet usa <base>/<fleet_id>/ con un subdirectorio por run y fleet_summary.json
+        config: Límites y política de capturas (por defecto FleetConfig.from_env())
+        browser: Navegador ya lanzado (opcional); si se pasa, el fleet no lo cierra
+
+    Returns:
+        Resumen del fleet con counts agregados y el resumen de cada run (en el orden de jobs)
+
+    Raises:
+        ValueError: Si la política de capturas no es válida
+    """
+    config = config or FleetConfig.from_env()
+    policy = resolve_screenshot_policy(config.screenshot_policy)
+    fleet_id = _create_fleet_id()
+    base_dir = Path(evidence_base_dir) if evidence_base_dir else Path("data") / "connectors" / "evidence"
+    fleet_dir = base_dir / fleet_id
+    fleet_dir.mkdir(parents=True, exist_ok=True)
+
+    started_at = datetime.now().isoformat()
+    started = time.monotonic()
+    global_slot = asyncio.Semaphore(max(1, config.max_concurrency))
+    limiters: Dict[str, PlatformRateLimiter] = {}
+
+    async def _run_job(index: int, job: FleetJob, shared_browser: Browser) -> Dict[str, Any]:
+        job_started = time.monotonic()
+        run_id = f"{fleet_id}-{index:03d}"
+        try:
+            ctx, connector = _prepare_run(
+                job.platform_id,
+                tenant_id=job.tenant_id,
+                headless=headless,
+                base_url=job.base_url,
+                evidence_base_dir=str(fleet_dir),
+                dry_run=job.dry_run,
+                screenshot_policy=policy,
+                run_id=run_id,
+            )
+        except Exception as e:
+            summary = _error_summary(run_id, job, f"Setup failed: {str(e)}")
+        else:
+            limiter = limiters.setdefault(job.platform_id, PlatformRateLimiter(config.limit_for(job.platform_id)))
+            # Primero el slot de plataforma: un job en espera por su plataforma no ocupa slot global
+            async with limiter.slot, global_slot:
+                try:
+                    summary = await run_connector_in_browser(
+                        shared_browser,
+                        ctx,
+                        connector,
+                        max_items=job.max_items,
+                        throttle=limiter.throttle,
+                    )
+                except Exception as e:
+                    summary = _error_summary(run_id, job, f"Execution failed: {str(e)}")
+        summary.setdefault("tenant_id", job.tenant_id)
+        summary["duration_ms"] = int((time.monotonic() - job_started) * 1000)
+        return summary
+
+    playwright = None
+    owns_browser = browser is None
+    try:
+        if owns_browser:
+            playwright = await async_playwright().start()
+            browser = await playwright.chromium.launch(headless=headless)
+        runs = await asyncio.gather(*(_run_job(i, job, browser) for i, job in enumerate(jobs)))
+    finally:
+        if owns_browser:
+            if browser:
+                await browser.close()
+            if playwright:
+                await playwright.stop()
+
+    counts = {key: sum(run.get("counts", {}).get(key, 0) for run in runs) for key in COUNT_KEYS}
+    summary = {
+        "fleet_id": fleet_id,
+        "started_at": started_at,
+        "duration_ms": int((time.monotonic() - started) * 1000),
+        "max_concurrency": config.max_concurrency,
+        "screenshot_policy": policy,
+        "jobs": len(jobs),
+        "failed_jobs": sum(1 for run in runs if run.get("error")),
+        "counts": counts,
+        "runs": list(runs),
+        "evidence_dir": str(fleet_dir),
+    }
+    with open(fleet_dir / "fleet_summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    return summary
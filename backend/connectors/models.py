@@ -13,6 +13,14 @@ from datetime import datetime
 import hashlib
 
 
+# Política de capturas de pantalla (RunContext.screenshot_policy)
+SCREENSHOT_FULL = "full"  # full_page en cada paso (comportamiento histórico)
+SCREENSHOT_VIEWPORT = "viewport"  # solo el viewport: mucho más barato que full_page
+SCREENSHOT_ON_FAILURE = "on_failure"  # solo en errores y subidas fallidas
+SCREENSHOT_OFF = "off"
+SCREENSHOT_POLICIES = (SCREENSHOT_FULL, SCREENSHOT_VIEWPORT, SCREENSHOT_ON_FAILURE, SCREENSHOT_OFF)
+
+
 @dataclass
 class PendingRequirement:
     """
@@ -83,6 +91,7 @@ class RunContext:
         "network_idle": 5000,
     })
     evidence_dir: Optional[str] = None
+    screenshot_policy: str = SCREENSHOT_FULL  # ver SCREENSHOT_POLICIES
     
     @classmethod
     def create_run_id(cls) -> str:
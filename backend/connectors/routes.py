@@ -7,8 +7,9 @@ Endpoint DEV-ONLY para ejecutar conectores.
 import os
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 
+from backend.connectors.fleet import FleetConfig, FleetJob, run_fleet
 from backend.connectors.runner import run_connector
 
 router = APIRouter(prefix="/api/connectors", tags=["connectors"])
@@ -21,6 +22,35 @@ class ConnectorRunRequest(BaseModel):
     headless: bool = True
     max_items: int = 3
     dry_run: bool = False
+    screenshot_policy: Optional[str] = None
+
+
+class ConnectorFleetJobRequest(BaseModel):
+    """Job (tenant, plataforma) de un fleet."""
+    platform_id: str
+    tenant_id: Optional[str] = None
+    max_items: int = 3
+    dry_run: bool = False
+
+
+class ConnectorFleetRequest(BaseModel):
+    """Request para ejecutar varios conectores en paralelo (modo fleet)."""
+    jobs: List[ConnectorFleetJobRequest]
+    headless: bool = True
+    max_concurrency: Optional[int] = None
+    screenshot_policy: Optional[str] = None
+
+
+def _ensure_enabled() -> None:
+    """Endpoints DEV-ONLY: 404 salvo E2E_SEED_ENABLED=1 o ENVIRONMENT=dev."""
+    e2e_enabled = os.getenv("E2E_SEED_ENABLED") == "1"
+    env_dev = os.getenv("ENVIRONMENT") in ("dev", "development", "local")
+    
+    if not (e2e_enabled or env_dev):
+        raise HTTPException(
+            status_code=404,
+            detail="Connector endpoints disabled. Set E2E_SEED_ENABLED=1 or ENVIRONMENT=dev"
+        )
 
 
 @router.post("/run")
@@ -37,14 +67,7 @@ async def run_connector_endpoint(request: ConnectorRunRequest):
         Resumen de ejecución con counts y results
     """
     # Verificar que esté habilitado (DEV-ONLY)
-    e2e_enabled = os.getenv("E2E_SEED_ENABLED") == "1"
-    env_dev = os.getenv("ENVIRONMENT") in ("dev", "development", "local")
-    
-    if not (e2e_enabled or env_dev):
-        raise HTTPException(
-            status_code=404,
-            detail="Connector endpoints disabled. Set E2E_SEED_ENABLED=1 or ENVIRONMENT=dev"
-        )
+    _ensure_enabled()
     
     try:
         result = await run_connector(
@@ -53,9 +76,50 @@ async def run_connector_endpoint(request: ConnectorRunRequest):
             headless=request.headless,
             max_items=request.max_items,
             dry_run=request.dry_run,
+            screenshot_policy=request.screenshot_policy,
         )
         return result
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Execution failed: {str(e)}")
+
+
+@router.post("/fleet")
+async def run_fleet_endpoint(request: ConnectorFleetRequest):
+    """
+    Ejecuta varios jobs (tenant, plataforma) en paralelo con un navegador compartido (DEV-ONLY).
+    
+    Los límites por defecto salen de FleetConfig.from_env(); max_concurrency y
+    screenshot_policy del request los sobrescriben.
+    
+    Returns:
+        Resumen del fleet con counts agregados y el resumen de cada run
+    """
+    _ensure_enabled()
+    
+    if not request.jobs:
+        raise HTTPException(status_code=400, detail="At least one job is required")
+    
+    config = FleetConfig.from_env()
+    if request.max_concurrency is not None:
+        config.max_concurrency = max(1, request.max_concurrency)
+    if request.screenshot_policy is not None:
+        config.screenshot_policy = request.screenshot_policy
+    
+    jobs = [
+        FleetJob(
+            platform_id=job.platform_id,
+            tenant_id=job.tenant_id,
+            max_items=job.max_items,
+            dry_run=job.dry_run,
+        )
+        for job in request.jobs
+    ]
+    
+    try:
+        return await run_fleet(jobs, headless=request.headless, config=config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Execution failed: {str(e)}")
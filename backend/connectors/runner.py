@@ -7,16 +7,20 @@ Ejecuta el flujo completo de un conector:
 3. Extracción de requisitos
 4. Matching con repositorio
 5. Subida de documentos
+
+run_connector lanza un navegador propio; run_connector_in_browser ejecuta el mismo flujo
+en un BrowserContext aislado de un navegador compartido (modo fleet, ver fleet.py).
 """
 
 import os
 import json
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
 from datetime import datetime
 
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 
+from backend.connectors.base import BaseConnector, capture_screenshot, resolve_screenshot_policy
 from backend.connectors.registry import get_connector
 from backend.connectors.models import RunContext, PendingRequirement, UploadResult
 
@@ -168,35 +172,26 @@ def _suggest_fix(match_result: Dict) -> str:
         return "Revisar configuración del repositorio y reglas de matching"
 
 
-async def run_connector(
+def _prepare_run(
     platform_id: str,
     tenant_id: Optional[str] = None,
     headless: bool = True,
-    max_items: int = 5,
     base_url: Optional[str] = None,
     evidence_base_dir: Optional[str] = None,
     dry_run: bool = False,
-) -> Dict[str, Any]:
+    screenshot_policy: Optional[str] = None,
+    run_id: Optional[str] = None,
+) -> Tuple[RunContext, BaseConnector]:
     """
-    Ejecuta un conector completo.
-    
-    Args:
-        platform_id: ID de la plataforma (ej "egestiona")
-        tenant_id: ID del tenant/empresa (opcional)
-        headless: Si ejecutar en modo headless
-        max_items: Máximo número de items a procesar
-        base_url: URL base del portal (opcional)
-        evidence_base_dir: Directorio base para evidencias (opcional)
-    
-    Returns:
-        Resumen JSON con counts y results
+    Crea el contexto de ejecución, el directorio de evidencias y el conector.
     
     Raises:
-        ValueError: Si el conector no está registrado
-        Exception: Si hay errores durante la ejecución
+        ValueError: Si el conector no está registrado o la política de capturas no es válida
     """
+    policy = resolve_screenshot_policy(screenshot_policy)
+    
     # Crear contexto de ejecución
-    run_id = RunContext.create_run_id()
+    run_id = run_id or RunContext.create_run_id()
     
     # Crear directorio de evidencias
     if evidence_base_dir:
@@ -214,6 +209,7 @@ async def run_connector(
         headless=headless,
         dry_run=dry_run,
         evidence_dir=str(evidence_dir),
+        screenshot_policy=policy,
     )
     
     # Obtener conector
@@ -221,9 +217,54 @@ async def run_connector(
     if not connector:
         raise ValueError(f"Connector for platform '{platform_id}' not found")
     
-    # Inicializar Playwright
-    playwright = await async_playwright().start()
-    browser: Optional[Browser] = None
+    return ctx, connector
+
+
+async def _capture_failure(page: Optional[Page], path: Path, policy: str) -> None:
+    """Captura de error best-effort (la página puede estar cerrada o colgada)."""
+    if page is None:
+        return
+    try:
+        await capture_screenshot(page, path, policy, failure=True)
+    except Exception:
+        pass
+
+
+async def run_connector_in_browser(
+    browser: Browser,
+    ctx: RunContext,
+    connector: BaseConnector,
+    max_items: int = 5,
+    throttle: Optional[Callable[[], Awaitable[None]]] = None,
+) -> Dict[str, Any]:
+    """
+    Ejecuta un conector ya preparado en un BrowserContext propio de `browser`.
+    
+    El contexto (cookies, storage, sesión) es exclusivo del run y se cierra al terminar,
+    de modo que varios runs pueden compartir el mismo proceso de navegador.
+    
+    Args:
+        browser: Navegador Playwright (propio o compartido por el fleet)
+        ctx: Contexto de ejecución (ver _prepare_run)
+        connector: Conector instanciado con ctx
+        max_items: Máximo número de items a procesar
+        throttle: Corutina opcional que se espera antes de cada interacción con el portal
+            (login, navegación, subida); el fleet la usa para limitar el ritmo por plataforma
+    
+    Returns:
+        Resumen JSON con counts y results
+    """
+    run_id = ctx.run_id
+    platform_id = ctx.platform_id
+    tenant_id = ctx.tenant_id
+    dry_run = ctx.dry_run
+    evidence_dir = Path(ctx.evidence_dir)
+    policy = ctx.screenshot_policy
+    
+    async def _throttle() -> None:
+        if throttle is not None:
+            await throttle()
+    
     context: Optional[BrowserContext] = None
     page: Optional[Page] = None
     
@@ -237,8 +278,6 @@ async def run_connector(
     }
     
     try:
-        # Lanzar navegador
-        browser = await playwright.chromium.launch(headless=headless)
         context = await browser.new_context(
             viewport={"width": 1280, "height": 720}
         )
@@ -246,9 +285,11 @@ async def run_connector(
         
         # 1. Login
         try:
+            await _throttle()
             await connector.login(page)
-            await page.screenshot(path=str(evidence_dir / "01_login.png"), full_page=True)
+            await capture_screenshot(page, evidence_dir / "01_login.png", policy)
         except Exception as e:
+            await _capture_failure(page, evidence_dir / "01_login_error.png", policy)
             error_msg = f"Login failed: {str(e)}"
             return {
                 "run_id": run_id,
@@ -260,9 +301,11 @@ async def run_connector(
         
         # 2. Navegar a pendientes
         try:
+            await _throttle()
             await connector.navigate_to_pending(page)
-            await page.screenshot(path=str(evidence_dir / "02_pending.png"), full_page=True)
+            await capture_screenshot(page, evidence_dir / "02_pending.png", policy)
         except Exception as e:
+            await _capture_failure(page, evidence_dir / "02_pending_error.png", policy)
             error_msg = f"Navigation to pending failed: {str(e)}"
             return {
                 "run_id": run_id,
@@ -335,6 +378,7 @@ async def run_connector(
                     continue
                 
                 try:
+                    await _throttle()
                     upload_result = await connector.upload_one(page, req, doc_id)
                     
                     if upload_result.success:
@@ -351,13 +395,18 @@ async def run_connector(
                         "evidence": upload_result.evidence,
                     })
                     
-                    # Screenshot después de cada subida
+                    # Screenshot después de cada subida (según política)
                     if page:
-                        screenshot_path = evidence_dir / f"upload_{req.id[:8]}.png"
-                        await page.screenshot(path=str(screenshot_path), full_page=True)
-                        if upload_result.evidence:
-                            upload_result.evidence["screenshot"] = str(screenshot_path)
+                        screenshot_path = await capture_screenshot(
+                            page,
+                            evidence_dir / f"upload_{req.id[:8]}.png",
+                            policy,
+                            failure=not upload_result.success,
+                        )
+                        if screenshot_path and upload_result.evidence:
+                            upload_result.evidence["screenshot"] = screenshot_path
                 except Exception as e:
+                    await _capture_failure(page, evidence_dir / f"upload_{req.id[:8]}_error.png", policy)
                     counts["failed"] += 1
                     results.append({
                         "requirement_id": req.id,
@@ -397,11 +446,62 @@ async def run_connector(
         return summary
     
     finally:
-        # Cerrar navegador
+        # Cerrar contexto (el navegador pertenece al llamador)
         if page:
             await page.close()
         if context:
             await context.close()
+
+
+async def run_connector(
+    platform_id: str,
+    tenant_id: Optional[str] = None,
+    headless: bool = True,
+    max_items: int = 5,
+    base_url: Optional[str] = None,
+    evidence_base_dir: Optional[str] = None,
+    dry_run: bool = False,
+    screenshot_policy: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Ejecuta un conector completo.
+    
+    Args:
+        platform_id: ID de la plataforma (ej "egestiona")
+        tenant_id: ID del tenant/empresa (opcional)
+        headless: Si ejecutar en modo headless
+        max_items: Máximo número de items a procesar
+        base_url: URL base del portal (opcional)
+        evidence_base_dir: Directorio base para evidencias (opcional)
+        screenshot_policy: Política de capturas (por defecto CONNECTOR_SCREENSHOT_POLICY o "full")
+    
+    Returns:
+        Resumen JSON con counts y results
+    
+    Raises:
+        ValueError: Si el conector no está registrado
+        Exception: Si hay errores durante la ejecución
+    """
+    ctx, connector = _prepare_run(
+        platform_id,
+        tenant_id=tenant_id,
+        headless=headless,
+        base_url=base_url,
+        evidence_base_dir=evidence_base_dir,
+        dry_run=dry_run,
+        screenshot_policy=screenshot_policy,
+    )
+    
+    # Inicializar Playwright
+    playwright = await async_playwright().start()
+    browser: Optional[Browser] = None
+    
+    try:
+        # Lanzar navegador
+        browser = await playwright.chromium.launch(headless=headless)
+        return await run_connector_in_browser(browser, ctx, connector, max_items=max_items)
+    finally:
+        # Cerrar navegador
         if browser:
             await browser.close()
         await playwright.stop()
@@ -12,8 +12,9 @@ from __future__ import annotations
 
 import asyncio
 import json
+import os
 import sys
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
@@ -24,6 +25,7 @@ from backend.shared.executor_contracts_v1 import (
     ExecutorErrorV1,
     ErrorStageV1,
     ErrorSeverityV1,
+    SignatureModeV1,
     StateSignatureV1,
     TargetKindV1,
     TargetV1,
@@ -33,7 +35,7 @@ from backend.shared.executor_contracts_v1 import (
     compute_state_signature_v1,
 )
 
-from backend.executor.redaction_v1 import RedactorV1
+from backend.executor.redaction_v1 import DEFAULT_STREAM_CHUNK_CHARS, RedactorV1, iter_string_chunks
 
 def _sha256_bytes(data: bytes) -> str:
     import hashlib
@@ -66,6 +68,11 @@ class ExecutionProfileV1:
     action_timeout_ms: int = 5000
     observation_text_max_len: int = 3000
     max_visible_items: int = 60
+    # Modo de firma de estado por observación (EXECUTOR_SIGNATURE_MODE, default dom_structural).
+    # La captura full-page a disco se reserva a fallos/acciones críticas (capture_screenshot_file).
+    signature_mode: str = field(
+        default_factory=lambda: os.getenv("EXECUTOR_SIGNATURE_MODE", SignatureModeV1.dom_structural.value)
+    )
 
 
 class ExecutorTypedException(Exception):
@@ -111,21 +118,26 @@ class BrowserController:
 
         self._playwright = sync_playwright().start()
 
-        if user_data_dir:
-            # persistent context
-            ctx = self._playwright.chromium.launch_persistent_context(
-                user_data_dir=user_data_dir,
-                headless=headless,
-                viewport=viewport or {"width": 1280, "height": 720},
-            )
-            self._context = ctx
-            self._browser = None
-            pages = ctx.pages
-            self._page = pages[0] if pages else ctx.new_page()
-        else:
-            self._browser = self._playwright.chromium.launch(headless=headless)
-            self._context = self._browser.new_context(viewport=viewport or {"width": 1280, "height": 720})
-            self._page = self._context.new_page()
+        try:
+            if user_data_dir:
+                # persistent context
+                ctx = self._playwright.chromium.launch_persistent_context(
+                    user_data_dir=user_data_dir,
+                    headless=headless,
+                    viewport=viewport or {"width": 1280, "height": 720},
+                )
+                self._context = ctx
+                self._browser = None
+                pages = ctx.pages
+                self._page = pages[0] if pages else ctx.new_page()
+            else:
+                self._browser = self._playwright.chromium.launch(headless=headless)
+                self._context = self._browser.new_context(viewport=viewport or {"width": 1280, "height": 720})
+                self._page = self._context.new_page()
+        except BaseException:
+            # Sin navegador no quedarse con Playwright (y su event loop) vivo en este hilo
+            self.close()
+            raise
 
     def close(self) -> None:
         """
@@ -355,17 +367,24 @@ class BrowserController:
         evidence_dir: Path,
         phase: str = "before",
         redactor: Optional[RedactorV1] = None,
+        signature_mode: Optional[str] = None,
     ) -> Tuple[DomSnapshotV1, StateSignatureV1, List[EvidenceItemV1]]:
         """
         Captura:
         - DomSnapshotV1 real (parcial)
-        - StateSignatureV1 real (incluye screenshot_hash)
+        - StateSignatureV1 real (incluye screenshot_hash y signature_mode)
         - EvidenceItemV1[] (dom_snapshot_partial + screenshot_hash)
 
         No guarda screenshot por defecto; solo crea `.sha256`.
+        signature_mode (default: profile.signature_mode) decide cómo se obtiene screenshot_hash:
+        hash estructural del DOM (sin screenshot), viewport, viewport_lowres o full_page.
         """
         if not self._page:
             raise RuntimeError("BrowserController not started")
+        try:
+            mode = SignatureModeV1(signature_mode or self.profile.signature_mode)
+        except ValueError:
+            mode = SignatureModeV1.full_page
 
         evidence_dir.mkdir(parents=True, exist_ok=True)
         dom_dir = evidence_dir / "dom"
@@ -383,7 +402,7 @@ class BrowserController:
 
         # Extract visible elements determinísticamente (sin heurísticas creativas)
         extracted: Dict[str, Any] = page.evaluate(
-            """(maxItems) => {
+            """([maxItems, withStructure]) => {
               const isVisible = (el) => {
                 try {
                   const style = window.getComputedStyle(el);
@@ -446,9 +465,31 @@ class BrowserController:
                 if (buttons.length >= maxItems) break;
               }
 
-              return { anchors, inputs, buttons, visible_text: norm(document.body ? (document.body.innerText || '') : '') };
+              // Hash estructural (FNV-1a 32 bits) sobre tag/id/nº clases/nº hijos, acotado
+              let structure_hash = 0x811c9dc5;
+              let structure_nodes = 0;
+              if (withStructure && document.body) {
+                const walker = document.createTreeWalker(document.body, NodeFilter.SHOW_ELEMENT);
+                let node = walker.currentNode;
+                while (node && structure_nodes < 20000) {
+                  const token = node.tagName + '#' + (node.id || '') + '.' + (node.classList ? node.classList.length : 0) + ':' + node.childElementCount + ';';
+                  for (let k = 0; k < token.length; k++) {
+                    structure_hash ^= token.charCodeAt(k);
+                    structure_hash = Math.imul(structure_hash, 0x01000193) >>> 0;
+                  }
+                  structure_nodes++;
+                  node = walker.nextNode();
+                }
+              }
+
+              return {
+                anchors, inputs, buttons,
+                visible_text: norm(document.body ? (document.body.innerText || '') : ''),
+                structure_hash: structure_hash.toString(16),
+                structure_nodes,
+              };
             }""",
-            self.profile.max_visible_items,
+            [self.profile.max_visible_items, mode == SignatureModeV1.dom_structural],
         )
 
         anchors = [
@@ -517,19 +558,25 @@ class BrowserController:
         dom_path.write_text(json.dumps(dom_snapshot.model_dump(), ensure_ascii=False, indent=2), encoding="utf-8")
 
         # screenshot bytes -> hash (no guardamos imagen por defecto)
-        try:
-            shot_bytes = page.screenshot(full_page=True)
-        except Exception as e:
-            raise ExecutorTypedException(
-                ExecutorErrorV1(
-                    error_code="EVIDENCE_SCREENSHOT_FAILED",
-                    stage=ErrorStageV1.evidence,
-                    severity=ErrorSeverityV1.error,
-                    message="failed to capture screenshot bytes",
-                    retryable=False,
-                    cause=repr(e),
+        if mode == SignatureModeV1.dom_structural:
+            shot_bytes = f"dom:{extracted.get('structure_hash')}:{extracted.get('structure_nodes')}".encode("utf-8")
+        else:
+            try:
+                if mode == SignatureModeV1.viewport_lowres:
+                    shot_bytes = page.screenshot(full_page=False, scale="css", type="jpeg", quality=30)
+                else:
+                    shot_bytes = page.screenshot(full_page=(mode == SignatureModeV1.full_page))
+            except Exception as e:
+                raise ExecutorTypedException(
+                    ExecutorErrorV1(
+                        error_code="EVIDENCE_SCREENSHOT_FAILED",
+                        stage=ErrorStageV1.evidence,
+                        severity=ErrorSeverityV1.error,
+                        message="failed to capture screenshot bytes",
+                        retryable=False,
+                        cause=repr(e),
+                    )
                 )
-            )
 
         import hashlib
 
@@ -555,6 +602,7 @@ class BrowserController:
             visible_text=visible_text,
             screenshot_hash=screenshot_hash,
             visible_text_max_len=self.profile.observation_text_max_len,
+            signature_mode=mode,
         )
 
         items = [
@@ -604,8 +652,12 @@ class BrowserController:
                 )
             )
         if redactor and redactor.enabled:
-            html = redactor.redact_html(html)
-        path.write_text(html, encoding="utf-8")
+            # HTML grande: redacción por trozos directa a disco
+            with open(path, "w", encoding="utf-8") as f:
+                for part in redactor.iter_redact_html(iter_string_chunks(html, DEFAULT_STREAM_CHUNK_CHARS)):
+                    f.write(part)
+        else:
+            path.write_text(html, encoding="utf-8")
         return EvidenceItemV1(
             kind=EvidenceKindV1.html_full,
             step_id=step_id,
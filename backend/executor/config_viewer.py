@@ -26,7 +26,7 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from backend.executor.runtime_h4 import ExecutorRuntimeH4
 from backend.executor.threaded_runtime import run_actions_threaded
 from starlette.concurrency import run_in_threadpool
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
 from backend.repository.secrets_store_v1 import SecretsStoreV1
 from backend.shared.executor_contracts_v1 import (
@@ -206,7 +206,7 @@ def _create_stub_run_dir(*, base_dir: Path, message: str, details: Optional[Dict
 def create_config_viewer_router(*, base_dir: Path) -> APIRouter:
     router = APIRouter(tags=["config"])
     base_dir = ensure_data_layout(base_dir=base_dir)
-    store = ConfigStoreV1(base_dir=base_dir)
+    store = get_config_store(base_dir)
     secrets = SecretsStoreV1(base_dir=base_dir)
 
     @router.get("/config", response_class=HTMLResponse)
@@ -289,12 +289,11 @@ def create_config_viewer_router(*, base_dir: Path) -> APIRouter:
             # Obtener opciones de empresas propias
             try:
                 # get_coordination_context_options es async, pero estamos en función sync
-                # Usar ConfigStore directamente para evitar dependencia async
+                # Usar el ConfigStore compartido directamente para evitar dependencia async
                 from backend.config import DATA_DIR
-                from backend.repository.config_store_v1 import ConfigStoreV1 as StoreHelper
                 from backend.shared.org_v1 import OrgV1 as OrgHelper
                 
-                helper_store = StoreHelper(base_dir=DATA_DIR)
+                helper_store = get_config_store(DATA_DIR)
                 helper_org = helper_store.load_org()
                 own_companies = [
                     type('CompanyOption', (), {
@@ -7,13 +7,22 @@ Redacta PII/credenciales/tokens en:
 - trace payloads (dict/list JSON-serializable)
 
 Mantiene un redaction_report (contadores por tipo).
+
+Motor: regex precompiladas a nivel de módulo, un detector combinado (alternación de
+todos los patrones) que descarta en una sola pasada los textos sin nada que redactar
+(la mayoría de valores de trace) y subn() por tipo, que cuenta y sustituye a la vez.
+Las pasadas por tipo se mantienen en el orden original: una alternación única cambia
+el resultado cuando matches de tipos distintos se solapan (p.ej. "600 123 456.x@y.com").
+iter_redact_text / iter_redact_html redactan por trozos (HTML grande) cortando solo en
+fronteras de línea que ningún patrón puede cruzar: mismo resultado y mismo report.
 """
 
 from __future__ import annotations
 
+import functools
 import re
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 DEFAULT_SENSITIVE_KEYWORDS = (
@@ -42,12 +51,67 @@ NIE_RE = re.compile(r"\b[XYZ]\d{7}[A-Z]\b", re.IGNORECASE)
 # Evita falsos positivos sobre valores de schema tipo "observation_captured" (minúsculas + _).
 TOKEN_RE = re.compile(r"\b(?=[A-Za-z0-9_\-]{20,}\b)(?=.*(\d|[A-Z]))[A-Za-z0-9_\-]{20,}\b")
 
+# Equivalente a TOKEN_RE con lookahead perezoso: solo importa que exista un dígito/mayúscula
+# en el resto de la línea; ".*" recorría la línea entera (HTML minificado: O(n²)).
+_TOKEN_SCAN_RE = re.compile(r"\b(?=[A-Za-z0-9_\-]{20,}\b)(?=.*?[\dA-Z])[A-Za-z0-9_\-]{20,}\b")
+
+# Orden de aplicación (cada pasada ve el resultado de la anterior)
+_TEXT_PASSES: Tuple[Tuple[re.Pattern, str], ...] = (
+    (EMAIL_RE, "email"),
+    (PHONE_RE, "phone"),
+    (NIF_RE, "dni_nif"),
+    (NIE_RE, "dni_nie"),
+    (_TOKEN_SCAN_RE, "token"),
+)
+
+# Detector combinado: encuentra algo si y solo si alguna de las pasadas tendría match
+_ANY_RE = re.compile(
+    "|".join(
+        f"(?i:{rx.pattern})" if rx.flags & re.IGNORECASE else f"(?:{rx.pattern})"
+        for rx, _ in _TEXT_PASSES
+    )
+)
+
+_INPUT_OPEN_RE = re.compile(r"<input", re.IGNORECASE)
+_PASSWORD_INPUT_RE = re.compile(r'(<input[^>]*type=["\']password["\'][^>]*value=["\'])([^"\']*)(["\'])', re.IGNORECASE)
+_NAMED_INPUT_RE = re.compile(r'(<input[^>]*(?:name|id)=["\']([^"\']+)["\'][^>]*value=["\'])([^"\']*)(["\'])', re.IGNORECASE)
+_VALUE_OPEN_RE = re.compile(r'value=["\']', re.IGNORECASE)
+_QUOTE_RE = re.compile(r'["\']')
 
+# Frontera segura para trocear: tras "\n" y antes de un carácter que no puede continuar un teléfono
+_SAFE_CUT_RE = re.compile(r"\n(?=[^\d\s\-])")
+
+DEFAULT_STREAM_CHUNK_CHARS = 256 * 1024
+
+
+@functools.lru_cache(maxsize=4096)
 def _key_is_sensitive(key: str) -> bool:
     k = (key or "").lower()
     return any(s in k for s in DEFAULT_SENSITIVE_KEYWORDS)
 
 
+def iter_string_chunks(s: str, size: int) -> Iterator[str]:
+    for start in range(0, len(s), size):
+        yield s[start:start + size]
+
+
+def _safe_cuts(buf: str, start: int = 0) -> List[int]:
+    """Posiciones de corte seguras en buf a partir de start (orden ascendente)."""
+    return [m.end() for m in _SAFE_CUT_RE.finditer(buf, max(0, start))]
+
+
+def _html_cut_is_safe(buf: str, cut: int) -> bool:
+    """Ningún match de los patrones <input ... value="..."> empezado antes de cut puede cruzarlo."""
+    for m in _INPUT_OPEN_RE.finditer(buf, 0, cut):
+        tag_end = buf.find(">", m.start(), cut)
+        if tag_end == -1:
+            return False
+        for vm in _VALUE_OPEN_RE.finditer(buf, m.start(), tag_end):
+            if _QUOTE_RE.search(buf, vm.end(), cut) is None:
+                return False
+    return True
+
+
 @dataclass
 class RedactionReport:
     counts: Dict[str, int] = field(default_factory=dict)
@@ -62,26 +126,43 @@ class RedactorV1:
         self.strict = strict
         self.report = RedactionReport()
 
-    def redact_text(self, s: str) -> str:
-        if not self.enabled or not s:
-            return s
+    def _redact_text_passes(self, s: str) -> Tuple[str, int]:
+        """Pasadas de texto (sin text_redactions). Devuelve (texto, nº de sustituciones)."""
+        if _ANY_RE.search(s) is None:
+            return s, 0
+        total = 0
+        for rx, kind in _TEXT_PASSES:
+            s, n = rx.subn("***", s)
+            if n:
+                self.report.inc(kind, n)
+                total += n
+        return s, total
+
+    def _redact_input_values(self, html: str) -> str:
+        if _INPUT_OPEN_RE.search(html) is None:
+            return html
 
-        original = s
+        # Redactar value="..." de inputs password y campos con nombres sensibles (regex conservador)
+        # type=password
+        html, n = _PASSWORD_INPUT_RE.subn(r"\1***\3", html)
+        if n:
+            self.report.inc("password_value", n)
 
-        def sub_and_count(rx: re.Pattern, kind: str, txt: str) -> str:
-            matches = list(rx.finditer(txt))
-            if matches:
-                self.report.inc(kind, len(matches))
-                txt = rx.sub("***", txt)
-            return txt
+        # name/id sensibles
+        def _named(mm: re.Match) -> str:
+            if _key_is_sensitive(mm.group(2) or ""):
+                self.report.inc("sensitive_input_value", 1)
+                return mm.group(1) + "***" + mm.group(4)
+            return mm.group(0)
 
-        s = sub_and_count(EMAIL_RE, "email", s)
-        s = sub_and_count(PHONE_RE, "phone", s)
-        s = sub_and_count(NIF_RE, "dni_nif", s)
-        s = sub_and_count(NIE_RE, "dni_nie", s)
-        s = sub_and_count(TOKEN_RE, "token", s)
+        return _NAMED_INPUT_RE.sub(_named, html)
 
-        if s != original:
+    def redact_text(self, s: str) -> str:
+        if not self.enabled or not s:
+            return s
+        s, total = self._redact_text_passes(s)
+        # Toda sustitución cambia el texto ("***" no casa con ningún patrón)
+        if total:
             self.report.inc("text_redactions", 1)
         return s
 
@@ -89,25 +170,49 @@ class RedactorV1:
         if not self.enabled or not html:
             return html
         # Redacción general por regex + value/password patterns
-        red = self.redact_text(html)
+        return self._redact_input_values(self.redact_text(html))
+
+    def _iter_redact(self, chunks: Iterable[str], *, html: bool) -> Iterator[str]:
+        buf = ""
+        changed = False
+        for chunk in chunks:
+            if not chunk:
+                continue
+            scanned = len(buf) - 1  # solo buscar cortes en la parte nueva (el "\n" puede ser el último char)
+            buf += chunk
+            cuts = _safe_cuts(buf, scanned)
+            if html:
+                cuts = next(([c] for c in reversed(cuts) if _html_cut_is_safe(buf, c)), [])
+            if not cuts:
+                continue
+            cut = cuts[-1]
+            part, n = self._redact_text_passes(buf[:cut])
+            changed = changed or n > 0
+            yield self._redact_input_values(part) if html else part
+            buf = buf[cut:]
+        if buf:
+            part, n = self._redact_text_passes(buf)
+            changed = changed or n > 0
+            yield self._redact_input_values(part) if html else part
+        if changed:
+            self.report.inc("text_redactions", 1)
 
-        # Redactar value="..." de inputs password y campos con nombres sensibles (regex conservador)
-        # type=password
-        pw_rx = re.compile(r'(<input[^>]*type=["\']password["\'][^>]*value=["\'])([^"\']*)(["\'])', re.IGNORECASE)
-        m = list(pw_rx.finditer(red))
-        if m:
-            self.report.inc("password_value", len(m))
-            red = pw_rx.sub(r"\1***\3", red)
+    def iter_redact_text(self, chunks: Iterable[str]) -> Iterator[str]:
+        """
+        Redacción por trozos: concatenar la salida == redact_text("".join(chunks)),
+        con el mismo report. Solo corta en fronteras de línea que ningún patrón cruza.
+        """
+        if not self.enabled:
+            yield from chunks
+            return
+        yield from self._iter_redact(chunks, html=False)
 
-        # name/id sensibles
-        named_rx = re.compile(r'(<input[^>]*(?:name|id)=["\']([^"\']+)["\'][^>]*value=["\'])([^"\']*)(["\'])', re.IGNORECASE)
-        out = red
-        for mm in list(named_rx.finditer(out)):
-            key = mm.group(2) or ""
-            if _key_is_sensitive(key):
-                self.report.inc("sensitive_input_value", 1)
-                out = out.replace(mm.group(0), mm.group(1) + "***" + mm.group(4))
-        return out
+    def iter_redact_html(self, chunks: Iterable[str]) -> Iterator[str]:
+        """Como iter_redact_text, equivalente a redact_html (no corta dentro de <input ...>)."""
+        if not self.enabled:
+            yield from chunks
+            return
+        yield from self._iter_redact(chunks, html=True)
 
     def redact_jsonable(self, obj: Any, *, parent_key: Optional[str] = None) -> Any:
         """
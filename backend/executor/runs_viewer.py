@@ -17,6 +17,7 @@ import json
 import os
 import re
 import tempfile
+from urllib.parse import urlencode
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
@@ -27,6 +28,7 @@ from fastapi.responses import FileResponse, HTMLResponse, JSONResponse, PlainTex
 
 from backend.executor.runtime_h4 import ExecutorRuntimeH4
 from backend.executor.threaded_runtime import run_actions_threaded
+from backend.shared.run_index_v1 import get_executor_run_index
 from backend.shared.executor_contracts_v1 import (
     EvidenceManifestV1,
     ExecutionModeV1,
@@ -49,6 +51,8 @@ DEFAULT_MAX_TEXT_BYTES = 2 * 1024 * 1024  # 2MB (html_full / json / trace)
 DEFAULT_MAX_TRACE_BYTES = 2 * 1024 * 1024
 
 RUN_LEVEL_STEP_ID = "run"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 
 @dataclass(frozen=True)
@@ -59,6 +63,8 @@ class RunIndexItem:
     status: str
     mode: Optional[str]
     last_error: Optional[str]
+    duration_ms: Optional[int] = None
+    counters: Optional[Dict[str, Any]] = None
 
 
 @dataclass(frozen=True)
@@ -373,29 +379,46 @@ def parse_run(run_dir: Path) -> ParsedRun:
     )
 
 
-def list_runs(runs_root: Path) -> List[RunIndexItem]:
+def list_runs_page(
+    runs_root: Path,
+    *,
+    status: Optional[str] = None,
+    mode: Optional[str] = None,
+    q: Optional[str] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+) -> Tuple[List[RunIndexItem], int]:
+    """
+    Página de runs (desc por started_at) desde el índice persistente y total filtrado.
+
+    No parsea trace.jsonl: el índice lo mantiene ExecutorRuntimeH4 (se reconstruye
+    escaneando runs_root solo si falta el fichero de índice).
+    """
+    runs_root = Path(runs_root)
     if not runs_root.exists():
-        return []
-    items: List[RunIndexItem] = []
-    for p in runs_root.iterdir():
-        if not p.is_dir():
-            continue
-        trace = p / "trace.jsonl"
-        if not trace.exists():
-            continue
-        parsed = parse_run(p)
-        items.append(
-            RunIndexItem(
-                run_id=parsed.run_id,
-                started_at=parsed.started_at,
-                finished_at=parsed.finished_at,
-                status=parsed.status,
-                mode=parsed.mode,
-                last_error=parsed.last_error,
-            )
-        )
-    # Orden desc por started_at (string ISO) y fallback por nombre
-    items.sort(key=lambda x: (x.started_at or "", x.run_id), reverse=True)
+        return [], 0
+    needle = q.lower() if q else None
+
+    def _match(record: Dict[str, Any]) -> bool:
+        if status and record.get("status") != status:
+            return False
+        if mode and record.get("mode") != mode:
+            return False
+        if needle and needle not in record["run_id"].lower() and needle not in (record.get("last_error") or "").lower():
+            return False
+        return True
+
+    records, total = get_executor_run_index(runs_root).query(
+        where=_match if (status or mode or needle) else None,
+        offset=max(0, offset),
+        limit=limit,
+    )
+    fields = RunIndexItem.__dataclass_fields__
+    return [RunIndexItem(**{k: v for k, v in r.items() if k in fields}) for r in records], total
+
+
+def list_runs(runs_root: Path) -> List[RunIndexItem]:
+    items, _ = list_runs_page(runs_root)
     return items
 
 
@@ -459,10 +482,39 @@ def create_runs_viewer_router(*, runs_root: Path) -> APIRouter:
     inspections_root = (data_root / "documents" / "_inspections").resolve()
 
     @router.get("/runs", response_class=HTMLResponse)
-    def runs_index(request: Request, format: Optional[str] = None):
-        rows = list_runs(runs_root)
+    def runs_index(
+        request: Request,
+        format: Optional[str] = None,
+        status: Optional[str] = None,
+        mode: Optional[str] = None,
+        q: Optional[str] = None,
+        offset: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ):
+        offset = max(0, offset)
+        limit = min(max(1, limit), MAX_PAGE_SIZE)
+        rows, total = list_runs_page(runs_root, status=status, mode=mode, q=q, offset=offset, limit=limit)
         if _wants_json(request, format):
-            return JSONResponse([r.__dict__ for r in rows])
+            return JSONResponse(
+                [r.__dict__ for r in rows],
+                headers={"X-Total-Count": str(total), "X-Offset": str(offset), "X-Limit": str(limit)},
+            )
+
+        def _page_link(label: str, page_offset: int) -> str:
+            params = {k: v for k, v in (("status", status), ("mode", mode), ("q", q)) if v}
+            params.update({"offset": page_offset, "limit": limit})
+            return f'<a class="btn" href="/runs?{html.escape(urlencode(params))}">{label}</a>'
+
+        links = []
+        if offset > 0:
+            links.append(_page_link("&laquo; Anteriores", max(0, offset - limit)))
+        if offset + limit < total:
+            links.append(_page_link("Siguientes &raquo;", offset + limit))
+        shown_to = min(offset + len(rows), total)
+        pager = (
+            f'<div class="row" style="align-items:center; margin:8px 0;">'
+            f'<span class="muted">{offset + 1 if rows else 0}–{shown_to} de {total}</span>{"".join(links)}</div>'
+        )
 
         trs = []
         for r in rows:
@@ -493,6 +545,13 @@ def create_runs_viewer_router(*, runs_root: Path) -> APIRouter:
   </div>
 </div>
 <h3>Runs recientes</h3>
+<form method="get" action="/runs" class="row" style="align-items:center; margin-bottom:12px;">
+  <input name="q" placeholder="run_id / error" value="{html.escape(q or '')}"/>
+  <input name="status" placeholder="status" value="{html.escape(status or '')}"/>
+  <input name="mode" placeholder="mode" value="{html.escape(mode or '')}"/>
+  <button class="btn" type="submit">Filtrar</button>
+</form>
+{pager}
 <table>
   <thead>
     <tr>
@@ -503,6 +562,7 @@ def create_runs_viewer_router(*, runs_root: Path) -> APIRouter:
     {''.join(trs) if trs else '<tr><td colspan="6" class="muted">No hay runs todavía.</td></tr>'}
   </tbody>
 </table>
+{pager}
 """
         return HTMLResponse(_page("Runs", body))
 
@@ -29,9 +29,13 @@ from backend.executor.action_compiler_v1 import (
 )
 from backend.executor.browser_controller import BrowserController, ExecutionProfileV1, ExecutorTypedException
 from backend.executor.redaction_v1 import RedactorV1
+from backend.executor.trace_sink_v1 import EvidenceManifestWriterV1, TraceSinkV1
 from backend.inspector.document_inspector_v1 import DocumentInspectorV1
 from backend.repository.document_repository_v1 import DocumentRepositoryV1
 from backend.repository.secrets_store_v1 import SecretsStoreV1
+from backend.runs.background_runs_v1 import cancel_requested, report_progress
+from backend.runs.run_timeline import EventType
+from backend.shared.run_index_v1 import executor_run_record, get_executor_run_index
 from backend.shared.executor_contracts_v1 import (
     ExecutionModeV1,
     RuntimeExecutionMode,
@@ -40,7 +44,6 @@ from backend.shared.executor_contracts_v1 import (
     ConditionKindV1,
     EvidenceItemV1,
     EvidenceKindV1,
-    EvidenceManifestV1,
     EvidencePolicyV1,
     EvidenceRefV1,
     ExecutorErrorV1,
@@ -116,6 +119,7 @@ class ExecutorRuntimeH4:
     def run_actions(self, *, url: str, actions: List[ActionSpecV1], headless: bool = True, fail_fast: bool = False, execution_mode: RuntimeExecutionMode = "explore") -> Path:
         run_id = f"r_{uuid.uuid4().hex}"
         run_dir = self.runs_root / run_id
+        report_progress(f"Run de ejecución {run_id} creado", runtime_run_id=run_id)
         evidence_dir = run_dir / "evidence"
         (evidence_dir / "dom").mkdir(parents=True, exist_ok=True)
         (evidence_dir / "shots").mkdir(parents=True, exist_ok=True)
@@ -125,7 +129,9 @@ class ExecutorRuntimeH4:
         manifest_path = run_dir / "evidence_manifest.json"
 
         seq = 0
-        manifest_items: List[EvidenceItemV1] = []
+        # trace.jsonl con handle abierto y buffer; manifest incremental
+        trace_sink = TraceSinkV1(trace_path)
+        manifest_writer = EvidenceManifestWriterV1(manifest_path)
 
         # H8.E2: Status final por defecto es SUCCESS (solo cambia si hay errores explícitos)
         # Nota: No usar anotaciones de tipo aquí para permitir nonlocal en funciones anidadas
@@ -170,20 +176,28 @@ class ExecutorRuntimeH4:
 
         redactor = RedactorV1(enabled=bool(self.redaction_policy.enabled), strict=True)
 
+        def index_run(**fields: Any) -> None:
+            """Registra el run en el índice del viewer (best-effort: nunca rompe el run)."""
+            try:
+                get_executor_run_index(self.runs_root).upsert(
+                    executor_run_record(run_id, mode=self.execution_mode.value, **fields)
+                )
+            except Exception as e:
+                print(f"[runtime_h4] No se pudo actualizar el índice de runs: {e}")
+
         def emit(ev: TraceEventV1) -> None:
             nonlocal seq
             seq += 1
             ev.seq = seq
-            with open(trace_path, "a", encoding="utf-8") as f:
-                payload = ev.model_dump(mode="json")
-                # redaction en trace payload
-                payload = redactor.redact_jsonable(payload)
-                f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+            payload = ev.model_dump(mode="json")
+            # redaction en trace payload
+            payload = redactor.redact_jsonable(payload)
+            trace_sink.write(payload)
 
         def add_evidence(step_id: str, state_before: Optional[StateSignatureV1], state_after: Optional[StateSignatureV1], items: List[EvidenceItemV1]) -> None:
             if not items:
                 return
-            manifest_items.extend(items)
+            manifest_writer.add_items(items)
             emit(
                 TraceEventV1(
                     run_id=run_id,
@@ -198,22 +212,20 @@ class ExecutorRuntimeH4:
             )
 
         def write_manifest() -> None:
-            manifest = EvidenceManifestV1(
+            manifest_writer.write(
                 run_id=run_id,
                 policy=EvidencePolicyV1(
                     always=[EvidenceKindV1.dom_snapshot_partial, EvidenceKindV1.screenshot],
                     on_failure_or_critical=[EvidenceKindV1.html_full],
                 ),
                 redaction=RedactionPolicyV1(enabled=bool(self.redaction_policy.enabled), rules=list(self.redaction_policy.rules or []), mode=self.execution_mode),
-                items=manifest_items or [
-                    EvidenceItemV1(
-                        kind=EvidenceKindV1.dom_snapshot_partial,
-                        step_id="none",
-                        relative_path="evidence/dom/none.json",
-                        sha256="0" * 64,
-                        size_bytes=0,
-                    )
-                ],
+                placeholder=EvidenceItemV1(
+                    kind=EvidenceKindV1.dom_snapshot_partial,
+                    step_id="none",
+                    relative_path="evidence/dom/none.json",
+                    sha256="0" * 64,
+                    size_bytes=0,
+                ),
                 redaction_report=dict(redactor.report.counts) if redactor.enabled else None,
                 metadata={
                     "execution_mode": self.execution_mode.value,
@@ -221,7 +233,6 @@ class ExecutorRuntimeH4:
                     "inputs_used": sorted(set(inputs_used)),
                 },
             )
-            manifest_path.write_text(json.dumps(manifest.model_dump(mode="json"), ensure_ascii=False, indent=2), encoding="utf-8")
 
         def _write_run_finished_json(
             path: Path,
@@ -257,6 +268,14 @@ class ExecutorRuntimeH4:
                 },
             }
             path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding="utf-8")
+            index_run(
+                status=status,
+                started_at=started_at_val,
+                finished_at=finished_at_val,
+                duration_ms=duration_ms_val,
+                last_error=last_error_val,
+                counters=data["counters"],
+            )
 
         def emit_run_finished(status: str, reason: Optional[str] = None, error: Optional[str] = None, error_code_val: Optional[str] = None, state_after: Optional[StateSignatureV1] = None) -> None:
             """
@@ -358,6 +377,7 @@ class ExecutorRuntimeH4:
                 },
             )
         )
+        index_run(status="running", started_at=started_at)
 
         ctrl = BrowserController(profile=self.profile)
         try:
@@ -394,6 +414,8 @@ class ExecutorRuntimeH4:
 
             # Step loop
             for i, action in enumerate(actions):
+                # Límite de paso: eventos del paso anterior a disco
+                trace_sink.flush()
                 # Fix: Policy guard - detener si se solicitó parar (postcondiciones cumplidas)
                 if _stop_requested:
                     break
@@ -409,6 +431,18 @@ class ExecutorRuntimeH4:
 
                 step_id = f"step_{i:03d}"
 
+                # Runs en segundo plano: progreso por paso y cancelación cooperativa
+                report_progress(
+                    f"Paso {i + 1}/{len(actions)}: {getattr(action.kind, 'value', action.kind)}",
+                    EventType.ACTION,
+                    runtime_run_id=run_id,
+                    step_id=step_id,
+                )
+                if cancel_requested():
+                    emit_run_finished("failed", reason="canceled", error="canceled", error_code_val="CANCELED", state_after=current_sig)
+                    write_manifest()
+                    return run_dir
+
                 # action_compiled
                 emit(
                     TraceEventV1(
@@ -1128,6 +1162,10 @@ class ExecutorRuntimeH4:
                 ctrl.close()
             except Exception:
                 pass
+            try:
+                trace_sink.close()
+            except Exception as e:
+                print(f"[runtime_h4] Error cerrando trace.jsonl: {e}")
             # Fix: run_finished.json DEBE existir siempre (fallback final).
             try:
                 if not finished_path.exists():
@@ -0,0 +1,174 @@
+"""
+Escritura de trace.jsonl y evidence_manifest.json para ExecutorRuntimeH4.
+
+Antes, cada evento abría trace.jsonl en modo append, escribía una línea y cerraba el
+fichero; el manifest se reconstruía (validando todos los items) en cada salida.
+
+- TraceSinkV1: handle abierto durante el run y buffer acotado (eventos/bytes). Se vacía
+  en límites de paso (el runtime llama a flush()), en eventos de error/halt/fin de run
+  y al cerrar. Ante un crash solo se pierden los eventos de la ventana sin vaciar.
+  fsync configurable (EXECUTOR_TRACE_FSYNC): "never", "run_end" (por defecto) o "flush".
+- EvidenceManifestWriterV1: cada item se serializa una sola vez al añadirse; el manifest
+  se reescribe de forma atómica solo si cambió desde la última escritura.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, IO, Iterable, List, Optional
+
+from backend.shared.executor_contracts_v1 import (
+    EvidenceItemV1,
+    EvidenceManifestV1,
+    EvidencePolicyV1,
+    RedactionPolicyV1,
+    TraceEventTypeV1,
+)
+from backend.shared.write_behind_v1 import atomic_write_json
+
+
+FSYNC_NEVER = "never"
+FSYNC_RUN_END = "run_end"
+FSYNC_FLUSH = "flush"
+FSYNC_MODES = (FSYNC_NEVER, FSYNC_RUN_END, FSYNC_FLUSH)
+
+DEFAULT_MAX_BUFFERED_EVENTS = 64
+DEFAULT_MAX_BUFFERED_BYTES = 256 * 1024
+
+# Eventos tras los que el buffer se vacía inmediatamente
+FLUSH_EVENT_TYPES = frozenset({
+    TraceEventTypeV1.run_started.value,
+    TraceEventTypeV1.run_finished.value,
+    TraceEventTypeV1.error_raised.value,
+    TraceEventTypeV1.policy_halt.value,
+})
+
+
+def _fsync_mode_from_env() -> str:
+    mode = os.getenv("EXECUTOR_TRACE_FSYNC", FSYNC_RUN_END).strip().lower()
+    return mode if mode in FSYNC_MODES else FSYNC_RUN_END
+
+
+class TraceSinkV1:
+    """Escritor bufferizado de trace.jsonl (una línea JSON por evento)."""
+
+    def __init__(
+        self,
+        path: Path,
+        *,
+        max_buffered_events: int = DEFAULT_MAX_BUFFERED_EVENTS,
+        max_buffered_bytes: int = DEFAULT_MAX_BUFFERED_BYTES,
+        fsync: Optional[str] = None,
+    ):
+        self.path = Path(path)
+        self.max_buffered_events = max(1, max_buffered_events)
+        self.max_buffered_bytes = max(1, max_buffered_bytes)
+        self.fsync = fsync if fsync in FSYNC_MODES else _fsync_mode_from_env()
+        self._file: Optional[IO[str]] = None
+        self._buffer: List[str] = []
+        self._buffered_bytes = 0
+        self.events_written = 0
+
+    def _ensure_open(self) -> IO[str]:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def write(self, payload: Dict[str, Any]) -> None:
+        """Encola un evento (payload ya redactado); vacía si el buffer llega al límite o es un evento clave."""
+        line = json.dumps(payload, ensure_ascii=False) + "\n"
+        self._buffer.append(line)
+        self._buffered_bytes += len(line)
+        self.events_written += 1
+        if payload.get("event_type") == TraceEventTypeV1.run_finished.value:
+            self.flush(fsync=self.fsync in (FSYNC_RUN_END, FSYNC_FLUSH))
+        elif (
+            payload.get("event_type") in FLUSH_EVENT_TYPES
+            or len(self._buffer) >= self.max_buffered_events
+            or self._buffered_bytes >= self.max_buffered_bytes
+        ):
+            self.flush()
+
+    def flush(self, *, fsync: Optional[bool] = None) -> None:
+        """Escribe el buffer en disco (límite de paso, error o fin de run)."""
+        if self._buffer:
+            f = self._ensure_open()
+            f.write("".join(self._buffer))
+            self._buffer.clear()
+            self._buffered_bytes = 0
+            f.flush()
+            if fsync if fsync is not None else self.fsync == FSYNC_FLUSH:
+                os.fsync(f.fileno())
+        elif fsync and self._file is not None:
+            os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        try:
+            self.flush(fsync=self.fsync in (FSYNC_RUN_END, FSYNC_FLUSH))
+        finally:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __enter__(self) -> "TraceSinkV1":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+class EvidenceManifestWriterV1:
+    """evidence_manifest.json incremental (items serializados una vez, escritura atómica)."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._items: List[Dict[str, Any]] = []
+        self._last_signature: Optional[str] = None
+
+    def add_items(self, items: Iterable[EvidenceItemV1]) -> None:
+        self._items.extend(item.model_dump(mode="json") for item in items)
+
+    @property
+    def item_count(self) -> int:
+        return len(self._items)
+
+    def write(
+        self,
+        *,
+        run_id: str,
+        policy: EvidencePolicyV1,
+        redaction: RedactionPolicyV1,
+        placeholder: EvidenceItemV1,
+        redaction_report: Optional[Dict[str, int]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """
+        Escribe el manifest si cambió (items, redaction_report o metadata). Devuelve True si escribió.
+
+        placeholder: item usado si aún no hay evidencias (el contrato exige items no vacío).
+        """
+        signature = json.dumps(
+            [len(self._items), redaction_report, metadata, redaction.model_dump(mode="json")],
+            sort_keys=True,
+            default=str,
+        )
+        if signature == self._last_signature and self.path.exists():
+            return False
+        # Valida la cabecera con el contrato; los items ya se validaron al construirse
+        header = EvidenceManifestV1(
+            run_id=run_id,
+            policy=policy,
+            redaction=redaction,
+            items=[placeholder],
+            redaction_report=redaction_report,
+            metadata=metadata or {},
+        )
+        data = header.model_dump(mode="json")
+        if self._items:
+            data["items"] = self._items
+        atomic_write_json(self.path, data)
+        self._last_signature = signature
+        return True
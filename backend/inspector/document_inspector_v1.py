@@ -2,7 +2,7 @@
 H7.6 — DocumentInspector v1 (determinista, sin OCR ni LLM)
 
 Características:
-- Extrae texto de PDF (pypdf) y limita tamaño.
+- Extrae texto de PDF (pypdf, vía caché compartida por sha256) y limita tamaño.
 - Detecta fechas básicas (issue_date / valid_until) de forma determinista.
 - Aplica criterios declarativos (criteria_profiles_v1).
 - Cachea por sha256 en data/documents/_inspections/<sha256>.json
@@ -28,6 +28,7 @@ except ImportError:
 from backend.inspector.criteria_profiles_v1 import CriterionResultV1, get_profile
 from backend.repository.document_repository_v1 import DocumentRepositoryV1, DocumentIndexEntryV1
 from backend.shared.executor_contracts_v1 import _sha256_bytes
+from backend.shared.pdf_text_cache import PdfTextExtractionError, get_pdf_text_cache, sha256_file
 
 
 def _now_iso() -> str:
@@ -59,6 +60,11 @@ class InspectorConfigV1:
     max_text_bytes: int = 5 * 1024 * 1024  # 5MB
 
 
+# Páginas del primer tramo de extracción: las que llenarían max_text_bytes con texto denso.
+# Si el tope no se alcanza se duplica el tramo (la caché solo extrae las páginas que faltan).
+DENSE_PAGE_TEXT_BYTES = 4 * 1024
+
+
 DATE_PATTERNS: List[Tuple[str, re.Pattern]] = [
     # Nota: usamos (?!\\d) en vez de \\b al final para soportar PDFs donde el extractor
     # concatena texto sin separadores (p.ej. "...2025-01-01Válido...").
@@ -218,32 +224,46 @@ class DocumentInspectorV1:
     def _report_path(self, sha256: str) -> Path:
         return self._inspection_dir() / f"{sha256}.json"
 
-    def extract_text_pdf(self, path: Path) -> str:
+    def extract_text_pdf(self, path: Path, *, sha256: Optional[str] = None) -> str:
         if PdfReader is None:
             # Guardarraíl DX: no romper import-time/uvicorn si falta pypdf.
             raise DocumentInspectionError("DOCUMENT_PARSE_FAILED", "pypdf not installed")
-        try:
-            reader = PdfReader(str(path))
-        except Exception as e:
-            raise DocumentInspectionError("DOCUMENT_PARSE_FAILED", "cannot open pdf", details={"cause": repr(e)})
+        cache = get_pdf_text_cache()
+        sha256 = sha256 or sha256_file(path)
+        page_bound = max(1, -(-self.cfg.max_text_bytes // DENSE_PAGE_TEXT_BYTES))
         parts: List[str] = []
         size = 0
-        for i, page in enumerate(reader.pages):
+        done = 0
+        capped = False
+        while not capped:
             try:
-                t = page.extract_text() or ""
-            except Exception as e:
-                raise DocumentInspectionError("DOCUMENT_PARSE_FAILED", "pdf text extraction failed", details={"page": i, "cause": repr(e)})
-            if not t:
-                continue
-            b = t.encode("utf-8", errors="ignore")
-            if size + len(b) > self.cfg.max_text_bytes:
-                # cortar determinista
-                remain = max(0, self.cfg.max_text_bytes - size)
-                parts.append(b[:remain].decode("utf-8", errors="ignore"))
-                size = self.cfg.max_text_bytes
+                pdf_text = cache.extract(path, reader_factory=PdfReader, sha256=sha256, max_pages=page_bound)
+            except PdfTextExtractionError as e:
+                raise DocumentInspectionError("DOCUMENT_PARSE_FAILED", "cannot open pdf", details={"cause": str(e)})
+            for i in range(done, len(pdf_text.pages)):
+                t = pdf_text.pages[i]
+                if t is None:
+                    raise DocumentInspectionError(
+                        "DOCUMENT_PARSE_FAILED",
+                        "pdf text extraction failed",
+                        details={"page": i, "cause": pdf_text.page_errors.get(i)},
+                    )
+                if not t:
+                    continue
+                b = t.encode("utf-8", errors="ignore")
+                if size + len(b) > self.cfg.max_text_bytes:
+                    # cortar determinista
+                    remain = max(0, self.cfg.max_text_bytes - size)
+                    parts.append(b[:remain].decode("utf-8", errors="ignore"))
+                    size = self.cfg.max_text_bytes
+                    capped = True
+                    break
+                parts.append(t)
+                size += len(b)
+            done = len(pdf_text.pages)
+            if pdf_text.complete:
                 break
-            parts.append(t)
-            size += len(b)
+            page_bound *= 2
 
         text = "\n".join(parts).strip()
         if not text:
@@ -286,7 +306,7 @@ class DocumentInspectorV1:
         extracted: Dict[str, Any] = {}
 
         try:
-            text = self.extract_text_pdf(self.repo.resolve(file_ref))
+            text = self.extract_text_pdf(self.repo.resolve(file_ref), sha256=doc_hash)
         except DocumentInspectionError as e:
             errors.append({"error_code": e.error_code, "message": str(e), "details": e.details})
             rep = InspectionReportV1(
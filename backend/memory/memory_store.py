@@ -3,6 +3,9 @@ Almacén de memoria persistente para trabajadores, empresas y plataformas.
 
 v3.9.0: Gestiona la lectura y escritura de memoria persistente en formato JSON,
 permitiendo al agente recordar información entre ejecuciones.
+
+Las memorias se mantienen en la caché write-behind compartida (backend.shared.write_behind_v1):
+los update_*_outcome modifican la versión en memoria y el JSON se escribe en el siguiente flush.
 """
 
 import json
@@ -10,14 +13,44 @@ import logging
 import os
 import re
 from pathlib import Path
-from typing import Optional, List
+from typing import Any, Callable, Dict, Optional, List, Type
 from datetime import datetime
 
 from backend.shared.models import WorkerMemory, CompanyMemory, PlatformMemory
+from backend.shared.write_behind_v1 import get_learning_cache
 
 logger = logging.getLogger(__name__)
 
 
+def _serialize_memory(memory: Any) -> Dict[str, Any]:
+    """Convierte a dict y serializa datetime (last_seen, last_outcome_timestamp)."""
+    data = memory.model_dump()
+    if data.get('last_seen') and isinstance(data['last_seen'], datetime):
+        data['last_seen'] = data['last_seen'].isoformat()
+    if data.get('last_outcome_timestamp') and isinstance(data['last_outcome_timestamp'], datetime):
+        data['last_outcome_timestamp'] = data['last_outcome_timestamp'].isoformat()
+    return data
+
+
+def _read_memory_file(file_path: Path, model: Type[Any], label: str) -> Optional[Any]:
+    """Lee un JSON de memoria (None si es inválido)."""
+    try:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        
+        # Convertir last_seen de string a datetime si existe
+        if 'last_seen' in data and data['last_seen']:
+            data['last_seen'] = datetime.fromisoformat(data['last_seen'])
+        # v4.2.0: Convertir last_outcome_timestamp de string a datetime si existe
+        if 'last_outcome_timestamp' in data and data['last_outcome_timestamp']:
+            data['last_outcome_timestamp'] = datetime.fromisoformat(data['last_outcome_timestamp'])
+        
+        return model(**data)
+    except Exception as e:
+        logger.warning(f"[memory-store] Error al cargar memoria de {label}: {e}")
+        return None
+
+
 def _normalize_company_name(company_name: str) -> str:
     """
     Normaliza el nombre de una empresa para usarlo como nombre de archivo.
@@ -68,6 +101,61 @@ class MemoryStore:
         except Exception as e:
             logger.warning(f"[memory-store] Error al crear directorios: {e}")
     
+    def _worker_path(self, worker_id: str) -> Path:
+        return self.workers_dir / f"{worker_id}.json"
+    
+    def _company_path(self, company_name: str, platform: Optional[str]) -> Path:
+        normalized_name = _normalize_company_name(company_name)
+        if platform:
+            # Si hay plataforma, incluirla en el nombre del archivo
+            return self.companies_dir / f"{normalized_name}_{_normalize_company_name(platform)}.json"
+        return self.companies_dir / f"{normalized_name}.json"
+    
+    def _platform_path(self, platform: str) -> Path:
+        return self.platforms_dir / f"{_normalize_company_name(platform)}.json"
+    
+    def _get_cached(self, file_path: Path, model: Type[Any], label: str) -> Optional[Any]:
+        """Memoria en la caché compartida (cargada de disco si no está o cambió)."""
+        return get_learning_cache().get(
+            file_path,
+            lambda p: _read_memory_file(p, model, label),
+            _serialize_memory,
+        )
+    
+    def _load_copy(self, file_path: Path, model: Type[Any], label: str) -> Optional[Any]:
+        memory = self._get_cached(file_path, model, label)
+        return memory.model_copy(deep=True) if memory is not None else None
+    
+    def _save(self, file_path: Path, memory: Any, label: str) -> None:
+        try:
+            get_learning_cache().write_through(file_path, memory.model_copy(deep=True), _serialize_memory)
+        except Exception as e:
+            logger.warning(f"[memory-store] Error al guardar memoria de {label}: {e}")
+    
+    def _mutate(
+        self,
+        file_path: Path,
+        model: Type[Any],
+        label: str,
+        create: Callable[[], Any],
+        fn: Callable[[Any], None],
+    ) -> Any:
+        """
+        Aplica fn(memory) a la memoria en caché (o nueva) bajo el lock de la caché y la marca
+        sucia (escritura diferida). Retorna una copia independiente del resultado.
+        """
+        def _apply(memory: Any) -> Any:
+            fn(memory)
+            return memory.model_copy(deep=True)
+        
+        return get_learning_cache().mutate(
+            file_path,
+            lambda p: _read_memory_file(p, model, label),
+            _serialize_memory,
+            create,
+            _apply,
+        )
+    
     def load_worker(self, worker_id: str) -> Optional[WorkerMemory]:
         """
         Carga la memoria de un trabajador.
@@ -78,23 +166,7 @@ class MemoryStore:
         Returns:
             WorkerMemory si existe, None en caso contrario o si hay error
         """
-        file_path = self.workers_dir / f"{worker_id}.json"
-        
-        if not file_path.exists():
-            return None
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Convertir last_seen de string a datetime si existe
-            if 'last_seen' in data and data['last_seen']:
-                data['last_seen'] = datetime.fromisoformat(data['last_seen'])
-            
-            return WorkerMemory(**data)
-        except Exception as e:
-            logger.warning(f"[memory-store] Error al cargar memoria de trabajador {worker_id}: {e}")
-            return None
+        return self._load_copy(self._worker_path(worker_id), WorkerMemory, f"trabajador {worker_id}")
     
     def save_worker(self, memory: WorkerMemory) -> None:
         """
@@ -103,20 +175,7 @@ class MemoryStore:
         Args:
             memory: WorkerMemory a guardar
         """
-        file_path = self.workers_dir / f"{memory.worker_id}.json"
-        
-        try:
-            # Convertir a dict y serializar datetime
-            data = memory.model_dump()
-            if data.get('last_seen') and isinstance(data['last_seen'], datetime):
-                data['last_seen'] = data['last_seen'].isoformat()
-            if data.get('last_outcome_timestamp') and isinstance(data['last_outcome_timestamp'], datetime):
-                data['last_outcome_timestamp'] = data['last_outcome_timestamp'].isoformat()
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.warning(f"[memory-store] Error al guardar memoria de trabajador {memory.worker_id}: {e}")
+        self._save(self._worker_path(memory.worker_id), memory, f"trabajador {memory.worker_id}")
     
     def load_company(self, company_name: str, platform: Optional[str] = None) -> Optional[CompanyMemory]:
         """
@@ -129,31 +188,9 @@ class MemoryStore:
         Returns:
             CompanyMemory si existe, None en caso contrario o si hay error
         """
-        normalized_name = _normalize_company_name(company_name)
-        if platform:
-            # Si hay plataforma, incluirla en el nombre del archivo
-            file_path = self.companies_dir / f"{normalized_name}_{_normalize_company_name(platform)}.json"
-        else:
-            file_path = self.companies_dir / f"{normalized_name}.json"
-        
-        if not file_path.exists():
-            return None
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Convertir last_seen de string a datetime si existe
-            if 'last_seen' in data and data['last_seen']:
-                data['last_seen'] = datetime.fromisoformat(data['last_seen'])
-            # v4.2.0: Convertir last_outcome_timestamp de string a datetime si existe
-            if 'last_outcome_timestamp' in data and data['last_outcome_timestamp']:
-                data['last_outcome_timestamp'] = datetime.fromisoformat(data['last_outcome_timestamp'])
-            
-            return CompanyMemory(**data)
-        except Exception as e:
-            logger.warning(f"[memory-store] Error al cargar memoria de empresa {company_name}: {e}")
-            return None
+        return self._load_copy(
+            self._company_path(company_name, platform), CompanyMemory, f"empresa {company_name}"
+        )
     
     def save_company(self, memory: CompanyMemory) -> None:
         """
@@ -162,24 +199,9 @@ class MemoryStore:
         Args:
             memory: CompanyMemory a guardar
         """
-        normalized_name = _normalize_company_name(memory.company_name)
-        if memory.platform:
-            file_path = self.companies_dir / f"{normalized_name}_{_normalize_company_name(memory.platform)}.json"
-        else:
-            file_path = self.companies_dir / f"{normalized_name}.json"
-        
-        try:
-            # Convertir a dict y serializar datetime
-            data = memory.model_dump()
-            if data.get('last_seen') and isinstance(data['last_seen'], datetime):
-                data['last_seen'] = data['last_seen'].isoformat()
-            if data.get('last_outcome_timestamp') and isinstance(data['last_outcome_timestamp'], datetime):
-                data['last_outcome_timestamp'] = data['last_outcome_timestamp'].isoformat()
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.warning(f"[memory-store] Error al guardar memoria de empresa {memory.company_name}: {e}")
+        self._save(
+            self._company_path(memory.company_name, memory.platform), memory, f"empresa {memory.company_name}"
+        )
     
     def load_platform(self, platform: str) -> Optional[PlatformMemory]:
         """
@@ -191,27 +213,7 @@ class MemoryStore:
         Returns:
             PlatformMemory si existe, None en caso contrario o si hay error
         """
-        normalized_name = _normalize_company_name(platform)
-        file_path = self.platforms_dir / f"{normalized_name}.json"
-        
-        if not file_path.exists():
-            return None
-        
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # Convertir last_seen de string a datetime si existe
-            if 'last_seen' in data and data['last_seen']:
-                data['last_seen'] = datetime.fromisoformat(data['last_seen'])
-            # v4.2.0: Convertir last_outcome_timestamp de string a datetime si existe
-            if 'last_outcome_timestamp' in data and data['last_outcome_timestamp']:
-                data['last_outcome_timestamp'] = datetime.fromisoformat(data['last_outcome_timestamp'])
-            
-            return PlatformMemory(**data)
-        except Exception as e:
-            logger.warning(f"[memory-store] Error al cargar memoria de plataforma {platform}: {e}")
-            return None
+        return self._load_copy(self._platform_path(platform), PlatformMemory, f"plataforma {platform}")
     
     def save_platform(self, memory: PlatformMemory) -> None:
         """
@@ -220,21 +222,7 @@ class MemoryStore:
         Args:
             memory: PlatformMemory a guardar
         """
-        normalized_name = _normalize_company_name(memory.platform)
-        file_path = self.platforms_dir / f"{normalized_name}.json"
-        
-        try:
-            # Convertir a dict y serializar datetime
-            data = memory.model_dump()
-            if data.get('last_seen') and isinstance(data['last_seen'], datetime):
-                data['last_seen'] = data['last_seen'].isoformat()
-            if data.get('last_outcome_timestamp') and isinstance(data['last_outcome_timestamp'], datetime):
-                data['last_outcome_timestamp'] = data['last_outcome_timestamp'].isoformat()
-            
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.warning(f"[memory-store] Error al guardar memoria de plataforma {memory.platform}: {e}")
+        self._save(self._platform_path(memory.platform), memory, f"plataforma {memory.platform}")
     
     # v4.2.0: Métodos para actualizar memoria con resultados de OutcomeJudge
     def update_worker_outcome(
@@ -259,43 +247,42 @@ class MemoryStore:
         Returns:
             WorkerMemory actualizado, o None si hay error
         """
-        # Cargar memoria actual o inicializar nueva
-        memory = self.load_worker(worker_id)
-        if not memory:
-            memory = WorkerMemory(worker_id=worker_id)
-        
-        # Actualizar campos de outcome
-        if new_score is not None:
-            memory.last_outcome_score = new_score
+        file_path = self._worker_path(worker_id)
+        
+        def _apply(memory: WorkerMemory) -> None:
+            # Actualizar campos de outcome
+            if new_score is not None:
+                memory.last_outcome_score = new_score
+                
+                # Actualizar best/worst
+                if memory.best_outcome_score is None or new_score > memory.best_outcome_score:
+                    memory.best_outcome_score = new_score
+                if memory.worst_outcome_score is None or new_score < memory.worst_outcome_score:
+                    memory.worst_outcome_score = new_score
             
-            # Actualizar best/worst
-            if memory.best_outcome_score is None or new_score > memory.best_outcome_score:
-                memory.best_outcome_score = new_score
-            if memory.worst_outcome_score is None or new_score < memory.worst_outcome_score:
-                memory.worst_outcome_score = new_score
-        
-        memory.outcome_run_count += 1
-        memory.last_outcome_issues = issues[:5] if issues else None  # Limitar a top 5
-        memory.last_outcome_timestamp = timestamp
-        
-        # Actualizar historial (limitar a últimos 10)
-        if memory.outcome_history is None:
-            memory.outcome_history = []
-        
-        history_entry = {
-            "score": new_score,
-            "timestamp": timestamp.isoformat(),
-            "issues": issues[:3] if issues else []  # Limitar a top 3 por entrada
-        }
-        memory.outcome_history.append(history_entry)
-        # Mantener solo últimos 10
-        if len(memory.outcome_history) > 10:
-            memory.outcome_history = memory.outcome_history[-10:]
-        
-        # Guardar
+            memory.outcome_run_count += 1
+            memory.last_outcome_issues = issues[:5] if issues else None  # Limitar a top 5
+            memory.last_outcome_timestamp = timestamp
+            
+            # Actualizar historial (limitar a últimos 10)
+            if memory.outcome_history is None:
+                memory.outcome_history = []
+            
+            history_entry = {
+                "score": new_score,
+                "timestamp": timestamp.isoformat(),
+                "issues": issues[:3] if issues else []  # Limitar a top 3 por entrada
+            }
+            memory.outcome_history.append(history_entry)
+            # Mantener solo últimos 10
+            if len(memory.outcome_history) > 10:
+                memory.outcome_history = memory.outcome_history[-10:]
+        
+        # Memoria en caché o nueva, mutada bajo el lock de la caché (escritura diferida)
         try:
-            self.save_worker(memory)
-            return memory
+            return self._mutate(
+                file_path, WorkerMemory, f"trabajador {worker_id}", lambda: WorkerMemory(worker_id=worker_id), _apply
+            )
         except Exception as e:
             logger.warning(f"[memory-store] Error al actualizar outcome de trabajador {worker_id}: {e}")
             return None
@@ -324,42 +311,41 @@ class MemoryStore:
         Returns:
             CompanyMemory actualizado, o None si hay error
         """
-        # Cargar memoria actual o inicializar nueva
-        memory = self.load_company(company_name, platform)
-        if not memory:
-            memory = CompanyMemory(company_name=company_name, platform=platform)
-        
-        # Actualizar media incremental
-        if worker_contribution_score is not None:
-            if memory.avg_outcome_score is None:
-                memory.avg_outcome_score = worker_contribution_score
-            else:
-                # Media incremental: (avg_prev * count_prev + new_score) / (count_prev + 1)
-                memory.avg_outcome_score = (
-                    (memory.avg_outcome_score * memory.outcome_run_count + worker_contribution_score)
-                    / (memory.outcome_run_count + 1)
-                )
-        
-        memory.outcome_run_count += 1
-        memory.last_outcome_timestamp = timestamp
-        
-        # Actualizar common_issues (merge simple: añadir nuevas y mantener lista deduplicada)
-        if memory.common_issues is None:
-            memory.common_issues = []
-        
-        # Añadir issues nuevas que no estén ya en la lista
-        for issue in issues[:5]:  # Limitar a top 5
-            if issue not in memory.common_issues:
-                memory.common_issues.append(issue)
-        
-        # Limitar a últimos 10 issues
-        if len(memory.common_issues) > 10:
-            memory.common_issues = memory.common_issues[-10:]
+        file_path = self._company_path(company_name, platform)
+        
+        def _apply(memory: CompanyMemory) -> None:
+            # Actualizar media incremental
+            if worker_contribution_score is not None:
+                if memory.avg_outcome_score is None:
+                    memory.avg_outcome_score = worker_contribution_score
+                else:
+                    # Media incremental: (avg_prev * count_prev + new_score) / (count_prev + 1)
+                    memory.avg_outcome_score = (
+                        (memory.avg_outcome_score * memory.outcome_run_count + worker_contribution_score)
+                        / (memory.outcome_run_count + 1)
+                    )
+            
+            memory.outcome_run_count += 1
+            memory.last_outcome_timestamp = timestamp
+            
+            # Actualizar common_issues (merge simple: añadir nuevas y mantener lista deduplicada)
+            if memory.common_issues is None:
+                memory.common_issues = []
+            
+            # Añadir issues nuevas que no estén ya en la lista
+            for issue in issues[:5]:  # Limitar a top 5
+                if issue not in memory.common_issues:
+                    memory.common_issues.append(issue)
+            
+            # Limitar a últimos 10 issues
+            if len(memory.common_issues) > 10:
+                memory.common_issues = memory.common_issues[-10:]
         
-        # Guardar
+        # Memoria en caché o nueva, mutada bajo el lock de la caché (escritura diferida)
         try:
-            self.save_company(memory)
-            return memory
+            return self._mutate(
+                file_path, CompanyMemory, f"empresa {company_name}", lambda: CompanyMemory(company_name=company_name, platform=platform), _apply
+            )
         except Exception as e:
             logger.warning(f"[memory-store] Error al actualizar outcome de empresa {company_name}: {e}")
             return None
@@ -386,42 +372,41 @@ class MemoryStore:
         Returns:
             PlatformMemory actualizado, o None si hay error
         """
-        # Cargar memoria actual o inicializar nueva
-        memory = self.load_platform(platform_name)
-        if not memory:
-            memory = PlatformMemory(platform=platform_name)
-        
-        # Actualizar media incremental
-        if company_contribution_score is not None:
-            if memory.avg_outcome_score is None:
-                memory.avg_outcome_score = company_contribution_score
-            else:
-                # Media incremental: (avg_prev * count_prev + new_score) / (count_prev + 1)
-                memory.avg_outcome_score = (
-                    (memory.avg_outcome_score * memory.outcome_run_count + company_contribution_score)
-                    / (memory.outcome_run_count + 1)
-                )
-        
-        memory.outcome_run_count += 1
-        memory.last_outcome_timestamp = timestamp
-        
-        # Actualizar common_issues (merge simple: añadir nuevas y mantener lista deduplicada)
-        if memory.common_issues is None:
-            memory.common_issues = []
-        
-        # Añadir issues nuevas que no estén ya en la lista
-        for issue in issues[:5]:  # Limitar a top 5
-            if issue not in memory.common_issues:
-                memory.common_issues.append(issue)
-        
-        # Limitar a últimos 10 issues
-        if len(memory.common_issues) > 10:
-            memory.common_issues = memory.common_issues[-10:]
+        file_path = self._platform_path(platform_name)
+        
+        def _apply(memory: PlatformMemory) -> None:
+            # Actualizar media incremental
+            if company_contribution_score is not None:
+                if memory.avg_outcome_score is None:
+                    memory.avg_outcome_score = company_contribution_score
+                else:
+                    # Media incremental: (avg_prev * count_prev + new_score) / (count_prev + 1)
+                    memory.avg_outcome_score = (
+                        (memory.avg_outcome_score * memory.outcome_run_count + company_contribution_score)
+                        / (memory.outcome_run_count + 1)
+                    )
+            
+            memory.outcome_run_count += 1
+            memory.last_outcome_timestamp = timestamp
+            
+            # Actualizar common_issues (merge simple: añadir nuevas y mantener lista deduplicada)
+            if memory.common_issues is None:
+                memory.common_issues = []
+            
+            # Añadir issues nuevas que no estén ya en la lista
+            for issue in issues[:5]:  # Limitar a top 5
+                if issue not in memory.common_issues:
+                    memory.common_issues.append(issue)
+            
+            # Limitar a últimos 10 issues
+            if len(memory.common_issues) > 10:
+                memory.common_issues = memory.common_issues[-10:]
         
-        # Guardar
+        # Memoria en caché o nueva, mutada bajo el lock de la caché (escritura diferida)
         try:
-            self.save_platform(memory)
-            return memory
+            return self._mutate(
+                file_path, PlatformMemory, f"plataforma {platform_name}", lambda: PlatformMemory(platform=platform_name), _apply
+            )
         except Exception as e:
             logger.warning(f"[memory-store] Error al actualizar outcome de plataforma {platform_name}: {e}")
             return None
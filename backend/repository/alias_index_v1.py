@@ -0,0 +1,174 @@
+"""
+Índice precompilado de aliases de tipos de documento.
+
+Compartido por DocumentMatcherV1.find_matching_types, type_suggestions_v1 e impact_preview_v1:
+- aliases y nombres de tipo normalizados una sola vez
+- mapa de prefijos de código (ej: "T205.0" -> tipos con alias que empiezan por ese código)
+- autómata Aho-Corasick sobre todos los aliases normalizados: una pasada sobre el texto
+  del pendiente encuentra todos los aliases contenidos, sin importar cuántos tipos haya
+
+Se reconstruye solo cuando cambian los tipos (DocumentRepositoryStoreV1.types_signature()).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.shared.document_repository_v1 import DocumentTypeV1
+from backend.shared.text_normalizer import normalize_text
+
+
+CODE_PREFIX_RE = re.compile(r'^([Tt]\d+(?:\.\d+)?)')
+
+
+def extract_code_prefix(text: Optional[str]) -> Optional[str]:
+    """Código al inicio del texto (ej: "T205.0 Recibo" -> "T205.0")."""
+    if not text:
+        return None
+    match = CODE_PREFIX_RE.match(text)
+    return match.group(1) if match else None
+
+
+class _AhoCorasick:
+    """Autómata Aho-Corasick mínimo (patrones str -> ids)."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build()
+
+    def _add(self, pattern: str) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        if pattern not in self._out[node]:
+            self._out[node].append(pattern)
+
+    def _build(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, nxt in self._goto[node].items():
+                queue.append(nxt)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(ch, 0)
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, str]]:
+        """Genera (posición_inicio, patrón) para cada ocurrencia en text."""
+        node = 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for pattern in self._out[node]:
+                yield i - len(pattern) + 1, pattern
+
+
+class AliasIndexV1:
+    """Índice de aliases para un conjunto de tipos (normalmente los activos)."""
+
+    def __init__(self, types: List[DocumentTypeV1]):
+        self.types: List[DocumentTypeV1] = list(types)
+        self.name_normalized: Dict[str, str] = {}
+        self.aliases_normalized: Dict[str, List[Tuple[str, str]]] = {}
+        self.code_prefix_map: Dict[str, List[Tuple[str, str]]] = {}
+        self._pattern_owners: Dict[str, List[Tuple[str, str]]] = {}
+
+        for doc_type in self.types:
+            self.name_normalized[doc_type.type_id] = normalize_text(doc_type.name)
+            normalized: List[Tuple[str, str]] = []
+            for alias in doc_type.platform_aliases:
+                alias_norm = normalize_text(alias)
+                normalized.append((alias, alias_norm))
+                if not alias_norm:
+                    continue
+                self._pattern_owners.setdefault(alias_norm, []).append((doc_type.type_id, alias))
+                code = extract_code_prefix(alias)
+                if code:
+                    self.code_prefix_map.setdefault(code.upper(), []).append((doc_type.type_id, code))
+            self.aliases_normalized[doc_type.type_id] = normalized
+
+        self._types_by_id = {t.type_id: t for t in self.types}
+        self._automaton = _AhoCorasick(self._pattern_owners.keys())
+
+    def get_type(self, type_id: str) -> Optional[DocumentTypeV1]:
+        return self._types_by_id.get(type_id)
+
+    def contained_aliases(self, text_normalized: str) -> Dict[str, List[Tuple[str, int]]]:
+        """
+        Aliases contenidos en text_normalized (una sola pasada).
+        Retorna {type_id: [(alias_original, posición_inicio), ...]} en orden de aparición.
+        """
+        found: Dict[str, List[Tuple[str, int]]] = {}
+        if not text_normalized:
+            return found
+        for start, pattern in self._automaton.iter_matches(text_normalized):
+            for type_id, alias in self._pattern_owners[pattern]:
+                found.setdefault(type_id, []).append((alias, start))
+        return found
+
+    def types_for_code(self, code: Optional[str]) -> Set[str]:
+        """type_ids con algún alias cuyo código inicial coincide (case-insensitive)."""
+        if not code:
+            return set()
+        return {type_id for type_id, _ in self.code_prefix_map.get(code.upper(), [])}
+
+    def find_matching_types(self, base_text: str) -> List[Tuple[DocumentTypeV1, float]]:
+        """
+        Tipos que coinciden con el texto base (misma semántica que el scan alias por alias):
+        - 0.9 si el código inicial del texto coincide con el código de un alias
+        - 0.75 si un alias normalizado aparece al inicio del texto normalizado
+        - 0.6 si aparece en cualquier otra posición
+        Ordenado por confidence descendente (estable respecto al orden de self.types).
+        """
+        base_normalized = normalize_text(base_text)
+        if not base_normalized:
+            return []
+
+        confidence: Dict[str, float] = {}
+        for type_id in self.types_for_code(extract_code_prefix(base_text)):
+            confidence[type_id] = 0.9
+        for type_id, hits in self.contained_aliases(base_normalized).items():
+            best = 0.75 if any(start == 0 for _, start in hits) else 0.6
+            confidence[type_id] = max(confidence.get(type_id, 0.0), best)
+
+        matches = [(t, confidence[t.type_id]) for t in self.types if confidence.get(t.type_id, 0.0) > 0.0]
+        matches.sort(key=lambda x: x[1], reverse=True)
+        return matches
+
+
+_INDEXES: Dict[tuple, Tuple[tuple, AliasIndexV1]] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_alias_index(store, include_inactive: bool = False) -> AliasIndexV1:
+    """
+    Índice compartido para el store dado; se reconstruye solo si cambia store.types_signature().
+    """
+    signature = store.types_signature()
+    key = (signature[:2], include_inactive)
+    with _INDEXES_LOCK:
+        cached = _INDEXES.get(key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+    index = AliasIndexV1(store.list_types(include_inactive=include_inactive))
+    with _INDEXES_LOCK:
+        _INDEXES[key] = (signature, index)
+    return index
@@ -0,0 +1,293 @@
+"""
+Almacén de contenido direccionado por sha256 para los PDFs del repositorio documental.
+
+Los operadores suben el mismo certificado para muchos trabajadores y coordinaciones:
+cada contenido distinto se guarda una sola vez en blobs/<aa>/<sha256> y docs/<doc_id>.pdf
+(la ruta que usan todos los consumidores) es una exportación del blob:
+
+- hardlink si el sistema de ficheros lo permite (mismo volumen),
+- reflink (FICLONE, Linux btrfs/xfs) si el hardlink falla,
+- copia como último recurso.
+
+El modo se elige con REPOSITORY_BLOB_EXPORT (auto | hardlink | reflink | copy).
+Las exportaciones se sustituyen siempre de forma atómica (os.replace), nunca se reescriben
+en sitio: escribir dentro de docs/<doc_id>.pdf alteraría el blob compartido.
+
+Las referencias son los DocumentInstanceV1 (campo sha256): un blob sin documentos que
+lo referencien es huérfano y lo elimina gc() (ver backend/tools/gc_repository_blobs.py).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+
+BLOBS_DIRNAME = "blobs"
+EXPORT_MODES = ("auto", "hardlink", "reflink", "copy")
+DEFAULT_GC_GRACE_S = 3600
+
+_CHUNK_SIZE = 1024 * 1024
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+# ioctl FICLONE (linux/fs.h): clon copy-on-write del fichero completo
+_FICLONE = 0x40049409
+
+
+def is_sha256(value: Optional[str]) -> bool:
+    return bool(value) and bool(_SHA256_RE.match(value))
+
+
+def hash_file(path: Path) -> str:
+    """SHA256 de un fichero leyendo por bloques (no carga el fichero en memoria)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def copy_with_hash(src: BinaryIO, dst: BinaryIO) -> Tuple[str, int]:
+    """Copia un stream calculando su sha256 en la misma pasada. Devuelve (sha256, bytes)."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: src.read(_CHUNK_SIZE), b""):
+        digest.update(chunk)
+        dst.write(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def get_export_mode() -> str:
+    mode = os.getenv("REPOSITORY_BLOB_EXPORT", "auto").strip().lower()
+    return mode if mode in EXPORT_MODES else "auto"
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+        return True
+    except OSError:
+        dst.unlink(missing_ok=True)
+        return False
+
+
+@dataclass
+class BlobPutResultV1:
+    """Resultado de guardar contenido: created=False si ya existía (deduplicado)."""
+    sha256: str
+    path: Path
+    size_bytes: int
+    created: bool
+
+
+class BlobStoreV1:
+    """Blobs inmutables blobs/<aa>/<sha256>; las escrituras pasan por blobs/tmp/ y os.replace."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.tmp_dir = self.root / "tmp"
+
+    # ========== LECTURA ==========
+
+    def path_for(self, sha256: str) -> Path:
+        if not is_sha256(sha256):
+            raise ValueError(f"sha256 inválido: {sha256!r}")
+        return self.root / sha256[:2] / sha256
+
+    def has(self, sha256: str) -> bool:
+        return is_sha256(sha256) and self.path_for(sha256).is_file()
+
+    def claim(self, sha256: str) -> bool:
+        """
+        Reutilización de un blob existente: refresca su mtime para que gc() respete el
+        margen hasta que el documento que lo referencia esté guardado. False si no existe.
+        """
+        if not is_sha256(sha256):
+            return False
+        try:
+            _touch(self.path_for(sha256))
+        except FileNotFoundError:
+            return False
+        return True
+
+    def iter_blobs(self) -> Iterator[Tuple[str, Path]]:
+        if not self.root.exists():
+            return
+        for shard in self.root.iterdir():
+            if shard.name == "tmp" or not shard.is_dir():
+                continue
+            for blob in shard.iterdir():
+                if is_sha256(blob.name):
+                    yield blob.name, blob
+
+    # ========== ESCRITURA ==========
+
+    def _new_tmp(self) -> Path:
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        return self.tmp_dir / f"{uuid.uuid4().hex}.part"
+
+    def _commit(self, tmp: Path, sha256: str, size: int) -> BlobPutResultV1:
+        target = self.path_for(sha256)
+        if self.claim(sha256):
+            tmp.unlink(missing_ok=True)
+            return BlobPutResultV1(sha256=sha256, path=target, size_bytes=size, created=False)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        if os.name != "nt":
+            # Contenido compartido por hardlinks: impedir reescrituras en sitio. En Windows no
+            # (no se podría borrar ni sustituir la exportación); remove_file/_replace_readonly
+            # cubren además blobs de solo lectura que lleguen de otro sistema.
+            os.chmod(tmp, 0o444)
+        os.replace(tmp, target)
+        return BlobPutResultV1(sha256=sha256, path=target, size_bytes=size, created=True)
+
+    def put_stream(self, src: BinaryIO) -> BlobPutResultV1:
+        """Vuelca un stream (p.ej. el upload HTTP) hasheando en la misma pasada: una sola escritura."""
+        tmp = self._new_tmp()
+        try:
+            with open(tmp, "wb") as dst:
+                sha256, size = copy_with_hash(src, dst)
+            return self._commit(tmp, sha256, size)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+
+    def put_file(self, source: Path, sha256: Optional[str] = None) -> BlobPutResultV1:
+        """
+        Guarda un fichero existente. Si se conoce su sha256 y el blob ya existe no se
+        escribe nada (duplicado); si no, se copia hasheando en la misma pasada.
+        """
+        source = Path(source)
+        if sha256 and self.claim(sha256):
+            return BlobPutResultV1(sha256=sha256, path=self.path_for(sha256),
+                                   size_bytes=source.stat().st_size, created=False)
+        with open(source, "rb") as src:
+            return self.put_stream(src)
+
+    def export(self, sha256: str, target: Path, mode: Optional[str] = None) -> str:
+        """
+        Materializa el blob en target (hardlink → reflink → copia según el modo).
+        Sustituye target de forma atómica. Devuelve el modo usado.
+        """
+        blob = self.path_for(sha256)
+        # Re-comprobar y proteger del gc justo antes de enlazar (el blob pudo reutilizarse
+        # tras un has()/put anterior)
+        if not self.claim(sha256):
+            raise FileNotFoundError(f"Blob {sha256} no existe")
+        mode = mode or get_export_mode()
+        target = Path(target)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+        used = None
+        try:
+            if mode in ("auto", "hardlink"):
+                try:
+                    os.link(blob, tmp)
+                    used = "hardlink"
+                except OSError:
+                    if mode == "hardlink":
+                        raise
+            if used is None and mode in ("auto", "reflink"):
+                if _reflink(blob, tmp):
+                    used = "reflink"
+                elif mode == "reflink":
+                    raise OSError(f"reflink no soportado para {target}")
+            if used is None:
+                shutil.copyfile(blob, tmp)
+                used = "copy"
+            _replace_readonly(tmp, target)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return used
+
+    # ========== GC ==========
+
+    def gc(
+        self,
+        referenced: Set[str],
+        grace_s: float = DEFAULT_GC_GRACE_S,
+        dry_run: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Elimina blobs sin referencias y temporales abandonados más antiguos que grace_s
+        (un upload en curso guarda el blob antes de guardar su documento).
+        """
+        now = time.time()
+        stats = {"blobs": 0, "referenced": 0, "removed": 0, "bytes_freed": 0, "tmp_removed": 0}
+
+        def _old(path: Path) -> bool:
+            try:
+                return now - path.stat().st_mtime >= grace_s
+            except OSError:
+                return False
+
+        for sha256, blob in list(self.iter_blobs()):
+            stats["blobs"] += 1
+            if sha256 in referenced:
+                stats["referenced"] += 1
+                continue
+            if not _old(blob):
+                continue
+            stats["removed"] += 1
+            stats["bytes_freed"] += blob.stat().st_size
+            if not dry_run:
+                remove_file(blob)
+
+        if self.tmp_dir.exists():
+            for tmp in self.tmp_dir.iterdir():
+                if _old(tmp):
+                    stats["tmp_removed"] += 1
+                    if not dry_run:
+                        tmp.unlink(missing_ok=True)
+        return stats
+
+    def total_bytes(self, shas: Optional[Iterable[str]] = None) -> int:
+        wanted = set(shas) if shas is not None else None
+        return sum(p.stat().st_size for sha, p in self.iter_blobs() if wanted is None or sha in wanted)
+
+
+def _touch(path: Path) -> None:
+    try:
+        os.utime(path)
+    except PermissionError:
+        # Solo lectura en Windows: basta con saber que existe
+        if not path.exists():
+            raise FileNotFoundError(str(path))
+
+
+def _make_writable(path: Path) -> None:
+    # Windows no borra ni sustituye ficheros de solo lectura (p.ej. blobs 0o444 copiados
+    # desde otro sistema); docs/<doc_id>.pdf comparte el fichero con su blob al ser hardlink
+    os.chmod(path, 0o644)
+
+
+def remove_file(path: Path) -> None:
+    """Borra un blob o una exportación aunque sea de solo lectura (no falla si no existe)."""
+    path = Path(path)
+    try:
+        path.unlink(missing_ok=True)
+    except PermissionError:
+        _make_writable(path)
+        path.unlink(missing_ok=True)
+
+
+def _replace_readonly(src: Path, target: Path) -> None:
+    try:
+        os.replace(src, target)
+    except PermissionError:
+        if not target.exists():
+            raise
+        _make_writable(target)
+        os.replace(src, target)
@@ -0,0 +1,519 @@
+"""
+Calendario de cumplimiento materializado (process-wide) para /api/repository/docs/pending.
+
+Antes, cada petición recorría todos los documentos y, por cada tipo periódico y sujeto,
+llamaba a PeriodPlannerV1.generate_expected_periods, que volvía a listar documentos:
+O(tipos × sujetos × documentos). El calendario mantiene en memoria:
+
+- por documento: fecha de caducidad (y fecha base) ya calculadas, independientes de hoy;
+  una lista ordenada por caducidad sirve expired/expiring_soon con bisect.
+- por (tipo, sujeto, período): período esperado, documento que lo cubre y estado
+  (AVAILABLE, MISSING, LATE) para la ventana materializada.
+
+Se actualiza de forma incremental:
+- save_document/delete_document del store (notify_document_saved/notify_document_deleted)
+  solo recalculan las celdas del tipo y sujetos afectados.
+- un cambio de tipos (types_signature) solo recalcula los tipos modificados.
+- el cambio de día recalcula estados de períodos, sin releer documentos.
+Si la firma de documentos cambia por otra vía (otro proceso, escritura externa) se
+reconstruye completo en la siguiente consulta.
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import threading
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from backend.repository.document_status_calculator_v1 import (
+    DocumentValidityStatus,
+    add_months,
+    calculate_document_status,
+)
+from backend.repository.period_planner_v1 import PeriodPlannerV1, PeriodStatusV1
+from backend.shared.document_repository_v1 import DocumentInstanceV1, DocumentTypeV1, PeriodKindV1
+
+
+DEFAULT_WINDOW_MONTHS = 24
+PENDING_BUCKETS = ("expired", "expiring_soon", "missing")
+
+# (scope, company_key, person_key)
+Subject = Tuple[str, Optional[str], Optional[str]]
+
+
+def _today() -> date:
+    return date.today()
+
+
+def _type_fingerprint(doc_type: DocumentTypeV1) -> str:
+    return json.dumps(doc_type.model_dump(mode="json"), sort_keys=True, default=str)
+
+
+def _doc_subject(doc: DocumentInstanceV1) -> Optional[Subject]:
+    """Sujeto que un documento da de alta en el calendario (mismo criterio que /docs/pending)."""
+    scope = getattr(doc.scope, "value", doc.scope)
+    if scope == "worker" and doc.person_key:
+        return ("worker", doc.company_key, doc.person_key)
+    if scope == "company" and doc.company_key:
+        return ("company", doc.company_key, None)
+    return None
+
+
+def _covers(entry: dict, subject: Subject) -> bool:
+    """Mismo filtro que list_documents(company_key=..., person_key=...): None no filtra."""
+    _, company_key, person_key = subject
+    return (company_key is None or entry["company_key"] == company_key) and (
+        person_key is None or entry["person_key"] == person_key
+    )
+
+
+class ComplianceCalendarV1:
+    """Vista materializada de vencimientos y períodos esperados de un repositorio."""
+
+    def __init__(self, store, window_months: int = DEFAULT_WINDOW_MONTHS):
+        self.store = store
+        self.planner = PeriodPlannerV1(store)
+        self._lock = threading.RLock()
+        self._built = False
+        self._day: Optional[date] = None
+        self._window = window_months
+        self._docs_signature: Optional[tuple] = None
+        self._types_signature: Optional[tuple] = None
+
+        self._types: Dict[str, DocumentTypeV1] = {}
+        self._type_fingerprints: Dict[str, str] = {}
+        # doc_id -> entrada ligera (claves del sujeto, período, caducidad y snapshot para la respuesta)
+        self._docs: Dict[str, dict] = {}
+        # Índices de documentos: ("type", t), ("company", t, c), ("person", t, p)
+        self._doc_index: Dict[tuple, Set[str]] = {}
+        # (end_date, doc_id) ordenado: expired/expiring_soon por rango
+        self._by_end_date: List[Tuple[date, str]] = []
+        # type_id -> sujeto -> doc_ids que lo dan de alta
+        self._subjects: Dict[str, Dict[Subject, Set[str]]] = {}
+        # (type_id, sujeto) -> filas de períodos (más reciente primero)
+        self._cells: Dict[Tuple[str, Subject], List[dict]] = {}
+
+        self._stats = {
+            "full_rebuilds": 0,
+            "document_updates": 0,
+            "type_updates": 0,
+            "day_rollovers": 0,
+            "cells_rebuilt": 0,
+        }
+
+    # ========== DOCUMENTOS ==========
+
+    def _doc_entry(self, doc: DocumentInstanceV1) -> dict:
+        end_date: Optional[date] = None
+        base_date: Optional[date] = None
+        if doc.computed_validity and doc.computed_validity.valid_to:
+            end_date = doc.computed_validity.valid_to
+        else:
+            # La fecha de caducidad no depende de hoy: se calcula una vez por versión del documento
+            _, end_date, _, base_date, _ = calculate_document_status(doc, doc_type=self._types.get(doc.type_id))
+        return {
+            "doc_id": doc.doc_id,
+            "type_id": doc.type_id,
+            "scope": getattr(doc.scope, "value", doc.scope),
+            "company_key": doc.company_key,
+            "person_key": doc.person_key,
+            "period_key": doc.period_key,
+            "created_at": doc.created_at,
+            "file_name": doc.file_name_original,
+            "end_date": end_date,
+            "base_date": base_date,
+            "subject": _doc_subject(doc),
+            "doc": doc.model_dump(mode="json"),
+        }
+
+    def _index_keys(self, entry: dict) -> Iterable[tuple]:
+        yield ("type", entry["type_id"])
+        yield ("company", entry["type_id"], entry["company_key"])
+        yield ("person", entry["type_id"], entry["person_key"])
+
+    def _add_doc(self, entry: dict) -> None:
+        doc_id = entry["doc_id"]
+        self._docs[doc_id] = entry
+        for key in self._index_keys(entry):
+            self._doc_index.setdefault(key, set()).add(doc_id)
+        if entry["end_date"] is not None:
+            bisect.insort(self._by_end_date, (entry["end_date"], doc_id))
+        if entry["subject"] is not None:
+            self._subjects.setdefault(entry["type_id"], {}).setdefault(entry["subject"], set()).add(doc_id)
+
+    def _remove_doc(self, doc_id: str) -> Optional[dict]:
+        entry = self._docs.pop(doc_id, None)
+        if entry is None:
+            return None
+        for key in self._index_keys(entry):
+            bucket = self._doc_index.get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._doc_index[key]
+        if entry["end_date"] is not None:
+            pos = bisect.bisect_left(self._by_end_date, (entry["end_date"], doc_id))
+            if pos < len(self._by_end_date) and self._by_end_date[pos] == (entry["end_date"], doc_id):
+                del self._by_end_date[pos]
+        subject = entry["subject"]
+        if subject is not None:
+            subjects = self._subjects.get(entry["type_id"], {})
+            owners = subjects.get(subject)
+            if owners is not None:
+                owners.discard(doc_id)
+                if not owners:
+                    del subjects[subject]
+                    self._cells.pop((entry["type_id"], subject), None)
+        return entry
+
+    # ========== PERÍODOS ==========
+
+    def _expected_periods(self, period_kind: PeriodKindV1) -> List[Tuple[int, str, date, date]]:
+        """(antigüedad, period_key, inicio, fin) de la ventana materializada, más reciente primero."""
+        today = self._day
+        periods = []
+        if period_kind == PeriodKindV1.MONTH:
+            first = today.replace(day=1)
+            for age in range(self._window):
+                start = add_months(first, -age)
+                end = add_months(start, 1) - timedelta(days=1)
+                periods.append((age, f"{start.year}-{start.month:02d}", start, end))
+        elif period_kind == PeriodKindV1.YEAR:
+            for age in range(self._window // 12 + 1):
+                year = today.year - age
+                periods.append((age, str(year), date(year, 1, 1), date(year, 12, 31)))
+        return periods
+
+    def _covering_docs(self, type_id: str, subject: Subject) -> Dict[str, dict]:
+        """period_key -> documento más reciente del sujeto que lo cubre."""
+        _, company_key, person_key = subject
+        if person_key is not None:
+            candidates = self._doc_index.get(("person", type_id, person_key), set())
+        elif company_key is not None:
+            candidates = self._doc_index.get(("company", type_id, company_key), set())
+        else:
+            candidates = self._doc_index.get(("type", type_id), set())
+
+        by_period: Dict[str, dict] = {}
+        for doc_id in candidates:
+            entry = self._docs[doc_id]
+            if not entry["period_key"] or not _covers(entry, subject):
+                continue
+            current = by_period.get(entry["period_key"])
+            if current is None or (entry["created_at"], doc_id) > (current["created_at"], current["doc_id"]):
+                by_period[entry["period_key"]] = entry
+        return by_period
+
+    def _period_rows(self, type_id: str, subject: Subject) -> List[dict]:
+        """Filas de períodos de la ventana para (tipo, sujeto); vacía si el tipo no es periódico."""
+        doc_type = self._types.get(type_id)
+        period_kind = self.planner.get_period_kind_from_type(doc_type) if doc_type and doc_type.active else PeriodKindV1.NONE
+        if period_kind == PeriodKindV1.NONE:
+            return []
+
+        grace_days = 0
+        if period_kind == PeriodKindV1.MONTH and doc_type.validity_policy.monthly:
+            grace_days = doc_type.validity_policy.monthly.grace_days
+
+        covering = self._covering_docs(type_id, subject)
+        rows = []
+        for age, period_key, start, end in self._expected_periods(period_kind):
+            doc = covering.get(period_key)
+            status = PeriodStatusV1.AVAILABLE if doc else PeriodStatusV1.MISSING
+            days_late = None
+            if doc is None:
+                days_since_end = (self._day - end).days
+                if days_since_end > grace_days:
+                    status = PeriodStatusV1.LATE
+                    days_late = days_since_end - grace_days
+            rows.append({
+                "age": age,
+                "period_kind": period_kind,
+                "period_key": period_key,
+                "period_start": start,
+                "period_end": end,
+                "status": status,
+                "doc_id": doc["doc_id"] if doc else None,
+                "doc_file_name": doc["file_name"] if doc else None,
+                "days_late": days_late,
+            })
+        return rows
+
+    def _rebuild_cell(self, type_id: str, subject: Subject) -> None:
+        key = (type_id, subject)
+        rows = self._period_rows(type_id, subject)
+        if not rows:
+            self._cells.pop(key, None)
+            return
+        self._cells[key] = rows
+        self._stats["cells_rebuilt"] += 1
+
+    def _rebuild_type_cells(self, type_id: str, subjects: Optional[Iterable[Subject]] = None) -> None:
+        for subject in list(subjects if subjects is not None else self._subjects.get(type_id, {})):
+            if subject in self._subjects.get(type_id, {}):
+                self._rebuild_cell(type_id, subject)
+            else:
+                self._cells.pop((type_id, subject), None)
+
+    def _rebuild_all_cells(self) -> None:
+        self._cells = {}
+        for type_id in list(self._subjects):
+            self._rebuild_type_cells(type_id)
+
+    # ========== SINCRONIZACIÓN ==========
+
+    def _load_types(self) -> Set[str]:
+        """Recarga los tipos; devuelve los type_id añadidos, modificados o eliminados."""
+        types = {t.type_id: t for t in self.store.list_types(include_inactive=True)}
+        fingerprints = {type_id: _type_fingerprint(t) for type_id, t in types.items()}
+        changed = {t for t in set(fingerprints) | set(self._type_fingerprints)
+                   if fingerprints.get(t) != self._type_fingerprints.get(t)}
+        self._types = types
+        self._type_fingerprints = fingerprints
+        self._types_signature = self.store.types_signature()
+        return changed
+
+    def _full_rebuild(self) -> None:
+        self._load_types()
+        self._docs = {}
+        self._doc_index = {}
+        self._by_end_date = []
+        self._subjects = {}
+        docs = self.store.list_documents()
+        for doc in docs if isinstance(docs, list) else []:
+            self._add_doc(self._doc_entry(doc))
+        self._docs_signature = self.store.documents_signature()
+        self._rebuild_all_cells()
+        self._built = True
+        self._stats["full_rebuilds"] += 1
+
+    def _ensure_fresh(self, window_months: int) -> None:
+        today = _today()
+        if not self._built:
+            self._day = today
+            self._window = max(self._window, window_months)
+            self._full_rebuild()
+            return
+
+        if self.store.documents_signature() != self._docs_signature:
+            # Cambios que no pasaron por notify_* (otro proceso, escritura externa)
+            self._day = today
+            self._window = max(self._window, window_months)
+            self._full_rebuild()
+            return
+
+        if self.store.types_signature() != self._types_signature:
+            changed = self._load_types()
+            for type_id in changed:
+                for doc_id in list(self._doc_index.get(("type", type_id), ())):
+                    entry = self._docs[doc_id]
+                    self._remove_doc(doc_id)
+                    self._add_doc({**entry, **self._doc_entry(DocumentInstanceV1.model_validate(entry["doc"]))})
+                self._rebuild_type_cells(type_id)
+            self._stats["type_updates"] += 1
+
+        if today != self._day or window_months > self._window:
+            if today != self._day:
+                self._stats["day_rollovers"] += 1
+            self._day = today
+            self._window = max(self._window, window_months)
+            self._rebuild_all_cells()
+
+    def on_document_saved(self, doc: DocumentInstanceV1) -> None:
+        """Aplica un alta/modificación: solo se recalculan las celdas del tipo y sujetos afectados."""
+        with self._lock:
+            if not self._built:
+                return
+            old = self._remove_doc(doc.doc_id)
+            entry = self._doc_entry(doc)
+            self._add_doc(entry)
+            self._refresh_cells_for(old, entry)
+            self._docs_signature = self.store.documents_signature()
+            self._stats["document_updates"] += 1
+
+    def on_document_deleted(self, doc_id: str) -> None:
+        """Aplica una baja."""
+        with self._lock:
+            if not self._built:
+                return
+            old = self._remove_doc(doc_id)
+            self._refresh_cells_for(old, None)
+            self._docs_signature = self.store.documents_signature()
+            self._stats["document_updates"] += 1
+
+    def _refresh_cells_for(self, *entries: Optional[dict]) -> None:
+        for entry in entries:
+            if entry is None:
+                continue
+            type_id = entry["type_id"]
+            affected = [s for s in self._subjects.get(type_id, {}) if _covers(entry, s)]
+            self._rebuild_type_cells(type_id, affected)
+
+    # ========== CONSULTA ==========
+
+    def pending(
+        self,
+        months_ahead: int = 3,
+        max_months_back: int = DEFAULT_WINDOW_MONTHS,
+        buckets: Iterable[str] = PENDING_BUCKETS,
+        type_id: Optional[str] = None,
+        scope: Optional[str] = None,
+        company_key: Optional[str] = None,
+        person_key: Optional[str] = None,
+    ) -> Dict[str, List[dict]]:
+        """
+        expired / expiring_soon (documentos, por fecha de caducidad ascendente) y missing
+        (períodos MISSING/LATE por tipo, sujeto y período descendente), con filtros opcionales.
+        """
+        max_months_back = max(1, max_months_back)
+        buckets = set(buckets)
+        with self._lock:
+            self._ensure_fresh(max_months_back)
+            today = self._day
+            threshold_days = months_ahead * 30
+
+            def _wanted(entry_type_id, entry_scope, entry_company, entry_person) -> bool:
+                return (
+                    (type_id is None or entry_type_id == type_id)
+                    and (scope is None or entry_scope == scope)
+                    and (company_key is None or entry_company == company_key)
+                    and (person_key is None or entry_person == person_key)
+                )
+
+            result: Dict[str, List[dict]] = {}
+            if "expired" in buckets or "expiring_soon" in buckets:
+                expired, expiring_soon = [], []
+                stop = bisect.bisect_left(self._by_end_date, (today + timedelta(days=threshold_days + 1), ""))
+                for end_date, doc_id in self._by_end_date[:stop]:
+                    entry = self._docs[doc_id]
+                    if entry["base_date"] and entry["base_date"] > today:
+                        continue  # vigencia aún no iniciada: VALID
+                    if not _wanted(entry["type_id"], entry["scope"], entry["company_key"], entry["person_key"]):
+                        continue
+                    days_until_expiry = (end_date - today).days
+                    status = DocumentValidityStatus.EXPIRED if days_until_expiry < 0 else DocumentValidityStatus.EXPIRING_SOON
+                    target = expired if status == DocumentValidityStatus.EXPIRED else expiring_soon
+                    target.append({
+                        **entry["doc"],
+                        "validity_status": status,
+                        "validity_end_date": end_date.isoformat(),
+                        "days_until_expiry": days_until_expiry,
+                    })
+                if "expired" in buckets:
+                    result["expired"] = expired
+                if "expiring_soon" in buckets:
+                    result["expiring_soon"] = expiring_soon
+
+            if "missing" in buckets:
+                missing = []
+                cells = sorted(
+                    self._cells.items(),
+                    key=lambda item: (self._types[item[0][0]].name, item[0][0],
+                                      tuple("" if v is None else v for v in item[0][1])),
+                )
+                for (cell_type_id, (cell_scope, cell_company, cell_person)), rows in cells:
+                    if not _wanted(cell_type_id, cell_scope, cell_company, cell_person):
+                        continue
+                    doc_type = self._types[cell_type_id]
+                    for row in rows:
+                        max_age = max_months_back if row["period_kind"] == PeriodKindV1.MONTH else max_months_back // 12 + 1
+                        if row["age"] >= max_age or row["status"] == PeriodStatusV1.AVAILABLE:
+                            continue
+                        missing.append({
+                            "type_id": cell_type_id,
+                            "type_name": doc_type.name,
+                            "scope": cell_scope,
+                            "company_key": cell_company,
+                            "person_key": cell_person,
+                            "period_key": row["period_key"],
+                            "period_start": row["period_start"].isoformat(),
+                            "period_end": row["period_end"].isoformat(),
+                            "status": row["status"].value,
+                            "days_late": row["days_late"],
+                        })
+                result["missing"] = missing
+            return result
+
+    def expected_periods(self, type_id: str, subject: Subject, months: Optional[int] = None) -> List[dict]:
+        """
+        Períodos esperados de (tipo, sujeto), incluidos los AVAILABLE, más reciente primero
+        (mismo formato que PeriodInfoV1.to_dict). Sirve /types/{type_id}/expected.
+
+        Si la celda no está materializada (sujeto sin documentos, o company_key/person_key
+        distintos de los del alta) se calcula al vuelo desde los índices, sin listar documentos.
+        """
+        months = self._window if months is None else max(1, months)
+        with self._lock:
+            self._ensure_fresh(months)
+            rows = self._cells.get((type_id, subject))
+            if rows is None:
+                rows = self._period_rows(type_id, subject)
+            result = []
+            for row in rows:
+                max_age = months if row["period_kind"] == PeriodKindV1.MONTH else months // 12 + 1
+                if row["age"] >= max_age:
+                    continue
+                result.append({
+                    "period_key": row["period_key"],
+                    "period_kind": row["period_kind"].value,
+                    "period_start": row["period_start"].isoformat(),
+                    "period_end": row["period_end"].isoformat(),
+                    "status": row["status"].value,
+                    "doc_id": row["doc_id"],
+                    "doc_file_name": row["doc_file_name"],
+                    "days_late": row["days_late"],
+                })
+            return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **self._stats,
+                "documents": len(self._docs),
+                "cells": len(self._cells),
+                "window_months": self._window,
+                "day": self._day.isoformat() if self._day else None,
+            }
+
+
+_CALENDARS: Dict[tuple, ComplianceCalendarV1] = {}
+_CALENDARS_LOCK = threading.Lock()
+
+
+def _calendar_key(store) -> tuple:
+    return (store.backend.name, str(store.repo_dir))
+
+
+def get_compliance_calendar(store) -> ComplianceCalendarV1:
+    """Calendario compartido para el repositorio del store (backend + raíz)."""
+    key = _calendar_key(store)
+    with _CALENDARS_LOCK:
+        calendar = _CALENDARS.get(key)
+        if calendar is None:
+            calendar = ComplianceCalendarV1(store)
+            _CALENDARS[key] = calendar
+        return calendar
+
+
+def notify_document_saved(store, doc: DocumentInstanceV1) -> None:
+    """Hook de DocumentRepositoryStoreV1.save_document (no crea el calendario si no existe)."""
+    with _CALENDARS_LOCK:
+        calendar = _CALENDARS.get(_calendar_key(store))
+    if calendar is not None:
+        calendar.on_document_saved(doc)
+
+
+def notify_document_deleted(store, doc_id: str) -> None:
+    """Hook de DocumentRepositoryStoreV1.delete_document."""
+    with _CALENDARS_LOCK:
+        calendar = _CALENDARS.get(_calendar_key(store))
+    if calendar is not None:
+        calendar.on_document_deleted(doc_id)
+
+
+def reset_compliance_calendars() -> None:
+    """Descarta todos los calendarios (tests / cambio de repository_root_dir)."""
+    with _CALENDARS_LOCK:
+        _CALENDARS.clear()
@@ -6,7 +6,7 @@ from typing import Optional
 
 from fastapi import APIRouter, Query
 
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import get_config_store
 from backend.shared.org_v1 import OrgV1
 from backend.shared.people_v1 import PeopleV1, PersonV1
 from backend.shared.platforms_v1 import PlatformsV1
@@ -22,7 +22,7 @@ router = APIRouter(
 @router.get("/org", response_model=OrgV1)
 async def get_org() -> OrgV1:
     """Obtiene la configuración de organización (solo lectura)."""
-    store = ConfigStoreV1()
+    store = get_config_store()
     return store.load_org()
 
 
@@ -38,7 +38,7 @@ async def get_people(own_company_key: Optional[str] = Query(None, description="F
     Returns:
         PeopleV1 con personas filtradas (o todas si no se especifica filtro)
     """
-    store = ConfigStoreV1()
+    store = get_config_store()
     people = store.load_people()
     
     # Si no se especifica filtro, devolver todo pero loggear warning en dev
@@ -72,10 +72,9 @@ def get_people_for_own_company(own_company_key: str, base_dir: Optional[str] = N
         Lista de PersonV1 asociadas a la empresa propia
     """
     if base_dir:
-        from pathlib import Path
-        store = ConfigStoreV1(base_dir=Path(base_dir))
+        store = get_config_store(base_dir)
     else:
-        store = ConfigStoreV1()
+        store = get_config_store()
     
     people = store.load_people()
     return [p for p in people.people if p.own_company_key == own_company_key]
@@ -84,6 +83,6 @@ def get_people_for_own_company(own_company_key: str, base_dir: Optional[str] = N
 @router.get("/platforms", response_model=PlatformsV1)
 async def get_platforms() -> PlatformsV1:
     """Obtiene la lista de plataformas (solo lectura)."""
-    store = ConfigStoreV1()
+    store = get_config_store()
     return store.load_platforms()
 
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
 from backend.shared.org_v1 import OrgV1
@@ -34,9 +35,25 @@ def _atomic_write_json(path: Path, payload: dict) -> None:
     tmp.replace(path)
 
 
+# Modelos ya validados por fichero de refs, invalidados por (mtime_ns, size) o al escribir.
+_REFS_CACHE: Dict[Path, Tuple[tuple, Any]] = {}
+_REFS_LOCK = threading.Lock()
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
 class ConfigStoreV1:
     """
     Store local (JSON) para org/people/platforms (sin DB).
+
+    Las lecturas se cachean a nivel de proceso mientras el fichero no cambie; cada load_*
+    devuelve una copia, así que el llamador puede modificarla y hacer save_*.
     """
 
     def __init__(self, *, base_dir: str | Path = "data"):
@@ -46,27 +63,50 @@ class ConfigStoreV1:
     def _read_json(self, name: str) -> dict:
         p = self.refs_dir / name
         if not p.exists():
-            ensure_data_layout(base_dir=self.base_dir)
+            ensure_data_layout(base_dir=self.base_dir, force=True)
         return json.loads(p.read_text(encoding="utf-8"))
 
     def _write_json(self, name: str, payload: dict) -> None:
         p = self.refs_dir / name
         _atomic_write_json(p, payload)
+        with _REFS_LOCK:
+            _REFS_CACHE.pop(p, None)
+
+    def _load_cached(self, name: str, build: Callable[[dict], Any]) -> Any:
+        p = self.refs_dir / name
+        signature = _file_signature(p)
+        with _REFS_LOCK:
+            cached = _REFS_CACHE.get(p)
+        if signature is None or cached is None or cached[0] != signature:
+            # Firma tomada antes de leer: si el fichero cambia durante la lectura, se relee
+            raw = self._read_json(name)
+            if signature is None:
+                signature = _file_signature(p)  # _read_json lo recreó desde la plantilla
+            model = build(raw)
+            if signature is not None:
+                with _REFS_LOCK:
+                    _REFS_CACHE[p] = (signature, model)
+            cached = (signature, model)
+        return cached[1].model_copy(deep=True)
 
     def load_org(self) -> OrgV1:
-        raw = self._read_json("org.json")
-        org = raw.get("org") if isinstance(raw, dict) else {}
-        if isinstance(org, dict):
-            org = {**org, "schema_version": "v1"}
-        return OrgV1.model_validate(org)
+        def _build(raw: dict) -> OrgV1:
+            org = raw.get("org") if isinstance(raw, dict) else {}
+            if isinstance(org, dict):
+                org = {**org, "schema_version": "v1"}
+            return OrgV1.model_validate(org)
+
+        return self._load_cached("org.json", _build)
 
     def save_org(self, org: OrgV1) -> None:
         self._write_json("org.json", {"schema_version": "v1", "org": org.model_dump(mode="json", exclude={"schema_version"})})
 
     def load_people(self) -> PeopleV1:
-        raw = self._read_json("people.json")
-        people = raw.get("people") if isinstance(raw, dict) else []
-        return PeopleV1.model_validate({"schema_version": "v1", "people": people or []})
+        def _build(raw: dict) -> PeopleV1:
+            people = raw.get("people") if isinstance(raw, dict) else []
+            return PeopleV1.model_validate({"schema_version": "v1", "people": people or []})
+
+        return self._load_cached("people.json", _build)
 
     def save_people(self, people: PeopleV1) -> None:
         # HOTFIX: Asegurar que own_company_key se persiste explícitamente
@@ -81,9 +121,11 @@ class ConfigStoreV1:
         self._write_json("people.json", {"schema_version": "v1", "people": serialized_people})
 
     def load_platforms(self) -> PlatformsV1:
-        raw = self._read_json("platforms.json")
-        platforms = raw.get("platforms") if isinstance(raw, dict) else []
-        return PlatformsV1.model_validate({"schema_version": "v1", "platforms": platforms or []})
+        def _build(raw: dict) -> PlatformsV1:
+            platforms = raw.get("platforms") if isinstance(raw, dict) else []
+            return PlatformsV1.model_validate({"schema_version": "v1", "platforms": platforms or []})
+
+        return self._load_cached("platforms.json", _build)
 
     def save_platforms(self, platforms: PlatformsV1) -> None:
         # Persistir con aliases para soportar keys "client_input/user_input/pass_input/submit_btn/post_login_check"
@@ -9,8 +9,14 @@ Responsabilidad:
 from __future__ import annotations
 
 import json
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Set
+
+
+# base_dirs (resueltos) cuyo layout ya se verificó en este proceso
+_LAYOUT_READY: Set[Path] = set()
+_LAYOUT_LOCK = threading.Lock()
 
 
 def _write_json_if_missing(path: Path, payload: Dict[str, Any]) -> None:
@@ -42,11 +48,17 @@ def _warn_if_damaged_json(path: Path) -> None:
         print(f"[WARN] Config file has invalid JSON (left as-is): {path}")
 
 
-def ensure_data_layout(*, base_dir: str | Path = "data") -> Path:
+def ensure_data_layout(*, base_dir: str | Path = "data", force: bool = False) -> Path:
     """
     Crea la estructura base de data/ si falta y devuelve base_dir (Path resuelto).
+
+    La verificación completa (mkdirs + plantillas + aviso de JSON dañado) se hace una vez
+    por proceso y base_dir; después basta con comprobar que refs/ sigue existiendo.
+    force=True la repite (p.ej. si falta un fichero de refs).
     """
     base = Path(base_dir).resolve()
+    if not force and base in _LAYOUT_READY and (base / "refs").is_dir():
+        return base
 
     # Dirs
     (base / "documents").mkdir(parents=True, exist_ok=True)
@@ -76,6 +88,8 @@ def ensure_data_layout(*, base_dir: str | Path = "data") -> Path:
     for p in (documents_p, secrets_p, org_p, people_p, platforms_p):
         _warn_if_damaged_json(p)
 
+    with _LAYOUT_LOCK:
+        _LAYOUT_READY.add(base)
     return base
 
 
@@ -0,0 +1,202 @@
+"""
+Catálogo en memoria (process-wide) de los sidecars meta/*.json del repositorio.
+
+Evita re-globear y re-validar todos los sidecars en cada list_documents():
+- Se carga una sola vez por directorio meta/.
+- Se invalida si cambia el mtime de meta/ (altas/bajas/replace atómico externos).
+- save_document/delete_document actualizan el catálogo directamente.
+- Índices secundarios por type_id, scope, company_key, person_key, period_key, status y
+  sha256 (duplicados de contenido en el upload).
+- Contador de generación (generation()) que avanza con cada cambio: base de los ETag
+  de /api/repository/docs.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import uuid
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from backend.shared.document_repository_v1 import DocumentInstanceV1
+
+
+# Campos indexados (nombre del atributo en DocumentInstanceV1)
+INDEXED_FIELDS = ("type_id", "scope", "company_key", "person_key", "period_key", "status", "sha256")
+
+# Identifica este proceso: la generación se reinicia al arrancar y no debe colisionar
+# con ETags emitidos por un proceso anterior.
+_BOOT_TOKEN = uuid.uuid4().hex[:12]
+
+
+def _index_value(value) -> Optional[str]:
+    """Normaliza el valor indexado (enums -> str)."""
+    if value is None:
+        return None
+    return getattr(value, "value", value)
+
+
+class DocumentCatalogV1:
+    """
+    Catálogo indexado de DocumentInstanceV1 para un directorio meta/.
+
+    Los documentos devueltos son copias profundas: mutarlos no altera el catálogo
+    (los cambios deben persistirse con save_document).
+    """
+
+    def __init__(self, meta_dir: Path):
+        self.meta_dir = Path(meta_dir)
+        self._lock = threading.RLock()
+        self._docs: Dict[str, DocumentInstanceV1] = {}
+        self._indexes: Dict[str, Dict[Optional[str], Set[str]]] = {f: {} for f in INDEXED_FIELDS}
+        self._loaded = False
+        self._dir_mtime_ns: Optional[int] = None
+        self._generation = 0
+
+    # ========== CARGA / INVALIDACIÓN ==========
+
+    def _current_dir_mtime_ns(self) -> Optional[int]:
+        try:
+            return self.meta_dir.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _ensure_fresh(self) -> None:
+        """Recarga el catálogo si no está cargado o si meta/ cambió en disco."""
+        mtime = self._current_dir_mtime_ns()
+        if self._loaded and mtime == self._dir_mtime_ns:
+            return
+        self._reload(mtime)
+
+    def _reload(self, mtime: Optional[int]) -> None:
+        self._docs = {}
+        self._indexes = {f: {} for f in INDEXED_FIELDS}
+        if self.meta_dir.exists():
+            for meta_path in self.meta_dir.glob("*.json"):
+                try:
+                    raw = json.loads(meta_path.read_text(encoding="utf-8"))
+                    doc = DocumentInstanceV1.model_validate(raw)
+                except Exception:
+                    continue
+                self._add(doc)
+        self._dir_mtime_ns = mtime
+        self._loaded = True
+        self._generation += 1
+
+    def invalidate(self) -> None:
+        """Fuerza una recarga completa en la próxima consulta."""
+        with self._lock:
+            self._loaded = False
+
+    # ========== ÍNDICES ==========
+
+    def _add(self, doc: DocumentInstanceV1) -> None:
+        self._docs[doc.doc_id] = doc
+        for field in INDEXED_FIELDS:
+            key = _index_value(getattr(doc, field, None))
+            self._indexes[field].setdefault(key, set()).add(doc.doc_id)
+
+    def _remove(self, doc_id: str) -> None:
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for field in INDEXED_FIELDS:
+            key = _index_value(getattr(doc, field, None))
+            bucket = self._indexes[field].get(key)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._indexes[field][key]
+
+    # ========== API ==========
+
+    def upsert(self, doc: DocumentInstanceV1) -> None:
+        """Registra un documento recién escrito en disco."""
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(doc.doc_id)
+            self._add(doc.model_copy(deep=True))
+            self._dir_mtime_ns = self._current_dir_mtime_ns()
+            self._generation += 1
+
+    def discard(self, doc_id: str) -> None:
+        """Elimina un documento recién borrado de disco."""
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(doc_id)
+            self._dir_mtime_ns = self._current_dir_mtime_ns()
+            self._generation += 1
+
+    def get(self, doc_id: str) -> Optional[DocumentInstanceV1]:
+        with self._lock:
+            self._ensure_fresh()
+            doc = self._docs.get(doc_id)
+            return doc.model_copy(deep=True) if doc is not None else None
+
+    def query(self, **filters: Optional[str]) -> List[DocumentInstanceV1]:
+        """
+        Devuelve los documentos que cumplen todos los filtros (campos de INDEXED_FIELDS),
+        ordenados por created_at descendente. Filtros a None se ignoran.
+        """
+        active = {k: _index_value(v) for k, v in filters.items() if v is not None}
+        unknown = set(active) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported catalog filters: {sorted(unknown)}")
+
+        with self._lock:
+            self._ensure_fresh()
+            if active:
+                # Intersección empezando por el bucket más pequeño
+                buckets = sorted(
+                    (self._indexes[field].get(value, set()) for field, value in active.items()),
+                    key=len,
+                )
+                ids = set(buckets[0])
+                for bucket in buckets[1:]:
+                    ids &= bucket
+                    if not ids:
+                        break
+                docs = [self._docs[i] for i in ids]
+            else:
+                docs = list(self._docs.values())
+
+            docs.sort(key=lambda d: d.created_at, reverse=True)
+            return [d.model_copy(deep=True) for d in docs]
+
+    def generation(self) -> tuple:
+        """
+        Firma barata del contenido: (token de proceso, generación). Cambia con cada
+        upsert/discard y con cada recarga por cambios externos en meta/.
+        """
+        with self._lock:
+            self._ensure_fresh()
+            return (_BOOT_TOKEN, self._generation)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_fresh()
+            return len(self._docs)
+
+
+_CATALOGS: Dict[str, DocumentCatalogV1] = {}
+_CATALOGS_LOCK = threading.Lock()
+
+
+def get_document_catalog(meta_dir: Path) -> DocumentCatalogV1:
+    """Obtiene (o crea) el catálogo compartido para un directorio meta/."""
+    key = str(Path(meta_dir).resolve())
+    with _CATALOGS_LOCK:
+        catalog = _CATALOGS.get(key)
+        if catalog is None:
+            catalog = DocumentCatalogV1(Path(key))
+            _CATALOGS[key] = catalog
+        return catalog
+
+
+def reset_document_catalogs() -> None:
+    """Descarta todos los catálogos (tests / cambio de repository_root_dir)."""
+    with _CATALOGS_LOCK:
+        _CATALOGS.clear()
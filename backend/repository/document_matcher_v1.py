@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import copy
 import json
 import re
+import threading
+from contextlib import contextmanager
 from datetime import date, datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Tuple, Any
 
 from backend.shared.document_repository_v1 import (
     DocumentTypeV1,
@@ -12,6 +15,7 @@ from backend.shared.document_repository_v1 import (
     DocumentStatusV1,
 )
 from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.alias_index_v1 import get_alias_index
 from backend.repository.rule_based_matcher_v1 import RuleBasedMatcherV1
 from backend.repository.submission_rules_store_v1 import SubmissionRulesStoreV1
 from backend.shared.text_normalizer import normalize_text as normalize_text_robust
@@ -36,6 +40,11 @@ from backend.repository.matching_debug_codes_v1 import (
     VALIDITY_MISMATCH,
 )
 
+# Firmas de tipos (store.types_signature()) para las que ya se verificaron los aliases
+# de T104_AUTONOMOS_RECEIPT: no releer tipos en cada DocumentMatcherV1(...)
+_AUTONOMOS_ALIASES_OK: set = set()
+_AUTONOMOS_ALIASES_LOCK = threading.Lock()
+
 # Mantener compatibilidad: normalize_text para matching
 def normalize_text(text: str) -> str:
     """Alias para compatibilidad con código existente."""
@@ -119,22 +128,137 @@ class PendingItemV1:
         }
 
 
+class _MemoizedReadsV1:
+    """
+    Proxy que memoiza métodos de lectura de un store durante un batch de matching.
+    Cualquier método de escritura invalida la memoria; el resto de atributos se delegan.
+    """
+    
+    def __init__(self, target: Any, read_methods: Tuple[str, ...], write_methods: Tuple[str, ...] = ()):
+        self._target = target
+        self._read_methods = read_methods
+        self._write_methods = write_methods
+        self._memo: Dict[tuple, Any] = {}
+    
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._target, name)
+        if name in self._read_methods:
+            def _read(*args, **kwargs):
+                key = (name, args, tuple(sorted(kwargs.items())))
+                if key not in self._memo:
+                    self._memo[key] = attr(*args, **kwargs)
+                value = self._memo[key]
+                # Las listas se copian para que el llamador pueda reordenarlas/filtrarlas
+                return list(value) if isinstance(value, list) else value
+            return _read
+        if name in self._write_methods:
+            def _write(*args, **kwargs):
+                self._memo.clear()
+                return attr(*args, **kwargs)
+            return _write
+        return attr
+
+
+class _MatchingBatchV1:
+    """Estado de un batch de matching: escrituras de debug diferidas."""
+    
+    def __init__(self, evidence_dir: Optional[Path]):
+        self.evidence_dir = evidence_dir
+        self.debug_infos: Dict[Path, List[dict]] = {}
+        self.index_entries: Dict[Path, Dict[str, dict]] = {}
+
+
 class DocumentMatcherV1:
     """Matcher determinista de documentos del repositorio con pendientes de eGestiona."""
     
+    _STORE_READS = ("list_types", "get_type", "list_documents", "get_document")
+    _STORE_WRITES = ("create_type", "update_type", "delete_type", "duplicate_type", "save_document", "delete_document")
+    
     def __init__(self, store: DocumentRepositoryStoreV1, base_dir: str | Path = "data"):
         self.store = store
         self.base_dir = base_dir
         # Inicializar rule matcher
         rules_store = SubmissionRulesStoreV1(base_dir=base_dir)
         self.rule_matcher = RuleBasedMatcherV1(rules_store)
+        # Estado de batch (ver matching_batch / match_pending_items)
+        self._batch: Optional[_MatchingBatchV1] = None
+        self._batch_learning_store = None
         # Asegurar aliases para T104_AUTONOMOS_RECEIPT
         self._ensure_autonomos_aliases()
     
+    @contextmanager
+    def matching_batch(self, evidence_dir: Optional[Path] = None) -> Iterator["DocumentMatcherV1"]:
+        """
+        Contexto de batch: devuelve un matcher propio del batch en el que tipos,
+        documentos, reglas y hints se leen una sola vez y los ficheros de debug
+        (pending_match_debug.json, matching_debug/index.json) se escriben una sola
+        vez al salir.
+        
+        El matcher original no se modifica: otros hilos que lo compartan siguen
+        leyendo del store real mientras el batch está abierto.
+        """
+        if self._batch is not None:
+            # Batch anidado: reutilizar el exterior
+            yield self
+            return
+        
+        from backend.shared.learning_store import LearningStore
+        
+        batch_matcher = copy.copy(self)
+        batch_matcher.store = _MemoizedReadsV1(self.store, self._STORE_READS, self._STORE_WRITES)
+        batch_matcher.rule_matcher = copy.copy(self.rule_matcher)
+        batch_matcher.rule_matcher.rules_store = _MemoizedReadsV1(self.rule_matcher.rules_store, ("list_rules",))
+        batch_matcher._batch = _MatchingBatchV1(evidence_dir)
+        batch_matcher._batch_learning_store = _MemoizedReadsV1(LearningStore(base_dir=self.base_dir), ("find_hints",))
+        try:
+            yield batch_matcher
+        finally:
+            batch = batch_matcher._batch
+            batch_matcher._batch = None
+            batch_matcher._flush_batch_debug(batch)
+    
+    def match_pending_items(
+        self,
+        items: List[PendingItemV1],
+        company_key: str,
+        person_key: Optional[str] = None,
+        platform_key: str = "egestiona",
+        coord_label: Optional[str] = None,
+        evidence_dir: Optional[Path] = None,
+        generate_debug_report: bool = True,
+    ) -> List[Dict]:
+        """
+        Matching de un grid completo de pendientes en una sola pasada.
+        
+        Mismo resultado por item que match_pending_item (en el mismo orden que items),
+        pero cargando tipos/documentos/reglas/hints una vez y escribiendo
+        matching_debug/index.json una única vez.
+        """
+        with self.matching_batch(evidence_dir=evidence_dir) as batch_matcher:
+            return [
+                batch_matcher.match_pending_item(
+                    pending,
+                    company_key=company_key,
+                    person_key=person_key,
+                    platform_key=platform_key,
+                    coord_label=coord_label,
+                    evidence_dir=evidence_dir,
+                    generate_debug_report=generate_debug_report,
+                )
+                for pending in items
+            ]
+    
     def _ensure_autonomos_aliases(self) -> None:
         """Asegura que T104_AUTONOMOS_RECEIPT tiene los aliases necesarios para T205.0."""
+        signature = self._types_signature()
+        if signature is not None:
+            with _AUTONOMOS_ALIASES_LOCK:
+                if signature in _AUTONOMOS_ALIASES_OK:
+                    return
+        
         doc_type = self.store.get_type("T104_AUTONOMOS_RECEIPT")
         if not doc_type:
+            self._mark_autonomos_aliases_ok()
             return
         
         required_aliases = [
@@ -167,6 +291,21 @@ class DocumentMatcherV1:
             type_dict["platform_aliases"] = updated_aliases
             updated_type = DocumentTypeV1(**type_dict)
             self.store.update_type("T104_AUTONOMOS_RECEIPT", updated_type)
+        self._mark_autonomos_aliases_ok()
+    
+    def _types_signature(self) -> Optional[tuple]:
+        """Firma de tipos del store (None si el store no la soporta, p.ej. dobles de test)."""
+        try:
+            signature = self.store.types_signature()
+        except Exception:
+            return None
+        return signature if isinstance(signature, tuple) else None
+    
+    def _mark_autonomos_aliases_ok(self) -> None:
+        signature = self._types_signature()
+        if signature is not None:
+            with _AUTONOMOS_ALIASES_LOCK:
+                _AUTONOMOS_ALIASES_OK.add(signature)
     
     def find_matching_types(
         self,
@@ -179,55 +318,12 @@ class DocumentMatcherV1:
         - Detecta códigos al inicio del texto (ej: "T205.0" -> match exacto con mayor confidence)
         - Fallback a contains normalized para aliases de texto
         
+        Usa el AliasIndexV1 compartido (aliases pre-normalizados + Aho-Corasick),
+        reconstruido solo cuando cambian los tipos.
+        
         Retorna: Lista de (tipo, confidence) ordenada por confidence descendente.
         """
-        base_normalized = normalize_text(base_text)
-        if not base_normalized:
-            return []
-        
-        matches: List[Tuple[DocumentTypeV1, float]] = []
-        all_types = self.store.list_types(include_inactive=False)
-        
-        # Extraer código al inicio (ej: "T205.0", "T205")
-        code_match = re.match(r'^([Tt]\d+(?:\.\d+)?)', base_text)
-        detected_code = code_match.group(1) if code_match else None
-        
-        for doc_type in all_types:
-            best_confidence = 0.0
-            match_reason = None
-            
-            for alias in doc_type.platform_aliases:
-                alias_normalized = normalize_text(alias)
-                if not alias_normalized:
-                    continue
-                
-                # Match exacto por código al inicio (mayor confidence)
-                if detected_code:
-                    alias_code_match = re.match(r'^([Tt]\d+(?:\.\d+)?)', alias)
-                    if alias_code_match:
-                        alias_code = alias_code_match.group(1)
-                        if alias_code.upper() == detected_code.upper():
-                            best_confidence = max(best_confidence, 0.9)  # Alta confidence por código exacto
-                            match_reason = f"exact_code_match:{alias_code}"
-                            continue
-                
-                # Fallback: contains normalized
-                if alias_normalized in base_normalized:
-                    # Si el alias está al inicio del texto, mayor confidence
-                    if base_normalized.startswith(alias_normalized):
-                        confidence = 0.75
-                    else:
-                        confidence = 0.6
-                    best_confidence = max(best_confidence, confidence)
-                    if not match_reason:
-                        match_reason = f"contains_alias:{alias}"
-            
-            if best_confidence > 0.0:
-                matches.append((doc_type, best_confidence))
-        
-        # Ordenar por confidence descendente
-        matches.sort(key=lambda x: x[1], reverse=True)
-        return matches
+        return get_alias_index(self.store).find_matching_types(base_text)
     
     def score_document(
         self,
@@ -879,7 +975,8 @@ class DocumentMatcherV1:
             from backend.shared.text_normalizer import normalize_text as normalize_text_for_hint
             
             # Usar el mismo base_dir que el store para que los tests funcionen
-            learning_store = LearningStore(base_dir=self.base_dir)
+            # (en batch se reutiliza un único LearningStore con find_hints memoizado)
+            learning_store = self._batch_learning_store or LearningStore(base_dir=self.base_dir)
             
             # Construir portal label normalizado
             portal_type_label_normalized = None
@@ -1273,7 +1370,14 @@ class DocumentMatcherV1:
         }
     
     def _save_debug_info(self, evidence_dir: Path, debug_info: dict) -> None:
-        """Guarda pending_match_debug.json en evidence_dir (legacy)."""
+        """Guarda pending_match_debug.json en evidence_dir (legacy). En batch se difiere."""
+        if self._batch is not None:
+            self._batch.debug_infos.setdefault(Path(evidence_dir), []).append(debug_info)
+            return
+        self._write_debug_infos(evidence_dir, [debug_info])
+    
+    def _write_debug_infos(self, evidence_dir: Path, debug_infos: List[dict]) -> None:
+        """Añade entradas a pending_match_debug.json (una sola escritura)."""
         try:
             debug_path = evidence_dir / "pending_match_debug.json"
             # Si ya existe, leer y añadir a lista
@@ -1281,14 +1385,13 @@ class DocumentMatcherV1:
                 try:
                     existing = json.loads(debug_path.read_text(encoding="utf-8"))
                     if isinstance(existing, list):
-                        existing.append(debug_info)
-                        debug_data = existing
+                        debug_data = existing + list(debug_infos)
                     else:
-                        debug_data = [existing, debug_info]
+                        debug_data = [existing] + list(debug_infos)
                 except Exception:
-                    debug_data = [debug_info]
+                    debug_data = list(debug_infos)
             else:
-                debug_data = [debug_info]
+                debug_data = list(debug_infos)
             
             debug_path.write_text(
                 json.dumps(debug_data, ensure_ascii=False, indent=2),
@@ -1318,20 +1421,6 @@ class DocumentMatcherV1:
                 encoding="utf-8"
             )
             
-            # Actualizar índice
-            index_path = matching_debug_dir / "index.json"
-            index_data = {}
-            if index_path.exists():
-                try:
-                    index_data = json.loads(index_path.read_text(encoding="utf-8"))
-                except Exception:
-                    index_data = {}
-            
-            if "items" not in index_data:
-                index_data["items"] = []
-            
-            # Añadir o actualizar entrada
-            existing_idx = next((i for i, item in enumerate(index_data["items"]) if item.get("item_id") == item_id), None)
             item_entry = {
                 "item_id": item_id,
                 "pending_label": debug_report.meta["request_context"]["pending_label"],
@@ -1345,11 +1434,42 @@ class DocumentMatcherV1:
                 "report_path": str(report_path.relative_to(evidence_dir)),
                 "created_at": debug_report.meta["created_at"],
             }
+        except Exception as e:
+            # No fallar si no se puede guardar debug report
+            print(f"[MATCHING_DEBUG] Error guardando debug report: {e}")
+            return
+        
+        if self._batch is not None:
+            # En batch: el índice se escribe una sola vez al cerrar el batch
+            self._batch.index_entries.setdefault(Path(evidence_dir), {})[item_id] = item_entry
+            return
+        self._write_debug_index(evidence_dir, [item_entry])
+    
+    def _write_debug_index(self, evidence_dir: Path, item_entries: List[dict]) -> None:
+        """Actualiza matching_debug/index.json con varias entradas (una sola escritura)."""
+        try:
+            matching_debug_dir = evidence_dir / "matching_debug"
+            matching_debug_dir.mkdir(parents=True, exist_ok=True)
+            index_path = matching_debug_dir / "index.json"
+            index_data = {}
+            if index_path.exists():
+                try:
+                    index_data = json.loads(index_path.read_text(encoding="utf-8"))
+                except Exception:
+                    index_data = {}
             
-            if existing_idx is not None:
-                index_data["items"][existing_idx] = item_entry
-            else:
-                index_data["items"].append(item_entry)
+            if "items" not in index_data:
+                index_data["items"] = []
+            
+            # Añadir o actualizar entradas
+            positions = {item.get("item_id"): i for i, item in enumerate(index_data["items"])}
+            for item_entry in item_entries:
+                existing_idx = positions.get(item_entry["item_id"])
+                if existing_idx is not None:
+                    index_data["items"][existing_idx] = item_entry
+                else:
+                    positions[item_entry["item_id"]] = len(index_data["items"])
+                    index_data["items"].append(item_entry)
             
             # Actualizar resumen
             index_data["summary"] = {
@@ -1373,6 +1493,17 @@ class DocumentMatcherV1:
             print(f"[MATCHING_DEBUG] Error guardando debug report: {e}")
             pass
     
+    def _flush_batch_debug(self, batch: Optional[_MatchingBatchV1]) -> None:
+        """Escribe los ficheros de debug acumulados durante un batch."""
+        if batch is None:
+            return
+        for evidence_dir, debug_infos in batch.debug_infos.items():
+            if debug_infos:
+                self._write_debug_infos(evidence_dir, debug_infos)
+        for evidence_dir, entries in batch.index_entries.items():
+            if entries:
+                self._write_debug_index(evidence_dir, list(entries.values()))
+    
     def build_matching_debug_report(
         self,
         pending: PendingItemV1,
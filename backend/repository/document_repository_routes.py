@@ -1,8 +1,10 @@
 from __future__ import annotations
 
-import shutil
+import base64
+import hashlib
 import json
 import re
+import unicodedata
 import zipfile
 import io
 from pathlib import Path
@@ -13,11 +15,13 @@ from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Request, R
 from pydantic import BaseModel, field_validator
 from typing import Optional, List, Union, Any
 
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_service_v1 import get_config_store, get_repository_store
 from backend.repository.date_parser_v1 import parse_date_from_filename
 from backend.repository.validity_calculator_v1 import compute_validity
 from backend.repository.period_planner_v1 import PeriodPlannerV1, PeriodInfoV1
-from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.blob_store_v1 import is_sha256
+from backend.repository.compliance_calendar_v1 import PENDING_BUCKETS, get_compliance_calendar
+from backend.shared.storage_io_v1 import async_store, run_storage_io
 from backend.shared.document_repository_v1 import (
     DocumentTypeV1,
     DocumentInstanceV1,
@@ -63,7 +67,7 @@ async def list_types(
     Si no, devuelve List[DocumentTypeV1] (compatibilidad hacia atrás).
     """
     try:
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         types = store.list_types(include_inactive=True)  # Traer todos y filtrar después
         
         # Filtros
@@ -152,7 +156,7 @@ async def list_types(
 @router.get("/types/{type_id}", response_model=DocumentTypeV1)
 async def get_type(type_id: str) -> DocumentTypeV1:
     """Obtiene un tipo por ID."""
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     doc_type = store.get_type(type_id)
     if not doc_type:
         raise HTTPException(status_code=404, detail=f"Type {type_id} not found")
@@ -186,7 +190,7 @@ async def create_type(doc_type: DocumentTypeV1, request: Request) -> DocumentTyp
                    f"Usa ENVIRONMENT=test o header X-E2E=1 para tests."
         )
     
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     try:
         result = store.create_type(doc_type)
         
@@ -212,7 +216,7 @@ async def create_type(doc_type: DocumentTypeV1, request: Request) -> DocumentTyp
 @router.put("/types/{type_id}", response_model=DocumentTypeV1)
 async def update_type(type_id: str, doc_type: DocumentTypeV1) -> DocumentTypeV1:
     """Actualiza un tipo existente. El type_id no se puede cambiar."""
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     try:
         # Asegurar que el type_id del body coincide con el de la URL
         # Si no coincide, usar el de la URL (el type_id no se puede cambiar)
@@ -237,7 +241,7 @@ async def duplicate_type(
     request: DuplicateTypeRequest
 ) -> DocumentTypeV1:
     """Duplica un tipo con nuevo ID."""
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     try:
         # Si no se proporciona new_type_id, generar uno automáticamente
         new_type_id = request.new_type_id
@@ -263,7 +267,7 @@ async def duplicate_type(
 @router.delete("/types/{type_id}")
 async def delete_type(type_id: str) -> dict:
     """Elimina un tipo (hard delete)."""
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     try:
         store.delete_type(type_id)
         return {"status": "ok", "message": f"Type {type_id} deleted"}
@@ -297,7 +301,7 @@ async def add_alias_to_type(
     from backend.training.training_action_logger import log_training_action
     from backend.config import DATA_DIR
     
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     
     # Obtener tipo existente
     doc_type = store.get_type(type_id)
@@ -356,7 +360,7 @@ async def add_alias_to_type(
 
 @router.post("/docs/upload", response_model=DocumentInstanceV1)
 async def upload_document(
-    file: UploadFile = File(...),
+    file: Optional[UploadFile] = File(None),
     type_id: str = Form(...),
     scope: str = Form(...),
     company_key: Optional[str] = Form(None),
@@ -364,6 +368,8 @@ async def upload_document(
     period_key: Optional[str] = Form(None),
     issue_date: Optional[str] = Form(None),
     validity_start_date: Optional[str] = Form(None),
+    content_sha256: Optional[str] = Form(None),
+    file_name: Optional[str] = Form(None),
     request: Request = None,
 ) -> DocumentInstanceV1:
     """
@@ -374,6 +380,8 @@ async def upload_document(
     - scope: "company" o "worker"
     - company_key: Clave de empresa (si scope=company)
     - person_key: Clave de persona (si scope=worker)
+    - content_sha256 + file_name: subida por referencia (sin file) a un contenido ya
+      almacenado; el cliente lo comprueba antes con GET /blobs/{sha256}
     """
     import os
     
@@ -392,7 +400,7 @@ async def upload_document(
                    f"Usa ENVIRONMENT=test o header X-E2E=1 para tests."
         )
     
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     
     # Validar tipo
     doc_type = store.get_type(type_id)
@@ -422,181 +430,406 @@ async def upload_document(
             raise HTTPException(status_code=400, detail="person_key required for scope=worker")
     
     # Validar que es PDF
-    if not file.filename or not file.filename.lower().endswith(".pdf"):
+    original_name = file.filename if file is not None else file_name
+    if file is None and not content_sha256:
+        raise HTTPException(status_code=400, detail="file or content_sha256 required")
+    if not original_name or not original_name.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="File must be a PDF")
     
     # Generar doc_id
     doc_id = str(uuid4())
+    io_store = async_store(store)
     
-    # Guardar archivo temporalmente
-    import tempfile
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        shutil.copyfileobj(file.file, tmp_file)
-        tmp_path = Path(tmp_file.name)
+    if file is not None:
+        # Hash y escritura en una sola pasada directamente al almacén de blobs (fuera del event loop);
+        # si el contenido ya existía no se guarda otra copia
+        blob = await io_store.ingest_pdf_stream(file.file)
+        sha256 = blob.sha256
+    else:
+        # claim refresca el blob para que el gc no lo borre antes de guardar el documento
+        if not await run_storage_io(store.blobs.claim, content_sha256):
+            raise HTTPException(status_code=404, detail=f"Content {content_sha256} not found")
+        sha256 = content_sha256
     
-    try:
-        # Calcular hash
-        sha256 = store.compute_file_hash(tmp_path)
-        
-        # Copiar al repositorio
-        stored_path_rel = f"data/repository/docs/{doc_id}.pdf"
-        store.store_pdf(tmp_path, doc_id)
-        
-        # Parsear fecha desde nombre
-        name_date, name_date_confidence = parse_date_from_filename(file.filename)
-        
-        # Parsear issue_date si viene en el form
-        parsed_issue_date = None
-        if issue_date:
+    stored_path_rel = f"data/repository/docs/{doc_id}.pdf"
+    
+    # Parsear fecha desde nombre
+    name_date, name_date_confidence = parse_date_from_filename(original_name)
+    
+    # Parsear issue_date si viene en el form
+    parsed_issue_date = None
+    if issue_date:
+        try:
+            parsed_issue_date = datetime.strptime(issue_date, "%Y-%m-%d").date()
+        except ValueError:
+            pass  # Si no se puede parsear, usar None
+    
+    # Resolver validity_start_date según el modo del tipo
+    parsed_validity_start_date = None
+    validity_start_mode = getattr(doc_type, 'validity_start_mode', 'issue_date')
+    
+    if validity_start_mode == "issue_date":
+        # Inicio de vigencia = issue_date
+        parsed_validity_start_date = parsed_issue_date or name_date
+    elif validity_start_mode == "manual":
+        # Inicio de vigencia viene del form (obligatorio)
+        if validity_start_date:
             try:
-                parsed_issue_date = datetime.strptime(issue_date, "%Y-%m-%d").date()
+                parsed_validity_start_date = datetime.strptime(validity_start_date, "%Y-%m-%d").date()
             except ValueError:
-                pass  # Si no se puede parsear, usar None
-        
-        # Resolver validity_start_date según el modo del tipo
-        parsed_validity_start_date = None
-        validity_start_mode = getattr(doc_type, 'validity_start_mode', 'issue_date')
-        
-        if validity_start_mode == "issue_date":
-            # Inicio de vigencia = issue_date
-            parsed_validity_start_date = parsed_issue_date or name_date
-        elif validity_start_mode == "manual":
-            # Inicio de vigencia viene del form (obligatorio)
-            if validity_start_date:
-                try:
-                    parsed_validity_start_date = datetime.strptime(validity_start_date, "%Y-%m-%d").date()
-                except ValueError:
-                    raise HTTPException(
-                        status_code=400,
-                        detail="validity_start_date debe estar en formato YYYY-MM-DD"
-                    )
-            else:
                 raise HTTPException(
                     status_code=400,
-                    detail="validity_start_date es obligatorio cuando validity_start_mode=manual"
-                )
-        
-        # Crear metadatos extraídos
-        extracted = ExtractedMetadataV1(
-            issue_date=parsed_issue_date,
-            name_date=name_date,
-            validity_start_date=parsed_validity_start_date
-        )
-        
-        # Calcular validez
-        computed_validity = compute_validity(doc_type.validity_policy, extracted)
-        
-        # Inferir period_key si el tipo es periódico
-        planner = PeriodPlannerV1(store)
-        period_kind = planner.get_period_kind_from_type(doc_type)
-        period_key_param = period_key  # Guardar el parámetro del form
-        needs_period = False
-        
-        if period_kind != PeriodKindV1.NONE:
-            # Use provided period_key or try to infer
-            if not period_key_param:
-                # Usar validity_start_date como fecha base para calcular periodo si está disponible
-                base_date = extracted.validity_start_date or extracted.issue_date or name_date
-                period_key_param = planner.infer_period_key(
-                    doc_type=doc_type,
-                    issue_date=base_date,  # Usar validity_start_date como base
-                    name_date=name_date,
-                    filename=file.filename or "unknown.pdf",
+                    detail="validity_start_date debe estar en formato YYYY-MM-DD"
                 )
-            if not period_key_param:
-                needs_period = True
-        
-        # Crear instancia de documento
-        doc = DocumentInstanceV1(
-            doc_id=doc_id,
-            file_name_original=file.filename or "unknown.pdf",
-            stored_path=stored_path_rel,
-            sha256=sha256,
-            type_id=type_id,
-            scope=DocumentScopeV1(scope),
-            company_key=company_key,
-            person_key=person_key,
-            extracted=extracted,
-            computed_validity=computed_validity,
-            period_kind=period_kind,
-            period_key=period_key_param,
-            issued_at=extracted.issue_date or name_date,
-            needs_period=needs_period,
-            status=DocumentStatusV1.draft,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
-        )
-        
-        # Guardar
-        store.save_document(doc)
-        
-        return doc
+        else:
+            raise HTTPException(
+                status_code=400,
+                detail="validity_start_date es obligatorio cuando validity_start_mode=manual"
+            )
+    
+    # Crear metadatos extraídos
+    extracted = ExtractedMetadataV1(
+        issue_date=parsed_issue_date,
+        name_date=name_date,
+        validity_start_date=parsed_validity_start_date
+    )
+    
+    # Calcular validez
+    computed_validity = compute_validity(doc_type.validity_policy, extracted)
     
-    finally:
-        # Limpiar archivo temporal
-        tmp_path.unlink(missing_ok=True)
+    # Inferir period_key si el tipo es periódico
+    planner = PeriodPlannerV1(store)
+    period_kind = planner.get_period_kind_from_type(doc_type)
+    period_key_param = period_key  # Guardar el parámetro del form
+    needs_period = False
+    
+    if period_kind != PeriodKindV1.NONE:
+        # Use provided period_key or try to infer
+        if not period_key_param:
+            # Usar validity_start_date como fecha base para calcular periodo si está disponible
+            base_date = extracted.validity_start_date or extracted.issue_date or name_date
+            period_key_param = planner.infer_period_key(
+                doc_type=doc_type,
+                issue_date=base_date,  # Usar validity_start_date como base
+                name_date=name_date,
+                filename=original_name,
+            )
+        if not period_key_param:
+            needs_period = True
+    
+    # Crear instancia de documento
+    doc = DocumentInstanceV1(
+        doc_id=doc_id,
+        file_name_original=original_name,
+        stored_path=stored_path_rel,
+        sha256=sha256,
+        type_id=type_id,
+        scope=DocumentScopeV1(scope),
+        company_key=company_key,
+        person_key=person_key,
+        extracted=extracted,
+        computed_validity=computed_validity,
+        period_kind=period_kind,
+        period_key=period_key_param,
+        issued_at=extracted.issue_date or name_date,
+        needs_period=needs_period,
+        status=DocumentStatusV1.draft,
+        created_at=datetime.utcnow(),
+        updated_at=datetime.utcnow()
+    )
+    
+    # Exportar como docs/<doc_id>.pdf (hardlink al blob si es posible) y guardar
+    try:
+        await io_store.export_pdf(sha256, doc_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=409, detail=f"Content {sha256} no longer available, upload the file again")
+    await io_store.save_document(doc)
+    
+    return doc
+
+
+# Paginación por cursor de /docs: tamaño por defecto y máximo de página
+DOCS_DEFAULT_PAGE_SIZE = 100
+DOCS_MAX_PAGE_SIZE = 500
+
+# Campos calculados por calculate_document_status (se omite el cálculo si la proyección no los pide)
+VALIDITY_FIELDS = (
+    "validity_status",
+    "validity_end_date",
+    "days_until_expiry",
+    "validity_base_date",
+    "validity_base_reason",
+)
+
+
+def _normalize_search(value: Optional[str]) -> str:
+    """Minúsculas y sin tildes (igual que normalizeString del frontend)."""
+    if not value:
+        return ""
+    decomposed = unicodedata.normalize("NFD", str(value))
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower().strip()
+
+
+# Ordenaciones de /docs: por fecha, o alfabética por tipo/sujeto (más reciente primero en empates)
+DOCS_SORTS = ("date_desc", "date_asc", "type", "subject")
+_TEXT_SORTS = ("type", "subject")
+
+
+def _doc_sort_key(doc: DocumentInstanceV1, sort: str = "date_desc", types_by_id: Optional[dict] = None) -> tuple:
+    """Clave de orden estable: created_at y doc_id como desempate."""
+    if sort in _TEXT_SORTS:
+        if sort == "type":
+            doc_type = (types_by_id or {}).get(doc.type_id)
+            label = doc_type.name if doc_type else doc.type_id
+        else:
+            label = doc.person_key or doc.company_key
+        return (_normalize_search(label), -doc.created_at.timestamp(), doc.doc_id)
+    return (doc.created_at, doc.doc_id)
+
+
+def _encode_docs_cursor(key: tuple, sort: str) -> str:
+    if sort in _TEXT_SORTS:
+        payload = {"k": list(key), "s": sort}
+    else:
+        payload = {"c": key[0].isoformat(), "d": key[1], "s": sort}
+    raw = json.dumps(payload, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_docs_cursor(cursor: str, sort: str) -> tuple:
+    """Devuelve la clave de orden del último elemento entregado. 400 si es inválido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        if sort in _TEXT_SORTS:
+            label, neg_ts, doc_id = payload["k"]
+            key = (str(label), float(neg_ts), str(doc_id))
+        else:
+            key = (datetime.fromisoformat(payload["c"]), str(payload["d"]))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if payload.get("s") != sort:
+        raise HTTPException(status_code=400, detail="El cursor pertenece a otra ordenación")
+    return key
+
+
+def _is_demo_doc(doc: DocumentInstanceV1, doc_type: Optional[DocumentTypeV1]) -> bool:
+    """Documentos de demo/test (mismos patrones que el filtro demo del buscador)."""
+    file_name = doc.file_name_original or ""
+    person_key = doc.person_key or ""
+    company_key = doc.company_key or ""
+    return (
+        doc.doc_id.startswith("demo_")
+        or (doc.type_id or "").startswith("demo_")
+        or "(Demo)" in file_name or "(demo)" in file_name
+        or person_key.startswith(("demo_worker_", "TEST_")) or person_key == "worker123"
+        or company_key.startswith(("demo_", "TEST_"))
+        or (doc_type is not None and ("(Demo)" in doc_type.name or "(demo)" in doc_type.name))
+    )
+
+
+def _docs_etag(store, params: dict) -> str:
+    """
+    ETag débil de /docs: generación de documentos y tipos, fecha de hoy (la validez
+    depende de ella) y parámetros de la consulta. Se calcula sin leer ningún documento.
+    """
+    basis = json.dumps(
+        [list(store.documents_signature()), list(store.types_signature()), date.today().isoformat(), params],
+        default=str,
+        sort_keys=True,
+    )
+    return 'W/"' + hashlib.sha1(basis.encode("utf-8")).hexdigest()[:24] + '"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (lista separada por comas o '*')."""
+    if not if_none_match:
+        return False
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
 
 
 @router.get("/docs")
 async def list_documents(
+    request: Request,
+    response: Response,
     type_id: Optional[str] = None,
     scope: Optional[str] = None,
     status: Optional[str] = None,
     validity_status: Optional[str] = None,  # VALID, EXPIRING_SOON, EXPIRED
     limit: Optional[int] = None,  # SPRINT C2.10.1: Límite de documentos a retornar
-    sort: Optional[str] = None  # SPRINT C2.10.1: Ordenación ('date_desc', 'date_asc')
-) -> List[dict]:
+    sort: Optional[str] = None,  # SPRINT C2.10.1: Ordenación ('date_desc', 'date_asc', 'type', 'subject')
+    company_key: Optional[str] = None,
+    person_key: Optional[str] = None,
+    subject_key: Optional[str] = None,  # Empresa o trabajador (person_key o company_key)
+    exclude_demo: bool = False,  # Ocultar documentos demo/test
+    q: Optional[str] = None,  # Búsqueda en nombre de archivo, empresa, persona y tipo
+    fields: Optional[str] = None,  # Proyección: "doc_id,type_id,validity_status"
+    cursor: Optional[str] = None,
+    page_size: Optional[int] = None,
+) -> Union[List[dict], dict]:
     """
     Lista todos los documentos (con filtros opcionales).
     Incluye estado de validez calculado (validity_status, validity_end_date, days_until_expiry).
     SPRINT C2.10.1: Soporta limit y sort para optimizar carga en UI.
+
+    Si se proporcionan cursor/page_size, devuelve {items, next_cursor, has_more, page_size, total}
+    (total es None si depende de validity_status). Si no, devuelve List[dict] (compatibilidad hacia atrás).
+    Todos los filtros y la ordenación se aplican antes de paginar: total cuenta ya filtrado.
+    La respuesta lleva ETag: con If-None-Match coincidente devuelve 304 sin leer documentos.
     """
+    params = {
+        "type_id": type_id,
+        "scope": scope,
+        "status": status,
+        "validity_status": validity_status,
+        "limit": limit,
+        "sort": sort,
+        "company_key": company_key,
+        "person_key": person_key,
+        "subject_key": subject_key,
+        "exclude_demo": exclude_demo,
+        "q": q,
+        "fields": fields,
+        "cursor": cursor,
+        "page_size": page_size,
+    }
+    # Escaneo de meta/ + cálculo de validez fuera del event loop
+    etag, payload = await run_storage_io(_list_documents_sync, params, request.headers.get("if-none-match"))
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if payload is None:
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return payload
+
+
+def _list_documents_sync(params: dict, if_none_match: Optional[str] = None) -> tuple:
+    """Devuelve (etag, payload); payload es None si el cliente ya tiene esta versión."""
     from backend.repository.document_status_calculator_v1 import calculate_document_status
-    
+
     try:
-        store = DocumentRepositoryStoreV1()
-        docs = store.list_documents(type_id=type_id, scope=scope, status=status)
+        store = get_repository_store()
+        etag = _docs_etag(store, params)
+        if _etag_matches(if_none_match, etag):
+            return etag, None
+
+        sort = params["sort"] if params["sort"] in DOCS_SORTS else "date_desc"
+        paginated = params["cursor"] is not None or params["page_size"] is not None
+        after = _decode_docs_cursor(params["cursor"], sort) if params["cursor"] else None
+
+        docs = store.list_documents(
+            type_id=params["type_id"],
+            scope=params["scope"],
+            status=params["status"],
+            company_key=params["company_key"],
+            person_key=params["person_key"],
+        )
         # Asegurar que siempre es una lista
         if not isinstance(docs, list):
-            return []
-        
+            docs = []
+
+        # Tipos leídos una sola vez por petición (antes: get_type() por documento releía types.json)
+        types_by_id = {t.type_id: t for t in store.list_types(include_inactive=True)}
+
+        subject_key = params.get("subject_key")
+        if subject_key:
+            docs = [d for d in docs if subject_key in (d.person_key, d.company_key)]
+        if params.get("exclude_demo"):
+            docs = [d for d in docs if not _is_demo_doc(d, types_by_id.get(d.type_id))]
+
         # SPRINT C2.10.1: Aplicar ordenación antes de calcular validez (más eficiente)
-        if sort == 'date_asc':
-            docs = sorted(docs, key=lambda d: d.created_at)
-        elif sort == 'date_desc' or sort is None:
-            # Por defecto: más recientes primero (ya viene ordenado así de list_documents)
-            pass
-        
-        # SPRINT C2.10.1: Aplicar limit ANTES de calcular validez (optimización)
-        if limit is not None and limit > 0:
-            docs = docs[:limit]
-        
-        # Calcular estado de validez para cada documento
+        def _sort_key(doc: DocumentInstanceV1) -> tuple:
+            return _doc_sort_key(doc, sort, types_by_id)
+
+        docs.sort(key=_sort_key, reverse=(sort == "date_desc"))
+
+        needle = _normalize_search(params["q"])
+        if needle:
+            def _matches(doc: DocumentInstanceV1) -> bool:
+                doc_type = types_by_id.get(doc.type_id)
+                haystack = (
+                    doc.file_name_original,
+                    doc.company_key,
+                    doc.person_key,
+                    doc.type_id,
+                    doc_type.name if doc_type else None,
+                )
+                return any(needle in _normalize_search(value) for value in haystack)
+
+            docs = [d for d in docs if _matches(d)]
+        total = len(docs)
+
+        if after is not None:
+            if sort == "date_desc":
+                docs = [d for d in docs if _sort_key(d) < after]
+            else:
+                docs = [d for d in docs if _sort_key(d) > after]
+
+        if paginated:
+            size = max(1, min(params["page_size"] or DOCS_DEFAULT_PAGE_SIZE, DOCS_MAX_PAGE_SIZE))
+        else:
+            size = None
+            # SPRINT C2.10.1: Aplicar limit ANTES de calcular validez (optimización)
+            if params["limit"] is not None and params["limit"] > 0:
+                docs = docs[:params["limit"]]
+
+        projection = [f.strip() for f in (params["fields"] or "").split(",") if f.strip()]
+        validity_status = params["validity_status"]
+        needs_validity = bool(validity_status) or not projection or any(f in VALIDITY_FIELDS for f in projection)
+
+        # Calcular estado de validez solo para los documentos que se entregan
         result = []
+        last_doc = None
+        has_more = False
         for doc in docs:
             doc_dict = doc.model_dump() if hasattr(doc, 'model_dump') else doc.dict()
-            
-            # Calcular estado de validez (con tipo de documento para cálculo correcto)
-            doc_type = store.get_type(doc.type_id)
-            validity_status_calc, validity_end_date, days_until_expiry, base_date, base_reason = calculate_document_status(
-                doc, doc_type=doc_type
-            )
-            
-            # Añadir campos calculados
-            doc_dict['validity_status'] = validity_status_calc
-            doc_dict['validity_end_date'] = validity_end_date.isoformat() if validity_end_date else None
-            doc_dict['days_until_expiry'] = days_until_expiry
-            # Campos de debug (opcional, se pueden quitar después)
-            doc_dict['validity_base_date'] = base_date.isoformat() if base_date else None
-            doc_dict['validity_base_reason'] = base_reason
-            
-            # Filtrar por validity_status si se especifica
-            if validity_status and validity_status_calc != validity_status:
-                continue
-            
+
+            if needs_validity:
+                # Calcular estado de validez (con tipo de documento para cálculo correcto)
+                validity_status_calc, validity_end_date, days_until_expiry, base_date, base_reason = calculate_document_status(
+                    doc, doc_type=types_by_id.get(doc.type_id)
+                )
+
+                # Filtrar por validity_status si se especifica
+                if validity_status and validity_status_calc != validity_status:
+                    continue
+
+                # Añadir campos calculados
+                doc_dict['validity_status'] = validity_status_calc
+                doc_dict['validity_end_date'] = validity_end_date.isoformat() if validity_end_date else None
+                doc_dict['days_until_expiry'] = days_until_expiry
+                # Campos de debug (opcional, se pueden quitar después)
+                doc_dict['validity_base_date'] = base_date.isoformat() if base_date else None
+                doc_dict['validity_base_reason'] = base_reason
+
+            if size is not None and len(result) == size:
+                has_more = True
+                break
+
+            if projection:
+                doc_dict = {f: doc_dict[f] for f in projection if f in doc_dict}
             result.append(doc_dict)
-        
-        return result
+            last_doc = doc
+
+        if not paginated:
+            return etag, result
+
+        return etag, {
+            "items": result,
+            "next_cursor": _encode_docs_cursor(_sort_key(last_doc), sort) if has_more else None,
+            "has_more": has_more,
+            "page_size": size,
+            # Total barato solo si no depende del cálculo de validez
+            "total": None if validity_status else total,
+        }
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=500, detail=f"Error al leer documentos: {str(e)}")
     except Exception as e:
@@ -606,7 +839,14 @@ async def list_documents(
 @router.get("/docs/pending")
 async def get_pending_documents(
     months_ahead: int = 3,  # Meses hacia adelante para considerar "expira pronto"
-    max_months_back: int = 24  # Máximo de meses hacia atrás para generar períodos faltantes
+    max_months_back: int = 24,  # Máximo de meses hacia atrás para generar períodos faltantes
+    bucket: Optional[str] = None,  # "expired", "expiring_soon", "missing" (por defecto, los tres)
+    type_id: Optional[str] = None,
+    scope: Optional[str] = None,  # "worker", "company"
+    company_key: Optional[str] = None,
+    person_key: Optional[str] = None,
+    page: Optional[int] = None,
+    page_size: Optional[int] = None,
 ) -> dict:
     """
     Obtiene documentos pendientes, expirados y próximos a expirar.
@@ -617,153 +857,89 @@ async def get_pending_documents(
     - expired: Documentos expirados
     - expiring_soon: Documentos que expiran pronto (dentro de months_ahead meses)
     - missing: Períodos esperados sin documento (agrupados por tipo y sujeto)
+    
+    Se sirve desde el calendario materializado (compliance_calendar_v1).
+    Si se proporcionan page/page_size, cada lista se pagina y se añade totals por lista.
     """
+    if bucket is not None and bucket not in PENDING_BUCKETS:
+        raise HTTPException(status_code=400, detail=f"bucket debe ser uno de {', '.join(PENDING_BUCKETS)}")
+    filters = {"type_id": type_id, "scope": scope, "company_key": company_key, "person_key": person_key}
+    return await run_storage_io(
+        _get_pending_documents_sync, months_ahead, max_months_back, bucket, filters, page, page_size
+    )
+
+
+def _get_pending_documents_sync(
+    months_ahead: int,
+    max_months_back: int,
+    bucket: Optional[str] = None,
+    filters: Optional[dict] = None,
+    page: Optional[int] = None,
+    page_size: Optional[int] = None,
+) -> dict:
     import time
-    import logging
-    logger = logging.getLogger(__name__)
     
     t0 = time.time()
-    from backend.repository.document_status_calculator_v1 import calculate_document_status, DocumentValidityStatus
-    from backend.repository.period_planner_v1 import PeriodPlannerV1
-    
     try:
-        store = DocumentRepositoryStoreV1()
-        planner = PeriodPlannerV1(store)
-        
-        t1 = time.time()
-        # Obtener todos los documentos (usar la misma fuente que /docs)
-        all_docs = store.list_documents()
-        if not isinstance(all_docs, list):
-            all_docs = []
-        
-        t2 = time.time()
-        # SPRINT C2.9.24: Cachear tipos de documentos para evitar llamadas repetidas
-        types_cache = {}
-        all_types = store.list_types()
-        for doc_type in all_types:
-            types_cache[doc_type.type_id] = doc_type
-        
-        # Calcular estados usando la MISMA función que /docs
-        expired = []
-        expiring_soon = []
-        
-        # SPRINT C2.9.24: Optimización: usar computed_validity cuando esté disponible para evitar recálculo
-        today = date.today()
-        expiring_soon_threshold_days = months_ahead * 30
-        
-        for doc in all_docs:
-            # Intentar usar computed_validity si existe y es reciente
-            status = None
-            validity_end_date = None
-            days_until_expiry = None
-            
-            if doc.computed_validity and doc.computed_validity.valid_to:
-                # Usar computed_validity existente (ya calculado)
-                validity_end_date = doc.computed_validity.valid_to
-                days_until_expiry = (validity_end_date - today).days
-                
-                if days_until_expiry < 0:
-                    status = DocumentValidityStatus.EXPIRED
-                elif days_until_expiry <= expiring_soon_threshold_days:
-                    status = DocumentValidityStatus.EXPIRING_SOON
-                else:
-                    status = DocumentValidityStatus.VALID
-            else:
-                # Recalcular solo si no hay computed_validity
-                doc_type = types_cache.get(doc.type_id)
-                if not doc_type:
-                    doc_type = store.get_type(doc.type_id)
-                    if doc_type:
-                        types_cache[doc.type_id] = doc_type
-                
-                status, validity_end_date, days_until_expiry, base_date, base_reason = calculate_document_status(
-                    doc,
-                    doc_type=doc_type,
-                    expiring_soon_threshold_days=expiring_soon_threshold_days
-                )
-            
-            doc_dict = doc.model_dump() if hasattr(doc, 'model_dump') else doc.dict()
-            doc_dict['validity_status'] = status
-            doc_dict['validity_end_date'] = validity_end_date.isoformat() if validity_end_date else None
-            doc_dict['days_until_expiry'] = days_until_expiry
-            
-            # Clasificar usando el mismo enum
-            if status == DocumentValidityStatus.EXPIRED:
-                expired.append(doc_dict)
-            elif status == DocumentValidityStatus.EXPIRING_SOON:
-                expiring_soon.append(doc_dict)
-        
-        # Ordenar por fecha de caducidad
-        expired.sort(key=lambda d: d.get('validity_end_date') or '9999-12-31')
-        expiring_soon.sort(key=lambda d: d.get('validity_end_date') or '9999-12-31')
-        
-        t3 = time.time()
-        # Obtener tipos periódicos y generar períodos faltantes
-        types = store.list_types()
-        missing = []
-        
-        for doc_type in types:
-            period_kind = planner.get_period_kind_from_type(doc_type)
-            if period_kind.value == 'NONE':
-                continue  # Solo tipos periódicos
-            
-            # Obtener sujetos únicos de documentos existentes de este tipo
-            type_docs = [d for d in all_docs if d.type_id == doc_type.type_id]
-            subjects = set()
-            for doc in type_docs:
-                if doc.scope.value == 'worker' and doc.person_key:
-                    subjects.add(('worker', doc.company_key, doc.person_key))
-                elif doc.scope.value == 'company' and doc.company_key:
-                    subjects.add(('company', doc.company_key, None))
-            
-            # Para cada sujeto, verificar períodos faltantes
-            for scope, company_key, person_key in subjects:
-                periods = planner.generate_expected_periods(
-                    doc_type=doc_type,
-                    months_back=max_months_back,
-                    company_key=company_key,
-                    person_key=person_key
-                )
-                
-                for period in periods:
-                    if period.status.value == 'MISSING' or period.status.value == 'LATE':
-                        missing.append({
-                            'type_id': doc_type.type_id,
-                            'type_name': doc_type.name,
-                            'scope': scope,
-                            'company_key': company_key,
-                            'person_key': person_key,
-                            'period_key': period.period_key,
-                            'period_start': period.period_start.isoformat() if period.period_start else None,
-                            'period_end': period.period_end.isoformat() if period.period_end else None,
-                            'status': period.status.value,
-                            'days_late': period.days_late if hasattr(period, 'days_late') else None
-                        })
+        store = get_repository_store()
+        calendar = get_compliance_calendar(store)
+        buckets = (bucket,) if bucket else PENDING_BUCKETS
+        result = calendar.pending(
+            months_ahead=months_ahead,
+            max_months_back=max_months_back,
+            buckets=buckets,
+            **(filters or {}),
+        )
         
-        t4 = time.time()
-        ms_total = int((t4 - t0) * 1000)
-        ms_read = int((t2 - t1) * 1000)
-        ms_calc = int((t3 - t2) * 1000)
-        ms_missing = int((t4 - t3) * 1000)
+        if page is not None or page_size is not None:
+            page = max(1, page or 1)
+            page_size = max(1, min(page_size or 50, 500))
+            start = (page - 1) * page_size
+            totals = {name: len(items) for name, items in result.items()}
+            result = {name: items[start:start + page_size] for name, items in result.items()}
+            result.update({"totals": totals, "page": page, "page_size": page_size})
         
+        ms_total = int((time.time() - t0) * 1000)
+        stats = calendar.stats()
         # SPRINT C2.9.24: Log de timing (usar print para asegurar que se vea)
-        print(f"[PENDING] ms_total={ms_total}, ms_read={ms_read}, ms_calc={ms_calc}, ms_missing={ms_missing}, "
-              f"counts=docs={len(all_docs)}, expired={len(expired)}, expiring={len(expiring_soon)}, missing={len(missing)}")
+        print(f"[PENDING] ms_total={ms_total}, docs={stats['documents']}, cells={stats['cells']}, "
+              f"rebuilds={stats['full_rebuilds']}, counts=" +
+              ", ".join(f"{name}={len(result.get(name, []))}" for name in buckets))
         
-        return {
-            'expired': expired,
-            'expiring_soon': expiring_soon,
-            'missing': missing
-        }
+        return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error al obtener documentos pendientes: {str(e)}")
 
 
+@router.get("/blobs/{sha256}")
+async def get_blob_info(sha256: str) -> dict:
+    """
+    Consulta rápida de duplicados antes de subir: si el contenido ya está almacenado,
+    el cliente puede subir por referencia (content_sha256) sin reenviar el PDF.
+    """
+    if not is_sha256(sha256):
+        raise HTTPException(status_code=400, detail="sha256 must be 64 lowercase hex characters")
+    return await run_storage_io(_get_blob_info_sync, sha256)
+
+
+def _get_blob_info_sync(sha256: str) -> dict:
+    store = get_repository_store()
+    exists = store.blobs.has(sha256)
+    docs = store.find_documents_by_sha256(sha256)
+    return {
+        "sha256": sha256,
+        "exists": exists,
+        "size_bytes": store.blobs.path_for(sha256).stat().st_size if exists else None,
+        "refcount": len(docs),
+        "doc_ids": [d.doc_id for d in docs],
+    }
+
+
 @router.get("/docs/{doc_id}", response_model=DocumentInstanceV1)
 async def get_document(doc_id: str) -> DocumentInstanceV1:
     """Obtiene un documento por ID."""
-    store = DocumentRepositoryStoreV1()
-    doc = store.get_document(doc_id)
+    store = get_repository_store()
+    doc = await async_store(store).get_document(doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail=f"Document {doc_id} not found")
     return doc
@@ -777,7 +953,7 @@ async def get_document_pdf(doc_id: str):
     
     logger = logging.getLogger(__name__)
     
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     
     # Verificar que el documento existe
     doc = store.get_document(doc_id)
@@ -838,10 +1014,11 @@ async def replace_document_pdf(
     Reemplaza el PDF de un documento existente.
     Conserva todos los metadatos, solo actualiza el archivo PDF y su hash.
     """
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
+    io_store = async_store(store)
     
     # Verificar que el documento existe
-    doc = store.get_document(doc_id)
+    doc = await io_store.get_document(doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail=f"Document {doc_id} not found")
     
@@ -849,37 +1026,29 @@ async def replace_document_pdf(
     if not file.filename or not file.filename.lower().endswith(".pdf"):
         raise HTTPException(status_code=400, detail="File must be a PDF")
     
-    # Guardar archivo temporalmente
-    import tempfile
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-        shutil.copyfileobj(file.file, tmp_file)
-        tmp_path = Path(tmp_file.name)
-    
+    # Guardar contenido (hash en la misma pasada) y reemplazar la exportación docs/<doc_id>.pdf
+    # de forma atómica, fuera del event loop: el blob anterior queda intacto para otros
+    # documentos que lo compartan
+    blob = await io_store.ingest_pdf_stream(file.file)
     try:
-        # Calcular nuevo hash
-        new_sha256 = store.compute_file_hash(tmp_path)
-        
-        # Reemplazar PDF
-        store.store_pdf(tmp_path, doc_id)
-        
-        # Actualizar hash en el documento (campo real del modelo)
-        doc.sha256 = new_sha256
-        
-        # Actualizar nombre de archivo si es diferente
-        if file.filename and file.filename != doc.file_name_original:
-            doc.file_name_original = file.filename
+        await io_store.export_pdf(blob.sha256, doc_id)
+    except FileNotFoundError:
+        raise HTTPException(status_code=409, detail=f"Content {blob.sha256} no longer available, upload the file again")
+    
+    # Actualizar hash en el documento (campo real del modelo)
+    doc.sha256 = blob.sha256
+    
+    # Actualizar nombre de archivo si es diferente
+    if file.filename and file.filename != doc.file_name_original:
+        doc.file_name_original = file.filename
 
-        # Actualizar timestamp
-        doc.updated_at = datetime.utcnow()
-        
-        # Guardar documento actualizado
-        store.save_document(doc)
-        
-        return doc
+    # Actualizar timestamp
+    doc.updated_at = datetime.utcnow()
+    
+    # Guardar documento actualizado
+    await io_store.save_document(doc)
     
-    finally:
-        # Limpiar archivo temporal
-        tmp_path.unlink(missing_ok=True)
+    return doc
 
 
 class DocumentUpdateRequest(BaseModel):
@@ -933,7 +1102,7 @@ async def update_document(
     - person_key: Clave de persona
     - status: draft | reviewed | ready_to_submit | submitted
     """
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     
     # Obtener documento existente
     doc = store.get_document(doc_id)
@@ -1098,21 +1267,26 @@ async def get_expected_periods(
     
     Returns:
         Lista de períodos con estado (AVAILABLE, MISSING, LATE)
+    
+    Se sirve desde el calendario materializado (compliance_calendar_v1), sin listar documentos.
     """
-    store = DocumentRepositoryStoreV1()
+    return await run_storage_io(_get_expected_periods_sync, type_id, company_key, person_key, months)
+
+
+def _get_expected_periods_sync(
+    type_id: str,
+    company_key: Optional[str],
+    person_key: Optional[str],
+    months: int,
+) -> List[dict]:
+    store = get_repository_store()
     doc_type = store.get_type(type_id)
     if not doc_type:
         raise HTTPException(status_code=404, detail=f"Type {type_id} not found")
     
-    planner = PeriodPlannerV1(store)
-    periods = planner.generate_expected_periods(
-        doc_type=doc_type,
-        months_back=months,
-        company_key=company_key,
-        person_key=person_key,
-    )
-    
-    return [p.to_dict() for p in periods]
+    scope = getattr(doc_type.scope, "value", doc_type.scope)
+    calendar = get_compliance_calendar(store)
+    return calendar.expected_periods(type_id, (scope, company_key, person_key), months=months)
 
 
 @router.get("/subjects")
@@ -1134,7 +1308,7 @@ async def get_subjects() -> dict:
         }
     """
     try:
-        config_store = ConfigStoreV1()
+        config_store = get_config_store()
         org = config_store.load_org()
         people = config_store.load_people()
         
@@ -1197,7 +1371,7 @@ async def delete_document(doc_id: str) -> dict:
     - Si doc_id no existe → 404
     - Si status == "submitted" → 409 (no se puede borrar)
     """
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     
     try:
         store.delete_document(doc_id)
@@ -1285,7 +1459,7 @@ async def generate_cae_pack(request: CAEPackRequest) -> Response:
             detail="doc_ids no puede estar vacío"
         )
     
-    store = DocumentRepositoryStoreV1()
+    store = get_repository_store()
     
     # Crear ZIP en memoria
     zip_buffer = io.BytesIO()
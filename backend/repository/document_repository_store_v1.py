@@ -1,12 +1,23 @@
 from __future__ import annotations
 
 import json
-import hashlib
+import os
+import threading
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
 from uuid import uuid4
 
+from backend.repository.blob_store_v1 import (
+    BLOBS_DIRNAME,
+    DEFAULT_GC_GRACE_S,
+    BlobPutResultV1,
+    BlobStoreV1,
+    hash_file,
+    remove_file,
+)
 from backend.repository.data_bootstrap_v1 import ensure_data_layout
+from backend.repository.repository_backends_v1 import create_repository_backend
 from backend.repository.config_store_v1 import _atomic_write_json
 from backend.repository.settings_routes import load_settings
 from backend.shared.document_repository_v1 import (
@@ -18,27 +29,44 @@ from backend.shared.document_repository_v1 import (
 )
 
 
+# Backends ya inicializados (layout + seed) por (storage_backend, repo_dir): construir el
+# store en cada request solo cuesta load_settings() (cacheado) y una comprobación de existencia.
+_BACKENDS: Dict[Tuple[str, str], Any] = {}
+_BACKENDS_LOCK = threading.Lock()
+
+
+def _layout_marker(backend: Any) -> Path:
+    """Fichero cuya existencia indica que el layout/seed del backend sigue en disco."""
+    return Path(getattr(backend, "db_path", None) or backend.types_path)
+
+
 class DocumentRepositoryStoreV1:
     """
-    Store local (JSON) para el repositorio documental.
+    Store local para el repositorio documental.
     - types/types.json: tipos de documento
     - meta/<doc_id>.json: metadatos sidecar por documento
     - rules/submission_rules.json: reglas de envío (placeholder)
     - overrides/overrides.json: overrides de validez (placeholder)
+
+    Con storage_backend="sqlite" (settings) tipos y metadatos viven en repository.sqlite3
+    (ver repository_backends_v1); reglas y overrides siguen en JSON. Los PDFs siempre en docs/.
+
+    Los PDFs se guardan una vez por contenido en blobs/<aa>/<sha256> (ver blob_store_v1);
+    docs/<doc_id>.pdf es una exportación (hardlink/reflink/copia) del blob.
     """
 
     def __init__(self, *, base_dir: str | Path = "data"):
         # Cargar configuración de ruta del repositorio
+        storage_backend = "json"
         try:
             settings = load_settings()
             repository_root = Path(settings.repository_root_dir)
+            storage_backend = getattr(settings, "storage_backend", "json")
         except Exception:
             # Fallback a comportamiento anterior si hay error
             self.base_dir = ensure_data_layout(base_dir=base_dir)
             repository_root = (Path(self.base_dir) / "repository").resolve()
         
-        # Asegurar que el directorio raíz existe
-        repository_root.mkdir(parents=True, exist_ok=True)
         self.repo_dir = repository_root.resolve()
         
         # Mantener base_dir para compatibilidad (usar el mismo que configurado)
@@ -49,23 +77,37 @@ class DocumentRepositoryStoreV1:
         self.rules_dir = self.repo_dir / "rules"
         self.overrides_dir = self.repo_dir / "overrides"
         
+        self.types_path = self.types_dir / "types.json"
+        self.rules_path = self.rules_dir / "submission_rules.json"
+        self.overrides_path = self.overrides_dir / "overrides.json"
+        self.blobs = BlobStoreV1(self.repo_dir / BLOBS_DIRNAME)
+        
+        backend_key = ("sqlite" if storage_backend == "sqlite" else "json", str(self.repo_dir))
+        with _BACKENDS_LOCK:
+            backend = _BACKENDS.get(backend_key)
+        if backend is not None and _layout_marker(backend).exists():
+            self.backend = backend
+            return
+        
         # Asegurar estructura de directorios
+        self.repo_dir.mkdir(parents=True, exist_ok=True)
         self.types_dir.mkdir(parents=True, exist_ok=True)
         self.docs_dir.mkdir(parents=True, exist_ok=True)
         self.meta_dir.mkdir(parents=True, exist_ok=True)
         self.rules_dir.mkdir(parents=True, exist_ok=True)
         self.overrides_dir.mkdir(parents=True, exist_ok=True)
         
-        self.types_path = self.types_dir / "types.json"
-        self.rules_path = self.rules_dir / "submission_rules.json"
-        self.overrides_path = self.overrides_dir / "overrides.json"
+        # Backend de almacenamiento (json: sidecars + catálogo indexado; sqlite: fichero único)
+        self.backend = create_repository_backend(backend_key[0], self.repo_dir)
         
         # Seed inicial si no existe
         self._ensure_seed()
+        with _BACKENDS_LOCK:
+            _BACKENDS[backend_key] = self.backend
 
     def _ensure_seed(self) -> None:
         """Crea el seed inicial T104_AUTONOMOS_RECEIPT si no existe types.json."""
-        if not self.types_path.exists():
+        if not self.backend.has_types():
             from backend.shared.document_repository_v1 import (
                 ValidityPolicyV1,
                 MonthlyValidityConfigV1,
@@ -92,11 +134,7 @@ class DocumentRepositoryStoreV1:
             self._write_types([seed_type])
         
         # Seed placeholder para rules y overrides
-        if not self.rules_path.exists():
-            self._write_json(self.rules_path, {"schema_version": "v1", "rules": []})
-        
-        if not self.overrides_path.exists():
-            self._write_json(self.overrides_path, {"schema_version": "v1", "overrides": []})
+        self.backend.ensure_placeholders()
 
     def _read_json(self, path: Path) -> dict:
         """Lee JSON desde un path. Si el JSON es inválido, lanza excepción clara."""
@@ -117,11 +155,8 @@ class DocumentRepositoryStoreV1:
     # ========== TIPOS DE DOCUMENTO ==========
 
     def _read_types(self) -> Dict[str, DocumentTypeV1]:
-        """Lee todos los tipos desde types.json."""
-        raw = self._read_json(self.types_path)
-        types_list = raw.get("types", []) if isinstance(raw, dict) else []
-        if not isinstance(types_list, list):
-            types_list = []
+        """Lee todos los tipos desde el backend (types.json o tabla types)."""
+        types_list = self.backend.read_types_raw()
         
         result: Dict[str, DocumentTypeV1] = {}
         for item in types_list:
@@ -133,12 +168,8 @@ class DocumentRepositoryStoreV1:
         return result
 
     def _write_types(self, types: List[DocumentTypeV1]) -> None:
-        """Escribe tipos a types.json."""
-        payload = {
-            "schema_version": "v1",
-            "types": [t.model_dump(mode="json") for t in types]
-        }
-        self._write_json(self.types_path, payload)
+        """Escribe tipos al backend (types.json o tabla types)."""
+        self.backend.write_types(types)
 
     def list_types(self, include_inactive: bool = False) -> List[DocumentTypeV1]:
         """Lista todos los tipos (opcionalmente incluyendo inactivos)."""
@@ -148,6 +179,14 @@ class DocumentRepositoryStoreV1:
             result = [t for t in result if t.active]
         return sorted(result, key=lambda t: t.name)
 
+    def types_signature(self) -> tuple:
+        """Firma que cambia cuando se modifican los tipos (para cachés derivadas, ej. AliasIndexV1)."""
+        return (self.backend.name, str(self.repo_dir)) + tuple(self.backend.types_signature())
+
+    def documents_signature(self) -> tuple:
+        """Firma que cambia cuando se crean, modifican o borran documentos (ETags de /docs)."""
+        return (self.backend.name, str(self.repo_dir)) + tuple(self.backend.documents_signature())
+
     def get_type(self, type_id: str) -> Optional[DocumentTypeV1]:
         """Obtiene un tipo por ID."""
         types_dict = self._read_types()
@@ -290,11 +329,7 @@ class DocumentRepositoryStoreV1:
 
     def get_document(self, doc_id: str) -> Optional[DocumentInstanceV1]:
         """Obtiene un documento por ID."""
-        meta_path = self._get_doc_meta_path(doc_id)
-        if not meta_path.exists():
-            return None
-        raw = self._read_json(meta_path)
-        return DocumentInstanceV1.model_validate(raw)
+        return self.backend.get_document(doc_id)
 
     def list_documents(
         self,
@@ -305,61 +340,91 @@ class DocumentRepositoryStoreV1:
         person_key: Optional[str] = None,
         period_key: Optional[str] = None,
     ) -> List[DocumentInstanceV1]:
-        """Lista todos los documentos (con filtros opcionales)."""
-        result: List[DocumentInstanceV1] = []
-        for meta_path in self.meta_dir.glob("*.json"):
+        """
+        Lista todos los documentos (con filtros opcionales).
+
+        Backend json: catálogo indexado en memoria (ver document_catalog_v1), no relee
+        meta/*.json salvo que el directorio haya cambiado en disco.
+        Backend sqlite: consulta sobre columnas indexadas.
+        """
+        if scope:
+            # Convertir string a enum para comparación correcta
             try:
-                raw = self._read_json(meta_path)
-                doc = DocumentInstanceV1.model_validate(raw)
-                
-                if type_id and doc.type_id != type_id:
-                    continue
-                if scope:
-                    # Convertir string a enum para comparación correcta
-                    try:
-                        scope_enum = DocumentScopeV1(scope)
-                        if doc.scope != scope_enum:
-                            continue
-                    except (ValueError, TypeError):
-                        # Si scope no es un valor válido del enum, no filtrar por scope
-                        pass
-                if status and doc.status != status:
-                    continue
-                if company_key and doc.company_key != company_key:
-                    continue
-                if person_key and doc.person_key != person_key:
-                    continue
-                if period_key and doc.period_key != period_key:
-                    continue
-                
-                result.append(doc)
-            except Exception:
-                continue
-        
-        return sorted(result, key=lambda d: d.created_at, reverse=True)
+                scope = DocumentScopeV1(scope).value
+            except (ValueError, TypeError):
+                # Si scope no es un valor válido del enum, no filtrar por scope
+                scope = None
+        return self.backend.query_documents(
+            type_id=type_id or None,
+            scope=scope or None,
+            status=status or None,
+            company_key=company_key or None,
+            person_key=person_key or None,
+            period_key=period_key or None,
+        )
 
     def save_document(self, doc: DocumentInstanceV1) -> DocumentInstanceV1:
-        """Guarda un documento (crea o actualiza el sidecar JSON)."""
-        meta_path = self._get_doc_meta_path(doc.doc_id)
-        payload = doc.model_dump(mode="json")
-        self._write_json(meta_path, payload)
+        """Guarda un documento (crea o actualiza sus metadatos en el backend)."""
+        from backend.repository.compliance_calendar_v1 import notify_document_saved
+
+        self.backend.save_document(doc)
+        notify_document_saved(self, doc)
         return doc
 
     def compute_file_hash(self, file_path: Path) -> str:
         """Calcula SHA256 de un archivo."""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-
-    def store_pdf(self, source_path: Path, doc_id: str) -> Path:
-        """Copia un PDF al repositorio con nombre <doc_id>.pdf."""
+        return hash_file(file_path)
+
+    def store_pdf(self, source_path: Path, doc_id: str, sha256: Optional[str] = None) -> Path:
+        """Guarda un PDF en el almacén de blobs y lo exporta como <doc_id>.pdf."""
+        blob = self.blobs.put_file(source_path, sha256=sha256)
+        return self.export_pdf(blob.sha256, doc_id)
+
+    def ingest_pdf_stream(self, src: BinaryIO) -> BlobPutResultV1:
+        """Guarda el contenido de un upload (hash y escritura en una pasada; deduplicado por sha256)."""
+        return self.blobs.put_stream(src)
+
+    def export_pdf(self, sha256: str, doc_id: str) -> Path:
+        """Materializa un blob existente como docs/<doc_id>.pdf (sustitución atómica)."""
         target_path = self._get_doc_pdf_path(doc_id)
-        import shutil
-        shutil.copy2(source_path, target_path)
+        self.blobs.export(sha256, target_path)
         return target_path
 
+    def find_documents_by_sha256(self, sha256: str) -> List[DocumentInstanceV1]:
+        """Documentos que referencian un contenido (índice sha256 del backend)."""
+        return self.backend.query_documents(sha256=sha256)
+
+    def blob_refcounts(self) -> Counter:
+        """Referencias por blob: nº de documentos con ese sha256."""
+        return Counter(doc.sha256 for doc in self.list_documents() if doc.sha256)
+
+    def adopt_legacy_pdfs(self) -> Dict[str, int]:
+        """
+        Pasa al almacén de blobs los PDFs de docs/ que aún son copias independientes
+        (subidas anteriores al almacén direccionado por contenido).
+        """
+        stats = {"adopted": 0, "deduplicated": 0, "skipped": 0}
+        for doc in self.list_documents():
+            pdf_path = self._get_doc_pdf_path(doc.doc_id)
+            if not pdf_path.is_file():
+                stats["skipped"] += 1
+                continue
+            if doc.sha256 and self.blobs.has(doc.sha256) and os.path.samefile(pdf_path, self.blobs.path_for(doc.sha256)):
+                continue
+            blob = self.blobs.put_file(pdf_path)
+            self.blobs.export(blob.sha256, pdf_path)
+            stats["adopted"] += 1
+            if not blob.created:
+                stats["deduplicated"] += 1
+            if blob.sha256 != doc.sha256:
+                doc.sha256 = blob.sha256
+                self.save_document(doc)
+        return stats
+
+    def gc_blobs(self, grace_s: float = DEFAULT_GC_GRACE_S, dry_run: bool = False) -> Dict[str, int]:
+        """Elimina los blobs que ningún documento referencia (con margen para uploads en curso)."""
+        return self.blobs.gc(set(self.blob_refcounts()), grace_s=grace_s, dry_run=dry_run)
+
     def delete_document(self, doc_id: str) -> None:
         """
         Elimina un documento (PDF + sidecar JSON).
@@ -376,25 +441,25 @@ class DocumentRepositoryStoreV1:
         
         # Eliminar archivos (operación atómica: ambos o ninguno)
         pdf_path = self._get_doc_pdf_path(doc_id)
-        meta_path = self._get_doc_meta_path(doc_id)
         
         try:
-            # Eliminar PDF primero
-            if pdf_path.exists():
-                pdf_path.unlink()
-            # Luego eliminar JSON
-            if meta_path.exists():
-                meta_path.unlink()
+            # Eliminar PDF primero (hardlink del blob: puede ser de solo lectura)
+            remove_file(pdf_path)
+            # Luego eliminar metadatos
+            self.backend.delete_document(doc_id)
         except Exception as e:
             # Si falla, intentar restaurar (best-effort)
             raise RuntimeError(f"Failed to delete document {doc_id}: {e}") from e
 
+        from backend.repository.compliance_calendar_v1 import notify_document_deleted
+
+        notify_document_deleted(self, doc_id)
+
     # ========== REGLAS Y OVERRIDES (PLACEHOLDER) ==========
 
     def list_submission_rules(self) -> List[SubmissionRuleV1]:
         """Lista reglas de envío (placeholder)."""
-        raw = self._read_json(self.rules_path)
-        rules_list = raw.get("rules", []) if isinstance(raw, dict) else []
+        rules_list = self.backend.read_rules_raw()
         result: List[SubmissionRuleV1] = []
         for item in rules_list:
             try:
@@ -406,8 +471,7 @@ class DocumentRepositoryStoreV1:
 
     def list_validity_overrides(self) -> List[ValidityOverrideV1]:
         """Lista overrides de validez (placeholder)."""
-        raw = self._read_json(self.overrides_path)
-        overrides_list = raw.get("overrides", []) if isinstance(raw, dict) else []
+        overrides_list = self.backend.read_overrides_raw()
         result: List[ValidityOverrideV1] = []
         for item in overrides_list:
             try:
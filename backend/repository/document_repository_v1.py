@@ -24,7 +24,7 @@ from typing import Any, Dict, List, Optional
 
 from pydantic import BaseModel, Field, field_validator
 
-from backend.shared.executor_contracts_v1 import _sha256_bytes
+from backend.repository.blob_store_v1 import copy_with_hash, hash_file
 from backend.shared.file_ref_v1 import FileRefV1, parse, validate_syntax
 
 
@@ -123,11 +123,7 @@ class DocumentRepositoryV1:
         tmp.replace(self.cfg.index_path)
 
     def _hash_file(self, path: Path) -> str:
-        h = None
-        with open(path, "rb") as f:
-            data = f.read()
-            h = _sha256_bytes(data)
-        return h
+        return hash_file(path)
 
     def _safe_resolve_repo_path(self, rel_path: str) -> Path:
         p = Path(rel_path)
@@ -239,10 +235,10 @@ class DocumentRepositoryV1:
         if dest.exists():
             raise ValueError(f"Destination exists (no overwrite): {dest}")
 
-        shutil.copy2(src, dest)
-
-        sha = self._hash_file(dest)
-        size = dest.stat().st_size
+        # Copia y hash en una sola pasada (sin releer el destino)
+        with open(src, "rb") as fsrc, open(dest, "wb") as fdst:
+            sha, size = copy_with_hash(fsrc, fdst)
+        shutil.copystat(src, dest)
         mime = mimetypes.guess_type(dest.name)[0] or "application/octet-stream"
         rel_to_project = str(dest.relative_to(self.cfg.project_root)).replace("\\", "/")
 
@@ -92,8 +92,8 @@ def calculate_document_status(
     # Cargar tipo de documento si no se proporciona
     if doc_type is None:
         try:
-            from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
-            store = DocumentRepositoryStoreV1()
+            from backend.repository.repository_service_v1 import get_repository_store
+            store = get_repository_store()
             doc_type = store.get_type(doc.type_id)
         except Exception:
             doc_type = None
@@ -10,10 +10,9 @@ from __future__ import annotations
 from typing import Dict, List, Optional, Any
 from datetime import date
 
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_service_v1 import get_config_store, get_repository_store
 from backend.repository.document_matcher_v1 import DocumentMatcherV1, PendingItemV1, normalize_text
 from backend.shared.document_repository_v1 import DocumentTypeV1, DocumentInstanceV1
-from backend.repository.config_store_v1 import ConfigStoreV1
 from backend.config import DATA_DIR
 
 
@@ -66,9 +65,9 @@ def preview_assign_alias(
     if base_dir is None:
         base_dir = DATA_DIR
     
-    store = DocumentRepositoryStoreV1(base_dir=base_dir)
+    store = get_repository_store(base_dir)
     matcher = DocumentMatcherV1(store, base_dir=base_dir)
-    config_store = ConfigStoreV1(base_dir=base_dir)
+    config_store = get_config_store(base_dir)
     
     # Obtener tipo existente
     doc_type = store.get_type(type_id)
@@ -210,7 +209,7 @@ def preview_create_type(
     if base_dir is None:
         base_dir = DATA_DIR
     
-    store = DocumentRepositoryStoreV1(base_dir=base_dir)
+    store = get_repository_store(base_dir)
     matcher = DocumentMatcherV1(store, base_dir=base_dir)
     
     # Verificar si el tipo_id ya existe
@@ -18,6 +18,7 @@ from backend.shared.document_repository_v1 import (
     MonthlyValidityConfigV1,
 )
 from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.document_status_calculator_v1 import add_months
 
 
 class PeriodStatusV1(str, Enum):
@@ -171,16 +172,13 @@ class PeriodPlannerV1:
         periods: List[PeriodInfoV1] = []
         
         if period_kind == PeriodKindV1.MONTH:
-            # Generar meses hacia atrás
+            # Generar meses hacia atrás (por meses de calendario: restar 30 días saltaba o repetía meses)
+            first_of_month = today.replace(day=1)
             for i in range(months_back):
-                target_date = today - timedelta(days=30 * i)
-                period_key = f"{target_date.year}-{target_date.month:02d}"
-                period_start = date(target_date.year, target_date.month, 1)
+                period_start = add_months(first_of_month, -i)
+                period_key = f"{period_start.year}-{period_start.month:02d}"
                 # Último día del mes
-                if target_date.month == 12:
-                    period_end = date(target_date.year, 12, 31)
-                else:
-                    period_end = date(target_date.year, target_date.month + 1, 1) - timedelta(days=1)
+                period_end = add_months(period_start, 1) - timedelta(days=1)
                 
                 # Determinar estado
                 status = PeriodStatusV1.MISSING
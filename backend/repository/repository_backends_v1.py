@@ -0,0 +1,534 @@
+"""
+Backends de almacenamiento para DocumentRepositoryStoreV1.
+
+- json (por defecto): layout histórico de data/repository
+    types/types.json, meta/<doc_id>.json, rules/submission_rules.json, overrides/overrides.json
+- sqlite: un único fichero repository.sqlite3 (modo WAL, columnas indexadas)
+    con tablas types y documents.
+
+Reglas y overrides siguen en rules/submission_rules.json y overrides/overrides.json con
+ambos backends: SubmissionRulesStoreV1 escribe las reglas ahí, y una copia en SQLite
+quedaría obsoleta tras la primera edición.
+
+Los PDFs siguen viviendo en docs/<doc_id>.pdf en ambos backends.
+El backend se elige con RepositorySettingsV1.storage_backend (settings_routes).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from backend.repository.config_store_v1 import _atomic_write_json
+from backend.repository.document_catalog_v1 import INDEXED_FIELDS, get_document_catalog
+from backend.shared.document_repository_v1 import DocumentInstanceV1, DocumentTypeV1
+
+
+STORAGE_BACKENDS = ("json", "sqlite")
+SQLITE_DB_NAME = "repository.sqlite3"
+
+# Campos indexados sin columna propia: índice de expresión sobre el payload
+_SQLITE_EXPRESSION_COLUMNS = {"sha256": "json_extract(payload, '$.sha256')"}
+
+
+def _read_json_file(path: Path) -> dict:
+    """Lee JSON desde un path. Si el JSON es inválido, lanza excepción clara."""
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"JSON inválido en {path}: {str(e)}")
+    except Exception as e:
+        raise ValueError(f"Error al leer {path}: {str(e)}")
+
+
+def _list_from(raw: dict, key: str) -> List[dict]:
+    items = raw.get(key, []) if isinstance(raw, dict) else []
+    return items if isinstance(items, list) else []
+
+
+class _JsonRulesAndOverridesV1:
+    """Reglas y overrides en JSON (compartido por ambos backends)."""
+
+    rules_path: Path
+    overrides_path: Path
+
+    def _init_rules_paths(self, repo_dir: Path) -> None:
+        self.rules_path = repo_dir / "rules" / "submission_rules.json"
+        self.overrides_path = repo_dir / "overrides" / "overrides.json"
+        for d in (self.rules_path.parent, self.overrides_path.parent):
+            d.mkdir(parents=True, exist_ok=True)
+
+    def ensure_placeholders(self) -> None:
+        if not self.rules_path.exists():
+            _atomic_write_json(self.rules_path, {"schema_version": "v1", "rules": []})
+        if not self.overrides_path.exists():
+            _atomic_write_json(self.overrides_path, {"schema_version": "v1", "overrides": []})
+
+    def read_rules_raw(self) -> List[dict]:
+        return _list_from(_read_json_file(self.rules_path), "rules")
+
+    def read_overrides_raw(self) -> List[dict]:
+        return _list_from(_read_json_file(self.overrides_path), "overrides")
+
+
+class JsonRepositoryBackendV1(_JsonRulesAndOverridesV1):
+    """Backend JSON (sidecars por documento + catálogo indexado en memoria)."""
+
+    name = "json"
+
+    def __init__(self, repo_dir: Path):
+        self.repo_dir = Path(repo_dir)
+        self.types_path = self.repo_dir / "types" / "types.json"
+        self.meta_dir = self.repo_dir / "meta"
+        for d in (self.types_path.parent, self.meta_dir):
+            d.mkdir(parents=True, exist_ok=True)
+        self._init_rules_paths(self.repo_dir)
+        self.catalog = get_document_catalog(self.meta_dir)
+
+    # ========== TIPOS ==========
+
+    def has_types(self) -> bool:
+        return self.types_path.exists()
+
+    def types_signature(self) -> tuple:
+        """Firma barata que cambia cuando cambian los tipos (mtime/tamaño de types.json)."""
+        try:
+            st = self.types_path.stat()
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return (None, None)
+
+    def read_types_raw(self) -> List[dict]:
+        return _list_from(_read_json_file(self.types_path), "types")
+
+    def write_types(self, types: List[DocumentTypeV1]) -> None:
+        payload = {
+            "schema_version": "v1",
+            "types": [t.model_dump(mode="json") for t in types]
+        }
+        _atomic_write_json(self.types_path, payload)
+
+    # ========== DOCUMENTOS ==========
+
+    def _meta_path(self, doc_id: str) -> Path:
+        return self.meta_dir / f"{doc_id}.json"
+
+    def get_document(self, doc_id: str) -> Optional[DocumentInstanceV1]:
+        meta_path = self._meta_path(doc_id)
+        if not meta_path.exists():
+            return None
+        return DocumentInstanceV1.model_validate(_read_json_file(meta_path))
+
+    def query_documents(self, **filters: Optional[str]) -> List[DocumentInstanceV1]:
+        return self.catalog.query(**filters)
+
+    def documents_signature(self) -> tuple:
+        """Firma barata que cambia cuando cambian los documentos (generación del catálogo)."""
+        return self.catalog.generation()
+
+    def save_document(self, doc: DocumentInstanceV1) -> None:
+        _atomic_write_json(self._meta_path(doc.doc_id), doc.model_dump(mode="json"))
+        self.catalog.upsert(doc)
+
+    def delete_document(self, doc_id: str) -> None:
+        meta_path = self._meta_path(doc_id)
+        if meta_path.exists():
+            meta_path.unlink()
+        self.catalog.discard(doc_id)
+
+
+_SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS types (
+    type_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS documents (
+    doc_id TEXT PRIMARY KEY,
+    type_id TEXT,
+    scope TEXT,
+    company_key TEXT,
+    person_key TEXT,
+    period_key TEXT,
+    status TEXT,
+    created_at TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_documents_type_id ON documents(type_id);
+CREATE INDEX IF NOT EXISTS idx_documents_scope ON documents(scope);
+CREATE INDEX IF NOT EXISTS idx_documents_company_key ON documents(company_key);
+CREATE INDEX IF NOT EXISTS idx_documents_person_key ON documents(person_key);
+CREATE INDEX IF NOT EXISTS idx_documents_period_key ON documents(period_key);
+CREATE INDEX IF NOT EXISTS idx_documents_status ON documents(status);
+CREATE INDEX IF NOT EXISTS idx_documents_created_at ON documents(created_at);
+CREATE INDEX IF NOT EXISTS idx_documents_sha256 ON documents(json_extract(payload, '$.sha256'));
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+_CONNECTIONS: Dict[str, sqlite3.Connection] = {}
+_CONNECTION_LOCKS: Dict[str, threading.RLock] = {}
+_CONNECTIONS_LOCK = threading.Lock()
+
+
+def _get_connection(db_path: Path) -> tuple[sqlite3.Connection, threading.RLock]:
+    """Conexión compartida por proceso (una por fichero), serializada con un lock."""
+    key = str(Path(db_path).resolve())
+    with _CONNECTIONS_LOCK:
+        conn = _CONNECTIONS.get(key)
+        if conn is None:
+            Path(key).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(key, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SQLITE_SCHEMA)
+            _CONNECTIONS[key] = conn
+            _CONNECTION_LOCKS[key] = threading.RLock()
+        return conn, _CONNECTION_LOCKS[key]
+
+
+def close_sqlite_connections() -> None:
+    """Cierra todas las conexiones compartidas (tests / apagado)."""
+    with _CONNECTIONS_LOCK:
+        for conn in _CONNECTIONS.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _CONNECTIONS.clear()
+        _CONNECTION_LOCKS.clear()
+
+
+class SqliteRepositoryBackendV1(_JsonRulesAndOverridesV1):
+    """Backend SQLite: tipos e instancias en un único fichero (reglas y overrides en JSON)."""
+
+    name = "sqlite"
+
+    def __init__(self, repo_dir: Path, db_path: Optional[Path] = None):
+        self.repo_dir = Path(repo_dir)
+        self.db_path = Path(db_path) if db_path else self.repo_dir / SQLITE_DB_NAME
+        self._conn, self._lock = _get_connection(self.db_path)
+        self._init_rules_paths(self.repo_dir)
+
+    def _fetchall(self, sql: str, params: tuple = ()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _replace_all(self, table: str, rows: List[tuple], columns: str) -> None:
+        placeholders = ", ".join("?" for _ in columns.split(","))
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(f"DELETE FROM {table}")
+                self._conn.executemany(
+                    f"INSERT INTO {table} ({columns}) VALUES ({placeholders})", rows
+                )
+                self._bump_version(table)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _bump_version(self, table: str) -> None:
+        """
+        Contador de versión por tabla (invalidación de cachés derivadas y ETags) e instante
+        de la última escritura (para detectar cambios posteriores en el layout JSON).
+        """
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, 1) "
+            "ON CONFLICT(key) DO UPDATE SET value = value + 1",
+            (f"{table}_version",),
+        )
+        self._conn.execute(
+            "INSERT INTO meta (key, value) VALUES ('last_write_ns', ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (time.time_ns(),),
+        )
+
+    def _read_version(self, table: str) -> int:
+        rows = self._fetchall("SELECT value FROM meta WHERE key = ?", (f"{table}_version",))
+        return rows[0][0] if rows else 0
+
+    def last_write_ns(self) -> int:
+        """Instante (ns) de la última escritura; mtime del fichero en bases anteriores al registro."""
+        rows = self._fetchall("SELECT value FROM meta WHERE key = 'last_write_ns'")
+        if rows:
+            return rows[0][0]
+        try:
+            return self.db_path.stat().st_mtime_ns
+        except OSError:
+            return 0
+
+    def json_sidecars_digest(self) -> Optional[int]:
+        """Digest de los meta/*.json presentes en la última migración (None si no consta)."""
+        rows = self._fetchall("SELECT value FROM meta WHERE key = 'json_sidecars_digest'")
+        return rows[0][0] if rows else None
+
+    def record_json_sync(self, digest: int) -> None:
+        """Marca SQLite y el layout JSON como sincronizados (tras migrar o exportar)."""
+        with self._lock:
+            for key, value in (("json_sidecars_digest", digest), ("last_write_ns", time.time_ns())):
+                self._conn.execute(
+                    "INSERT INTO meta (key, value) VALUES (?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                    (key, value),
+                )
+
+    # ========== TIPOS ==========
+
+    def has_types(self) -> bool:
+        return bool(self._fetchall("SELECT 1 FROM types LIMIT 1"))
+
+    def types_signature(self) -> tuple:
+        """Firma barata que cambia cuando cambian los tipos (contador types_version)."""
+        return (str(self.db_path), self._read_version("types"))
+
+    def read_types_raw(self) -> List[dict]:
+        rows = self._fetchall("SELECT payload FROM types ORDER BY position")
+        return [json.loads(r[0]) for r in rows]
+
+    def write_types(self, types: List[DocumentTypeV1]) -> None:
+        rows = [
+            (t.type_id, i, json.dumps(t.model_dump(mode="json"), ensure_ascii=False))
+            for i, t in enumerate(types)
+        ]
+        self._replace_all("types", rows, "type_id, position, payload")
+
+    # ========== DOCUMENTOS ==========
+
+    @staticmethod
+    def _document_row(doc: DocumentInstanceV1) -> tuple:
+        payload = doc.model_dump(mode="json")
+        return (
+            doc.doc_id,
+            payload.get("type_id"),
+            payload.get("scope"),
+            payload.get("company_key"),
+            payload.get("person_key"),
+            payload.get("period_key"),
+            payload.get("status"),
+            payload.get("created_at"),
+            json.dumps(payload, ensure_ascii=False),
+        )
+
+    def get_document(self, doc_id: str) -> Optional[DocumentInstanceV1]:
+        rows = self._fetchall("SELECT payload FROM documents WHERE doc_id = ?", (doc_id,))
+        if not rows:
+            return None
+        return DocumentInstanceV1.model_validate(json.loads(rows[0][0]))
+
+    def query_documents(self, **filters: Optional[str]) -> List[DocumentInstanceV1]:
+        unknown = set(filters) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Unsupported document filters: {sorted(unknown)}")
+        clauses = []
+        params = []
+        for field, value in filters.items():
+            if value is None:
+                continue
+            clauses.append(f"{_SQLITE_EXPRESSION_COLUMNS.get(field, field)} = ?")
+            params.append(getattr(value, "value", value))
+        sql = "SELECT payload FROM documents"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY created_at DESC"
+
+        result: List[DocumentInstanceV1] = []
+        for (payload,) in self._fetchall(sql, tuple(params)):
+            try:
+                result.append(DocumentInstanceV1.model_validate(json.loads(payload)))
+            except Exception:
+                continue
+        return result
+
+    def documents_signature(self) -> tuple:
+        """Firma barata que cambia cuando cambian los documentos (contador documents_version)."""
+        return (str(self.db_path), self._read_version("documents"))
+
+    def save_document(self, doc: DocumentInstanceV1) -> None:
+        self.save_documents([doc])
+
+    def save_documents(self, docs: List[DocumentInstanceV1]) -> None:
+        """Inserción (masiva en la migración) en una sola transacción."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO documents "
+                    "(doc_id, type_id, scope, company_key, person_key, period_key, status, created_at, payload) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [self._document_row(d) for d in docs],
+                )
+                self._bump_version("documents")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def replace_documents(self, docs: List[DocumentInstanceV1]) -> None:
+        """Sustituye todos los documentos (re-migración con el layout JSON como fuente)."""
+        self._replace_all(
+            "documents",
+            [self._document_row(d) for d in docs],
+            "doc_id, type_id, scope, company_key, person_key, period_key, status, created_at, payload",
+        )
+
+    def delete_document(self, doc_id: str) -> None:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM documents WHERE doc_id = ?", (doc_id,))
+                self._bump_version("documents")
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+def create_repository_backend(name: Optional[str], repo_dir: Path):
+    """Instancia el backend configurado (json si no se reconoce)."""
+    if name == "sqlite":
+        return SqliteRepositoryBackendV1(repo_dir)
+    return JsonRepositoryBackendV1(repo_dir)
+
+
+def _json_sidecars_digest(sidecars: List[Path]) -> int:
+    """Digest (entero de 63 bits, cabe en meta.value) del conjunto de doc_ids con sidecar."""
+    names = "\n".join(sorted(p.name for p in sidecars))
+    return int.from_bytes(hashlib.sha256(names.encode("utf-8")).digest()[:8], "big") >> 1
+
+
+def json_changed_since_sqlite(repo_dir: Path, db_path: Optional[Path] = None) -> bool:
+    """
+    True si el layout JSON cambió desde la última escritura en SQLite (p.ej. se volvió a
+    storage_backend=json y se editó el repositorio): activar sqlite sin re-migrar serviría
+    datos obsoletos.
+
+    - Altas y ediciones: types.json o algún meta/*.json posterior a la última escritura.
+    - Bajas (delete_document solo borra el sidecar): el conjunto de meta/*.json difiere del
+      registrado en la migración; en bases sin registro, se mira el mtime de meta/.
+    """
+    repo_dir = Path(repo_dir)
+    target = SqliteRepositoryBackendV1(repo_dir, db_path=db_path)
+    sources = [repo_dir / "types" / "types.json"]
+    meta_dir = repo_dir / "meta"
+    sidecars = list(meta_dir.glob("*.json")) if meta_dir.is_dir() else []
+    sources.extend(sidecars)
+
+    recorded = target.json_sidecars_digest()
+    if recorded is None:
+        sources.append(meta_dir)
+    elif recorded != _json_sidecars_digest(sidecars):
+        return True
+
+    newest = 0
+    for path in sources:
+        try:
+            newest = max(newest, path.stat().st_mtime_ns)
+        except OSError:
+            continue
+    if not newest:
+        return False
+    return newest > target.last_write_ns()
+
+
+def migrate_json_to_sqlite(
+    repo_dir: Path,
+    db_path: Optional[Path] = None,
+    *,
+    replace_documents: bool = False,
+) -> Dict[str, int]:
+    """
+    Migración del layout JSON (data/repository) a SQLite.
+
+    Idempotente: reemplaza tipos y hace upsert de documentos (reglas y overrides siguen
+    en JSON con ambos backends). Con replace_documents=True el layout JSON es la fuente
+    de verdad y se eliminan de SQLite los documentos que ya no tienen sidecar.
+    Los sidecars JSON no se borran (rollback = volver a storage_backend=json).
+    """
+    source = JsonRepositoryBackendV1(repo_dir)
+    target = SqliteRepositoryBackendV1(repo_dir, db_path=db_path)
+
+    types: List[DocumentTypeV1] = []
+    for item in source.read_types_raw():
+        try:
+            types.append(DocumentTypeV1.model_validate(item))
+        except Exception:
+            continue
+    target.write_types(types)
+
+    docs: List[DocumentInstanceV1] = []
+    skipped = 0
+    sidecars = list(source.meta_dir.glob("*.json"))
+    for meta_path in sidecars:
+        try:
+            docs.append(DocumentInstanceV1.model_validate(_read_json_file(meta_path)))
+        except Exception:
+            skipped += 1
+    if replace_documents:
+        target.replace_documents(docs)
+    else:
+        target.save_documents(docs)
+    # Sidecars migrados: un borrado posterior en modo json no cambia ningún mtime de fichero
+    target.record_json_sync(_json_sidecars_digest(sidecars))
+
+    return {
+        "types": len(types),
+        "documents": len(docs),
+        "documents_skipped": skipped,
+    }
+
+
+def export_sqlite_to_json(repo_dir: Path, db_path: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Vuelca SQLite al layout JSON (al volver de storage_backend=sqlite a json).
+
+    SQLite es la fuente de verdad: se reescriben types.json y los sidecars que difieren, y se
+    borran los sidecars de documentos eliminados mientras sqlite estaba activo (si no, el
+    layout JSON los resucitaría). Los sidecars sin cambios no se tocan.
+    """
+    source = SqliteRepositoryBackendV1(repo_dir, db_path=db_path)
+    target = JsonRepositoryBackendV1(repo_dir)
+
+    types: List[DocumentTypeV1] = []
+    for item in source.read_types_raw():
+        try:
+            types.append(DocumentTypeV1.model_validate(item))
+        except Exception:
+            continue
+    target.write_types(types)
+
+    docs = source.query_documents()
+    written = 0
+    for doc in docs:
+        try:
+            if _read_json_file(target._meta_path(doc.doc_id)) == doc.model_dump(mode="json"):
+                continue
+        except ValueError:
+            pass
+        target.save_document(doc)
+        written += 1
+
+    keep = {f"{d.doc_id}.json" for d in docs}
+    deleted = 0
+    for meta_path in list(target.meta_dir.glob("*.json")):
+        if meta_path.name not in keep:
+            target.delete_document(meta_path.stem)
+            deleted += 1
+
+    source.record_json_sync(_json_sidecars_digest(list(target.meta_dir.glob("*.json"))))
+    return {
+        "types": len(types),
+        "documents": len(docs),
+        "documents_written": written,
+        "documents_deleted": deleted,
+    }
@@ -0,0 +1,105 @@
+"""
+Servicio process-wide de configuración y repositorio documental.
+
+Los handlers HTTP y los runs headful construían ConfigStoreV1 / DocumentRepositoryStoreV1
+en cada llamada (load_settings + mkdirs + comprobaciones de seed). El servicio mantiene
+una instancia por base_dir, creada en el startup de la app (warm_up), y la revalida de
+forma barata:
+
+- settings.json / refs/*.json: cacheados por (mtime_ns, size) e invalidados al escribir
+  (ver settings_routes.load_settings y ConfigStoreV1).
+- DocumentRepositoryStoreV1: se reconstruye solo si cambia repository_root_dir o
+  storage_backend en settings.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from backend.repository import document_repository_store_v1 as _store_module
+from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.data_bootstrap_v1 import ensure_data_layout
+from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.settings_routes import RepositorySettingsV1
+from backend.shared.org_v1 import OrgV1
+from backend.shared.people_v1 import PeopleV1
+from backend.shared.platforms_v1 import PlatformsV1
+
+
+class RepositoryServiceV1:
+    """Stores compartidos para un base_dir (config de refs + repositorio documental)."""
+
+    def __init__(self, base_dir: str | Path = "data"):
+        self.base_dir = ensure_data_layout(base_dir=base_dir)
+        self._lock = threading.Lock()
+        self._config_store: Optional[ConfigStoreV1] = None
+        self._repository_store: Optional[Tuple[tuple, DocumentRepositoryStoreV1]] = None
+
+    def settings(self) -> RepositorySettingsV1:
+        return _store_module.load_settings()
+
+    def config_store(self) -> ConfigStoreV1:
+        with self._lock:
+            if self._config_store is None:
+                self._config_store = ConfigStoreV1(base_dir=self.base_dir)
+            return self._config_store
+
+    def _repository_key(self) -> tuple:
+        try:
+            settings = self.settings()
+            return (getattr(settings, "storage_backend", "json"), str(Path(settings.repository_root_dir).resolve()))
+        except Exception:
+            return ("json", str((self.base_dir / "repository").resolve()))
+
+    def repository_store(self) -> DocumentRepositoryStoreV1:
+        """Store del repositorio; se recrea si los settings apuntan a otra raíz/backend."""
+        key = self._repository_key()
+        with self._lock:
+            cached = self._repository_store
+            if cached is not None and cached[0] == key and cached[1].types_dir.is_dir():
+                return cached[1]
+        store = DocumentRepositoryStoreV1(base_dir=self.base_dir)
+        with self._lock:
+            self._repository_store = (key, store)
+        return store
+
+    def load_org(self) -> OrgV1:
+        return self.config_store().load_org()
+
+    def load_people(self) -> PeopleV1:
+        return self.config_store().load_people()
+
+    def load_platforms(self) -> PlatformsV1:
+        return self.config_store().load_platforms()
+
+    def warm_up(self) -> None:
+        """Inicializa stores y llena las cachés (startup de la app)."""
+        self.load_org()
+        self.load_people()
+        self.load_platforms()
+        self.repository_store().list_types(include_inactive=True)
+
+
+_SERVICES: Dict[str, RepositoryServiceV1] = {}
+_SERVICES_LOCK = threading.Lock()
+
+
+def get_repository_service(base_dir: str | Path = "data") -> RepositoryServiceV1:
+    """Servicio compartido para un base_dir (clave: ruta resuelta)."""
+    key = str(Path(base_dir).resolve())
+    with _SERVICES_LOCK:
+        service = _SERVICES.get(key)
+        if service is None:
+            service = RepositoryServiceV1(base_dir=key)
+            _SERVICES[key] = service
+        return service
+
+
+def get_config_store(base_dir: str | Path = "data") -> ConfigStoreV1:
+    return get_repository_service(base_dir).config_store()
+
+
+def get_repository_store(base_dir: str | Path = "data") -> DocumentRepositoryStoreV1:
+    return get_repository_service(base_dir).repository_store()
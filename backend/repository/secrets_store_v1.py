@@ -22,7 +22,7 @@ class SecretsStoreV1:
 
     def _read(self) -> dict:
         if not self.path.exists():
-            ensure_data_layout(base_dir=self.base_dir)
+            ensure_data_layout(base_dir=self.base_dir, force=True)
         return json.loads(self.path.read_text(encoding="utf-8"))
 
     def _write(self, payload: dict) -> None:
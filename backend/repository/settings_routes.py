@@ -7,8 +7,9 @@ from __future__ import annotations
 
 import json
 import os
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Literal, Optional, Tuple
 
 from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel, Field, field_validator
@@ -54,6 +55,10 @@ class RepositorySettingsV1(BaseModel):
     repository_root_dir: str = Field(
         description="Ruta absoluta en el servidor donde se guardan los documentos"
     )
+    storage_backend: Literal["json", "sqlite"] = Field(
+        default="json",
+        description="Backend de metadatos: json (sidecars por documento) o sqlite (repository.sqlite3)"
+    )
 
     @field_validator('repository_root_dir')
     @classmethod
@@ -100,25 +105,48 @@ def get_default_repository_root() -> str:
     return str((base_dir / "repository").resolve())
 
 
+# settings.json parseado por ruta, validado por (mtime_ns, size): evita releer y validar
+# el fichero en cada construcción de DocumentRepositoryStoreV1.
+_SETTINGS_CACHE: Dict[Path, Tuple[tuple, RepositorySettingsV1]] = {}
+_SETTINGS_LOCK = threading.Lock()
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
 def load_settings() -> RepositorySettingsV1:
-    """Carga la configuración desde el archivo JSON."""
+    """Carga la configuración desde el archivo JSON (cacheada mientras no cambie el fichero)."""
     settings_path = get_settings_path()
     
-    if not settings_path.exists():
+    signature = _file_signature(settings_path)
+    if signature is None:
         # Crear configuración por defecto
         default_root = get_default_repository_root()
         settings = RepositorySettingsV1(repository_root_dir=default_root)
         save_settings(settings)
         return settings
     
+    with _SETTINGS_LOCK:
+        cached = _SETTINGS_CACHE.get(settings_path)
+    if cached is not None and cached[0] == signature:
+        return cached[1].model_copy()
+    
     try:
         with open(settings_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
-        return RepositorySettingsV1(**data)
+        settings = RepositorySettingsV1(**data)
     except Exception as e:
         # Si hay error, usar default
         default_root = get_default_repository_root()
         return RepositorySettingsV1(repository_root_dir=default_root)
+    with _SETTINGS_LOCK:
+        _SETTINGS_CACHE[settings_path] = (signature, settings)
+    return settings.model_copy()
 
 
 def save_settings(settings: RepositorySettingsV1) -> None:
@@ -128,6 +156,8 @@ def save_settings(settings: RepositorySettingsV1) -> None:
     
     with open(settings_path, 'w', encoding='utf-8') as f:
         json.dump(settings.model_dump(), f, indent=2, ensure_ascii=False)
+    with _SETTINGS_LOCK:
+        _SETTINGS_CACHE.pop(settings_path, None)
 
 
 def validate_and_ensure_directory(path_str: str, create_if_missing: bool = True) -> Path:
@@ -194,12 +224,23 @@ async def get_settings() -> RepositorySettingsV1:
 @router.put("/settings", response_model=RepositorySettingsV1)
 async def update_settings(
     settings: RepositorySettingsV1,
-    dry_run: Optional[bool] = Query(None, description="Si es True, solo valida sin guardar")
+    dry_run: Optional[bool] = Query(None, description="Si es True, solo valida sin guardar"),
+    remigrate: bool = Query(False, description="Al pasar a sqlite, re-migrar desde el layout JSON"),
 ) -> RepositorySettingsV1:
     """
     Actualiza la configuración del repositorio.
     
     - dry_run: Si es True, solo valida sin guardar
+    - remigrate: Si es True, al pasar a sqlite se vuelca de nuevo el layout JSON
+      (fuente de verdad: los documentos sin sidecar se eliminan de SQLite)
+    
+    Al pasar a storage_backend=sqlite por primera vez (sin repository.sqlite3)
+    se migra automáticamente el layout JSON existente. Si ya existe y el layout
+    JSON cambió después de la última escritura en SQLite (se volvió a json y se
+    editó), el cambio se rechaza con 409 salvo remigrate=True.
+    
+    Al volver de sqlite a json en la misma raíz, el contenido de SQLite se vuelca
+    al layout JSON (tipos, sidecars y borrados hechos mientras sqlite estaba activo).
     """
     # Validar y asegurar que el directorio existe y es escribible
     validated_path = validate_and_ensure_directory(
@@ -210,7 +251,41 @@ async def update_settings(
     # Actualizar con la ruta resuelta
     settings.repository_root_dir = str(validated_path)
     
+    from backend.repository.repository_backends_v1 import SQLITE_DB_NAME, json_changed_since_sqlite
+    
+    current = load_settings()
+    migration = None
+    export_to_json = (
+        settings.storage_backend == "json"
+        and current.storage_backend == "sqlite"
+        and Path(current.repository_root_dir).resolve() == validated_path.resolve()
+        and (validated_path / SQLITE_DB_NAME).exists()
+    )
+    if settings.storage_backend == "sqlite":
+        switching = (
+            current.storage_backend != "sqlite"
+            or Path(current.repository_root_dir).resolve() != validated_path.resolve()
+        )
+        if not (validated_path / SQLITE_DB_NAME).exists():
+            migration = {"replace_documents": False}
+        elif switching and (remigrate or json_changed_since_sqlite(validated_path)):
+            if not remigrate:
+                raise HTTPException(
+                    status_code=409,
+                    detail=(
+                        "El repositorio JSON tiene cambios posteriores a repository.sqlite3; "
+                        "repite con remigrate=true para volcarlo de nuevo a SQLite"
+                    ),
+                )
+            migration = {"replace_documents": True}
+    
     if not dry_run:
+        if migration is not None:
+            from backend.repository.repository_backends_v1 import migrate_json_to_sqlite
+            migrate_json_to_sqlite(validated_path, **migration)
+        if export_to_json:
+            from backend.repository.repository_backends_v1 import export_sqlite_to_json
+            export_sqlite_to_json(validated_path)
         # Guardar configuración
         save_settings(settings)
     
@@ -10,8 +10,9 @@ from __future__ import annotations
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import date
 
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_service_v1 import get_repository_store
 from backend.repository.document_matcher_v1 import DocumentMatcherV1, PendingItemV1
+from backend.repository.alias_index_v1 import get_alias_index
 from backend.shared.document_repository_v1 import DocumentTypeV1
 from backend.repository.text_utils import normalize_whitespace
 from backend.shared.text_normalizer import normalize_text
@@ -69,11 +70,12 @@ def suggest_types(
     if base_dir is None:
         base_dir = DATA_DIR
     
-    store = DocumentRepositoryStoreV1(base_dir=base_dir)
+    store = get_repository_store(base_dir)
     matcher = DocumentMatcherV1(store, base_dir=base_dir)
     
-    # Obtener todos los tipos activos
-    all_types = store.list_types(include_inactive=False)
+    # Obtener todos los tipos activos (índice compartido con aliases/nombres pre-normalizados)
+    alias_index = get_alias_index(store)
+    all_types = alias_index.types
     
     # Obtener contexto
     company_key = context.get("company_key") or context.get("own_company_key")
@@ -83,6 +85,8 @@ def suggest_types(
     # Normalizar texto del pending para matching
     pending_text = pending.get_base_text()
     pending_normalized = normalize_text(pending_text)
+    # Aliases contenidos en el texto del pending (una sola pasada Aho-Corasick)
+    contained = alias_index.contained_aliases(pending_normalized)
     
     suggestions: List[Tuple[DocumentTypeV1, float, List[str]]] = []
     
@@ -94,15 +98,15 @@ def suggest_types(
         reasons: List[str] = []
         
         # 1. Match por nombre/alias (peso: 0.4)
-        type_name_normalized = normalize_text(doc_type.name)
+        type_name_normalized = alias_index.name_normalized[doc_type.type_id]
         if pending_normalized in type_name_normalized or type_name_normalized in pending_normalized:
             score += 0.4
             reasons.append(f"Nombre coincide: '{doc_type.name}'")
         
-        # Match por aliases
-        for alias in doc_type.platform_aliases:
-            alias_normalized = normalize_text(alias)
-            if alias_normalized in pending_normalized or pending_normalized in alias_normalized:
+        # Match por aliases (alias contenido en el pending, o pending contenido en el alias)
+        contained_aliases = {alias for alias, _ in contained.get(doc_type.type_id, [])}
+        for alias, alias_normalized in alias_index.aliases_normalized[doc_type.type_id]:
+            if not alias_normalized or alias in contained_aliases or pending_normalized in alias_normalized:
                 score += 0.4
                 reasons.append(f"Alias coincide: '{alias}'")
                 break  # Solo contar una vez
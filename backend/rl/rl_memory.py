@@ -2,20 +2,53 @@
 RL Memory: Almacenamiento persistente de políticas de aprendizaje por refuerzo.
 
 v5.1.0: Gestiona la carga y guardado de políticas RL en memoria local.
+
+Las políticas se mantienen en la caché write-behind compartida (backend.shared.write_behind_v1)
+con la Q-table indexada por (state, action): update_q_value no relee ni reescribe el JSON.
 """
 
 import json
 import logging
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from datetime import datetime
 
 from backend.shared.models import RLPolicy, RLStateActionValue
+from backend.shared.write_behind_v1 import get_learning_cache
 from backend.config import MEMORY_BASE_DIR
 
 logger = logging.getLogger(__name__)
 
 
+class _PolicyDoc:
+    """Política en memoria + índices por (state, action) y por state."""
+    
+    def __init__(self, policy: RLPolicy):
+        self.policy = policy
+        self.index: Dict[Tuple[str, str], RLStateActionValue] = {}
+        self.by_state: Dict[str, List[RLStateActionValue]] = {}
+        for q in policy.q_table:
+            self._add_to_index(q)
+    
+    def _add_to_index(self, q: RLStateActionValue) -> None:
+        key = (q.state, q.action)
+        if key not in self.index:
+            self.index[key] = q
+        self.by_state.setdefault(q.state, []).append(q)
+    
+    def add(self, q: RLStateActionValue) -> None:
+        self.policy.q_table.append(q)
+        self._add_to_index(q)
+
+
+def _serialize_policy(doc: _PolicyDoc) -> Dict[str, Any]:
+    return {
+        "platform": doc.policy.platform,
+        "q_table": [item.model_dump() for item in doc.policy.q_table],
+        "last_updated": doc.policy.last_updated,
+    }
+
+
 class RLMemory:
     """
     Gestor de memoria para políticas de aprendizaje por refuerzo.
@@ -54,22 +87,8 @@ class RLMemory:
         safe_platform = platform.replace(" ", "_").replace("/", "_").lower()
         return self.base_dir / f"{safe_platform}.json"
     
-    def load_policy(self, platform: str) -> Optional[RLPolicy]:
-        """
-        Carga una política desde disco.
-        
-        Args:
-            platform: Nombre de la plataforma
-            
-        Returns:
-            RLPolicy cargada o None si no existe
-        """
-        policy_path = self._get_policy_path(platform)
-        
-        if not policy_path.exists():
-            logger.debug(f"[rl-memory] No policy found for platform: {platform}")
-            return None
-        
+    def _read_policy_file(self, policy_path: Path, platform: str) -> Optional[_PolicyDoc]:
+        """Lee y valida el JSON de una política (None si es inválido)."""
         try:
             with open(policy_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -86,15 +105,42 @@ class RLMemory:
             )
             
             logger.info(f"[rl-memory] Loaded policy for {platform}: {len(q_table)} Q-values")
-            return policy
+            return _PolicyDoc(policy)
         
         except Exception as e:
             logger.warning(f"[rl-memory] Error loading policy for {platform}: {e}")
             return None
     
+    def _get_doc(self, platform: str) -> Optional[_PolicyDoc]:
+        """Política en memoria (cargada de disco la primera vez o si cambió fuera del proceso)."""
+        policy_path = self._get_policy_path(platform)
+        doc = get_learning_cache().get(
+            policy_path,
+            lambda p: self._read_policy_file(p, platform),
+            _serialize_policy,
+        )
+        if doc is None:
+            logger.debug(f"[rl-memory] No policy found for platform: {platform}")
+        return doc
+    
+    def load_policy(self, platform: str) -> Optional[RLPolicy]:
+        """
+        Carga una política (copia independiente de la versión en memoria).
+        
+        Args:
+            platform: Nombre de la plataforma
+            
+        Returns:
+            RLPolicy cargada o None si no existe
+        """
+        doc = self._get_doc(platform)
+        if doc is None:
+            return None
+        return doc.policy.model_copy(deep=True)
+    
     def save_policy(self, platform: str, policy: RLPolicy) -> bool:
         """
-        Guarda una política en disco.
+        Guarda una política en disco (escritura inmediata y atómica).
         
         Args:
             platform: Nombre de la plataforma
@@ -109,16 +155,11 @@ class RLMemory:
             # Actualizar timestamp
             policy.last_updated = datetime.now().isoformat()
             
-            # Convertir a dict
-            data = {
-                "platform": policy.platform,
-                "q_table": [item.model_dump() for item in policy.q_table],
-                "last_updated": policy.last_updated,
-            }
-            
-            # Guardar JSON
-            with open(policy_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            get_learning_cache().write_through(
+                policy_path,
+                _PolicyDoc(policy.model_copy(deep=True)),
+                _serialize_policy,
+            )
             
             logger.info(f"[rl-memory] Saved policy for {platform}: {len(policy.q_table)} Q-values")
             return True
@@ -150,48 +191,54 @@ class RLMemory:
         Returns:
             True si se actualizó correctamente
         """
-        # Cargar política existente o crear nueva
-        policy = self.load_policy(platform)
-        if policy is None:
-            policy = RLPolicy(platform=platform, q_table=[])
-        
-        # Buscar Q-value existente
-        q_value = None
-        for q in policy.q_table:
-            if q.state == state and q.action == action:
-                q_value = q
-                break
+        def _apply(doc: _PolicyDoc) -> None:
+            # Buscar Q-value existente (índice por (state, action))
+            q_value = doc.index.get((state, action))
+            
+            # Si no existe, crear nuevo
+            if q_value is None:
+                q_value = RLStateActionValue(
+                    state=state,
+                    action=action,
+                    value=0.0,
+                    visits=0,
+                    success_rate=0.0,
+                )
+                doc.add(q_value)
+            
+            # Actualizar Q-value usando fórmula Q-learning simplificada
+            # Q(s,a) = Q(s,a) + α * (reward + γ * max(Q(s',a')) - Q(s,a))
+            # Para simplificar, usamos: Q(s,a) = Q(s,a) + α * reward
+            old_value = q_value.value
+            q_value.value = old_value + learning_rate * (reward - old_value)
+            
+            # Actualizar visitas
+            q_value.visits += 1
+            
+            # Actualizar success_rate basándose en reward
+            if reward > 0:
+                # Recompensa positiva incrementa success_rate
+                q_value.success_rate = min(1.0, q_value.success_rate + learning_rate * reward)
+            else:
+                # Recompensa negativa la reduce
+                q_value.success_rate = max(0.0, q_value.success_rate + learning_rate * reward)
+            
+            doc.policy.last_updated = datetime.now().isoformat()
         
-        # Si no existe, crear nuevo
-        if q_value is None:
-            q_value = RLStateActionValue(
-                state=state,
-                action=action,
-                value=0.0,
-                visits=0,
-                success_rate=0.0,
+        # Política en memoria o nueva, mutada bajo el lock de la caché write-behind
+        # (el flush la serializa con el mismo lock y la escritura a disco es diferida)
+        try:
+            get_learning_cache().mutate(
+                self._get_policy_path(platform),
+                lambda p: self._read_policy_file(p, platform),
+                _serialize_policy,
+                lambda: _PolicyDoc(RLPolicy(platform=platform, q_table=[])),
+                _apply,
             )
-            policy.q_table.append(q_value)
-        
-        # Actualizar Q-value usando fórmula Q-learning simplificada
-        # Q(s,a) = Q(s,a) + α * (reward + γ * max(Q(s',a')) - Q(s,a))
-        # Para simplificar, usamos: Q(s,a) = Q(s,a) + α * reward
-        old_value = q_value.value
-        q_value.value = old_value + learning_rate * (reward - old_value)
-        
-        # Actualizar visitas
-        q_value.visits += 1
-        
-        # Actualizar success_rate basándose en reward
-        if reward > 0:
-            # Recompensa positiva incrementa success_rate
-            q_value.success_rate = min(1.0, q_value.success_rate + learning_rate * reward)
-        else:
-            # Recompensa negativa la reduce
-            q_value.success_rate = max(0.0, q_value.success_rate + learning_rate * reward)
-        
-        # Guardar política actualizada
-        return self.save_policy(platform, policy)
+            return True
+        except Exception as e:
+            logger.error(f"[rl-memory] Error updating policy for {platform}: {e}", exc_info=True)
+            return False
     
     def get_best_action(self, platform: str, state: str) -> Optional[str]:
         """
@@ -204,12 +251,12 @@ class RLMemory:
         Returns:
             Mejor acción o None si no hay datos
         """
-        policy = self.load_policy(platform)
-        if policy is None:
+        doc = self._get_doc(platform)
+        if doc is None:
             return None
         
         # Buscar todas las acciones para este estado
-        state_actions = [q for q in policy.q_table if q.state == state]
+        state_actions = doc.by_state.get(state, [])
         
         if not state_actions:
             return None
@@ -267,12 +314,11 @@ class RLMemory:
         Returns:
             Lista de estados únicos
         """
-        policy = self.load_policy(platform)
-        if policy is None:
+        doc = self._get_doc(platform)
+        if doc is None:
             return []
         
-        states = set(q.state for q in policy.q_table)
-        return sorted(list(states))
+        return sorted(doc.by_state.keys())
     
     def get_state_action_stats(self, platform: str, state: str) -> Dict[str, Any]:
         """
@@ -285,11 +331,11 @@ class RLMemory:
         Returns:
             Dict con estadísticas
         """
-        policy = self.load_policy(platform)
-        if policy is None:
+        doc = self._get_doc(platform)
+        if doc is None:
             return {}
         
-        state_actions = [q for q in policy.q_table if q.state == state]
+        state_actions = doc.by_state.get(state, [])
         
         if not state_actions:
             return {}
@@ -0,0 +1,271 @@
+"""
+Runs en segundo plano para flujos Playwright síncronos (eGestiona headful/headless).
+
+Los endpoints /runs/egestiona/* mantenían la petición HTTP abierta durante minutos y
+ocupaban un worker del threadpool de Starlette. Aquí se encolan en un executor propio
+(EGESTIONA_RUN_WORKERS, por defecto 2) y se devuelve un run_id al instante:
+
+- estado/resultado: BackgroundRunV1.to_dict()
+- progreso: RunTimeline del run (report_progress desde el hilo del flujo)
+- cancelación cooperativa: cancel_requested() en los puntos de control del flujo
+  (p.ej. entre acciones de ExecutorRuntimeH4) o raise_if_canceled() en los flujos headful
+  (login, páginas del grid, matching); un run aún encolado se cancela sin ejecutarse.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.runs.run_timeline import EventType, RunTimeline
+
+
+DEFAULT_RUN_WORKERS = 2
+DEFAULT_MAX_FINISHED_RUNS = 200
+
+
+class BackgroundRunStatus(str, Enum):
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    SUCCESS = "SUCCESS"
+    FAILED = "FAILED"
+    CANCELED = "CANCELED"
+
+
+TERMINAL_STATUSES = (BackgroundRunStatus.SUCCESS, BackgroundRunStatus.FAILED, BackgroundRunStatus.CANCELED)
+
+
+class BackgroundRunCanceled(Exception):
+    """El run se canceló antes de producir resultado."""
+
+
+@dataclass
+class BackgroundRunV1:
+    """Run encolado: estado, timeline de progreso y resultado (o error HTTP equivalente)."""
+
+    run_id: str
+    kind: str
+    params: Dict[str, Any] = field(default_factory=dict)
+    status: BackgroundRunStatus = BackgroundRunStatus.QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[Dict[str, Any]] = None
+    timeline: RunTimeline = field(default=None)
+    cancel_event: threading.Event = field(default_factory=threading.Event)
+    future: Optional[Future] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.timeline is None:
+            self.timeline = RunTimeline(self.run_id)
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def urls(self) -> Dict[str, str]:
+        base = f"/runs/egestiona/background/{self.run_id}"
+        return {"status_url": base, "events_url": f"{base}/events", "cancel_url": f"{base}/cancel"}
+
+    def to_dict(self, include_events: bool = False) -> Dict[str, Any]:
+        def _iso(ts: Optional[float]) -> Optional[str]:
+            return datetime.utcfromtimestamp(ts).isoformat() + "Z" if ts else None
+
+        data = {
+            "run_id": self.run_id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": self.status.value,
+            "created_at": _iso(self.created_at),
+            "started_at": _iso(self.started_at),
+            "finished_at": _iso(self.finished_at),
+            "cancel_requested": self.cancel_event.is_set(),
+            "result": self.result,
+            "error": self.error,
+            "event_count": self.timeline.get_event_count(),
+            **self.urls(),
+        }
+        if include_events:
+            data["events"] = self.timeline.get_events_dict()
+        return data
+
+    async def wait_result(self) -> Any:
+        """Espera (sin bloquear el event loop) y devuelve el resultado o relanza el error del flujo."""
+        try:
+            return await asyncio.wrap_future(self.future)
+        except asyncio.CancelledError:
+            if self.future is not None and self.future.cancelled():
+                raise BackgroundRunCanceled(self.run_id)
+            raise
+
+
+_current = threading.local()
+
+
+def current_run() -> Optional[BackgroundRunV1]:
+    """Run en segundo plano que se ejecuta en este hilo (None fuera del executor)."""
+    return getattr(_current, "run", None)
+
+
+def report_progress(message: str, event_type: EventType = EventType.INFO, **metadata: Any) -> None:
+    """Añade un evento al timeline del run actual (no-op fuera de un run en segundo plano)."""
+    run = current_run()
+    if run is not None:
+        run.timeline.add_event(event_type, message, metadata)
+
+
+def cancel_requested() -> bool:
+    """True si se pidió cancelar el run actual (los flujos lo consultan entre pasos)."""
+    run = current_run()
+    return run is not None and run.cancel_event.is_set()
+
+
+def raise_if_canceled(checkpoint: str) -> None:
+    """
+    Punto de control para flujos que no pasan por ExecutorRuntimeH4 (constructores de plan,
+    matching headful): corta el run con BackgroundRunCanceled si se pidió cancelar.
+    """
+    run = current_run()
+    if run is not None and run.cancel_event.is_set():
+        run.timeline.add_event(EventType.WARNING, f"Cancelación atendida en {checkpoint}")
+        raise BackgroundRunCanceled(run.run_id)
+
+
+class BackgroundRunManagerV1:
+    """Executor acotado + registro en memoria de runs (los terminados se podan por antigüedad)."""
+
+    def __init__(self, max_workers: Optional[int] = None, max_finished: int = DEFAULT_MAX_FINISHED_RUNS):
+        if max_workers is None:
+            try:
+                max_workers = int(os.getenv("EGESTIONA_RUN_WORKERS", str(DEFAULT_RUN_WORKERS)))
+            except ValueError:
+                max_workers = DEFAULT_RUN_WORKERS
+        self.max_workers = max(1, max_workers)
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="egestiona-run")
+        self._runs: "OrderedDict[str, BackgroundRunV1]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, job: Callable[[], Any], params: Optional[Dict[str, Any]] = None) -> BackgroundRunV1:
+        """Encola job (callable síncrono) y devuelve el run en estado QUEUED."""
+        run_id = f"bg_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        run = BackgroundRunV1(run_id=run_id, kind=kind, params=dict(params or {}))
+        run.timeline.add_event(EventType.INFO, f"Run {kind} encolado")
+        with self._lock:
+            self._runs[run_id] = run
+            self._prune_locked()
+        run.future = self._executor.submit(self._execute, run, job)
+        return run
+
+    def _execute(self, run: BackgroundRunV1, job: Callable[[], Any]) -> Any:
+        if run.cancel_event.is_set():
+            self._finish(run, BackgroundRunStatus.CANCELED)
+            raise BackgroundRunCanceled(run.run_id)
+        run.status = BackgroundRunStatus.RUNNING
+        run.started_at = time.time()
+        run.timeline.add_event(EventType.INFO, f"Run {run.kind} iniciado")
+        _current.run = run
+        try:
+            result = job()
+        except BaseException as e:
+            run.error = _error_payload(e)
+            if run.cancel_event.is_set():
+                self._finish(run, BackgroundRunStatus.CANCELED)
+            else:
+                run.timeline.add_event(EventType.ERROR, f"Run {run.kind} falló: {run.error['detail']}", run.error)
+                self._finish(run, BackgroundRunStatus.FAILED)
+            raise
+        finally:
+            _current.run = None
+        run.result = result
+        if run.cancel_event.is_set():
+            self._finish(run, BackgroundRunStatus.CANCELED)
+        else:
+            run.timeline.add_event(EventType.SUCCESS, f"Run {run.kind} completado")
+            self._finish(run, BackgroundRunStatus.SUCCESS)
+        return result
+
+    def _finish(self, run: BackgroundRunV1, status: BackgroundRunStatus) -> None:
+        if status == BackgroundRunStatus.CANCELED:
+            run.timeline.add_event(EventType.WARNING, f"Run {run.kind} cancelado")
+        run.finished_at = time.time()
+        run.status = status
+
+    def get(self, run_id: str) -> Optional[BackgroundRunV1]:
+        with self._lock:
+            return self._runs.get(run_id)
+
+    def list_runs(self, limit: int = 50) -> List[BackgroundRunV1]:
+        """Runs más recientes primero."""
+        with self._lock:
+            runs = list(self._runs.values())
+        return list(reversed(runs))[:limit]
+
+    def cancel(self, run_id: str) -> Optional[BackgroundRunV1]:
+        """
+        Pide cancelar un run. Si aún está encolado no llega a ejecutarse; si está en curso,
+        el flujo se detiene en su siguiente punto de control (cancel_requested()).
+        """
+        run = self.get(run_id)
+        if run is None or run.is_terminal:
+            return run
+        run.cancel_event.set()
+        if run.future is not None and run.future.cancel():
+            self._finish(run, BackgroundRunStatus.CANCELED)
+        else:
+            run.timeline.add_event(EventType.WARNING, "Cancelación solicitada; se detendrá en el siguiente paso")
+        return run
+
+    def _prune_locked(self) -> None:
+        finished = [rid for rid, r in self._runs.items() if r.is_terminal]
+        for rid in finished[: max(0, len(finished) - self.max_finished)]:
+            self._runs.pop(rid, None)
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Cancela lo encolado, pide parar lo que está en curso y cierra el executor."""
+        with self._lock:
+            runs = list(self._runs.values())
+        for run in runs:
+            if not run.is_terminal:
+                self.cancel(run.run_id)
+        self._executor.shutdown(wait=wait)
+
+
+def _error_payload(exc: BaseException) -> Dict[str, Any]:
+    """Error como {status_code, detail}: las HTTPException de los flujos conservan su código."""
+    status_code = getattr(exc, "status_code", None)
+    if status_code is not None and hasattr(exc, "detail"):
+        return {"status_code": status_code, "detail": exc.detail}
+    return {"status_code": 500, "detail": f"{type(exc).__name__}: {exc}"}
+
+
+_MANAGER: Optional[BackgroundRunManagerV1] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_background_run_manager() -> BackgroundRunManagerV1:
+    """Manager process-wide de runs en segundo plano."""
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is None:
+            _MANAGER = BackgroundRunManagerV1()
+        return _MANAGER
+
+
+def shutdown_background_runs() -> None:
+    """Shutdown de la app: cancela runs pendientes sin esperar a los flujos en curso."""
+    global _MANAGER
+    with _MANAGER_LOCK:
+        manager, _MANAGER = _MANAGER, None
+    if manager is not None:
+        manager.shutdown(wait=False)
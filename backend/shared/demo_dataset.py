@@ -14,8 +14,7 @@ from pathlib import Path
 from typing import Optional
 
 from backend.config import DATA_DIR
-from backend.repository.config_store_v1 import ConfigStoreV1
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_service_v1 import get_config_store, get_repository_store
 from backend.shared.schedule_models import ScheduleV1, ScheduleStore
 from backend.shared.tenant_paths import tenant_root
 from backend.shared.tenant_context import compute_tenant_from_coordination_context
@@ -58,7 +57,7 @@ def ensure_demo_dataset() -> dict:
     }
     
     # 1. Crear org.json con empresa demo
-    store = ConfigStoreV1(base_dir=DATA_DIR)
+    store = get_config_store(DATA_DIR)
     org = store.load_org()
     
     # Si no existe o no tiene la empresa demo, crearla
@@ -104,7 +103,7 @@ def ensure_demo_dataset() -> dict:
         results["platform_created"] = True
     
     # 3. Crear tipos de documentos demo
-    repo_store = DocumentRepositoryStoreV1(base_dir=DATA_DIR)
+    repo_store = get_repository_store(DATA_DIR)
     types = repo_store.list_types()
     
     demo_types = [
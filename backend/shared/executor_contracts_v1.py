@@ -252,11 +252,28 @@ class DomSnapshotV1(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
+class SignatureModeV1(str, Enum):
+    """
+    Cómo se obtiene screenshot_hash en StateSignatureV1.
+
+    - dom_structural: hash estructural del DOM calculado en el mismo page.evaluate (sin screenshot)
+    - viewport: screenshot PNG solo del viewport
+    - viewport_lowres: screenshot JPEG de baja calidad del viewport a escala CSS
+    - full_page: screenshot PNG de página completa (comportamiento original)
+    """
+
+    dom_structural = "dom_structural"
+    viewport = "viewport"
+    viewport_lowres = "viewport_lowres"
+    full_page = "full_page"
+
+
 class StateSignatureV1(BaseModel):
     """
     Firma estable del estado observado.
 
-    v1: hash(url + title + elementos clave + texto visible acotado) + hash de screenshot.
+    v1: hash(url + title + elementos clave + texto visible acotado) + hash de screenshot
+    (o hash estructural del DOM, según signature_mode).
     """
 
     schema_version: Literal["v1"] = Field(default=SCHEMA_VERSION_V1)
@@ -267,6 +284,7 @@ class StateSignatureV1(BaseModel):
     key_elements_hash: str
     visible_text_hash: str
     screenshot_hash: str
+    signature_mode: SignatureModeV1 = SignatureModeV1.full_page
 
     # opcional (no imprescindible para auditoría; útil para debug)
     url: Optional[str] = None
@@ -283,6 +301,7 @@ def compute_state_signature_v1(
     visible_text: str,
     screenshot_hash: str,
     visible_text_max_len: int = 3000,
+    signature_mode: SignatureModeV1 = SignatureModeV1.full_page,
 ) -> StateSignatureV1:
     """
     Helper determinista para construir StateSignatureV1 dado material ya extraído.
@@ -296,6 +315,7 @@ def compute_state_signature_v1(
         key_elements_hash=_sha256_bytes(_normalize_text(key_elements_json, max_len=20000).encode("utf-8")),
         visible_text_hash=sha256_text(visible_text, max_len=visible_text_max_len),
         screenshot_hash=str(screenshot_hash or ""),
+        signature_mode=signature_mode,
         url=url,
     )
 
@@ -10,7 +10,7 @@ from pathlib import Path
 
 from backend.shared.learning_store import LearnedHintV1, LearningStore
 from backend.shared.decision_pack import DecisionPackV1, ManualDecisionAction
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_service_v1 import get_repository_store
 from backend.repository.submission_history_utils import compute_pending_fingerprint
 from backend.shared.text_normalizer import normalize_text
 from backend.config import DATA_DIR
@@ -33,7 +33,7 @@ def generate_hints_from_decision_pack(
         Lista de hint_ids creados
     """
     store = LearningStore()
-    doc_store = DocumentRepositoryStoreV1()
+    doc_store = get_repository_store()
     snapshot_items = plan_data.get("snapshot", {}).get("items", [])
     original_decisions = plan_data.get("decisions", [])
     
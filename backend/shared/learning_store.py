@@ -6,6 +6,7 @@ futuros matchings de forma determinista y auditable.
 """
 from __future__ import annotations
 
+import threading
 from datetime import datetime, timezone
 from enum import Enum
 from typing import Dict, List, Optional, Any
@@ -114,6 +115,153 @@ class LearnedHintV1(BaseModel):
         )
 
 
+# Condiciones indexadas: (campo de consulta, dónde vive en el hint, coincidencia estricta)
+# Estricta: el hint debe tener exactamente ese valor.
+# No estricta: el hint coincide si tiene ese valor o no define la condición.
+_HINT_INDEX_FIELDS = (
+    ("type_id", "learned_mapping", "type_id_expected", True),
+    ("subject_key", "conditions", "subject_key", True),
+    ("person_key", "conditions", "person_key", True),
+    ("period_key", "conditions", "period_key", False),
+    ("portal_label_norm", "conditions", "portal_type_label_normalized", False),
+)
+
+
+class _HintCacheV1:
+    """
+    Cache en memoria (por fichero hints_v1.jsonl) con índices hash por condición.
+    
+    - Se refresca incrementalmente leyendo solo lo añadido desde el último offset.
+    - Si el fichero se reescribe (compactación) o trunca, se recarga completo.
+    - Los tombstones se recargan solo si cambia su mtime/tamaño.
+    """
+    
+    def __init__(self, hints_file: Path, tombstones_file: Path):
+        self.hints_file = hints_file
+        self.tombstones_file = tombstones_file
+        self.lock = threading.RLock()
+        self._reset()
+        self._tombstones_sig: Optional[tuple] = None
+        self.disabled_ids: set = set()
+    
+    def _reset(self) -> None:
+        self.hints: List[LearnedHintV1] = []
+        self.by_id: Dict[str, int] = {}
+        self.indexes: Dict[str, Dict[Optional[str], List[int]]] = {f[0]: {} for f in _HINT_INDEX_FIELDS}
+        self.offset = 0
+        self.file_id: Optional[tuple] = None
+    
+    def _add(self, hint: LearnedHintV1) -> None:
+        if hint.hint_id in self.by_id:
+            return
+        pos = len(self.hints)
+        self.hints.append(hint)
+        self.by_id[hint.hint_id] = pos
+        for name, container, key, _strict in _HINT_INDEX_FIELDS:
+            value = getattr(hint, container).get(key) or None
+            self.indexes[name].setdefault(value, []).append(pos)
+    
+    def refresh(self) -> None:
+        """Lee solo las líneas nuevas del JSONL (tail desde el último offset)."""
+        try:
+            st = self.hints_file.stat()
+        except OSError:
+            self._reset()
+            return
+        file_id = (st.st_dev, st.st_ino)
+        if file_id != self.file_id or st.st_size < self.offset:
+            self._reset()
+            self.file_id = file_id
+        if st.st_size == self.offset:
+            return
+        try:
+            with open(self.hints_file, "rb") as f:
+                f.seek(self.offset)
+                chunk = f.read()
+        except Exception as e:
+            print(f"[LearningStore] Error loading hints: {e}")
+            return
+        # Solo consumir líneas completas (una escritura concurrente puede dejar una línea a medias)
+        end = chunk.rfind(b"\n")
+        if end < 0:
+            return
+        for raw_line in chunk[:end].split(b"\n"):
+            line = raw_line.decode("utf-8").strip()
+            if not line:
+                continue
+            try:
+                self._add(LearnedHintV1(**json.loads(line)))
+            except Exception as e:
+                print(f"[LearningStore] Error parsing hint line: {e}")
+                continue
+        self.offset += end + 1
+    
+    def refresh_tombstones(self) -> None:
+        try:
+            st = self.tombstones_file.stat()
+            sig = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            self._tombstones_sig = None
+            self.disabled_ids = set()
+            return
+        if sig == self._tombstones_sig:
+            return
+        try:
+            with open(self.tombstones_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.disabled_ids = set(data.get("disabled_ids", []))
+        except Exception:
+            self.disabled_ids = set()
+        self._tombstones_sig = sig
+    
+    def candidates(self, filters: Dict[str, Optional[str]]) -> List[int]:
+        """Posiciones de hints que cumplen los filtros (orden de inserción)."""
+        selected: Optional[set] = None
+        for name, _container, _key, strict in _HINT_INDEX_FIELDS:
+            value = filters.get(name)
+            # period_key filtra si no es None (incluido ""); el resto solo si tiene valor
+            if (value is None) if name == "period_key" else (not value):
+                continue
+            index = self.indexes[name]
+            bucket = set(index.get(value or None, ())) if value else set()
+            if not strict:
+                bucket.update(index.get(None, ()))
+            selected = bucket if selected is None else (selected & bucket)
+            if not selected:
+                return []
+        if selected is None:
+            return list(range(len(self.hints)))
+        return sorted(selected)
+
+
+_HINT_CACHES: Dict[str, _HintCacheV1] = {}
+_HINT_CACHES_LOCK = threading.Lock()
+
+
+def _get_hint_cache(hints_file: Path, tombstones_file: Path) -> _HintCacheV1:
+    key = str(Path(hints_file).resolve())
+    with _HINT_CACHES_LOCK:
+        cache = _HINT_CACHES.get(key)
+        if cache is None:
+            cache = _HintCacheV1(Path(key), Path(tombstones_file))
+            _HINT_CACHES[key] = cache
+        return cache
+
+
+_WRITE_LOCKS: Dict[str, threading.RLock] = {}
+
+
+def _get_write_lock(hints_file: Path) -> threading.RLock:
+    """Lock por fichero hints_v1.jsonl de escritura: serializa append (add_hints) y compact."""
+    key = str(Path(hints_file).resolve())
+    with _HINT_CACHES_LOCK:
+        lock = _WRITE_LOCKS.get(key)
+        if lock is None:
+            lock = threading.RLock()
+            _WRITE_LOCKS[key] = lock
+        return lock
+
+
 class LearningStore:
     """Store para hints aprendidos."""
     
@@ -168,27 +316,35 @@ class LearningStore:
         """
         added_ids = []
         
-        # Cargar hints existentes para verificar duplicados
-        existing_hints = self._load_all_hints()
-        existing_ids = {h.hint_id for h in existing_hints}
-        
-        # Filtrar duplicados
-        new_hints = [h for h in hints if h.hint_id not in existing_ids]
-        
-        if not new_hints:
-            return []
-        
-        # SPRINT C2.22B: Append a JSONL en tenant path (escritura)
-        # Asegurar que el directorio existe antes de escribir
-        ensure_write_dir(self.learning_dir_write)
-        with open(self.hints_file_write, "a", encoding="utf-8") as f:
-            for hint in new_hints:
-                hint_dict = hint.model_dump(mode="json")
-                f.write(json.dumps(hint_dict, ensure_ascii=False) + "\n")
-                added_ids.append(hint.hint_id)
-        
-        # Actualizar índice
-        self._rebuild_index()
+        # Mismo lock que compact(): un append no puede caer entre su lectura y su replace
+        with _get_write_lock(self.hints_file_write):
+            # Verificar duplicados contra la cache en memoria (refresco incremental)
+            cache = self._cache()
+            with cache.lock:
+                cache.refresh()
+                existing_ids = set(cache.by_id)
+            
+            # Filtrar duplicados (también dentro del propio lote)
+            new_hints = []
+            for h in hints:
+                if h.hint_id not in existing_ids:
+                    existing_ids.add(h.hint_id)
+                    new_hints.append(h)
+            
+            if not new_hints:
+                return []
+            
+            # SPRINT C2.22B: Append a JSONL en tenant path (escritura)
+            # Asegurar que el directorio existe antes de escribir
+            ensure_write_dir(self.learning_dir_write)
+            with open(self.hints_file_write, "a", encoding="utf-8") as f:
+                for hint in new_hints:
+                    hint_dict = hint.model_dump(mode="json")
+                    f.write(json.dumps(hint_dict, ensure_ascii=False) + "\n")
+                    added_ids.append(hint.hint_id)
+            
+            # Actualizar índice
+            self._rebuild_index()
         
         return added_ids
     
@@ -215,46 +371,22 @@ class LearningStore:
         Returns:
             Lista de hints que coinciden (solo activos)
         """
-        all_hints = self._load_all_hints()
-        disabled_ids = self._load_disabled_ids()
-        
-        matching = []
-        for hint in all_hints:
-            # Saltar desactivados
-            if hint.hint_id in disabled_ids or hint.disabled:
-                continue
-            
-            # Verificar condiciones
-            conditions = hint.conditions
-            learned_mapping = hint.learned_mapping
-            
-            # Verificar type_id
-            if type_id and learned_mapping.get("type_id_expected") != type_id:
-                continue
-            
-            # Verificar subject_key
-            if subject_key and conditions.get("subject_key") != subject_key:
-                continue
-            
-            # Verificar person_key
-            if person_key and conditions.get("person_key") != person_key:
-                continue
-            
-            # Verificar period_key (si se proporciona y el hint lo requiere)
-            if period_key is not None:
-                hint_period = conditions.get("period_key")
-                if hint_period and hint_period != period_key:
-                    continue
-            
-            # Verificar portal_label_norm (opcional)
-            if portal_label_norm:
-                hint_label = conditions.get("portal_type_label_normalized")
-                if hint_label and hint_label != portal_label_norm:
-                    continue
-            
-            matching.append(hint)
-        
-        return matching
+        cache = self._cache()
+        with cache.lock:
+            cache.refresh()
+            cache.refresh_tombstones()
+            positions = cache.candidates({
+                "type_id": type_id,
+                "subject_key": subject_key,
+                "person_key": person_key,
+                "period_key": period_key,
+                "portal_label_norm": portal_label_norm,
+            })
+            disabled_ids = cache.disabled_ids
+            return [
+                hint for hint in (cache.hints[pos] for pos in positions)
+                if hint.hint_id not in disabled_ids and not hint.disabled
+            ]
     
     def disable_hint(self, hint_id: str, reason: Optional[str] = None) -> bool:
         """
@@ -327,54 +459,64 @@ class LearningStore:
         
         return filtered
     
-    def _load_all_hints(self) -> List[LearnedHintV1]:
-        """Carga todos los hints desde JSONL (con fallback legacy)."""
+    def _read_paths(self) -> tuple:
+        """(hints_file, tombstones_file) de lectura: tenant si existe, si no legacy."""
         # SPRINT C2.22B: Recalcular path de lectura dinámicamente (tenant o legacy)
-        # Si tenant dir existe ahora, usar tenant, si no legacy
         if self.tenant_learning_dir.exists():
-            hints_file = self.hints_file_write
-        else:
-            hints_file = self.legacy_learning_dir / "hints_v1.jsonl"
-        
-        if not hints_file.exists():
-            return []
-        
-        hints = []
-        try:
-            with open(hints_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    try:
-                        hint_dict = json.loads(line)
-                        hints.append(LearnedHintV1(**hint_dict))
-                    except Exception as e:
-                        print(f"[LearningStore] Error parsing hint line: {e}")
-                        continue
-        except Exception as e:
-            print(f"[LearningStore] Error loading hints: {e}")
-        
-        return hints
+            return self.hints_file_write, self.tombstones_file_write
+        return (
+            self.legacy_learning_dir / "hints_v1.jsonl",
+            self.legacy_learning_dir / "tombstones_v1.json",
+        )
+    
+    def _cache(self) -> _HintCacheV1:
+        """Cache de hints compartida por proceso para el fichero de lectura actual."""
+        hints_file, tombstones_file = self._read_paths()
+        return _get_hint_cache(hints_file, tombstones_file)
+    
+    def _load_all_hints(self) -> List[LearnedHintV1]:
+        """Carga todos los hints desde JSONL (con fallback legacy), vía cache incremental."""
+        cache = self._cache()
+        with cache.lock:
+            cache.refresh()
+            return list(cache.hints)
     
     def _load_disabled_ids(self) -> set:
         """Carga IDs de hints desactivados (con fallback legacy)."""
-        # SPRINT C2.22B: Recalcular path de lectura dinámicamente (tenant o legacy)
-        # Si tenant dir existe ahora, usar tenant, si no legacy
-        if self.tenant_learning_dir.exists():
-            tombstones_file = self.tombstones_file_write
-        else:
-            tombstones_file = self.legacy_learning_dir / "tombstones_v1.json"
+        cache = self._cache()
+        with cache.lock:
+            cache.refresh_tombstones()
+            return set(cache.disabled_ids)
+    
+    def compact(self) -> Dict[str, int]:
+        """
+        Reescribe hints_v1.jsonl sin los hints desactivados (tombstones o disabled=True).
         
-        if not tombstones_file.exists():
-            return set()
+        Los tombstones se conservan para que un hint re-aprendido siga desactivado.
+        Escritura atómica (tmp + replace) en el path de escritura del tenant, con el lock
+        de escritura de add_hints tomado de la lectura al replace (no se pierden appends).
         
-        try:
-            with open(tombstones_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                return set(data.get("disabled_ids", []))
-        except Exception:
-            return set()
+        Returns:
+            {"kept": N, "removed": M}
+        """
+        with _get_write_lock(self.hints_file_write):
+            all_hints = self._load_all_hints()
+            disabled_ids = self._load_disabled_ids()
+            kept = [h for h in all_hints if h.hint_id not in disabled_ids and not h.disabled]
+            
+            ensure_write_dir(self.learning_dir_write)
+            # Si se leía del path legacy, llevar también los tombstones al path del tenant
+            if disabled_ids and not self.tombstones_file_write.exists():
+                with open(self.tombstones_file_write, "w", encoding="utf-8") as f:
+                    json.dump({"disabled_ids": sorted(disabled_ids)}, f, indent=2, ensure_ascii=False)
+            tmp = self.hints_file_write.with_suffix(".jsonl.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                for hint in kept:
+                    f.write(json.dumps(hint.model_dump(mode="json"), ensure_ascii=False) + "\n")
+            tmp.replace(self.hints_file_write)
+            
+            self._rebuild_index()
+        return {"kept": len(kept), "removed": len(all_hints) - len(kept)}
     
     def _rebuild_index(self) -> None:
         """Reconstruye el índice (opcional, para lookup rápido)."""
@@ -102,11 +102,11 @@ class MatchingDebugReportV1(BaseModel):
         pending_text: Optional[str] = None,
     ) -> "MatchingDebugReportV1":
         """Crea un reporte vacío con metadata básica."""
-        from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+        from backend.repository.repository_service_v1 import get_repository_store
         import os
         from pathlib import Path
         
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         all_docs = store.list_documents()  # Sin filtros
         all_types = store.list_types(include_inactive=False)
         active_types = store.list_types(include_inactive=True)
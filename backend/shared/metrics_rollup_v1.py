@@ -0,0 +1,276 @@
+"""
+Rollups incrementales de métricas operativas (por tenant, día y plataforma).
+
+/api/metrics/summary recorría todos los plan dirs y cargaba cada metrics.json en cada
+petición (coste lineal con el histórico). save_metrics aplica aquí el delta entre la
+versión anterior y la nueva de las métricas de un plan:
+
+- days[YYYY-MM-DD][platform]: contadores agregados (runs, items, decisiones, orígenes,
+  runs con learning/presets) -> resúmenes por rango de fechas sin tocar los plans.
+- recent: contribución de los últimos MAX_RECENT plans de cada plataforma -> resumen
+  "últimos N runs" (global o filtrado por plataforma).
+
+Fichero: data/tenants/<tenant_id>/metrics_rollup.json (escritura atómica). Si no existe
+(instalaciones previas) se reconstruye una vez desde los metrics.json existentes.
+"""
+
+from __future__ import annotations
+
+import copy
+import json
+import threading
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.shared.tenant_paths import get_runs_root, tenant_root
+from backend.shared.write_behind_v1 import atomic_write_json
+
+
+ROLLUP_VERSION = 2  # v2: recent acotado por plataforma (v1 se reconstruye)
+MAX_RECENT = 100  # límite máximo de /metrics/summary?limit=
+UNKNOWN_PLATFORM = "unknown"
+
+DECISION_KEYS = ("AUTO_UPLOAD", "REVIEW_REQUIRED", "NO_MATCH", "SKIP")
+SOURCE_KEYS = ("auto_matching", "learning_hint_resolved", "preset_applied", "manual_single", "manual_batch")
+
+
+def _empty_counters() -> Dict[str, Any]:
+    return {
+        "runs": 0,
+        "total_items": 0,
+        "decisions": {k: 0 for k in DECISION_KEYS},
+        "sources": {k: 0 for k in SOURCE_KEYS},
+        "runs_with_learning": 0,
+        "runs_with_presets": 0,
+    }
+
+
+def _day_of(created_at: Optional[str]) -> str:
+    if not created_at:
+        return "unknown"
+    return str(created_at)[:10]
+
+
+def contribution_from_metrics(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Contadores que aporta un plan (dict de RunMetricsV1.to_dict())."""
+    counters = _empty_counters()
+    counters["runs"] = 1
+    counters["total_items"] = int(data.get("total_items") or 0)
+    for key, value in (data.get("decisions_count") or {}).items():
+        if key in counters["decisions"]:
+            counters["decisions"][key] = int(value or 0)
+    for key, value in (data.get("source_breakdown") or {}).items():
+        if key in counters["sources"]:
+            counters["sources"][key] = int(value or 0)
+    counters["runs_with_learning"] = 1 if counters["sources"]["learning_hint_resolved"] > 0 else 0
+    counters["runs_with_presets"] = 1 if counters["sources"]["preset_applied"] > 0 else 0
+    return counters
+
+
+def _add(target: Dict[str, Any], counters: Dict[str, Any], sign: int = 1) -> None:
+    for key in ("runs", "total_items", "runs_with_learning", "runs_with_presets"):
+        target[key] = target.get(key, 0) + sign * counters[key]
+    for group in ("decisions", "sources"):
+        bucket = target.setdefault(group, {})
+        for key, value in counters[group].items():
+            bucket[key] = bucket.get(key, 0) + sign * value
+
+
+def summarize(counters: Dict[str, Any]) -> Dict[str, Any]:
+    """Respuesta de /metrics/summary a partir de contadores agregados."""
+    decisions = {k: counters["decisions"].get(k, 0) for k in DECISION_KEYS}
+    sources = {k: counters["sources"].get(k, 0) for k in SOURCE_KEYS}
+    total_runs = counters["runs"]
+    total_decisions = sum(decisions.values())
+
+    percentages: Dict[str, float] = {}
+    if total_decisions > 0:
+        percentages["auto_upload"] = (decisions["AUTO_UPLOAD"] / total_decisions) * 100
+        percentages["skip"] = (decisions["SKIP"] / total_decisions) * 100
+        percentages["review_required"] = (decisions["REVIEW_REQUIRED"] / total_decisions) * 100
+    if total_runs > 0:
+        percentages["with_learning"] = (counters["runs_with_learning"] / total_runs) * 100
+        percentages["with_presets"] = (counters["runs_with_presets"] / total_runs) * 100
+
+    return {
+        "total_runs": total_runs,
+        "total_items": counters["total_items"],
+        "decisions_breakdown": decisions,
+        "source_breakdown": sources,
+        "percentages": percentages,
+    }
+
+
+class MetricsRollupStoreV1:
+    """Rollup de métricas de un tenant (cacheado en memoria, persistido en JSON)."""
+
+    def __init__(self, base_dir: Path, tenant_id: str = "default"):
+        self.base_dir = Path(base_dir)
+        self.tenant_id = tenant_id
+        self.path = tenant_root(self.base_dir, tenant_id) / "metrics_rollup.json"
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Any]] = None
+
+    # ----- carga / reconstrucción -----
+
+    def _load_locked(self) -> Dict[str, Any]:
+        if self._data is not None and self.path.exists():
+            return self._data
+        if self.path.exists():
+            try:
+                data = json.loads(self.path.read_text(encoding="utf-8"))
+                if data.get("version") == ROLLUP_VERSION:
+                    self._data = data
+                    return data
+            except Exception as e:
+                print(f"[MetricsRollup] Rollup ilegible, se reconstruye: {e}")
+        self._data = self._rebuild_locked()
+        return self._data
+
+    def _iter_plan_metrics(self) -> Iterable[Dict[str, Any]]:
+        runs_root = get_runs_root(self.base_dir, self.tenant_id, mode="read")
+        if not runs_root.exists():
+            return
+        for plan_dir in runs_root.iterdir():
+            metrics_path = plan_dir / "metrics.json"
+            if not metrics_path.is_file():
+                continue
+            try:
+                yield json.loads(metrics_path.read_text(encoding="utf-8"))
+            except Exception as e:
+                print(f"[MetricsRollup] Error leyendo {metrics_path}: {e}")
+
+    def _rebuild_locked(self) -> Dict[str, Any]:
+        data = {"version": ROLLUP_VERSION, "days": {}, "recent": []}
+        for metrics in self._iter_plan_metrics():
+            self._apply_locked(data, None, metrics)
+        self._persist_locked(data)
+        return data
+
+    def rebuild(self) -> None:
+        """Reconstruye el rollup completo desde los metrics.json (operación de mantenimiento)."""
+        with self._lock:
+            self._data = self._rebuild_locked()
+
+    def ensure_built(self) -> None:
+        """Carga o reconstruye el rollup (antes de escribir un metrics.json nuevo)."""
+        with self._lock:
+            self._load_locked()
+
+    def _persist_locked(self, data: Dict[str, Any]) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            data["updated_at"] = datetime.utcnow().isoformat() + "Z"
+            atomic_write_json(self.path, data)
+        except Exception as e:
+            print(f"[MetricsRollup] Error guardando rollup: {e}")
+
+    @property
+    def lock(self) -> threading.RLock:
+        """Lock del rollup: save_metrics lee, escribe el metrics.json y aplica el delta bajo él."""
+        return self._lock
+
+    # ----- actualización incremental -----
+
+    def _apply_locked(self, data: Dict[str, Any], previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> None:
+        days = data["days"]
+        if previous is not None:
+            prev_day = _day_of(previous.get("created_at"))
+            prev_platform = previous.get("platform") or UNKNOWN_PLATFORM
+            prev_bucket = days.setdefault(prev_day, {}).setdefault(prev_platform, _empty_counters())
+            _add(prev_bucket, contribution_from_metrics(previous), sign=-1)
+            if prev_bucket["runs"] <= 0:
+                del days[prev_day][prev_platform]
+                if not days[prev_day]:
+                    del days[prev_day]
+
+        contribution = contribution_from_metrics(current)
+        platform = current.get("platform") or UNKNOWN_PLATFORM
+        bucket = days.setdefault(_day_of(current.get("created_at")), {}).setdefault(platform, _empty_counters())
+        _add(bucket, contribution)
+
+        plan_id = current.get("plan_id")
+        recent: List[Dict[str, Any]] = [r for r in data["recent"] if r.get("plan_id") != plan_id]
+        recent.append({
+            "plan_id": plan_id,
+            "created_at": current.get("created_at") or "",
+            "platform": platform,
+            "counters": contribution,
+        })
+        recent.sort(key=lambda r: r["created_at"], reverse=True)
+        # Últimos MAX_RECENT por plataforma: incluye los MAX_RECENT globales y permite
+        # filtrar por plataforma sin perder plans desplazados por otras plataformas
+        kept: Dict[str, int] = {}
+        trimmed = []
+        for entry in recent:
+            count = kept.get(entry["platform"], 0)
+            if count < MAX_RECENT:
+                kept[entry["platform"]] = count + 1
+                trimmed.append(entry)
+        data["recent"] = trimmed
+
+    def apply(self, previous: Optional[Dict[str, Any]], current: Dict[str, Any]) -> None:
+        """Aplica el cambio de métricas de un plan (previous=None si es nuevo)."""
+        with self._lock:
+            data = self._load_locked()
+            self._apply_locked(data, previous, current)
+            self._persist_locked(data)
+
+    # ----- consultas -----
+
+    def summary(
+        self,
+        *,
+        limit: Optional[int] = None,
+        platform: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+    ) -> Dict[str, Any]:
+        """
+        Resumen agregado.
+
+        Con date_from/date_to: suma de los buckets diarios del rango (coste por día, no por plan).
+        Sin rango: últimos `limit` plans (orden created_at descendente), como el resumen original.
+        """
+        with self._lock:
+            data = self._load_locked()
+            total = _empty_counters()
+            if date_from is not None or date_to is not None:
+                lo = date_from.isoformat() if date_from else ""
+                hi = date_to.isoformat() if date_to else "9999-12-31"
+                for day, platforms in data["days"].items():
+                    if not (lo <= day <= hi):
+                        continue
+                    for name, counters in platforms.items():
+                        if platform and name != platform:
+                            continue
+                        _add(total, counters)
+            else:
+                recent = [r for r in data["recent"] if not platform or r["platform"] == platform]
+                for entry in recent[: limit or MAX_RECENT]:
+                    _add(total, entry["counters"])
+        return summarize(total)
+
+    def daily(self, *, date_from: Optional[date] = None, date_to: Optional[date] = None) -> Dict[str, Dict[str, Any]]:
+        """Contadores por día y plataforma (copia) para series temporales del dashboard."""
+        lo = date_from.isoformat() if date_from else ""
+        hi = date_to.isoformat() if date_to else "9999-12-31"
+        with self._lock:
+            data = self._load_locked()
+            return copy.deepcopy({day: p for day, p in data["days"].items() if lo <= day <= hi})
+
+
+_STORES: Dict[tuple, MetricsRollupStoreV1] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_metrics_rollup(base_dir: Path, tenant_id: str = "default") -> MetricsRollupStoreV1:
+    """Store process-wide por (base_dir resuelto, tenant)."""
+    key = (str(Path(base_dir).resolve()), tenant_id)
+    with _STORES_LOCK:
+        store = _STORES.get(key)
+        if store is None:
+            store = MetricsRollupStoreV1(Path(base_dir), tenant_id)
+            _STORES[key] = store
+        return store
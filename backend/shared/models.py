@@ -37,6 +37,7 @@ class BrowserObservation(BaseModel):
     screenshot_path: Optional[str] = None  # v3.3.0: Ruta a captura de pantalla si está disponible
     ocr_text: Optional[str] = None  # v3.3.0: Texto extraído por OCR
     ocr_blocks: Optional[List[Dict[str, Any]]] = None  # v3.3.0: Bloques de texto OCR (serializable)
+    timings_ms: Optional[Dict[str, Any]] = None  # Tiempos de la observación (evaluate_ms, total_ms, roundtrips)
 
 
 class StepResult(BaseModel):
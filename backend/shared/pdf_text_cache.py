@@ -0,0 +1,239 @@
+"""
+Caché de extracción de texto PDF direccionada por contenido (sha256).
+
+Compartida por DocumentInspectorV1, DocumentAnalyzer, DeepDocumentAnalyzer y el flujo de
+upload: un PDF sin cambios nunca se vuelve a parsear con pypdf.
+
+- Clave: sha256 del fichero.
+- Valor: texto por página, nº de páginas, errores por página y tiempo de extracción.
+- LRU en memoria + almacén en disco: data/cache/pdf_text/<sha[:2]>/<sha256>.json
+- Extracción incremental: si un consumidor pidió solo las N primeras páginas y otro
+  necesita más, se extraen únicamente las que faltan.
+- El parseo se hace fuera del lock de la caché (solo se serializan extracciones del mismo
+  contenido); un resultado con páginas fallidas se devuelve pero no se cachea, así que se
+  reintenta en la siguiente extracción.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from backend.config import DATA_DIR
+
+
+DEFAULT_MEMORY_ENTRIES = 64
+# Locks por contenido (sha256 -> lock de un conjunto fijo): evita parsear dos veces el mismo PDF
+_EXTRACTION_LOCK_STRIPES = 32
+
+
+class PdfTextExtractionError(Exception):
+    """El PDF no se pudo abrir (no se cachea: puede ser un fichero a medio escribir)."""
+
+
+@dataclass
+class PdfTextV1:
+    """Texto extraído de un PDF (páginas en orden; None si la página falló)."""
+
+    sha256: str
+    page_count: int
+    pages: List[Optional[str]] = field(default_factory=list)
+    page_errors: Dict[int, str] = field(default_factory=dict)
+    extraction_ms: float = 0.0
+
+    @property
+    def complete(self) -> bool:
+        return len(self.pages) >= self.page_count
+
+    def text(self, max_pages: Optional[int] = None, sep: str = "\n") -> str:
+        """Concatena las páginas con texto (hasta max_pages)."""
+        pages = self.pages if max_pages is None else self.pages[:max_pages]
+        return sep.join(p for p in pages if p)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "sha256": self.sha256,
+            "page_count": self.page_count,
+            "pages": self.pages,
+            "page_errors": {str(k): v for k, v in self.page_errors.items()},
+            "extraction_ms": self.extraction_ms,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PdfTextV1":
+        return cls(
+            sha256=data["sha256"],
+            page_count=int(data["page_count"]),
+            pages=list(data.get("pages") or []),
+            page_errors={int(k): v for k, v in (data.get("page_errors") or {}).items()},
+            extraction_ms=float(data.get("extraction_ms") or 0.0),
+        )
+
+
+def sha256_file(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class PdfTextCacheV1:
+    """LRU en memoria + almacén JSON en disco, indexado por sha256."""
+
+    def __init__(self, cache_dir: Path, max_entries: int = DEFAULT_MEMORY_ENTRIES):
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, PdfTextV1]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._extraction_locks = [threading.Lock() for _ in range(_EXTRACTION_LOCK_STRIPES)]
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "extractions": 0}
+
+    def _disk_path(self, sha256: str) -> Path:
+        return self.cache_dir / sha256[:2] / f"{sha256}.json"
+
+    def _remember(self, entry: PdfTextV1) -> None:
+        self._memory[entry.sha256] = entry
+        self._memory.move_to_end(entry.sha256)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _lock_for(self, sha256: str) -> threading.Lock:
+        return self._extraction_locks[hash(sha256) % len(self._extraction_locks)]
+
+    def _load_disk(self, sha256: str) -> Optional[PdfTextV1]:
+        path = self._disk_path(sha256)
+        if not path.exists():
+            return None
+        try:
+            entry = PdfTextV1.from_dict(json.loads(path.read_text(encoding="utf-8")))
+        except Exception:
+            return None
+        # Entradas con páginas fallidas (versiones anteriores las guardaban): se reintentan
+        return None if entry.page_errors else entry
+
+    def _store_disk(self, entry: PdfTextV1) -> None:
+        path = self._disk_path(entry.sha256)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(mode="w", encoding="utf-8", delete=False, dir=path.parent) as tmp:
+                json.dump(entry.to_dict(), tmp, ensure_ascii=False)
+                tmp_path = Path(tmp.name)
+            tmp_path.replace(path)
+        except Exception as e:
+            print(f"[pdf_text_cache] No se pudo guardar en disco {entry.sha256}: {e}")
+
+    def get(self, sha256: str) -> Optional[PdfTextV1]:
+        """Entrada cacheada (memoria o disco) sin tocar el PDF."""
+        with self._lock:
+            entry = self._memory.get(sha256)
+            if entry is not None:
+                self._memory.move_to_end(sha256)
+                self.stats["memory_hits"] += 1
+                return entry
+            entry = self._load_disk(sha256)
+            if entry is not None:
+                self.stats["disk_hits"] += 1
+                self._remember(entry)
+            return entry
+
+    def extract(
+        self,
+        path: Path,
+        *,
+        reader_factory: Callable[[str], Any],
+        sha256: Optional[str] = None,
+        max_pages: Optional[int] = None,
+    ) -> PdfTextV1:
+        """
+        Texto del PDF (al menos max_pages páginas, o todas si None).
+
+        reader_factory: constructor del lector (pypdf.PdfReader del módulo llamante).
+        Lanza PdfTextExtractionError si el PDF no se puede abrir.
+        """
+        sha256 = sha256 or sha256_file(Path(path))
+        entry = self.get(sha256)
+        if _covers(entry, max_pages):
+            return entry
+
+        with self._lock_for(sha256):
+            # Otro hilo pudo extraer el mismo contenido mientras se esperaba el lock
+            entry = self.get(sha256)
+            if _covers(entry, max_pages):
+                return entry
+
+            started = time.perf_counter()
+            try:
+                reader = reader_factory(str(path))
+                pages = reader.pages
+                page_count = len(pages)
+            except Exception as e:
+                raise PdfTextExtractionError(repr(e)) from e
+
+            # Entrada nueva (no se modifica la cacheada: otros hilos pueden estar leyéndola)
+            result = PdfTextV1(
+                sha256=sha256,
+                page_count=page_count,
+                pages=list(entry.pages) if entry is not None else [],
+                extraction_ms=entry.extraction_ms if entry is not None else 0.0,
+            )
+            stop = page_count if max_pages is None else min(page_count, max_pages)
+            for i in range(len(result.pages), stop):
+                try:
+                    result.pages.append(pages[i].extract_text() or "")
+                except Exception as e:
+                    result.pages.append(None)
+                    result.page_errors[i] = repr(e)
+            result.extraction_ms += (time.perf_counter() - started) * 1000.0
+
+            with self._lock:
+                self.stats["extractions"] += 1
+                if not result.page_errors:
+                    self._remember(result)
+            if not result.page_errors:
+                self._store_disk(result)
+            return result
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._memory.clear()
+
+
+def _covers(entry: Optional[PdfTextV1], max_pages: Optional[int]) -> bool:
+    if entry is None:
+        return False
+    return entry.complete or (max_pages is not None and len(entry.pages) >= max_pages)
+
+
+_CACHE: Optional[PdfTextCacheV1] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_pdf_text_cache() -> PdfTextCacheV1:
+    """Caché process-wide (data/cache/pdf_text, o PDF_TEXT_CACHE_DIR)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            cache_dir = os.getenv("PDF_TEXT_CACHE_DIR") or str(Path(DATA_DIR) / "cache" / "pdf_text")
+            _CACHE = PdfTextCacheV1(Path(cache_dir))
+        return _CACHE
+
+
+def reset_pdf_text_cache(cache_dir: Optional[Path] = None) -> PdfTextCacheV1:
+    """Reinicia la caché process-wide (tests / cambio de data dir)."""
+    global _CACHE
+    with _CACHE_LOCK:
+        _CACHE = None
+    if cache_dir is not None:
+        with _CACHE_LOCK:
+            _CACHE = PdfTextCacheV1(Path(cache_dir))
+            return _CACHE
+    return get_pdf_text_cache()
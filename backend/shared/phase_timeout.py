@@ -23,6 +23,37 @@ DEFAULT_TIMEOUTS = {
     "pagination": 60,
 }
 
+# Presupuesto por defecto de UNA espera por condición dentro de cada fase (segundos).
+# Override por entorno: WAIT_BUDGET_<FASE>_S (p.ej. WAIT_BUDGET_GRID_LOAD_S=45).
+DEFAULT_WAIT_BUDGETS = {
+    "login": 25,
+    "navigation": 20,
+    "grid_load": 30,
+    "upload": 25,
+    "verification": 25,
+    "pagination": 10,
+}
+
+
+def get_wait_budget(phase: str, timeout_s: Optional[float] = None) -> float:
+    """
+    Presupuesto (segundos) de una espera por condición en una fase.
+    
+    Args:
+        phase: Fase (claves de DEFAULT_TIMEOUTS)
+        timeout_s: Presupuesto explícito del llamador (si None, env o DEFAULT_WAIT_BUDGETS[phase])
+    
+    Returns:
+        Presupuesto acotado al timeout de la fase (una espera nunca excede su fase)
+    """
+    if timeout_s is None:
+        env_value = os.getenv(f"WAIT_BUDGET_{phase.upper()}_S")
+        try:
+            timeout_s = float(env_value) if env_value else DEFAULT_WAIT_BUDGETS.get(phase, 20)
+        except ValueError:
+            timeout_s = DEFAULT_WAIT_BUDGETS.get(phase, 20)
+    return max(0.0, min(float(timeout_s), float(DEFAULT_TIMEOUTS.get(phase, 60))))
+
 
 class PhaseTimeoutError(Exception):
     """Excepción lanzada cuando se excede el timeout de una fase."""
@@ -0,0 +1,279 @@
+"""
+Índice persistente de runs (JSONL append-only por runs_root).
+
+El viewer de runs (/runs) parseaba trace.jsonl + manifest de cada run en cada vista y
+/api/runs/latest | /api/runs/summary ordenaban todos los directorios con glob: coste
+lineal con el histórico. Aquí cada run se registra al arrancar/terminar y los listados
+se sirven (filtrados y paginados) desde el índice en memoria:
+
+- ExecutorRuntimeH4 registra run_started / run_finished en <runs_root>/_run_index.jsonl.
+- save_run_summary registra los runs audit-ready en <tenant runs root>/_summary_index.jsonl.
+
+Una línea por actualización (la última gana); se compacta cuando las líneas obsoletas
+superan a las vigentes. Si el fichero no existe se reconstruye una vez escaneando el
+runs_root (borrar el fichero fuerza la reconstrucción). Cambios de otros procesos se
+detectan por (mtime, size) del fichero.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+
+EXECUTOR_INDEX_FILENAME = "_run_index.jsonl"
+SUMMARY_INDEX_FILENAME = "_summary_index.jsonl"
+
+RecordScan = Callable[[Path], Iterable[Dict[str, Any]]]
+SortKey = Callable[[Dict[str, Any]], Any]
+
+
+class RunIndexV1:
+    """Índice de runs de un runs_root: run_id -> registro (dict JSON)."""
+
+    def __init__(self, runs_root: Path, *, filename: str, scan: RecordScan, sort_key: SortKey):
+        self.runs_root = Path(runs_root)
+        self.path = self.runs_root / filename
+        self._scan = scan
+        self._sort_key = sort_key
+        self._lock = threading.RLock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._sorted: Optional[List[Dict[str, Any]]] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._lines = 0
+
+    # ----- carga -----
+
+    def _stat_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _ensure_loaded_locked(self) -> None:
+        signature = self._stat_signature()
+        if signature is None:
+            if self.runs_root.exists():
+                self._rebuild_locked()
+            else:
+                self._records, self._sorted, self._signature, self._lines = {}, None, None, 0
+            return
+        if signature == self._signature:
+            return
+        records: Dict[str, Dict[str, Any]] = {}
+        lines = 0
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except Exception:
+                    continue  # línea truncada (escritura interrumpida)
+                if isinstance(record, dict) and record.get("run_id"):
+                    records[record["run_id"]] = record
+                    lines += 1
+        self._records, self._sorted, self._signature, self._lines = records, None, signature, lines
+
+    def _write_all_locked(self, records: Dict[str, Dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(self.path.parent), prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for record in records.values():
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            os.replace(tmp, self.path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        self._records, self._sorted, self._lines = records, None, len(records)
+        self._signature = self._stat_signature()
+
+    def _rebuild_locked(self) -> None:
+        records: Dict[str, Dict[str, Any]] = {}
+        for record in self._scan(self.runs_root):
+            if record.get("run_id"):
+                records[record["run_id"]] = record
+        self._write_all_locked(records)
+
+    def rebuild(self) -> int:
+        """Reconstruye el índice escaneando el runs_root. Devuelve el número de runs."""
+        with self._lock:
+            self._rebuild_locked()
+            return len(self._records)
+
+    # ----- escritura -----
+
+    def upsert(self, record: Dict[str, Any]) -> None:
+        """Registra (o actualiza) un run. record debe incluir run_id."""
+        run_id = record.get("run_id")
+        if not run_id:
+            raise ValueError("record sin run_id")
+        with self._lock:
+            self._ensure_loaded_locked()
+            self.runs_root.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self._records[run_id] = dict(record)
+            self._sorted = None
+            self._lines += 1
+            self._signature = self._stat_signature()
+            if self._lines > 2 * len(self._records) + 100:
+                self._write_all_locked(dict(self._records))
+
+    # ----- consultas -----
+
+    def _sorted_locked(self) -> List[Dict[str, Any]]:
+        self._ensure_loaded_locked()
+        if self._sorted is None:
+            self._sorted = sorted(self._records.values(), key=self._sort_key, reverse=True)
+        return self._sorted
+
+    def get(self, run_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._ensure_loaded_locked()
+            record = self._records.get(run_id)
+            return dict(record) if record else None
+
+    def latest(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            ordered = self._sorted_locked()
+            return dict(ordered[0]) if ordered else None
+
+    def query(
+        self,
+        *,
+        where: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """Página de runs (más recientes primero) y total tras filtrar."""
+        with self._lock:
+            ordered = self._sorted_locked()
+            matched = [r for r in ordered if where(r)] if where else ordered
+            end = None if limit is None else offset + limit
+            return [dict(r) for r in matched[offset:end]], len(matched)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._ensure_loaded_locked()
+            return len(self._records)
+
+
+# ----- runs del executor (runs/<run_id>/trace.jsonl) -----
+
+
+def executor_run_record(
+    run_id: str,
+    *,
+    status: str,
+    started_at: Optional[str],
+    finished_at: Optional[str] = None,
+    duration_ms: Optional[int] = None,
+    mode: Optional[str] = None,
+    last_error: Optional[str] = None,
+    counters: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    return {
+        "run_id": run_id,
+        "started_at": started_at,
+        "finished_at": finished_at,
+        "status": status,
+        "mode": mode,
+        "last_error": last_error,
+        "duration_ms": duration_ms,
+        "counters": counters or {},
+    }
+
+
+def _scan_executor_runs(runs_root: Path) -> Iterable[Dict[str, Any]]:
+    from backend.executor.runs_viewer import parse_run
+
+    for run_dir in runs_root.iterdir():
+        if not run_dir.is_dir() or not (run_dir / "trace.jsonl").exists():
+            continue
+        try:
+            parsed = parse_run(run_dir)
+        except Exception as e:
+            print(f"[RunIndex] Error parseando {run_dir.name}: {e}")
+            continue
+        yield executor_run_record(
+            parsed.run_id,
+            status=parsed.status,
+            started_at=parsed.started_at,
+            finished_at=parsed.finished_at,
+            duration_ms=parsed.duration_ms,
+            mode=parsed.mode,
+            last_error=parsed.last_error,
+            counters=parsed.counters,
+        )
+
+
+def _executor_sort_key(record: Dict[str, Any]) -> Tuple[str, str]:
+    return (record.get("started_at") or "", record["run_id"])
+
+
+# ----- runs audit-ready (data/tenants/<tenant>/runs/<YYYYMMDD_HHMMSS>__<run_id>/) -----
+
+
+def summary_run_record(run_dir_name: str, summary: Dict[str, Any]) -> Dict[str, Any]:
+    context = summary.get("context") or {}
+    return {
+        "run_id": summary.get("run_id") or run_dir_name.split("__", 1)[-1],
+        "run_dir": run_dir_name,
+        "started_at": summary.get("started_at"),
+        "finished_at": summary.get("finished_at"),
+        "status": summary.get("status"),
+        "platform_key": context.get("platform_key"),
+        "dry_run": bool(summary.get("dry_run", False)),
+    }
+
+
+def _scan_summary_runs(runs_root: Path) -> Iterable[Dict[str, Any]]:
+    for run_dir in runs_root.glob("*__*"):
+        summary_path = run_dir / "summary.json"
+        if not summary_path.is_file():
+            continue
+        try:
+            summary = json.loads(summary_path.read_text(encoding="utf-8"))
+        except Exception as e:
+            print(f"[RunIndex] Error leyendo {summary_path}: {e}")
+            continue
+        yield summary_run_record(run_dir.name, summary)
+
+
+def _summary_sort_key(record: Dict[str, Any]) -> str:
+    return record.get("run_dir") or ""
+
+
+_INDEXES: Dict[Tuple[str, str], RunIndexV1] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def _get_index(runs_root: Path, filename: str, scan: RecordScan, sort_key: SortKey) -> RunIndexV1:
+    key = (str(Path(runs_root).resolve()), filename)
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(key)
+        if index is None:
+            index = RunIndexV1(Path(runs_root), filename=filename, scan=scan, sort_key=sort_key)
+            _INDEXES[key] = index
+        return index
+
+
+def get_executor_run_index(runs_root: Path) -> RunIndexV1:
+    """Índice process-wide de los runs del executor bajo runs_root."""
+    return _get_index(runs_root, EXECUTOR_INDEX_FILENAME, _scan_executor_runs, _executor_sort_key)
+
+
+def get_summary_run_index(runs_root: Path) -> RunIndexV1:
+    """Índice process-wide de los runs audit-ready (summary.json) bajo runs_root."""
+    return _get_index(runs_root, SUMMARY_INDEX_FILENAME, _scan_summary_runs, _summary_sort_key)
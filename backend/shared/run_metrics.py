@@ -16,6 +16,7 @@ from pathlib import Path
 import json
 
 from backend.config import DATA_DIR
+from backend.shared.metrics_rollup_v1 import get_metrics_rollup
 from backend.shared.tenant_paths import get_runs_root
 
 
@@ -23,6 +24,7 @@ class RunMetricsV1(BaseModel):
     """Métricas operativas de un run/plan."""
     run_id: Optional[str] = Field(None, description="ID del run (si es ejecución)")
     plan_id: str = Field(..., description="ID del plan")
+    platform: Optional[str] = Field(None, description="Plataforma del plan (rollups por plataforma)")
     total_items: int = Field(0, description="Total de items en el plan")
     decisions_count: Dict[str, int] = Field(
         default_factory=lambda: {
@@ -66,6 +68,7 @@ class RunMetricsV1(BaseModel):
         return {
             "run_id": self.run_id,
             "plan_id": self.plan_id,
+            "platform": self.platform,
             "total_items": self.total_items,
             "decisions_count": self.decisions_count,
             "source_breakdown": self.source_breakdown,
@@ -86,7 +89,13 @@ class RunMetricsV1(BaseModel):
         return cls(**data)
 
 
-def initialize_metrics(plan_id: str, total_items: int, base_dir: Path = None, tenant_id: str = "default") -> RunMetricsV1:
+def initialize_metrics(
+    plan_id: str,
+    total_items: int,
+    base_dir: Path = None,
+    tenant_id: str = "default",
+    platform: Optional[str] = None,
+) -> RunMetricsV1:
     """
     Inicializa métricas para un plan.
     
@@ -94,6 +103,7 @@ def initialize_metrics(plan_id: str, total_items: int, base_dir: Path = None, te
         plan_id: ID del plan
         total_items: Total de items en el plan
         base_dir: Directorio base (default: DATA_DIR)
+        platform: Plataforma del plan (ej: "egestiona")
     
     Returns:
         RunMetricsV1 inicializado
@@ -101,6 +111,7 @@ def initialize_metrics(plan_id: str, total_items: int, base_dir: Path = None, te
     base = Path(base_dir) if base_dir else Path(DATA_DIR)
     metrics = RunMetricsV1(
         plan_id=plan_id,
+        platform=platform,
         total_items=total_items,
     )
     metrics.timestamps["plan_created_at"] = datetime.now(timezone.utc).isoformat()
@@ -141,7 +152,8 @@ def load_metrics(plan_id: str, base_dir: Path = None, tenant_id: str = "default"
 
 def save_metrics(metrics: RunMetricsV1, base_dir: Path = None, tenant_id: str = "default") -> Path:
     """
-    Guarda métricas de un plan.
+    Guarda métricas de un plan y aplica el delta al rollup del tenant
+    (ver metrics_rollup_v1).
     
     Args:
         metrics: Métricas a guardar
@@ -156,12 +168,33 @@ def save_metrics(metrics: RunMetricsV1, base_dir: Path = None, tenant_id: str =
     metrics_path = runs_root / metrics.plan_id / "metrics.json"
     metrics_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Actualizar updated_at
-    metrics.updated_at = datetime.now(timezone.utc)
-    
-    # Guardar
-    with open(metrics_path, "w", encoding="utf-8") as f:
-        json.dump(metrics.to_dict(), f, indent=2, ensure_ascii=False)
+    # Lectura de la versión anterior, escritura y delta bajo el lock del rollup: dos
+    # save_metrics concurrentes del mismo plan no pueden aplicar el mismo "previous" dos veces
+    rollup = get_metrics_rollup(base, tenant_id)
+    with rollup.lock:
+        # El rollup se carga/reconstruye antes de escribir (si no, contaría el plan dos veces)
+        rollup.ensure_built()
+        
+        previous = None
+        if metrics_path.exists():
+            try:
+                with open(metrics_path, "r", encoding="utf-8") as f:
+                    previous = json.load(f)
+            except Exception as e:
+                print(f"[RunMetrics] Error reading previous metrics: {e}")
+        
+        # Actualizar updated_at
+        metrics.updated_at = datetime.now(timezone.utc)
+        
+        # Guardar
+        data = metrics.to_dict()
+        with open(metrics_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        
+        try:
+            rollup.apply(previous, data)
+        except Exception as e:
+            print(f"[RunMetrics] Error updating metrics rollup: {e}")
     
     return metrics_path
 
@@ -103,11 +103,20 @@ def save_run_summary(
         input_data: Datos de input (plan/preset/pack) para input.json
         result_data: Datos de resultado para result.json
     """
+    from backend.shared.run_index_v1 import get_summary_run_index, summary_run_record
+    
     # Guardar summary.json
     summary_path = run_dir / "summary.json"
+    summary_data = summary.model_dump(mode="json", exclude_none=True)
     with open(summary_path, "w", encoding="utf-8") as f:
         import json
-        json.dump(summary.model_dump(mode="json", exclude_none=True), f, indent=2, ensure_ascii=False, default=str)
+        json.dump(summary_data, f, indent=2, ensure_ascii=False, default=str)
+    
+    # Registrar en el índice de runs del tenant (listados sin glob de todos los run dirs)
+    try:
+        get_summary_run_index(run_dir.parent).upsert(summary_run_record(run_dir.name, summary_data))
+    except Exception as e:
+        print(f"[save_run_summary] Error actualizando índice de runs: {e}")
     
     # Guardar summary.md (humano)
     summary_md_path = run_dir / "summary.md"
@@ -189,6 +198,7 @@ def list_run_summaries(
     limit: int = 50,
     platform: Optional[str] = None,
     tenant_id: str = "default",
+    offset: int = 0,
 ) -> List[Dict[str, Any]]:
     """
     Lista summaries de runs recientes.
@@ -196,14 +206,19 @@ def list_run_summaries(
     SPRINT C2.16: Función legacy para compatibilidad con runs_summary_routes.
     SPRINT C2.29: Adaptada para usar estructura de directorios nueva.
     
+    Filtra y pagina sobre el índice de runs del tenant; solo lee los summary.json
+    de la página devuelta.
+    
     Args:
         limit: Límite de resultados
         platform: Filtrar por plataforma (opcional)
         tenant_id: ID del tenant
+        offset: Runs a saltar (paginación)
     
     Returns:
         Lista de diccionarios con información de runs
     """
+    from backend.shared.run_index_v1 import get_summary_run_index
     from backend.shared.tenant_paths import tenant_runs_root
     from backend.config import DATA_DIR
     import json
@@ -213,28 +228,18 @@ def list_run_summaries(
     if not runs_root.exists():
         return []
     
-    # Buscar directorios de runs
-    run_dirs = sorted(runs_root.glob("*__*"), key=lambda p: p.name, reverse=True)
+    records, _ = get_summary_run_index(runs_root).query(
+        where=(lambda r: r.get("platform_key") == platform) if platform else None,
+        offset=offset,
+        limit=limit,
+    )
     
     summaries = []
-    for run_dir in run_dirs[:limit]:
-        summary_path = run_dir / "summary.json"
-        if not summary_path.exists():
-            continue
-        
+    for record in records:
+        summary_path = runs_root / record["run_dir"] / "summary.json"
         try:
             with open(summary_path, "r", encoding="utf-8") as f:
-                summary_data = json.load(f)
-            
-            # Filtrar por plataforma si se especifica
-            if platform:
-                context = summary_data.get("context", {})
-                if context.get("platform_key") != platform:
-                    continue
-            
-            # Convertir a formato legacy si es necesario
-            summaries.append(summary_data)
-        
+                summaries.append(json.load(f))
         except Exception as e:
             print(f"[list_run_summaries] Error loading {summary_path}: {e}")
             continue
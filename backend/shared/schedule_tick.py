@@ -142,11 +142,11 @@ def execute_schedule_tick(
                 # Ejecutar realmente
                 # Construir contexto desde schedule
                 from backend.api.runs_routes import _execute_schedule_run
-                from backend.repository.config_store_v1 import ConfigStoreV1
+                from backend.repository.repository_service_v1 import get_config_store
                 from backend.api.coordination_context_routes import CompanyOptionV1
                 
                 # Obtener nombres desde ConfigStore
-                store = ConfigStoreV1(base_dir=DATA_DIR)
+                store = get_config_store(DATA_DIR)
                 org = store.load_org()
                 platforms_data = store.load_platforms()
                 
@@ -0,0 +1,81 @@
+"""
+I/O de almacenamiento fuera del event loop.
+
+Varios handlers `async def` escaneaban directorios (meta/, runs/, decision packs) o
+hasheaban PDFs directamente en el event loop: un listado lento bloqueaba todas las
+peticiones concurrentes (incluido /api/health y el polling de progreso de jobs).
+
+- run_storage_io(fn, ...): ejecuta una función síncrona en un executor acotado
+  (STORAGE_IO_WORKERS, por defecto 8), separado del threadpool de Starlette.
+- AsyncStoreV1 / async_store(store): fachada async de cualquier store
+  (`await async_store(store).list_documents(...)`).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, TypeVar
+
+T = TypeVar("T")
+
+DEFAULT_STORAGE_IO_WORKERS = 8
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_EXECUTOR_LOCK = threading.Lock()
+
+
+def get_storage_executor() -> ThreadPoolExecutor:
+    """Executor process-wide para I/O de stores."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        if _EXECUTOR is None:
+            try:
+                workers = int(os.getenv("STORAGE_IO_WORKERS", str(DEFAULT_STORAGE_IO_WORKERS)))
+            except ValueError:
+                workers = DEFAULT_STORAGE_IO_WORKERS
+            _EXECUTOR = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="storage-io")
+        return _EXECUTOR
+
+
+async def run_storage_io(fn: Callable[..., T], /, *args: Any, **kwargs: Any) -> T:
+    """Ejecuta fn(*args, **kwargs) en el executor de I/O (propaga contextvars y excepciones)."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    call = functools.partial(ctx.run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_storage_executor(), call)
+
+
+class AsyncStoreV1:
+    """Fachada async: cada método del store se ejecuta en el executor de I/O."""
+
+    def __init__(self, store: Any):
+        self._store = store
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._store, name)
+        if not callable(attr):
+            return attr
+
+        async def _call(*args: Any, **kwargs: Any) -> Any:
+            return await run_storage_io(attr, *args, **kwargs)
+
+        _call.__name__ = name
+        return _call
+
+
+def async_store(store: Any) -> AsyncStoreV1:
+    return AsyncStoreV1(store)
+
+
+def shutdown_storage_executor() -> None:
+    """Shutdown de la app: cierra el executor (se recrea bajo demanda)."""
+    global _EXECUTOR
+    with _EXECUTOR_LOCK:
+        executor, _EXECUTOR = _EXECUTOR, None
+    if executor is not None:
+        executor.shutdown(wait=False)
@@ -111,11 +111,11 @@ def make_upload_decision(
     candidates = match_result.get("candidates", [])
     
     # Verificar que el archivo existe
-    from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+    from backend.repository.repository_service_v1 import get_repository_store
     from backend.repository.data_bootstrap_v1 import ensure_data_layout
     
     ensure_data_layout(base_dir=base_dir)
-    doc_repo = DocumentRepositoryStoreV1(base_dir=base_dir)
+    doc_repo = get_repository_store(base_dir)
     
     doc_id = best_doc.get("doc_id")
     file_exists = False
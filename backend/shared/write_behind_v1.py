@@ -0,0 +1,270 @@
+"""
+Caché write-behind para documentos JSON de aprendizaje (memoria visual, RL, MemoryStore).
+
+Cada evento de aprendizaje (clic, transición RL, outcome) modificaba un contador y reescribía
+el JSON completo. Aquí los documentos viven en memoria (con índices por clave definidos por
+cada store) y solo los sucios se escriben a disco:
+
+- cada LEARNING_FLUSH_INTERVAL_S segundos (hilo daemon; 0 = escritura inmediata)
+- al terminar un run (flush_learning_stores): batch CAE (cae_batch_adapter), episodio RL
+  del planificador híbrido y tras guardar la memoria de plataforma en /agent/answer
+- en el shutdown de la app y al salir del proceso (atexit)
+
+Las escrituras son atómicas (tmp en el mismo directorio + fsync + os.replace): un crash deja
+el fichero anterior o el nuevo, nunca uno a medias.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+DEFAULT_FLUSH_INTERVAL_S = 2.0
+
+
+def atomic_write_json(path: Path, payload: Any) -> None:
+    """Escribe JSON de forma atómica y durable (tmp + fsync + replace)."""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=str(path.parent))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+
+def _file_signature(path: Path) -> Optional[tuple]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+class _Entry:
+    __slots__ = ("doc", "serialize", "dirty", "signature", "version", "missing_dir_warned")
+
+    def __init__(self, doc: Any, serialize: Callable[[Any], Any], signature: Optional[tuple]):
+        self.doc = doc
+        self.serialize = serialize
+        self.dirty = False
+        self.signature = signature
+        self.version = 0
+        self.missing_dir_warned = False
+
+
+class WriteBehindCacheV1:
+    """
+    Documentos en memoria indexados por ruta de fichero.
+
+    El doc es un objeto propio de cada store (p.ej. política + índice por (state, action));
+    serialize(doc) produce el payload JSON. Un doc limpio se recarga si el fichero cambió
+    fuera del proceso (mtime/tamaño); uno sucio siempre prevalece hasta el flush.
+
+    Los docs se modifican con mutate(): la mutación corre bajo el mismo lock con el que el
+    flush los serializa, y el get-or-create es atómico (dos creadores concurrentes comparten doc).
+    """
+
+    def __init__(self, flush_interval_s: Optional[float] = None):
+        if flush_interval_s is None:
+            try:
+                flush_interval_s = float(os.getenv("LEARNING_FLUSH_INTERVAL_S", str(DEFAULT_FLUSH_INTERVAL_S)))
+            except ValueError:
+                flush_interval_s = DEFAULT_FLUSH_INTERVAL_S
+        self.flush_interval_s = flush_interval_s
+        self._entries: Dict[Path, _Entry] = {}
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {"hits": 0, "loads": 0, "updates": 0, "writes": 0}
+
+    def get(
+        self,
+        path: Path,
+        load: Callable[[Path], Optional[Any]],
+        serialize: Callable[[Any], Any],
+    ) -> Optional[Any]:
+        """Doc en memoria para path; load(path) lo construye desde disco si no está o cambió."""
+        path = Path(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            signature = _file_signature(path)
+            if entry is not None and (entry.dirty or entry.signature == signature):
+                self.stats["hits"] += 1
+                return entry.doc
+            doc = load(path) if signature is not None else None
+            self.stats["loads"] += 1
+            if doc is None:
+                self._entries.pop(path, None)
+                return None
+            self._entries[path] = _Entry(doc, serialize, signature)
+            return doc
+
+    def put(self, path: Path, doc: Any, serialize: Callable[[Any], Any]) -> None:
+        """Registra doc como versión actual (sucia) de path; se escribirá en el próximo flush."""
+        path = Path(path)
+        with self._lock:
+            self._mark_dirty_locked(path, doc, serialize)
+        self._schedule_flush(path)
+
+    def mutate(
+        self,
+        path: Path,
+        load: Callable[[Path], Optional[Any]],
+        serialize: Callable[[Any], Any],
+        create: Callable[[], Any],
+        fn: Callable[[Any], Any],
+    ) -> Any:
+        """
+        Aplica fn(doc) al doc de path bajo el lock de la caché y lo marca sucio.
+
+        Si no hay doc (ni en memoria ni en disco) se construye con create() y se registra en la
+        misma sección crítica. Retorna lo que devuelva fn. Si fn lanza, el doc no se marca sucio.
+        """
+        path = Path(path)
+        with self._lock:
+            doc = self.get(path, load, serialize)
+            if doc is None:
+                doc = create()
+            result = fn(doc)
+            self._mark_dirty_locked(path, doc, serialize)
+        self._schedule_flush(path)
+        return result
+
+    def _mark_dirty_locked(self, path: Path, doc: Any, serialize: Callable[[Any], Any]) -> None:
+        entry = self._entries.get(path)
+        if entry is None or entry.doc is not doc:
+            entry = _Entry(doc, serialize, _file_signature(path))
+            self._entries[path] = entry
+        entry.serialize = serialize
+        entry.dirty = True
+        entry.version += 1
+        self.stats["updates"] += 1
+
+    def _schedule_flush(self, path: Path) -> None:
+        if self.flush_interval_s <= 0:
+            self.flush(path)
+        else:
+            self._ensure_flusher()
+
+    def write_through(self, path: Path, doc: Any, serialize: Callable[[Any], Any]) -> None:
+        """Escritura inmediata (save_* explícito): actualiza memoria y disco."""
+        path = Path(path)
+        with self._lock:
+            entry = _Entry(doc, serialize, None)
+            entry.dirty = True
+            self._entries[path] = entry
+        self.flush(path, raise_errors=True)
+
+    def invalidate(self, path: Path) -> None:
+        with self._lock:
+            self._entries.pop(Path(path), None)
+
+    def flush(self, path: Optional[Path] = None, *, raise_errors: bool = False) -> int:
+        """
+        Escribe los docs sucios (todos o solo path). Retorna cuántos se escribieron.
+
+        Los payloads se serializan bajo el lock y se escriben fuera de él: las actualizaciones
+        concurrentes no esperan al disco (quedan sucias para el siguiente flush). Un doc cuyo
+        directorio no existe tampoco se descarta: sigue sucio y se reintenta en el siguiente flush.
+        """
+        with self._io_lock:
+            with self._lock:
+                if path is not None:
+                    entry = self._entries.get(Path(path))
+                    candidates = [(Path(path), entry)] if entry is not None and entry.dirty else []
+                else:
+                    candidates = [(p, e) for p, e in self._entries.items() if e.dirty]
+                pending = []
+                for p, entry in candidates:
+                    if not p.parent.exists():
+                        # El directorio desapareció: no recrearlo, pero tampoco perder el doc
+                        if not entry.missing_dir_warned:
+                            logger.warning(f"[write-behind] Directorio inexistente, {p} queda pendiente")
+                            entry.missing_dir_warned = True
+                        continue
+                    entry.missing_dir_warned = False
+                    pending.append((p, entry, entry.version, entry.serialize(entry.doc)))
+
+            written = 0
+            for p, entry, version, payload in pending:
+                try:
+                    atomic_write_json(p, payload)
+                except Exception as e:
+                    if raise_errors:
+                        raise
+                    logger.warning(f"[write-behind] Error escribiendo {p}: {e}")
+                    continue
+                written += 1
+                with self._lock:
+                    entry.signature = _file_signature(p)
+                    if entry.version == version:
+                        entry.dirty = False
+            with self._lock:
+                self.stats["writes"] += written
+            return written
+
+    def dirty_count(self) -> int:
+        with self._lock:
+            return sum(1 for e in self._entries.values() if e.dirty)
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._flush_loop, name="learning-write-behind", daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self) -> None:
+        while not self._stop.wait(self.flush_interval_s):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.warning(f"[write-behind] Error en flush periódico: {e}")
+
+    def close(self) -> None:
+        """Para el hilo de flush y escribe lo pendiente."""
+        self._stop.set()
+        self.flush()
+
+
+_CACHE: Optional[WriteBehindCacheV1] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_learning_cache() -> WriteBehindCacheV1:
+    """Caché compartida por los stores de aprendizaje del proceso."""
+    global _CACHE
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = WriteBehindCacheV1()
+        return _CACHE
+
+
+def flush_learning_stores() -> int:
+    """Vuelca a disco todas las actualizaciones pendientes (fin de run / shutdown)."""
+    with _CACHE_LOCK:
+        cache = _CACHE
+    return cache.flush() if cache is not None else 0
+
+
+atexit.register(flush_learning_stores)
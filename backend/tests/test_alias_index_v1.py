@@ -0,0 +1,108 @@
+"""
+Tests del índice de aliases precompilado (AliasIndexV1).
+"""
+
+import re
+from unittest.mock import patch
+
+import pytest
+
+from backend.repository.alias_index_v1 import AliasIndexV1, get_alias_index
+from backend.repository.document_catalog_v1 import reset_document_catalogs
+from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.shared.document_repository_v1 import (
+    DocumentScopeV1,
+    DocumentTypeV1,
+    MonthlyValidityConfigV1,
+    ValidityPolicyV1,
+)
+from backend.shared.text_normalizer import normalize_text
+
+
+def _type(type_id, name, aliases):
+    return DocumentTypeV1(
+        type_id=type_id,
+        name=name,
+        scope=DocumentScopeV1.worker,
+        validity_policy=ValidityPolicyV1(mode="monthly", basis="name_date", monthly=MonthlyValidityConfigV1()),
+        platform_aliases=aliases,
+    )
+
+
+TYPES = [
+    _type("A", "Recibo autónomos", ["T205.0", "T104.0 Recibo autónomos", "cuota autónomos", "recibo"]),
+    _type("B", "Formación PRL", ["T301 Formación", "formación prl", "prl"]),
+    _type("C", "Seguro RC", ["seguro responsabilidad civil", "RC", "T205"]),
+    _type("D", "Sin aliases", []),
+]
+
+
+def _reference_find_matching_types(types, base_text):
+    """Implementación previa (alias por alias) usada como referencia."""
+    base_normalized = normalize_text(base_text)
+    if not base_normalized:
+        return []
+    code_match = re.match(r'^([Tt]\d+(?:\.\d+)?)', base_text)
+    detected_code = code_match.group(1) if code_match else None
+    matches = []
+    for doc_type in types:
+        best = 0.0
+        for alias in doc_type.platform_aliases:
+            alias_normalized = normalize_text(alias)
+            if not alias_normalized:
+                continue
+            if detected_code:
+                alias_code_match = re.match(r'^([Tt]\d+(?:\.\d+)?)', alias)
+                if alias_code_match and alias_code_match.group(1).upper() == detected_code.upper():
+                    best = max(best, 0.9)
+                    continue
+            if alias_normalized in base_normalized:
+                best = max(best, 0.75 if base_normalized.startswith(alias_normalized) else 0.6)
+        if best > 0.0:
+            matches.append((doc_type, best))
+    matches.sort(key=lambda x: x[1], reverse=True)
+    return matches
+
+
+@pytest.mark.parametrize("text", [
+    "T205.0 Último recibo bancario pago cuota autónomos",
+    "t205.0 algo",
+    "T205 Seguro",
+    "Formación PRL trabajador",
+    "Certificado de formación prl y recibo",
+    "nada que ver",
+    "",
+    "RC general",
+])
+def test_index_matches_reference_scan(text):
+    index = AliasIndexV1(TYPES)
+    got = [(t.type_id, c) for t, c in index.find_matching_types(text)]
+    expected = [(t.type_id, c) for t, c in _reference_find_matching_types(TYPES, text)]
+    assert got == expected
+
+
+def test_contained_aliases_and_code_map():
+    index = AliasIndexV1(TYPES)
+    found = index.contained_aliases(normalize_text("pago cuota autónomos y formación prl"))
+    assert {alias for alias, _ in found["A"]} == {"cuota autónomos"}
+    assert {alias for alias, _ in found["B"]} == {"formación prl", "prl"}
+    assert index.types_for_code("t205") == {"C"}
+    assert index.types_for_code("T205.0") == {"A"}
+
+
+def test_shared_index_rebuilt_only_when_types_change(tmp_path):
+    reset_document_catalogs()
+    with patch('backend.repository.document_repository_store_v1.load_settings') as mock_settings:
+        class MockSettings:
+            repository_root_dir = str(tmp_path / "repository")
+        mock_settings.return_value = MockSettings()
+        store = DocumentRepositoryStoreV1(base_dir=str(tmp_path))
+
+    first = get_alias_index(store)
+    assert get_alias_index(store) is first
+
+    store.create_type(_type("NEW", "Nuevo", ["alias nuevo"]))
+    second = get_alias_index(store)
+    assert second is not first
+    assert [t.type_id for t, _ in second.find_matching_types("alias nuevo")] == ["NEW"]
+    reset_document_catalogs()
@@ -0,0 +1,206 @@
+"""
+Tests de runs eGestiona en segundo plano (executor propio, progreso SSE y cancelación).
+"""
+
+import json
+import threading
+import time
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.adapters.egestiona import background_run_routes, flows
+from backend.runs import background_runs_v1
+from backend.runs.background_runs_v1 import (
+    BackgroundRunManagerV1,
+    BackgroundRunStatus,
+    cancel_requested,
+    raise_if_canceled,
+    report_progress,
+)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    manager = BackgroundRunManagerV1(max_workers=1)
+    monkeypatch.setattr(background_runs_v1, "_MANAGER", manager)
+    yield manager
+    manager.shutdown(wait=True)
+
+
+@pytest.fixture
+def client(manager):
+    app = FastAPI()
+    app.include_router(flows.router)
+    app.include_router(background_run_routes.router)
+    return TestClient(app)
+
+
+def _wait_terminal(run, timeout=5.0):
+    deadline = time.time() + timeout
+    while not run.is_terminal and time.time() < deadline:
+        time.sleep(0.01)
+    assert run.is_terminal
+
+
+def test_flow_endpoint_returns_run_id_immediately(client, manager, monkeypatch):
+    release = threading.Event()
+
+    def fake_login(**kwargs):
+        report_progress("login ok")
+        release.wait(5)
+        return "r_flow123"
+
+    monkeypatch.setattr(flows, "run_login_and_snapshot", fake_login)
+
+    resp = client.post("/runs/egestiona/login", params={"coord": "Kern"})
+    assert resp.status_code == 200
+    body = resp.json()
+    run_id = body["run_id"]
+    assert run_id.startswith("bg_")
+    assert body["events_url"] == f"/runs/egestiona/background/{run_id}/events"
+
+    release.set()
+    _wait_terminal(manager.get(run_id))
+    status = client.get(f"/runs/egestiona/background/{run_id}").json()
+    assert status["status"] == "SUCCESS"
+    assert status["result"] == {"run_id": "r_flow123", "runs_url": "/runs/r_flow123"}
+    assert "login ok" in [e["message"] for e in status["events"]]
+
+    # SSE: timeline completo y evento final de estado
+    stream = client.get(f"/runs/egestiona/background/{run_id}/events")
+    assert stream.headers["content-type"].startswith("text/event-stream")
+    chunks = [c for c in stream.text.split("\n\n") if c.strip()]
+    assert chunks[-1].startswith("event: status")
+    assert json.loads(chunks[-1].split("data: ", 1)[1])["status"] == "SUCCESS"
+    assert sum(1 for c in chunks if "event: timeline" in c) == status["event_count"]
+
+    # wait=True conserva la respuesta bloqueante legacy
+    legacy = client.post("/runs/egestiona/login", params={"coord": "Kern", "wait": True})
+    assert legacy.json() == {"run_id": "r_flow123", "runs_url": "/runs/r_flow123"}
+
+
+def test_flow_errors_keep_http_status(client, manager, monkeypatch):
+    def fake_login(**kwargs):
+        raise ValueError("coordinación desconocida")
+
+    monkeypatch.setattr(flows, "run_login_and_snapshot", fake_login)
+
+    legacy = client.post("/runs/egestiona/login", params={"coord": "X", "wait": True})
+    assert legacy.status_code == 400
+
+    run_id = client.post("/runs/egestiona/login", params={"coord": "X"}).json()["run_id"]
+    _wait_terminal(manager.get(run_id))
+    status = client.get(f"/runs/egestiona/background/{run_id}").json()
+    assert status["status"] == "FAILED"
+    assert status["error"] == {"status_code": 400, "detail": "coordinación desconocida"}
+
+
+def test_cancel_queued_and_running_runs(manager):
+    started = threading.Event()
+    steps = []
+
+    def long_flow():
+        started.set()
+        for i in range(500):
+            if cancel_requested():
+                return "partial"
+            steps.append(i)
+            time.sleep(0.01)
+        return "done"
+
+    running = manager.submit("long", long_flow)
+    queued = manager.submit("queued", lambda: pytest.fail("no debe ejecutarse"))
+    assert started.wait(5)
+
+    assert manager.cancel(queued.run_id).status == BackgroundRunStatus.CANCELED
+    manager.cancel(running.run_id)
+    _wait_terminal(running)
+    assert running.status == BackgroundRunStatus.CANCELED
+    assert len(steps) < 500
+    assert [r.run_id for r in manager.list_runs()] == [queued.run_id, running.run_id]
+
+
+def test_executor_is_bounded(manager):
+    gate = threading.Event()
+    active = []
+    peak = []
+
+    def job():
+        active.append(1)
+        peak.append(len(active))
+        gate.wait(5)
+        active.pop()
+        return True
+
+    runs = [manager.submit("job", job) for _ in range(3)]
+    time.sleep(0.1)
+    assert [r.status for r in runs].count(BackgroundRunStatus.RUNNING) == 1
+    gate.set()
+    for run in runs:
+        _wait_terminal(run)
+    assert max(peak) == 1
+
+
+def test_sse_resume_after_and_last_event_id_agree(client, manager):
+    run = manager.submit("short", lambda: report_progress("paso"))
+    _wait_terminal(run)
+    url = f"/runs/egestiona/background/{run.run_id}/events"
+
+    def _ids(resp):
+        return [int(c.split("\n", 1)[0][4:]) for c in resp.text.split("\n\n") if c.startswith("id: ")]
+
+    all_ids = _ids(client.get(url))
+    assert all_ids == list(range(run.timeline.get_event_count()))
+    # ?after=N y Last-Event-ID: N significan "último recibido": se reanuda en N+1
+    assert _ids(client.get(url, params={"after": 1})) == all_ids[2:]
+    assert _ids(client.get(url, headers={"Last-Event-ID": "1"})) == all_ids[2:]
+
+
+def test_headful_checkpoints_stop_canceled_runs(manager):
+    started, go_on = threading.Event(), threading.Event()
+    pages = []
+
+    def plan_builder():
+        raise_if_canceled("login")
+        started.set()
+        go_on.wait(5)
+        for page in range(10):
+            raise_if_canceled(f"grid_page_{page}")
+            pages.append(page)
+        return "plan"
+
+    run = manager.submit("plan", plan_builder)
+    assert started.wait(5)
+    manager.cancel(run.run_id)
+    go_on.set()
+    _wait_terminal(run)
+    assert run.status == BackgroundRunStatus.CANCELED and pages == []
+    assert "Cancelación atendida en grid_page_0" in [e.message for e in run.timeline.get_events()]
+    raise_if_canceled("fuera de un run")  # no-op fuera del executor
+
+
+def test_readonly_plan_builder_runs_in_background(client, manager, monkeypatch):
+    release = threading.Event()
+
+    def fake_plan(**kwargs):
+        release.wait(5)
+        return {"plan": [], "summary": {"pending_count": 0}, "pending_items": [], "match_results": []}
+
+    monkeypatch.setattr(flows, "run_build_submission_plan_readonly_headful", fake_plan)
+    params = {"coord": "Kern", "company_key": "B12345678"}
+
+    body = client.post("/runs/egestiona/build_submission_plan_readonly", params=params).json()
+    assert body["status_url"] == f"/runs/egestiona/background/{body['run_id']}"
+    run = manager.get(body["run_id"])
+    assert run.kind == "build_submission_plan_readonly" and not run.is_terminal
+
+    release.set()
+    _wait_terminal(run)
+    result = client.get(body["status_url"]).json()["result"]
+    assert result["status"] == "ok" and result["items"] == []
+
+    # wait=True (y callers internos como /runs/auto_upload/plan) recibe el plan directamente
+    legacy = client.post("/runs/egestiona/build_submission_plan_readonly", params={**params, "wait": True})
+    assert legacy.json()["status"] == "ok" and legacy.json()["items"] == []
@@ -0,0 +1,249 @@
+"""
+Tests del almacén de PDFs direccionado por contenido (blobs/<aa>/<sha256>): deduplicación
+en el upload, exportación docs/<doc_id>.pdf por hardlink/copia, consulta de duplicados,
+subida por referencia, reemplazo sin alterar blobs compartidos y GC de huérfanos.
+"""
+
+import hashlib
+import io
+import os
+import stat
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.repository import blob_store_v1, document_repository_routes
+from backend.repository.blob_store_v1 import BlobStoreV1
+from backend.repository.compliance_calendar_v1 import reset_compliance_calendars
+from backend.repository.document_catalog_v1 import reset_document_catalogs
+from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_backends_v1 import close_sqlite_connections
+from backend.shared.document_repository_v1 import DocumentInstanceV1, DocumentScopeV1
+
+PDF = b"%PDF-1.4\ncertificado PRL\n%%EOF\n"
+PDF_SHA = hashlib.sha256(PDF).hexdigest()
+
+
+def _make_store(tmp_path, backend="json"):
+    with patch('backend.repository.document_repository_store_v1.load_settings') as mock_settings:
+        class MockSettings:
+            repository_root_dir = str(tmp_path / "repository")
+            storage_backend = backend
+        mock_settings.return_value = MockSettings()
+        return DocumentRepositoryStoreV1(base_dir=str(tmp_path))
+
+
+@pytest.fixture(autouse=True)
+def _isolate():
+    reset_document_catalogs()
+    reset_compliance_calendars()
+    yield
+    close_sqlite_connections()
+    reset_compliance_calendars()
+    reset_document_catalogs()
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    store = _make_store(tmp_path)
+    monkeypatch.setattr(document_repository_routes, "get_repository_store", lambda: store)
+    app = FastAPI()
+    app.include_router(document_repository_routes.router)
+    return store, TestClient(app)
+
+
+def _upload(client, person_key, content=PDF, name="prl_2025-01.pdf"):
+    return client.post(
+        "/api/repository/docs/upload",
+        files={"file": (name, io.BytesIO(content), "application/pdf")},
+        data={"type_id": "T104_AUTONOMOS_RECEIPT", "scope": "worker", "company_key": "C1", "person_key": person_key},
+    )
+
+
+def test_put_is_deduplicated_and_export_replaces_atomically(tmp_path, monkeypatch):
+    blobs = BlobStoreV1(tmp_path / "blobs")
+    first = blobs.put_stream(io.BytesIO(PDF))
+    second = blobs.put_file(first.path)
+    assert first.created and not second.created
+    assert first.sha256 == PDF_SHA and first.path == tmp_path / "blobs" / PDF_SHA[:2] / PDF_SHA
+    assert list(blobs.tmp_dir.iterdir()) == []
+
+    target = tmp_path / "docs" / "a.pdf"
+    assert blobs.export(PDF_SHA, target) == "hardlink"
+    assert os.path.samefile(target, first.path)
+
+    other = blobs.put_stream(io.BytesIO(b"%PDF-otro"))
+    blobs.export(other.sha256, target)  # sustitución, no reescritura en sitio
+    assert first.path.read_bytes() == PDF and target.read_bytes() == b"%PDF-otro"
+
+    monkeypatch.setenv("REPOSITORY_BLOB_EXPORT", "copy")
+    assert blobs.export(PDF_SHA, tmp_path / "docs" / "b.pdf") == "copy"
+    assert not os.path.samefile(tmp_path / "docs" / "b.pdf", first.path)
+
+
+def test_uploads_of_the_same_content_share_one_blob(client):
+    store, http = client
+    a = _upload(http, "P1").json()
+    b = _upload(http, "P2").json()
+
+    assert a["sha256"] == b["sha256"] == PDF_SHA
+    assert [sha for sha, _ in store.blobs.iter_blobs()] == [PDF_SHA]
+    pdf_a, pdf_b = store._get_doc_pdf_path(a["doc_id"]), store._get_doc_pdf_path(b["doc_id"])
+    assert os.path.samefile(pdf_a, pdf_b) and pdf_a.read_bytes() == PDF
+
+    info = http.get(f"/api/repository/blobs/{PDF_SHA}").json()
+    assert info["exists"] and info["refcount"] == 2 and info["size_bytes"] == len(PDF)
+    assert sorted(info["doc_ids"]) == sorted([a["doc_id"], b["doc_id"]])
+    assert http.get("/api/repository/blobs/nope").status_code == 400
+
+    # Subida por referencia: sin reenviar el PDF
+    by_ref = http.post(
+        "/api/repository/docs/upload",
+        data={"type_id": "T104_AUTONOMOS_RECEIPT", "scope": "worker", "company_key": "C1",
+              "person_key": "P3", "content_sha256": PDF_SHA, "file_name": "prl_2025-01.pdf"},
+    )
+    assert by_ref.status_code == 200 and by_ref.json()["file_name_original"] == "prl_2025-01.pdf"
+    assert store.blob_refcounts()[PDF_SHA] == 3
+    missing = http.post(
+        "/api/repository/docs/upload",
+        data={"type_id": "T104_AUTONOMOS_RECEIPT", "scope": "worker", "company_key": "C1",
+              "person_key": "P4", "content_sha256": "0" * 64, "file_name": "x.pdf"},
+    )
+    assert missing.status_code == 404
+
+    # Reemplazar el PDF de un documento no altera a los que comparten el blob
+    replaced = http.put(
+        f"/api/repository/docs/{a['doc_id']}/pdf",
+        files={"file": ("nuevo.pdf", io.BytesIO(b"%PDF-nuevo"), "application/pdf")},
+    ).json()
+    assert replaced["sha256"] == hashlib.sha256(b"%PDF-nuevo").hexdigest()
+    assert pdf_a.read_bytes() == b"%PDF-nuevo" and pdf_b.read_bytes() == PDF
+
+
+def test_gc_removes_only_unreferenced_blobs_after_grace(client):
+    store, http = client
+    doc = _upload(http, "P1").json()
+    orphan = store.ingest_pdf_stream(io.BytesIO(b"%PDF-huerfano"))
+
+    assert store.gc_blobs()["removed"] == 0  # dentro del margen: puede ser un upload en curso
+    dry = store.gc_blobs(grace_s=0, dry_run=True)
+    assert dry["removed"] == 1 and orphan.path.exists()
+
+    stats = store.gc_blobs(grace_s=0)
+    assert stats == {"blobs": 2, "referenced": 1, "removed": 1, "bytes_freed": len(b"%PDF-huerfano"), "tmp_removed": 0}
+    assert not orphan.path.exists() and store.blobs.has(doc["sha256"])
+
+    http.delete(f"/api/repository/docs/{doc['doc_id']}")
+    assert store.gc_blobs(grace_s=0)["removed"] == 1
+    assert list(store.blobs.iter_blobs()) == []
+
+
+def test_reused_content_is_protected_from_gc_grace(client, monkeypatch):
+    store, http = client
+    old = store.ingest_pdf_stream(io.BytesIO(PDF))  # huérfano antiguo (p.ej. documento borrado)
+    stamp = old.path.stat().st_mtime - 2 * 3600
+    os.utime(old.path, (stamp, stamp))
+
+    by_ref = http.post(
+        "/api/repository/docs/upload",
+        data={"type_id": "T104_AUTONOMOS_RECEIPT", "scope": "worker", "company_key": "C1",
+              "person_key": "P1", "content_sha256": PDF_SHA, "file_name": "prl_2025-01.pdf"},
+    )
+    assert by_ref.status_code == 200
+    assert old.path.stat().st_mtime > stamp + 3600
+
+    # Un put deduplicado también refresca el blob: el gc lo respeta aunque aún no tenga documento
+    os.utime(old.path, (stamp, stamp))
+    assert store.ingest_pdf_stream(io.BytesIO(PDF)).created is False
+    assert store.blobs.gc(set())["removed"] == 0
+
+    # Si el blob desaparece antes de exportar, 409 en lugar de un 500
+    def vanished(sha256, doc_id):
+        raise FileNotFoundError(sha256)
+
+    monkeypatch.setattr(store, "export_pdf", vanished)
+    assert _upload(http, "P2").status_code == 409
+
+
+def test_upload_and_replace_write_pdfs_off_the_event_loop(client, monkeypatch):
+    store, http = client
+    threads = []
+    for name in ("ingest_pdf_stream", "export_pdf", "save_document"):
+        original = getattr(store, name)
+
+        def recorder(*args, _original=original, **kwargs):
+            threads.append(threading.current_thread().name)
+            return _original(*args, **kwargs)
+
+        monkeypatch.setattr(store, name, recorder)
+
+    doc = _upload(http, "P1").json()
+    http.put(
+        f"/api/repository/docs/{doc['doc_id']}/pdf",
+        files={"file": ("nuevo.pdf", io.BytesIO(b"%PDF-nuevo"), "application/pdf")},
+    )
+    assert len(threads) == 6
+    assert all(name.startswith("storage-io") for name in threads)
+
+
+def test_readonly_exports_can_be_replaced_and_deleted_with_windows_semantics(client, monkeypatch):
+    store, http = client
+    doc = _upload(http, "P1").json()
+    pdf_path = store._get_doc_pdf_path(doc["doc_id"])
+    os.chmod(pdf_path, 0o444)  # blob de solo lectura (compartido por el hardlink)
+
+    def _readonly(path):
+        return os.path.exists(path) and not os.stat(path).st_mode & stat.S_IWUSR
+
+    # Windows: ni os.replace sobre un destino de solo lectura ni unlink funcionan
+    real_replace, real_unlink = os.replace, type(pdf_path).unlink
+
+    def strict_replace(src, dst):
+        if _readonly(dst):
+            raise PermissionError(f"read-only: {dst}")
+        real_replace(src, dst)
+
+    def strict_unlink(self, missing_ok=False):
+        if _readonly(self):
+            raise PermissionError(f"read-only: {self}")
+        real_unlink(self, missing_ok=missing_ok)
+
+    monkeypatch.setattr(blob_store_v1.os, "replace", strict_replace)
+    monkeypatch.setattr(type(pdf_path), "unlink", strict_unlink)
+
+    replaced = http.put(
+        f"/api/repository/docs/{doc['doc_id']}/pdf",
+        files={"file": ("nuevo.pdf", io.BytesIO(b"%PDF-nuevo"), "application/pdf")},
+    )
+    assert replaced.status_code == 200 and pdf_path.read_bytes() == b"%PDF-nuevo"
+
+    os.chmod(pdf_path, 0o444)
+    assert http.delete(f"/api/repository/docs/{doc['doc_id']}").status_code == 200
+    assert not pdf_path.exists()
+
+
+@pytest.mark.parametrize("backend", ["json", "sqlite"])
+def test_adopt_legacy_pdfs_and_sha256_lookup(tmp_path, backend):
+    store = _make_store(tmp_path, backend)
+    for doc_id in ("old1", "old2"):
+        store._get_doc_pdf_path(doc_id).write_bytes(PDF)  # copias independientes (layout anterior)
+        store.save_document(DocumentInstanceV1(
+            doc_id=doc_id,
+            file_name_original=f"{doc_id}.pdf",
+            stored_path=f"data/repository/docs/{doc_id}.pdf",
+            sha256=PDF_SHA,
+            type_id="T104_AUTONOMOS_RECEIPT",
+            scope=DocumentScopeV1.worker,
+            company_key="C1",
+            person_key=doc_id,
+            created_at=datetime(2025, 1, 1),
+        ))
+
+    assert sorted(d.doc_id for d in store.find_documents_by_sha256(PDF_SHA)) == ["old1", "old2"]
+    assert store.adopt_legacy_pdfs() == {"adopted": 2, "deduplicated": 1, "skipped": 0}
+    assert os.path.samefile(store._get_doc_pdf_path("old1"), store._get_doc_pdf_path("old2"))
+    assert store.adopt_legacy_pdfs()["adopted"] == 0
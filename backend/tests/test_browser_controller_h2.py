@@ -111,3 +111,62 @@ def test_locate_unique_raises_typed_error_on_missing(tmp_path: Path):
 
 
 
+
+
+class _FakePage:
+    """Página mínima para capture_observation sin navegador."""
+
+    def __init__(self, structure_hash: str = "abc123"):
+        self.url = "https://example.test/app"
+        self.structure_hash = structure_hash
+        self.screenshot_calls = []
+        self.evaluate_args = None
+
+    def title(self):
+        return "App"
+
+    def evaluate(self, script, args):
+        self.evaluate_args = args
+        return {
+            "anchors": [],
+            "inputs": [],
+            "buttons": [{"text": "Enviar", "attrs": {}, "selector": None}],
+            "visible_text": "Hola",
+            "structure_hash": self.structure_hash,
+            "structure_nodes": 12,
+        }
+
+    def screenshot(self, **kwargs):
+        self.screenshot_calls.append(kwargs)
+        return b"png-bytes"
+
+
+def test_capture_observation_signature_modes(tmp_path: Path):
+    from backend.executor.browser_controller import ExecutionProfileV1
+    from backend.shared.executor_contracts_v1 import SignatureModeV1
+
+    ctrl = BrowserController(profile=ExecutionProfileV1(signature_mode="dom_structural"))
+    page = _FakePage()
+    ctrl._page = page
+
+    _, sig_dom, _ = ctrl.capture_observation(step_id="s0", evidence_dir=tmp_path)
+    assert sig_dom.signature_mode == SignatureModeV1.dom_structural
+    assert sig_dom.screenshot_hash.startswith("sha256:")
+    assert page.screenshot_calls == []
+    assert page.evaluate_args == [ctrl.profile.max_visible_items, True]
+
+    # misma estructura -> misma firma; estructura distinta -> firma distinta
+    _, sig_same, _ = ctrl.capture_observation(step_id="s1", evidence_dir=tmp_path)
+    assert sig_same.screenshot_hash == sig_dom.screenshot_hash
+    page.structure_hash = "def456"
+    _, sig_changed, _ = ctrl.capture_observation(step_id="s2", evidence_dir=tmp_path)
+    assert sig_changed.screenshot_hash != sig_dom.screenshot_hash
+
+    _, sig_vp, _ = ctrl.capture_observation(step_id="s3", evidence_dir=tmp_path, signature_mode="viewport")
+    assert sig_vp.signature_mode == SignatureModeV1.viewport
+    assert page.screenshot_calls[-1] == {"full_page": False}
+    assert page.evaluate_args == [ctrl.profile.max_visible_items, False]
+
+    _, sig_full, _ = ctrl.capture_observation(step_id="s4", evidence_dir=tmp_path, signature_mode="full_page")
+    assert sig_full.signature_mode == SignatureModeV1.full_page
+    assert page.screenshot_calls[-1] == {"full_page": True}
@@ -0,0 +1,111 @@
+"""
+Tests de BrowserController.get_observation (una sola ida y vuelta con page.evaluate).
+"""
+
+import os
+import tempfile
+
+import pytest
+
+from backend.browser.browser import BrowserController
+
+
+class _FakePage:
+    """Página falsa: evaluate devuelve la observación cruda y cuenta las llamadas."""
+
+    def __init__(self, raw=None, fail_evaluate=False):
+        self.url = "https://example.com/dashboard"
+        self.raw = raw or {}
+        self.fail_evaluate = fail_evaluate
+        self.evaluate_calls = 0
+        self.query_calls = 0
+
+    async def evaluate(self, script, arg=None):
+        self.evaluate_calls += 1
+        if self.fail_evaluate:
+            raise RuntimeError("Execution context was destroyed")
+        return self.raw
+
+    async def title(self):
+        return "Fallback"
+
+    async def inner_text(self, selector):
+        return "texto legacy"
+
+    async def query_selector_all(self, selector):
+        self.query_calls += 1
+        return []
+
+
+@pytest.mark.asyncio
+async def test_observation_single_evaluate_keeps_shape_and_dedup():
+    controller = BrowserController()
+    controller.page = _FakePage(raw={
+        "url": "https://example.com/dashboard",
+        "title": "Panel CAE",
+        "bodyText": "x" * 3001,
+        "clickables": ["Subir   documento", "subir documento", "A", "", "Guardar"],
+        "inputs": [["Buscar", "", "q", "Buscar"], ["", "Fecha", "fecha", "Fecha de expedición"]],
+    })
+
+    obs = await controller.get_observation()
+
+    assert controller.page.evaluate_calls == 1
+    assert controller.page.query_calls == 0
+    assert obs.url == "https://example.com/dashboard"
+    assert obs.title == "Panel CAE"
+    assert obs.visible_text_excerpt == "x" * 3000 + "..."
+    assert obs.clickable_texts == ["Subir documento", "Guardar"]
+    assert obs.input_hints == ["Buscar", "q", "Fecha", "Fecha de expedición"]
+    assert obs.timings_ms["roundtrips"] == 1
+    assert obs.timings_ms["evaluate_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_observation_falls_back_to_per_element_path():
+    controller = BrowserController()
+    controller.page = _FakePage(fail_evaluate=True)
+
+    obs = await controller.get_observation()
+
+    assert controller.page.query_calls > 0
+    assert obs.title == "Fallback"
+    assert obs.visible_text_excerpt == "texto legacy"
+    assert obs.timings_ms["roundtrips"] is None
+
+
+@pytest.mark.asyncio
+async def test_observation_visibility_in_real_page():
+    browser = BrowserController()
+    try:
+        await browser.start(headless=True)
+    except Exception as e:
+        pytest.skip(f"Chromium no disponible: {e}")
+
+    html_content = """
+    <!DOCTYPE html>
+    <html><head><title>Obs</title></head>
+    <body>
+        <a href="#">Ver pendientes</a>
+        <button style="visibility:hidden">Oculto</button>
+        <button style="display:none">Tampoco</button>
+        <div role="button">Enviar</div>
+        <label for="nif">NIF trabajador</label>
+        <input type="text" id="nif" name="nif" placeholder="12345678Z">
+        <input type="text" name="oculto" style="display:none">
+    </body>
+    </html>
+    """
+    with tempfile.NamedTemporaryFile(mode="w", suffix=".html", delete=False, encoding="utf-8") as f:
+        f.write(html_content)
+        temp_path = f.name
+    try:
+        await browser.goto(f"file://{temp_path}")
+        obs = await browser.get_observation()
+        assert obs.title == "Obs"
+        assert obs.clickable_texts == ["Ver pendientes", "Enviar"]
+        assert obs.input_hints == ["12345678Z", "nif", "NIF trabajador"]
+        assert obs.timings_ms["roundtrips"] == 1
+    finally:
+        os.unlink(temp_path)
+        await browser.close()
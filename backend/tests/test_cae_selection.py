@@ -66,13 +66,13 @@ class TestDocCandidates:
     def test_doc_candidates_filters_and_orders(self, tmp_path, sample_doc, sample_doc_type):
         """Test que doc_candidates filtra y ordena correctamente."""
         with patch('backend.cae.submission_routes.DATA_DIR', tmp_path):
-            with patch('backend.repository.document_repository_store_v1.DocumentRepositoryStoreV1') as mock_store_class:
+            with patch('backend.repository.repository_service_v1.get_repository_store') as mock_get_store:
                 mock_store = Mock()
                 mock_store.list_documents.return_value = [sample_doc]
                 mock_store.get_type.return_value = sample_doc_type
                 pdf_path = Path(tmp_path / "test-doc-001.pdf")
                 mock_store._get_doc_pdf_path.return_value = pdf_path
-                mock_store_class.return_value = mock_store
+                mock_get_store.return_value = mock_store
                 
                 # Crear el PDF para que exista
                 pdf_path.parent.mkdir(parents=True, exist_ok=True)
@@ -146,13 +146,13 @@ class TestDocCandidates:
     def test_doc_candidates_fallback_false_returns_empty(self, tmp_path, sample_doc, sample_doc_type):
         """Test que doc_candidates con allow_period_fallback=false devuelve [] cuando no hay docs con period_key."""
         with patch('backend.cae.submission_routes.DATA_DIR', tmp_path):
-            with patch('backend.repository.document_repository_store_v1.DocumentRepositoryStoreV1') as mock_store_class:
+            with patch('backend.repository.repository_service_v1.get_repository_store') as mock_get_store:
                 mock_store = Mock()
                 # Primera llamada con period_key: devuelve []
                 # Segunda llamada (fallback): no se llama porque allow_period_fallback=false
                 mock_store.list_documents.return_value = []  # No hay documentos con ese period_key
                 mock_store.get_type.return_value = sample_doc_type
-                mock_store_class.return_value = mock_store
+                mock_get_store.return_value = mock_store
                 
                 client = TestClient(app)
                 response = client.get(
@@ -181,7 +181,7 @@ class TestDocCandidates:
     def test_doc_candidates_fallback_true_returns_other_periods(self, tmp_path, sample_doc, sample_doc_type):
         """Test que doc_candidates con allow_period_fallback=true devuelve docs de otros periodos cuando no hay con period_key."""
         with patch('backend.cae.submission_routes.DATA_DIR', tmp_path):
-            with patch('backend.repository.document_repository_store_v1.DocumentRepositoryStoreV1') as mock_store_class:
+            with patch('backend.repository.repository_service_v1.get_repository_store') as mock_get_store:
                 mock_store = Mock()
                 pdf_path = Path(tmp_path / "test-doc-001.pdf")
                 mock_store._get_doc_pdf_path.return_value = pdf_path
@@ -197,7 +197,7 @@ class TestDocCandidates:
                     return []
                 
                 mock_store.list_documents.side_effect = list_documents_side_effect
-                mock_store_class.return_value = mock_store
+                mock_get_store.return_value = mock_store
                 
                 # Crear el PDF para que exista
                 pdf_path.parent.mkdir(parents=True, exist_ok=True)
@@ -240,13 +240,13 @@ class TestDocCandidates:
     def test_doc_candidates_fallback_not_applied_when_docs_exist(self, tmp_path, sample_doc, sample_doc_type):
         """Test que doc_candidates no aplica fallback cuando hay documentos con el period_key solicitado."""
         with patch('backend.cae.submission_routes.DATA_DIR', tmp_path):
-            with patch('backend.repository.document_repository_store_v1.DocumentRepositoryStoreV1') as mock_store_class:
+            with patch('backend.repository.repository_service_v1.get_repository_store') as mock_get_store:
                 mock_store = Mock()
                 mock_store.list_documents.return_value = [sample_doc]  # Hay documentos con ese period_key
                 mock_store.get_type.return_value = sample_doc_type
                 pdf_path = Path(tmp_path / "test-doc-001.pdf")
                 mock_store._get_doc_pdf_path.return_value = pdf_path
-                mock_store_class.return_value = mock_store
+                mock_get_store.return_value = mock_store
                 
                 # Crear el PDF para que exista
                 pdf_path.parent.mkdir(parents=True, exist_ok=True)
@@ -288,7 +288,7 @@ class TestPlanFromSelection:
     def test_plan_from_selection_ready_when_all_have_suggested_doc_id(self, tmp_path):
         """Test que plan_from_selection retorna READY cuando todos tienen suggested_doc_id."""
         with patch('backend.cae.submission_routes.DATA_DIR', tmp_path):
-            with patch('backend.repository.document_repository_store_v1.DocumentRepositoryStoreV1') as mock_store_class:
+            with patch('backend.repository.repository_service_v1.get_repository_store') as mock_get_store:
                 mock_store = Mock()
                 mock_doc = Mock()
                 mock_doc.doc_id = "test-doc-001"
@@ -317,7 +317,7 @@ class TestPlanFromSelection:
                 mock_store.get_document.return_value = mock_doc
                 mock_store.get_type.return_value = mock_doc_type
                 mock_store._get_doc_pdf_path.return_value = pdf_path
-                mock_store_class.return_value = mock_store
+                mock_get_store.return_value = mock_store
                 
                 try:
                     client = TestClient(app)
@@ -392,10 +392,10 @@ class TestPlanFromSelection:
     def test_plan_from_selection_blocked_when_doc_not_found(self, tmp_path):
         """Test que plan_from_selection retorna BLOCKED cuando el documento no existe."""
         with patch('backend.cae.submission_routes.DATA_DIR', tmp_path):
-            with patch('backend.repository.document_repository_store_v1.DocumentRepositoryStoreV1') as mock_store_class:
+            with patch('backend.repository.repository_service_v1.get_repository_store') as mock_get_store:
                 mock_store = Mock()
                 mock_store.get_document.return_value = None  # Documento no encontrado
-                mock_store_class.return_value = mock_store
+                mock_get_store.return_value = mock_store
                 
                 client = TestClient(app)
                 response = client.post(
@@ -431,7 +431,7 @@ class TestPlanFromSelection:
     def test_plan_from_selection_blocked_when_pdf_not_found(self, tmp_path):
         """Test que plan_from_selection retorna BLOCKED cuando el PDF no existe."""
         with patch('backend.cae.submission_routes.DATA_DIR', tmp_path):
-            with patch('backend.repository.document_repository_store_v1.DocumentRepositoryStoreV1') as mock_store_class:
+            with patch('backend.repository.repository_service_v1.get_repository_store') as mock_get_store:
                 mock_store = Mock()
                 mock_doc = Mock()
                 mock_doc.doc_id = "test-doc-001"
@@ -443,7 +443,7 @@ class TestPlanFromSelection:
                 
                 mock_store.get_document.return_value = mock_doc
                 mock_store._get_doc_pdf_path.return_value = pdf_path
-                mock_store_class.return_value = mock_store
+                mock_get_store.return_value = mock_store
                 
                 client = TestClient(app)
                 response = client.post(
@@ -0,0 +1,216 @@
+"""
+Tests del calendario de cumplimiento materializado (/api/repository/docs/pending):
+períodos esperados por (tipo, sujeto), buckets de caducidad, actualización incremental
+(alta/baja de documentos, cambio de tipos, cambio de día) y filtros/paginación del endpoint.
+"""
+
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.repository import compliance_calendar_v1, document_repository_routes, period_planner_v1
+from backend.repository.compliance_calendar_v1 import get_compliance_calendar, reset_compliance_calendars
+from backend.repository.document_catalog_v1 import reset_document_catalogs
+from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.period_planner_v1 import PeriodPlannerV1
+from backend.shared.document_repository_v1 import (
+    ComputedValidityV1,
+    DocumentInstanceV1,
+    DocumentScopeV1,
+    DocumentTypeV1,
+    MonthlyValidityConfigV1,
+    ValidityPolicyV1,
+)
+
+
+def _monthly_type(type_id="T_MONTH", name="Recibo mensual", grace_days=0, active=True):
+    return DocumentTypeV1(
+        type_id=type_id,
+        name=name,
+        description="",
+        scope=DocumentScopeV1.worker,
+        validity_policy=ValidityPolicyV1(
+            mode="monthly", basis="name_date", monthly=MonthlyValidityConfigV1(grace_days=grace_days)
+        ),
+        active=active,
+    )
+
+
+def _doc(doc_id, period_key=None, *, person_key="P1", company_key="C1", type_id="T_MONTH", valid_to=None):
+    return DocumentInstanceV1(
+        doc_id=doc_id,
+        file_name_original=f"{doc_id}.pdf",
+        stored_path=f"data/repository/docs/{doc_id}.pdf",
+        sha256="0" * 64,
+        type_id=type_id,
+        scope=DocumentScopeV1.worker,
+        company_key=company_key,
+        person_key=person_key,
+        period_key=period_key,
+        computed_validity=ComputedValidityV1(valid_to=valid_to) if valid_to else ComputedValidityV1(),
+        created_at=datetime(2025, 1, 1),
+    )
+
+
+@pytest.fixture
+def today(monkeypatch):
+    current = {"day": date(2025, 3, 15)}
+    monkeypatch.setattr(compliance_calendar_v1, "_today", lambda: current["day"])
+    return current
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch, today):
+    reset_document_catalogs()
+    reset_compliance_calendars()
+    with patch('backend.repository.document_repository_store_v1.load_settings') as mock_settings:
+        class MockSettings:
+            repository_root_dir = str(tmp_path / "repository")
+        mock_settings.return_value = MockSettings()
+        store = DocumentRepositoryStoreV1(base_dir=str(tmp_path))
+    store.create_type(_monthly_type())
+    monkeypatch.setattr(document_repository_routes, "get_repository_store", lambda: store)
+    yield store
+    reset_compliance_calendars()
+    reset_document_catalogs()
+
+
+def _app():
+    app = FastAPI()
+    app.include_router(document_repository_routes.router)
+    return app
+
+
+def _missing(calendar, **kwargs):
+    return [(m["person_key"], m["period_key"], m["status"], m["days_late"])
+            for m in calendar.pending(max_months_back=3, buckets=("missing",), **kwargs)["missing"]]
+
+
+def test_missing_periods_per_subject_and_incremental_document_updates(store):
+    store.save_document(_doc("mar", "2025-03"))
+    store.save_document(_doc("jan", "2025-01"))
+    store.save_document(_doc("p2", "2025-03", person_key="P2"))
+    calendar = get_compliance_calendar(store)
+
+    assert _missing(calendar) == [
+        ("P1", "2025-02", "LATE", 15),
+        ("P2", "2025-02", "LATE", 15),
+        ("P2", "2025-01", "LATE", 43),
+    ]
+    assert calendar.expected_periods("T_MONTH", ("worker", "C1", "P1"))[0]["doc_id"] == "mar"
+
+    store.save_document(_doc("feb", "2025-02"))
+    assert _missing(calendar, person_key="P1") == []
+    store.delete_document("feb")
+    assert _missing(calendar, person_key="P1") == [("P1", "2025-02", "LATE", 15)]
+    store.delete_document("p2")  # el sujeto P2 desaparece con su único documento
+    assert [m[0] for m in _missing(calendar)] == ["P1"]
+
+    stats = calendar.stats()
+    assert stats["full_rebuilds"] == 1 and stats["document_updates"] == 3
+
+
+def test_day_rollover_and_type_changes_do_not_reload_documents(store, today):
+    store.save_document(_doc("mar", "2025-03"))
+    calendar = get_compliance_calendar(store)
+    assert [m[1] for m in _missing(calendar)] == ["2025-02", "2025-01"]
+
+    today["day"] = date(2025, 4, 2)
+    assert _missing(calendar)[0] == ("P1", "2025-04", "MISSING", None)
+
+    store.update_type("T_MONTH", _monthly_type(grace_days=5))
+    assert ("P1", "2025-02", "LATE", 28) in _missing(calendar)
+    store.update_type("T_MONTH", _monthly_type(active=False))
+    assert _missing(calendar) == []
+
+    stats = calendar.stats()
+    assert stats["full_rebuilds"] == 1
+    assert stats["day_rollovers"] == 1 and stats["type_updates"] == 2
+
+
+def test_external_writes_trigger_a_full_rebuild(store):
+    calendar = get_compliance_calendar(store)
+    assert _missing(calendar) == []
+
+    store.backend.save_document(_doc("mar", "2025-03"))  # sin pasar por el store (otro proceso)
+    assert [m[1] for m in _missing(calendar)] == ["2025-02", "2025-01"]
+    assert calendar.stats()["full_rebuilds"] == 2
+
+
+def test_expiry_buckets_are_sorted_and_filtered(store):
+    store.save_document(_doc("old", valid_to=date(2025, 3, 1)))
+    store.save_document(_doc("older", valid_to=date(2025, 2, 1), person_key="P2"))
+    store.save_document(_doc("soon", valid_to=date(2025, 4, 10)))
+    store.save_document(_doc("edge", valid_to=date(2025, 6, 13)))  # hoy + 90 días
+    store.save_document(_doc("later", valid_to=date(2025, 6, 14)))
+    calendar = get_compliance_calendar(store)
+
+    result = calendar.pending(months_ahead=3, buckets=("expired", "expiring_soon"))
+    assert [d["doc_id"] for d in result["expired"]] == ["older", "old"]
+    assert [(d["doc_id"], d["days_until_expiry"]) for d in result["expiring_soon"]] == [("soon", 26), ("edge", 90)]
+    assert result["expired"][0]["validity_status"] == "EXPIRED"
+
+    assert [d["doc_id"] for d in calendar.pending(buckets=("expired",), person_key="P2")["expired"]] == ["older"]
+
+
+def test_pending_endpoint_filters_and_paginates(store):
+    for i, period in enumerate(["2025-03", "2025-01"]):
+        store.save_document(_doc(f"d{i}", period, person_key=f"P{i}"))
+    app = FastAPI()
+    app.include_router(document_repository_routes.router)
+    client = TestClient(app)
+
+    legacy = client.get("/api/repository/docs/pending", params={"max_months_back": 3}).json()
+    assert set(legacy) == {"expired", "expiring_soon", "missing"} and len(legacy["missing"]) == 4
+
+    page = client.get(
+        "/api/repository/docs/pending",
+        params={"max_months_back": 3, "bucket": "missing", "page": 2, "page_size": 3},
+    ).json()
+    assert set(page) == {"missing", "totals", "page", "page_size"}
+    assert page["totals"] == {"missing": 4} and len(page["missing"]) == 1
+
+    filtered = client.get("/api/repository/docs/pending", params={"max_months_back": 3, "person_key": "P1"}).json()
+    assert [m["period_key"] for m in filtered["missing"]] == ["2025-03", "2025-02"]
+    assert client.get("/api/repository/docs/pending", params={"bucket": "todo"}).status_code == 400
+
+
+def test_expected_endpoint_is_served_from_the_calendar(store, monkeypatch):
+    store.save_document(_doc("mar", "2025-03"))
+    store.save_document(_doc("jan", "2025-01"))
+    client = TestClient(_app())
+    params = {"company_key": "C1", "person_key": "P1", "months": 3}
+    expected = client.get("/api/repository/types/T_MONTH/expected", params=params).json()
+    assert [(p["period_key"], p["status"], p["doc_id"], p["days_late"]) for p in expected] == [
+        ("2025-03", "AVAILABLE", "mar", None),
+        ("2025-02", "LATE", None, 15),
+        ("2025-01", "AVAILABLE", "jan", None),
+    ]
+    assert expected[1]["period_start"] == "2025-02-01" and expected[1]["period_end"] == "2025-02-28"
+
+    # Con el calendario ya construido no se vuelven a listar documentos, ni para sujetos sin celda
+    def no_listing(*args, **kwargs):
+        raise AssertionError("list_documents no debería llamarse")
+
+    monkeypatch.setattr(store, "list_documents", no_listing)
+    assert client.get("/api/repository/types/T_MONTH/expected", params=params).json() == expected
+    unknown = client.get("/api/repository/types/T_MONTH/expected", params={"person_key": "P9", "months": 2}).json()
+    assert [(p["period_key"], p["status"]) for p in unknown] == [("2025-03", "MISSING"), ("2025-02", "LATE")]
+    by_person = client.get("/api/repository/types/T_MONTH/expected", params={"person_key": "P1", "months": 1}).json()
+    assert by_person[0]["doc_id"] == "mar"
+    assert client.get("/api/repository/types/NOPE/expected").status_code == 404
+
+
+def test_planner_steps_back_by_calendar_month(store, monkeypatch):
+    class _Today(date):
+        @classmethod
+        def today(cls):
+            return cls(2025, 3, 31)
+
+    monkeypatch.setattr(period_planner_v1, "date", _Today)
+    periods = PeriodPlannerV1(store).generate_expected_periods(store.get_type("T_MONTH"), months_back=4)
+    assert [p.period_key for p in periods] == ["2025-03", "2025-02", "2025-01", "2024-12"]
+    assert periods[1].period_end == date(2025, 2, 28)
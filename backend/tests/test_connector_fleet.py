@@ -0,0 +1,207 @@
+"""
+Tests del modo fleet de conectores (navegador compartido, límites y política de capturas).
+
+Usan un navegador y un conector falsos: no requieren Playwright real.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from backend.connectors import registry
+from backend.connectors.base import BaseConnector, resolve_screenshot_policy
+from backend.connectors.fleet import FleetConfig, FleetJob, PlatformLimit, _parse_platform_limits, run_fleet
+from backend.connectors.models import PendingRequirement, UploadResult
+
+
+class _FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def screenshot(self, path, full_page=False):
+        self.browser.screenshots.append((path, full_page))
+
+    async def close(self):
+        pass
+
+
+class _FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.closed = False
+
+    async def new_page(self):
+        return _FakePage(self.browser)
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeBrowser:
+    def __init__(self):
+        self.contexts = []
+        self.screenshots = []
+        self.closed = False
+
+    async def new_context(self, **kwargs):
+        context = _FakeContext(self)
+        self.contexts.append(context)
+        return context
+
+    async def close(self):
+        self.closed = True
+
+
+class _Tracker:
+    active = 0
+    peak = 0
+    active_by_platform = {}
+    peak_by_platform = {}
+    calls = []
+
+
+def _make_connector(platform_id):
+    class _FakeConnector(BaseConnector):
+        async def login(self, page):
+            if self.ctx.tenant_id == "broken":
+                raise RuntimeError("bad credentials")
+            _Tracker.calls.append((self.ctx.platform_id, asyncio.get_running_loop().time()))
+            _Tracker.active += 1
+            _Tracker.peak = max(_Tracker.peak, _Tracker.active)
+            active = _Tracker.active_by_platform.get(platform_id, 0) + 1
+            _Tracker.active_by_platform[platform_id] = active
+            _Tracker.peak_by_platform[platform_id] = max(_Tracker.peak_by_platform.get(platform_id, 0), active)
+            await asyncio.sleep(0.02)
+            _Tracker.active -= 1
+            _Tracker.active_by_platform[platform_id] -= 1
+
+        async def navigate_to_pending(self, page):
+            pass
+
+        async def extract_pending(self, page):
+            return [
+                PendingRequirement(id=f"req{i}-{self.ctx.tenant_id}", subject_type="empresa", doc_type_hint="TC2")
+                for i in range(2)
+            ]
+
+        async def match_repository(self, reqs):
+            return {r.id: {"decision": "match", "chosen_doc_id": f"doc_{r.id}"} for r in reqs}
+
+        async def upload_one(self, page, req, doc_id):
+            ok = req.id.startswith("req0")
+            return UploadResult(success=ok, requirement_id=req.id, uploaded_doc_id=doc_id,
+                                error=None if ok else "portal error", evidence={"log": "x"})
+
+    _FakeConnector.platform_id = platform_id
+    return _FakeConnector
+
+
+@pytest.fixture
+def fake_platforms(monkeypatch):
+    monkeypatch.setattr(registry, "_connector_classes", dict(registry._connector_classes))
+    _Tracker.active = _Tracker.peak = 0
+    _Tracker.active_by_platform, _Tracker.peak_by_platform, _Tracker.calls = {}, {}, []
+    for platform_id in ("fake_a", "fake_b"):
+        registry.register_connector(_make_connector(platform_id))
+
+
+@pytest.mark.asyncio
+async def test_fleet_shares_browser_isolates_contexts_and_caps_concurrency(tmp_path, fake_platforms):
+    browser = _FakeBrowser()
+    jobs = [FleetJob(platform_id="fake_a" if i % 2 else "fake_b", tenant_id=f"t{i}") for i in range(8)]
+    jobs.append(FleetJob(platform_id="fake_a", tenant_id="broken"))
+    jobs.append(FleetJob(platform_id="unknown", tenant_id="t_x"))
+    config = FleetConfig(
+        max_concurrency=3,
+        default_platform_limit=PlatformLimit(max_concurrency=2, min_interval_s=0),
+        screenshot_policy="full",
+    )
+
+    summary = await run_fleet(jobs, evidence_base_dir=str(tmp_path), config=config, browser=browser)
+
+    # Un contexto por job ejecutado, todos cerrados; el navegador es del llamador
+    assert len(browser.contexts) == 9
+    assert all(c.closed for c in browser.contexts)
+    assert not browser.closed
+    assert _Tracker.peak <= 3
+    assert all(peak <= 2 for peak in _Tracker.peak_by_platform.values())
+
+    assert summary["jobs"] == 10 and summary["failed_jobs"] == 2
+    assert summary["counts"]["uploaded"] == 8 and summary["counts"]["failed"] == 8
+    assert [r["tenant_id"] for r in summary["runs"]] == [j.tenant_id for j in jobs]
+    assert "bad credentials" in summary["runs"][8]["error"]
+    assert "not found" in summary["runs"][9]["error"]
+    assert len({r["run_id"] for r in summary["runs"]}) == 10
+
+    saved = json.loads((tmp_path / summary["fleet_id"] / "fleet_summary.json").read_text(encoding="utf-8"))
+    assert saved["counts"] == summary["counts"]
+
+
+@pytest.mark.asyncio
+async def test_platform_min_interval_spaces_portal_interactions(tmp_path, fake_platforms):
+    jobs = [FleetJob(platform_id="fake_a", tenant_id=f"t{i}", dry_run=True) for i in range(3)]
+    config = FleetConfig(
+        max_concurrency=3,
+        default_platform_limit=PlatformLimit(max_concurrency=3, min_interval_s=0.05),
+        screenshot_policy="off",
+    )
+    await run_fleet(jobs, evidence_base_dir=str(tmp_path), config=config, browser=_FakeBrowser())
+
+    times = sorted(t for _, t in _Tracker.calls)
+    # login y navegación de cada job pasan por el throttle: los logins quedan espaciados
+    assert all(b - a >= 0.045 for a, b in zip(times, times[1:]))
+
+
+@pytest.mark.parametrize("policy,expected", [
+    ("full", [True] * 4),
+    ("viewport", [False] * 4),
+    ("on_failure", [True]),  # solo la subida fallida
+    ("off", []),
+])
+@pytest.mark.asyncio
+async def test_screenshot_policy(tmp_path, fake_platforms, policy, expected):
+    browser = _FakeBrowser()
+    config = FleetConfig(max_concurrency=1, screenshot_policy=policy,
+                         default_platform_limit=PlatformLimit(min_interval_s=0))
+    summary = await run_fleet([FleetJob(platform_id="fake_a", tenant_id="t0")],
+                              evidence_base_dir=str(tmp_path), config=config, browser=browser)
+
+    assert [full for _, full in browser.screenshots] == expected
+    run = summary["runs"][0]
+    with_shot = [r for r in run["results"] if "screenshot" in r["evidence"]]
+    assert len(with_shot) == (0 if policy == "off" else 1 if policy == "on_failure" else 2)
+
+
+def test_policy_and_limits_parsing(monkeypatch):
+    monkeypatch.delenv("CONNECTOR_SCREENSHOT_POLICY", raising=False)
+    assert resolve_screenshot_policy() == "full"
+    monkeypatch.setenv("CONNECTOR_SCREENSHOT_POLICY", "On_Failure")
+    assert resolve_screenshot_policy() == "on_failure"
+    with pytest.raises(ValueError):
+        resolve_screenshot_policy("sometimes")
+
+    default = PlatformLimit(max_concurrency=2, min_interval_s=1.0)
+    limits = _parse_platform_limits("egestiona=3:0.5, otra=1, mala=x:y, =2", default)
+    assert limits == {"egestiona": PlatformLimit(3, 0.5), "otra": PlatformLimit(1, 1.0)}
+
+
+@pytest.mark.asyncio
+async def test_egestiona_matching_runs_off_the_event_loop(monkeypatch):
+    import threading
+
+    from backend.connectors.egestiona.connector import EgestionaConnector
+
+    loop_thread = threading.get_ident()
+    seen = {}
+
+    def fake_sync(self, reqs):
+        seen["thread"] = threading.get_ident()
+        return {r.id: {"decision": "no_match"} for r in reqs}
+
+    monkeypatch.setattr(EgestionaConnector, "_match_repository_sync", fake_sync)
+    connector = EgestionaConnector.__new__(EgestionaConnector)
+    reqs = [PendingRequirement(id="r1", subject_type="empresa", doc_type_hint="TC2")]
+
+    assert await connector.match_repository(reqs) == {"r1": {"decision": "no_match"}}
+    assert seen["thread"] != loop_thread
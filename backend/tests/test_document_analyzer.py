@@ -11,9 +11,18 @@ from unittest.mock import MagicMock, AsyncMock, patch
 
 from backend.agents.document_analyzer import DocumentAnalyzer
 from backend.shared.models import DocumentAnalysisResult
+from backend.shared.pdf_text_cache import reset_pdf_text_cache
 from backend.vision.ocr_service import OCRService
 
 
+@pytest.fixture(autouse=True)
+def _isolated_pdf_text_cache(tmp_path):
+    """Los PDFs de prueba comparten contenido: caché de texto aislada por test."""
+    reset_pdf_text_cache(tmp_path / "pdf_text")
+    yield
+    reset_pdf_text_cache()
+
+
 class TestDocumentAnalyzer:
     """Tests para DocumentAnalyzer"""
     
@@ -0,0 +1,97 @@
+"""
+Tests del catálogo indexado en memoria de DocumentRepositoryStoreV1.
+"""
+
+import json
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from backend.repository.document_catalog_v1 import get_document_catalog, reset_document_catalogs
+from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.shared.document_repository_v1 import DocumentInstanceV1, DocumentScopeV1, DocumentStatusV1
+
+
+@pytest.fixture
+def store(tmp_path):
+    reset_document_catalogs()
+    with patch('backend.repository.document_repository_store_v1.load_settings') as mock_settings:
+        class MockSettings:
+            repository_root_dir = str(tmp_path / "repository")
+        mock_settings.return_value = MockSettings()
+        yield DocumentRepositoryStoreV1(base_dir=str(tmp_path))
+    reset_document_catalogs()
+
+
+def _doc(doc_id, *, type_id="T1", person_key=None, company_key="C1", period_key=None, minutes=0):
+    return DocumentInstanceV1(
+        doc_id=doc_id,
+        file_name_original=f"{doc_id}.pdf",
+        stored_path=f"data/repository/docs/{doc_id}.pdf",
+        sha256="0" * 64,
+        type_id=type_id,
+        scope=DocumentScopeV1.worker if person_key else DocumentScopeV1.company,
+        company_key=company_key,
+        person_key=person_key,
+        period_key=period_key,
+        created_at=datetime(2025, 1, 1) + timedelta(minutes=minutes),
+    )
+
+
+def test_filters_use_indexes_and_keep_order(store):
+    store.save_document(_doc("a", type_id="T1", person_key="P1", period_key="2025-01", minutes=1))
+    store.save_document(_doc("b", type_id="T1", person_key="P2", period_key="2025-01", minutes=2))
+    store.save_document(_doc("c", type_id="T2", minutes=3))
+
+    assert [d.doc_id for d in store.list_documents()] == ["c", "b", "a"]
+    assert [d.doc_id for d in store.list_documents(type_id="T1")] == ["b", "a"]
+    assert [d.doc_id for d in store.list_documents(type_id="T1", person_key="P1")] == ["a"]
+    assert [d.doc_id for d in store.list_documents(scope="company")] == ["c"]
+    assert [d.doc_id for d in store.list_documents(scope="not-a-scope")] == ["c", "b", "a"]
+    assert [d.doc_id for d in store.list_documents(status="draft", period_key="2025-01")] == ["b", "a"]
+    assert store.list_documents(type_id="T1", period_key="2099-01") == []
+
+
+def test_save_and_delete_update_catalog(store):
+    store.save_document(_doc("a"))
+    assert len(store.list_documents(type_id="T1")) == 1
+
+    doc = store.get_document("a")
+    doc.type_id = "T9"
+    store.save_document(doc)
+    assert store.list_documents(type_id="T1") == []
+    assert [d.doc_id for d in store.list_documents(type_id="T9")] == ["a"]
+
+    store.delete_document("a")
+    assert store.list_documents() == []
+
+
+def test_returned_documents_are_copies(store):
+    store.save_document(_doc("a"))
+    listed = store.list_documents()[0]
+    listed.status = DocumentStatusV1.submitted
+    assert store.list_documents()[0].status == DocumentStatusV1.draft
+
+
+def test_external_sidecar_changes_invalidate_catalog(store):
+    store.save_document(_doc("a"))
+    assert len(store.list_documents()) == 1
+
+    # Otro proceso añade un sidecar directamente en meta/
+    external = _doc("ext", minutes=5).model_dump(mode="json")
+    (store.meta_dir / "ext.json").write_text(json.dumps(external), encoding="utf-8")
+
+    assert [d.doc_id for d in store.list_documents()] == ["ext", "a"]
+
+
+def test_catalog_is_shared_across_store_instances(store):
+    assert get_document_catalog(store.meta_dir) is store.backend.catalog
+    store.save_document(_doc("a"))
+    with patch('backend.repository.document_repository_store_v1.load_settings') as mock_settings:
+        class MockSettings:
+            repository_root_dir = str(store.repo_dir)
+        mock_settings.return_value = MockSettings()
+        other = DocumentRepositoryStoreV1(base_dir=str(store.base_dir))
+    assert other.backend.catalog is store.backend.catalog
+    assert [d.doc_id for d in other.list_documents()] == ["a"]
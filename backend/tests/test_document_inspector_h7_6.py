@@ -8,6 +8,15 @@ import pytest
 
 from backend.inspector.document_inspector_v1 import DocumentInspectorV1
 from backend.repository.document_repository_v1 import DocumentRepositoryV1
+from backend.shared.pdf_text_cache import reset_pdf_text_cache
+
+
+@pytest.fixture(autouse=True)
+def _isolated_pdf_text_cache(tmp_path):
+    """La caché de texto PDF process-wide vive en tmp_path (no en data/ del repo)."""
+    reset_pdf_text_cache(tmp_path / "pdf_text")
+    yield
+    reset_pdf_text_cache()
 
 
 def _make_pdf_with_text(tmp_path: Path, *, lines: list[str]) -> Path:
@@ -168,3 +177,28 @@ def test_inspect_no_text_returns_document_no_text(tmp_path: Path):
 
 
 
+def test_extract_text_stops_parsing_pages_at_byte_cap(tmp_path: Path, monkeypatch):
+    from backend.inspector import document_inspector_v1
+    from backend.inspector.document_inspector_v1 import InspectorConfigV1
+
+    class _Page:
+        calls = 0
+
+        def extract_text(self):
+            _Page.calls += 1
+            return "x" * 1000
+
+    class _Reader:
+        def __init__(self, path):
+            self.pages = [_Page() for _ in range(50)]
+
+    monkeypatch.setattr(document_inspector_v1, "PdfReader", _Reader)
+    pdf = tmp_path / "big.pdf"
+    pdf.write_bytes(b"%PDF-1.4 big")
+    repo = DocumentRepositoryV1(project_root=tmp_path, data_root="data")
+    inspector = DocumentInspectorV1(repository=repo, config=InspectorConfigV1(max_text_bytes=8 * 1024))
+
+    text = inspector.extract_text_pdf(pdf)
+    assert len(text.replace("\n", "")) == 8 * 1024
+    # Tramos de 2, 4, 8 y 16 páginas: no se parsean las 50
+    assert _Page.calls == 16
@@ -0,0 +1,122 @@
+"""
+Tests del matching por lotes (DocumentMatcherV1.match_pending_items).
+"""
+
+import json
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+
+from backend.repository.document_catalog_v1 import reset_document_catalogs
+from backend.repository.document_matcher_v1 import DocumentMatcherV1, PendingItemV1
+from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.shared.document_repository_v1 import DocumentInstanceV1, DocumentScopeV1, DocumentStatusV1
+
+
+@pytest.fixture
+def matcher(tmp_path):
+    reset_document_catalogs()
+    base_dir = tmp_path / "data"
+    base_dir.mkdir()
+    with patch('backend.repository.document_repository_store_v1.load_settings') as mock_settings:
+        class MockSettings:
+            repository_root_dir = str(base_dir / "repository")
+        mock_settings.return_value = MockSettings()
+        store = DocumentRepositoryStoreV1(base_dir=str(base_dir))
+    store.save_document(DocumentInstanceV1(
+        doc_id="doc_jan",
+        file_name_original="recibo_enero.pdf",
+        stored_path="docs/doc_jan.pdf",
+        sha256="0" * 64,
+        type_id="T104_AUTONOMOS_RECEIPT",
+        scope=DocumentScopeV1.worker,
+        company_key="COMP",
+        person_key="P1",
+        period_key="2025-01",
+        status=DocumentStatusV1.reviewed,
+        created_at=datetime(2025, 2, 1),
+    ))
+    yield DocumentMatcherV1(store, base_dir=str(base_dir))
+    reset_document_catalogs()
+
+
+def _pendings():
+    return [
+        PendingItemV1(tipo_doc="T205.0 Recibo autónomos", elemento="P1", empresa="COMP",
+                      fecha_inicio=date(2025, 1, 1), fecha_fin=date(2025, 1, 31)),
+        PendingItemV1(tipo_doc="T999 Desconocido", elemento="P1", empresa="COMP"),
+        PendingItemV1(tipo_doc="T205.0 Recibo autónomos", elemento="P1", empresa="COMP",
+                      fecha_inicio=date(2025, 3, 1), fecha_fin=date(2025, 3, 31)),
+    ]
+
+
+def _comparable(result):
+    return {
+        "best_doc": (result.get("best_doc") or {}).get("doc_id"),
+        "confidence": result.get("confidence"),
+        "needs_operator": result.get("needs_operator"),
+        "alternatives": [a.get("doc_id") for a in result.get("alternatives") or []],
+    }
+
+
+def test_batch_matches_same_as_item_by_item(matcher, tmp_path):
+    single = [
+        matcher.match_pending_item(p, company_key="COMP", person_key="P1")
+        for p in _pendings()
+    ]
+    batch = matcher.match_pending_items(_pendings(), company_key="COMP", person_key="P1")
+
+    assert [_comparable(r) for r in batch] == [_comparable(r) for r in single]
+    assert batch[0]["best_doc"]["doc_id"] == "doc_jan"
+
+
+def test_batch_reads_store_once_and_writes_index_once(matcher, tmp_path):
+    evidence_dir = tmp_path / "evidence"
+    evidence_dir.mkdir()
+
+    calls = {"list_types": 0}
+    original_list_types = matcher.store.list_types
+
+    def counting_list_types(*args, **kwargs):
+        calls["list_types"] += 1
+        return original_list_types(*args, **kwargs)
+
+    matcher.store.list_types = counting_list_types
+    with patch.object(DocumentMatcherV1, "_write_debug_index", autospec=True,
+                      side_effect=DocumentMatcherV1._write_debug_index) as write_index:
+        matcher.match_pending_items(_pendings(), company_key="COMP", person_key="P1",
+                                    evidence_dir=evidence_dir)
+
+    # Una lectura por combinación de argumentos, no por item
+    assert calls["list_types"] <= 2
+    assert write_index.call_count == 1
+
+    debug_infos = json.loads((evidence_dir / "pending_match_debug.json").read_text(encoding="utf-8"))
+    assert len(debug_infos) == 3
+    index = json.loads((evidence_dir / "matching_debug" / "index.json").read_text(encoding="utf-8"))
+    assert index["summary"]["total_items"] == len(index["items"])
+    # El matcher compartido nunca entra en modo batch
+    assert matcher._batch is None
+    assert isinstance(matcher.store, DocumentRepositoryStoreV1)
+
+
+def test_batch_does_not_touch_the_shared_matcher(matcher):
+    original_store = matcher.store
+    original_rules_store = matcher.rule_matcher.rules_store
+
+    with matcher.matching_batch() as batch_matcher:
+        assert batch_matcher is not matcher
+        assert batch_matcher._batch is not None
+        # Otro hilo usando el matcher compartido sigue viendo el store real, sin memo del batch
+        assert matcher.store is original_store
+        assert matcher.rule_matcher.rules_store is original_rules_store
+        assert matcher._batch is None
+        assert batch_matcher.match_pending_item(_pendings()[0], company_key="COMP", person_key="P1")["best_doc"]["doc_id"] == "doc_jan"
+
+        # Batch anidado: reutiliza el mismo matcher de batch
+        with batch_matcher.matching_batch() as nested:
+            assert nested is batch_matcher
+
+    assert matcher.store is original_store
+    assert matcher.rule_matcher.rules_store is original_rules_store
@@ -0,0 +1,218 @@
+"""
+Tests del pool de sesiones de eGestiona (sin navegador: browser/context/page falsos).
+"""
+
+import json
+import os
+import time
+
+import pytest
+
+from backend.adapters.egestiona import session_pool
+from backend.adapters.egestiona.session_pool import (
+    EgestionaSessionPoolV1,
+    egestiona_session_key,
+    egestiona_session_key_for,
+    get_session_pool,
+    home_url_for,
+    open_egestiona_session,
+)
+from backend.cae.egestiona_session_v1 import EgestionaPlanSessionV1
+
+
+LOGIN_URL = "https://coordinate.egestiona.es/login?origen=subcontrata"
+
+
+class _FakeLocator:
+    def __init__(self, page, selector):
+        self.page = page
+        self.selector = selector
+
+    def count(self):
+        return 0 if self.page.portal.logged_in(self.page.context.cookies) else 1
+
+
+class _FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.portal = context.portal
+        self.url = "about:blank"
+
+    def goto(self, url, **kwargs):
+        self.portal.gotos.append(url)
+        if url.endswith("default_contenido.asp") and not self.portal.logged_in(self.context.cookies):
+            self.url = LOGIN_URL
+        else:
+            self.url = url
+
+    def locator(self, selector):
+        return _FakeLocator(self, selector)
+
+
+class _FakeContext:
+    def __init__(self, portal, storage_state=None):
+        self.portal = portal
+        self.cookies = []
+        if storage_state:
+            with open(storage_state, encoding="utf-8") as f:
+                self.cookies = json.load(f)["cookies"]
+        self.closed = False
+
+    def new_page(self):
+        return _FakePage(self)
+
+    def storage_state(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"cookies": self.cookies, "origins": []}, f)
+
+    def close(self):
+        self.closed = True
+
+
+class _FakePortal:
+    """Simula el portal: una cookie de sesión válida mientras no se expire."""
+
+    def __init__(self):
+        self.valid_tokens = set()
+        self.logins = 0
+        self.gotos = []
+
+    def logged_in(self, cookies):
+        return any(c.get("value") in self.valid_tokens for c in cookies)
+
+    def login(self, page):
+        self.logins += 1
+        token = f"tok-{self.logins}"
+        self.valid_tokens.add(token)
+        page.context.cookies = [{"name": "ASPSESSION", "value": token}]
+        page.url = "https://coordinate.egestiona.es/default_contenido.asp"
+
+
+class _FakeBrowser:
+    def __init__(self, portal):
+        self.portal = portal
+        self.contexts = []
+
+    def new_context(self, viewport=None, storage_state=None):
+        context = _FakeContext(self.portal, storage_state=storage_state)
+        self.contexts.append(context)
+        return context
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return EgestionaSessionPoolV1(tmp_path, ttl_s=600)
+
+
+def _key(tenant="ACME", user="user1", client_code=""):
+    return egestiona_session_key(
+        tenant=tenant, platform="egestiona", coordination="Kern", username=user, client_code=client_code,
+    )
+
+
+def test_second_open_reuses_session_without_login(pool):
+    portal = _FakePortal()
+    home = home_url_for(LOGIN_URL)
+    assert home == "https://coordinate.egestiona.es/default_contenido.asp"
+
+    _, _, reused = pool.open(_FakeBrowser(portal), _key(), login_fn=portal.login, home_url=home)
+    assert reused is False
+    assert portal.logins == 1
+    assert pool.state_path(_key()).exists()
+
+    # Otro flujo (otro navegador) con la misma clave: sin login
+    _, page, reused = pool.open(_FakeBrowser(portal), _key(), login_fn=portal.login, home_url=home)
+    assert reused is True
+    assert portal.logins == 1
+    assert page.url == home
+
+
+def test_expired_portal_session_triggers_login(pool):
+    portal = _FakePortal()
+    home = home_url_for(LOGIN_URL)
+    pool.open(_FakeBrowser(portal), _key(), login_fn=portal.login, home_url=home)
+
+    portal.valid_tokens.clear()  # el portal cerró la sesión
+    _, _, reused = pool.open(_FakeBrowser(portal), _key(), login_fn=portal.login, home_url=home)
+    assert reused is False
+    assert portal.logins == 2
+    assert pool.stats["expired"] == 1
+
+
+def test_ttl_and_keys_isolate_sessions(pool, tmp_path):
+    portal = _FakePortal()
+    home = home_url_for(LOGIN_URL)
+    pool.open(_FakeBrowser(portal), _key(), login_fn=portal.login, home_url=home)
+
+    # Otra combinación tenant/usuario no comparte sesión
+    _, _, reused = pool.open(_FakeBrowser(portal), _key(tenant="BETA"), login_fn=portal.login, home_url=home)
+    assert reused is False
+    assert pool.state_path(_key(tenant="BETA")) != pool.state_path(_key())
+    assert "tenants" in pool.state_path(_key()).parts
+
+    # Storage state más viejo que el TTL: se descarta sin probarlo
+    path = pool.state_path(_key())
+    old = time.time() - 3600
+    os.utime(path, (old, old))
+    gotos_before = len(portal.gotos)
+    assert pool.try_reuse(_FakeBrowser(portal), _key(), home_url=home) is None
+    assert len(portal.gotos) == gotos_before
+    assert not path.exists()
+
+
+def test_client_code_is_part_of_the_session_key(pool):
+    portal = _FakePortal()
+    home = home_url_for(LOGIN_URL)
+    pool.open(_FakeBrowser(portal), _key(client_code="C1"), login_fn=portal.login, home_url=home)
+
+    # Mismo usuario y coordinación, otro ClientName: otra sesión (login propio)
+    assert pool.state_path(_key(client_code="C2")) != pool.state_path(_key(client_code="C1"))
+    _, _, reused = pool.open(_FakeBrowser(portal), _key(client_code="C2"), login_fn=portal.login, home_url=home)
+    assert reused is False
+    assert portal.logins == 2
+
+
+def test_failed_login_closes_the_new_context(pool):
+    portal = _FakePortal()
+    browser = _FakeBrowser(portal)
+
+    def failing_login(page):
+        raise TimeoutError("login timeout")
+
+    with pytest.raises(TimeoutError):
+        pool.open(browser, _key(), login_fn=failing_login, home_url=home_url_for(LOGIN_URL))
+    assert len(browser.contexts) == 1 and browser.contexts[0].closed
+    assert not pool.state_path(_key()).exists()
+
+
+def test_plan_build_and_execution_share_the_pooled_session(tmp_path, monkeypatch):
+    portal = _FakePortal()
+    monkeypatch.setattr(session_pool, "login_egestiona", lambda page, **kwargs: portal.login(page))
+    monkeypatch.setattr(session_pool, "wait_for_portal_ready", lambda page, **kwargs: None)
+
+    # Construcción del plan (flujo headful): login real
+    _, _, reused = open_egestiona_session(
+        _FakeBrowser(portal), base_dir=tmp_path, platform="egestiona", coordination="Kern",
+        client_code="C1", username="user1", password="pw", login_url=LOGIN_URL, wait_after_login_s=2.5,
+    )
+    assert reused is False and portal.logins == 1
+
+    # Ejecución del plan (sesión compartida del runner CAE): reutiliza sin login
+    class _Session(EgestionaPlanSessionV1):
+        def _launch(self):
+            self._browser = _FakeBrowser(portal)
+
+        def _navigate_to_list(self, screenshots_dir):
+            pass
+
+    session = _Session("Kern", "C1", "user1", "pw", base_dir=tmp_path, login_url=LOGIN_URL)
+    session.open(None)
+    assert session.stats["session_reused"] == 1 and session.stats["logins"] == 0
+
+    # Gate de auto-upload: misma clave aunque filtre por otra empresa
+    reused_session = get_session_pool(tmp_path).try_reuse(
+        _FakeBrowser(portal), egestiona_session_key_for(coordination="Kern", username="user1", client_code="C1"),
+        home_url=home_url_for(LOGIN_URL),
+    )
+    assert reused_session is not None
+    assert portal.logins == 1
@@ -0,0 +1,389 @@
+"""
+Tests de la ejecución de planes CAE en una sesión eGestiona compartida (login único,
+grid re-extraído solo tras subir, fallos aislados con recarga de página).
+"""
+
+import json
+import threading
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from backend.cae.egestiona_session_v1 import EgestionaPlanSessionPoolV1, EgestionaPlanSessionV1
+from backend.cae.execution_runner_v1 import CAE_WRITE_ALLOWLIST, CAEExecutionRunnerV1
+from backend.cae.submission_models_v1 import CAEScopeContextV1, CAESubmissionItemV1, CAESubmissionPlanV1
+
+
+def _item(type_id="T104_AUTONOMOS_RECEIPT", person_key=CAE_WRITE_ALLOWLIST["person_key"]):
+    return CAESubmissionItemV1(
+        kind="MISSING_PERIOD",
+        type_id=type_id,
+        scope="worker",
+        company_key=CAE_WRITE_ALLOWLIST["company_key"],
+        person_key=person_key,
+        period_key="2025-12",
+        status="PLANNED",
+        suggested_doc_id=f"doc-{type_id}",
+    )
+
+
+def _plan(items):
+    return CAESubmissionPlanV1(
+        plan_id="CAEPLAN-SESSION-001",
+        created_at=datetime.now(),
+        scope=CAEScopeContextV1(
+            platform_key="egestiona",
+            type_ids=[i.type_id for i in items],
+            company_key=CAE_WRITE_ALLOWLIST["company_key"],
+            person_key=CAE_WRITE_ALLOWLIST["person_key"],
+            mode="WRITE",
+        ),
+        decision="READY",
+        reasons=[],
+        items=items,
+        summary={"pending_items": len(items), "docs_candidates": len(items), "total_items": len(items)},
+        executor_hint="egestiona_upload_v1",
+    )
+
+
+class _FakePage:
+    url = "https://coordinate.egestiona.es/default_contenido.asp"
+
+    def __init__(self):
+        self.reloads = 0
+
+    def screenshot(self, path, full_page=False):
+        Path(path).write_bytes(b"PNG")
+
+    def reload(self, **kwargs):
+        self.reloads += 1
+
+    def frame(self, name=None):
+        return object()
+
+    def locator(self, selector):
+        return SimpleNamespace(count=lambda: 1)
+
+
+class _FakeSession:
+    """Sesión falsa para el runner: registra logins, subidas, recuperaciones e hilos."""
+
+    instances = []
+    fail_open = False
+
+    def __init__(self, coordination, client_code, username, password):
+        self.coordination = coordination
+        self.page = _FakePage()
+        self.stats = {"logins": 0, "recoveries": 0, "items": 0}
+        self.threads = set()
+        self.closed = False
+        _FakeSession.instances.append(self)
+
+    def open(self, screenshots_dir=None):
+        self.threads.add(threading.get_ident())
+        if _FakeSession.fail_open:
+            raise RuntimeError("LOGIN_FAILED")
+        self.stats["logins"] += 1
+
+    def upload_item(self, item, pdf_path, screenshot_paths, date_ddmmyyyy=None):
+        self.threads.add(threading.get_ident())
+        self.stats["items"] += 1
+        if item.type_id == "BAD":
+            raise RuntimeError("GRID_EMPTY: el grid no tiene filas")
+
+    def recover(self):
+        self.threads.add(threading.get_ident())
+        self.stats["recoveries"] += 1
+        self.page.reload()
+
+    def close(self):
+        self.threads.add(threading.get_ident())
+        self.closed = True
+
+
+@pytest.fixture
+def real_runner(tmp_path, monkeypatch):
+    """Runner REAL con store, config y secretos simulados y sesión falsa."""
+    from backend.repository import data_bootstrap_v1, repository_service_v1
+    from backend.repository.config_store_v1 import ConfigStoreV1
+    from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+    from backend.repository.secrets_store_v1 import SecretsStoreV1
+
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    coordination = SimpleNamespace(label="Kern", client_code="C1", username="user", password_ref="ref")
+    platforms = SimpleNamespace(platforms=[SimpleNamespace(key="egestiona", coordinations=[coordination])])
+
+    monkeypatch.setattr(DocumentRepositoryStoreV1, "__init__", lambda self, *a, **k: None)
+    monkeypatch.setattr(DocumentRepositoryStoreV1, "get_document", lambda self, doc_id: SimpleNamespace(doc_id=doc_id))
+    monkeypatch.setattr(DocumentRepositoryStoreV1, "_get_doc_pdf_path", lambda self, doc_id: pdf)
+    monkeypatch.setattr(data_bootstrap_v1, "ensure_data_layout", lambda **k: tmp_path)
+    monkeypatch.setattr(ConfigStoreV1, "__init__", lambda self, *a, **k: None)
+    monkeypatch.setattr(ConfigStoreV1, "load_platforms", lambda self: platforms)
+    monkeypatch.setattr(repository_service_v1, "get_repository_store", lambda *a, **k: DocumentRepositoryStoreV1())
+    monkeypatch.setattr(repository_service_v1, "get_config_store", lambda *a, **k: ConfigStoreV1())
+    monkeypatch.setattr(SecretsStoreV1, "__init__", lambda self, *a, **k: None)
+    monkeypatch.setattr(SecretsStoreV1, "get_secret", lambda self, ref: "secret")
+    monkeypatch.setenv("CAE_EXECUTOR_MODE", "REAL")
+    monkeypatch.delenv("CAE_EGESTIONA_SESSION_MODE", raising=False)
+    _FakeSession.instances = []
+    _FakeSession.fail_open = False
+
+    with patch("backend.cae.execution_runner_v1.DATA_DIR", tmp_path):
+        runner = CAEExecutionRunnerV1()
+    runner.session_factory = _FakeSession
+    return runner
+
+
+def test_plan_mode_logs_in_once_and_isolates_failed_item(real_runner):
+    items = [_item("T1"), _item("BAD"), _item("T3"), _item("T4")]
+    result = real_runner.execute_plan_egestiona(_plan(items), dry_run=False)
+
+    assert len(_FakeSession.instances) == 1
+    session = _FakeSession.instances[0]
+    assert session.stats == {"logins": 1, "recoveries": 1, "items": 4}
+    assert session.page.reloads == 1
+    assert session.closed
+
+    assert result.status == "PARTIAL_SUCCESS"
+    assert result.summary["items_success"] == 3 and result.summary["items_failed"] == 1
+    manifest = json.loads((Path(result.evidence_path) / "manifest.json").read_text(encoding="utf-8"))
+    assert manifest["stop_reason"] == "FAILED"
+    assert [r["status"] for r in manifest["items_results"]] == ["SUCCESS", "FAILED", "SUCCESS", "SUCCESS"]
+    assert manifest["session"]["logins"] == 1
+
+
+def test_item_mode_keeps_one_browser_per_item_and_stops_on_failure(real_runner, monkeypatch):
+    monkeypatch.setenv("CAE_EGESTIONA_SESSION_MODE", "item")
+    with patch("backend.cae.execution_runner_v1.DATA_DIR", real_runner.evidence_base_dir.parent):
+        runner = CAEExecutionRunnerV1()
+    runner.session_factory = _FakeSession
+
+    result = runner.execute_plan_egestiona(_plan([_item("T1"), _item("BAD"), _item("T3")]), dry_run=False)
+
+    assert len(_FakeSession.instances) == 2
+    assert all(s.closed and s.stats["logins"] == 1 and s.stats["recoveries"] == 0 for s in _FakeSession.instances)
+    assert result.summary["items_processed"] == 2
+
+
+def test_failed_login_is_not_retried_per_item(real_runner):
+    _FakeSession.fail_open = True
+    result = real_runner.execute_plan_egestiona(_plan([_item("T1"), _item("T2"), _item("T3")]), dry_run=False)
+
+    assert len(_FakeSession.instances) == 1
+    assert result.status == "FAILED"
+    assert result.summary["items_failed"] == 3
+    assert "LOGIN_FAILED" in (result.error or "")
+
+
+@pytest.mark.asyncio
+async def test_async_plan_runs_session_on_a_single_thread(real_runner):
+    progress = []
+
+    def on_progress(p):
+        progress.append(p.current_index)
+        return True
+
+    result = await real_runner.execute_plan_egestiona_with_progress(
+        _plan([_item("T1"), _item("T2"), _item("T3")]), dry_run=False, on_progress=on_progress,
+    )
+
+    assert result.status == "SUCCESS"
+    session = _FakeSession.instances[0]
+    assert session.stats["logins"] == 1 and session.closed
+    assert len(session.threads) == 1  # open, subidas y close en el mismo hilo
+
+
+class _ListFrame:
+    def __init__(self):
+        self.clicks = 0
+        self.clicked_rows = []
+
+    def locator(self, selector):
+        return SimpleNamespace(count=lambda: 1, screenshot=lambda path: Path(path).write_bytes(b"PNG"))
+
+    def evaluate(self, js, arg=None):
+        self.clicks += 1
+        self.clicked_rows.append(arg)
+        return {"ok": True}
+
+    def is_detached(self):
+        return False
+
+
+class _OfflineSession(EgestionaPlanSessionV1):
+    """EgestionaPlanSessionV1 con navegador, login y navegación simulados."""
+
+    def _launch(self):
+        self.page = _FakePage()
+
+    def _login(self, screenshots_dir):
+        self.stats["logins"] += 1
+
+    def _navigate_to_list(self, screenshots_dir):
+        self.list_frame = _ListFrame()
+        self._rows = None
+        self.stats["list_navigations"] += 1
+
+    def _attach_pdf(self, pdf_path):
+        pass
+
+    def _submit(self, confirmation_path):
+        pass
+
+
+def test_grid_is_reextracted_only_after_uploads(tmp_path, monkeypatch):
+    from backend.adapters.egestiona import grid_extract
+
+    rows = [
+        {"Empresa": "OTRA SA", "Elemento": "JUAN", "_raw_cells": ["OTRA SA", "JUAN"]},
+        {"Empresa": "TEDELAB SL", "Elemento": "EMILIO GARCIA", "_raw_cells": ["TEDELAB SL", "EMILIO GARCIA"]},
+    ]
+    monkeypatch.setattr(grid_extract, "extract_dhtmlx_grid", lambda frame: {"rows": rows})
+    shots = {name: tmp_path / f"{name}.png" for name in ("03_listado", "04_detail", "05_uploaded", "06_confirmation")}
+
+    pool = EgestionaPlanSessionPoolV1(session_factory=_OfflineSession)
+    session = pool.get("egestiona", "Kern", "C1", "user", "secret")
+    assert pool.get("egestiona", "Kern", "C1", "user", "secret") is session
+
+    session.upload_item(_item("T1"), tmp_path / "doc.pdf", shots)
+    # Se pulsa la fila que coincide con el item, no la primera del grid
+    assert session.list_frame.clicked_rows == [["TEDELAB SL", "EMILIO GARCIA"]]
+    with pytest.raises(RuntimeError, match="0 filas"):
+        session.upload_item(_item("T2", person_key="NADIE"), tmp_path / "doc.pdf", shots)
+    session.upload_item(_item("T3"), tmp_path / "doc.pdf", shots)  # reutiliza la extracción anterior
+    session.recover()
+
+    stats = pool.stats()
+    assert stats["logins"] == 1 and stats["browser_launches"] == 0
+    assert stats["grid_extractions"] == 2
+    assert stats["recoveries"] == 1 and stats["list_navigations"] == 2
+    assert session.page.reloads == 1
+
+    pool.close_all()
+    assert pool.stats()["logins"] == 1
+
+
+class _ModalPage(_FakePage):
+    """Página con modal de detalle: se abre al pulsar una fila y se cierra al enviar (si close_on_submit)."""
+
+    def __init__(self):
+        super().__init__()
+        self.modal_open = False
+        self.close_on_submit = True
+
+    def locator(self, selector):
+        def _click(timeout=None):
+            if self.close_on_submit:
+                self.modal_open = False
+        return SimpleNamespace(count=lambda: 1, first=SimpleNamespace(click=_click))
+
+    def wait_for_load_state(self, state, timeout=None):
+        pass
+
+    def wait_for_function(self, expression, arg=None, timeout=None, polling=None):
+        if self.modal_open:
+            raise TimeoutError("modal abierto")
+        return SimpleNamespace(json_value=lambda: True)
+
+
+class _ModalListFrame(_ListFrame):
+    def __init__(self, page):
+        super().__init__()
+        self.page = page
+        self.idle_waits = 0
+
+    def evaluate(self, js, arg=None):
+        if arg is None:  # instalación del observer de wait_for_grid_idle
+            return True
+        self.page.modal_open = True
+        return super().evaluate(js, arg)
+
+    def wait_for_function(self, expression, arg=None, timeout=None, polling=None):
+        self.idle_waits += 1
+        return SimpleNamespace(json_value=lambda: {"rows": 2})
+
+
+class _ModalSession(_OfflineSession):
+    """Sesión offline con el _submit real (espera el cierre del modal y el grid)."""
+
+    attached = []
+
+    def _launch(self):
+        self.page = _ModalPage()
+
+    def _navigate_to_list(self, screenshots_dir):
+        self.page.modal_open = False  # navegar al listado descarta el detalle
+        self.list_frame = _ModalListFrame(self.page)
+        self._rows = None
+        self.stats["list_navigations"] += 1
+
+    def _attach_pdf(self, pdf_path):
+        assert self.page.modal_open
+        _ModalSession.attached.append((pdf_path.name, self.list_frame.clicked_rows[-1]))
+
+    _submit = EgestionaPlanSessionV1._submit
+
+
+def test_open_detail_modal_is_not_reused_for_the_next_row(tmp_path, monkeypatch):
+    from backend.adapters.egestiona import grid_extract
+
+    rows = [
+        {"Empresa": "TEDELAB SL", "Elemento": "EMILIO GARCIA", "_raw_cells": ["TEDELAB SL", "EMILIO GARCIA"]},
+        {"Empresa": "TEDELAB SL", "Elemento": "MARIA LOPEZ", "_raw_cells": ["TEDELAB SL", "MARIA LOPEZ"]},
+    ]
+    monkeypatch.setattr(grid_extract, "extract_dhtmlx_grid", lambda frame: {"rows": rows})
+    shots = {name: tmp_path / f"{name}.png" for name in ("03_listado", "04_detail", "05_uploaded", "06_confirmation")}
+    _ModalSession.attached = []
+
+    session = _ModalSession("Kern", "C1", "user", "secret", base_dir=tmp_path)
+    session.open(tmp_path)
+    first_frame = session.list_frame
+
+    # El envío no cierra el detalle: el item falla y el listado se da por perdido
+    session.page.close_on_submit = False
+    with pytest.raises(RuntimeError, match="MODAL_NOT_CLOSED"):
+        session.upload_item(_item("T1", person_key="EMILIO"), tmp_path / "a.pdf", shots)
+    assert session.list_frame is None
+    assert first_frame.idle_waits == 0
+
+    # El siguiente item (otra fila) vuelve al listado antes de abrir su detalle
+    session.page.close_on_submit = True
+    session.upload_item(_item("T2", person_key="MARIA"), tmp_path / "b.pdf", shots)
+    assert session.list_frame is not first_frame
+    assert session.stats["list_navigations"] == 2
+    assert _ModalSession.attached == [
+        ("a.pdf", ["TEDELAB SL", "EMILIO GARCIA"]),
+        ("b.pdf", ["TEDELAB SL", "MARIA LOPEZ"]),
+    ]
+    assert session.list_frame.clicked_rows == [["TEDELAB SL", "MARIA LOPEZ"]]
+    assert not session.page.modal_open and session.list_frame.idle_waits == 1
+
+
+def test_plan_session_reuses_saved_portal_session(tmp_path, monkeypatch):
+    from backend.adapters.egestiona import session_pool
+
+    calls = []
+
+    def fake_open(browser, **kwargs):
+        calls.append(kwargs)
+        return object(), _FakePage(), True
+
+    monkeypatch.setattr(session_pool, "open_egestiona_session", fake_open)
+
+    class _Session(EgestionaPlanSessionV1):
+        def _launch(self):
+            self._browser = object()
+
+        def _navigate_to_list(self, screenshots_dir):
+            self.list_frame = _ListFrame()
+
+    session = _Session("Kern", "C1", "user", "secret", base_dir=tmp_path, login_url="https://portal/login")
+    session.open(tmp_path)
+
+    assert calls[0]["coordination"] == "Kern" and calls[0]["base_dir"] == tmp_path
+    assert session.stats["session_reused"] == 1 and session.stats["logins"] == 0
+    assert (tmp_path / "01_login.png").exists()
@@ -8,7 +8,7 @@ import asyncio
 from datetime import datetime
 from unittest.mock import Mock, patch, MagicMock
 
-# No usar pytest_plugins - usamos asyncio.run() directamente
+# Los tests async usan @pytest.mark.asyncio (pytest-asyncio)
 
 from backend.cae.job_queue_models_v1 import CAEJobV1, CAEJobStatus, CAEJobProgressV1
 from backend.cae.job_queue_v1 import enqueue_job, get_job, list_jobs, start_worker, stop_worker, cancel_job, retry_job
@@ -19,14 +19,16 @@ from backend.cae.execution_models_v1 import RunResultV1
 @pytest.fixture(autouse=True)
 def reset_job_queue():
     """Limpia la cola antes y después de cada test."""
-    from backend.cae.job_queue_v1 import _jobs, _queue, _current_job_id
+    from backend.cae.job_queue_v1 import _jobs, _queue, _running, _tenant_last_served
     _jobs.clear()
     _queue.clear()
-    _current_job_id = None
+    _running.clear()
+    _tenant_last_served.clear()
     yield
     _jobs.clear()
     _queue.clear()
-    _current_job_id = None
+    _running.clear()
+    _tenant_last_served.clear()
 
 
 @pytest.fixture
@@ -518,3 +520,277 @@ def test_retry_rejected_for_canceled(sample_plan):
     result = retry_job(job_id)
     assert result is None
 
+
+
+# Pool de workers: concurrencia por tenant/sesión y reparto justo
+
+def _plan_for(plan_id, company_key, platform_key="egestiona"):
+    return CAESubmissionPlanV1(
+        plan_id=plan_id,
+        created_at=datetime.utcnow(),
+        scope=CAEScopeContextV1(
+            platform_key=platform_key,
+            type_ids=[],
+            company_key=company_key,
+            mode="PREPARE_WRITE",
+        ),
+        decision="READY",
+        reasons=[],
+        items=[],
+        summary={"total_items": 0},
+    )
+
+
+@pytest.fixture
+def platforms_config():
+    """Una coordinación (un login) por plataforma, compartida por todas las empresas."""
+    from backend.shared.platforms_v1 import PlatformsV1
+
+    platforms = PlatformsV1.model_validate({
+        "platforms": [
+            {
+                "key": "egestiona",
+                "base_url": "https://egestiona.example",
+                "coordinations": [{"label": "Kern", "client_code": "kern", "username": "ops"}],
+            },
+            {
+                "key": "ctaima",
+                "base_url": "https://ctaima.example",
+                "coordinations": [{"label": "Principal", "client_code": "main", "username": "ops"}],
+            },
+        ]
+    })
+    with patch('backend.cae.job_queue_v1._load_platforms', return_value=platforms):
+        yield platforms
+
+
+def test_pick_next_job_round_robin_across_tenants(platforms_config):
+    """Un tenant con muchos jobs no acapara la cola."""
+    from backend.cae.job_queue_v1 import _claim_next_job, _running
+
+    a_jobs = [enqueue_job(_plan_for(f"A-{i}", "ACME"), "t", "r").job_id for i in range(3)]
+    b_job = enqueue_job(_plan_for("B-0", "BETA"), "t", "r").job_id
+
+    first = _claim_next_job()
+    _running.clear()
+    second = _claim_next_job()
+    _running.clear()
+    third = _claim_next_job()
+
+    assert first == a_jobs[0]
+    assert second == b_job
+    assert third == a_jobs[1]
+
+
+def test_pick_next_job_respects_session_limit(platforms_config):
+    """Dos jobs de la misma sesión de portal nunca se reservan a la vez."""
+    from backend.cae.job_queue_v1 import _claim_next_job
+
+    with patch.dict(os.environ, {"CAE_JOB_MAX_PER_TENANT": "5", "CAE_JOB_MAX_PER_SESSION": "1"}):
+        same_1 = enqueue_job(_plan_for("S-1", "ACME"), "t", "r").job_id
+        enqueue_job(_plan_for("S-2", "ACME"), "t", "r")
+        other_platform = enqueue_job(_plan_for("S-3", "ACME", platform_key="ctaima"), "t", "r").job_id
+
+        assert _claim_next_job() == same_1
+        assert _claim_next_job() == other_platform
+        assert _claim_next_job() is None
+
+
+def test_pick_next_job_serializes_companies_sharing_a_login(platforms_config):
+    """Empresas distintas con la misma coordinación comparten sesión: no se reservan a la vez."""
+    from backend.cae.job_queue_v1 import _claim_next_job, _running
+
+    with patch.dict(os.environ, {"CAE_JOB_MAX_PER_TENANT": "5", "CAE_JOB_MAX_PER_SESSION": "1"}):
+        acme = enqueue_job(_plan_for("ACME-1", "ACME"), "t", "r").job_id
+        beta = enqueue_job(_plan_for("BETA-1", "BETA"), "t", "r").job_id
+
+        assert _claim_next_job() == acme
+        assert _claim_next_job() is None
+        _running.pop(acme)
+        assert _claim_next_job() == beta
+
+
+async def _run_pool(tmp_path, plans, slow_prefix):
+    """Ejecuta plans en el pool (con _execute_job falso); devuelve orden de fin y máx. paralelo."""
+    import json
+    from backend.cae.job_queue_v1 import _job_session_key
+
+    plans_dir = tmp_path / "docs" / "evidence" / "cae_plans"
+    plans_dir.mkdir(parents=True, exist_ok=True)
+    for plan in plans:
+        (plans_dir / f"{plan.plan_id}.json").write_text(
+            json.dumps(plan.model_dump(mode="json")), encoding="utf-8"
+        )
+
+    active_sessions = []
+    max_parallel = {"n": 0}
+    order = []
+
+    async def fake_execute(job_id, job):
+        session = _job_session_key(job)
+        assert session not in active_sessions, "misma sesión en paralelo"
+        active_sessions.append(session)
+        max_parallel["n"] = max(max_parallel["n"], len(active_sessions))
+        await asyncio.sleep(0.3 if job.plan_id.startswith(slow_prefix) else 0.01)
+        active_sessions.remove(session)
+        order.append(job.plan_id)
+        job.status = "SUCCESS"
+        job.finished_at = datetime.utcnow()
+
+    with patch('backend.config.DATA_DIR', tmp_path), \
+         patch('backend.cae.job_queue_v1.JOBS_FILE', tmp_path / "cae_jobs.json"), \
+         patch.dict(os.environ, {"CAE_JOB_WORKERS": "3"}), \
+         patch('backend.cae.job_queue_v1._execute_job', side_effect=fake_execute):
+        start_worker()
+        try:
+            ids = [enqueue_job(p, "t", "r").job_id for p in plans]
+            for _ in range(100):
+                await asyncio.sleep(0.02)
+                if all(get_job(i).status == "SUCCESS" for i in ids):
+                    break
+        finally:
+            stop_worker()
+    return order, max_parallel["n"]
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_runs_tenants_in_parallel(tmp_path, platforms_config):
+    """Un job lento de un tenant no bloquea los jobs de otro tenant con otra sesión."""
+    plans = [
+        _plan_for("SLOW", "ACME"),
+        _plan_for("SLOW-2", "ACME"),
+        _plan_for("FAST", "BETA", platform_key="ctaima"),
+    ]
+
+    order, max_parallel = await _run_pool(tmp_path, plans, slow_prefix="SLOW")
+
+    assert order == ["FAST", "SLOW", "SLOW-2"]
+    assert max_parallel == 2
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_serializes_companies_sharing_a_login(tmp_path, platforms_config):
+    """Dos empresas con la misma coordinación se ejecutan una detrás de otra."""
+    plans = [_plan_for("ACME-1", "ACME"), _plan_for("BETA-1", "BETA")]
+
+    order, max_parallel = await _run_pool(tmp_path, plans, slow_prefix="ACME")
+
+    assert order == ["ACME-1", "BETA-1"]
+    assert max_parallel == 1
+
+
+# Persistencia por journal + snapshot, retención y paginación
+
+def test_journal_replay_restores_latest_state(sample_plan, tmp_path):
+    """Los cambios se añaden al journal y se reproducen sobre el snapshot al cargar."""
+    import json
+    from backend.cae import job_queue_v1 as jq
+
+    with patch.object(jq, 'JOBS_FILE', tmp_path / "cae_jobs.json"):
+        job = enqueue_job(sample_plan, "t", "r")
+        jq._save_jobs()  # snapshot con el job QUEUED, journal vacío
+        assert (tmp_path / "cae_jobs.journal.jsonl").read_text(encoding="utf-8") == ""
+
+        job.cancel_requested = True
+        jq._persist_job(job.job_id)
+        job.progress.percent = 40
+        jq._persist_job(job.job_id)
+
+        journal_lines = (tmp_path / "cae_jobs.journal.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(journal_lines) == 2
+        snapshot = json.loads((tmp_path / "cae_jobs.json").read_text(encoding="utf-8"))
+        assert snapshot[0]["progress"]["percent"] == 0
+
+        jq._jobs.clear()
+        jq._queue.clear()
+        jq._load_jobs()
+
+        loaded = get_job(job.job_id)
+        assert loaded.cancel_requested is True
+        assert loaded.progress.percent == 40
+        assert job.job_id in jq._queue
+        # La carga compacta el journal en el snapshot
+        assert (tmp_path / "cae_jobs.journal.jsonl").read_text(encoding="utf-8") == ""
+
+
+def test_snapshot_archives_terminal_jobs_out_of_retention(sample_plan, tmp_path):
+    """Los jobs terminales fuera de retención pasan al archivo y salen de memoria."""
+    import json
+    from datetime import timedelta
+    from backend.cae import job_queue_v1 as jq
+
+    with patch.object(jq, 'JOBS_FILE', tmp_path / "cae_jobs.json"), \
+         patch.dict(os.environ, {"CAE_JOB_RETENTION_DAYS": "7"}):
+        old = enqueue_job(sample_plan, "t", "r")
+        old.status = "SUCCESS"
+        old.finished_at = datetime.utcnow() - timedelta(days=10)
+        recent = enqueue_job(sample_plan, "t", "r")
+        recent.status = "FAILED"
+        recent.finished_at = datetime.utcnow()
+        queued = enqueue_job(sample_plan, "t", "r")
+
+        jq._save_jobs()
+
+        assert get_job(old.job_id) is None
+        assert get_job(recent.job_id) is not None
+        assert get_job(queued.job_id) is not None
+        archived = [json.loads(l) for l in (tmp_path / "cae_jobs_archive.jsonl").read_text(encoding="utf-8").splitlines()]
+        assert [j["job_id"] for j in archived] == [old.job_id]
+
+
+def test_list_jobs_cursor_pagination(sample_plan):
+    """La paginación por cursor recorre todos los jobs sin repetir."""
+    from datetime import timedelta
+    from backend.cae.job_queue_v1 import list_jobs_page
+
+    created = []
+    for i in range(5):
+        job = enqueue_job(sample_plan, "t", "r")
+        job.created_at = datetime(2025, 1, 1) + timedelta(minutes=i)
+        created.append(job.job_id)
+
+    page1, cursor = list_jobs_page(limit=2)
+    assert [j.job_id for j in page1] == created[::-1][:2]
+    page2, cursor = list_jobs_page(limit=2, cursor=cursor)
+    assert [j.job_id for j in page2] == created[::-1][2:4]
+    page3, cursor = list_jobs_page(limit=2, cursor=cursor)
+    assert [j.job_id for j in page3] == created[::-1][4:]
+    assert cursor is None
+
+
+def test_snapshots_from_other_threads_do_not_race_with_enqueue(sample_plan, tmp_path, capsys):
+    """Snapshots desde hilos (callback de progreso) mientras se encolan jobs: ninguno se descarta."""
+    import json
+    import sys
+    import threading
+    from backend.cae import job_queue_v1 as jq
+
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)  # cambios de hilo frecuentes: la carrera aparece enseguida sin lock
+    with patch.object(jq, 'JOBS_FILE', tmp_path / "cae_jobs.json"):
+        stop = threading.Event()
+
+        errors = []
+
+        def snapshots():
+            while not stop.is_set():
+                try:
+                    jq._save_jobs()
+                    jq.list_jobs_page(limit=10)
+                except Exception as e:
+                    errors.append(e)
+
+        saver = threading.Thread(target=snapshots)
+        saver.start()
+        try:
+            for _ in range(300):
+                enqueue_job(sample_plan, "t", "r")
+        finally:
+            stop.set()
+            saver.join(timeout=10)
+            sys.setswitchinterval(switch_interval)
+        jq._save_jobs()
+
+        assert errors == []
+        assert "Error al guardar jobs" not in capsys.readouterr().out
+        assert len(json.loads((tmp_path / "cae_jobs.json").read_text(encoding="utf-8"))) == 300
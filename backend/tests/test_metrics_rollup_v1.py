@@ -0,0 +1,158 @@
+"""
+Tests de rollups incrementales de métricas (metrics_rollup_v1 + /api/metrics/summary).
+"""
+
+import json
+import sys
+import threading
+from datetime import date, datetime, timezone
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import metrics_routes
+from backend.shared import metrics_rollup_v1
+from backend.shared.metrics_rollup_v1 import MetricsRollupStoreV1, get_metrics_rollup
+from backend.shared.run_metrics import (
+    initialize_metrics,
+    load_metrics,
+    record_learning_hint_applied,
+    save_metrics,
+    update_metrics_from_decisions,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_rollups(monkeypatch):
+    monkeypatch.setattr(metrics_rollup_v1, "_STORES", {})
+
+
+def _decisions(*kinds):
+    return [{"decision": k} for k in kinds]
+
+
+def _set_created_at(base, plan_id, created_at):
+    metrics = load_metrics(plan_id, base_dir=base)
+    metrics.created_at = created_at
+    save_metrics(metrics, base_dir=base)
+
+
+def test_rollup_matches_full_scan_after_incremental_updates(tmp_path):
+    initialize_metrics("plan_a", 3, base_dir=tmp_path, platform="egestiona")
+    update_metrics_from_decisions("plan_a", _decisions("AUTO_UPLOAD", "AUTO_UPLOAD", "SKIP"), base_dir=tmp_path)
+    initialize_metrics("plan_b", 2, base_dir=tmp_path, platform="cetaima")
+    update_metrics_from_decisions("plan_b", _decisions("REVIEW_REQUIRED", "NO_MATCH"), base_dir=tmp_path)
+    record_learning_hint_applied("plan_b", count=2, base_dir=tmp_path)
+
+    incremental = get_metrics_rollup(tmp_path).summary()
+
+    # Reconstrucción desde cero (como en instalaciones sin rollup): mismo resultado
+    rebuilt = MetricsRollupStoreV1(tmp_path)
+    rebuilt.path.unlink()
+    assert rebuilt.summary() == incremental
+
+    assert incremental["total_runs"] == 2
+    assert incremental["total_items"] == 5
+    assert incremental["decisions_breakdown"] == {
+        "AUTO_UPLOAD": 2, "REVIEW_REQUIRED": 1, "NO_MATCH": 1, "SKIP": 1,
+    }
+    assert incremental["source_breakdown"]["learning_hint_resolved"] == 2
+    assert incremental["percentages"]["auto_upload"] == pytest.approx(40.0)
+    assert incremental["percentages"]["with_learning"] == pytest.approx(50.0)
+
+    egestiona = get_metrics_rollup(tmp_path).summary(platform="egestiona")
+    assert egestiona["total_runs"] == 1
+    assert egestiona["decisions_breakdown"]["AUTO_UPLOAD"] == 2
+
+
+def test_date_range_uses_daily_buckets(tmp_path):
+    for plan_id, day in (("plan_old", 1), ("plan_mid", 10), ("plan_new", 20)):
+        initialize_metrics(plan_id, 1, base_dir=tmp_path, platform="egestiona")
+        update_metrics_from_decisions(plan_id, _decisions("AUTO_UPLOAD"), base_dir=tmp_path)
+        _set_created_at(tmp_path, plan_id, datetime(2026, 3, day, 12, tzinfo=timezone.utc))
+
+    rollup = get_metrics_rollup(tmp_path)
+    in_range = rollup.summary(date_from=date(2026, 3, 5), date_to=date(2026, 3, 31))
+    assert in_range["total_runs"] == 2
+    assert in_range["decisions_breakdown"]["AUTO_UPLOAD"] == 2
+
+    # Mover un plan de día descuenta del bucket anterior (el de hoy queda vacío y se elimina)
+    days = rollup.daily()
+    assert set(days) == {"2026-03-01", "2026-03-10", "2026-03-20"}
+    assert all(days[d]["egestiona"]["runs"] == 1 for d in days)
+
+    # Sin rango: últimos N plans por created_at
+    assert rollup.summary(limit=1)["total_runs"] == 1
+    assert rollup.summary(limit=50)["total_runs"] == 3
+
+
+def test_last_n_per_platform_survives_busier_platforms(tmp_path):
+    rollup = MetricsRollupStoreV1(tmp_path)
+    rollup.apply(None, {"plan_id": "old_cetaima", "platform": "cetaima", "created_at": "2026-01-01T00:00:00", "total_items": 4})
+    for i in range(metrics_rollup_v1.MAX_RECENT + 20):
+        rollup.apply(None, {"plan_id": f"eg_{i}", "platform": "egestiona", "created_at": f"2026-02-01T00:{i // 60:02d}:{i % 60:02d}", "total_items": 1})
+
+    # El plan de cetaima queda fuera de los 100 globales, pero sigue en sus "últimos N"
+    assert rollup.summary(platform="cetaima")["total_items"] == 4
+    assert rollup.summary()["total_runs"] == metrics_rollup_v1.MAX_RECENT
+    assert rollup.summary()["total_items"] == metrics_rollup_v1.MAX_RECENT
+    assert rollup.summary(platform="egestiona", limit=5)["total_runs"] == 5
+
+
+def test_concurrent_saves_of_one_plan_count_it_once(tmp_path):
+    initialize_metrics("plan_a", 2, base_dir=tmp_path, platform="egestiona")
+    metrics = load_metrics("plan_a", base_dir=tmp_path)
+    errors = []
+
+    def worker():
+        try:
+            for _ in range(20):
+                save_metrics(metrics.model_copy(deep=True), base_dir=tmp_path)
+        except Exception as e:  # pragma: no cover - solo para diagnosticar
+            errors.append(e)
+
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        threads = [threading.Thread(target=worker) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(old_interval)
+
+    assert errors == []
+    days = get_metrics_rollup(tmp_path).daily()
+    assert sum(p["runs"] for platforms in days.values() for p in platforms.values()) == 1
+    assert get_metrics_rollup(tmp_path).summary()["total_items"] == 2
+
+
+def test_summary_endpoint_reads_rollup_without_scanning_plans(tmp_path, monkeypatch):
+    initialize_metrics("plan_a", 2, base_dir=tmp_path, platform="egestiona")
+    update_metrics_from_decisions("plan_a", _decisions("AUTO_UPLOAD", "SKIP"), base_dir=tmp_path)
+    rollup_path = get_metrics_rollup(tmp_path).path
+    assert json.loads(rollup_path.read_text(encoding="utf-8"))["version"] == metrics_rollup_v1.ROLLUP_VERSION
+
+    monkeypatch.setattr(metrics_routes, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(metrics_rollup_v1, "_STORES", {})
+    monkeypatch.setattr(
+        MetricsRollupStoreV1,
+        "_iter_plan_metrics",
+        lambda self: pytest.fail("el resumen no debe recorrer los plan dirs"),
+    )
+
+    app = FastAPI()
+    app.include_router(metrics_routes.router)
+    client = TestClient(app)
+
+    body = client.get("/api/metrics/summary", params={"platform": "egestiona"}).json()
+    assert body["total_runs"] == 1
+    assert body["percentages"]["auto_upload"] == pytest.approx(50.0)
+
+    ranged = client.get("/api/metrics/summary", params={"from_date": "2000-01-01", "to_date": "2100-01-01"}).json()
+    assert ranged["total_items"] == 2
+
+    bad = client.get("/api/metrics/summary", params={"from_date": "2100-01-01", "to_date": "2000-01-01"})
+    assert bad.status_code == 400
@@ -0,0 +1,153 @@
+"""
+Tests de la caché compartida de texto PDF (lector falso: sin pypdf real).
+"""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from backend.shared.pdf_text_cache import (
+    PdfTextCacheV1,
+    PdfTextExtractionError,
+    reset_pdf_text_cache,
+    sha256_file,
+)
+
+
+class _FakePage:
+    def __init__(self, text, fail=False):
+        self.text = text
+        self.fail = fail
+        self.calls = 0
+
+    def extract_text(self):
+        self.calls += 1
+        if self.fail:
+            raise ValueError("broken page")
+        return self.text
+
+
+class _FakeReaderFactory:
+    def __init__(self, pages):
+        self.pages = pages
+        self.opened = 0
+
+    def __call__(self, path):
+        self.opened += 1
+        return self
+
+
+@pytest.fixture
+def pdf_file(tmp_path):
+    path = tmp_path / "doc.pdf"
+    path.write_bytes(b"%PDF-1.4 fake")
+    return path
+
+
+def test_same_content_is_extracted_once(tmp_path, pdf_file):
+    cache = PdfTextCacheV1(tmp_path / "cache")
+    factory = _FakeReaderFactory([_FakePage("uno"), _FakePage(""), _FakePage("tres")])
+
+    first = cache.extract(pdf_file, reader_factory=factory)
+    assert first.text() == "uno\ntres"
+    assert first.page_count == 3 and first.complete
+
+    # Copia con otro nombre: mismo sha256 -> sin volver a abrir el PDF
+    copy = tmp_path / "copia.pdf"
+    copy.write_bytes(pdf_file.read_bytes())
+    second = cache.extract(copy, reader_factory=factory)
+    assert second.text() == "uno\ntres"
+    assert factory.opened == 1
+    assert cache.stats["memory_hits"] == 1
+
+    # Otro proceso (caché nueva, mismo directorio): se lee de disco
+    other = PdfTextCacheV1(tmp_path / "cache")
+    third = other.extract(pdf_file, reader_factory=factory, sha256=sha256_file(pdf_file))
+    assert third.pages == ["uno", "", "tres"]
+    assert factory.opened == 1
+    assert other.stats["disk_hits"] == 1
+
+
+def test_partial_extraction_is_completed_incrementally(tmp_path, pdf_file):
+    cache = PdfTextCacheV1(tmp_path / "cache")
+    pages = [_FakePage(f"p{i}") for i in range(5)]
+    factory = _FakeReaderFactory(pages)
+
+    partial = cache.extract(pdf_file, reader_factory=factory, max_pages=2)
+    assert partial.pages == ["p0", "p1"] and not partial.complete
+    assert cache.extract(pdf_file, reader_factory=factory, max_pages=2) is partial
+    assert factory.opened == 1
+
+    full = cache.extract(pdf_file, reader_factory=factory)
+    assert full.text() == "p0\np1\np2\np3\np4"
+    assert factory.opened == 2
+    assert [p.calls for p in pages] == [1, 1, 1, 1, 1]
+
+
+def test_page_errors_are_recorded_and_open_errors_not_cached(tmp_path, pdf_file):
+    cache = PdfTextCacheV1(tmp_path / "cache")
+    flaky = _FakePage("b", fail=True)
+    factory = _FakeReaderFactory([_FakePage("a"), flaky])
+    entry = cache.extract(pdf_file, reader_factory=factory)
+    assert entry.pages == ["a", None]
+    assert "broken page" in entry.page_errors[1]
+
+    # Un resultado con páginas fallidas no se cachea (ni en memoria ni en disco): se reintenta
+    sha = sha256_file(pdf_file)
+    assert cache.get(sha) is None and not (tmp_path / "cache" / sha[:2] / f"{sha}.json").exists()
+    flaky.fail = False
+    assert cache.extract(pdf_file, reader_factory=factory).pages == ["a", "b"]
+    assert factory.opened == 2 and cache.get(sha).complete
+
+    other = tmp_path / "other.pdf"
+    other.write_bytes(b"%PDF-1.4 other")
+
+    def _broken(path):
+        raise OSError("truncated")
+
+    with pytest.raises(PdfTextExtractionError):
+        cache.extract(other, reader_factory=_broken)
+    assert cache.get(sha256_file(other)) is None
+
+
+def test_reset_points_process_cache_to_dir(tmp_path, pdf_file):
+    cache = reset_pdf_text_cache(tmp_path / "shared")
+    try:
+        cache.extract(pdf_file, reader_factory=_FakeReaderFactory([_FakePage("x")]))
+        sha = sha256_file(pdf_file)
+        assert (tmp_path / "shared" / sha[:2] / f"{sha}.json").exists()
+    finally:
+        reset_pdf_text_cache()
+
+
+def test_extraction_does_not_hold_the_cache_lock(tmp_path):
+    cache = PdfTextCacheV1(tmp_path / "cache")
+    slow, fast = tmp_path / "slow.pdf", tmp_path / "fast.pdf"
+    slow.write_bytes(b"%PDF-1.4 slow")
+    for i in range(100):
+        fast.write_bytes(b"%%PDF-1.4 fast %d" % i)
+        if cache._lock_for(sha256_file(fast)) is not cache._lock_for(sha256_file(slow)):
+            break
+
+    started, release = threading.Event(), threading.Event()
+
+    class _BlockingPage:
+        def extract_text(self):
+            started.set()
+            release.wait(5)
+            return "lento"
+
+    worker = threading.Thread(
+        target=cache.extract, args=(slow,), kwargs={"reader_factory": _FakeReaderFactory([_BlockingPage()])}
+    )
+    worker.start()
+    try:
+        assert started.wait(5)
+        # Mientras se parsea otro PDF, extraer y consultar este no espera
+        assert cache.extract(fast, reader_factory=_FakeReaderFactory([_FakePage("rapido")])).text() == "rapido"
+        assert cache.get(sha256_file(slow)) is None
+    finally:
+        release.set()
+        worker.join(5)
+    assert cache.get(sha256_file(slow)).text() == "lento"
@@ -0,0 +1,114 @@
+"""
+Equivalencia del motor de redacción precompilado con la implementación original
+(texto, HTML y redacción por trozos): mismo resultado y mismo RedactionReport.
+"""
+
+import random
+import re
+
+from backend.executor.redaction_v1 import (
+    EMAIL_RE,
+    NIE_RE,
+    NIF_RE,
+    PHONE_RE,
+    TOKEN_RE,
+    RedactorV1,
+    _key_is_sensitive,
+    iter_string_chunks,
+)
+
+
+class _ReferenceRedactor(RedactorV1):
+    """Implementación original (pasadas finditer + sub, replace por input)."""
+
+    def redact_text(self, s):
+        if not self.enabled or not s:
+            return s
+        original = s
+        for rx, kind in ((EMAIL_RE, "email"), (PHONE_RE, "phone"), (NIF_RE, "dni_nif"), (NIE_RE, "dni_nie"), (TOKEN_RE, "token")):
+            matches = list(rx.finditer(s))
+            if matches:
+                self.report.inc(kind, len(matches))
+                s = rx.sub("***", s)
+        if s != original:
+            self.report.inc("text_redactions", 1)
+        return s
+
+    def redact_html(self, html):
+        if not self.enabled or not html:
+            return html
+        red = self.redact_text(html)
+        pw_rx = re.compile(r'(<input[^>]*type=["\']password["\'][^>]*value=["\'])([^"\']*)(["\'])', re.IGNORECASE)
+        m = list(pw_rx.finditer(red))
+        if m:
+            self.report.inc("password_value", len(m))
+            red = pw_rx.sub(r"\1***\3", red)
+        named_rx = re.compile(r'(<input[^>]*(?:name|id)=["\']([^"\']+)["\'][^>]*value=["\'])([^"\']*)(["\'])', re.IGNORECASE)
+        out = red
+        for mm in list(named_rx.finditer(out)):
+            if _key_is_sensitive(mm.group(2) or ""):
+                self.report.inc("sensitive_input_value", 1)
+                out = out.replace(mm.group(0), mm.group(1) + "***" + mm.group(4))
+        return out
+
+
+PIECES = [
+    "john.doe@example.com", "600 123 456", "+34 600-123-456", "12345678Z", "X1234567L",
+    "A" * 24, "observation_captured_event", "abcdefghijklmnopqrstuvwx", "Session_Token_ABC123xyz789",
+    " ", " ", "\n", "\n", "-", ".", "@", "x", "7", "Z", "<div>", "</div>",
+    '<input type="password" value="Secret1">', "<input name='email' value='a@b.es'>",
+    '<input id="user" value="demo">', '<input\n name="tel" value="6">', 'value="', '"', ">",
+]
+
+
+def _random_doc(rng, n):
+    return "".join(rng.choice(PIECES) for _ in range(n))
+
+
+def _pair(kind, doc):
+    ref, new = _ReferenceRedactor(enabled=True), RedactorV1(enabled=True)
+    return getattr(ref, kind)(doc), ref.report.counts, getattr(new, kind)(doc), new.report.counts
+
+
+def test_known_overlap_cases_match_reference():
+    for doc in (
+        "600 123 456.x@y.com",
+        "observation_captured_long_name 600123456",
+        "Email john.doe@example.com DNI 12345678Z TOKEN " + "A" * 32,
+        "a@b.com-123456789 X1234567L",
+    ):
+        ref_out, ref_counts, out, counts = _pair("redact_text", doc)
+        assert out == ref_out
+        assert counts == ref_counts
+
+
+def test_random_text_and_html_match_reference():
+    rng = random.Random(1234)
+    for _ in range(300):
+        doc = _random_doc(rng, rng.randint(1, 60))
+        for kind in ("redact_text", "redact_html"):
+            ref_out, ref_counts, out, counts = _pair(kind, doc)
+            assert out == ref_out, doc
+            assert counts == ref_counts, doc
+
+
+def test_streaming_matches_whole_document():
+    rng = random.Random(99)
+    for _ in range(200):
+        doc = _random_doc(rng, rng.randint(20, 200))
+        size = rng.randint(1, 40)
+        for kind, stream in (("redact_text", "iter_redact_text"), ("redact_html", "iter_redact_html")):
+            whole = RedactorV1(enabled=True)
+            expected = getattr(whole, kind)(doc)
+            streamed = RedactorV1(enabled=True)
+            out = "".join(getattr(streamed, stream)(iter_string_chunks(doc, size)))
+            assert out == expected, (doc, size)
+            assert streamed.report.counts == whole.report.counts, (doc, size)
+
+
+def test_disabled_redactor_is_noop():
+    r = RedactorV1(enabled=False)
+    doc = "john.doe@example.com"
+    assert r.redact_html(doc) == doc
+    assert "".join(r.iter_redact_text([doc])) == doc
+    assert r.report.counts == {}
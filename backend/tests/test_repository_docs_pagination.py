@@ -0,0 +1,177 @@
+"""
+Tests de /api/repository/docs: paginación por cursor, búsqueda, proyección de campos,
+caché de tipos por petición y ETag/If-None-Match sobre la generación del repositorio.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.repository import document_repository_routes
+from backend.repository.document_catalog_v1 import reset_document_catalogs
+from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_backends_v1 import close_sqlite_connections
+from backend.shared.document_repository_v1 import DocumentInstanceV1, DocumentScopeV1
+
+
+def _make_store(tmp_path, backend="json"):
+    with patch('backend.repository.document_repository_store_v1.load_settings') as mock_settings:
+        class MockSettings:
+            repository_root_dir = str(tmp_path / "repository")
+            storage_backend = backend
+        mock_settings.return_value = MockSettings()
+        return DocumentRepositoryStoreV1(base_dir=str(tmp_path))
+
+
+def _doc(doc_id, *, minutes=0, file_name=None, company_key="C1", person_key=None):
+    return DocumentInstanceV1(
+        doc_id=doc_id,
+        file_name_original=file_name or f"{doc_id}.pdf",
+        stored_path=f"data/repository/docs/{doc_id}.pdf",
+        sha256="0" * 64,
+        type_id="T1",
+        scope=DocumentScopeV1.worker if person_key else DocumentScopeV1.company,
+        company_key=company_key,
+        person_key=person_key,
+        created_at=datetime(2025, 1, 1) + timedelta(minutes=minutes),
+    )
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    reset_document_catalogs()
+    store = _make_store(tmp_path)
+    monkeypatch.setattr(document_repository_routes, "get_repository_store", lambda: store)
+    yield store
+    close_sqlite_connections()
+    reset_document_catalogs()
+
+
+@pytest.fixture
+def client(store):
+    app = FastAPI()
+    app.include_router(document_repository_routes.router)
+    return TestClient(app)
+
+
+def test_cursor_walk_is_stable_and_legacy_list_is_kept(store, client):
+    # Dos documentos con el mismo created_at: el desempate por doc_id evita saltos/duplicados
+    for i, doc_id in enumerate(["a", "b", "c", "d", "e"]):
+        store.save_document(_doc(doc_id, minutes=min(i, 3)))
+
+    legacy = client.get("/api/repository/docs").json()
+    assert isinstance(legacy, list) and [d["doc_id"] for d in legacy] == ["e", "d", "c", "b", "a"]
+
+    seen, cursor = [], None
+    while True:
+        params = {"page_size": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/repository/docs", params=params).json()
+        assert page["total"] == 5 and len(page["items"]) <= 2
+        seen += [d["doc_id"] for d in page["items"]]
+        cursor = page["next_cursor"]
+        if not page["has_more"]:
+            assert cursor is None
+            break
+    assert seen == ["e", "d", "c", "b", "a"]
+
+    asc = client.get("/api/repository/docs", params={"page_size": 3, "sort": "date_asc"}).json()
+    assert [d["doc_id"] for d in asc["items"]] == ["a", "b", "c"]
+    # Un cursor de otra ordenación o corrupto es un error del cliente
+    assert client.get("/api/repository/docs", params={"cursor": asc["next_cursor"]}).status_code == 400
+    assert client.get("/api/repository/docs", params={"cursor": "no-es-un-cursor"}).status_code == 400
+
+
+def test_search_and_projection(store, client):
+    store.save_document(_doc("a", file_name="Recibo_Autónomos_Enero.pdf", minutes=1))
+    store.save_document(_doc("b", company_key="TEDELAB", minutes=2))
+    store.save_document(_doc("c", person_key="EMILIO_GARCIA", minutes=3))
+
+    def ids(**params):
+        return [d["doc_id"] for d in client.get("/api/repository/docs", params=params).json()]
+
+    assert ids(q="autonomos") == ["a"]  # sin tildes ni mayúsculas
+    assert ids(q="tedelab") == ["b"]
+    assert ids(q="emilio") == ["c"]
+    assert ids(person_key="EMILIO_GARCIA") == ["c"]
+
+    projected = client.get("/api/repository/docs", params={"fields": "doc_id,validity_status"}).json()
+    assert all(set(d) == {"doc_id", "validity_status"} for d in projected)
+
+
+def test_subject_demo_filters_and_text_sorts_apply_before_paging(store, client):
+    store.save_document(_doc("w_b", person_key="BEA", minutes=1))
+    store.save_document(_doc("w_a", person_key="ANA", minutes=2))
+    store.save_document(_doc("c_z", company_key="ZETA", minutes=3))
+    store.save_document(_doc("w_a2", person_key="ANA", minutes=4))
+    store.save_document(_doc("demo_1", person_key="ANA", minutes=5))
+    store.save_document(_doc("t_1", person_key="TEST_X", minutes=6))
+
+    def walk(**params):
+        seen, cursor, totals = [], None, set()
+        while True:
+            page = client.get(
+                "/api/repository/docs", params={"page_size": 1, **params, **({"cursor": cursor} if cursor else {})}
+            ).json()
+            seen += [d["doc_id"] for d in page["items"]]
+            totals.add(page["total"])
+            cursor = page["next_cursor"]
+            if not page["has_more"]:
+                return seen, totals
+
+    assert walk(subject_key="ANA", exclude_demo=True) == (["w_a2", "w_a"], {2})
+    # Sujeto A→Z sobre todo el repositorio (empates: más reciente primero), no por página
+    assert walk(sort="subject", exclude_demo=True) == (["w_a2", "w_a", "w_b", "c_z"], {4})
+    assert walk(sort="subject")[0][:3] == ["demo_1", "w_a2", "w_a"]
+
+    cursor = client.get("/api/repository/docs", params={"page_size": 1, "sort": "subject"}).json()["next_cursor"]
+    bad = client.get("/api/repository/docs", params={"page_size": 1, "sort": "type", "cursor": cursor})
+    assert bad.status_code == 400
+
+
+def test_types_are_read_once_per_request(store, client):
+    for i in range(5):
+        store.save_document(_doc(f"d{i}", minutes=i))
+
+    with patch.object(store.backend, "read_types_raw", wraps=store.backend.read_types_raw) as read_types:
+        assert len(client.get("/api/repository/docs").json()) == 5
+    assert read_types.call_count == 1
+
+
+def test_etag_revalidation_returns_304_until_repository_changes(store, client):
+    store.save_document(_doc("a"))
+
+    first = client.get("/api/repository/docs", params={"page_size": 10})
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"') and first.headers["cache-control"] == "no-cache"
+
+    cached = client.get("/api/repository/docs", params={"page_size": 10}, headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    # Otra consulta tiene su propio ETag
+    assert client.get("/api/repository/docs", headers={"If-None-Match": etag}).status_code == 200
+
+    store.save_document(_doc("b", minutes=1))
+    changed = client.get("/api/repository/docs", params={"page_size": 10}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert [d["doc_id"] for d in changed.json()["items"]] == ["b", "a"]
+
+    store.delete_document("b")
+    assert client.get(
+        "/api/repository/docs", params={"page_size": 10}, headers={"If-None-Match": changed.headers["etag"]}
+    ).status_code == 200
+
+
+def test_sqlite_documents_signature_follows_writes(tmp_path):
+    reset_document_catalogs()
+    try:
+        store = _make_store(tmp_path, backend="sqlite")
+        initial = store.documents_signature()
+        store.save_document(_doc("a"))
+        saved = store.documents_signature()
+        store.delete_document("a")
+        assert initial != saved != store.documents_signature()
+    finally:
+        close_sqlite_connections()
+        reset_document_catalogs()
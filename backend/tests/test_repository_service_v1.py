@@ -0,0 +1,94 @@
+"""
+Tests del servicio compartido de config/repositorio (cachés invalidadas por escritura o mtime).
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from backend.repository.config_store_v1 import ConfigStoreV1
+from backend.repository.repository_service_v1 import RepositoryServiceV1
+from backend.repository.settings_routes import RepositorySettingsV1, load_settings, save_settings
+from backend.shared.people_v1 import PeopleV1, PersonV1
+
+
+@pytest.fixture
+def repo_data_dir(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    monkeypatch.setenv("REPOSITORY_DATA_DIR", str(data_dir))
+    return data_dir
+
+
+def _bump_mtime(path: Path) -> None:
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def test_config_store_reads_are_cached_and_invalidated(tmp_path):
+    base = tmp_path / "data"
+    store = ConfigStoreV1(base_dir=base)
+    people = PeopleV1(people=[PersonV1(worker_id="w1", full_name="Juan", tax_id="00000000T", role="worker", relation_type="employee")])
+    store.save_people(people)
+
+    # Otra instancia sobre el mismo base_dir ve la escritura
+    other = ConfigStoreV1(base_dir=base)
+    loaded = other.load_people()
+    assert [p.worker_id for p in loaded.people] == ["w1"]
+
+    # Las copias devueltas son independientes de la caché
+    loaded.people.clear()
+    assert len(other.load_people().people) == 1
+
+    # Edición externa del fichero (sin pasar por save_people): se detecta por mtime/tamaño
+    people_path = Path(store.refs_dir) / "people.json"
+    raw = json.loads(people_path.read_text(encoding="utf-8"))
+    raw["people"][0]["full_name"] = "Juana"
+    people_path.write_text(json.dumps(raw), encoding="utf-8")
+    _bump_mtime(people_path)
+    assert other.load_people().people[0].full_name == "Juana"
+
+
+def test_load_settings_cached_until_file_changes(repo_data_dir):
+    first = load_settings()
+    settings_path = repo_data_dir / "repository" / "settings.json"
+    assert settings_path.exists()
+
+    new_root = repo_data_dir / "other_repo"
+    save_settings(RepositorySettingsV1(repository_root_dir=str(new_root)))
+    assert load_settings().repository_root_dir == str(new_root.resolve())
+
+    settings_path.write_text(json.dumps({"repository_root_dir": first.repository_root_dir}), encoding="utf-8")
+    _bump_mtime(settings_path)
+    assert load_settings().repository_root_dir == first.repository_root_dir
+
+
+def test_service_reuses_stores_and_follows_settings(repo_data_dir, tmp_path):
+    service = RepositoryServiceV1(base_dir=tmp_path / "data")
+    service.warm_up()
+
+    store = service.repository_store()
+    assert service.repository_store() is store
+    assert service.config_store() is service.config_store()
+    assert store.get_type("T104_AUTONOMOS_RECEIPT") is not None
+
+    # Cambiar la raíz del repositorio en settings: el servicio entrega un store nuevo
+    new_root = tmp_path / "moved_repo"
+    save_settings(RepositorySettingsV1(repository_root_dir=str(new_root)))
+    moved = service.repository_store()
+    assert moved is not store
+    assert moved.repo_dir == new_root.resolve()
+    assert moved.get_type("T104_AUTONOMOS_RECEIPT") is not None  # seed en la nueva raíz
+
+
+def test_repository_store_reinitializes_deleted_layout(repo_data_dir, tmp_path):
+    service = RepositoryServiceV1(base_dir=tmp_path / "data")
+    store = service.repository_store()
+    store.types_path.unlink()
+
+    # El marcador de layout falta: el siguiente store vuelve a sembrar los tipos
+    from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+    fresh = DocumentRepositoryStoreV1(base_dir=tmp_path / "data")
+    assert fresh.types_path.exists()
+    assert fresh.get_type("T104_AUTONOMOS_RECEIPT") is not None
@@ -0,0 +1,239 @@
+"""
+Tests del backend SQLite de DocumentRepositoryStoreV1 y del migrador desde JSON.
+"""
+
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from fastapi import HTTPException
+
+from backend.repository import settings_routes
+from backend.repository.document_catalog_v1 import reset_document_catalogs
+from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_backends_v1 import (
+    SQLITE_DB_NAME,
+    SqliteRepositoryBackendV1,
+    close_sqlite_connections,
+    json_changed_since_sqlite,
+    migrate_json_to_sqlite,
+)
+from backend.repository.submission_rules_store_v1 import SubmissionRulesStoreV1
+from backend.shared.document_repository_v1 import (
+    DocumentInstanceV1,
+    DocumentScopeV1,
+    SubmissionRuleMatchV1,
+    SubmissionRuleV1,
+)
+
+
+def _make_store(repo_dir, backend):
+    with patch('backend.repository.document_repository_store_v1.load_settings') as mock_settings:
+        class MockSettings:
+            repository_root_dir = str(repo_dir)
+            storage_backend = backend
+        mock_settings.return_value = MockSettings()
+        return DocumentRepositoryStoreV1(base_dir=str(repo_dir.parent))
+
+
+@pytest.fixture(autouse=True)
+def _isolate():
+    reset_document_catalogs()
+    yield
+    close_sqlite_connections()
+    reset_document_catalogs()
+
+
+def _doc(doc_id, *, type_id="T104_AUTONOMOS_RECEIPT", person_key="P1", period_key="2025-01", minutes=0):
+    return DocumentInstanceV1(
+        doc_id=doc_id,
+        file_name_original=f"{doc_id}.pdf",
+        stored_path=f"data/repository/docs/{doc_id}.pdf",
+        sha256="0" * 64,
+        type_id=type_id,
+        scope=DocumentScopeV1.worker,
+        person_key=person_key,
+        period_key=period_key,
+        created_at=datetime(2025, 1, 1) + timedelta(minutes=minutes),
+    )
+
+
+def test_sqlite_store_roundtrip(tmp_path):
+    repo_dir = tmp_path / "repository"
+    store = _make_store(repo_dir, "sqlite")
+
+    assert isinstance(store.backend, SqliteRepositoryBackendV1)
+    assert (repo_dir / SQLITE_DB_NAME).exists()
+    assert not (repo_dir / "types" / "types.json").exists()
+    # Seed inicial en la tabla types
+    assert store.get_type("T104_AUTONOMOS_RECEIPT") is not None
+
+    store.save_document(_doc("a", minutes=1))
+    store.save_document(_doc("b", person_key="P2", minutes=2))
+    assert [d.doc_id for d in store.list_documents()] == ["b", "a"]
+    assert [d.doc_id for d in store.list_documents(person_key="P1", scope="worker")] == ["a"]
+    assert store.get_document("a").period_key == "2025-01"
+
+    store.delete_document("a")
+    assert store.get_document("a") is None
+    assert [d.doc_id for d in store.list_documents()] == ["b"]
+
+
+def test_migrate_json_layout_to_sqlite(tmp_path):
+    repo_dir = tmp_path / "repository"
+    json_store = _make_store(repo_dir, "json")
+    json_store.save_document(_doc("a", minutes=1))
+    json_store.save_document(_doc("b", person_key="P2", minutes=2))
+    (repo_dir / "meta" / "broken.json").write_text("{not json", encoding="utf-8")
+
+    counts = migrate_json_to_sqlite(repo_dir)
+    assert counts["types"] == 1
+    assert counts["documents"] == 2
+    assert counts["documents_skipped"] == 1
+
+    sqlite_store = _make_store(repo_dir, "sqlite")
+    assert [t.type_id for t in sqlite_store.list_types()] == ["T104_AUTONOMOS_RECEIPT"]
+    assert [d.doc_id for d in sqlite_store.list_documents()] == ["b", "a"]
+
+    # Idempotente
+    assert migrate_json_to_sqlite(repo_dir)["documents"] == 2
+    assert len(sqlite_store.list_documents()) == 2
+
+
+def test_sqlite_store_reads_rules_written_by_rules_store(tmp_path):
+    repo_dir = tmp_path / "repository"
+    store = _make_store(repo_dir, "sqlite")
+    rules_store = SubmissionRulesStoreV1(base_dir=tmp_path)
+    assert rules_store.rules_path == store.backend.rules_path.resolve()
+    assert store.list_submission_rules() == []
+
+    rules_store.create_rule(SubmissionRuleV1(
+        rule_id="R1",
+        platform_key="egestiona",
+        match=SubmissionRuleMatchV1(pending_text_contains=["prl"]),
+        document_type_id="T104_AUTONOMOS_RECEIPT",
+    ))
+    assert [r.rule_id for r in store.list_submission_rules()] == ["R1"]
+
+    rules_store.delete_rule("R1")
+    assert store.list_submission_rules() == []
+
+
+def test_sqlite_documents_scope_is_indexed(tmp_path):
+    store = _make_store(tmp_path / "repository", "sqlite")
+    indexes = {
+        row[0]
+        for row in store.backend._fetchall(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'documents'"
+        )
+    }
+    assert "idx_documents_scope" in indexes
+
+
+def test_remigration_mirrors_json_edits_made_after_switching_back(tmp_path):
+    repo_dir = tmp_path / "repository"
+    json_store = _make_store(repo_dir, "json")
+    json_store.save_document(_doc("a", minutes=1))
+    json_store.save_document(_doc("b", minutes=2))
+    migrate_json_to_sqlite(repo_dir)
+    assert not json_changed_since_sqlite(repo_dir)
+
+    # De vuelta en json: se borra "a" y se crea "c" (mtime de fichero con resolución de tick)
+    time.sleep(0.05)
+    json_store.delete_document("a")
+    json_store.save_document(_doc("c", minutes=3))
+    assert json_changed_since_sqlite(repo_dir)
+
+    counts = migrate_json_to_sqlite(repo_dir, replace_documents=True)
+    assert counts["documents"] == 2
+    sqlite_store = _make_store(repo_dir, "sqlite")
+    assert [d.doc_id for d in sqlite_store.list_documents()] == ["c", "b"]
+    assert not json_changed_since_sqlite(repo_dir)
+
+
+def test_deletion_alone_marks_json_as_changed_since_sqlite(tmp_path):
+    repo_dir = tmp_path / "repository"
+    json_store = _make_store(repo_dir, "json")
+    json_store.save_document(_doc("a", minutes=1))
+    json_store.save_document(_doc("b", minutes=2))
+    migrate_json_to_sqlite(repo_dir)
+    assert not json_changed_since_sqlite(repo_dir)
+
+    # Sin sleep: el borrado no deja ningún fichero con mtime posterior a la migración
+    json_store.delete_document("a")
+    assert json_changed_since_sqlite(repo_dir)
+
+    migrate_json_to_sqlite(repo_dir, replace_documents=True)
+    assert not json_changed_since_sqlite(repo_dir)
+    sqlite_store = _make_store(repo_dir, "sqlite")
+    assert [d.doc_id for d in sqlite_store.list_documents()] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_switch_to_sqlite_refuses_stale_db_unless_remigrate(tmp_path, monkeypatch):
+    settings_path = tmp_path / "settings.json"
+    monkeypatch.setattr(settings_routes, "get_settings_path", lambda: settings_path)
+    repo_dir = tmp_path / "repository"
+
+    async def _put(backend, dry_run=None, remigrate=False):
+        settings = settings_routes.RepositorySettingsV1(repository_root_dir=str(repo_dir), storage_backend=backend)
+        # Llamada directa a la ruta: los defaults Query(...) no se resuelven
+        return await settings_routes.update_settings(settings, dry_run=dry_run, remigrate=remigrate)
+
+    json_store = _make_store(repo_dir, "json")
+    json_store.save_document(_doc("a", minutes=1))
+    await _put("json")
+
+    # Primera activación: sin repository.sqlite3, migración automática
+    await _put("sqlite")
+    assert [d.doc_id for d in _make_store(repo_dir, "sqlite").list_documents()] == ["a"]
+
+    # Vuelta a json y edición: el cambio a sqlite se rechaza (también en dry_run)
+    await _put("json")
+    time.sleep(0.05)
+    json_store.save_document(_doc("b", minutes=2))
+    for dry_run in (True, None):
+        with pytest.raises(HTTPException) as exc:
+            await _put("sqlite", dry_run=dry_run)
+        assert exc.value.status_code == 409
+    assert settings_routes.load_settings().storage_backend == "json"
+
+    await _put("sqlite", remigrate=True)
+    assert settings_routes.load_settings().storage_backend == "sqlite"
+    assert [d.doc_id for d in _make_store(repo_dir, "sqlite").list_documents()] == ["b", "a"]
+
+
+@pytest.mark.asyncio
+async def test_switch_back_to_json_exports_sqlite_changes(tmp_path, monkeypatch):
+    settings_path = tmp_path / "settings.json"
+    monkeypatch.setattr(settings_routes, "get_settings_path", lambda: settings_path)
+    repo_dir = tmp_path / "repository"
+
+    async def _put(backend, remigrate=False):
+        settings = settings_routes.RepositorySettingsV1(repository_root_dir=str(repo_dir), storage_backend=backend)
+        return await settings_routes.update_settings(settings, dry_run=None, remigrate=remigrate)
+
+    json_store = _make_store(repo_dir, "json")
+    json_store.save_document(_doc("a", minutes=1))
+    json_store.save_document(_doc("b", minutes=2))
+    await _put("json")
+    await _put("sqlite")
+
+    # En sqlite: se borra "a", se crea "c" y se edita "b"
+    sqlite_store = _make_store(repo_dir, "sqlite")
+    sqlite_store.delete_document("a")
+    sqlite_store.save_document(_doc("c", minutes=3))
+    sqlite_store.save_document(_doc("b", minutes=2, period_key="2025-02"))
+
+    await _put("json")
+    json_store = _make_store(repo_dir, "json")
+    docs = json_store.list_documents()
+    assert [d.doc_id for d in docs] == ["c", "b"]
+    assert json_store.get_document("b").period_key == "2025-02"
+    assert not (repo_dir / "meta" / "a.json").exists()
+
+    # JSON y SQLite quedan sincronizados: volver a sqlite no exige re-migrar
+    assert not json_changed_since_sqlite(repo_dir)
+    await _put("sqlite")
+    assert settings_routes.load_settings().storage_backend == "sqlite"
@@ -0,0 +1,142 @@
+"""
+Tests del índice persistente de runs (viewer /runs y runs audit-ready).
+"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.executor import runs_viewer
+from backend.executor.runs_viewer import create_runs_viewer_router, list_runs_page
+from backend.shared import run_index_v1
+from backend.shared.run_index_v1 import (
+    EXECUTOR_INDEX_FILENAME,
+    executor_run_record,
+    get_executor_run_index,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_indexes(monkeypatch):
+    monkeypatch.setattr(run_index_v1, "_INDEXES", {})
+
+
+def _write_run(runs_root: Path, run_id: str, minute: int, status: str = "success", last_error=None) -> None:
+    run_dir = runs_root / run_id
+    run_dir.mkdir(parents=True)
+    started = f"2026-01-01T00:{minute:02d}:00+00:00"
+    events = [
+        {"schema_version": "v1", "run_id": run_id, "seq": 1, "ts_utc": started, "event_type": "run_started",
+         "step_id": None, "state_signature_before": None, "state_signature_after": None,
+         "metadata": {"execution_mode": "training"}},
+        {"schema_version": "v1", "run_id": run_id, "seq": 2, "ts_utc": started, "event_type": "run_finished",
+         "step_id": None, "state_signature_before": None, "state_signature_after": None,
+         "metadata": {"status": status}},
+    ]
+    (run_dir / "trace.jsonl").write_text("\n".join(json.dumps(e) for e in events) + "\n", encoding="utf-8")
+    (run_dir / "run_finished.json").write_text(
+        json.dumps({"run_id": run_id, "status": status, "started_at": started, "finished_at": started,
+                    "last_error": last_error, "counters": {"retries": 0, "recoveries": 0}}),
+        encoding="utf-8",
+    )
+
+
+def test_index_rebuilds_once_then_serves_without_parsing(tmp_path, monkeypatch):
+    runs_root = tmp_path / "runs"
+    for i in range(5):
+        _write_run(runs_root, f"r_{i}", minute=i, status="failed" if i % 2 else "success",
+                   last_error="TIMEOUT" if i % 2 else None)
+
+    rows, total = list_runs_page(runs_root, offset=0, limit=2)
+    assert total == 5
+    assert [r.run_id for r in rows] == ["r_4", "r_3"]
+    assert (runs_root / EXECUTOR_INDEX_FILENAME).exists()
+
+    monkeypatch.setattr(runs_viewer, "parse_run", lambda run_dir: pytest.fail("el listado no debe parsear trazas"))
+
+    rows, total = list_runs_page(runs_root, status="failed")
+    assert total == 2
+    assert {r.run_id for r in rows} == {"r_1", "r_3"}
+    assert list_runs_page(runs_root, q="timeout")[1] == 2
+    assert [r.run_id for r in list_runs_page(runs_root, offset=4, limit=10)[0]] == ["r_0"]
+
+    # Un run nuevo registrado por el runtime aparece sin reconstruir
+    get_executor_run_index(runs_root).upsert(
+        executor_run_record("r_new", status="running", started_at="2026-01-02T00:00:00+00:00", mode="training")
+    )
+    rows, total = list_runs_page(runs_root, limit=1)
+    assert total == 6
+    assert rows[0].run_id == "r_new" and rows[0].status == "running"
+
+
+def test_index_upserts_compact_and_reload_from_disk(tmp_path):
+    runs_root = tmp_path / "runs"
+    runs_root.mkdir()
+    index = get_executor_run_index(runs_root)
+    for i in range(120):
+        index.upsert(executor_run_record("r_same", status="running", started_at=f"2026-01-01T00:00:{i % 60:02d}+00:00"))
+    index.upsert(executor_run_record("r_same", status="success", started_at="2026-01-01T00:00:00+00:00"))
+
+    lines = (runs_root / EXECUTOR_INDEX_FILENAME).read_text(encoding="utf-8").splitlines()
+    assert len(lines) < 121  # compactado
+    assert len(index) == 1
+
+    # Otro proceso (instancia nueva) ve el último estado
+    other = run_index_v1.RunIndexV1(
+        runs_root, filename=EXECUTOR_INDEX_FILENAME, scan=lambda root: [], sort_key=lambda r: r["run_id"]
+    )
+    assert other.get("r_same")["status"] == "success"
+
+
+def test_viewer_json_is_paginated(tmp_path):
+    runs_root = tmp_path / "runs"
+    for i in range(3):
+        _write_run(runs_root, f"r_{i}", minute=i)
+
+    app = FastAPI()
+    app.include_router(create_runs_viewer_router(runs_root=runs_root))
+    client = TestClient(app)
+
+    resp = client.get("/runs", params={"format": "json", "limit": 2, "offset": 1})
+    assert resp.status_code == 200
+    assert resp.headers["X-Total-Count"] == "3"
+    assert [r["run_id"] for r in resp.json()] == ["r_1", "r_0"]
+
+    html_page = client.get("/runs", params={"limit": 1}).text
+    assert "Siguientes" in html_page and "r_2" in html_page and "r_1" not in html_page
+
+
+def test_summary_runs_listed_from_index(tmp_path, monkeypatch):
+    import backend.config
+    from backend.api import runs_routes
+    from backend.shared.run_summary import (
+        RunContextV1,
+        RunSummaryV1,
+        create_run_dir,
+        list_run_summaries,
+        save_run_summary,
+    )
+
+    monkeypatch.setattr(backend.config, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(runs_routes, "DATA_DIR", tmp_path)
+
+    for i, platform in enumerate(["egestiona", "cetaima", "egestiona"]):
+        run_dir = create_run_dir(tmp_path, "t1", f"run_{i}")
+        run_dir = run_dir.rename(run_dir.parent / f"20260101_00000{i}__run_{i}")
+        context = RunContextV1(own_company_key="own", platform_key=platform, coordinated_company_key="coord")
+        save_run_summary(
+            run_dir,
+            RunSummaryV1(run_id=f"run_{i}", started_at=datetime(2026, 1, 1), status="success",
+                         context=context, run_dir_rel=run_dir.name),
+        )
+
+    assert [s["run_id"] for s in list_run_summaries(limit=10, platform="egestiona", tenant_id="t1")] == ["run_2", "run_0"]
+    assert [s["run_id"] for s in list_run_summaries(limit=1, offset=1, tenant_id="t1")] == ["run_1"]
+
+    latest = runs_routes._read_latest_run("t1")
+    assert latest["run_id"] == "run_2"
+    assert runs_routes._read_run("run_1", "t1")["summary"]["context"]["platform_key"] == "cetaima"
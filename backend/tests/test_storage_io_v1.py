@@ -0,0 +1,99 @@
+"""
+Tests de I/O de stores fuera del event loop (run_storage_io / async_store).
+
+Test de carga: la latencia p99 de /api/health se mantiene plana mientras
+listados pesados (/api/repository/docs, /api/metrics/summary) están en curso.
+"""
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from backend.api import metrics_routes
+from backend.repository import document_repository_routes
+from backend.shared.storage_io_v1 import async_store, run_storage_io
+
+SLOW_SCAN_S = 0.4
+
+
+class _SlowRepositoryStore:
+    """Store con un escaneo de meta/ lento y bloqueante."""
+
+    def list_documents(self, **kwargs):
+        time.sleep(SLOW_SCAN_S)
+        return []
+
+    def list_types(self, include_inactive=False):
+        return []
+
+    def documents_signature(self):
+        return ("slow", 0)
+
+    def types_signature(self):
+        return ("slow", 0)
+
+
+@pytest.mark.asyncio
+async def test_async_store_facade_runs_off_loop():
+    class _Store:
+        label = "docs"
+
+        def where(self):
+            return threading.current_thread().name
+
+    store = async_store(_Store())
+    label, thread_name, total = store.label, await store.where(), await run_storage_io(sum, [1, 2, 3])
+    assert label == "docs"
+    assert thread_name.startswith("storage-io")
+    assert total == 6
+
+
+@pytest.mark.asyncio
+async def test_health_p99_flat_during_heavy_listings(monkeypatch):
+    from backend.app import app
+
+    monkeypatch.setattr(document_repository_routes, "get_repository_store", lambda: _SlowRepositoryStore())
+
+    def slow_summary(*args):
+        time.sleep(SLOW_SCAN_S)
+        return {"total_runs": 0}
+
+    monkeypatch.setattr(metrics_routes, "_compute_metrics_summary", slow_summary)
+
+    async def _health_latencies(client, n, interval=0.01):
+        """Latencia medida desde el instante programado de cada sonda (incluye esperas del loop)."""
+        latencies = []
+        start = time.perf_counter()
+        for i in range(n):
+            scheduled = start + i * interval
+            delay = scheduled - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            resp = await client.get("/api/health")
+            latencies.append(time.perf_counter() - scheduled)
+            assert resp.status_code == 200
+        return latencies
+
+    def _p99(values):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * 0.99))]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        idle = await _health_latencies(client, 20)
+
+        async def _heavy():
+            await asyncio.sleep(0.02)  # lanzar los listados con las sondas ya en marcha
+            calls = [client.get("/api/repository/docs") for _ in range(4)]
+            calls += [client.get("/api/metrics/summary") for _ in range(2)]
+            return await asyncio.gather(*calls)
+
+        loaded, results = await asyncio.gather(_health_latencies(client, 60), _heavy())
+
+    assert all(r.status_code == 200 for r in results)
+    # Con I/O bloqueante en el loop, cada health esperaría al escaneo (>= SLOW_SCAN_S)
+    assert _p99(loaded) < SLOW_SCAN_S / 2
+    assert _p99(loaded) < _p99(idle) + 0.1
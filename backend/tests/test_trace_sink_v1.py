@@ -0,0 +1,96 @@
+"""
+Tests del trace sink bufferizado y del manifest incremental del runtime H4.
+"""
+
+import json
+
+from backend.executor.trace_sink_v1 import EvidenceManifestWriterV1, TraceSinkV1
+from backend.shared.executor_contracts_v1 import (
+    EvidenceItemV1,
+    EvidenceKindV1,
+    EvidencePolicyV1,
+    RedactionPolicyV1,
+)
+
+
+def _lines(path):
+    if not path.exists():
+        return []
+    return [json.loads(l) for l in path.read_text(encoding="utf-8").splitlines() if l.strip()]
+
+
+def test_sink_buffers_until_step_boundary_or_key_event(tmp_path):
+    trace = tmp_path / "run" / "trace.jsonl"
+    sink = TraceSinkV1(trace, max_buffered_events=10, fsync="never")
+
+    sink.write({"seq": 1, "event_type": "run_started"})
+    assert [e["seq"] for e in _lines(trace)] == [1]  # run_started se vacía al momento
+
+    sink.write({"seq": 2, "event_type": "action_started"})
+    sink.write({"seq": 3, "event_type": "action_executed"})
+    assert len(_lines(trace)) == 1  # en buffer
+
+    sink.flush()  # límite de paso
+    assert [e["seq"] for e in _lines(trace)] == [1, 2, 3]
+
+    sink.write({"seq": 4, "event_type": "action_started"})
+    sink.write({"seq": 5, "event_type": "error_raised"})
+    assert [e["seq"] for e in _lines(trace)] == [1, 2, 3, 4, 5]
+
+    for seq in range(6, 16):
+        sink.write({"seq": seq, "event_type": "observation_captured"})
+    assert len(_lines(trace)) == 15  # buffer lleno (10 eventos) -> vaciado
+
+    sink.write({"seq": 16, "event_type": "action_started"})
+    sink.close()
+    assert [e["seq"] for e in _lines(trace)] == list(range(1, 17))
+    assert sink.events_written == 16
+
+
+def test_sink_bounded_by_bytes(tmp_path):
+    trace = tmp_path / "trace.jsonl"
+    with TraceSinkV1(trace, max_buffered_events=1000, max_buffered_bytes=200, fsync="never") as sink:
+        for seq in range(20):
+            sink.write({"seq": seq, "event_type": "action_executed", "metadata": {"pad": "x" * 40}})
+            unflushed = seq + 1 - len(_lines(trace))
+            assert unflushed <= 4
+    assert len(_lines(trace)) == 20
+
+
+def _write_manifest(writer, report):
+    return writer.write(
+        run_id="r_1",
+        policy=EvidencePolicyV1(always=[EvidenceKindV1.screenshot], on_failure_or_critical=[]),
+        redaction=RedactionPolicyV1(enabled=True, rules=["emails"]),
+        placeholder=EvidenceItemV1(
+            kind=EvidenceKindV1.dom_snapshot_partial,
+            step_id="none",
+            relative_path="evidence/dom/none.json",
+            sha256="0" * 64,
+            size_bytes=0,
+        ),
+        redaction_report=report,
+        metadata={"execution_mode": "training"},
+    )
+
+
+def test_manifest_writer_placeholder_incremental_and_skips_unchanged(tmp_path):
+    path = tmp_path / "evidence_manifest.json"
+    writer = EvidenceManifestWriterV1(path)
+
+    assert _write_manifest(writer, {"emails": 0})
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert [i["relative_path"] for i in data["items"]] == ["evidence/dom/none.json"]
+
+    writer.add_items([
+        EvidenceItemV1(kind=EvidenceKindV1.screenshot, step_id="step_000",
+                       relative_path="evidence/shots/step_000.png", sha256="a" * 64, size_bytes=10),
+    ])
+    assert _write_manifest(writer, {"emails": 1})
+    assert not _write_manifest(writer, {"emails": 1})  # sin cambios: no reescribe
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    assert data["run_id"] == "r_1"
+    assert data["redaction_report"] == {"emails": 1}
+    assert [i["relative_path"] for i in data["items"]] == ["evidence/shots/step_000.png"]
+    assert writer.item_count == 1
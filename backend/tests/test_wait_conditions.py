@@ -0,0 +1,186 @@
+"""
+Tests de las esperas por condición de eGestiona (presupuestos por fase, timeline y
+sustitución de las pausas fijas). Usan páginas y frames falsos: no requieren Playwright.
+"""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from backend.adapters.egestiona import pagination_helper
+from backend.adapters.egestiona.wait_conditions import (
+    wait_for_frame,
+    wait_for_grid_idle,
+    wait_for_grid_rows,
+    wait_for_network_quiet,
+    wait_until,
+)
+from backend.runs import background_runs_v1
+from backend.runs.background_runs_v1 import BackgroundRunV1
+from backend.runs.run_timeline import EventType, RunTimeline
+from backend.shared.phase_timeout import DEFAULT_TIMEOUTS, PhaseTimeoutError, get_wait_budget
+
+
+class _FakeHandle:
+    def __init__(self, value):
+        self.value = value
+
+    def json_value(self):
+        return self.value
+
+
+class _FakeFrame:
+    """Frame falso: wait_for_function devuelve el valor configurado o lanza timeout."""
+
+    def __init__(self, name="", url="", value=None):
+        self.name = name
+        self.url = url
+        self.value = value
+        self.calls = []
+        self.evaluated = []
+        self.waits = 0
+
+    def wait_for_function(self, expression, arg=None, timeout=None, polling=None):
+        self.calls.append({"expression": expression, "arg": arg, "timeout": timeout, "polling": polling})
+        if self.value is None:
+            raise TimeoutError("Timeout exceeded")
+        return _FakeHandle(self.value)
+
+    def evaluate(self, expression):
+        self.evaluated.append(expression)
+        return True
+
+    def wait_for_timeout(self, ms):
+        self.waits += 1
+
+
+class _FakePage(_FakeFrame):
+    def __init__(self, frames=()):
+        super().__init__()
+        self.frames = list(frames)
+        self.load_states = []
+
+    def frame(self, name=None):
+        return next((f for f in self.frames if f.name == name), None)
+
+    def wait_for_load_state(self, state, timeout=None):
+        self.load_states.append((state, timeout))
+
+
+def test_wait_budget_per_phase_with_env_override_capped_by_phase_timeout(monkeypatch):
+    monkeypatch.delenv("WAIT_BUDGET_GRID_LOAD_S", raising=False)
+    assert get_wait_budget("grid_load") == 30
+    assert get_wait_budget("grid_load", 12.5) == 12.5
+    monkeypatch.setenv("WAIT_BUDGET_GRID_LOAD_S", "45")
+    assert get_wait_budget("grid_load") == 45
+    monkeypatch.setenv("WAIT_BUDGET_GRID_LOAD_S", "900")
+    assert get_wait_budget("grid_load") == DEFAULT_TIMEOUTS["grid_load"]
+    monkeypatch.setenv("WAIT_BUDGET_GRID_LOAD_S", "rapido")
+    assert get_wait_budget("grid_load") == 30
+
+
+def test_wait_until_returns_as_soon_as_condition_holds_and_records_duration():
+    timeline = RunTimeline("r1")
+    page = _FakePage()
+    polls = iter([None, False, "listo"])
+
+    started = time.monotonic()
+    result = wait_until(lambda: next(polls), condition="custom", phase="navigation",
+                        timeout_s=5.0, target=page, timeline=timeline)
+
+    assert result and result.value == "listo"
+    assert time.monotonic() - started < 1.0
+    assert page.waits == 2  # sondeo con wait_for_timeout de Playwright, no time.sleep
+    event = timeline.get_last_event()
+    assert event.type == EventType.INFO
+    assert event.metadata["condition"] == "custom" and event.metadata["phase"] == "navigation"
+    assert event.metadata["duration_ms"] == result.duration_ms
+
+
+def test_wait_until_timeout_is_falsy_warns_and_can_raise():
+    timeline = RunTimeline("r2")
+    result = wait_until(lambda: 1 / 0, condition="never", phase="pagination", timeout_s=0.05, timeline=timeline)
+
+    assert not result
+    assert timeline.get_last_event().type == EventType.WARNING
+    with pytest.raises(PhaseTimeoutError) as exc:
+        wait_until(lambda: False, condition="never", phase="pagination", timeout_s=0.01, raise_on_timeout=True)
+    assert exc.value.phase == "pagination"
+
+
+def test_waits_are_reported_to_the_current_background_run():
+    run = BackgroundRunV1(run_id="bg-1", kind="test")
+    background_runs_v1._current.run = run
+    try:
+        wait_until(lambda: True, condition="custom", phase="login", timeout_s=1.0)
+    finally:
+        background_runs_v1._current.run = None
+
+    events = run.timeline.get_events_dict()
+    assert len(events) == 1 and events[0]["metadata"]["phase"] == "login"
+
+
+def test_wait_for_frame_by_name_url_and_ready_check():
+    grid = _FakeFrame(name="", url="https://x/buscador.asp?Apartado_ID=3")
+    page = _FakePage([_FakeFrame(name="nm_contenido", url="https://x/dash")])
+
+    assert wait_for_frame(page, "nm_contenido", timeout_s=1.0).value is page.frames[0]
+
+    appear_after = iter([False, False, True])
+
+    def _find():
+        if next(appear_after, True) and grid not in page.frames:
+            page.frames.append(grid)
+        return page.frame(name="f3") or next((f for f in page.frames if "apartado_id=3" in f.url.lower()), None)
+
+    result = wait_for_frame(page, _find, ready=lambda fr: fr is grid, timeout_s=1.0)
+    assert result.value is grid
+
+    missing = wait_for_frame(page, "f3", url_contains=("nada",), timeout_s=0.05)
+    assert not missing and missing.value is None
+
+
+def test_grid_conditions_use_playwright_wait_for_function():
+    frame = _FakeFrame(value={"rows": 3, "registros": 3, "loading": False})
+
+    rows = wait_for_grid_rows(frame, min_rows=2, timeout_s=4.0)
+    assert rows and rows.value["rows"] == 3
+    assert frame.calls[-1]["arg"] == 2 and frame.calls[-1]["timeout"] == 4000
+
+    frame.value = {"rows": 3, "registros": 3, "mutations": 7, "saw_loading": True}
+    idle = wait_for_grid_idle(frame, quiet_ms=250, timeout_s=2.0)
+    assert idle and idle.value["saw_loading"]
+    assert "MutationObserver" in frame.evaluated[-1]  # observador (re)armado antes de esperar
+    assert frame.calls[-1]["arg"] == 250 and frame.calls[-1]["timeout"] <= 2000
+
+    frame.value = None
+    assert not wait_for_grid_rows(frame, timeout_s=0.0)
+    assert frame.calls[-1]["timeout"] >= 1  # nunca timeout=0 (sin límite en Playwright)
+
+
+def test_grid_rows_treats_explicit_zero_registros_as_settled():
+    # "0 Registros" sin "Loading...": el predicado devuelve el estado en lugar de seguir esperando
+    frame = _FakeFrame(value={"rows": 0, "registros": 0, "loading": False})
+    empty = wait_for_grid_rows(frame, timeout_s=30.0)
+    assert empty and empty.value["registros"] == 0
+    assert "state.registros === 0" in frame.calls[-1]["expression"]
+    assert frame.calls[-1]["expression"].index("state.loading") < frame.calls[-1]["expression"].index("=== 0")
+
+
+def test_network_quiet_uses_load_state_with_phase_budget(monkeypatch):
+    monkeypatch.delenv("WAIT_BUDGET_LOGIN_S", raising=False)
+    page = _FakePage()
+    assert wait_for_network_quiet(page, phase="login")
+    assert page.load_states == [("networkidle", 25000)]
+
+
+def test_pagination_page_change_returns_when_row_count_changes(monkeypatch):
+    counts = iter([10, 10, 10, 7])
+    frame = _FakeFrame()
+    frame.locator = lambda selector: SimpleNamespace(count=lambda: next(counts, 7))
+    monkeypatch.setattr(pagination_helper, "read_grid_state", lambda fr: {"loading": False})
+
+    started = time.monotonic()
+    assert pagination_helper.wait_for_page_change(frame, initial_row_count=10, timeout_seconds=5.0)
+    assert time.monotonic() - started < 1.0
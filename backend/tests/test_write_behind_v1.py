@@ -0,0 +1,163 @@
+"""
+Tests de la caché write-behind de memoria de aprendizaje (RL, memoria visual, MemoryStore).
+"""
+
+import json
+import os
+import shutil
+import sys
+import threading
+from datetime import datetime
+
+import pytest
+
+from backend.memory.memory_store import MemoryStore
+from backend.rl.rl_memory import RLMemory
+from backend.shared import write_behind_v1
+from backend.shared.write_behind_v1 import WriteBehindCacheV1, flush_learning_stores
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """Caché aislada sin flush periódico (solo flush explícito)."""
+    cache = WriteBehindCacheV1(flush_interval_s=3600)
+    monkeypatch.setattr(write_behind_v1, "_CACHE", cache)
+    yield cache
+    cache.close()
+
+
+def test_rl_updates_are_batched_until_flush(cache, tmp_path):
+    memory = RLMemory(base_dir=tmp_path)
+    policy_path = tmp_path / "rl" / "cae.json"
+
+    for i in range(50):
+        memory.update_q_value("cae", f"state_{i % 5}", "click_upload", reward=1.0)
+
+    # Nada en disco hasta el flush; las lecturas ven el estado en memoria
+    assert not policy_path.exists()
+    assert memory.get_best_action("cae", "state_0") == "click_upload"
+    assert cache.dirty_count() == 1
+
+    assert flush_learning_stores() == 1
+    assert cache.stats["writes"] == 1
+    data = json.loads(policy_path.read_text(encoding="utf-8"))
+    assert len(data["q_table"]) == 5
+    assert all(q["visits"] == 10 for q in data["q_table"])
+
+    # Otra instancia (mismo proceso) y una relectura desde disco coinciden
+    cache.invalidate(policy_path)
+    reloaded = RLMemory(base_dir=tmp_path).load_policy("cae")
+    assert len(reloaded.q_table) == 5
+
+
+def test_memory_store_outcomes_write_behind(cache, tmp_path):
+    store = MemoryStore(str(tmp_path))
+    for score in (0.4, 0.6, 0.8):
+        store.update_worker_outcome(worker_id="w1", new_score=score, issues=["falta firma"], timestamp=datetime.now())
+        store.update_company_outcome(
+            company_name="Empresa Test", platform="egestiona", worker_contribution_score=score, issues=[], timestamp=datetime.now(),
+        )
+
+    worker_path = tmp_path / "workers" / "w1.json"
+    assert not worker_path.exists()
+    assert store.load_worker("w1").outcome_run_count == 3
+
+    flush_learning_stores()
+    data = json.loads(worker_path.read_text(encoding="utf-8"))
+    assert data["outcome_run_count"] == 3
+    assert data["last_outcome_score"] == 0.8
+    assert (tmp_path / "companies" / "empresa_test_egestiona.json").exists()
+
+    # Las copias devueltas no alteran la caché
+    loaded = store.load_worker("w1")
+    loaded.outcome_run_count = 99
+    assert store.load_worker("w1").outcome_run_count == 3
+
+
+def test_clean_entry_reloads_external_change(cache, tmp_path):
+    store = MemoryStore(str(tmp_path))
+    store.update_platform_outcome(platform_name="egestiona", company_contribution_score=0.5, issues=[], timestamp=datetime.now())
+    flush_learning_stores()
+
+    platform_path = tmp_path / "platforms" / "egestiona.json"
+    data = json.loads(platform_path.read_text(encoding="utf-8"))
+    data["outcome_run_count"] = 7
+    platform_path.write_text(json.dumps(data), encoding="utf-8")
+    st = platform_path.stat()
+    os.utime(platform_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+    assert store.load_platform("egestiona").outcome_run_count == 7
+
+
+def test_atomic_write_leaves_no_temp_files_and_keeps_missing_dirs_pending(cache, tmp_path):
+    memory = RLMemory(base_dir=tmp_path)
+    memory.update_q_value("cae", "s", "a", reward=1.0)
+    flush_learning_stores()
+    assert sorted(p.name for p in (tmp_path / "rl").iterdir()) == ["cae.json"]
+
+    # Si el directorio desaparece antes del flush, no se recrea pero la entrada sigue sucia
+    memory.update_q_value("cae", "s", "a", reward=1.0)
+    shutil.rmtree(tmp_path / "rl")
+    assert flush_learning_stores() == 0
+    assert cache.dirty_count() == 1
+    assert not (tmp_path / "rl").exists()
+
+    # Cuando el directorio vuelve, el siguiente flush escribe la actualización pendiente
+    (tmp_path / "rl").mkdir()
+    assert flush_learning_stores() == 1
+    data = json.loads((tmp_path / "rl" / "cae.json").read_text(encoding="utf-8"))
+    assert data["q_table"][0]["visits"] == 2
+
+
+def test_concurrent_creators_share_one_document(cache, tmp_path):
+    memory = RLMemory(base_dir=tmp_path)
+    barrier = threading.Barrier(8)
+    errors = []
+
+    def worker(i):
+        try:
+            barrier.wait()
+            for n in range(50):
+                memory.update_q_value(f"nueva_{n}", f"state_{i}", "click", reward=1.0)
+        except Exception as e:  # pragma: no cover - solo para diagnosticar
+            errors.append(e)
+
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-5)
+    try:
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        sys.setswitchinterval(old_interval)
+
+    assert errors == []
+    flush_learning_stores()
+    for n in range(50):
+        data = json.loads((tmp_path / "rl" / f"nueva_{n}.json").read_text(encoding="utf-8"))
+        assert len(data["q_table"]) == 8
+
+
+@pytest.mark.asyncio
+async def test_rl_episode_flushes_learning_when_it_ends(cache, tmp_path, monkeypatch):
+    from unittest.mock import MagicMock
+
+    from backend.agents.hybrid_planner import HybridPlanner
+
+    memory = RLMemory(base_dir=tmp_path)
+    planner = HybridPlanner(browser_controller=MagicMock(), rl_engine=MagicMock())
+
+    async def episode(*args):
+        memory.update_q_value("cae", "state_0", "click_upload", reward=1.0)
+        raise RuntimeError("fallo a mitad del episodio")
+
+    monkeypatch.setattr(planner, "_run_episode", episode)
+    with pytest.raises(RuntimeError):
+        await planner.run("subir documento")
+
+    # Lo aprendido antes del fallo está en disco sin esperar al flush periódico
+    assert cache.dirty_count() == 0
+    data = json.loads((tmp_path / "rl" / "cae.json").read_text(encoding="utf-8"))
+    assert len(data["q_table"]) == 1
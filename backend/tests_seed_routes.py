@@ -63,7 +63,7 @@ def ensure_unique_periods(periods: list[str]) -> list[str]:
     
     return unique_periods
 
-from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+from backend.repository.repository_service_v1 import get_repository_store
 from backend.repository.validity_calculator_v1 import compute_validity
 from backend.shared.document_repository_v1 import (
     DocumentTypeV1,
@@ -115,7 +115,7 @@ async def seed_cae_selection_v1() -> SeedCAESelectionResponse:
     
     # SPRINT C2.5.2: Lock global para evitar condiciones de carrera
     with SEED_LOCK:
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         
         # IDs únicos con prefijo E2E_
     run_id = str(uuid4())[:8]
@@ -263,7 +263,7 @@ async def cleanup_seed_data():
     
     # SPRINT C2.5.2: Lock global para evitar condiciones de carrera
     with SEED_LOCK:
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         
         # Buscar y eliminar tipos y documentos con prefijo E2E_
         types = store.list_types(include_inactive=True)
@@ -317,7 +317,7 @@ async def seed_reset() -> dict:
     
     # SPRINT C2.5.2: Lock global para evitar condiciones de carrera
     with SEED_LOCK:
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         deleted_types = []
         deleted_docs = []
         deleted_snapshots = []
@@ -402,7 +402,7 @@ async def seed_basic_repository() -> BasicRepositorySeedResponse:
     
     # SPRINT C2.5.2: Lock global para evitar condiciones de carrera
     with SEED_LOCK:
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         run_id = str(uuid4())[:8]
     
     # IDs con prefijo E2E_
@@ -544,9 +544,8 @@ async def seed_basic_cae_snapshot() -> dict:
         created_at = datetime.utcnow()
         
         from backend.cae.coordination_models_v1 import PlatformPendingItemV1, CoordinationSnapshotV1
-        from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
         
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         e2e_types = [t for t in store.list_types(include_inactive=True) if t.type_id.startswith("E2E_")]
         
         pending_items = []
@@ -629,7 +628,7 @@ async def seed_upload_pack() -> UploadPackSeedResponse:
     
     # SPRINT C2.5.2: Lock global para evitar condiciones de carrera
     with SEED_LOCK:
-        store = DocumentRepositoryStoreV1()
+        store = get_repository_store()
         pdfs_dir = store.docs_dir
         pdfs_dir.mkdir(parents=True, exist_ok=True)
         
@@ -0,0 +1,36 @@
+"""
+Script CLI para compactar el learning store (hints_v1.jsonl).
+
+Uso:
+    python -m backend.tools.compact_learning_hints [--tenant default]
+
+Reescribe hints_v1.jsonl sin los hints desactivados. Los tombstones se conservan.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Añadir el root del proyecto al path
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(_PROJECT_ROOT))
+
+from backend.shared.learning_store import LearningStore
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compacta hints_v1.jsonl eliminando hints desactivados")
+    parser.add_argument("--tenant", default="default", help="ID del tenant (default: default)")
+    args = parser.parse_args()
+
+    store = LearningStore(tenant_id=args.tenant)
+    result = store.compact()
+    print(f"[compact] {store.hints_file_write}")
+    print(f"  - kept: {result['kept']}")
+    print(f"  - removed: {result['removed']}")
+
+
+if __name__ == '__main__':
+    main()
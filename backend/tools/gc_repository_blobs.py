@@ -0,0 +1,56 @@
+"""
+Script CLI para el almacén de blobs del repositorio documental (contenido por sha256).
+
+Uso:
+    python -m backend.tools.gc_repository_blobs [--adopt] [--dry-run] [--grace-hours N]
+
+- --adopt: pasa a blobs/ los PDFs de docs/ que aún son copias independientes
+  (subidas anteriores al almacén por contenido) y los sustituye por hardlinks.
+- Después elimina los blobs que ningún documento referencia y los temporales
+  abandonados, con un margen (--grace-hours) para uploads en curso.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Añadir el root del proyecto al path
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(_PROJECT_ROOT))
+
+from backend.repository.blob_store_v1 import DEFAULT_GC_GRACE_S
+from backend.repository.document_repository_store_v1 import DocumentRepositoryStoreV1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GC de blobs huérfanos de data/repository/blobs")
+    parser.add_argument("--adopt", action="store_true", help="Deduplicar PDFs existentes de docs/ en blobs/")
+    parser.add_argument("--dry-run", action="store_true", help="Solo informar, no borrar nada")
+    parser.add_argument(
+        "--grace-hours",
+        type=float,
+        default=DEFAULT_GC_GRACE_S / 3600,
+        help="No borrar blobs más recientes que este margen (uploads en curso)",
+    )
+    args = parser.parse_args()
+
+    store = DocumentRepositoryStoreV1()
+    print(f"[blobs] Repositorio: {store.repo_dir}")
+
+    if args.adopt and not args.dry_run:
+        adopted = store.adopt_legacy_pdfs()
+        print(f"[blobs] adopt: {adopted}")
+
+    refcounts = store.blob_refcounts()
+    shared = sum(1 for count in refcounts.values() if count > 1)
+    print(f"[blobs] contenidos referenciados: {len(refcounts)} (compartidos por varios documentos: {shared})")
+
+    stats = store.gc_blobs(grace_s=args.grace_hours * 3600, dry_run=args.dry_run)
+    prefix = "[blobs] (dry-run) " if args.dry_run else "[blobs] "
+    print(f"{prefix}gc: {stats}")
+
+
+if __name__ == '__main__':
+    main()
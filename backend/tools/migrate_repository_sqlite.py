@@ -0,0 +1,47 @@
+"""
+Script CLI para migrar el repositorio documental de JSON a SQLite.
+
+Uso:
+    python -m backend.tools.migrate_repository_sqlite [--activate]
+
+Lee types/types.json y meta/*.json del repository_root_dir configurado y los vuelca a
+repository.sqlite3 (modo WAL). Reglas y overrides siguen en JSON con ambos backends.
+Los ficheros JSON no se modifican. Con --activate se guarda storage_backend=sqlite.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+# Añadir el root del proyecto al path
+_PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(_PROJECT_ROOT))
+
+from backend.repository.repository_backends_v1 import SQLITE_DB_NAME, migrate_json_to_sqlite
+from backend.repository.settings_routes import load_settings, save_settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migra data/repository (JSON) a SQLite")
+    parser.add_argument("--activate", action="store_true", help="Guardar storage_backend=sqlite en settings.json")
+    args = parser.parse_args()
+
+    settings = load_settings()
+    repo_dir = Path(settings.repository_root_dir)
+    print(f"[migrate] Repositorio: {repo_dir}")
+
+    counts = migrate_json_to_sqlite(repo_dir)
+    print(f"[migrate] SQLite: {repo_dir / SQLITE_DB_NAME}")
+    for key, value in counts.items():
+        print(f"  - {key}: {value}")
+
+    if args.activate:
+        settings.storage_backend = "sqlite"
+        save_settings(settings)
+        print("[migrate] storage_backend=sqlite activado")
+
+
+if __name__ == '__main__':
+    main()
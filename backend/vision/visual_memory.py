@@ -2,12 +2,16 @@
 Visual Memory Store: Gestión de memoria visual (heatmaps y landmarks).
 
 v5.2.0: Almacena y consulta memoria visual para navegación basada en coordenadas.
+
+Los snapshots se mantienen en la caché write-behind compartida (backend.shared.write_behind_v1)
+con celdas indexadas por (row, col) y landmarks por texto: cada clic actualiza contadores en
+memoria y el JSON se reescribe en el siguiente flush.
 """
 
 import json
 import logging
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Set, Tuple
 from datetime import datetime
 
 from backend.shared.models import (
@@ -17,10 +21,54 @@ from backend.shared.models import (
     VisualLandmark,
 )
 from backend.config import VISUAL_MEMORY_BASE_DIR, VISUAL_MEMORY_ENABLED
+from backend.shared.write_behind_v1 import get_learning_cache
 
 logger = logging.getLogger(__name__)
 
 
+class _SnapshotDoc:
+    """Snapshot en memoria + índices de celdas (row, col) y landmarks por text_snippet."""
+    
+    def __init__(self, snapshot: VisualMemorySnapshot):
+        self.snapshot = snapshot
+        self.cells: Dict[Tuple[int, int], VisualHeatmapCell] = {}
+        if snapshot.heatmap is not None:
+            for cell in snapshot.heatmap.cells:
+                self.cells.setdefault((cell.row, cell.col), cell)
+        self.landmarks_by_text: Dict[Optional[str], List[VisualLandmark]] = {}
+        for landmark in snapshot.landmarks:
+            self.landmarks_by_text.setdefault(landmark.text_snippet, []).append(landmark)
+    
+    def add_cell(self, cell: VisualHeatmapCell) -> None:
+        self.snapshot.heatmap.cells.append(cell)
+        self.cells[(cell.row, cell.col)] = cell
+    
+    def add_landmark(self, landmark: VisualLandmark) -> None:
+        self.snapshot.landmarks.append(landmark)
+        self.landmarks_by_text.setdefault(landmark.text_snippet, []).append(landmark)
+
+
+def _serialize_snapshot(doc: _SnapshotDoc) -> Dict[str, Any]:
+    snapshot = doc.snapshot
+    data = {
+        "platform": snapshot.platform,
+        "page_signature": snapshot.page_signature,
+        "version": snapshot.version,
+        "landmarks": [landmark.model_dump() for landmark in snapshot.landmarks],
+    }
+    
+    if snapshot.heatmap:
+        data["heatmap"] = {
+            "platform": snapshot.heatmap.platform,
+            "page_signature": snapshot.heatmap.page_signature,
+            "rows": snapshot.heatmap.rows,
+            "cols": snapshot.heatmap.cols,
+            "cells": [cell.model_dump() for cell in snapshot.heatmap.cells],
+            "last_updated_at": snapshot.heatmap.last_updated_at,
+        }
+    return data
+
+
 class VisualMemoryStore:
     """
     Almacén de memoria visual.
@@ -40,6 +88,7 @@ class VisualMemoryStore:
         
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self._known_dirs: Set[Path] = set()
         
         logger.debug(f"[visual-memory] Initialized with base_dir: {self.base_dir}")
     
@@ -59,34 +108,19 @@ class VisualMemoryStore:
         safe_signature = page_signature.replace("/", "_").replace("\\", "_")
         
         platform_dir = self.base_dir / safe_platform
-        platform_dir.mkdir(parents=True, exist_ok=True)
+        if platform_dir not in self._known_dirs:
+            platform_dir.mkdir(parents=True, exist_ok=True)
+            self._known_dirs.add(platform_dir)
         
         return platform_dir / f"{safe_signature}.json"
     
-    def load_snapshot(
+    def _read_snapshot_file(
         self,
+        snapshot_path: Path,
         platform: str,
         page_signature: str,
-    ) -> Optional[VisualMemorySnapshot]:
-        """
-        Carga un snapshot de memoria visual desde disco.
-        
-        Args:
-            platform: Nombre de la plataforma
-            page_signature: Firma de la página
-            
-        Returns:
-            VisualMemorySnapshot cargado o None si no existe
-        """
-        if not VISUAL_MEMORY_ENABLED:
-            return None
-        
-        snapshot_path = self._get_snapshot_path(platform, page_signature)
-        
-        if not snapshot_path.exists():
-            logger.debug(f"[visual-memory] No snapshot found for {platform}/{page_signature}")
-            return None
-        
+    ) -> Optional[_SnapshotDoc]:
+        """Lee y valida el JSON de un snapshot (None si es inválido)."""
         try:
             with open(snapshot_path, 'r', encoding='utf-8') as f:
                 data = json.load(f)
@@ -127,7 +161,7 @@ class VisualMemoryStore:
                 f"{len(cells) if heatmap else 0} cells, {len(landmarks)} landmarks"
             )
             
-            return snapshot
+            return _SnapshotDoc(snapshot)
         
         except Exception as e:
             logger.warning(
@@ -136,9 +170,57 @@ class VisualMemoryStore:
             )
             return None
     
+    def _get_doc(self, platform: str, page_signature: str) -> Optional[_SnapshotDoc]:
+        """Snapshot en memoria (cargado de disco la primera vez o si cambió fuera del proceso)."""
+        snapshot_path = self._get_snapshot_path(platform, page_signature)
+        doc = get_learning_cache().get(
+            snapshot_path,
+            lambda p: self._read_snapshot_file(p, platform, page_signature),
+            _serialize_snapshot,
+        )
+        if doc is None:
+            logger.debug(f"[visual-memory] No snapshot found for {platform}/{page_signature}")
+        return doc
+    
+    def _mutate(self, platform: str, page_signature: str, fn: Callable[[_SnapshotDoc], None]) -> None:
+        """Aplica fn(doc) al snapshot (en memoria o nuevo) bajo el lock de la caché y lo marca sucio."""
+        get_learning_cache().mutate(
+            self._get_snapshot_path(platform, page_signature),
+            lambda p: self._read_snapshot_file(p, platform, page_signature),
+            _serialize_snapshot,
+            lambda: _SnapshotDoc(VisualMemorySnapshot(
+                platform=platform,
+                page_signature=page_signature,
+            )),
+            fn,
+        )
+    
+    def load_snapshot(
+        self,
+        platform: str,
+        page_signature: str,
+    ) -> Optional[VisualMemorySnapshot]:
+        """
+        Carga un snapshot de memoria visual (copia independiente de la versión en memoria).
+        
+        Args:
+            platform: Nombre de la plataforma
+            page_signature: Firma de la página
+            
+        Returns:
+            VisualMemorySnapshot cargado o None si no existe
+        """
+        if not VISUAL_MEMORY_ENABLED:
+            return None
+        
+        doc = self._get_doc(platform, page_signature)
+        if doc is None:
+            return None
+        return doc.snapshot.model_copy(deep=True)
+    
     def save_snapshot(self, snapshot: VisualMemorySnapshot) -> bool:
         """
-        Guarda un snapshot de memoria visual en disco.
+        Guarda un snapshot de memoria visual en disco (escritura inmediata y atómica).
         
         Args:
             snapshot: Snapshot a guardar
@@ -152,27 +234,11 @@ class VisualMemoryStore:
         snapshot_path = self._get_snapshot_path(snapshot.platform, snapshot.page_signature)
         
         try:
-            # Convertir a dict
-            data = {
-                "platform": snapshot.platform,
-                "page_signature": snapshot.page_signature,
-                "version": snapshot.version,
-                "landmarks": [landmark.model_dump() for landmark in snapshot.landmarks],
-            }
-            
-            if snapshot.heatmap:
-                data["heatmap"] = {
-                    "platform": snapshot.heatmap.platform,
-                    "page_signature": snapshot.heatmap.page_signature,
-                    "rows": snapshot.heatmap.rows,
-                    "cols": snapshot.heatmap.cols,
-                    "cells": [cell.model_dump() for cell in snapshot.heatmap.cells],
-                    "last_updated_at": snapshot.heatmap.last_updated_at,
-                }
-            
-            # Guardar JSON
-            with open(snapshot_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            get_learning_cache().write_through(
+                snapshot_path,
+                _SnapshotDoc(snapshot.model_copy(deep=True)),
+                _serialize_snapshot,
+            )
             
             logger.debug(
                 f"[visual-memory] Saved snapshot for {snapshot.platform}/{snapshot.page_signature}"
@@ -210,14 +276,8 @@ class VisualMemoryStore:
         if not VISUAL_MEMORY_ENABLED:
             return
         
-        try:
-            # Cargar snapshot existente o crear nuevo
-            snapshot = self.load_snapshot(platform, page_signature)
-            if snapshot is None:
-                snapshot = VisualMemorySnapshot(
-                    platform=platform,
-                    page_signature=page_signature,
-                )
+        def _apply(doc: _SnapshotDoc) -> None:
+            snapshot = doc.snapshot
             
             # Crear o obtener heatmap
             if snapshot.heatmap is None:
@@ -228,17 +288,13 @@ class VisualMemoryStore:
                     cols=6,
                 )
             
-            # Buscar celda existente
-            cell = None
-            for c in snapshot.heatmap.cells:
-                if c.row == row and c.col == col:
-                    cell = c
-                    break
+            # Buscar celda existente (índice por (row, col))
+            cell = doc.cells.get((row, col))
             
             # Crear celda si no existe
             if cell is None:
                 cell = VisualHeatmapCell(row=row, col=col)
-                snapshot.heatmap.cells.append(cell)
+                doc.add_cell(cell)
             
             # Actualizar contadores
             cell.clicks += int(weight)
@@ -253,9 +309,10 @@ class VisualMemoryStore:
             # Actualizar timestamp
             cell.last_used_at = datetime.now().isoformat()
             snapshot.heatmap.last_updated_at = datetime.now().isoformat()
-            
-            # Guardar snapshot
-            self.save_snapshot(snapshot)
+        
+        try:
+            # Snapshot en memoria o nuevo, mutado bajo el lock de la caché (escritura diferida)
+            self._mutate(platform, page_signature, _apply)
         
         except Exception as e:
             logger.warning(
@@ -285,22 +342,13 @@ class VisualMemoryStore:
         if not VISUAL_MEMORY_ENABLED:
             return
         
-        try:
-            # Cargar snapshot existente o crear nuevo
-            snapshot = self.load_snapshot(platform, page_signature)
-            if snapshot is None:
-                snapshot = VisualMemorySnapshot(
-                    platform=platform,
-                    page_signature=page_signature,
-                )
-            
-            # Buscar landmark existente (por posición aproximada y texto)
+        def _apply(doc: _SnapshotDoc) -> None:
+            # Buscar landmark existente (mismo texto y posición aproximada)
             existing_landmark = None
-            for lm in snapshot.landmarks:
+            for lm in doc.landmarks_by_text.get(landmark.text_snippet, []):
                 if (
                     abs(lm.x_center - landmark.x_center) < 0.1 and
-                    abs(lm.y_center - landmark.y_center) < 0.1 and
-                    lm.text_snippet == landmark.text_snippet
+                    abs(lm.y_center - landmark.y_center) < 0.1
                 ):
                     existing_landmark = lm
                     break
@@ -308,7 +356,7 @@ class VisualMemoryStore:
             # Si no existe, añadir nuevo
             if existing_landmark is None:
                 existing_landmark = landmark
-                snapshot.landmarks.append(existing_landmark)
+                doc.add_landmark(existing_landmark)
             
             # Actualizar contadores
             existing_landmark.uses += int(weight)
@@ -322,9 +370,10 @@ class VisualMemoryStore:
             
             # Actualizar timestamp
             existing_landmark.last_used_at = datetime.now().isoformat()
-            
-            # Guardar snapshot
-            self.save_snapshot(snapshot)
+        
+        try:
+            # Snapshot en memoria o nuevo, mutado bajo el lock de la caché (escritura diferida)
+            self._mutate(platform, page_signature, _apply)
         
         except Exception as e:
             logger.warning(
@@ -353,18 +402,18 @@ class VisualMemoryStore:
         if not VISUAL_MEMORY_ENABLED:
             return []
         
-        snapshot = self.load_snapshot(platform, page_signature)
-        if snapshot is None or snapshot.heatmap is None:
+        doc = self._get_doc(platform, page_signature)
+        if doc is None or doc.snapshot.heatmap is None:
             return []
         
         # Ordenar por score descendente
         sorted_cells = sorted(
-            snapshot.heatmap.cells,
+            doc.snapshot.heatmap.cells,
             key=lambda c: c.score,
             reverse=True,
         )
         
-        return sorted_cells[:top_k]
+        return [cell.model_copy() for cell in sorted_cells[:top_k]]
     
     def get_best_landmarks(
         self,
@@ -388,12 +437,12 @@ class VisualMemoryStore:
         if not VISUAL_MEMORY_ENABLED:
             return []
         
-        snapshot = self.load_snapshot(platform, page_signature)
-        if snapshot is None:
+        doc = self._get_doc(platform, page_signature)
+        if doc is None:
             return []
         
         # Filtrar por role si se especifica
-        landmarks = snapshot.landmarks
+        landmarks = doc.snapshot.landmarks
         if role:
             landmarks = [lm for lm in landmarks if lm.role == role]
         
@@ -404,7 +453,7 @@ class VisualMemoryStore:
             reverse=True,
         )
         
-        return sorted_landmarks[:top_k]
+        return [landmark.model_copy(deep=True) for landmark in sorted_landmarks[:top_k]]
 
 
 
@@ -0,0 +1,157 @@
+"""
+Benchmark del motor de redacción (RedactorV1) frente a la implementación anterior.
+
+Mide redact_text sobre payloads de trace, redact_html sobre HTML grande (una línea,
+como page.content() minificado, y multilínea) e iter_redact_html por trozos.
+Verifica además que salida y RedactionReport son idénticos.
+
+Ejecutar: python scripts/bench_redaction.py [--html-kb 1024] [--repeat 3]
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+# Añadir raíz del proyecto al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.executor.redaction_v1 import (
+    DEFAULT_STREAM_CHUNK_CHARS,
+    EMAIL_RE,
+    NIE_RE,
+    NIF_RE,
+    PHONE_RE,
+    TOKEN_RE,
+    RedactorV1,
+    _key_is_sensitive,
+    iter_string_chunks,
+)
+
+
+class LegacyRedactorV1(RedactorV1):
+    """Implementación anterior: 5 pasadas finditer + sub, regex de HTML compiladas por llamada."""
+
+    def redact_text(self, s):
+        if not self.enabled or not s:
+            return s
+        original = s
+
+        def sub_and_count(rx, kind, txt):
+            matches = list(rx.finditer(txt))
+            if matches:
+                self.report.inc(kind, len(matches))
+                txt = rx.sub("***", txt)
+            return txt
+
+        s = sub_and_count(EMAIL_RE, "email", s)
+        s = sub_and_count(PHONE_RE, "phone", s)
+        s = sub_and_count(NIF_RE, "dni_nif", s)
+        s = sub_and_count(NIE_RE, "dni_nie", s)
+        s = sub_and_count(TOKEN_RE, "token", s)
+        if s != original:
+            self.report.inc("text_redactions", 1)
+        return s
+
+    def redact_html(self, html):
+        if not self.enabled or not html:
+            return html
+        red = self.redact_text(html)
+        pw_rx = re.compile(r'(<input[^>]*type=["\']password["\'][^>]*value=["\'])([^"\']*)(["\'])', re.IGNORECASE)
+        m = list(pw_rx.finditer(red))
+        if m:
+            self.report.inc("password_value", len(m))
+            red = pw_rx.sub(r"\1***\3", red)
+        named_rx = re.compile(r'(<input[^>]*(?:name|id)=["\']([^"\']+)["\'][^>]*value=["\'])([^"\']*)(["\'])', re.IGNORECASE)
+        out = red
+        for mm in list(named_rx.finditer(out)):
+            if _key_is_sensitive(mm.group(2) or ""):
+                self.report.inc("sensitive_input_value", 1)
+                out = out.replace(mm.group(0), mm.group(1) + "***" + mm.group(4))
+        return out
+
+
+def _build_html(target_kb: int, multiline: bool) -> str:
+    row = (
+        '<tr class="grid-row row_even"><td data-col="trabajador">Juan Pérez</td>'
+        '<td>12345678Z</td><td>juan.perez@contratas.es</td><td>+34 600 123 456</td>'
+        '<td><a href="/docs/view?id=Doc_Ref_9f8e7d6c5b4a3210">ver</a></td>'
+        '<td><input name="obs" value="pendiente de revisión"></td></tr>'
+    )
+    form = '<input type="password" name="password" value="Sup3rSecret"><input id="email" value="x@y.es">'
+    sep = "\n" if multiline else ""
+    rows = []
+    size = 0
+    while size < target_kb * 1024:
+        rows.append(row)
+        size += len(row) + len(sep)
+    return "<html><body>" + form + sep + sep.join(rows) + "</body></html>"
+
+
+def _build_trace_payloads(n: int):
+    return [
+        {
+            "event_type": "action_executed",
+            "step_id": f"step_{i:03d}",
+            "metadata": {"selector": "#grid tr:nth-child(3) td", "text": "Estado: pendiente", "count": i},
+            "action_spec": {"kind": "click", "target": {"type": "css", "selector": "button.enviar"}},
+            "error": None if i % 10 else {"message": f"timeout esperando a juan{i}@contratas.es"},
+        }
+        for i in range(n)
+    ]
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _compare(label: str, legacy_fn, new_fn, repeat: int) -> None:
+    legacy, new = LegacyRedactorV1(enabled=True), RedactorV1(enabled=True)
+    legacy_out, new_out = legacy_fn(legacy), new_fn(new)
+    identical = legacy_out == new_out and legacy.report.counts == new.report.counts
+    t_legacy = _time(lambda: legacy_fn(LegacyRedactorV1(enabled=True)), repeat)
+    t_new = _time(lambda: new_fn(RedactorV1(enabled=True)), repeat)
+    speedup = t_legacy / t_new if t_new else float("inf")
+    print(f"{label:<40} legacy {t_legacy * 1000:9.1f} ms   nuevo {t_new * 1000:9.1f} ms   x{speedup:6.1f}   idéntico={identical}")
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Benchmark RedactorV1 (legacy vs motor precompilado)")
+    parser.add_argument("--html-kb", type=int, default=1024, help="Tamaño del HTML sintético (KB)")
+    parser.add_argument("--trace-events", type=int, default=2000, help="Eventos de trace sintéticos")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones (se toma el mejor tiempo)")
+    args = parser.parse_args()
+
+    print("=" * 100)
+    print("REDACTION BENCHMARK")
+    print("=" * 100)
+
+    payloads = _build_trace_payloads(args.trace_events)
+    _compare(
+        f"trace payloads ({args.trace_events} eventos)",
+        lambda r: [r.redact_jsonable(p) for p in payloads],
+        lambda r: [r.redact_jsonable(p) for p in payloads],
+        args.repeat,
+    )
+
+    for multiline in (True, False):
+        html = _build_html(args.html_kb, multiline)
+        label = f"html {len(html) // 1024} KB ({'multilínea' if multiline else 'una línea'})"
+        _compare(label, lambda r: r.redact_html(html), lambda r: r.redact_html(html), args.repeat)
+        _compare(
+            label + " por trozos",
+            lambda r: r.redact_html(html),
+            lambda r: "".join(r.iter_redact_html(iter_string_chunks(html, DEFAULT_STREAM_CHUNK_CHARS))),
+            args.repeat,
+        )
+
+
+if __name__ == "__main__":
+    main()
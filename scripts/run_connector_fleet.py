@@ -0,0 +1,87 @@
+"""
+Barrido de conectores en modo fleet (varios tenants en paralelo, un solo navegador).
+
+Ejemplos:
+    python scripts/run_connector_fleet.py --tenant "Aigues de Manresa" --tenant "Otra Empresa" --dry-run
+    python scripts/run_connector_fleet.py --jobs-file nightly_jobs.json --max-concurrency 6 --screenshots on_failure
+
+jobs-file: lista JSON de objetos {"platform_id", "tenant_id", "max_items", "dry_run"}.
+Límites por defecto: ver backend/connectors/fleet.py (variables CONNECTOR_FLEET_*).
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+# Añadir raíz del proyecto al path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.connectors.fleet import FleetConfig, FleetJob, run_fleet
+from backend.connectors.models import SCREENSHOT_POLICIES
+import backend.connectors.egestiona  # noqa: F401  (registra el conector)
+
+
+def _load_jobs(args) -> list:
+    jobs = []
+    if args.jobs_file:
+        with open(args.jobs_file, "r", encoding="utf-8") as f:
+            for item in json.load(f):
+                jobs.append(FleetJob(
+                    platform_id=item.get("platform_id", args.platform),
+                    tenant_id=item.get("tenant_id"),
+                    max_items=int(item.get("max_items", args.max_items)),
+                    dry_run=bool(item.get("dry_run", args.dry_run)),
+                ))
+    for tenant in args.tenant or []:
+        jobs.append(FleetJob(platform_id=args.platform, tenant_id=tenant, max_items=args.max_items, dry_run=args.dry_run))
+    return jobs
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="Ejecuta conectores en paralelo (modo fleet)")
+    parser.add_argument("--platform", default="egestiona", help="Plataforma por defecto de los jobs")
+    parser.add_argument("--tenant", action="append", help="Tenant a procesar (repetible)")
+    parser.add_argument("--jobs-file", help="Fichero JSON con la lista de jobs")
+    parser.add_argument("--max-items", type=int, default=5, help="Máximo de items por run")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="Límite global de runs simultáneos")
+    parser.add_argument("--screenshots", choices=SCREENSHOT_POLICIES, default=None, help="Política de capturas")
+    parser.add_argument("--evidence-dir", default=None, help="Directorio base de evidencias")
+    parser.add_argument("--dry-run", action="store_true", help="No subir documentos")
+    parser.add_argument("--headed", action="store_true", help="Mostrar el navegador")
+    args = parser.parse_args()
+
+    jobs = _load_jobs(args)
+    if not jobs:
+        parser.error("Indica al menos un --tenant o un --jobs-file")
+
+    config = FleetConfig.from_env()
+    if args.max_concurrency is not None:
+        config.max_concurrency = max(1, args.max_concurrency)
+    config.screenshot_policy = args.screenshots
+
+    summary = asyncio.run(run_fleet(
+        jobs,
+        headless=not args.headed,
+        evidence_base_dir=args.evidence_dir,
+        config=config,
+    ))
+
+    print("=" * 80)
+    print(f"FLEET {summary['fleet_id']}: {summary['jobs']} jobs en {summary['duration_ms'] / 1000:.1f} s "
+          f"(concurrencia {summary['max_concurrency']}, capturas {summary['screenshot_policy']})")
+    print("=" * 80)
+    for run in summary["runs"]:
+        counts = run.get("counts", {})
+        status = f"ERROR: {run['error']}" if run.get("error") else "ok"
+        print(f"{run.get('platform_id')}/{run.get('tenant_id') or '-'}: {run.get('duration_ms', 0) / 1000:.1f} s  "
+              f"pendientes={counts.get('total_requirements', 0)} match={counts.get('matched', 0)} "
+              f"subidos={counts.get('uploaded', 0)}  {status}")
+    print(f"\nResumen: {summary['evidence_dir']}/fleet_summary.json")
+    sys.exit(1 if summary["failed_jobs"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('SPRINT C2.12.6: Prueba REAL GUIADA (HEADFUL) + EVIDENCIAS', () => {
     test('Ejecutar flujo completo desde UI y generar evidencias', async ({ page }) => {
@@ -164,7 +165,7 @@ test.describe('SPRINT C2.12.6: Prueba REAL GUIADA (HEADFUL) + EVIDENCIAS', () =>
         let responseError = null;
         
         const responsePromise = page.waitForResponse(
-            resp => resp.url().includes('/runs/egestiona/build_submission_plan_readonly'),
+            resp => isBackgroundRunResult(resp, 'build_submission_plan_readonly'),
             { timeout: 300000 } // 5 minutos
         );
         
@@ -185,7 +186,7 @@ test.describe('SPRINT C2.12.6: Prueba REAL GUIADA (HEADFUL) + EVIDENCIAS', () =>
         // Esperar la respuesta de red (puede tardar varios minutos)
         console.log('[TEST] Esperando respuesta del endpoint (timeout 5min)...');
         try {
-            networkResponse = await responsePromise;
+            networkResponse = await backgroundRunResponse(await responsePromise);
             if (networkResponse.status() === 200) {
                 responseJson = await networkResponse.json();
                 console.log('[TEST] ✅ Respuesta recibida:', responseJson.status, 'run_id:', responseJson.run_id || responseJson.artifacts?.run_id);
@@ -34,7 +34,7 @@ test.describe('C2.15: AUTO-UPLOAD Real (Protected)', () => {
         // 1) Construir plan de auto-upload
         console.log('[AUTO_UPLOAD_TEST] Paso 1: Construyendo plan de auto-upload...');
         const planResponse = await page.request.post(
-            `${BACKEND_URL}/runs/egestiona/build_auto_upload_plan?coord=Aigues%20de%20Manresa&company_key=F63161988&person_key=erm&limit=200&only_target=true&max_items=200&max_pages=10`,
+            `${BACKEND_URL}/runs/egestiona/build_auto_upload_plan?wait=true&coord=Aigues%20de%20Manresa&company_key=F63161988&person_key=erm&limit=200&only_target=true&max_items=200&max_pages=10`,
             {
                 headers: {
                     'Content-Type': 'application/json',
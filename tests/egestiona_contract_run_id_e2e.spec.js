@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('SPRINT C2.13.2: Validación de contrato run_id + Grid Loading + Empty-state (E2E REAL)', () => {
     test('Validar que run_id está presente, grid espera loading, y empty-state no genera error falso', async ({ page }) => {
@@ -84,10 +85,7 @@ test.describe('SPRINT C2.13.2: Validación de contrato run_id + Grid Loading + E
         
         // Preparar waitForResponse ANTES de hacer click (importante para capturar el request)
         const responsePromise = page.waitForResponse(
-            response => {
-                const url = response.url();
-                return url.includes('/runs/egestiona/build_submission_plan_readonly');
-            },
+            resp => isBackgroundRunResult(resp, 'build_submission_plan_readonly'),
             { timeout: 300000 } // 5 minutos timeout para ejecución real
         );
         
@@ -121,7 +119,7 @@ test.describe('SPRINT C2.13.2: Validación de contrato run_id + Grid Loading + E
         let responseReceived = false;
         
         try {
-            const response = await responsePromise;
+            const response = await backgroundRunResponse(await responsePromise);
             responseJson = await response.json();
             responseReceived = true;
             
@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('SPRINT C2.12.6: Validación de contrato run_id REAL (E2E sin falsos positivos)', () => {
     test('Validar que run_id está presente en respuesta REAL de red y UI no muestra run_id_missing falso', async ({ page }) => {
@@ -94,7 +95,7 @@ test.describe('SPRINT C2.12.6: Validación de contrato run_id REAL (E2E sin fals
         let responseJson = null;
         
         const responsePromise = page.waitForResponse(
-            resp => resp.url().includes('/runs/egestiona/build_submission_plan_readonly') && resp.status() === 200,
+            resp => isBackgroundRunResult(resp, 'build_submission_plan_readonly'),
             { timeout: 300000 } // 5 minutos timeout
         );
         
@@ -119,7 +120,7 @@ test.describe('SPRINT C2.12.6: Validación de contrato run_id REAL (E2E sin fals
         
         // Esperar la respuesta REAL de red
         try {
-            networkResponse = await responsePromise;
+            networkResponse = await backgroundRunResponse(await responsePromise);
             responseJson = await networkResponse.json();
         } catch (error) {
             // Si no se captura la respuesta, el test debe FALLAR
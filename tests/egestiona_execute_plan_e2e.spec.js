@@ -13,7 +13,7 @@ test.describe('SPRINT C2.12.3: Ejecutar Plan con Guardrails (E2E)', () => {
 
         // PASO 1: Generar plan (READ-ONLY) usando FIXTURE
         console.log('[E2E] Paso 1: Generando plan READ-ONLY con FIXTURE...');
-        const buildResponse = await fetch(`${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?coord=Aigues%20de%20Manresa&company_key=B12345678&limit=5&only_target=false&fixture=1`, {
+        const buildResponse = await fetch(`${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?wait=true&coord=Aigues%20de%20Manresa&company_key=B12345678&limit=5&only_target=false&fixture=1`, {
             method: 'POST',
             headers: {
                 'X-CAE-PLAN-FIXTURE': '1',
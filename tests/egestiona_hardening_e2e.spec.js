@@ -35,7 +35,7 @@ test.describe('C2.16: Hardening E2E (Protected)', () => {
         
         // Primero construir plan
         const planResponse = await page.request.post(
-            `${BACKEND_URL}/runs/egestiona/build_auto_upload_plan?coord=Aigues%20de%20Manresa&company_key=F63161988&person_key=erm&limit=200&only_target=true&max_items=200&max_pages=10`,
+            `${BACKEND_URL}/runs/egestiona/build_auto_upload_plan?wait=true&coord=Aigues%20de%20Manresa&company_key=F63161988&person_key=erm&limit=200&only_target=true&max_items=200&max_pages=10`,
             {
                 headers: {
                     'Content-Type': 'application/json',
@@ -15,7 +15,7 @@ test.describe('SPRINT C2.12.6: Headful Run Persistente (E2E)', () => {
         const BACKEND_URL = 'http://127.0.0.1:8000';
 
         // Generar plan con FIXTURE (no genera storage_state real)
-        const buildResponse = await fetch(`${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?coord=Aigues%20de%20Manresa&company_key=B12345678&limit=5&only_target=false&fixture=1`, {
+        const buildResponse = await fetch(`${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?wait=true&coord=Aigues%20de%20Manresa&company_key=B12345678&limit=5&only_target=false&fixture=1`, {
             method: 'POST',
             headers: {
                 'X-CAE-PLAN-FIXTURE': '1',
@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('Revisar Pendientes CAE (Avanzado) - Manual READ-ONLY', () => {
     test('Ejecutar flujo completo y generar evidencias', async ({ page }) => {
@@ -236,7 +237,7 @@ test.describe('Revisar Pendientes CAE (Avanzado) - Manual READ-ONLY', () => {
         let responseJson = null;
         
         const responsePromise = page.waitForResponse(
-            resp => resp.url().includes('/runs/egestiona/build_submission_plan_readonly') && resp.request().method() === 'POST',
+            resp => isBackgroundRunResult(resp, 'build_submission_plan_readonly'),
             { timeout: 360000 } // 6 minutos timeout
         );
         
@@ -269,7 +270,7 @@ test.describe('Revisar Pendientes CAE (Avanzado) - Manual READ-ONLY', () => {
         // Esperar la respuesta de red
         console.log('[TEST] Esperando respuesta del endpoint (timeout 6min)...');
         try {
-            networkResponse = await responsePromise;
+            networkResponse = await backgroundRunResponse(await responsePromise);
             const status = networkResponse.status();
             console.log(`[TEST] Respuesta HTTP recibida: ${status}`);
             
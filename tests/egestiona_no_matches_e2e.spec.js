@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('SPRINT C2.13.1: READ-ONLY no falla cuando no hay matches', () => {
     test('build_submission_plan_readonly devuelve status ok con items=[] cuando no hay matches', async ({ page }) => {
@@ -120,9 +121,10 @@ test.describe('SPRINT C2.13.1: READ-ONLY no falla cuando no hay matches', () =>
         let networkResponse = null;
         let networkResponseBody = null;
         
-        page.on('response', async (response) => {
-            const url = response.url();
-            if (url.includes('/runs/egestiona/build_submission_plan_readonly') && response.request().method() === 'POST') {
+        page.on('response', async (statusResponse) => {
+            if (await isBackgroundRunResult(statusResponse, 'build_submission_plan_readonly')) {
+                const response = await backgroundRunResponse(statusResponse);
+                const url = response.url();
                 console.log(`[TEST][NETWORK] Capturando respuesta de: ${url}`);
                 networkResponse = {
                     url: url,
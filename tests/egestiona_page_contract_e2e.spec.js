@@ -16,7 +16,7 @@ test.describe('HOTFIX: Page Contract Validator (E2E)', () => {
         // El test valida que el código de error existe y se maneja correctamente.
         
         // Intentar generar plan (puede fallar por page contract si hay problemas)
-        const buildResponse = await fetch(`${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?coord=Aigues%20de%20Manresa&company_key=B12345678&limit=5&only_target=false&fixture=1`, {
+        const buildResponse = await fetch(`${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?wait=true&coord=Aigues%20de%20Manresa&company_key=B12345678&limit=5&only_target=false&fixture=1`, {
             method: 'POST',
             headers: {
                 'X-CAE-PLAN-FIXTURE': '1',
@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('SPRINT C2.13.0: Auto-disparar búsqueda y esperar grid estable', () => {
     test('build_submission_plan_readonly detecta pendientes correctamente tras auto-búsqueda', async ({ page }) => {
@@ -120,9 +121,10 @@ test.describe('SPRINT C2.13.0: Auto-disparar búsqueda y esperar grid estable',
         let networkResponse = null;
         let networkResponseBody = null;
         
-        page.on('response', async (response) => {
-            const url = response.url();
-            if (url.includes('/runs/egestiona/build_submission_plan_readonly') && response.request().method() === 'POST') {
+        page.on('response', async (statusResponse) => {
+            if (await isBackgroundRunResult(statusResponse, 'build_submission_plan_readonly')) {
+                const response = await backgroundRunResponse(statusResponse);
+                const url = response.url();
                 console.log(`[TEST][NETWORK] Capturando respuesta de: ${url}`);
                 networkResponse = {
                     url: url,
@@ -25,7 +25,7 @@ test.describe('C2.13.9a: READ-ONLY Backend Regression - Grid Search Fix + Instru
         // Hacer request directo al endpoint
         console.log('[REGRESSION TEST] Haciendo POST al endpoint build_submission_plan_readonly...');
         const response = await page.request.post(
-            `${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?coord=Aigues%20de%20Manresa&company_key=F63161988&person_key=erm&limit=50&only_target=true`,
+            `${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?wait=true&coord=Aigues%20de%20Manresa&company_key=F63161988&person_key=erm&limit=50&only_target=true`,
             {
                 headers: {
                     'Content-Type': 'application/json',
@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('C2.13.7: READ-ONLY debe calcular pendientes REALES', () => {
     test('build_submission_plan_readonly ejecuta Playwright y devuelve items > 0', async ({ page }) => {
@@ -120,9 +121,10 @@ test.describe('C2.13.7: READ-ONLY debe calcular pendientes REALES', () => {
         let networkResponse = null;
         let networkResponseBody = null;
         
-        page.on('response', async (response) => {
-            const url = response.url();
-            if (url.includes('/runs/egestiona/build_submission_plan_readonly') && response.request().method() === 'POST') {
+        page.on('response', async (statusResponse) => {
+            if (await isBackgroundRunResult(statusResponse, 'build_submission_plan_readonly')) {
+                const response = await backgroundRunResponse(statusResponse);
+                const url = response.url();
                 console.log(`[TEST][NETWORK] Capturando respuesta de: ${url}`);
                 networkResponse = {
                     url: url,
@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('C2.13.8: READ-ONLY UI Render - renderPlanItems fix', () => {
     test('build_submission_plan_readonly renderiza items correctamente en UI sin errores JS', async ({ page }) => {
@@ -135,9 +136,10 @@ test.describe('C2.13.8: READ-ONLY UI Render - renderPlanItems fix', () => {
         let networkResponse = null;
         let networkResponseBody = null;
         
-        page.on('response', async (response) => {
-            const url = response.url();
-            if (url.includes('/runs/egestiona/build_submission_plan_readonly') && response.request().method() === 'POST') {
+        page.on('response', async (statusResponse) => {
+            if (await isBackgroundRunResult(statusResponse, 'build_submission_plan_readonly')) {
+                const response = await backgroundRunResponse(statusResponse);
+                const url = response.url();
                 console.log(`[TEST][NETWORK] Capturando respuesta de: ${url}`);
                 networkResponse = {
                     url: url,
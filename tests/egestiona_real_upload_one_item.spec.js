@@ -34,7 +34,7 @@ test.describe('C2.14.1: REAL Uploader - One Item (Protected)', () => {
         // 1) Primero obtener un plan READ-ONLY para tener items con pending_item_key
         console.log('[REAL UPLOAD TEST] Paso 1: Obteniendo plan READ-ONLY...');
         const planResponse = await page.request.post(
-            `${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?coord=Aigues%20de%20Manresa&company_key=F63161988&person_key=erm&limit=50&only_target=true`,
+            `${BACKEND_URL}/runs/egestiona/build_submission_plan_readonly?wait=true&coord=Aigues%20de%20Manresa&company_key=F63161988&person_key=erm&limit=50&only_target=true`,
             {
                 headers: {
                     'Content-Type': 'application/json',
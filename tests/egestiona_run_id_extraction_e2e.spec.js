@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('HOTFIX C2.12.5.1: Extracción robusta de run_id', () => {
     test('UI NO muestra run_id_missing cuando respuesta contiene plan_id o run_id', async ({ page }) => {
@@ -115,7 +116,7 @@ test.describe('HOTFIX C2.12.5.1: Extracción robusta de run_id', () => {
         let responseJson = null;
         
         const responsePromise = page.waitForResponse(
-            resp => resp.url().includes('/runs/egestiona/build_submission_plan_readonly') && resp.request().method() === 'POST',
+            resp => isBackgroundRunResult(resp, 'build_submission_plan_readonly'),
             { timeout: 360000 } // 6 minutos
         );
         
@@ -130,7 +131,7 @@ test.describe('HOTFIX C2.12.5.1: Extracción robusta de run_id', () => {
         // Esperar la respuesta de red
         console.log('[TEST] Esperando respuesta del endpoint...');
         try {
-            networkResponse = await responsePromise;
+            networkResponse = await backgroundRunResponse(await responsePromise);
             responseJson = await networkResponse.json();
             console.log('[TEST] ✅ Respuesta recibida');
         } catch (error) {
@@ -1,6 +1,7 @@
 const { test, expect } = require('@playwright/test');
 const fs = require('fs');
 const path = require('path');
+const { isBackgroundRunResult, backgroundRunResponse } = require('./helpers/e2eSeed');
 
 test.describe('HOTFIX C2.12.5.2: Instrumentación completa de respuesta y extracción robusta de run_id', () => {
     test('Capturar respuesta EXACTA del endpoint y validar extracción de run_id', async ({ page }) => {
@@ -47,9 +48,10 @@ test.describe('HOTFIX C2.12.5.2: Instrumentación completa de respuesta y extrac
         let networkResponse = null;
         let networkResponseBody = null;
         
-        page.on('response', async (response) => {
-            const url = response.url();
-            if (url.includes('/runs/egestiona/build_submission_plan_readonly') && response.request().method() === 'POST') {
+        page.on('response', async (statusResponse) => {
+            if (await isBackgroundRunResult(statusResponse, 'build_submission_plan_readonly')) {
+                const response = await backgroundRunResponse(statusResponse);
+                const url = response.url();
                 console.log(`[TEST][NETWORK] Capturando respuesta de: ${url}`);
                 networkResponse = {
                     url: url,
@@ -309,6 +309,57 @@ async function waitForTestIdAttached(page, testId, timeout = 10000) {
     await page.waitForSelector(`[data-testid="${testId}"]`, { timeout, state: 'attached' });
 }
 
+/**
+ * Los POST /runs/egestiona/* devuelven un run en segundo plano ({run_id, status_url});
+ * home.html consulta status_url hasta que termina. Predicado (para waitForResponse o
+ * page.on('response')) que reconoce la consulta final de un run del tipo indicado.
+ *
+ * @param {import('@playwright/test').Response} response
+ * @param {string} kind - Tipo de run (ej "build_submission_plan_readonly")
+ */
+async function isBackgroundRunResult(response, kind) {
+    if (!response.url().includes('/runs/egestiona/background/') || response.request().method() !== 'GET') {
+        return false;
+    }
+    try {
+        const run = await response.json();
+        return run.kind === kind && ['SUCCESS', 'FAILED', 'CANCELED'].includes(run.status);
+    } catch {
+        return false;
+    }
+}
+
+/**
+ * Respuesta equivalente a la del endpoint con wait=true a partir de la consulta final del run:
+ * el "result" con 200, o {detail} con el código HTTP del error del flujo.
+ *
+ * @param {import('@playwright/test').Response} response - Respuesta aceptada por isBackgroundRunResult
+ */
+async function backgroundRunResponse(response) {
+    const run = await response.json();
+    let status = 200;
+    let body = run.result;
+    if (run.status === 'CANCELED') {
+        status = 409;
+        body = { detail: `Run ${run.run_id} cancelado` };
+    } else if (run.status === 'FAILED') {
+        const error = run.error || {};
+        status = error.status_code || 500;
+        body = { detail: error.detail || 'Error en el run' };
+    }
+    const text = JSON.stringify(body);
+    return {
+        url: () => response.url(),
+        status: () => status,
+        statusText: () => (status === 200 ? 'OK' : 'Error'),
+        ok: () => status >= 200 && status < 300,
+        headers: () => response.headers(),
+        request: () => response.request(),
+        json: async () => JSON.parse(text),
+        text: async () => text,
+    };
+}
+
 module.exports = {
     seedUploadPack,
     seedReset,
@@ -318,6 +369,8 @@ module.exports = {
     gotoHash,
     waitForTestId,
     waitForTestIdAttached,
+    isBackgroundRunResult,
+    backgroundRunResponse,
     BACKEND_URL,
 };
 
@@ -6,6 +6,7 @@ from pathlib import Path
 import tempfile
 import shutil
 import json
+import threading
 
 from backend.shared.learning_store import (
     LearningStore,
@@ -313,3 +314,97 @@ def test_disable_hint_stops_application(temp_store):
     all_hints = temp_store.list_hints(include_disabled=True)
     assert len(all_hints) == 1
     assert all_hints[0].hint_id == hint.hint_id
+
+
+def _make_hint(item_fingerprint, subject_key="COMPANY123", person_key=None, period_key=None, label=None, type_id="T104_AUTONOMOS_RECEIPT"):
+    return LearnedHintV1.create(
+        plan_id="plan_test",
+        decision_pack_id="pack_test",
+        item_fingerprint=item_fingerprint,
+        type_id_expected=type_id,
+        local_doc_id=f"doc_{item_fingerprint}",
+        local_doc_fingerprint=None,
+        subject_key=subject_key,
+        person_key=person_key,
+        period_key=period_key,
+        portal_type_label_normalized=label,
+    )
+
+
+def test_find_hints_indexed_conditions(temp_store):
+    """Test: Los índices respetan la semántica de condiciones (period/label opcionales en el hint)."""
+    temp_store.add_hints([
+        _make_hint("a", person_key="P1", period_key="2025-01", label="recibo ss"),
+        _make_hint("b", person_key="P1"),  # sin período ni label: aplica a cualquiera
+        _make_hint("c", person_key="P2", period_key="2025-01"),
+        _make_hint("d", subject_key="OTHER", person_key="P1", period_key="2025-01"),
+    ])
+
+    def ids(**kwargs):
+        return [h.item_fingerprint for h in temp_store.find_hints(platform="egestiona", **kwargs)]
+
+    assert ids(subject_key="COMPANY123", person_key="P1", period_key="2025-01") == ["a", "b"]
+    assert ids(subject_key="COMPANY123", person_key="P1", period_key="2025-02") == ["b"]
+    assert ids(subject_key="COMPANY123", person_key="P1", period_key="") == ["b"]
+    assert ids(subject_key="COMPANY123", person_key="P1", portal_label_norm="otro") == ["b"]
+    assert ids(person_key="P1") == ["a", "b", "d"]
+    assert ids(type_id="OTHER_TYPE") == []
+    assert ids() == ["a", "b", "c", "d"]
+
+
+def test_find_hints_sees_appends_from_other_instances(tmp_path):
+    """Test: La cache se refresca incrementalmente con hints añadidos por otra instancia."""
+    reader = LearningStore(base_dir=tmp_path)
+    writer = LearningStore(base_dir=tmp_path)
+    writer.add_hints([_make_hint("a")])
+    assert len(reader.find_hints(platform="egestiona", subject_key="COMPANY123")) == 1
+
+    # Append externo (otro proceso) directamente al JSONL
+    extra = _make_hint("b")
+    with open(writer.hints_file_write, "a", encoding="utf-8") as f:
+        f.write(json.dumps(extra.model_dump(mode="json")) + "\n")
+    assert len(reader.find_hints(platform="egestiona", subject_key="COMPANY123")) == 2
+
+
+def test_compact_removes_tombstoned_hints(temp_store):
+    """Test: compact() reescribe el JSONL sin hints desactivados y mantiene el tombstone."""
+    hint_a = _make_hint("a")
+    hint_b = _make_hint("b")
+    temp_store.add_hints([hint_a, hint_b])
+    temp_store.disable_hint(hint_a.hint_id)
+
+    result = temp_store.compact()
+    assert result == {"kept": 1, "removed": 1}
+
+    lines = [l for l in temp_store.hints_file_write.read_text(encoding="utf-8").splitlines() if l.strip()]
+    assert [json.loads(l)["hint_id"] for l in lines] == [hint_b.hint_id]
+    assert [h.hint_id for h in temp_store.find_hints(platform="egestiona", subject_key="COMPANY123")] == [hint_b.hint_id]
+
+    # Re-aprender el hint desactivado no lo reactiva
+    temp_store.add_hints([hint_a])
+    assert [h.hint_id for h in temp_store.find_hints(platform="egestiona", subject_key="COMPANY123")] == [hint_b.hint_id]
+
+
+def test_compact_does_not_lose_concurrent_appends(tmp_path, monkeypatch):
+    """Test: un add_hints que llega entre la lectura y el replace de compact() no se pierde."""
+    compactor = LearningStore(base_dir=tmp_path)
+    writer = LearningStore(base_dir=tmp_path)
+    compactor.add_hints([_make_hint("a")])
+    late = _make_hint("late")
+    racers = []
+    original = compactor._load_disabled_ids
+
+    def load_and_race():
+        if not racers:
+            racer = threading.Thread(target=writer.add_hints, args=([late],))
+            racer.start()
+            racer.join(timeout=0.2)  # sin lock compartido, el append terminaría aquí
+            racers.append(racer)
+        return original()
+
+    monkeypatch.setattr(compactor, "_load_disabled_ids", load_and_race)
+    assert compactor.compact() == {"kept": 1, "removed": 0}
+    racers[0].join(timeout=5)
+
+    lines = [l for l in compactor.hints_file_write.read_text(encoding="utf-8").splitlines() if l.strip()]
+    assert [json.loads(l)["hint_id"] for l in lines] == [_make_hint("a").hint_id, late.hint_id]